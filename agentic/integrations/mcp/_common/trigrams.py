@@ -0,0 +1,72 @@
+"""Trigram helpers shared by the indexed text searches.
+
+Used by archive_workspace (``infra/text_search.py``) and local_projects
+(``indexer.py``). An index maps each lower-cased 3-character slice of a file
+to the ids of the files containing it; a query is narrowed to the files
+holding all trigrams of its required literals and then verified against the
+file text.
+
+A query with no trigram to narrow on gets ``None`` from ``candidates``,
+meaning "scan everything": regexes without a required literal run of three
+characters (``\\w+``, top-level ``|``), and plain substrings shorter than a
+trigram (``"ab"``). Those stay plain substring/regex scans over every
+indexed file, so short and mid-word queries keep matching.
+"""
+from __future__ import annotations
+
+import re
+from typing import List, Mapping, Optional, Sequence, Set
+
+try:  # Python 3.11+
+    import re._constants as _sre_c
+    import re._parser as _sre_parse
+except ImportError:  # pragma: no cover
+    import sre_constants as _sre_c  # type: ignore[no-redef]
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+
+def trigrams_of(text: str) -> Set[str]:
+    low = text.lower()
+    return {low[i:i + 3] for i in range(len(low) - 2)}
+
+
+def required_literals(query: str, *, regex: bool = False) -> List[str]:
+    """Literal strings any match must contain (possibly none)."""
+    if not regex:
+        return [query]
+    try:
+        parsed = _sre_parse.parse(query)
+    except re.error:
+        return []
+    runs: List[str] = []
+    current: List[str] = []
+    for op, av in parsed:
+        if op is _sre_c.LITERAL:
+            current.append(chr(av))
+            continue
+        if op is _sre_c.BRANCH:
+            return []  # a|b: neither side is required
+        if current:
+            runs.append("".join(current))
+            current = []
+    if current:
+        runs.append("".join(current))
+    return [r for r in runs if len(r) >= 3]
+
+
+def candidates(postings: Mapping[str, Sequence[int]], literals: List[str]) -> Optional[Set[int]]:
+    """File ids holding every trigram of ``literals``, or None when nothing narrows the search."""
+    grams: Set[str] = set()
+    for lit in literals:
+        grams |= trigrams_of(lit)
+    if not grams:
+        return None
+    lists = sorted((postings.get(g, ()) for g in grams), key=len)
+    if not lists[0]:
+        return set()
+    result = set(lists[0])
+    for lst in lists[1:]:
+        result.intersection_update(lst)
+        if not result:
+            break
+    return result
@@ -1,87 +1,155 @@
+"""archive_workspace MCP server.
+
+Workspaces live on disk (see ``infra/workspace_store``): a zip archive is
+read lazily through an mmap, searches go through a trigram index, symbols
+come from a parser pool, and range edits land on piece tables backed by a
+journal, so a workspace survives restarts without being re-indexed.
+
+Tools:
+  hp.ws.open_archive   load a zip (archive_path / archive_base64) or inline files
+  hp.ws.search         substring or regex search
+  hp.ws.symbols        find Python/TS definitions by name
+  hp.ws.read_range     read a line range
+  hp.ws.replace_range  replace a line range
+  hp.ws.tree           list files
+"""
+
 from __future__ import annotations
 
-from agentic.integrations.mcp._common.server import ToolDef, create_mcp_app
+import asyncio
+import re
+import zipfile
 
-_WORKSPACES: dict[str, dict[str, str]] = {}
+from agentic.integrations.mcp._common.server import ToolDef, create_mcp_app
+from agentic.integrations.mcp.archive_workspace.domain.archive_open import open_files, open_zip
+from agentic.integrations.mcp.archive_workspace.domain.search import search
+from agentic.integrations.mcp.archive_workspace.domain.tree import tree
+from agentic.integrations.mcp.archive_workspace.infra.workspace_store import Workspace, get_workspace
 
 
 def _content(text: str, **meta: object) -> dict:
     return {"content": [{"type": "text", "text": text}], "meta": meta}
 
 
-def _get_ws(workspace_id: str) -> dict[str, str]:
-    return _WORKSPACES.setdefault(workspace_id, {})
+def _ws_id(args: dict) -> str:
+    return str(args.get("workspace_id", "")).strip() or "default"
+
+
+def _line_range(args: dict) -> tuple[int, int]:
+    start = max(1, int(args.get("start_line", 1) or 1))
+    end = max(start, int(args.get("end_line", start) or start))
+    return start, end
+
+
+def _missing(workspace_id: str, **meta: object) -> dict:
+    return _content("Workspace not found", ok=False, workspace_id=workspace_id, **meta)
 
 
 async def open_archive(args: dict) -> dict:
-    workspace_id = str(args.get("workspace_id", "")).strip() or "default"
+    workspace_id = _ws_id(args)
+    archive_path = str(args.get("archive_path", "") or "").strip()
+    archive_base64 = str(args.get("archive_base64", "") or "")
+    if archive_path or archive_base64:
+        try:
+            ws = await asyncio.to_thread(
+                open_zip, workspace_id, archive_path=archive_path, archive_base64=archive_base64
+            )
+        except (OSError, ValueError, zipfile.BadZipFile) as exc:
+            return _content(f"Could not open archive: {exc}", ok=False, workspace_id=workspace_id)
+        count = len(ws.files)
+        return _content(f"Opened archive with {count} files into {workspace_id}", ok=True, workspace_id=workspace_id, file_count=count)
+
     files = args.get("files") or {}
     if not isinstance(files, dict):
         return _content("files must be a path->content object", ok=False)
-    ws = _get_ws(workspace_id)
-    for path, content in files.items():
-        ws[str(path)] = str(content)
-    return _content(f"Loaded {len(files)} files into {workspace_id}", ok=True, workspace_id=workspace_id, file_count=len(ws))
+    ws, loaded = await asyncio.to_thread(open_files, workspace_id, files)
+    return _content(f"Loaded {loaded} files into {workspace_id}", ok=True, workspace_id=workspace_id, file_count=len(ws.files))
 
 
 async def ws_search(args: dict) -> dict:
-    workspace_id = str(args.get("workspace_id", "")).strip() or "default"
-    query = str(args.get("query", "")).strip().lower()
+    workspace_id = _ws_id(args)
+    query = str(args.get("query", "")).strip()
     top_k = max(1, min(int(args.get("top_k", 20) or 20), 200))
-    ws = _get_ws(workspace_id)
-    matches = []
-    for path, content in ws.items():
-        if query in path.lower() or query in content.lower():
-            matches.append({"path": path, "preview": content[:180]})
-    matches = matches[:top_k]
+    ws = await asyncio.to_thread(get_workspace, workspace_id)
+    if ws is None or not query:
+        return _content(f"Found 0 matches in {workspace_id}", ok=True, workspace_id=workspace_id, matches=[])
+    try:
+        matches = await asyncio.to_thread(
+            search,
+            ws,
+            query,
+            regex=bool(args.get("regex", False)),
+            case_sensitive=bool(args.get("case_sensitive", False)),
+            top_k=top_k,
+        )
+    except re.error as exc:
+        return _content(f"Invalid regex: {exc}", ok=False, workspace_id=workspace_id)
     return _content(f"Found {len(matches)} matches in {workspace_id}", ok=True, workspace_id=workspace_id, matches=matches)
 
 
+async def ws_symbols(args: dict) -> dict:
+    workspace_id = _ws_id(args)
+    query = str(args.get("query", "")).strip()
+    kind = str(args.get("kind", "") or "").strip()
+    top_k = max(1, min(int(args.get("top_k", 20) or 20), 200))
+    ws = await asyncio.to_thread(get_workspace, workspace_id)
+    if ws is None:
+        return _missing(workspace_id)
+    with ws.lock:
+        symbols = ws.symbols.find(query, kind=kind, limit=top_k)
+    text = "\n".join(f"{s['path']}:{s['line']} {s['kind']} {s['qualname']}" for s in symbols)
+    return _content(text or "<no symbols>", ok=True, workspace_id=workspace_id, symbols=symbols)
+
+
+def _read_range(ws: Workspace, path: str, start: int, end: int) -> list[str]:
+    with ws.lock:
+        return ws.table(path).read_lines(start, end)
+
+
+def _replace_range(ws: Workspace, path: str, start: int, end: int, replacement: str) -> None:
+    with ws.lock:
+        ws.replace_lines(path, start, end, replacement)
+
+
 async def ws_read_range(args: dict) -> dict:
-    workspace_id = str(args.get("workspace_id", "")).strip() or "default"
+    workspace_id = _ws_id(args)
     path = str(args.get("path", "")).strip()
-    start = max(1, int(args.get("start_line", 1) or 1))
-    end = max(start, int(args.get("end_line", start) or start))
-    ws = _get_ws(workspace_id)
-    if path not in ws:
+    start, end = _line_range(args)
+    ws = await asyncio.to_thread(get_workspace, workspace_id)
+    if ws is None or path not in ws.files:
         return _content("Path not found", ok=False, workspace_id=workspace_id, path=path)
-    lines = ws[path].splitlines()
-    chunk = lines[start - 1 : end]
+    chunk = await asyncio.to_thread(_read_range, ws, path, start, end)
     text = "\n".join(f"{idx}: {line}" for idx, line in enumerate(chunk, start=start))
     return _content(text or "<empty range>", ok=True, workspace_id=workspace_id, path=path, start_line=start, end_line=end)
 
 
 async def ws_replace_range(args: dict) -> dict:
-    workspace_id = str(args.get("workspace_id", "")).strip() or "default"
+    workspace_id = _ws_id(args)
     path = str(args.get("path", "")).strip()
-    start = max(1, int(args.get("start_line", 1) or 1))
-    end = max(start, int(args.get("end_line", start) or start))
+    start, end = _line_range(args)
     replacement = str(args.get("replacement", ""))
-    ws = _get_ws(workspace_id)
-    if path not in ws:
+    ws = await asyncio.to_thread(get_workspace, workspace_id)
+    if ws is None or path not in ws.files:
         return _content("Path not found", ok=False, workspace_id=workspace_id, path=path)
-
-    lines = ws[path].splitlines()
-    prefix = lines[: start - 1]
-    suffix = lines[end:]
-    ws[path] = "\n".join(prefix + replacement.splitlines() + suffix)
+    await asyncio.to_thread(_replace_range, ws, path, start, end, replacement)
     return _content("Range replaced", ok=True, workspace_id=workspace_id, path=path)
 
 
 async def ws_tree(args: dict) -> dict:
-    workspace_id = str(args.get("workspace_id", "")).strip() or "default"
-    ws = _get_ws(workspace_id)
-    paths = sorted(ws.keys())
+    workspace_id = _ws_id(args)
+    ws = await asyncio.to_thread(get_workspace, workspace_id)
+    paths = tree(ws, str(args.get("prefix", "") or "")) if ws is not None else []
     return _content("\n".join(paths) if paths else "<empty workspace>", ok=True, workspace_id=workspace_id, paths=paths)
 
 
 def register_tools() -> list[ToolDef]:
     return [
-        ToolDef("hp.ws.open_archive", "Load workspace files", {"type": "object", "properties": {"workspace_id": {"type": "string"}, "files": {"type": "object"}}}, open_archive),
-        ToolDef("hp.ws.search", "Search files in workspace", {"type": "object", "properties": {"workspace_id": {"type": "string"}, "query": {"type": "string"}, "top_k": {"type": "integer"}}, "required": ["query"]}, ws_search),
+        ToolDef("hp.ws.open_archive", "Load a zip archive or inline files into a workspace", {"type": "object", "properties": {"workspace_id": {"type": "string"}, "files": {"type": "object"}, "archive_path": {"type": "string"}, "archive_base64": {"type": "string"}}}, open_archive),
+        ToolDef("hp.ws.search", "Search files in workspace", {"type": "object", "properties": {"workspace_id": {"type": "string"}, "query": {"type": "string"}, "top_k": {"type": "integer"}, "regex": {"type": "boolean"}, "case_sensitive": {"type": "boolean"}}, "required": ["query"]}, ws_search),
+        ToolDef("hp.ws.symbols", "Find Python/TS definitions by name", {"type": "object", "properties": {"workspace_id": {"type": "string"}, "query": {"type": "string"}, "kind": {"type": "string"}, "top_k": {"type": "integer"}}}, ws_symbols),
         ToolDef("hp.ws.read_range", "Read line range from workspace file", {"type": "object", "properties": {"workspace_id": {"type": "string"}, "path": {"type": "string"}, "start_line": {"type": "integer"}, "end_line": {"type": "integer"}}, "required": ["path"]}, ws_read_range),
         ToolDef("hp.ws.replace_range", "Replace line range in workspace file", {"type": "object", "properties": {"workspace_id": {"type": "string"}, "path": {"type": "string"}, "start_line": {"type": "integer"}, "end_line": {"type": "integer"}, "replacement": {"type": "string"}}, "required": ["path", "replacement"]}, ws_replace_range),
-        ToolDef("hp.ws.tree", "List workspace files", {"type": "object", "properties": {"workspace_id": {"type": "string"}}}, ws_tree),
+        ToolDef("hp.ws.tree", "List workspace files", {"type": "object", "properties": {"workspace_id": {"type": "string"}, "prefix": {"type": "string"}}}, ws_tree),
     ]
 
 
@@ -1,3 +1,51 @@
+"""Runtime settings for the archive workspace server.
+
+Values are read from the environment on use, so tests and operators can
+change them without re-importing the server.
+"""
+
 from __future__ import annotations
 
-# Configuration settings placeholder.
+import os
+from pathlib import Path
+
+MB = 1024 * 1024
+
+# Below this many files indexing runs in-process; a pool is not worth it.
+PARALLEL_MIN_FILES = 64
+
+# Edits are journaled; after this many the edited files are rewritten to
+# the overlay and re-indexed.
+EDIT_LOG_COMPACT = 200
+
+
+def data_dir() -> Path:
+    """Root for persisted workspaces (ARCHIVE_WS_DATA_DIR)."""
+    raw = os.getenv("ARCHIVE_WS_DATA_DIR", "").strip()
+    return Path(raw) if raw else Path.home() / ".homepilot" / "archive_workspace"
+
+
+def import_roots() -> list[Path]:
+    """Directories ``archive_path`` may point into (ARCHIVE_WS_IMPORT_ROOTS)."""
+    raw = os.getenv("ARCHIVE_WS_IMPORT_ROOTS", "").strip()
+    if not raw:
+        return [data_dir() / "imports"]
+    return [Path(p).expanduser() for p in raw.split(",") if p.strip()]
+
+
+def max_file_bytes() -> int:
+    """Archive members larger than this are listed but not indexed."""
+    return int(float(os.getenv("ARCHIVE_WS_MAX_FILE_MB", "4")) * MB)
+
+
+def text_cache_bytes() -> int:
+    """Budget for decoded file text kept in memory per workspace."""
+    return int(float(os.getenv("ARCHIVE_WS_TEXT_CACHE_MB", "32")) * MB)
+
+
+def index_workers() -> int:
+    """Processes used to index an archive; 0 indexes in-process."""
+    raw = os.getenv("ARCHIVE_WS_INDEX_WORKERS", "").strip()
+    if raw:
+        return max(0, int(raw))
+    return min(4, os.cpu_count() or 1)
@@ -1,5 +1,83 @@
+"""Create workspaces from zip archives or inline file maps."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import base64
+import binascii
+import shutil
+from pathlib import Path
+from typing import Dict
+
+from agentic.integrations.mcp.archive_workspace import config
+from agentic.integrations.mcp.archive_workspace.domain.symbols import analyse_archive
+from agentic.integrations.mcp.archive_workspace.infra.file_index import SRC_ZIP
+from agentic.integrations.mcp.archive_workspace.infra.workspace_store import (
+    Workspace,
+    fresh_workspace,
+    get_workspace,
+)
+from agentic.integrations.mcp.archive_workspace.infra.zip_reader import safe_member_path
+
+_B64_CHUNK = 4 * 1024 * 1024  # multiple of 4, so chunks decode independently
+
+
+def resolve_import_path(raw: str) -> Path:
+    """Resolve ``archive_path``; it must live under an allowed import root."""
+    path = Path(raw).expanduser().resolve()
+    for root in config.import_roots():
+        if path.is_relative_to(root.resolve()):
+            if not path.is_file():
+                raise FileNotFoundError(f"archive not found: {raw}")
+            return path
+    raise PermissionError("archive_path is outside ARCHIVE_WS_IMPORT_ROOTS")
+
+
+def _write_base64(data: str, dest: Path) -> None:
+    if any(c.isspace() for c in data[:1024]):
+        data = "".join(data.split())
+    try:
+        with open(dest, "wb") as fh:
+            for i in range(0, len(data), _B64_CHUNK):
+                fh.write(base64.b64decode(data[i:i + _B64_CHUNK], validate=True))
+    except binascii.Error as exc:
+        raise ValueError(f"archive_base64 is not valid base64: {exc}") from exc
+
+
+def open_zip(workspace_id: str, *, archive_path: str = "", archive_base64: str = "") -> Workspace:
+    """Replace the workspace with the archive's contents and index it."""
+    src_path = resolve_import_path(archive_path) if archive_path else None
+    ws = fresh_workspace(workspace_id)
+    with ws.lock:
+        if src_path is not None:
+            shutil.copyfile(src_path, ws.zip_path)
+        else:
+            _write_base64(archive_base64, ws.zip_path)
+        src = ws.attach_zip()
+
+        names = list(src.names())
+        results = analyse_archive(
+            src, names, workers=config.index_workers(), max_bytes=config.max_file_bytes()
+        )
+        for name, analysis in results:
+            entry = ws.files.put(name, SRC_ZIP, src.size(name), indexed=analysis is not None)
+            if analysis is not None:
+                ws.trigrams.add(entry.id, analysis["trigrams"])
+                ws.symbols.set(name, analysis["symbols"])
+        ws.save()
+    return ws
+
+
+def open_files(workspace_id: str, files: Dict[str, object]) -> tuple[Workspace, int]:
+    """Merge an inline ``path -> content`` map into the workspace."""
+    ws = get_workspace(workspace_id, create=True)
+    assert ws is not None
+    loaded = 0
+    with ws.lock:
+        for raw_path, content in files.items():
+            path = safe_member_path(str(raw_path))
+            if path is None:
+                continue
+            ws.write_file(path, str(content))
+            loaded += 1
+        ws.save()
+    return ws, loaded
@@ -1,5 +1,123 @@
+"""Piece-table text buffer for cheap line-range edits.
+
+A file is kept as its original text plus a list of pieces pointing into
+immutable buffers (the original, and one buffer per inserted replacement).
+Replacing a range splits at most two pieces and swaps the ones in between;
+nothing is copied or re-split. Line lookups use each buffer's newline
+positions (built once, on first use) and a binary search, so reading or
+editing line 50 000 does not walk the text before it.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+Piece = Tuple[int, int, int, int]  # (buffer index, start, length, newline count)
+
+
+class PieceTable:
+    def __init__(self, text: str = ""):
+        self._bufs: List[str] = [text]
+        self._nl: Dict[int, array] = {}
+        self._pieces: List[Piece] = [(0, 0, len(text), text.count("\n"))] if text else []
+        self._len = len(text)
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def piece_count(self) -> int:
+        return len(self._pieces)
+
+    def _newlines(self, b: int) -> array:
+        nl = self._nl.get(b)
+        if nl is None:
+            buf = self._bufs[b]
+            nl = array("q")
+            i = buf.find("\n")
+            while i >= 0:
+                nl.append(i)
+                i = buf.find("\n", i + 1)
+            self._nl[b] = nl
+        return nl
+
+    def _count_nl(self, b: int, lo: int, hi: int) -> int:
+        nl = self._newlines(b)
+        return bisect_left(nl, hi) - bisect_left(nl, lo)
+
+    def _split(self, offset: int) -> int:
+        """Index of the piece that starts at ``offset``, splitting one if needed."""
+        pos = 0
+        for i, (b, s, n, nl) in enumerate(self._pieces):
+            if offset == pos:
+                return i
+            if offset < pos + n:
+                k = offset - pos
+                left = self._count_nl(b, s, s + k)
+                self._pieces[i:i + 1] = [(b, s, k, left), (b, s + k, n - k, nl - left)]
+                return i + 1
+            pos += n
+        return len(self._pieces)
+
+    def offset_of_line(self, line: int) -> int:
+        """Offset where 1-based ``line`` starts (``len(self)`` past the end)."""
+        need = line - 1
+        if need <= 0:
+            return 0
+        pos = 0
+        for b, s, n, nl in self._pieces:
+            if need > nl:
+                need -= nl
+                pos += n
+                continue
+            positions = self._newlines(b)
+            idx = positions[bisect_left(positions, s) + need - 1]
+            return pos + (idx - s) + 1
+        return self._len
+
+    def slice(self, lo: int, hi: int) -> str:
+        out: List[str] = []
+        pos = 0
+        for b, s, n, _ in self._pieces:
+            if pos >= hi:
+                break
+            if pos + n > lo:
+                a = max(lo - pos, 0)
+                z = min(hi - pos, n)
+                out.append(self._bufs[b][s + a:s + z])
+            pos += n
+        return "".join(out)
+
+    def text(self) -> str:
+        return "".join(self._bufs[b][s:s + n] for b, s, n, _ in self._pieces)
+
+    def replace(self, lo: int, hi: int, text: str) -> None:
+        lo = max(0, min(lo, self._len))
+        hi = max(lo, min(hi, self._len))
+        i = self._split(lo)
+        j = self._split(hi)
+        new: List[Piece] = []
+        if text:
+            self._bufs.append(text)
+            new.append((len(self._bufs) - 1, 0, len(text), text.count("\n")))
+        self._pieces[i:j] = new
+        self._len += len(text) - (hi - lo)
+
+    def replace_lines(self, start: int, end: int, replacement: str) -> None:
+        """Replace 1-based lines ``start..end`` (inclusive) with ``replacement``.
+
+        Line endings are preserved: a replacement for complete lines gets a
+        trailing newline, and text appended past the end starts on a new line.
+        """
+        lo = self.offset_of_line(start)
+        hi = self.offset_of_line(end + 1)
+        if replacement and hi > lo and not replacement.endswith("\n") and self.slice(hi - 1, hi) == "\n":
+            replacement += "\n"
+        if replacement and lo == self._len and lo and self.slice(lo - 1, lo) != "\n":
+            replacement = "\n" + replacement
+        self.replace(lo, hi, replacement)
+
+    def read_lines(self, start: int, end: int) -> List[str]:
+        return self.slice(self.offset_of_line(start), self.offset_of_line(end + 1)).splitlines()
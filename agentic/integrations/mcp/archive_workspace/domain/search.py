@@ -1,5 +1,46 @@
+"""Workspace text search: trigram-narrowed, then verified per file."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+from typing import List
+
+from agentic.integrations.mcp.archive_workspace.infra.text_search import (
+    compile_query,
+    first_match,
+    required_literals,
+)
+from agentic.integrations.mcp.archive_workspace.infra.workspace_store import Workspace
+
+PREVIEW_CHARS = 180
+
+
+def search(
+    ws: Workspace,
+    query: str,
+    *,
+    regex: bool = False,
+    case_sensitive: bool = False,
+    top_k: int = 20,
+) -> List[dict]:
+    """One match per file, path order: the first matching line, or the path itself."""
+    pattern = compile_query(query, regex=regex, case_sensitive=case_sensitive)
+    with ws.lock:
+        live = ws.live_ids()
+        ids = ws.trigrams.candidates(required_literals(query, regex=regex))
+        content_paths = set(live.values()) if ids is None else {live[i] for i in ids if i in live}
+        content_paths |= ws.dirty
+        path_hits = {p for p in ws.paths() if pattern.search(p)}
+
+        matches: List[dict] = []
+        for path in sorted(content_paths | path_hits):
+            hit = first_match(ws.read_text(path), pattern) if path in content_paths else None
+            if hit is not None:
+                line_no, line = hit
+                matches.append({"path": path, "line": line_no, "preview": line.strip()[:PREVIEW_CHARS]})
+            elif path in path_hits:
+                entry = ws.files.get(path)
+                preview = ws.read_text(path)[:PREVIEW_CHARS] if entry and entry.indexed else ""
+                matches.append({"path": path, "line": None, "preview": preview})
+            if len(matches) >= top_k:
+                break
+    return matches
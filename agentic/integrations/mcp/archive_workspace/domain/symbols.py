@@ -1,5 +1,118 @@
+"""Per-file analysis (trigrams + symbols) and the workspace symbol index.
+
+Analysing an archive is CPU bound (trigram sets, ``ast.parse``), so large
+archives fan out over a spawn-based process pool. Workers are given only
+the archive path and member names, read the members themselves through
+their own mmap, and send back trigram lists and symbol tables; file
+contents never cross the process boundary.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from agentic.integrations.mcp.archive_workspace.config import PARALLEL_MIN_FILES
+from agentic.integrations.mcp.archive_workspace.infra.parser_generic import parse_symbols
+from agentic.integrations.mcp.archive_workspace.infra.text_search import trigrams_of
+from agentic.integrations.mcp.archive_workspace.infra.zip_reader import (
+    ZipSource,
+    decode_text,
+    looks_binary,
+    worker_source,
+)
+
+Analysis = Optional[dict]  # None: binary or too large to index
+
+
+def analyse_text(path: str, text: str) -> dict:
+    return {"trigrams": trigrams_of(text), "symbols": parse_symbols(path, text)}
+
+
+def _analyse_member(src: ZipSource, name: str, max_bytes: int) -> Tuple[str, Analysis]:
+    if src.size(name) > max_bytes:
+        return name, None
+    data = src.read_bytes(name)
+    if looks_binary(data):
+        return name, None
+    return name, analyse_text(name, decode_text(data))
+
+
+def _worker(job: Tuple[str, str, int]) -> Tuple[str, Analysis]:
+    zip_path, name, max_bytes = job
+    return _analyse_member(worker_source(zip_path), name, max_bytes)
+
+
+def analyse_archive(
+    src: ZipSource,
+    names: Sequence[str],
+    *,
+    workers: int,
+    max_bytes: int,
+) -> Iterator[Tuple[str, Analysis]]:
+    """Yield (member, analysis) for each name, in a pool when it pays off."""
+    if workers <= 0 or len(names) < PARALLEL_MIN_FILES:
+        for name in names:
+            yield _analyse_member(src, name, max_bytes)
+        return
+
+    jobs = [(str(src.path), name, max_bytes) for name in names]
+    chunk = max(1, len(jobs) // (workers * 8))
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        yield from pool.map(_worker, jobs, chunksize=chunk)
+
+
+class SymbolIndex:
+    def __init__(self) -> None:
+        self.by_path: Dict[str, List[dict]] = {}
+        self._by_name: Optional[Dict[str, List[Tuple[str, dict]]]] = None
+
+    def set(self, path: str, symbols: List[dict]) -> None:
+        if symbols:
+            self.by_path[path] = symbols
+        else:
+            self.by_path.pop(path, None)
+        self._by_name = None
+
+    def drop(self, path: str) -> None:
+        self.set(path, [])
+
+    def find(self, query: str, *, kind: str = "", limit: int = 50) -> List[dict]:
+        """Exact name matches first, then prefix, then substring."""
+        if self._by_name is None:
+            by_name: Dict[str, List[Tuple[str, dict]]] = {}
+            for path, symbols in self.by_path.items():
+                for sym in symbols:
+                    by_name.setdefault(sym["name"].lower(), []).append((path, sym))
+            self._by_name = by_name
+
+        q = query.strip().lower()
+        ranked: List[Tuple[int, str, dict]] = []
+        for name, hits in self._by_name.items():
+            if name == q:
+                rank = 0
+            elif name.startswith(q):
+                rank = 1
+            elif q in name:
+                rank = 2
+            else:
+                continue
+            ranked.extend((rank, path, sym) for path, sym in hits if not kind or sym["kind"] == kind)
+        ranked.sort(key=lambda r: (r[0], r[1], r[2]["line"]))
+        return [{"path": path, **sym} for _, path, sym in ranked[:limit]]
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.by_path), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SymbolIndex":
+        idx = cls()
+        idx.by_path = json.loads(path.read_text(encoding="utf-8"))
+        return idx
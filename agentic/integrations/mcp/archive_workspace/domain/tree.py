@@ -1,5 +1,12 @@
+"""Workspace file listing."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+from typing import List
+
+from agentic.integrations.mcp.archive_workspace.infra.workspace_store import Workspace
+
+
+def tree(ws: Workspace, prefix: str = "") -> List[str]:
+    prefix = prefix.strip().lstrip("/")
+    return sorted(p for p in ws.paths() if p.startswith(prefix))
@@ -1,5 +1,73 @@
+"""Workspace manifest: which files exist, where their bytes live, their ids.
+
+Each indexed file version gets a fresh integer id. Trigram postings refer
+to ids, so re-indexing an edited file just retires its old id instead of
+rewriting every posting list that mentioned it.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+SRC_ZIP = "zip"
+SRC_OVERLAY = "overlay"
+
+
+@dataclass
+class FileEntry:
+    id: int
+    src: str  # SRC_ZIP or SRC_OVERLAY
+    size: int
+    indexed: bool = True  # False for binary / oversized members
+
+
+class FileIndex:
+    def __init__(self) -> None:
+        self.files: Dict[str, FileEntry] = {}
+        self.next_id = 1
+        self.retired = 0  # ids dropped since postings were last pruned
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.files
+
+    def get(self, path: str) -> Optional[FileEntry]:
+        return self.files.get(path)
+
+    def paths(self) -> Iterator[str]:
+        return iter(self.files)
+
+    def put(self, path: str, src: str, size: int, indexed: bool = True) -> FileEntry:
+        if path in self.files:
+            self.retired += 1
+        entry = FileEntry(self.next_id, src, size, indexed)
+        self.next_id += 1
+        self.files[path] = entry
+        return entry
+
+    def live_ids(self) -> Dict[int, str]:
+        return {e.id: p for p, e in self.files.items() if e.indexed}
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "next_id": self.next_id,
+            "retired": self.retired,
+            "files": {p: asdict(e) for p, e in self.files.items()},
+        }), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "FileIndex":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        idx = cls()
+        idx.next_id = int(data.get("next_id", 1))
+        idx.retired = int(data.get("retired", 0))
+        idx.files = {p: FileEntry(**e) for p, e in (data.get("files") or {}).items()}
+        return idx
@@ -1,5 +1,25 @@
+"""Pick a symbol parser by file extension."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import posixpath
+from typing import List
+
+from agentic.integrations.mcp.archive_workspace.infra.parser_python import parse_python
+from agentic.integrations.mcp.archive_workspace.infra.parser_ts import parse_ts
+
+_PARSERS = {
+    ".py": parse_python,
+    ".pyi": parse_python,
+    ".ts": parse_ts,
+    ".tsx": parse_ts,
+    ".js": parse_ts,
+    ".jsx": parse_ts,
+    ".mjs": parse_ts,
+    ".cjs": parse_ts,
+}
+
+
+def parse_symbols(path: str, text: str) -> List[dict]:
+    parser = _PARSERS.get(posixpath.splitext(path)[1].lower())
+    return parser(text) if parser else []
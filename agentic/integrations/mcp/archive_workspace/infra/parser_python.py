@@ -1,5 +1,54 @@
+"""Python symbol extraction via ``ast`` (regex fallback for broken files)."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import ast
+import re
+from typing import List
+
+_DEF_RE = re.compile(r"^(\s*)(?:async\s+)?(def|class)\s+([A-Za-z_]\w*)", re.MULTILINE)
+
+
+def parse_python(text: str) -> List[dict]:
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return _parse_fallback(text)
+
+    out: List[dict] = []
+
+    def visit(node: ast.AST, parent: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                kind = "class" if isinstance(child, ast.ClassDef) else ("method" if parent else "function")
+                qual = f"{parent}.{child.name}" if parent else child.name
+                out.append({
+                    "name": child.name,
+                    "qualname": qual,
+                    "kind": kind,
+                    "line": child.lineno,
+                    "end_line": getattr(child, "end_lineno", child.lineno),
+                })
+                visit(child, qual)
+            elif isinstance(child, ast.Assign) and not parent:
+                for target in child.targets:
+                    if isinstance(target, ast.Name) and target.id.isupper():
+                        out.append({
+                            "name": target.id,
+                            "qualname": target.id,
+                            "kind": "constant",
+                            "line": child.lineno,
+                            "end_line": getattr(child, "end_lineno", child.lineno),
+                        })
+
+    visit(tree, "")
+    return out
+
+
+def _parse_fallback(text: str) -> List[dict]:
+    out: List[dict] = []
+    for m in _DEF_RE.finditer(text):
+        line = text.count("\n", 0, m.start()) + 1
+        kind = "class" if m.group(2) == "class" else ("method" if m.group(1) else "function")
+        out.append({"name": m.group(3), "qualname": m.group(3), "kind": kind, "line": line, "end_line": line})
+    return out
@@ -1,5 +1,34 @@
+"""TypeScript / JavaScript symbol extraction.
+
+Declaration-level regexes rather than a real parser: good enough to find
+where a name is defined, and dependency free.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import re
+from typing import List
+
+_DECL_RE = re.compile(
+    r"^[ \t]*(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?"
+    r"(?P<kind>function\*?|class|interface|type|enum|const|let|var)\s+(?P<name>[A-Za-z_$][\w$]*)",
+    re.MULTILINE,
+)
+_KIND = {
+    "function": "function", "function*": "function", "class": "class",
+    "interface": "interface", "type": "type", "enum": "enum",
+    "const": "variable", "let": "variable", "var": "variable",
+}
+
+
+def parse_ts(text: str) -> List[dict]:
+    out: List[dict] = []
+    for m in _DECL_RE.finditer(text):
+        line = text.count("\n", 0, m.start()) + 1
+        kind = _KIND[m.group("kind")]
+        if kind == "variable":
+            rest = text[m.end():text.find("\n", m.end())]
+            if "=>" in rest or "function" in rest:
+                kind = "function"
+        out.append({"name": m.group("name"), "qualname": m.group("name"), "kind": kind, "line": line, "end_line": line})
+    return out
@@ -1,5 +1,83 @@
+"""Trigram index for substring and regex search.
+
+Every indexed file contributes the set of lower-cased 3-character slices of
+its text; postings map each trigram to the ids of files containing it, kept
+as compact ``array('I')`` lists. A query is narrowed to the files holding
+all trigrams of its required literals, and only those files are read and
+matched line by line. The trigram and literal helpers are shared with
+local_projects (``_common/trigrams.py``); queries they cannot narrow fall
+back to a scan.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import os
+import pickle
+import re
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from agentic.integrations.mcp._common.trigrams import candidates
+from agentic.integrations.mcp._common.trigrams import required_literals, trigrams_of  # noqa: F401
+
+_FORMAT = 1
+
+
+class TrigramIndex:
+    def __init__(self) -> None:
+        self.postings: Dict[str, array] = {}
+
+    def add(self, file_id: int, trigrams: Iterable[str]) -> None:
+        postings = self.postings
+        for tri in trigrams:
+            lst = postings.get(tri)
+            if lst is None:
+                lst = postings[tri] = array("I")
+            lst.append(file_id)
+
+    def candidates(self, literals: List[str]) -> Optional[Set[int]]:
+        """File ids that may match, or None when the index cannot narrow."""
+        return candidates(self.postings, literals)
+
+    def prune(self, live_ids: Iterable[int]) -> None:
+        """Drop postings of retired file ids."""
+        live = set(live_ids)
+        pruned: Dict[str, array] = {}
+        for tri, lst in self.postings.items():
+            kept = array("I", (i for i in lst if i in live))
+            if kept:
+                pruned[tri] = kept
+        self.postings = pruned
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump({"format": _FORMAT, "postings": self.postings}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "TrigramIndex":
+        with open(path, "rb") as fh:
+            data = pickle.load(fh)
+        if data.get("format") != _FORMAT:
+            raise ValueError("unsupported trigram index format")
+        idx = cls()
+        idx.postings = data["postings"]
+        return idx
+
+
+def compile_query(query: str, *, regex: bool, case_sensitive: bool) -> re.Pattern:
+    flags = 0 if case_sensitive else re.IGNORECASE
+    return re.compile(query if regex else re.escape(query), flags)
+
+
+def first_match(text: str, pattern: re.Pattern) -> Optional[tuple[int, str]]:
+    """(1-based line, line text) of the first match in ``text``."""
+    m = pattern.search(text)
+    if not m:
+        return None
+    line_no = text.count("\n", 0, m.start()) + 1
+    lo = text.rfind("\n", 0, m.start()) + 1
+    hi = text.find("\n", m.start())
+    return line_no, text[lo:hi if hi >= 0 else len(text)]
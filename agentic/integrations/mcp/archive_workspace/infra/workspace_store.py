@@ -1,5 +1,277 @@
+"""On-disk workspaces and the in-process registry.
+
+Layout under ``config.data_dir()/<workspace>/``::
+
+    source.zip      the uploaded archive (read lazily through an mmap)
+    overlay/        files added inline or rewritten after edits
+    manifest.json   FileIndex: path -> id, source, size
+    trigrams.pkl    TrigramIndex postings
+    symbols.json    SymbolIndex
+    edits.jsonl     journal of range edits since the last compaction
+
+A restart reloads the manifest and indexes and replays the journal onto
+piece tables, so nothing is re-extracted or re-indexed. Edited files are
+re-indexed when the journal is compacted into the overlay; until then they
+are always searched directly.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from agentic.integrations.mcp.archive_workspace import config
+from agentic.integrations.mcp.archive_workspace.domain.replace import PieceTable
+from agentic.integrations.mcp.archive_workspace.domain.symbols import SymbolIndex, analyse_text
+from agentic.integrations.mcp.archive_workspace.infra.file_index import SRC_OVERLAY, FileIndex
+from agentic.integrations.mcp.archive_workspace.infra.text_search import TrigramIndex
+from agentic.integrations.mcp.archive_workspace.infra.zip_reader import ZipSource, looks_binary
+
+_SAFE_ID = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9._-]{0,63}")
+
+
+class Workspace:
+    def __init__(self, workspace_id: str, root: Path):
+        self.id = workspace_id
+        self.root = root
+        self.files = FileIndex()
+        self.trigrams = TrigramIndex()
+        self.symbols = SymbolIndex()
+        self.lock = threading.RLock()
+        self._zip: Optional[ZipSource] = None
+        self._tables: "OrderedDict[str, PieceTable]" = OrderedDict()
+        self._table_bytes = 0
+        self._dirty: Set[str] = set()
+        self._journal_len = 0
+        self._live: Optional[Dict[int, str]] = None
+
+    # ── paths ──────────────────────────────────────────────────────────
+    @property
+    def zip_path(self) -> Path:
+        return self.root / "source.zip"
+
+    @property
+    def overlay_dir(self) -> Path:
+        return self.root / "overlay"
+
+    @property
+    def journal_path(self) -> Path:
+        return self.root / "edits.jsonl"
+
+    # ── lifecycle ──────────────────────────────────────────────────────
+    @classmethod
+    def load(cls, workspace_id: str, root: Path) -> "Workspace":
+        ws = cls(workspace_id, root)
+        ws.files = FileIndex.load(root / "manifest.json")
+        if (root / "trigrams.pkl").exists():
+            ws.trigrams = TrigramIndex.load(root / "trigrams.pkl")
+        if (root / "symbols.json").exists():
+            ws.symbols = SymbolIndex.load(root / "symbols.json")
+        if ws.zip_path.exists():
+            ws._zip = ZipSource(ws.zip_path)
+        ws._replay_journal()
+        return ws
+
+    def attach_zip(self) -> ZipSource:
+        self._zip = ZipSource(self.zip_path)
+        return self._zip
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.files.save(self.root / "manifest.json")
+        self.trigrams.save(self.root / "trigrams.pkl")
+        self.symbols.save(self.root / "symbols.json")
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    # ── reads ──────────────────────────────────────────────────────────
+    def paths(self) -> Iterator[str]:
+        return self.files.paths()
+
+    def live_ids(self) -> Dict[int, str]:
+        if self._live is None:
+            self._live = self.files.live_ids()
+        return self._live
+
+    @property
+    def dirty(self) -> Set[str]:
+        return self._dirty
+
+    def _load_text(self, path: str) -> str:
+        entry = self.files.get(path)
+        if entry is None:
+            raise KeyError(path)
+        if entry.src == SRC_OVERLAY:
+            return (self.overlay_dir / path).read_text(encoding="utf-8", errors="replace")
+        assert self._zip is not None
+        return self._zip.read_text(path)
+
+    def table(self, path: str) -> PieceTable:
+        """Piece table for ``path``; clean ones are cached within a byte budget."""
+        table = self._tables.get(path)
+        if table is not None:
+            self._tables.move_to_end(path)
+            return table
+        table = PieceTable(self._load_text(path))
+        self._tables[path] = table
+        self._table_bytes += len(table)
+        budget = config.text_cache_bytes()
+        for old in list(self._tables):
+            if self._table_bytes <= budget or old == path:
+                break
+            if old not in self._dirty:
+                self._table_bytes -= len(self._tables.pop(old))
+        return table
+
+    def read_text(self, path: str) -> str:
+        return self.table(path).text()
+
+    # ── writes ─────────────────────────────────────────────────────────
+    def _forget(self, path: str) -> None:
+        table = self._tables.pop(path, None)
+        if table is not None:
+            self._table_bytes -= len(table)
+        self._dirty.discard(path)
+
+    def _index(self, path: str, text: str, src: str) -> None:
+        data = text.encode("utf-8")
+        indexed = len(data) <= config.max_file_bytes() and not looks_binary(data)
+        entry = self.files.put(path, src, len(data), indexed=indexed)
+        self._live = None
+        if indexed:
+            analysis = analyse_text(path, text)
+            self.trigrams.add(entry.id, analysis["trigrams"])
+            self.symbols.set(path, analysis["symbols"])
+        else:
+            self.symbols.drop(path)
+
+    def write_file(self, path: str, text: str) -> None:
+        """Store ``text`` in the overlay and index it (inline uploads)."""
+        target = self.overlay_dir / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(text, encoding="utf-8")
+        if path in self._dirty:
+            # Journaled edits were made against the old text; replaying
+            # them after a restart would apply them to the new one.
+            self._drop_journal(path)
+        self._forget(path)
+        self._index(path, text, SRC_OVERLAY)
+
+    def _drop_journal(self, path: str) -> None:
+        """Rewrite the journal without ``path``'s entries."""
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, encoding="utf-8") as fh:
+            kept = [line for line in fh if line.strip() and json.loads(line)["path"] != path]
+        tmp = self.journal_path.with_name(self.journal_path.name + ".tmp")
+        tmp.write_text("".join(kept), encoding="utf-8")
+        os.replace(tmp, self.journal_path)
+        self._journal_len = len(kept)
+
+    def replace_lines(self, path: str, start: int, end: int, replacement: str) -> None:
+        self.table(path).replace_lines(start, end, replacement)
+        self._dirty.add(path)
+        with open(self.journal_path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps({"path": path, "start": start, "end": end, "text": replacement}) + "\n")
+        self._journal_len += 1
+        if self._journal_len >= config.EDIT_LOG_COMPACT:
+            self.compact()
+
+    def _replay_journal(self) -> None:
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                op = json.loads(line)
+                if op["path"] in self.files:
+                    self.table(op["path"]).replace_lines(op["start"], op["end"], op["text"])
+                    self._dirty.add(op["path"])
+                    self._journal_len += 1
+
+    def compact(self) -> None:
+        """Write edited files to the overlay, re-index them, clear the journal."""
+        for path in sorted(self._dirty):
+            text = self._tables[path].text()
+            target = self.overlay_dir / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(target.name + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, target)
+            self._index(path, text, SRC_OVERLAY)
+            self._tables[path] = PieceTable(text)
+        self._dirty.clear()
+        self._table_bytes = sum(len(t) for t in self._tables.values())
+        if self.files.retired > len(self.files) // 4:
+            self.trigrams.prune(self.live_ids())
+            self.files.retired = 0
+        self.save()
+        self.journal_path.unlink(missing_ok=True)
+        self._journal_len = 0
+
+
+# ── registry ───────────────────────────────────────────────────────────
+
+_workspaces: Dict[str, Workspace] = {}
+_registry_lock = threading.Lock()
+
+
+def workspace_dir(workspace_id: str) -> Path:
+    name = workspace_id if _SAFE_ID.fullmatch(workspace_id) else (
+        "ws-" + hashlib.sha1(workspace_id.encode("utf-8")).hexdigest()[:16]
+    )
+    return config.data_dir() / name
+
+
+def get_workspace(workspace_id: str, *, create: bool = False) -> Optional[Workspace]:
+    """Loaded workspace, reading it from disk on first use after a restart."""
+    with _registry_lock:
+        ws = _workspaces.get(workspace_id)
+        if ws is not None:
+            return ws
+        root = workspace_dir(workspace_id)
+        if (root / "manifest.json").exists():
+            ws = Workspace.load(workspace_id, root)
+        elif create:
+            root.mkdir(parents=True, exist_ok=True)
+            ws = Workspace(workspace_id, root)
+        else:
+            return None
+        _workspaces[workspace_id] = ws
+        return ws
+
+
+def fresh_workspace(workspace_id: str) -> Workspace:
+    """Drop any existing workspace with this id and start an empty one."""
+    with _registry_lock:
+        old = _workspaces.pop(workspace_id, None)
+        if old is not None:
+            old.close()
+        root = workspace_dir(workspace_id)
+        shutil.rmtree(root, ignore_errors=True)
+        root.mkdir(parents=True, exist_ok=True)
+        ws = _workspaces[workspace_id] = Workspace(workspace_id, root)
+        return ws
+
+
+def loaded_workspaces() -> List[str]:
+    with _registry_lock:
+        return sorted(_workspaces)
+
+
+def _reset_for_tests() -> None:
+    with _registry_lock:
+        for ws in _workspaces.values():
+            ws.close()
+        _workspaces.clear()
@@ -1,5 +1,120 @@
+"""Lazy, memory-mapped access to workspace zip archives.
+
+The archive is mmap'ed and handed to ``zipfile`` as its file object, so
+opening a 200 MB archive reads only the central directory; member bytes are
+paged in when a member is actually read.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import io
+import mmap
+import posixpath
+import threading
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+_SNIFF_BYTES = 8192
+
+
+def safe_member_path(name: str) -> Optional[str]:
+    """Normalise a member/file path; None for dirs, absolute or escaping paths."""
+    name = name.replace("\\", "/")
+    if not name or name.endswith("/"):
+        return None
+    norm = posixpath.normpath(name)
+    if norm.startswith(("/", "../")) or norm in (".", "..") or ":" in norm.split("/")[0]:
+        return None
+    return norm
+
+
+def looks_binary(sample: bytes) -> bool:
+    return b"\x00" in sample[:_SNIFF_BYTES]
+
+
+def decode_text(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+class _MappedFile(io.RawIOBase):
+    """Seekable file object over an mmap (``mmap`` itself lacks ``seekable``)."""
+
+    def __init__(self, mm: mmap.mmap):
+        self._mm = mm
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self._mm.read(None if size is None or size < 0 else size)
+
+    def readinto(self, buf) -> int:
+        data = self._mm.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._mm.seek(offset, whence)
+        return self._mm.tell()
+
+    def tell(self) -> int:
+        return self._mm.tell()
+
+
+class ZipSource:
+    """Read-only view over one archive; safe to share between threads."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._fh = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+            self._zip = zipfile.ZipFile(_MappedFile(self._mm))
+        except Exception:
+            self._fh.close()
+            raise
+        # ZipFile shares one file position between readers
+        self._lock = threading.Lock()
+        self._members: Dict[str, zipfile.ZipInfo] = {}
+        for info in self._zip.infolist():
+            norm = safe_member_path(info.filename)
+            if norm is not None and not info.is_dir():
+                self._members[norm] = info
+
+    def names(self) -> Iterator[str]:
+        return iter(self._members)
+
+    def size(self, name: str) -> int:
+        return self._members[name].file_size
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._members
+
+    def read_bytes(self, name: str, limit: int = -1) -> bytes:
+        info = self._members[name]
+        with self._lock, self._zip.open(info) as fh:
+            return fh.read(limit)
+
+    def read_text(self, name: str) -> str:
+        return decode_text(self.read_bytes(name))
+
+    def close(self) -> None:
+        self._zip.close()
+        self._mm.close()
+        self._fh.close()
+
+
+# Index worker processes reopen the archive once and keep it for the pool's
+# lifetime instead of shipping file contents across the process boundary.
+_worker_sources: Dict[str, ZipSource] = {}
+
+
+def worker_source(path: str) -> ZipSource:
+    src = _worker_sources.get(path)
+    if src is None:
+        src = _worker_sources[path] = ZipSource(path)
+    return src
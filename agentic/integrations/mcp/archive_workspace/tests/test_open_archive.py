@@ -1,2 +1,108 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import base64
+import io
+import zipfile
+
+import pytest
+
+from agentic.integrations.mcp.archive_workspace import app as server
+from agentic.integrations.mcp.archive_workspace.infra import workspace_store
+
+
+@pytest.fixture()
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_WS_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv("ARCHIVE_WS_IMPORT_ROOTS", str(tmp_path / "imports"))
+    monkeypatch.setenv("ARCHIVE_WS_INDEX_WORKERS", "0")
+    (tmp_path / "imports").mkdir()
+    workspace_store._reset_for_tests()
+    yield tmp_path
+    workspace_store._reset_for_tests()
+
+
+def _zip_bytes(files: dict[str, bytes | str]) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_open_archive_from_path_indexes_members(data_dir):
+    archive = data_dir / "imports" / "repo.zip"
+    archive.write_bytes(_zip_bytes({
+        "pkg/core.py": "class Engine:\n    def start(self):\n        return 1\n",
+        "web/app.ts": "export function renderApp() {}\n",
+        "assets/logo.png": b"\x89PNG\x00\x00binary",
+        "../escape.py": "x = 1\n",
+    }))
+
+    res = await server.open_archive({"workspace_id": "w1", "archive_path": str(archive)})
+    assert res["meta"]["ok"] is True
+    assert res["meta"]["file_count"] == 3
+
+    ws = workspace_store.get_workspace("w1")
+    assert ws is not None
+    assert ws.files.get("assets/logo.png").indexed is False
+    # Nothing is decoded until a file is read.
+    assert ws._table_bytes == 0
+
+    names = [s["qualname"] for s in ws.symbols.find("start")]
+    assert names == ["Engine.start"]
+
+
+@pytest.mark.asyncio
+async def test_open_archive_from_base64(data_dir):
+    payload = base64.b64encode(_zip_bytes({"a.txt": "hello\n"})).decode()
+    res = await server.open_archive({"workspace_id": "b64", "archive_base64": payload})
+    assert res["meta"]["ok"] is True
+    tree = await server.ws_tree({"workspace_id": "b64"})
+    assert tree["meta"]["paths"] == ["a.txt"]
+
+
+@pytest.mark.asyncio
+async def test_archive_path_outside_import_roots_is_rejected(data_dir):
+    outside = data_dir / "elsewhere.zip"
+    outside.write_bytes(_zip_bytes({"a.txt": "x"}))
+    res = await server.open_archive({"workspace_id": "w1", "archive_path": str(outside)})
+    assert res["meta"]["ok"] is False
+    assert workspace_store.get_workspace("w1") is None
+
+
+@pytest.mark.asyncio
+async def test_open_archive_process_pool(data_dir, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_WS_INDEX_WORKERS", "2")
+    files = {f"mod_{i:03d}.py": f"def handler_{i}():\n    return {i}\n" for i in range(80)}
+    archive = data_dir / "imports" / "many.zip"
+    archive.write_bytes(_zip_bytes(files))
+
+    res = await server.open_archive({"workspace_id": "pool", "archive_path": str(archive)})
+    assert res["meta"]["file_count"] == 80
+    found = await server.ws_symbols({"workspace_id": "pool", "query": "handler_42"})
+    assert found["meta"]["symbols"][0]["path"] == "mod_042.py"
+
+
+@pytest.mark.asyncio
+async def test_inline_files_still_supported(data_dir):
+    res = await server.open_archive({"workspace_id": "w1", "files": {"a.py": "print(1)\n", "b.md": "# b\n"}})
+    assert res["meta"]["ok"] is True
+    assert res["meta"]["file_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_workspace_survives_restart_without_reindexing(data_dir, monkeypatch):
+    await server.open_archive({"workspace_id": "w1", "files": {"a.py": "one\ntwo\nthree\n"}})
+    await server.ws_replace_range({"workspace_id": "w1", "path": "a.py", "start_line": 2, "end_line": 2, "replacement": "TWO"})
+
+    workspace_store._reset_for_tests()
+
+    from agentic.integrations.mcp.archive_workspace.infra import text_search
+
+    def _no_reindex(text):
+        raise AssertionError("workspace was re-indexed on load")
+
+    monkeypatch.setattr(text_search, "trigrams_of", _no_reindex)
+    res = await server.ws_read_range({"workspace_id": "w1", "path": "a.py", "start_line": 1, "end_line": 3})
+    assert res["content"][0]["text"] == "1: one\n2: TWO\n3: three"
@@ -1,2 +1,38 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import pytest
+
+from agentic.integrations.mcp.archive_workspace import app as server
+from agentic.integrations.mcp.archive_workspace.domain.replace import PieceTable
+from agentic.integrations.mcp.archive_workspace.infra import workspace_store
+
+
+@pytest.fixture()
+def ws(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_WS_DATA_DIR", str(tmp_path))
+    workspace_store._reset_for_tests()
+    yield "w1"
+    workspace_store._reset_for_tests()
+
+
+def test_piece_table_line_offsets():
+    table = PieceTable("a\nbb\nccc\n")
+    assert table.offset_of_line(1) == 0
+    assert table.offset_of_line(3) == 5
+    assert table.offset_of_line(9) == len(table)
+    assert table.read_lines(2, 3) == ["bb", "ccc"]
+
+
+@pytest.mark.asyncio
+async def test_read_range(ws):
+    body = "".join(f"line {i}\n" for i in range(1, 101))
+    await server.open_archive({"workspace_id": ws, "files": {"big.txt": body}})
+    res = await server.ws_read_range({"workspace_id": ws, "path": "big.txt", "start_line": 50, "end_line": 52})
+    assert res["content"][0]["text"] == "50: line 50\n51: line 51\n52: line 52"
+
+
+@pytest.mark.asyncio
+async def test_read_range_missing(ws):
+    res = await server.ws_read_range({"workspace_id": ws, "path": "nope.txt"})
+    assert res["meta"]["ok"] is False
+    assert res["content"][0]["text"] == "Path not found"
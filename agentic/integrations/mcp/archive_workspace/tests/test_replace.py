@@ -1,2 +1,71 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import pytest
+
+from agentic.integrations.mcp.archive_workspace import app as server
+from agentic.integrations.mcp.archive_workspace import config
+from agentic.integrations.mcp.archive_workspace.domain.replace import PieceTable
+from agentic.integrations.mcp.archive_workspace.infra import workspace_store
+
+
+@pytest.fixture()
+def ws(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_WS_DATA_DIR", str(tmp_path))
+    workspace_store._reset_for_tests()
+    yield "w1"
+    workspace_store._reset_for_tests()
+
+
+def test_piece_table_replace_lines():
+    table = PieceTable("one\ntwo\nthree\n")
+    table.replace_lines(2, 2, "TWO\n2b")
+    assert table.text() == "one\nTWO\n2b\nthree\n"
+    table.replace_lines(1, 1, "")
+    assert table.text() == "TWO\n2b\nthree\n"
+    table.replace_lines(9, 9, "tail")
+    assert table.text() == "TWO\n2b\nthree\ntail"
+
+
+def test_piece_table_edits_do_not_copy_text():
+    table = PieceTable("".join(f"{i}\n" for i in range(10_000)))
+    for i in range(1, 50):
+        table.replace_lines(i * 100, i * 100, f"edit {i}")
+    assert table.read_lines(200, 200) == ["edit 2"]
+    assert table.piece_count < 150
+
+
+@pytest.mark.asyncio
+async def test_replace_range_journals_and_compacts(ws, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "EDIT_LOG_COMPACT", 3)
+    await server.open_archive({"workspace_id": ws, "files": {"a.py": "x = 1\ny = 2\n"}})
+    store = workspace_store.get_workspace(ws)
+
+    res = await server.ws_replace_range({"workspace_id": ws, "path": "a.py", "start_line": 1, "end_line": 1, "replacement": "x = 10"})
+    assert res["content"][0]["text"] == "Range replaced"
+    assert store.journal_path.exists()
+    assert "a.py" in store.dirty
+
+    for value in (20, 30):
+        await server.ws_replace_range({"workspace_id": ws, "path": "a.py", "start_line": 2, "end_line": 2, "replacement": f"y = {value}"})
+    assert not store.journal_path.exists()
+    assert store.dirty == set()
+    assert (store.overlay_dir / "a.py").read_text() == "x = 10\ny = 30\n"
+
+
+@pytest.mark.asyncio
+async def test_rewritten_file_drops_its_journaled_edits(ws):
+    await server.open_archive({"workspace_id": ws, "files": {"a.py": "old\n", "b.py": "keep\n"}})
+    for path in ("a.py", "b.py"):
+        await server.ws_replace_range({"workspace_id": ws, "path": path, "start_line": 1, "end_line": 1, "replacement": "EDITED"})
+    await server.open_archive({"workspace_id": ws, "files": {"a.py": "fresh\n"}})
+
+    workspace_store._reset_for_tests()
+    store = workspace_store.get_workspace(ws)
+    assert store.read_text("a.py") == "fresh\n"
+    assert store.read_text("b.py") == "EDITED\n"
+
+
+@pytest.mark.asyncio
+async def test_replace_range_missing(ws):
+    res = await server.ws_replace_range({"workspace_id": ws, "path": "nope.py", "replacement": "x"})
+    assert res["meta"]["ok"] is False
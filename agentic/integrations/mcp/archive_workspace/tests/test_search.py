@@ -1,2 +1,77 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import pytest
+
+from agentic.integrations.mcp.archive_workspace import app as server
+from agentic.integrations.mcp.archive_workspace.infra import workspace_store
+from agentic.integrations.mcp.archive_workspace.infra.text_search import TrigramIndex, required_literals
+
+
+@pytest.fixture()
+def ws(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_WS_DATA_DIR", str(tmp_path))
+    workspace_store._reset_for_tests()
+    yield "w1"
+    workspace_store._reset_for_tests()
+
+
+FILES = {
+    "src/auth.py": "def login(user):\n    return check_password(user)\n",
+    "src/db.py": "def connect():\n    return Pool(size=4)\n",
+    "docs/password_reset.md": "# Reset\nSteps here\n",
+}
+
+
+def test_required_literals():
+    assert required_literals("check_password") == ["check_password"]
+    assert required_literals(r"Pool\(size=\d+\)", regex=True) == ["Pool(size="]
+    assert required_literals("foo|bar", regex=True) == []
+
+
+def test_trigram_candidates_narrow_and_prune():
+    idx = TrigramIndex()
+    idx.add(1, {"abc", "bcd"})
+    idx.add(2, {"abc"})
+    assert idx.candidates(["abcd"]) == {1}
+    assert idx.candidates(["xy"]) is None
+    idx.prune({2: "b"})
+    assert idx.candidates(["abc"]) == {2}
+
+
+@pytest.mark.asyncio
+async def test_search_substring_and_path(ws):
+    await server.open_archive({"workspace_id": ws, "files": FILES})
+    res = await server.ws_search({"workspace_id": ws, "query": "PASSWORD"})
+    matches = res["meta"]["matches"]
+    assert [m["path"] for m in matches] == ["docs/password_reset.md", "src/auth.py"]
+    assert matches[1]["line"] == 2
+    assert matches[1]["preview"] == "return check_password(user)"
+    assert matches[0]["line"] is None
+
+
+@pytest.mark.asyncio
+async def test_search_regex_and_case(ws):
+    await server.open_archive({"workspace_id": ws, "files": FILES})
+    res = await server.ws_search({"workspace_id": ws, "query": r"Pool\(size=\d+\)", "regex": True})
+    assert [m["path"] for m in res["meta"]["matches"]] == ["src/db.py"]
+
+    res = await server.ws_search({"workspace_id": ws, "query": "pool(", "case_sensitive": True})
+    assert res["meta"]["matches"] == []
+
+    res = await server.ws_search({"workspace_id": ws, "query": "(", "regex": True})
+    assert res["meta"]["ok"] is False
+
+
+@pytest.mark.asyncio
+async def test_search_sees_unflushed_edits(ws):
+    await server.open_archive({"workspace_id": ws, "files": FILES})
+    await server.ws_replace_range({"workspace_id": ws, "path": "src/db.py", "start_line": 2, "end_line": 2, "replacement": "    return open_replica()"})
+    res = await server.ws_search({"workspace_id": ws, "query": "open_replica"})
+    assert [m["path"] for m in res["meta"]["matches"]] == ["src/db.py"]
+
+
+@pytest.mark.asyncio
+async def test_search_unknown_workspace(ws, tmp_path):
+    res = await server.ws_search({"workspace_id": "missing", "query": "x"})
+    assert res["meta"]["matches"] == []
+    assert not (tmp_path / "missing").exists()
@@ -1,2 +1,29 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import pytest
+
+from agentic.integrations.mcp.archive_workspace import app as server
+from agentic.integrations.mcp.archive_workspace.infra import workspace_store
+
+
+@pytest.fixture()
+def ws(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_WS_DATA_DIR", str(tmp_path))
+    workspace_store._reset_for_tests()
+    yield "w1"
+    workspace_store._reset_for_tests()
+
+
+@pytest.mark.asyncio
+async def test_tree_sorted_with_prefix(ws):
+    await server.open_archive({"workspace_id": ws, "files": {"src/b.py": "", "src/a.py": "", "README.md": ""}})
+    res = await server.ws_tree({"workspace_id": ws})
+    assert res["meta"]["paths"] == ["README.md", "src/a.py", "src/b.py"]
+    res = await server.ws_tree({"workspace_id": ws, "prefix": "src/"})
+    assert res["meta"]["paths"] == ["src/a.py", "src/b.py"]
+
+
+@pytest.mark.asyncio
+async def test_tree_empty(ws):
+    res = await server.ws_tree({"workspace_id": "nothing"})
+    assert res["content"][0]["text"] == "<empty workspace>"
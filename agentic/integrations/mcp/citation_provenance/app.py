@@ -1,50 +1,277 @@
+"""citation_provenance MCP server.
+
+Sources, claims and citations live in a SQLite lineage graph
+(CITATION_PROVENANCE_DB_PATH). Registering a source stores its normalised
+text and content hash; attaching a claim anchors each cited quote to a span
+of its source and stores the span's hash. Verifying an answer then compares
+hashes: only citations whose source changed since anchoring touch the text
+(cached per source), one worker per source.
+
+Tools:
+  hp.citation.register_source    store or update a source's text and parents
+  hp.citation.attach_claim       record a claim and anchor its citations
+  hp.citation.verify_citations   check every citation of an answer (alias hp.citation.verify)
+  hp.citation.get_lineage        claims, spans and source ancestry of an answer,
+                                 or everything derived from / citing a source
+"""
+
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
+from typing import Optional
+
 from agentic.integrations.mcp._common.server import ToolDef, create_mcp_app
+from agentic.integrations.mcp.citation_provenance import config
+from agentic.integrations.mcp.citation_provenance.domain.lineage import LineageGraph
+from agentic.integrations.mcp.citation_provenance.domain.parsing import markers, parse_citation
+from agentic.integrations.mcp.citation_provenance.domain.verification import PASSING, anchor, summarize, verify_batch
+from agentic.integrations.mcp.citation_provenance.infra.hashing import SpanIndexCache, content_hash, normalize
+from agentic.integrations.mcp.citation_provenance.infra.lineage_store import Citation, LineageStore
+
+
+class _Runtime:
+    def __init__(self) -> None:
+        self.store = LineageStore(config.db_path())
+        self.indexes = SpanIndexCache(self.store.source_text, config.index_cache_size())
+        self.graph = LineageGraph(self.store, config.max_lineage_depth())
+
+    def close(self) -> None:
+        self.store.close()
+
+
+_runtime: Optional[_Runtime] = None
+_runtime_lock = threading.Lock()
+
 
-_LINEAGE: dict[str, list[dict]] = {}
+def runtime() -> _Runtime:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = _Runtime()
+        return _runtime
+
+
+def shutdown() -> None:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is not None:
+            _runtime.close()
+        _runtime = None
+
+
+_reset_for_tests = shutdown
 
 
 def _content(text: str, **meta: object) -> dict:
     return {"content": [{"type": "text", "text": text}], "meta": meta}
 
 
+def _str_list(raw: object) -> list[str]:
+    if isinstance(raw, str):
+        raw = [raw]
+    return [str(v).strip() for v in raw or [] if str(v).strip()]
+
+
+async def register_source(args: dict) -> dict:
+    source_id = str(args.get("source_id", "")).strip()
+    text = normalize(str(args.get("text", "")))
+    if not source_id or not text:
+        return _content("Missing required fields: source_id and text", ok=False)
+    uri = str(args.get("uri", "") or "").strip()
+    parents = _str_list(args.get("derived_from"))
+    digest = content_hash(text)
+    rt = runtime()
+
+    def put() -> bool:
+        changed = rt.store.put_source(source_id, text, digest, uri)
+        if changed:
+            rt.indexes.discard(source_id)
+        rt.store.add_edges(source_id, parents)
+        return changed
+
+    changed = await asyncio.to_thread(put)
+    return _content(
+        f"Source {source_id} {'stored' if changed else 'unchanged'}",
+        ok=True,
+        source_id=source_id,
+        content_hash=digest,
+        length=len(text),
+        changed=changed,
+        derived_from=parents,
+    )
+
+
 async def attach_claim(args: dict) -> dict:
     response_id = str(args.get("response_id", "")).strip()
     claim = str(args.get("claim", "")).strip()
     citations = args.get("citations") or []
     if not response_id or not claim:
         return _content("Missing required fields: response_id and claim", ok=False)
-    entry = {"claim": claim, "citations": citations}
-    _LINEAGE.setdefault(response_id, []).append(entry)
+    refs = [r for r in (parse_citation(c) for c in citations) if r is not None]
+    rt = runtime()
+
+    def store() -> tuple[int, list[dict]]:
+        sources = rt.store.sources(r.source_id for r in refs)
+        rows, anchors = [], []
+        for r in refs:
+            cit = Citation(0, 0, r.ref, r.source_id, r.quote, -1 if r.start is None else r.start, -1 if r.end is None else r.end)
+            source = sources.get(r.source_id)
+            index = rt.indexes.get(r.source_id, source.content_hash) if source else None
+            if index is None:
+                cit.start = cit.end = -1
+                status = "missing_source"
+            else:
+                status = "anchored" if anchor(cit, index, source.content_hash) else "not_found"
+            rows.append(cit)
+            anchors.append(status)
+        claim_id = rt.store.add_claim(response_id, claim, rows)
+        return claim_id, [{**c.to_dict(), "anchor": s} for c, s in zip(rows, anchors)]
+
+    claim_id, stored = await asyncio.to_thread(store)
+    entry = {"claim_id": claim_id, "claim": claim, "citations": stored}
     return _content("Claim attached", ok=True, response_id=response_id, entry=entry)
 
 
 async def verify_citations(args: dict) -> dict:
-    response_text = str(args.get("response_text", "")).strip()
-    citation_count = response_text.count("[")
-    ok = citation_count > 0
+    response_text = str(args.get("response_text", "") or "").strip()
+    response_id = str(args.get("response_id", "") or "").strip()
+    found = markers(response_text)
+    if not response_id:
+        ok = len(found) > 0
+        return _content(
+            "Citation verification completed.",
+            ok=ok,
+            citation_count=len(found),
+            markers=found,
+            message="No bracket-style citations were detected." if not ok else "Citations detected.",
+        )
+
+    started = time.perf_counter()
+    rt = runtime()
+
+    def load():
+        cits = rt.store.citations(response_id)
+        return cits, rt.store.sources(c.source_id for c in cits)
+
+    cits, sources = await asyncio.to_thread(load)
+    checks, reanchored = await verify_batch(cits, sources, rt.indexes)
+    if reanchored:
+        await asyncio.to_thread(rt.store.reanchor, reanchored)
+
+    refs = {c.ref for c in cits}
+    dangling = [m for m in found if m not in refs]
+    unreferenced = sorted(refs - set(found)) if response_text else []
+    failing = [c.to_dict() for c in checks if c.status not in PASSING]
+    ok = bool(checks) and not failing and not dangling
+    if not checks:
+        message = "No citations are attached to this response."
+    elif ok:
+        message = "All citations verified."
+    else:
+        message = f"{len(failing)} citation(s) failed verification, {len(dangling)} marker(s) without a citation."
     return _content(
         "Citation verification completed.",
         ok=ok,
-        citation_count=citation_count,
-        message="No bracket-style citations were detected." if not ok else "Citations detected.",
+        response_id=response_id,
+        citation_count=len(checks),
+        counts=summarize(checks),
+        results=[c.to_dict() for c in checks],
+        failing=failing,
+        dangling_markers=dangling,
+        unreferenced=unreferenced,
+        reanchored=len(reanchored),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+        message=message,
     )
 
 
+def _reach(reach: tuple) -> list[dict]:
+    return [{"source_id": node, "depth": depth} for node, depth in reach]
+
+
 async def get_lineage(args: dict) -> dict:
     response_id = str(args.get("response_id", "")).strip()
-    entries = _LINEAGE.get(response_id, [])
-    return _content(f"Lineage entries: {len(entries)}", ok=True, response_id=response_id, entries=entries)
+    source_id = str(args.get("source_id", "") or "").strip()
+    rt = runtime()
+
+    if not response_id and source_id:
+        def source_lineage() -> dict:
+            up = rt.graph.ancestors([source_id])[source_id]
+            down = rt.graph.descendants([source_id])[source_id]
+            affected = [source_id] + [node for node, _ in down]
+            citing = rt.store.responses_citing(affected)
+            return {
+                "derived_from": _reach(up),
+                "derived": _reach(down),
+                "responses": sorted({rid for rids in citing.values() for rid in rids}),
+            }
+
+        info = await asyncio.to_thread(source_lineage)
+        return _content(
+            f"Source {source_id}: {len(info['derived'])} derived source(s), {len(info['responses'])} citing response(s)",
+            ok=True,
+            source_id=source_id,
+            **info,
+        )
+
+    def response_lineage() -> tuple[list[dict], dict]:
+        claims = rt.store.claims(response_id)
+        cits = rt.store.citations(response_id)
+        cited = list(dict.fromkeys(c.source_id for c in cits))
+        metas = rt.store.sources(cited)
+        ancestry = rt.graph.ancestors(cited)
+        by_claim: dict[int, list[dict]] = {}
+        for c in cits:
+            by_claim.setdefault(c.claim_id, []).append(c.to_dict())
+        entries = [
+            {"claim_id": cl["claim_id"], "claim": cl["claim"], "citations": by_claim.get(cl["claim_id"], [])}
+            for cl in claims
+        ]
+        sources = {
+            sid: {
+                "registered": sid in metas,
+                "uri": metas[sid].uri if sid in metas else "",
+                "content_hash": metas[sid].content_hash if sid in metas else None,
+                "derived_from": _reach(ancestry[sid]),
+            }
+            for sid in cited
+        }
+        return entries, sources
+
+    entries, sources = await asyncio.to_thread(response_lineage)
+    return _content(f"Lineage entries: {len(entries)}", ok=True, response_id=response_id, entries=entries, sources=sources)
+
+
+_CITATION_ITEM = {
+    "oneOf": [
+        {"type": "string"},
+        {
+            "type": "object",
+            "properties": {
+                "source_id": {"type": "string"},
+                "quote": {"type": "string"},
+                "start": {"type": "integer"},
+                "end": {"type": "integer"},
+                "ref": {"type": "string"},
+            },
+            "required": ["source_id"],
+        },
+    ]
+}
+_VERIFY_SCHEMA = {"type": "object", "properties": {"response_text": {"type": "string"}, "response_id": {"type": "string"}}}
 
 
 def register_tools() -> list[ToolDef]:
     return [
-        ToolDef("hp.citation.attach_claim", "Attach claim lineage", {"type": "object", "properties": {"response_id": {"type": "string"}, "claim": {"type": "string"}, "citations": {"type": "array", "items": {"type": "string"}}}, "required": ["response_id", "claim"]}, attach_claim),
-        ToolDef("hp.citation.verify_citations", "Verify citation coverage", {"type": "object", "properties": {"response_text": {"type": "string"}}, "required": ["response_text"]}, verify_citations),
-        ToolDef("hp.citation.verify", "Verify citation coverage (alias)", {"type": "object", "properties": {"response_text": {"type": "string"}}, "required": ["response_text"]}, verify_citations),
-        ToolDef("hp.citation.get_lineage", "Get response lineage", {"type": "object", "properties": {"response_id": {"type": "string"}}, "required": ["response_id"]}, get_lineage),
+        ToolDef("hp.citation.register_source", "Register source text for citation anchoring", {"type": "object", "properties": {"source_id": {"type": "string"}, "text": {"type": "string"}, "uri": {"type": "string"}, "derived_from": {"type": "array", "items": {"type": "string"}}}, "required": ["source_id", "text"]}, register_source),
+        ToolDef("hp.citation.attach_claim", "Attach claim lineage", {"type": "object", "properties": {"response_id": {"type": "string"}, "claim": {"type": "string"}, "citations": {"type": "array", "items": _CITATION_ITEM}}, "required": ["response_id", "claim"]}, attach_claim),
+        ToolDef("hp.citation.verify_citations", "Verify citation coverage", _VERIFY_SCHEMA, verify_citations),
+        ToolDef("hp.citation.verify", "Verify citation coverage (alias)", _VERIFY_SCHEMA, verify_citations),
+        ToolDef("hp.citation.get_lineage", "Get response lineage", {"type": "object", "properties": {"response_id": {"type": "string"}, "source_id": {"type": "string"}}}, get_lineage),
     ]
 
 
 app = create_mcp_app(server_name="mcp-citation-provenance", tools=register_tools())
+app.router.add_event_handler("shutdown", shutdown)
@@ -1,6 +1,22 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
 
 LOG_LEVEL = os.getenv('CITATION_PROVENANCE_LOG_LEVEL', 'INFO')
 SERVICE_NAME = os.getenv('CITATION_PROVENANCE_SERVICE_NAME', 'mcp-citation-provenance')
+
+
+def db_path() -> Path:
+    raw = os.getenv('CITATION_PROVENANCE_DB_PATH', '').strip()
+    return Path(raw) if raw else Path.home() / '.homepilot' / 'citation_provenance' / 'lineage.sqlite3'
+
+
+def index_cache_size() -> int:
+    """Source texts kept in memory for checking spans of changed sources."""
+    return max(1, int(os.getenv('CITATION_PROVENANCE_INDEX_CACHE', '64')))
+
+
+def max_lineage_depth() -> int:
+    """How many ``derived_from`` hops lineage traversal follows."""
+    return max(1, int(os.getenv('CITATION_PROVENANCE_MAX_DEPTH', '8')))
@@ -1,5 +1,69 @@
+"""Memoised walks over the ``derived_from`` graph.
+
+Walks are breadth-first from all start nodes at once, with one batched
+adjacency query per hop. Results are cached per node and direction and
+dropped whenever the store's ``generation`` moves, so repeated lineage calls
+for the same answer, or answers sharing sources, cost dict lookups.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from agentic.integrations.mcp.citation_provenance.infra.lineage_store import LineageStore
+
+# (node id, hops from the start node)
+Reach = Tuple[Tuple[str, int], ...]
+
+
+class LineageGraph:
+    def __init__(self, store: LineageStore, max_depth: int):
+        self._store = store
+        self._max_depth = max_depth
+        self._lock = threading.Lock()
+        self._generation = -1
+        self._memo: Dict[Tuple[str, str], Reach] = {}
+
+    def _cached(self, direction: str, ids: Sequence[str]) -> Dict[str, Reach]:
+        with self._lock:
+            if self._generation != self._store.generation:
+                self._memo.clear()
+                self._generation = self._store.generation
+            return {i: self._memo[(direction, i)] for i in ids if (direction, i) in self._memo}
+
+    def _walk(self, direction: str, ids: Sequence[str], step: Callable[[Sequence[str]], Dict[str, List[str]]]) -> Dict[str, Reach]:
+        generation = self._store.generation
+        out = self._cached(direction, ids)
+        todo = [i for i in ids if i not in out]
+        seen = {start: {start} for start in todo}
+        frontier = {start: [start] for start in todo}
+        reach: Dict[str, List[Tuple[str, int]]] = {start: [] for start in todo}
+        for depth in range(1, self._max_depth + 1):
+            wanted = {node for nodes in frontier.values() for node in nodes}
+            if not wanted:
+                break
+            adjacent = step(sorted(wanted))
+            for start, nodes in frontier.items():
+                nxt = []
+                for node in nodes:
+                    for other in adjacent.get(node, ()):
+                        if other not in seen[start]:
+                            seen[start].add(other)
+                            nxt.append(other)
+                            reach[start].append((other, depth))
+                frontier[start] = nxt
+        out.update({start: tuple(r) for start, r in reach.items()})
+        with self._lock:
+            if generation == self._store.generation == self._generation:
+                for node, found in out.items():
+                    self._memo[(direction, node)] = found
+        return out
+
+    def ancestors(self, ids: Sequence[str]) -> Dict[str, Reach]:
+        """Sources each of ``ids`` was derived from, nearest first."""
+        return self._walk("up", list(dict.fromkeys(ids)), self._store.parents_of)
+
+    def descendants(self, ids: Sequence[str]) -> Dict[str, Reach]:
+        """Sources derived from each of ``ids``, nearest first."""
+        return self._walk("down", list(dict.fromkeys(ids)), self._store.children_of)
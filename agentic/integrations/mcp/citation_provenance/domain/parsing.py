@@ -1,5 +1,51 @@
+"""Citation inputs and the citation markers found in answer text."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import re
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from agentic.integrations.mcp.citation_provenance.infra.hashing import normalize
+
+# [1], [1, 3], [^2], [doc-7] — but not markdown links ``[text](url)``.
+_MARKER = re.compile(r"\[\^?([^\[\]\n]{1,64})\](?!\()")
+
+
+@dataclass
+class CitationRef:
+    source_id: str
+    ref: str = ""
+    quote: str = ""
+    start: Optional[int] = None
+    end: Optional[int] = None
+
+
+def parse_citation(raw: Any) -> Optional[CitationRef]:
+    """A citation is a source id, or ``{"source_id", "quote"?, "start"?, "end"?, "ref"?}``."""
+    if isinstance(raw, str):
+        return CitationRef(raw.strip()) if raw.strip() else None
+    if not isinstance(raw, dict):
+        return None
+    source_id = str(raw.get("source_id") or raw.get("source") or raw.get("url") or "").strip()
+    if not source_id:
+        return None
+    start, end = raw.get("start"), raw.get("end")
+    return CitationRef(
+        source_id=source_id,
+        ref=str(raw.get("ref") or "").strip().lstrip("^"),
+        quote=normalize(str(raw.get("quote") or "")),
+        start=int(start) if start is not None else None,
+        end=int(end) if end is not None else None,
+    )
+
+
+def markers(text: str) -> List[str]:
+    """Citation markers in order of first appearance, e.g. ``["1", "3", "doc-7"]``."""
+    seen: dict[str, None] = {}
+    for m in _MARKER.finditer(text):
+        for part in m.group(1).split(","):
+            ref = part.strip().lstrip("^")
+            if ref:
+                seen.setdefault(ref, None)
+    return list(seen)
@@ -1,5 +1,134 @@
+"""Anchoring citations to source spans and verifying them by hash.
+
+A citation is anchored once: its quote is located in the source and the
+span's offsets, hash and the source's content hash are stored.
+Verifying is then, per citation:
+
+1. source content hash unchanged            -> the anchored result stands;
+2. else the span hash at the stored offsets -> verified (edit elsewhere);
+3. else the quote elsewhere in the source   -> moved, re-anchored;
+4. else                                     -> not_found.
+
+Step 1 reads no text. Steps 2-4 need the source text (``SpanIndex``, cached)
+and run per source in worker threads, all sources of an answer concurrently.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from agentic.integrations.mcp.citation_provenance.infra.hashing import SpanIndex, SpanIndexCache, span_hash
+from agentic.integrations.mcp.citation_provenance.infra.lineage_store import Citation, SourceMeta
+
+VERIFIED = "verified"
+MOVED = "moved"
+NOT_FOUND = "not_found"
+CHANGED = "changed"
+MISSING_SOURCE = "missing_source"
+
+PASSING = frozenset({VERIFIED, MOVED})
+
+
+@dataclass
+class SpanCheck:
+    ref: str
+    source_id: str
+    status: str
+    start: Optional[int] = None
+    end: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        return {"ref": self.ref, "source_id": self.source_id, "status": self.status, "start": self.start, "end": self.end}
+
+
+def anchor(cit: Citation, index: SpanIndex, content_hash: str) -> bool:
+    """Locate ``cit.quote`` (or the whole source) and record the span; returns whether it was found."""
+    if not cit.quote:
+        # Whole-source citation: the content hash is the span hash.
+        cit.start, cit.end, cit.span_hash, cit.content_hash = 0, index.length, None, content_hash
+        return True
+    target = span_hash(cit.quote)
+    size = len(cit.quote)
+    start = cit.start if cit.start is not None and cit.start >= 0 else 0
+    if index.span(start, start + size) != target:
+        found = index.find(cit.quote, near=start)
+        if found is None:
+            cit.start, cit.end, cit.span_hash, cit.content_hash = -1, -1, target, content_hash
+            return False
+        start = found
+    cit.start, cit.end, cit.span_hash, cit.content_hash = start, start + size, target, content_hash
+    return True
+
+
+def _fast(cit: Citation, source: Optional[SourceMeta]) -> Optional[SpanCheck]:
+    if source is None:
+        return SpanCheck(cit.ref, cit.source_id, MISSING_SOURCE)
+    if cit.content_hash == source.content_hash:
+        if cit.anchored:
+            return SpanCheck(cit.ref, cit.source_id, VERIFIED, cit.start, cit.end)
+        return SpanCheck(cit.ref, cit.source_id, NOT_FOUND)  # already searched this version
     return None
+
+
+def _slow(cit: Citation, index: SpanIndex, content_hash: str) -> SpanCheck:
+    """Check ``cit`` against a changed source; re-anchors ``cit`` in place when it still holds."""
+    if cit.quote and cit.anchored and index.span(cit.start, cit.end) == cit.span_hash:
+        cit.content_hash = content_hash
+        return SpanCheck(cit.ref, cit.source_id, VERIFIED, cit.start, cit.end)
+    if cit.quote:
+        size = len(cit.quote)
+        target = span_hash(cit.quote)
+        found = index.find(cit.quote, near=max(cit.start, 0))
+        if found is not None:
+            was_anchored = cit.anchored
+            cit.start, cit.end, cit.span_hash, cit.content_hash = found, found + size, target, content_hash
+            return SpanCheck(cit.ref, cit.source_id, MOVED if was_anchored else VERIFIED, cit.start, cit.end)
+        cit.start, cit.end, cit.span_hash, cit.content_hash = -1, -1, target, content_hash
+        return SpanCheck(cit.ref, cit.source_id, NOT_FOUND)
+    if not cit.anchored:
+        # Whole-source citation made before the source was registered.
+        anchor(cit, index, content_hash)
+        return SpanCheck(cit.ref, cit.source_id, VERIFIED, cit.start, cit.end)
+    return SpanCheck(cit.ref, cit.source_id, CHANGED)
+
+
+def _check_source(cits: List[Citation], indexes: SpanIndexCache, source: SourceMeta) -> List[SpanCheck]:
+    index = indexes.get(source.source_id, source.content_hash)
+    if index is None:
+        return [SpanCheck(c.ref, c.source_id, MISSING_SOURCE) for c in cits]
+    return [_slow(c, index, source.content_hash) for c in cits]
+
+
+async def verify_batch(
+    citations: List[Citation],
+    sources: Dict[str, SourceMeta],
+    indexes: SpanIndexCache,
+) -> tuple[List[SpanCheck], List[Citation]]:
+    """Check every citation; returns results in input order and the citations to re-anchor."""
+    results: List[Optional[SpanCheck]] = [None] * len(citations)
+    pending: Dict[str, List[int]] = {}
+    for i, cit in enumerate(citations):
+        fast = _fast(cit, sources.get(cit.source_id))
+        if fast is None:
+            pending.setdefault(cit.source_id, []).append(i)
+        else:
+            results[i] = fast
+
+    before = {i: (citations[i].start, citations[i].content_hash) for idx in pending.values() for i in idx}
+    groups = list(pending.items())
+    checked = await asyncio.gather(*(
+        asyncio.to_thread(_check_source, [citations[i] for i in idx], indexes, sources[sid])
+        for sid, idx in groups
+    ))
+    for (_, idx), checks in zip(groups, checked):
+        for i, check in zip(idx, checks):
+            results[i] = check
+    changed = [citations[i] for i, prev in before.items() if (citations[i].start, citations[i].content_hash) != prev]
+    return [r for r in results if r is not None], changed
+
+
+def summarize(checks: List[SpanCheck]) -> Dict[str, int]:
+    return dict(Counter(c.status for c in checks))
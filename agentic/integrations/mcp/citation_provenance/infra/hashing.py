@@ -1,5 +1,102 @@
+"""Content hashes for sources and polynomial hashes for cited spans.
+
+A citation stores the hash of its span, so checking it against a changed
+source hashes only that slice, not the document. Text is whitespace-normalised
+before hashing, so offsets and hashes do not change when a page is only
+re-wrapped.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Mersenne prime modulus and a fixed base, so hashes are stable across runs
+# and can be stored.
+_MOD = (1 << 61) - 1
+_BASE = 1_000_003
+
+_WS = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _WS.sub(" ", text).strip()
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of already normalised text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def span_hash(text: str) -> int:
+    """Polynomial hash mod 2**61 - 1; fits a signed 64-bit SQLite integer."""
+    h = 0
+    for ch in text:
+        h = (h * _BASE + ord(ch) + 1) % _MOD
+    return h
+
+
+class SpanIndex:
+    """A source's normalised text, for checking and relocating spans."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+
+    def span(self, start: int, end: int) -> Optional[int]:
+        """Hash of ``text[start:end]``, or None when the span is out of range."""
+        if start < 0 or end > self.length or start > end:
+            return None
+        return span_hash(self.text[start:end])
+
+    def find(self, quote: str, near: int = 0) -> Optional[int]:
+        """Offset of the occurrence of ``quote`` closest to ``near``."""
+        if not quote:
+            return None
+        best: Optional[int] = None
+        i = self.text.find(quote)
+        while i != -1:
+            if best is None or abs(i - near) < abs(best - near):
+                best = i
+            if i >= near:
+                break
+            i = self.text.find(quote, i + 1)
+        return best
+
+
+class SpanIndexCache:
+    """LRU of ``SpanIndex`` per source, reloaded when the content hash moves.
+
+    ``load`` returns the source's (content hash, text), or None if unknown.
+    """
+
+    def __init__(self, load: Callable[[str], Optional[tuple[str, str]]], size: int):
+        self._load = load
+        self._size = size
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, tuple[str, SpanIndex]]" = OrderedDict()
+
+    def get(self, source_id: str, expected_hash: str = "") -> Optional[SpanIndex]:
+        with self._lock:
+            hit = self._items.get(source_id)
+            if hit is not None and (not expected_hash or hit[0] == expected_hash):
+                self._items.move_to_end(source_id)
+                return hit[1]
+        loaded = self._load(source_id)
+        if loaded is None:
+            return None
+        digest, text = loaded
+        index = SpanIndex(text)
+        with self._lock:
+            self._items[source_id] = (digest, index)
+            self._items.move_to_end(source_id)
+            while len(self._items) > self._size:
+                self._items.popitem(last=False)
+        return index
+
+    def discard(self, source_id: str) -> None:
+        with self._lock:
+            self._items.pop(source_id, None)
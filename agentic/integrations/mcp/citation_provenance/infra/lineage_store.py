@@ -1,5 +1,252 @@
+"""SQLite lineage graph: sources, claims, citations and derivation edges.
+
+* ``sources`` keeps the normalised text and its content hash;
+* ``claims`` / ``citations`` hang off a response id, and each citation keeps
+  the offsets, hash and content hash of the span it was anchored to,
+  so verification only compares hashes;
+* ``edges`` (child derived from parent) is indexed in both directions, so
+  upstream and downstream walks are index lookups per hop.
+
+``generation`` increases on every write that can change a lineage answer;
+callers key their memoised traversals on it.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source_id    TEXT PRIMARY KEY,
+    uri          TEXT NOT NULL DEFAULT '',
+    content_hash TEXT NOT NULL,
+    length       INTEGER NOT NULL,
+    text         TEXT NOT NULL,
+    updated_at   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+    claim_id    INTEGER PRIMARY KEY,
+    response_id TEXT NOT NULL,
+    claim       TEXT NOT NULL,
+    created_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS claims_by_response ON claims (response_id);
+CREATE TABLE IF NOT EXISTS citations (
+    citation_id  INTEGER PRIMARY KEY,
+    claim_id     INTEGER NOT NULL,
+    response_id  TEXT    NOT NULL,
+    ref          TEXT    NOT NULL,
+    source_id    TEXT    NOT NULL,
+    quote        TEXT    NOT NULL DEFAULT '',
+    span_start   INTEGER NOT NULL DEFAULT -1,
+    span_end     INTEGER NOT NULL DEFAULT -1,
+    span_hash    INTEGER,
+    content_hash TEXT    NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS citations_by_response ON citations (response_id);
+CREATE INDEX IF NOT EXISTS citations_by_source ON citations (source_id);
+CREATE TABLE IF NOT EXISTS edges (
+    child  TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    kind   TEXT NOT NULL DEFAULT 'derived_from',
+    PRIMARY KEY (child, parent)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_by_parent ON edges (parent, child);
+"""
+
+
+@dataclass
+class SourceMeta:
+    source_id: str
+    uri: str
+    content_hash: str
+    length: int
+
+
+@dataclass
+class Citation:
+    citation_id: int
+    claim_id: int
+    ref: str
+    source_id: str
+    quote: str = ""
+    start: int = -1
+    end: int = -1
+    span_hash: Optional[int] = None
+    content_hash: str = ""
+
+    @property
+    def anchored(self) -> bool:
+        return self.start >= 0
+
+    def to_dict(self) -> dict:
+        return {
+            "ref": self.ref,
+            "source_id": self.source_id,
+            "quote": self.quote,
+            "start": self.start if self.anchored else None,
+            "end": self.end if self.anchored else None,
+        }
+
+
+_CITATION_COLUMNS = "citation_id, claim_id, ref, source_id, quote, span_start, span_end, span_hash, content_hash"
+
+
+def _chunks(items: Sequence[str], size: int = 500) -> Iterable[Sequence[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class LineageStore:
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self.generation = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self._conn
+
+    # -- sources ---------------------------------------------------------
+
+    def put_source(self, source_id: str, text: str, content_hash: str, uri: str = "") -> bool:
+        """Insert or replace a source's text; returns whether its content changed."""
+        with self._lock:
+            row = self._conn.execute("SELECT content_hash FROM sources WHERE source_id = ?", (source_id,)).fetchone()
+            self._conn.execute(
+                "INSERT INTO sources (source_id, uri, content_hash, length, text, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (source_id) DO UPDATE SET uri = CASE WHEN excluded.uri != '' THEN excluded.uri ELSE uri END, "
+                "content_hash = excluded.content_hash, length = excluded.length, text = excluded.text, "
+                "updated_at = excluded.updated_at",
+                (source_id, uri, content_hash, len(text), text, time.time()),
+            )
+            self.generation += 1
+        return row is None or row[0] != content_hash
+
+    def sources(self, source_ids: Iterable[str]) -> Dict[str, SourceMeta]:
+        ids = list(dict.fromkeys(source_ids))
+        out: Dict[str, SourceMeta] = {}
+        with self._lock:
+            for chunk in _chunks(ids):
+                marks = ",".join("?" * len(chunk))
+                for r in self._conn.execute(
+                    f"SELECT source_id, uri, content_hash, length FROM sources WHERE source_id IN ({marks})", chunk
+                ):
+                    out[r[0]] = SourceMeta(r[0], r[1], r[2], r[3])
+        return out
+
+    def source_text(self, source_id: str) -> Optional[tuple[str, str]]:
+        """(content hash, text) of a source."""
+        with self._lock:
+            row = self._conn.execute("SELECT content_hash, text FROM sources WHERE source_id = ?", (source_id,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    # -- edges -----------------------------------------------------------
+
+    def add_edges(self, child: str, parents: Iterable[str], kind: str = "derived_from") -> int:
+        rows = [(child, p, kind) for p in dict.fromkeys(parents) if p and p != child]
+        if not rows:
+            return 0
+        with self._lock:
+            cur = self._conn.executemany("INSERT OR IGNORE INTO edges (child, parent, kind) VALUES (?, ?, ?)", rows)
+            self.generation += 1
+        return cur.rowcount
+
+    def _adjacent(self, ids: Sequence[str], near: str, far: str) -> Dict[str, List[str]]:
+        out: Dict[str, List[str]] = {}
+        with self._lock:
+            for chunk in _chunks(list(ids)):
+                marks = ",".join("?" * len(chunk))
+                for a, b in self._conn.execute(f"SELECT {near}, {far} FROM edges WHERE {near} IN ({marks})", chunk):
+                    out.setdefault(a, []).append(b)
+        return out
+
+    def parents_of(self, ids: Sequence[str]) -> Dict[str, List[str]]:
+        return self._adjacent(ids, "child", "parent")
+
+    def children_of(self, ids: Sequence[str]) -> Dict[str, List[str]]:
+        return self._adjacent(ids, "parent", "child")
+
+    # -- claims and citations ---------------------------------------------
+
+    def add_claim(self, response_id: str, claim: str, citations: List[Citation]) -> int:
+        """Store a claim and its citations; citations without a ref are numbered per response."""
+        with self._lock:
+            c = self._conn
+            c.execute("BEGIN")
+            try:
+                claim_id = c.execute(
+                    "INSERT INTO claims (response_id, claim, created_at) VALUES (?, ?, ?)",
+                    (response_id, claim, time.time()),
+                ).lastrowid
+                n = c.execute("SELECT COUNT(*) FROM citations WHERE response_id = ?", (response_id,)).fetchone()[0]
+                for cit in citations:
+                    cit.claim_id = claim_id
+                    if not cit.ref:
+                        n += 1
+                        cit.ref = str(n)
+                    cit.citation_id = c.execute(
+                        "INSERT INTO citations (claim_id, response_id, ref, source_id, quote, span_start, span_end, span_hash, content_hash) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (claim_id, response_id, cit.ref, cit.source_id, cit.quote, cit.start, cit.end,
+                         cit.span_hash, cit.content_hash),
+                    ).lastrowid
+                c.execute("COMMIT")
+            except BaseException:
+                c.execute("ROLLBACK")
+                raise
+            self.generation += 1
+        return claim_id
+
+    def claims(self, response_id: str) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT claim_id, claim, created_at FROM claims WHERE response_id = ? ORDER BY claim_id", (response_id,)
+            ).fetchall()
+        return [{"claim_id": r[0], "claim": r[1], "created_at": r[2]} for r in rows]
+
+    def citations(self, response_id: str) -> List[Citation]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_CITATION_COLUMNS} FROM citations WHERE response_id = ? ORDER BY citation_id", (response_id,)
+            ).fetchall()
+        return [Citation(*r) for r in rows]
+
+    def responses_citing(self, source_ids: Sequence[str]) -> Dict[str, List[str]]:
+        """source id -> response ids with a citation of it."""
+        out: Dict[str, List[str]] = {}
+        with self._lock:
+            for chunk in _chunks(list(source_ids)):
+                marks = ",".join("?" * len(chunk))
+                for sid, rid in self._conn.execute(
+                    f"SELECT DISTINCT source_id, response_id FROM citations WHERE source_id IN ({marks})", chunk
+                ):
+                    out.setdefault(sid, []).append(rid)
+        return out
+
+    def reanchor(self, updates: List[Citation]) -> None:
+        """Persist new offsets / content hashes found during verification."""
+        if not updates:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE citations SET span_start = ?, span_end = ?, span_hash = ?, content_hash = ? WHERE citation_id = ?",
+                [(u.start, u.end, u.span_hash, u.content_hash, u.citation_id) for u in updates],
+            )
+            self.generation += 1
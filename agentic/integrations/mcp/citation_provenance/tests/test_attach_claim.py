@@ -1,2 +1,76 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import pytest
+
+from agentic.integrations.mcp.citation_provenance import app as server
+from agentic.integrations.mcp.citation_provenance.domain.parsing import markers, parse_citation
+from agentic.integrations.mcp.citation_provenance.infra.hashing import SpanIndex, normalize, span_hash
+
+SOURCE = """The Eiffel Tower was completed in 1889.
+It is 330 metres tall   and was the tallest structure until 1930."""
+
+
+@pytest.fixture()
+def provenance(tmp_path, monkeypatch):
+    monkeypatch.setenv("CITATION_PROVENANCE_DB_PATH", str(tmp_path / "lineage.sqlite3"))
+    server._reset_for_tests()
+    yield server
+    server._reset_for_tests()
+
+
+def test_span_hash_matches_slices():
+    text = normalize(SOURCE)
+    index = SpanIndex(text)
+    for start, end in ((0, 10), (5, 40), (17, len(text)), (3, 3)):
+        assert index.span(start, end) == span_hash(text[start:end])
+    assert index.span(-1, 4) is None and index.span(0, len(text) + 1) is None
+    assert index.find("330 metres tall") == text.index("330 metres tall")
+    assert index.find("not there") is None and index.find("") is None
+
+
+def test_find_prefers_the_match_nearest_the_old_offset():
+    text = "ab x ab y ab"
+    index = SpanIndex(text)
+    assert index.find("ab") == 0
+    assert index.find("ab", near=6) == 5
+    assert index.find("ab", near=11) == 10
+
+
+def test_parsing():
+    assert markers("A [1] and [2, 3] then [^4] and [1] but not [link](http://x)") == ["1", "2", "3", "4"]
+    assert parse_citation(" doc-1 ").source_id == "doc-1"
+    ref = parse_citation({"source_id": "d", "quote": "  a\n b ", "start": "4", "ref": "^2"})
+    assert (ref.quote, ref.start, ref.end, ref.ref) == ("a b", 4, None, "2")
+    assert parse_citation({"quote": "no source"}) is None and parse_citation(3) is None
+
+
+@pytest.mark.asyncio
+async def test_attach_anchors_quotes(provenance):
+    await provenance.register_source({"source_id": "eiffel", "text": SOURCE, "uri": "https://example.org/eiffel"})
+    out = await provenance.attach_claim({
+        "response_id": "r1",
+        "claim": "The tower is 330 m tall.",
+        "citations": [
+            {"source_id": "eiffel", "quote": "It is 330 metres\ntall"},
+            {"source_id": "eiffel", "quote": "built by aliens"},
+            "eiffel",
+            {"source_id": "unknown", "quote": "anything"},
+        ],
+    })
+    cits = out["meta"]["entry"]["citations"]
+    assert [c["ref"] for c in cits] == ["1", "2", "3", "4"]
+    assert [c["anchor"] for c in cits] == ["anchored", "not_found", "anchored", "missing_source"]
+    text = normalize(SOURCE)
+    assert text[cits[0]["start"]:cits[0]["end"]] == "It is 330 metres tall"
+    assert (cits[2]["start"], cits[2]["end"]) == (0, len(text))
+
+    more = await provenance.attach_claim({"response_id": "r1", "claim": "Completed 1889.", "citations": [{"source_id": "eiffel", "quote": "1889", "ref": "a"}, "eiffel"]})
+    assert [c["ref"] for c in more["meta"]["entry"]["citations"]] == ["a", "5"]
+
+
+@pytest.mark.asyncio
+async def test_attach_requires_fields(provenance):
+    out = await provenance.attach_claim({"response_id": "", "claim": "x"})
+    assert out["meta"]["ok"] is False
+    out = await provenance.register_source({"source_id": "s", "text": "   "})
+    assert out["meta"]["ok"] is False
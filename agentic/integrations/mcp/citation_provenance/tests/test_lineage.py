@@ -1,2 +1,82 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import pytest
+
+from agentic.integrations.mcp.citation_provenance import app as server
+from agentic.integrations.mcp.citation_provenance.domain.lineage import LineageGraph
+from agentic.integrations.mcp.citation_provenance.infra.lineage_store import LineageStore
+
+
+@pytest.fixture()
+def provenance(tmp_path, monkeypatch):
+    monkeypatch.setenv("CITATION_PROVENANCE_DB_PATH", str(tmp_path / "lineage.sqlite3"))
+    server._reset_for_tests()
+    yield server
+    server._reset_for_tests()
+
+
+def test_graph_walks_are_batched_and_memoised(tmp_path):
+    store = LineageStore(tmp_path / "g.sqlite3")
+    store.add_edges("summary", ["article", "transcript"])
+    store.add_edges("article", ["wire"])
+    store.add_edges("wire", ["summary"])  # cycle
+    store.add_edges("notes", ["article"])
+
+    calls = []
+    parents_of = store.parents_of
+    store.parents_of = lambda ids: calls.append(list(ids)) or parents_of(ids)
+    graph = LineageGraph(store, max_depth=8)
+
+    up = graph.ancestors(["summary", "notes"])
+    assert up["summary"] == (("article", 1), ("transcript", 1), ("wire", 2))
+    assert up["notes"] == (("article", 1), ("wire", 2), ("summary", 3), ("transcript", 4))
+    assert calls[0] == ["notes", "summary"]  # one query per hop for both starts
+
+    calls.clear()
+    assert graph.ancestors(["notes"])["notes"] == up["notes"]
+    assert calls == []
+
+    store.add_edges("transcript", ["audio"])  # invalidates
+    assert ("audio", 2) in graph.ancestors(["summary"])["summary"]
+    assert calls
+
+    down = graph.descendants(["wire"])["wire"]
+    assert dict(down) == {"article": 1, "summary": 2, "notes": 2}
+    assert LineageGraph(store, max_depth=1).ancestors(["notes"])["notes"] == (("article", 1),)
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_response_lineage(provenance):
+    await provenance.register_source({"source_id": "paper", "text": "Original finding: X causes Y.", "uri": "doi:1"})
+    await provenance.register_source({"source_id": "blog", "text": "A blog says X causes Y.", "derived_from": ["paper"]})
+    await provenance.attach_claim({"response_id": "r1", "claim": "X causes Y", "citations": [{"source_id": "blog", "quote": "X causes Y"}, "paper"]})
+    await provenance.attach_claim({"response_id": "r1", "claim": "Uncited claim"})
+
+    out = await provenance.get_lineage({"response_id": "r1"})
+    meta = out["meta"]
+    assert out["content"][0]["text"] == "Lineage entries: 2"
+    assert [e["claim"] for e in meta["entries"]] == ["X causes Y", "Uncited claim"]
+    assert [c["source_id"] for c in meta["entries"][0]["citations"]] == ["blog", "paper"]
+    assert meta["entries"][1]["citations"] == []
+    assert meta["sources"]["blog"]["derived_from"] == [{"source_id": "paper", "depth": 1}]
+    assert meta["sources"]["paper"]["uri"] == "doi:1"
+
+    empty = await provenance.get_lineage({"response_id": "nope"})
+    assert empty["meta"]["entries"] == []
+
+
+@pytest.mark.asyncio
+async def test_source_lineage_finds_downstream_responses(provenance):
+    await provenance.register_source({"source_id": "paper", "text": "p"})
+    await provenance.register_source({"source_id": "blog", "text": "b", "derived_from": ["paper"]})
+    await provenance.register_source({"source_id": "tweet", "text": "t", "derived_from": "blog"})
+    await provenance.attach_claim({"response_id": "r-blog", "claim": "c", "citations": ["blog"]})
+    await provenance.attach_claim({"response_id": "r-tweet", "claim": "c", "citations": ["tweet"]})
+    await provenance.attach_claim({"response_id": "r-other", "claim": "c", "citations": ["elsewhere"]})
+
+    out = await provenance.get_lineage({"source_id": "paper"})
+    meta = out["meta"]
+    assert meta["derived"] == [{"source_id": "blog", "depth": 1}, {"source_id": "tweet", "depth": 2}]
+    assert meta["derived_from"] == []
+    assert meta["responses"] == ["r-blog", "r-tweet"]
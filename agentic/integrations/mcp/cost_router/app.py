@@ -1,54 +1,199 @@
+"""cost_router MCP server.
+
+Usage is appended to a SQLite ledger (COST_ROUTER_DB_PATH) that keeps
+running aggregates per (tenant, month, route), so budget checks read one
+row instead of summing every event. Spend over a trailing window gives the
+burn rate behind the month-end forecast, and per-route averages of the
+reported latency, cost and errors steer ``hp.cost.recommend_route``.
+
+Tools:
+  hp.cost.recommend_route        pick a route for a quality level and budget
+  hp.cost.record_cost            append a usage event (cost, latency_ms, ok)
+  hp.cost.monthly_budget_status  month-to-date spend, burn rate and forecast
+  hp.cost.usage                  per-route breakdown for a month
+  hp.cost.set_budget             set a tenant's monthly budget
+"""
+
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
+from typing import Optional
+
 from agentic.integrations.mcp._common.server import ToolDef, create_mcp_app
+from agentic.integrations.mcp.cost_router import config
+from agentic.integrations.mcp.cost_router.domain.optimization import Forecast, forecast, month_key
+from agentic.integrations.mcp.cost_router.domain.routing import choose_route
+from agentic.integrations.mcp.cost_router.infra.budget_store import BudgetStore
+from agentic.integrations.mcp.cost_router.infra.pricing_provider import list_price, prices
+from agentic.integrations.mcp.cost_router.infra.usage_store import UsageEvent, UsageLedger
+
+# Old rate buckets are dropped once per this many records.
+PRUNE_EVERY = 500
+
+
+class _Runtime:
+    def __init__(self) -> None:
+        self.ledger = UsageLedger(
+            config.db_path(),
+            bucket_s=config.rate_window_s() / config.RATE_BUCKETS,
+            alpha=config.STATS_ALPHA,
+        )
+        self.budgets = BudgetStore(self.ledger)
+        self.records = 0
+
+    def close(self) -> None:
+        self.ledger.close()
+
+
+_runtime: Optional[_Runtime] = None
+_runtime_lock = threading.Lock()
+
 
-_COST_EVENTS: list[dict] = []
+def runtime() -> _Runtime:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = _Runtime()
+        return _runtime
 
 
-MODEL_COST = {
-    "cheap": 0.001,
-    "balanced": 0.01,
-    "premium": 0.05,
-}
+def shutdown() -> None:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is not None:
+            _runtime.close()
+        _runtime = None
+
+
+_reset_for_tests = shutdown
 
 
 def _content(text: str, **meta: object) -> dict:
     return {"content": [{"type": "text", "text": text}], "meta": meta}
 
 
+def _tenant(args: dict) -> str:
+    return str(args.get("tenant", "") or "").strip() or config.default_tenant()
+
+
+def _budget_forecast(rt: _Runtime, tenant: str, budget: Optional[float], now: float) -> Forecast:
+    if budget is None:
+        budget = rt.budgets.get(tenant)
+    if budget is None:
+        budget = config.default_monthly_budget()
+    _, spend = rt.ledger.month_total(tenant, month_key(now))
+    window_cost, window_s = rt.ledger.window_cost(tenant, now, config.RATE_BUCKETS)
+    return forecast(spend, budget, window_cost, window_s, now)
+
+
+def _optional_float(args: dict, key: str) -> Optional[float]:
+    raw = args.get(key)
+    return None if raw is None or raw == "" else float(raw)
+
+
 async def recommend_route(args: dict) -> dict:
     quality = str(args.get("quality", "balanced"))
-    budget_left = float(args.get("budget_left", 10.0))
-    if quality == "high" and budget_left > 1:
-        route = "premium"
-    elif budget_left < 0.2:
-        route = "cheap"
-    else:
-        route = "balanced"
-    return _content(f"Recommended route: {route}", ok=True, route=route, estimated_cost=MODEL_COST[route])
+    tenant = _tenant(args)
+    units = max(0.0, float(args.get("units", 1.0) or 1.0))
+    budget_left = _optional_float(args, "budget_left")
+    max_latency_ms = _optional_float(args, "max_latency_ms")
+    rt = runtime()
+
+    def decide():
+        fc = _budget_forecast(rt, tenant, None, time.time())
+        left = fc.remaining if budget_left is None else budget_left
+        stats = rt.ledger.route_stats()
+        decision = choose_route(
+            quality=quality,
+            budget_left=left,
+            stats=stats,
+            prices=prices(),
+            units=units,
+            max_latency_ms=max_latency_ms,
+            over_forecast=fc.projected_spend > fc.budget,
+        )
+        return decision, left, stats
+
+    decision, left, stats = await asyncio.to_thread(decide)
+    return _content(
+        f"Recommended route: {decision.route}",
+        ok=True,
+        route=decision.route,
+        estimated_cost=round(decision.estimated_cost, 6),
+        budget_left=round(left, 6),
+        reasons=decision.reasons,
+        stats={route: s.to_dict() for route, s in stats.items()},
+    )
 
 
 async def record_cost(args: dict) -> dict:
     route = str(args.get("route", "balanced"))
     units = float(args.get("units", 1.0))
-    cost = float(args.get("cost", MODEL_COST.get(route, MODEL_COST["balanced"]) * units))
-    _COST_EVENTS.append({"route": route, "units": units, "cost": cost})
-    return _content("Cost event recorded", ok=True, total_spend=sum(item["cost"] for item in _COST_EVENTS), count=len(_COST_EVENTS))
+    cost_raw = _optional_float(args, "cost")
+    event = UsageEvent(
+        ts=time.time(),
+        tenant=_tenant(args),
+        route=route,
+        units=units,
+        cost=list_price(route) * units if cost_raw is None else cost_raw,
+        latency_ms=_optional_float(args, "latency_ms"),
+        ok=bool(args.get("ok", True)),
+    )
+    rt = runtime()
+
+    def record() -> tuple[int, float]:
+        result = rt.ledger.record(event)
+        rt.records += 1
+        if rt.records % PRUNE_EVERY == 0:
+            rt.ledger.prune_buckets(event.ts, config.RATE_BUCKETS)
+        return result
+
+    count, spend = await asyncio.to_thread(record)
+    return _content("Cost event recorded", ok=True, tenant=event.tenant, cost=event.cost, total_spend=spend, count=count)
 
 
 async def monthly_budget_status(args: dict) -> dict:
-    budget = float(args.get("budget", 100.0))
-    spend = sum(item["cost"] for item in _COST_EVENTS)
-    remaining = budget - spend
-    return _content("Budget status computed", ok=remaining >= 0, budget=budget, spend=spend, remaining=remaining)
+    tenant = _tenant(args)
+    rt = runtime()
+    fc = await asyncio.to_thread(_budget_forecast, rt, tenant, _optional_float(args, "budget"), time.time())
+    info = fc.to_dict()
+    text = f"Spent {fc.spend:.2f} of {fc.budget:.2f} this month; projected {fc.projected_spend:.2f}"
+    if fc.exhausted_in_h is not None:
+        text += f"; budget runs out in {fc.exhausted_in_h:.1f} h at the current rate"
+    return _content(text, ok=fc.remaining >= 0, tenant=tenant, **info)
+
+
+async def usage(args: dict) -> dict:
+    tenant = _tenant(args)
+    month = str(args.get("month", "") or "").strip() or month_key(time.time())
+    rt = runtime()
+    routes = await asyncio.to_thread(rt.ledger.by_route, tenant, month)
+    count, spend = await asyncio.to_thread(rt.ledger.month_total, tenant, month)
+    lines = [f"Usage for {tenant} in {month}: {count} events, {spend:.4f} spent"]
+    lines += [f"- {r['route']}: {r['count']} events, {r['cost']:.4f}" for r in routes]
+    return _content("\n".join(lines), ok=True, tenant=tenant, month=month, count=count, spend=spend, routes=routes)
+
+
+async def set_budget(args: dict) -> dict:
+    tenant = _tenant(args)
+    monthly = _optional_float(args, "monthly_usd")
+    if monthly is None or monthly < 0:
+        return _content("monthly_usd must be a non-negative number", ok=False, tenant=tenant)
+    await asyncio.to_thread(runtime().budgets.set, tenant, monthly)
+    return _content(f"Budget for {tenant} set to {monthly:.2f}", ok=True, tenant=tenant, monthly_usd=monthly)
 
 
 def register_tools() -> list[ToolDef]:
     return [
-        ToolDef("hp.cost.recommend_route", "Recommend route", {"type": "object", "properties": {"quality": {"type": "string"}, "budget_left": {"type": "number"}}}, recommend_route),
-        ToolDef("hp.cost.record_cost", "Record cost event", {"type": "object", "properties": {"route": {"type": "string"}, "units": {"type": "number"}, "cost": {"type": "number"}}}, record_cost),
-        ToolDef("hp.cost.monthly_budget_status", "Get budget status", {"type": "object", "properties": {"budget": {"type": "number"}}}, monthly_budget_status),
+        ToolDef("hp.cost.recommend_route", "Recommend route", {"type": "object", "properties": {"quality": {"type": "string"}, "budget_left": {"type": "number"}, "tenant": {"type": "string"}, "units": {"type": "number"}, "max_latency_ms": {"type": "number"}}}, recommend_route),
+        ToolDef("hp.cost.record_cost", "Record cost event", {"type": "object", "properties": {"route": {"type": "string"}, "units": {"type": "number"}, "cost": {"type": "number"}, "tenant": {"type": "string"}, "latency_ms": {"type": "number"}, "ok": {"type": "boolean"}}}, record_cost),
+        ToolDef("hp.cost.monthly_budget_status", "Get budget status", {"type": "object", "properties": {"budget": {"type": "number"}, "tenant": {"type": "string"}}}, monthly_budget_status),
+        ToolDef("hp.cost.usage", "Per-route usage for a month", {"type": "object", "properties": {"tenant": {"type": "string"}, "month": {"type": "string"}}}, usage),
+        ToolDef("hp.cost.set_budget", "Set a tenant's monthly budget", {"type": "object", "properties": {"tenant": {"type": "string"}, "monthly_usd": {"type": "number"}}, "required": ["monthly_usd"]}, set_budget),
     ]
 
 
 app = create_mcp_app(server_name="mcp-cost-router", tools=register_tools())
+app.router.add_event_handler("shutdown", shutdown)
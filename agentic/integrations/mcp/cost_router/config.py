@@ -1,6 +1,43 @@
 from __future__ import annotations
 
+import json
 import os
+from pathlib import Path
 
 LOG_LEVEL = os.getenv('COST_ROUTER_LOG_LEVEL', 'INFO')
 SERVICE_NAME = os.getenv('COST_ROUTER_SERVICE_NAME', 'mcp-cost-router')
+
+
+def db_path() -> Path:
+    raw = os.getenv('COST_ROUTER_DB_PATH', '').strip()
+    return Path(raw) if raw else Path.home() / '.homepilot' / 'cost_router' / 'ledger.sqlite3'
+
+
+def default_tenant() -> str:
+    return os.getenv('COST_ROUTER_DEFAULT_TENANT', 'default').strip() or 'default'
+
+
+def default_monthly_budget() -> float:
+    """Budget for tenants without one set through ``hp.cost.set_budget``."""
+    return float(os.getenv('COST_ROUTER_MONTHLY_BUDGET', '100'))
+
+
+def price_overrides() -> dict[str, float]:
+    """Per-unit list prices, e.g. ``{"premium": 0.03}``, layered over the defaults."""
+    raw = os.getenv('COST_ROUTER_PRICES', '').strip()
+    if not raw:
+        return {}
+    return {str(k): float(v) for k, v in json.loads(raw).items()}
+
+
+def rate_window_s() -> float:
+    """Trailing window the burn rate is measured over."""
+    return max(60.0, float(os.getenv('COST_ROUTER_RATE_WINDOW_H', '6')) * 3600)
+
+
+# The rate window is kept as this many fixed buckets, so a rate read touches
+# a bounded number of rows however many events were recorded.
+RATE_BUCKETS = 72
+
+# Weight of the newest sample in the per-route latency/cost/error averages.
+STATS_ALPHA = 0.2
@@ -1,5 +1,55 @@
+"""Burn-rate forecast for a monthly budget."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import calendar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def month_key(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m")
+
+
+def seconds_left_in_month(ts: float) -> float:
+    now = datetime.fromtimestamp(ts, timezone.utc)
+    days = calendar.monthrange(now.year, now.month)[1]
+    end = datetime(now.year, now.month, days, tzinfo=timezone.utc).timestamp() + 86400
+    return max(0.0, end - ts)
+
+
+@dataclass
+class Forecast:
+    spend: float
+    budget: float
+    rate_per_hour: float
+    projected_spend: float
+    exhausted_in_h: Optional[float]  # None when not on track to run out this month
+
+    @property
+    def remaining(self) -> float:
+        return self.budget - self.spend
+
+    def to_dict(self) -> dict:
+        return {
+            "spend": round(self.spend, 6),
+            "budget": self.budget,
+            "remaining": round(self.remaining, 6),
+            "rate_per_hour": round(self.rate_per_hour, 6),
+            "projected_spend": round(self.projected_spend, 6),
+            "exhausted_in_h": None if self.exhausted_in_h is None else round(self.exhausted_in_h, 2),
+        }
+
+
+def forecast(spend: float, budget: float, window_cost: float, window_s: float, now: float) -> Forecast:
+    """Project month-end spend assuming the trailing-window rate holds."""
+    rate_s = window_cost / window_s if window_s > 0 else 0.0
+    left_s = seconds_left_in_month(now)
+    projected = spend + rate_s * left_s
+    exhausted = None
+    if spend >= budget:
+        exhausted = 0.0
+    elif rate_s > 0 and projected > budget:
+        exhausted = (budget - spend) / rate_s / 3600
+    return Forecast(spend, budget, rate_s * 3600, projected, exhausted)
@@ -1,5 +1,36 @@
+"""Routing policy: which routes a quality level may use and when to step down."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+# Cheapest first.
+TIERS = ("cheap", "balanced", "premium")
+
+# Highest tier each requested quality may use.
+QUALITY_CEILING = {"low": "cheap", "balanced": "balanced", "high": "premium"}
+
+# Budget left (USD) below which only the cheap route is used, and at or
+# below which premium is not used even for high quality.
+CHEAP_ONLY_BELOW = 0.2
+PREMIUM_MIN_BUDGET = 1.0
+
+# A route whose averaged error rate exceeds this (with enough samples) is
+# skipped while another route fits.
+MAX_ERROR_RATE = 0.5
+MIN_SAMPLES = 5
+
+# Step down a tier when the month-end forecast exceeds the budget by this factor.
+FORECAST_OVERSHOOT = 1.0
+
+
+def tier_index(route: str) -> int:
+    return TIERS.index(route) if route in TIERS else TIERS.index("balanced")
+
+
+def ceiling_for(quality: str, budget_left: float) -> str:
+    """Highest route allowed before live stats are considered."""
+    if budget_left < CHEAP_ONLY_BELOW:
+        return "cheap"
+    ceiling = QUALITY_CEILING.get(quality, "balanced")
+    if ceiling == "premium" and budget_left <= PREMIUM_MIN_BUDGET:
+        return "balanced"
+    return ceiling
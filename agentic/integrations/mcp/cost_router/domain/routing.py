@@ -1,5 +1,93 @@
+"""Route choice from the policy ceiling and live per-route stats."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from agentic.integrations.mcp.cost_router.domain import policies
+
+
+@dataclass
+class RouteStats:
+    """Exponentially weighted averages over the route's recorded events."""
+
+    route: str
+    samples: int = 0
+    latency_ms: Optional[float] = None
+    cost_per_unit: Optional[float] = None
+    error_rate: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "samples": self.samples,
+            "latency_ms": None if self.latency_ms is None else round(self.latency_ms, 1),
+            "cost_per_unit": None if self.cost_per_unit is None else round(self.cost_per_unit, 6),
+            "error_rate": round(self.error_rate, 3),
+        }
+
+
+@dataclass
+class Decision:
+    route: str
+    estimated_cost: float
+    reasons: List[str] = field(default_factory=list)
+
+
+def unit_cost(route: str, stats: Dict[str, RouteStats], prices: Dict[str, float]) -> float:
+    """Observed cost per unit once the route has enough samples, else its list price."""
+    s = stats.get(route)
+    if s is not None and s.cost_per_unit is not None and s.samples >= policies.MIN_SAMPLES:
+        return s.cost_per_unit
+    return prices.get(route, prices["balanced"])
+
+
+def choose_route(
+    *,
+    quality: str,
+    budget_left: float,
+    stats: Dict[str, RouteStats],
+    prices: Dict[str, float],
+    units: float = 1.0,
+    max_latency_ms: Optional[float] = None,
+    over_forecast: bool = False,
+) -> Decision:
+    reasons: List[str] = []
+    ceiling = policies.ceiling_for(quality, budget_left)
+    top = policies.tier_index(ceiling)
+    if ceiling != policies.QUALITY_CEILING.get(quality, "balanced"):
+        reasons.append(f"budget left {budget_left:.2f} caps the route at {ceiling}")
+    if over_forecast and top > 0:
+        top -= 1
+        reasons.append("burn rate projects overspend; stepping down a tier")
+
+    candidates = list(reversed(policies.TIERS[: top + 1]))  # best first
+
+    def affordable(route: str) -> bool:
+        return unit_cost(route, stats, prices) * units <= budget_left
+
+    def healthy(route: str) -> bool:
+        s = stats.get(route)
+        return s is None or s.samples < policies.MIN_SAMPLES or s.error_rate <= policies.MAX_ERROR_RATE
+
+    def fast_enough(route: str) -> bool:
+        s = stats.get(route)
+        return max_latency_ms is None or s is None or s.latency_ms is None or s.latency_ms <= max_latency_ms
+
+    chosen = None
+    for route in candidates:
+        if not affordable(route):
+            reasons.append(f"{route}: estimated cost exceeds budget left")
+            continue
+        if not healthy(route):
+            reasons.append(f"{route}: error rate {stats[route].error_rate:.0%}")
+            continue
+        if not fast_enough(route):
+            reasons.append(f"{route}: latency {stats[route].latency_ms:.0f} ms over {max_latency_ms:.0f} ms")
+            continue
+        chosen = route
+        break
+    if chosen is None:
+        chosen = "cheap"
+        reasons.append("no route met every constraint; using cheap")
+    return Decision(chosen, unit_cost(chosen, stats, prices) * units, reasons)
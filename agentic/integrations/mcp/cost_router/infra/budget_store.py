@@ -1,5 +1,34 @@
+"""Monthly budgets per tenant, kept in the ledger database."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+from typing import Optional
+
+from agentic.integrations.mcp.cost_router.infra.usage_store import UsageLedger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS budgets (
+    tenant      TEXT PRIMARY KEY,
+    monthly_usd REAL NOT NULL
+);
+"""
+
+
+class BudgetStore:
+    def __init__(self, ledger: UsageLedger):
+        self._ledger = ledger
+        with ledger.lock:
+            ledger.conn.executescript(_SCHEMA)
+
+    def get(self, tenant: str) -> Optional[float]:
+        with self._ledger.lock:
+            row = self._ledger.conn.execute("SELECT monthly_usd FROM budgets WHERE tenant = ?", (tenant,)).fetchone()
+        return float(row[0]) if row else None
+
+    def set(self, tenant: str, monthly_usd: float) -> None:
+        with self._ledger.lock:
+            self._ledger.conn.execute(
+                "INSERT INTO budgets (tenant, monthly_usd) VALUES (?, ?) "
+                "ON CONFLICT (tenant) DO UPDATE SET monthly_usd = excluded.monthly_usd",
+                (tenant, monthly_usd),
+            )
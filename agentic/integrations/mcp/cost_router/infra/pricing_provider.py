@@ -1,5 +1,20 @@
+"""List prices per route unit."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+from agentic.integrations.mcp.cost_router import config
+
+DEFAULT_PRICES = {
+    "cheap": 0.001,
+    "balanced": 0.01,
+    "premium": 0.05,
+}
+
+
+def prices() -> dict[str, float]:
+    return {**DEFAULT_PRICES, **config.price_overrides()}
+
+
+def list_price(route: str) -> float:
+    table = prices()
+    return table.get(route, table["balanced"])
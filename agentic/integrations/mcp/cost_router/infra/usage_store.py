@@ -1,5 +1,223 @@
+"""Append-only SQLite usage ledger with running aggregates.
+
+``events`` is the ledger itself and is only ever inserted into. In the same
+transaction each record folds into:
+
+* ``totals`` (tenant, month): month-to-date spend, so a budget check is a
+  single primary-key read;
+* ``aggregates`` (tenant, month, route): count, units, cost, latency sums;
+* ``rate_buckets`` (tenant, bucket): cost per fixed time bucket; the trailing
+  window is ``RATE_BUCKETS`` rows at most;
+* ``route_stats`` (route): exponentially weighted latency, cost per unit and
+  error rate that drive routing.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from agentic.integrations.mcp.cost_router.domain.optimization import month_key
+from agentic.integrations.mcp.cost_router.domain.routing import RouteStats
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id         INTEGER PRIMARY KEY,
+    ts         REAL    NOT NULL,
+    tenant     TEXT    NOT NULL,
+    month      TEXT    NOT NULL,
+    route      TEXT    NOT NULL,
+    units      REAL    NOT NULL,
+    cost       REAL    NOT NULL,
+    latency_ms REAL,
+    ok         INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totals (
+    tenant TEXT    NOT NULL,
+    month  TEXT    NOT NULL,
+    count  INTEGER NOT NULL,
+    cost   REAL    NOT NULL,
+    PRIMARY KEY (tenant, month)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS aggregates (
+    tenant        TEXT    NOT NULL,
+    month         TEXT    NOT NULL,
+    route         TEXT    NOT NULL,
+    count         INTEGER NOT NULL,
+    errors        INTEGER NOT NULL,
+    units         REAL    NOT NULL,
+    cost          REAL    NOT NULL,
+    latency_sum   REAL    NOT NULL,
+    latency_count INTEGER NOT NULL,
+    PRIMARY KEY (tenant, month, route)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    tenant TEXT    NOT NULL,
+    bucket INTEGER NOT NULL,
+    cost   REAL    NOT NULL,
+    PRIMARY KEY (tenant, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS route_stats (
+    route         TEXT PRIMARY KEY,
+    samples       INTEGER NOT NULL,
+    latency_ms    REAL,
+    cost_per_unit REAL,
+    error_rate    REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class UsageEvent:
+    ts: float
+    tenant: str
+    route: str
+    units: float
+    cost: float
+    latency_ms: Optional[float] = None
+    ok: bool = True
+
+
+def _ewma(old: Optional[float], new: Optional[float], alpha: float) -> Optional[float]:
+    if new is None:
+        return old
+    return new if old is None else old + alpha * (new - old)
+
+
+class UsageLedger:
+    def __init__(self, path: Path | str, *, bucket_s: float, alpha: float):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.bucket_s = bucket_s
+        self.alpha = alpha
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self._conn
+
+    @property
+    def lock(self) -> threading.Lock:
+        return self._lock
+
+    def _bucket(self, ts: float) -> int:
+        return int(ts // self.bucket_s)
+
+    def record(self, ev: UsageEvent) -> tuple[int, float]:
+        """Append ``ev``; returns the tenant's (event count, spend) for the month."""
+        month = month_key(ev.ts)
+        latency = ev.latency_ms if ev.latency_ms is not None and ev.latency_ms >= 0 else None
+        with self._lock:
+            c = self._conn
+            c.execute("BEGIN")
+            try:
+                c.execute(
+                    "INSERT INTO events (ts, tenant, month, route, units, cost, latency_ms, ok) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (ev.ts, ev.tenant, month, ev.route, ev.units, ev.cost, latency, int(ev.ok)),
+                )
+                row = c.execute(
+                    "INSERT INTO totals (tenant, month, count, cost) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT (tenant, month) DO UPDATE SET count = count + 1, cost = cost + excluded.cost "
+                    "RETURNING count, cost",
+                    (ev.tenant, month, ev.cost),
+                ).fetchone()
+                c.execute(
+                    "INSERT INTO aggregates VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (tenant, month, route) DO UPDATE SET count = count + 1, errors = errors + excluded.errors, "
+                    "units = units + excluded.units, cost = cost + excluded.cost, "
+                    "latency_sum = latency_sum + excluded.latency_sum, latency_count = latency_count + excluded.latency_count",
+                    (ev.tenant, month, ev.route, int(not ev.ok), ev.units, ev.cost, latency or 0.0, int(latency is not None)),
+                )
+                c.execute(
+                    "INSERT INTO rate_buckets (tenant, bucket, cost) VALUES (?, ?, ?) "
+                    "ON CONFLICT (tenant, bucket) DO UPDATE SET cost = cost + excluded.cost",
+                    (ev.tenant, self._bucket(ev.ts), ev.cost),
+                )
+                self._update_stats(ev, latency)
+                c.execute("COMMIT")
+            except BaseException:
+                c.execute("ROLLBACK")
+                raise
+        return int(row[0]), float(row[1])
+
+    def _update_stats(self, ev: UsageEvent, latency: Optional[float]) -> None:
+        row = self._conn.execute(
+            "SELECT samples, latency_ms, cost_per_unit, error_rate FROM route_stats WHERE route = ?", (ev.route,)
+        ).fetchone()
+        unit_cost = ev.cost / ev.units if ev.units > 0 else None
+        if row is None:
+            samples, lat, cpu, err = 1, latency, unit_cost, 0.0 if ev.ok else 1.0
+        else:
+            a = self.alpha
+            samples = row[0] + 1
+            lat = _ewma(row[1], latency, a)
+            cpu = _ewma(row[2], unit_cost, a)
+            err = _ewma(row[3], 0.0 if ev.ok else 1.0, a)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO route_stats (route, samples, latency_ms, cost_per_unit, error_rate) VALUES (?, ?, ?, ?, ?)",
+            (ev.route, samples, lat, cpu, err),
+        )
+
+    def month_total(self, tenant: str, month: str) -> tuple[int, float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count, cost FROM totals WHERE tenant = ? AND month = ?", (tenant, month)
+            ).fetchone()
+        return (int(row[0]), float(row[1])) if row else (0, 0.0)
+
+    def window_cost(self, tenant: str, now: float, buckets: int) -> tuple[float, float]:
+        """(cost, covered seconds) over the trailing ``buckets`` buckets, current one included."""
+        current = self._bucket(now)
+        first = current - buckets + 1
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(cost), 0) FROM rate_buckets WHERE tenant = ? AND bucket BETWEEN ? AND ?",
+                (tenant, first, current),
+            ).fetchone()
+        covered = (buckets - 1) * self.bucket_s + (now - current * self.bucket_s)
+        return float(row[0]), covered
+
+    def by_route(self, tenant: str, month: str) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT route, count, errors, units, cost, latency_sum, latency_count FROM aggregates "
+                "WHERE tenant = ? AND month = ? ORDER BY cost DESC",
+                (tenant, month),
+            ).fetchall()
+        return [
+            {
+                "route": r[0],
+                "count": r[1],
+                "errors": r[2],
+                "units": r[3],
+                "cost": round(r[4], 6),
+                "avg_latency_ms": round(r[5] / r[6], 1) if r[6] else None,
+            }
+            for r in rows
+        ]
+
+    def route_stats(self) -> Dict[str, RouteStats]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT route, samples, latency_ms, cost_per_unit, error_rate FROM route_stats"
+            ).fetchall()
+        return {r[0]: RouteStats(r[0], r[1], r[2], r[3], r[4]) for r in rows}
+
+    def prune_buckets(self, now: float, buckets: int) -> int:
+        """Drop rate buckets older than the window."""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM rate_buckets WHERE bucket < ?", (self._bucket(now) - buckets + 1,))
+        return cur.rowcount
@@ -1,2 +1,62 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+
+from agentic.integrations.mcp.cost_router import app as server
+from agentic.integrations.mcp.cost_router.domain.optimization import forecast, seconds_left_in_month
+
+
+@pytest.fixture()
+def router(tmp_path, monkeypatch):
+    monkeypatch.setenv("COST_ROUTER_DB_PATH", str(tmp_path / "ledger.sqlite3"))
+    server._reset_for_tests()
+    yield server
+    server._reset_for_tests()
+
+
+def test_seconds_left_in_month():
+    ts = datetime(2026, 2, 27, tzinfo=timezone.utc).timestamp()
+    assert seconds_left_in_month(ts) == 2 * 86400
+
+
+def test_forecast_projects_burn_rate():
+    now = datetime(2026, 3, 31, 12, tzinfo=timezone.utc).timestamp()  # 12 h left
+    fc = forecast(spend=40.0, budget=50.0, window_cost=6.0, window_s=6 * 3600, now=now)
+    assert fc.rate_per_hour == pytest.approx(1.0)
+    assert fc.projected_spend == pytest.approx(52.0)
+    assert fc.exhausted_in_h == pytest.approx(10.0)
+
+    calm = forecast(spend=10.0, budget=50.0, window_cost=0.0, window_s=6 * 3600, now=now)
+    assert calm.projected_spend == 10.0 and calm.exhausted_in_h is None
+
+
+@pytest.mark.asyncio
+async def test_budget_status_reads_totals(router):
+    for _ in range(5):
+        await router.record_cost({"route": "balanced", "cost": 1.0})
+    status = await router.monthly_budget_status({"budget": 10})
+    meta = status["meta"]
+    assert meta["ok"] is True
+    assert meta["spend"] == pytest.approx(5.0)
+    assert meta["remaining"] == pytest.approx(5.0)
+    assert meta["rate_per_hour"] > 0
+
+    over = await router.monthly_budget_status({"budget": 4})
+    assert over["meta"]["ok"] is False
+    assert over["meta"]["exhausted_in_h"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_set_budget_per_tenant(router):
+    await router.set_budget({"tenant": "acme", "monthly_usd": 2})
+    await router.record_cost({"tenant": "acme", "route": "premium", "cost": 1.5})
+    status = await router.monthly_budget_status({"tenant": "acme"})
+    assert status["meta"]["budget"] == 2.0
+    assert status["meta"]["remaining"] == pytest.approx(0.5)
+
+    default = await router.monthly_budget_status({})
+    assert default["meta"]["budget"] == 100.0
+    bad = await router.set_budget({"monthly_usd": -1})
+    assert bad["meta"]["ok"] is False
@@ -1,2 +1,64 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import pytest
+
+from agentic.integrations.mcp.cost_router import app as server
+from agentic.integrations.mcp.cost_router.domain.optimization import month_key
+from agentic.integrations.mcp.cost_router.infra.usage_store import UsageEvent, UsageLedger
+
+
+@pytest.fixture()
+def router(tmp_path, monkeypatch):
+    monkeypatch.setenv("COST_ROUTER_DB_PATH", str(tmp_path / "ledger.sqlite3"))
+    server._reset_for_tests()
+    yield server
+    server._reset_for_tests()
+
+
+def test_ledger_keeps_running_aggregates(tmp_path):
+    ledger = UsageLedger(tmp_path / "l.sqlite3", bucket_s=300, alpha=0.5)
+    ts = 1_780_000_000.0
+    assert ledger.record(UsageEvent(ts, "acme", "premium", 2, 0.10, latency_ms=800)) == (1, pytest.approx(0.10))
+    ledger.record(UsageEvent(ts + 1, "acme", "premium", 1, 0.05, latency_ms=400, ok=False))
+    ledger.record(UsageEvent(ts + 2, "acme", "cheap", 10, 0.01))
+    ledger.record(UsageEvent(ts + 3, "other", "cheap", 1, 0.5))
+
+    month = month_key(ts)
+    assert ledger.month_total("acme", month) == (3, pytest.approx(0.16))
+    routes = {r["route"]: r for r in ledger.by_route("acme", month)}
+    assert routes["premium"]["count"] == 2 and routes["premium"]["errors"] == 1
+    assert routes["premium"]["avg_latency_ms"] == 600.0
+    assert routes["cheap"]["avg_latency_ms"] is None
+
+    stats = ledger.route_stats()
+    assert stats["premium"].samples == 2
+    assert stats["premium"].latency_ms == pytest.approx(600.0)  # 800 -> 400 at alpha 0.5
+    assert stats["premium"].error_rate == pytest.approx(0.5)
+    assert ledger.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 4
+
+
+def test_window_cost_and_pruning(tmp_path):
+    ledger = UsageLedger(tmp_path / "l.sqlite3", bucket_s=60, alpha=0.2)
+    ts = 1_780_000_050.0  # 30 s into a bucket
+    ledger.record(UsageEvent(ts - 3600, "t", "cheap", 1, 5.0))  # outside a 10-bucket window
+    ledger.record(UsageEvent(ts - 120, "t", "cheap", 1, 1.0))
+    ledger.record(UsageEvent(ts, "t", "cheap", 1, 2.0))
+    cost, covered = ledger.window_cost("t", ts, 10)
+    assert cost == pytest.approx(3.0)
+    assert covered == pytest.approx(570)
+    assert ledger.prune_buckets(ts, 10) == 1
+    assert ledger.window_cost("t", ts, 10)[0] == pytest.approx(3.0)
+
+
+@pytest.mark.asyncio
+async def test_record_cost_uses_list_price_and_persists(router):
+    res = await router.record_cost({"route": "premium", "units": 2})
+    assert res["meta"]["cost"] == pytest.approx(0.1)
+    await router.record_cost({"route": "cheap", "cost": 0.25, "tenant": "acme"})
+
+    router._reset_for_tests()
+    usage = await router.usage({})
+    assert usage["meta"]["count"] == 1
+    assert usage["meta"]["routes"][0]["route"] == "premium"
+    acme = await router.usage({"tenant": "acme"})
+    assert acme["meta"]["spend"] == pytest.approx(0.25)
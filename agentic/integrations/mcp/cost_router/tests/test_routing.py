@@ -1,2 +1,73 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import pytest
+
+from agentic.integrations.mcp.cost_router import app as server
+from agentic.integrations.mcp.cost_router.domain.routing import RouteStats, choose_route
+from agentic.integrations.mcp.cost_router.infra.pricing_provider import DEFAULT_PRICES
+
+
+@pytest.fixture()
+def router(tmp_path, monkeypatch):
+    monkeypatch.setenv("COST_ROUTER_DB_PATH", str(tmp_path / "ledger.sqlite3"))
+    server._reset_for_tests()
+    yield server
+    server._reset_for_tests()
+
+
+def _choose(**kw):
+    params = {"quality": "high", "budget_left": 10.0, "stats": {}, "prices": DEFAULT_PRICES}
+    params.update(kw)
+    return choose_route(**params)
+
+
+def test_budget_thresholds():
+    assert _choose().route == "premium"
+    assert _choose(budget_left=1.0).route == "balanced"
+    assert _choose(budget_left=0.1).route == "cheap"
+    assert _choose(quality="low").route == "cheap"
+    assert _choose(quality="balanced").route == "balanced"
+
+
+def test_live_stats_steer_the_choice():
+    slow = {"premium": RouteStats("premium", samples=20, latency_ms=4000, cost_per_unit=0.05)}
+    decision = _choose(stats=slow, max_latency_ms=1500)
+    assert decision.route == "balanced"
+    assert any("latency" in r for r in decision.reasons)
+
+    failing = {"premium": RouteStats("premium", samples=20, error_rate=0.9)}
+    assert _choose(stats=failing).route == "balanced"
+
+    pricey = {"premium": RouteStats("premium", samples=20, cost_per_unit=3.0)}
+    decision = _choose(stats=pricey, budget_left=2.0)
+    assert decision.route == "balanced"
+    assert _choose(stats=pricey, budget_left=5.0).estimated_cost == pytest.approx(3.0)
+
+    # Too few samples: list price still applies.
+    early = {"premium": RouteStats("premium", samples=2, cost_per_unit=3.0)}
+    assert _choose(stats=early, budget_left=2.0).route == "premium"
+
+
+def test_forecast_overshoot_steps_down():
+    decision = _choose(over_forecast=True)
+    assert decision.route == "balanced"
+
+
+@pytest.mark.asyncio
+async def test_recommend_route_uses_recorded_latency(router):
+    assert (await router.recommend_route({"quality": "high"}))["meta"]["route"] == "premium"
+    for _ in range(6):
+        await router.record_cost({"route": "premium", "units": 1, "latency_ms": 5000})
+        await router.record_cost({"route": "balanced", "units": 1, "latency_ms": 300})
+    res = await router.recommend_route({"quality": "high", "max_latency_ms": 1000})
+    assert res["meta"]["route"] == "balanced"
+    assert res["meta"]["stats"]["premium"]["latency_ms"] == pytest.approx(5000)
+
+
+@pytest.mark.asyncio
+async def test_recommend_route_defaults_budget_left_to_tenant_remaining(router):
+    await router.set_budget({"tenant": "tight", "monthly_usd": 1.1})
+    await router.record_cost({"tenant": "tight", "route": "cheap", "cost": 1.0})
+    res = await router.recommend_route({"quality": "high", "tenant": "tight"})
+    assert res["meta"]["route"] == "cheap"
+    assert res["meta"]["budget_left"] == pytest.approx(0.1)
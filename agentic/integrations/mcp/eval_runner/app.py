@@ -1,62 +1,249 @@
+"""eval_runner MCP server.
+
+``hp.eval.run_suite`` streams cases from inline ``cases`` or a JSONL
+``dataset_path``, runs them against a target with bounded parallelism,
+answers unchanged cases from a response cache keyed on (model, prompt
+hash), scores them in vectorized batches and stores the run under
+EVAL_RUNNER_DATA_DIR. ``hp.eval.regression_gate`` compares a run with a
+baseline rate or run using bootstrap confidence intervals.
+
+Targets (``target`` argument):
+  {"type": "static"}                                   score each case's ``actual`` (default)
+  {"type": "chat", "model": "persona:...", "system": "..."}  OpenAI-compatible chat endpoint
+  {"type": "mcp_tool", "url": "http://host:port", "tool": "hp.x.y", "input_key": "query"}
+"""
+
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
 import uuid
+from typing import Any, Optional
 
 from agentic.integrations.mcp._common.server import ToolDef, create_mcp_app
+from agentic.integrations.mcp.eval_runner import config
+from agentic.integrations.mcp.eval_runner.domain.executor import ChatTarget, McpToolTarget, StaticTarget, run_cases
+from agentic.integrations.mcp.eval_runner.domain.regression import bootstrap_ci, gate_against_rate, gate_against_run
+from agentic.integrations.mcp.eval_runner.domain.scoring import METRICS, score_cases
+from agentic.integrations.mcp.eval_runner.infra.baseline_store import BaselineStore
+from agentic.integrations.mcp.eval_runner.infra.dataset_loader import DatasetError, iter_inline, iter_jsonl, resolve_dataset
+from agentic.integrations.mcp.eval_runner.infra.report_store import ReportStore
+from agentic.integrations.mcp.eval_runner.infra.response_cache import ResponseCache
+
+# Case details returned inline by run_suite; hp.eval.report has them all.
+MAX_INLINE_DETAILS = 200
+
+
+class _Runtime:
+    def __init__(self) -> None:
+        root = config.data_dir()
+        self.cache = ResponseCache(root / "responses.sqlite3")
+        self.reports = ReportStore(root / "runs")
+        self.baselines = BaselineStore(root / "baselines.json")
+
+    def close(self) -> None:
+        self.cache.close()
+
+
+_runtime: Optional[_Runtime] = None
+_runtime_lock = threading.Lock()
+
+
+def runtime() -> _Runtime:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = _Runtime()
+        return _runtime
 
-_RUNS: dict[str, dict] = {}
+
+def shutdown() -> None:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is not None:
+            _runtime.close()
+        _runtime = None
+
+
+_reset_for_tests = shutdown
 
 
 def _content(text: str, **meta: object) -> dict:
     return {"content": [{"type": "text", "text": text}], "meta": meta}
 
 
+def _target(spec: Any):
+    spec = spec if isinstance(spec, dict) else {"type": str(spec or "static")}
+    kind = str(spec.get("type", "static"))
+    if kind == "static":
+        return StaticTarget()
+    if kind == "chat":
+        model = str(spec.get("model", "")).strip()
+        if not model:
+            raise ValueError("chat target needs a model")
+        return ChatTarget(
+            url=str(spec.get("url") or config.chat_url()),
+            model_name=model,
+            system=str(spec.get("system", "") or ""),
+            temperature=float(spec.get("temperature", 0.0) or 0.0),
+            api_key=config.api_key(),
+        )
+    if kind == "mcp_tool":
+        url, tool = str(spec.get("url", "")).strip(), str(spec.get("tool", "")).strip()
+        if not url or not tool:
+            raise ValueError("mcp_tool target needs url and tool")
+        return McpToolTarget(url=url, tool=tool, input_key=str(spec.get("input_key", "query")), arguments=spec.get("arguments") or None)
+    raise ValueError(f"unknown target type '{kind}'")
+
+
 async def run_suite(args: dict) -> dict:
     suite = str(args.get("suite", "default"))
-    cases = args.get("cases") or []
-    run_id = str(uuid.uuid4())
-    passed = 0
-    total = 0
-    details = []
-    for case in cases:
-        total += 1
-        expected = case.get("expected")
-        actual = case.get("actual")
-        ok = expected == actual
-        if ok:
-            passed += 1
-        details.append({"name": case.get("name", f"case-{total}"), "ok": ok})
-
-    pass_rate = (passed / total) if total else 1.0
-    run = {"run_id": run_id, "suite": suite, "total": total, "passed": passed, "pass_rate": pass_rate, "details": details}
-    _RUNS[run_id] = run
-    return _content(f"Run {run_id} completed with pass_rate={pass_rate:.2%}", ok=True, run=run)
+    metric = str(args.get("metric", "exact"))
+    if metric not in METRICS:
+        return _content(f"Unknown metric '{metric}'", ok=False, metrics=list(METRICS))
+    try:
+        target = _target(args.get("target"))
+    except ValueError as exc:
+        return _content(str(exc), ok=False)
+
+    dataset_path = str(args.get("dataset_path", "") or "").strip()
+    limit = int(args["limit"]) if args.get("limit") else None
+    if dataset_path:
+        try:
+            cases = iter_jsonl(resolve_dataset(dataset_path, config.dataset_dir()), limit=limit)
+        except DatasetError as exc:
+            return _content(str(exc), ok=False)
+    else:
+        inline = args.get("cases") or []
+        if not isinstance(inline, list) or len(inline) > config.MAX_INLINE_CASES:
+            return _content(f"cases must be a list of at most {config.MAX_INLINE_CASES} objects; use dataset_path", ok=False)
+        cases = iter_inline(inline[:limit] if limit else inline)
+
+    rt = runtime()
+    concurrency = max(1, min(int(args.get("concurrency", config.concurrency()) or 1), 64))
+    started = time.time()
+    try:
+        results = await run_cases(
+            cases,
+            target,
+            cache=rt.cache if args.get("use_cache", True) else None,
+            concurrency=concurrency,
+            timeout_s=config.case_timeout_s(),
+        )
+    except DatasetError as exc:
+        return _content(str(exc), ok=False)
+
+    case_list = [r.case for r in results]
+    scores = score_cases(case_list, [r.response for r in results], default_metric=metric)
+    for i, r in enumerate(results):
+        if r.error:
+            scores[i] = 0.0
+    threshold = float(args.get("pass_threshold", 0.5))
+    passed_mask = scores >= threshold
+    total = len(results)
+    ci = bootstrap_ci(passed_mask, samples=config.bootstrap_samples())
+    details = [
+        {
+            "id": r.case["id"],
+            "name": r.case.get("name", r.case["id"]),
+            "ok": bool(passed_mask[i]),
+            "score": round(float(scores[i]), 4),
+            "cached": r.cached,
+            "error": r.error,
+            "latency_ms": None if r.latency_ms is None else round(r.latency_ms, 1),
+        }
+        for i, r in enumerate(results)
+    ]
+    run = {
+        "run_id": str(uuid.uuid4()),
+        "suite": suite,
+        "target": target.model,
+        "metric": metric,
+        "total": total,
+        "passed": int(passed_mask.sum()),
+        "pass_rate": float(passed_mask.mean()) if total else 1.0,
+        "mean_score": float(scores.mean()) if total else 1.0,
+        "pass_rate_ci": [round(ci.low, 4), round(ci.high, 4)] if total else [1.0, 1.0],
+        "cache_hits": sum(r.cached for r in results),
+        "errors": sum(bool(r.error) for r in results),
+        "started_at": started,
+        "duration_s": round(time.time() - started, 3),
+        "details": details,
+    }
+    await asyncio.to_thread(rt.reports.put, run)
+    shown = dict(run, details=details[:MAX_INLINE_DETAILS])
+    return _content(
+        f"Run {run['run_id']} completed with pass_rate={run['pass_rate']:.2%} "
+        f"({run['cache_hits']} cached, {run['errors']} errors, {run['duration_s']}s)",
+        ok=True,
+        run=shown,
+    )
+
+
+async def _load_run(run_id: str) -> Optional[dict]:
+    return await asyncio.to_thread(runtime().reports.get, run_id) if run_id else None
 
 
 async def report(args: dict) -> dict:
     run_id = str(args.get("run_id", "")).strip()
-    run = _RUNS.get(run_id)
+    run = await _load_run(run_id)
     if not run:
         return _content("Run not found", ok=False, run_id=run_id)
     return _content(f"Suite={run['suite']} pass_rate={run['pass_rate']:.2%}", ok=True, run=run)
 
 
+async def set_baseline(args: dict) -> dict:
+    run_id = str(args.get("run_id", "")).strip()
+    run = await _load_run(run_id)
+    if not run:
+        return _content("Run not found", ok=False, run_id=run_id)
+    await asyncio.to_thread(runtime().baselines.set, run["suite"], run_id)
+    return _content(f"Baseline for {run['suite']} set to {run_id}", ok=True, suite=run["suite"], run_id=run_id)
+
+
 async def regression_gate(args: dict) -> dict:
     run_id = str(args.get("run_id", "")).strip()
-    baseline = float(args.get("baseline", 0.9))
-    run = _RUNS.get(run_id)
+    run = await _load_run(run_id)
     if not run:
         return _content("Run not found", ok=False, run_id=run_id)
-    passed = run["pass_rate"] >= baseline
-    return _content(f"Regression gate passed={passed}", ok=passed, run_id=run_id, baseline=baseline, pass_rate=run["pass_rate"])
+    kw = {"samples": config.bootstrap_samples(), "confidence": float(args.get("confidence", 0.95))}
+
+    baseline_run_id = str(args.get("baseline_run_id", "") or "").strip()
+    if args.get("baseline") is None and not baseline_run_id:
+        baseline_run_id = await asyncio.to_thread(runtime().baselines.get, run["suite"]) or ""
+
+    if baseline_run_id and baseline_run_id != run_id:
+        base = await _load_run(baseline_run_id)
+        if not base:
+            return _content("Baseline run not found", ok=False, run_id=run_id, baseline_run_id=baseline_run_id)
+        current = {d["id"]: d["score"] for d in run["details"]}
+        previous = {d["id"]: d["score"] for d in base["details"]}
+        result = gate_against_run(current, previous, tolerance=float(args.get("tolerance", 0.0)), **kw)
+        extra = {"baseline_run_id": baseline_run_id, "baseline_pass_rate": base["pass_rate"]}
+    else:
+        baseline = float(args["baseline"]) if args.get("baseline") is not None else 0.9
+        result = gate_against_rate([1.0 if d["ok"] else 0.0 for d in run["details"]], baseline, **kw)
+        extra = {"baseline": baseline}
+
+    return _content(
+        f"Regression gate passed={result.passed} ({result.verdict}: {result.detail})",
+        ok=result.passed,
+        run_id=run_id,
+        pass_rate=run["pass_rate"],
+        **extra,
+        **result.to_dict(),
+    )
 
 
 def register_tools() -> list[ToolDef]:
     return [
-        ToolDef("hp.eval.run_suite", "Run eval suite", {"type": "object", "properties": {"suite": {"type": "string"}, "cases": {"type": "array", "items": {"type": "object"}}}}, run_suite),
+        ToolDef("hp.eval.run_suite", "Run eval suite", {"type": "object", "properties": {"suite": {"type": "string"}, "cases": {"type": "array", "items": {"type": "object"}}, "dataset_path": {"type": "string"}, "target": {"type": "object"}, "metric": {"type": "string", "enum": list(METRICS)}, "pass_threshold": {"type": "number"}, "concurrency": {"type": "integer"}, "use_cache": {"type": "boolean"}, "limit": {"type": "integer"}}}, run_suite),
         ToolDef("hp.eval.report", "Get run report", {"type": "object", "properties": {"run_id": {"type": "string"}}, "required": ["run_id"]}, report),
-        ToolDef("hp.eval.regression_gate", "Compare with baseline", {"type": "object", "properties": {"run_id": {"type": "string"}, "baseline": {"type": "number"}}, "required": ["run_id"]}, regression_gate),
+        ToolDef("hp.eval.set_baseline", "Use a run as its suite's baseline", {"type": "object", "properties": {"run_id": {"type": "string"}}, "required": ["run_id"]}, set_baseline),
+        ToolDef("hp.eval.regression_gate", "Compare with baseline", {"type": "object", "properties": {"run_id": {"type": "string"}, "baseline": {"type": "number"}, "baseline_run_id": {"type": "string"}, "tolerance": {"type": "number"}, "confidence": {"type": "number"}}, "required": ["run_id"]}, regression_gate),
     ]
 
 
 app = create_mcp_app(server_name="mcp-eval-runner", tools=register_tools())
+app.router.add_event_handler("shutdown", shutdown)
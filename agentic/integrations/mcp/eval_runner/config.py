@@ -1,6 +1,45 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
 
 LOG_LEVEL = os.getenv('EVAL_RUNNER_LOG_LEVEL', 'INFO')
 SERVICE_NAME = os.getenv('EVAL_RUNNER_SERVICE_NAME', 'mcp-eval-runner')
+
+
+def data_dir() -> Path:
+    """Runs, baselines and the response cache live here."""
+    raw = os.getenv('EVAL_RUNNER_DATA_DIR', '').strip()
+    return Path(raw) if raw else Path.home() / '.homepilot' / 'eval_runner'
+
+
+def dataset_dir() -> Path:
+    """``dataset_path`` arguments must resolve inside this directory."""
+    raw = os.getenv('EVAL_RUNNER_DATASET_DIR', '').strip()
+    return Path(raw) if raw else data_dir() / 'datasets'
+
+
+def chat_url() -> str:
+    """OpenAI-compatible chat endpoint used by ``chat`` targets (the backend's persona API by default)."""
+    base = os.getenv('BACKEND_BASE_URL', 'http://localhost:8000').rstrip('/')
+    return os.getenv('EVAL_RUNNER_CHAT_URL', f'{base}/v1/chat/completions')
+
+
+def api_key() -> str:
+    return os.getenv('EVAL_RUNNER_API_KEY', '')
+
+
+def concurrency() -> int:
+    return max(1, int(os.getenv('EVAL_RUNNER_CONCURRENCY', '8')))
+
+
+def case_timeout_s() -> float:
+    return float(os.getenv('EVAL_RUNNER_CASE_TIMEOUT_S', '120'))
+
+
+def bootstrap_samples() -> int:
+    return max(100, int(os.getenv('EVAL_RUNNER_BOOTSTRAP_SAMPLES', '2000')))
+
+
+# Largest inline ``cases`` list accepted; bigger suites go through dataset_path.
+MAX_INLINE_CASES = 5000
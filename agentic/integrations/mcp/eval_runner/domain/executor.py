@@ -1,5 +1,208 @@
+"""Concurrent case execution against an eval target.
+
+Targets:
+
+* ``static``   — the case carries its own ``actual`` (scoring only);
+* ``chat``     — an OpenAI-compatible chat endpoint (the backend's
+  ``/v1/chat/completions`` by default, where ``model`` names a persona);
+* ``mcp_tool`` — a tool on any MCP server, called over JSON-RPC.
+
+Cases are pulled from the (streaming) dataset as slots free up, so at most
+``concurrency`` calls are in flight and only those cases are held pending.
+For remote targets the response cache is consulted per batch first; only
+misses reach the target, and successful answers are written back.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Union
+
+import httpx
+
+from agentic.integrations.mcp.eval_runner.infra.response_cache import ResponseCache, prompt_hash
+
+# Cases are looked up in the cache this many at a time.
+CACHE_BATCH = 256
+
+
+@dataclass
+class CaseResult:
+    index: int
+    case: dict
+    response: Any = None
+    cached: bool = False
+    error: str = ""
+    latency_ms: Optional[float] = None
+
+
+class RemoteTarget(Protocol):
+    kind: str
+    model: str  # cache namespace: endpoint and what is called there
+
+    def prompt_of(self, case: dict) -> Any: ...
+
+    async def call(self, client: httpx.AsyncClient, prompt: Any) -> str: ...
+
+
+def _messages(case: dict, system: str) -> List[dict]:
+    raw = case.get("input", case.get("prompt", ""))
+    messages = list(raw) if isinstance(raw, list) else [{"role": "user", "content": str(raw)}]
+    if system and not any(m.get("role") == "system" for m in messages):
+        messages.insert(0, {"role": "system", "content": system})
+    return messages
+
+
+@dataclass
+class ChatTarget:
+    url: str
+    model_name: str
+    system: str = ""
+    temperature: float = 0.0
+    api_key: str = ""
+    kind: str = "chat"
+
+    @property
+    def model(self) -> str:
+        return f"chat:{self.url}#{self.model_name}"
+
+    def prompt_of(self, case: dict) -> Any:
+        return {"messages": _messages(case, self.system), "temperature": self.temperature}
+
+    async def call(self, client: httpx.AsyncClient, prompt: Any) -> str:
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        resp = await client.post(self.url, json={"model": self.model_name, **prompt}, headers=headers)
+        resp.raise_for_status()
+        data = resp.json()
+        return str(data["choices"][0]["message"]["content"] or "")
+
+
+@dataclass
+class McpToolTarget:
+    url: str
+    tool: str
+    input_key: str = "query"
+    arguments: Optional[Dict[str, Any]] = None
+    kind: str = "mcp_tool"
+
+    @property
+    def model(self) -> str:
+        return f"mcp:{self.url}#{self.tool}"
+
+    def prompt_of(self, case: dict) -> Any:
+        args = dict(self.arguments or {})
+        args.update(case.get("arguments") or {})
+        if self.input_key and self.input_key not in args:
+            args[self.input_key] = case.get("input", case.get("prompt", ""))
+        return args
+
+    async def call(self, client: httpx.AsyncClient, prompt: Any) -> str:
+        body = {"jsonrpc": "2.0", "id": "eval", "method": "tools/call", "params": {"name": self.tool, "arguments": prompt}}
+        resp = await client.post(self.url.rstrip("/") + "/rpc", json=body)
+        resp.raise_for_status()
+        data = resp.json()
+        if "error" in data:
+            raise RuntimeError(str(data["error"].get("message", data["error"])))
+        content = (data.get("result") or {}).get("content") or []
+        return "\n".join(str(c.get("text", "")) for c in content if c.get("type") == "text")
+
+
+@dataclass
+class StaticTarget:
+    """Scores the ``actual`` each case carries; nothing is called."""
+
+    kind: str = "static"
+    model: str = "static"
+
+
+Target = Union[StaticTarget, RemoteTarget]
+
+
+def _batches(cases: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch: List[dict] = []
+    for case in cases:
+        batch.append(case)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def run_cases(
+    cases: Iterable[dict],
+    target: Target,
+    *,
+    cache: Optional[ResponseCache],
+    concurrency: int,
+    timeout_s: float,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[CaseResult]:
+    """Run every case; results come back in dataset order."""
+    if isinstance(target, StaticTarget):
+        return [CaseResult(i, case, case.get("actual")) for i, case in enumerate(cases)]
+    return await _run_remote(cases, target, cache=cache, concurrency=concurrency, timeout_s=timeout_s, client=client)
+
+
+async def _run_remote(
+    cases: Iterable[dict],
+    target: RemoteTarget,
+    *,
+    cache: Optional[ResponseCache],
+    concurrency: int,
+    timeout_s: float,
+    client: Optional[httpx.AsyncClient],
+) -> List[CaseResult]:
+    own_client = client is None
+    if client is None:
+        client = httpx.AsyncClient(timeout=timeout_s, limits=httpx.Limits(max_connections=concurrency))
+    results: List[CaseResult] = []
+    slots = asyncio.Semaphore(concurrency)
+    fresh: List[tuple[str, str, Optional[float]]] = []
+
+    async def one(result: CaseResult, prompt: Any, key: str) -> None:
+        try:
+            started = time.perf_counter()
+            result.response = await asyncio.wait_for(target.call(client, prompt), timeout_s)
+            result.latency_ms = (time.perf_counter() - started) * 1000
+            fresh.append((key, result.response, result.latency_ms))
+        except Exception as exc:  # noqa: BLE001 - a failed case scores 0, the run goes on
+            result.error = f"{type(exc).__name__}: {exc}"[:300]
+        finally:
+            slots.release()
+
+    tasks: List[asyncio.Task] = []
+    index = 0
+    try:
+        for batch in _batches(cases, CACHE_BATCH):
+            prompts = [target.prompt_of(case) for case in batch]
+            keys = [prompt_hash(p) for p in prompts]
+            hits = await asyncio.to_thread(cache.get_many, target.model, keys) if cache else {}
+            for case, prompt, key in zip(batch, prompts, keys):
+                result = CaseResult(index, case)
+                index += 1
+                results.append(result)
+                if key in hits:
+                    result.response, result.latency_ms = hits[key]
+                    result.cached = True
+                    continue
+                await slots.acquire()
+                tasks.append(asyncio.create_task(one(result, prompt, key)))
+            tasks = [t for t in tasks if not t.done()]
+            if cache and fresh:
+                written = fresh[:]
+                del fresh[:]
+                await asyncio.to_thread(cache.put_many, target.model, written)
+        await asyncio.gather(*tasks)
+        if cache and fresh:
+            await asyncio.to_thread(cache.put_many, target.model, fresh)
+    finally:
+        pending = [t for t in tasks if not t.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if own_client:
+            await client.aclose()
+    return results
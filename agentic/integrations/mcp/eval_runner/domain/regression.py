@@ -1,5 +1,99 @@
+"""Bootstrap confidence intervals and the regression gate.
+
+A pass rate measured on a few hundred cases moves by several points from
+noise alone, so the gate decides on intervals rather than point estimates:
+
+* against a fixed ``baseline`` rate, the run fails only when the upper end
+  of its interval is below the baseline (a drop we are confident about);
+* against a baseline *run*, cases are paired by id and the interval of the
+  mean per-case difference must not lie entirely below ``-tolerance``.
+
+Resampling is vectorized: each chunk of bootstrap replicates is a single
+index matrix, so 2000 replicates over thousands of cases take milliseconds.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# Replicates resampled per chunk, bounding the index matrix to ~8M entries.
+_MAX_CELLS = 8_000_000
+
+
+@dataclass
+class Interval:
+    mean: float
+    low: float
+    high: float
+    n: int
+
+    def to_dict(self) -> dict:
+        return {"mean": round(self.mean, 4), "low": round(self.low, 4), "high": round(self.high, 4), "n": self.n}
+
+
+def bootstrap_means(values: np.ndarray, samples: int, rng: np.random.Generator) -> np.ndarray:
+    n = len(values)
+    out = np.empty(samples, dtype=np.float64)
+    chunk = max(1, _MAX_CELLS // max(n, 1))
+    for start in range(0, samples, chunk):
+        stop = min(samples, start + chunk)
+        idx = rng.integers(0, n, size=(stop - start, n))
+        out[start:stop] = values[idx].mean(axis=1)
+    return out
+
+
+def bootstrap_ci(values, *, samples: int = 2000, confidence: float = 0.95, seed: Optional[int] = 0) -> Interval:
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.size == 0:
+        return Interval(0.0, 0.0, 0.0, 0)
+    if arr.size == 1 or np.all(arr == arr[0]):
+        m = float(arr.mean())
+        return Interval(m, m, m, int(arr.size))
+    means = bootstrap_means(arr, samples, np.random.default_rng(seed))
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(means, [tail, 100 - tail])
+    return Interval(float(arr.mean()), float(low), float(high), int(arr.size))
+
+
+@dataclass
+class GateResult:
+    passed: bool
+    verdict: str  # "pass", "inconclusive" or "regression"
+    interval: Interval
+    reference: float
+    detail: str
+
+    def to_dict(self) -> dict:
+        return {
+            "passed": self.passed,
+            "verdict": self.verdict,
+            "interval": self.interval.to_dict(),
+            "reference": round(self.reference, 4),
+            "detail": self.detail,
+        }
+
+
+def gate_against_rate(scores, baseline: float, **kw) -> GateResult:
+    ci = bootstrap_ci(scores, **kw)
+    if ci.high < baseline:
+        return GateResult(False, "regression", ci, baseline, f"upper bound {ci.high:.3f} < baseline {baseline:.3f}")
+    if ci.mean < baseline:
+        return GateResult(True, "inconclusive", ci, baseline, f"mean {ci.mean:.3f} below baseline but within noise")
+    return GateResult(True, "pass", ci, baseline, f"mean {ci.mean:.3f} >= baseline {baseline:.3f}")
+
+
+def gate_against_run(current: dict, baseline: dict, *, tolerance: float = 0.0, **kw) -> GateResult:
+    """``current``/``baseline``: case id -> score. Only cases present in both are compared."""
+    shared = sorted(set(current) & set(baseline))
+    diffs = np.array([current[k] - baseline[k] for k in shared], dtype=np.float64)
+    ci = bootstrap_ci(diffs, **kw)
+    if not shared:
+        return GateResult(False, "regression", ci, -tolerance, "no cases in common with the baseline run")
+    if ci.high < -tolerance:
+        return GateResult(False, "regression", ci, -tolerance, f"score change {ci.mean:+.3f} (CI {ci.low:+.3f}..{ci.high:+.3f}) is a drop")
+    if ci.mean < -tolerance:
+        return GateResult(True, "inconclusive", ci, -tolerance, f"score change {ci.mean:+.3f} within noise")
+    return GateResult(True, "pass", ci, -tolerance, f"score change {ci.mean:+.3f} over {len(shared)} paired cases")
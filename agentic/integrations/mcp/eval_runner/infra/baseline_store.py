@@ -1,5 +1,33 @@
+"""Named baselines: the run each suite's regression gate compares against."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class BaselineStore:
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, str]:
+        if not self.path.exists():
+            return {}
+        return json.loads(self.path.read_text(encoding="utf-8"))
+
+    def get(self, suite: str) -> Optional[str]:
+        with self._lock:
+            return self._read().get(suite)
+
+    def set(self, suite: str, run_id: str) -> None:
+        with self._lock:
+            data = self._read()
+            data[suite] = run_id
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
@@ -1,5 +1,62 @@
+"""Streaming dataset loading.
+
+Datasets are JSONL, one case per line::
+
+    {"id": "greet-1", "input": "Say hi", "expected": "hi", "metric": "contains"}
+
+``input`` may be a string (sent as the user message) or a list of chat
+messages. Cases are yielded as the file is read, so a suite of any size is
+never held in memory at once.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import json
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+
+class DatasetError(ValueError):
+    pass
+
+
+def resolve_dataset(path: str, root: Path) -> Path:
+    """``path`` (absolute or relative to ``root``), refusing anything outside ``root``."""
+    root = root.resolve()
+    candidate = (root / path).resolve()
+    if candidate != root and root not in candidate.parents:
+        raise DatasetError(f"dataset_path must be inside {root}")
+    if not candidate.is_file():
+        raise DatasetError(f"dataset not found: {path}")
+    return candidate
+
+
+def _normalize(case: dict, index: int) -> dict:
+    if not isinstance(case, dict):
+        raise DatasetError(f"case {index} is not an object")
+    case = dict(case)
+    case.setdefault("id", str(case.get("name") or f"case-{index + 1}"))
+    case["id"] = str(case["id"])
+    return case
+
+
+def iter_jsonl(path: Path, *, limit: Optional[int] = None) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as fh:
+        index = 0
+        for line_no, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line or line.startswith("//"):
+                continue
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise DatasetError(f"{path.name}:{line_no}: {exc.msg}") from exc
+            yield _normalize(raw, index)
+            index += 1
+            if limit is not None and index >= limit:
+                return
+
+
+def iter_inline(cases: Iterable[dict]) -> Iterator[dict]:
+    for index, case in enumerate(cases):
+        yield _normalize(case, index)
@@ -1,5 +1,34 @@
+"""Run reports, one JSON file per run."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import json
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+_RUN_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class ReportStore:
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, run_id: str) -> Optional[Path]:
+        return self.root / f"{run_id}.json" if _RUN_ID.match(run_id) else None
+
+    def put(self, run: dict) -> None:
+        path = self._path(run["run_id"])
+        if path is None:
+            raise ValueError(f"invalid run id {run['run_id']!r}")
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(run), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def get(self, run_id: str) -> Optional[dict]:
+        path = self._path(run_id)
+        if path is None or not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
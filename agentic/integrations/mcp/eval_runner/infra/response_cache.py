@@ -0,0 +1,73 @@
+"""Response cache keyed on (model, prompt hash).
+
+A rerun of a suite only calls the target for cases whose prompt, target
+settings or model changed; everything else is answered from here.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    model       TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    response    TEXT NOT NULL,
+    latency_ms  REAL,
+    created_at  REAL NOT NULL,
+    PRIMARY KEY (model, prompt_hash)
+) WITHOUT ROWID;
+"""
+
+
+def prompt_hash(payload: Any) -> str:
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, tuple[str, Optional[float]]]:
+        keys = list(dict.fromkeys(hashes))
+        out: Dict[str, tuple[str, Optional[float]]] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT prompt_hash, response, latency_ms FROM responses WHERE model = ? AND prompt_hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                )
+                out.update({h: (r, lat) for h, r, lat in rows})
+        return out
+
+    def put_many(self, model: str, items: Iterable[tuple[str, str, Optional[float]]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO responses (model, prompt_hash, response, latency_ms, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(model, h, response, latency, now) for h, response, latency in items],
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
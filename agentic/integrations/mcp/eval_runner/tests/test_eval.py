@@ -1,2 +1,150 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from agentic.integrations.mcp._common.server import ToolDef, create_mcp_app
+from agentic.integrations.mcp.eval_runner import app as server
+from agentic.integrations.mcp.eval_runner.domain.executor import ChatTarget, McpToolTarget, run_cases
+from agentic.integrations.mcp.eval_runner.domain.scoring import score_cases
+from agentic.integrations.mcp.eval_runner.infra.dataset_loader import iter_inline
+from agentic.integrations.mcp.eval_runner.infra.response_cache import ResponseCache
+
+
+@pytest.fixture()
+def runner(tmp_path, monkeypatch):
+    monkeypatch.setenv("EVAL_RUNNER_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv("EVAL_RUNNER_DATASET_DIR", str(tmp_path / "datasets"))
+    (tmp_path / "datasets").mkdir()
+    server._reset_for_tests()
+    yield server
+    server._reset_for_tests()
+
+
+class _EchoServer:
+    """A real MCP app whose tool upper-cases its query, tracking concurrency."""
+
+    def __init__(self, delay_s: float = 0.02):
+        self.calls = 0
+        self.inflight = 0
+        self.peak = 0
+        self.delay_s = delay_s
+
+        async def echo(args: dict) -> dict:
+            self.calls += 1
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+            await asyncio.sleep(self.delay_s)
+            self.inflight -= 1
+            if args.get("query") == "boom":
+                raise RuntimeError("boom")
+            return {"content": [{"type": "text", "text": str(args.get("query", "")).upper()}]}
+
+        self.app = create_mcp_app(server_name="echo", tools=[ToolDef("hp.test.echo", "echo", {"type": "object"}, echo)])
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://echo")
+
+
+def test_scoring_metrics():
+    cases = [
+        {"expected": "Paris", "metric": "exact"},
+        {"expected": "paris", "metric": "contains"},
+        {"expected": 42, "metric": "numeric"},
+        {"expected": "the quick brown fox", "metric": "f1"},
+        {"expected": {"a": 1}},
+    ]
+    responses = [" paris ", "The capital is Paris.", "It is 42.0", "quick brown dog", {"a": 1}]
+    scores = score_cases(cases, responses)
+    assert scores.tolist()[:3] == [1.0, 1.0, 1.0]
+    assert scores[3] == pytest.approx(2 * (2 / 3) * (2 / 4) / (2 / 3 + 2 / 4))
+    assert scores[4] == 1.0
+
+
+def test_numeric_tolerance_is_per_case():
+    loose = {"expected": 100, "metric": "numeric", "tolerance": 0.5}
+    strict = {"expected": 100, "metric": "numeric"}
+    assert score_cases([loose, strict], ["100", "140"]).tolist() == [1.0, 0.0]
+    assert score_cases([strict, loose], ["140", "140"]).tolist() == [0.0, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_static_suite_keeps_inline_cases_working(runner):
+    res = await runner.run_suite({"cases": [{"expected": 1, "actual": 1}, {"name": "miss", "expected": "a", "actual": "b"}]})
+    run = res["meta"]["run"]
+    assert run["total"] == 2 and run["passed"] == 1
+    assert [d["name"] for d in run["details"]] == ["case-1", "miss"]
+
+
+@pytest.mark.asyncio
+async def test_executor_bounds_parallelism_and_caches(tmp_path):
+    echo = _EchoServer()
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    target = McpToolTarget(url="http://echo", tool="hp.test.echo")
+    cases = [{"id": f"c{i}", "input": f"q{i}"} for i in range(20)] + [{"id": "bad", "input": "boom"}]
+
+    async with echo.client() as client:
+        first = await run_cases(iter_inline(cases), target, cache=cache, concurrency=4, timeout_s=5, client=client)
+        assert echo.peak == 4
+        assert [r.response for r in first[:2]] == ["Q0", "Q1"]
+        assert first[-1].error.startswith("RuntimeError")
+
+        cases[3]["input"] = "changed"
+        second = await run_cases(iter_inline(cases), target, cache=cache, concurrency=4, timeout_s=5, client=client)
+    # Only the changed case and the failed one are evaluated again.
+    assert echo.calls == 21 + 2
+    assert sum(r.cached for r in second) == 19
+    assert second[3].response == "CHANGED" and not second[3].cached
+
+
+@pytest.mark.asyncio
+async def test_chat_cache_is_per_endpoint(tmp_path):
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.host)
+        return httpx.Response(200, json={"choices": [{"message": {"content": request.url.host}}]})
+
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    cases = [{"id": "a", "input": "hi"}]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        for host in ("one", "two", "one"):
+            target = ChatTarget(url=f"http://{host}/v1/chat/completions", model_name="persona")
+            [res] = await run_cases(iter_inline(cases), target, cache=cache, concurrency=1, timeout_s=5, client=client)
+            assert res.response == host
+    assert seen == ["one", "two"]
+
+
+@pytest.mark.asyncio
+async def test_dataset_streaming_from_jsonl(runner, tmp_path):
+    path = tmp_path / "datasets" / "suite.jsonl"
+    with open(path, "w", encoding="utf-8") as fh:
+        for i in range(300):
+            fh.write(json.dumps({"id": f"n{i}", "expected": str(i), "actual": str(i if i % 10 else -1)}) + "\n")
+        fh.write("\n")
+    res = await runner.run_suite({"suite": "numbers", "dataset_path": "suite.jsonl"})
+    run = res["meta"]["run"]
+    assert run["total"] == 300
+    assert run["pass_rate"] == pytest.approx(0.9)
+    low, high = run["pass_rate_ci"]
+    assert low < 0.9 < high
+
+    limited = await runner.run_suite({"dataset_path": "suite.jsonl", "limit": 5})
+    assert limited["meta"]["run"]["total"] == 5
+
+    escaped = await runner.run_suite({"dataset_path": "../data/x.jsonl"})
+    assert escaped["meta"]["ok"] is False
+
+    (tmp_path / "datasets" / "broken.jsonl").write_text('{"id": 1}\n{oops\n')
+    broken = await runner.run_suite({"dataset_path": "broken.jsonl"})
+    assert "broken.jsonl:2" in broken["content"][0]["text"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_target_and_metric(runner):
+    assert (await runner.run_suite({"target": {"type": "nope"}}))["meta"]["ok"] is False
+    assert (await runner.run_suite({"metric": "bleu"}))["meta"]["ok"] is False
+    assert (await runner.run_suite({"target": {"type": "chat"}}))["meta"]["ok"] is False
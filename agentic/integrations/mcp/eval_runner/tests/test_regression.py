@@ -1,2 +1,60 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from agentic.integrations.mcp.eval_runner import app as server
+from agentic.integrations.mcp.eval_runner.domain.regression import bootstrap_ci, gate_against_rate, gate_against_run
+
+
+@pytest.fixture()
+def runner(tmp_path, monkeypatch):
+    monkeypatch.setenv("EVAL_RUNNER_DATA_DIR", str(tmp_path))
+    server._reset_for_tests()
+    yield server
+    server._reset_for_tests()
+
+
+def test_bootstrap_interval_narrows_with_more_cases():
+    small = bootstrap_ci([1] * 45 + [0] * 5)
+    large = bootstrap_ci([1] * 4500 + [0] * 500)
+    assert small.low < 0.9 < small.high
+    assert large.high - large.low < small.high - small.low
+    assert bootstrap_ci([1, 1, 1]).low == 1.0
+    assert bootstrap_ci([]).n == 0
+
+
+def test_gate_against_rate_verdicts():
+    assert gate_against_rate([1] * 88 + [0] * 12, 0.9).verdict == "inconclusive"
+    assert gate_against_rate([1] * 60 + [0] * 40, 0.9).verdict == "regression"
+    assert gate_against_rate([1] * 95 + [0] * 5, 0.9).verdict == "pass"
+
+
+def test_gate_against_run_is_paired():
+    rng = np.random.default_rng(1)
+    base = {f"c{i}": float(v) for i, v in enumerate(rng.random(400) < 0.8)}
+    same = dict(base)
+    worse = {k: (0.0 if i % 5 == 0 else v) for i, (k, v) in enumerate(base.items())}
+    assert gate_against_run(same, base).verdict == "pass"
+    result = gate_against_run(worse, base)
+    assert result.verdict == "regression" and not result.passed
+    assert gate_against_run(worse, base, tolerance=0.5).passed
+    assert gate_against_run({"x": 1.0}, base).verdict == "regression"
+
+
+@pytest.mark.asyncio
+async def test_regression_gate_tool(runner):
+    good = [{"id": f"c{i}", "expected": 1, "actual": 1} for i in range(100)]
+    bad = [{"id": f"c{i}", "expected": 1, "actual": 1 if i % 3 else 0} for i in range(100)]
+    base_run = (await runner.run_suite({"suite": "s", "cases": good}))["meta"]["run"]["run_id"]
+    bad_run = (await runner.run_suite({"suite": "s", "cases": bad}))["meta"]["run"]["run_id"]
+
+    vs_rate = await runner.regression_gate({"run_id": bad_run, "baseline": 0.9})
+    assert vs_rate["meta"]["ok"] is False and vs_rate["meta"]["verdict"] == "regression"
+
+    assert (await runner.set_baseline({"run_id": base_run}))["meta"]["ok"]
+    vs_baseline = await runner.regression_gate({"run_id": bad_run})
+    assert vs_baseline["meta"]["baseline_run_id"] == base_run
+    assert vs_baseline["meta"]["ok"] is False
+    assert (await runner.regression_gate({"run_id": base_run}))["meta"]["ok"] is True
+    assert (await runner.regression_gate({"run_id": "missing"}))["meta"]["ok"] is False
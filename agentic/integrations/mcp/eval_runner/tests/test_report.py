@@ -1,2 +1,32 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import pytest
+
+from agentic.integrations.mcp.eval_runner import app as server
+
+
+@pytest.fixture()
+def runner(tmp_path, monkeypatch):
+    monkeypatch.setenv("EVAL_RUNNER_DATA_DIR", str(tmp_path))
+    server._reset_for_tests()
+    yield server
+    server._reset_for_tests()
+
+
+@pytest.mark.asyncio
+async def test_report_survives_restart(runner):
+    cases = [{"id": f"c{i}", "expected": "x", "actual": "x"} for i in range(250)]
+    res = await runner.run_suite({"suite": "big", "cases": cases})
+    run = res["meta"]["run"]
+    assert len(run["details"]) == server.MAX_INLINE_DETAILS
+
+    runner._reset_for_tests()
+    stored = await runner.report({"run_id": run["run_id"]})
+    assert stored["meta"]["run"]["suite"] == "big"
+    assert len(stored["meta"]["run"]["details"]) == 250
+
+
+@pytest.mark.asyncio
+async def test_report_rejects_bad_ids(runner):
+    assert (await runner.report({"run_id": "../../etc/passwd"}))["meta"]["ok"] is False
+    assert (await runner.report({"run_id": ""}))["meta"]["ok"] is False
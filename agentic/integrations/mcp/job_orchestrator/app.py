@@ -1,47 +1,210 @@
+"""job_orchestrator MCP server.
+
+Jobs are persisted in a SQLite queue under JOB_ORCHESTRATOR_DATA_DIR and run
+by a background asyncio worker pool, so an agent can submit a long render or
+research task and poll for it instead of holding the MCP request open.
+
+Tools:
+  hp.jobs.submit  enqueue a job (priority, delay_s, max_attempts)
+  hp.jobs.status  status and progress; ``wait_s`` long-polls for a change
+  hp.jobs.result  result of a completed job
+  hp.jobs.cancel  cancel a queued or running job
+  hp.jobs.list    recent jobs, optionally filtered by status/task
+
+Progress is also streamed as server-sent events from ``GET /jobs/{job_id}/events``.
+"""
+
 from __future__ import annotations
 
-import uuid
+import asyncio
+import json
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi.responses import StreamingResponse
 
 from agentic.integrations.mcp._common.server import ToolDef, create_mcp_app
+from agentic.integrations.mcp.job_orchestrator import config
+from agentic.integrations.mcp.job_orchestrator.domain.executor import known_tasks
+from agentic.integrations.mcp.job_orchestrator.domain.lifecycle import COMPLETED, is_terminal
+from agentic.integrations.mcp.job_orchestrator.infra.queue import JobQueue
+from agentic.integrations.mcp.job_orchestrator.infra.result_store import ResultStore
+from agentic.integrations.mcp.job_orchestrator.infra.state_store import StateStore
+from agentic.integrations.mcp.job_orchestrator.infra.worker import WorkerPool
+
+WATCH_INTERVAL_S = 0.25
+MAX_WAIT_S = 30.0
+
+
+class _Runtime:
+    def __init__(self) -> None:
+        root = config.data_dir()
+        self.store = StateStore(root / "jobs.sqlite3")
+        self.queue = JobQueue(self.store, lease_s=config.lease_s())
+        self.results = ResultStore(root / "results")
+        self.pool = WorkerPool(
+            self.queue, self.results,
+            workers=config.workers(), limits=config.task_limits(), retention_s=config.retention_s(),
+        )
+        self.pool.start()
+
+    def close(self) -> None:
+        self.pool.stop()
+        self.store.close()
+
+
+_runtime: Optional[_Runtime] = None
+_runtime_lock = threading.Lock()
+
+
+def runtime() -> _Runtime:
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = _Runtime()
+        return _runtime
+
+
+def shutdown() -> None:
+    """Stop the worker pool; interrupted jobs are re-queued on the next start."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is not None:
+            _runtime.close()
+        _runtime = None
 
-_JOBS: dict[str, dict] = {}
+
+_reset_for_tests = shutdown
 
 
 def _content(text: str, **meta: object) -> dict:
     return {"content": [{"type": "text", "text": text}], "meta": meta}
 
 
+def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: v for k, v in job.items() if k not in ("payload", "result_ref")}
+    out["job_id"] = out.pop("id")
+    return out
+
+
+async def _watch(job_id: str, *, timeout_s: float) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the job whenever its status/progress changes, until terminal or timeout."""
+    rt = runtime()
+    deadline = time.monotonic() + timeout_s
+    last = None
+    while True:
+        job = await asyncio.to_thread(rt.store.get, job_id)
+        if job is None:
+            return
+        key = (job["status"], job["progress"], job["message"], job["attempts"])
+        if key != last:
+            last = key
+            yield job
+        if is_terminal(job["status"]) or time.monotonic() >= deadline:
+            return
+        await asyncio.sleep(WATCH_INTERVAL_S)
+
+
 async def submit(args: dict) -> dict:
-    job_id = str(uuid.uuid4())
-    task = str(args.get("task", "task"))
+    task = str(args.get("task", "")).strip()
+    if task not in known_tasks():
+        return _content(f"Unknown task type '{task}'", ok=False, task=task, known_tasks=known_tasks())
     payload = args.get("payload") or {}
-    result = {"echo": payload, "task": task}
-    _JOBS[job_id] = {"job_id": job_id, "status": "completed", "task": task, "result": result}
-    return _content(f"Job submitted {job_id}", ok=True, job_id=job_id, status="completed")
+    if not isinstance(payload, dict):
+        return _content("payload must be an object", ok=False)
+    rt = runtime()
+    job = await asyncio.to_thread(
+        rt.queue.enqueue,
+        task,
+        payload,
+        priority=int(args.get("priority", 0) or 0),
+        delay_s=float(args.get("delay_s", 0) or 0),
+        max_attempts=max(1, int(args.get("max_attempts", config.max_attempts()) or 1)),
+    )
+    rt.pool.wake()
+    return _content(f"Job submitted {job['id']}", ok=True, job_id=job["id"], status=job["status"])
 
 
 async def status(args: dict) -> dict:
     job_id = str(args.get("job_id", "")).strip()
-    job = _JOBS.get(job_id)
+    wait_s = max(0.0, min(float(args.get("wait_s", 0) or 0), MAX_WAIT_S))
+    job = await asyncio.to_thread(runtime().store.get, job_id)
     if not job:
         return _content("Job not found", ok=False, job_id=job_id)
-    return _content(f"Job {job_id} status={job['status']}", ok=True, job_id=job_id, status=job["status"])
+    if wait_s and not is_terminal(job["status"]):
+        # Long-poll: return on the first change after the current state.
+        seen = 0
+        async for update in _watch(job_id, timeout_s=wait_s):
+            job = update
+            seen += 1
+            if seen > 1:
+                break
+    info = _public(job)
+    return _content(
+        f"Job {job_id} status={job['status']} progress={job['progress']:.0%}",
+        ok=True,
+        **info,
+    )
 
 
 async def result(args: dict) -> dict:
     job_id = str(args.get("job_id", "")).strip()
-    job = _JOBS.get(job_id)
+    rt = runtime()
+    job = await asyncio.to_thread(rt.store.get, job_id)
     if not job:
         return _content("Job not found", ok=False, job_id=job_id)
-    return _content("Job result ready", ok=True, job_id=job_id, result=job["result"])
+    if job["status"] != COMPLETED:
+        return _content(f"Job {job_id} is {job['status']}", ok=False, job_id=job_id, status=job["status"], error=job["error"])
+    value = await asyncio.to_thread(rt.results.get, job["result_ref"])
+    return _content("Job result ready", ok=True, job_id=job_id, result=value)
+
+
+async def cancel(args: dict) -> dict:
+    job_id = str(args.get("job_id", "")).strip()
+    rt = runtime()
+    previous = await asyncio.to_thread(rt.queue.cancel, job_id)
+    if previous is None:
+        job = await asyncio.to_thread(rt.store.get, job_id)
+        if not job:
+            return _content("Job not found", ok=False, job_id=job_id)
+        return _content(f"Job {job_id} already {job['status']}", ok=False, job_id=job_id, status=job["status"])
+    rt.pool.cancel(job_id)
+    return _content(f"Job {job_id} cancelled", ok=True, job_id=job_id, status="cancelled", previous_status=previous)
+
+
+async def list_jobs(args: dict) -> dict:
+    limit = max(1, min(int(args.get("limit", 50) or 50), 500))
+    rt = runtime()
+    jobs = await asyncio.to_thread(
+        rt.store.list, status=str(args.get("status", "") or ""), task=str(args.get("task", "") or ""), limit=limit
+    )
+    counts = await asyncio.to_thread(rt.store.counts)
+    return _content(f"{len(jobs)} jobs", ok=True, jobs=[_public(j) for j in jobs], counts=counts)
 
 
 def register_tools() -> list[ToolDef]:
     return [
-        ToolDef("hp.jobs.submit", "Submit async job", {"type": "object", "properties": {"task": {"type": "string"}, "payload": {"type": "object"}}}, submit),
-        ToolDef("hp.jobs.status", "Get job status", {"type": "object", "properties": {"job_id": {"type": "string"}}, "required": ["job_id"]}, status),
+        ToolDef("hp.jobs.submit", "Submit async job", {"type": "object", "properties": {"task": {"type": "string"}, "payload": {"type": "object"}, "priority": {"type": "integer"}, "delay_s": {"type": "number"}, "max_attempts": {"type": "integer"}}, "required": ["task"]}, submit),
+        ToolDef("hp.jobs.status", "Get job status", {"type": "object", "properties": {"job_id": {"type": "string"}, "wait_s": {"type": "number"}}, "required": ["job_id"]}, status),
         ToolDef("hp.jobs.result", "Get job result", {"type": "object", "properties": {"job_id": {"type": "string"}}, "required": ["job_id"]}, result),
+        ToolDef("hp.jobs.cancel", "Cancel a queued or running job", {"type": "object", "properties": {"job_id": {"type": "string"}}, "required": ["job_id"]}, cancel),
+        ToolDef("hp.jobs.list", "List recent jobs", {"type": "object", "properties": {"status": {"type": "string"}, "task": {"type": "string"}, "limit": {"type": "integer"}}}, list_jobs),
     ]
 
 
 app = create_mcp_app(server_name="mcp-job-orchestrator", tools=register_tools())
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, timeout_s: float = 600.0) -> StreamingResponse:
+    async def stream() -> AsyncIterator[str]:
+        async for job in _watch(job_id, timeout_s=timeout_s):
+            yield f"event: progress\ndata: {json.dumps(_public(job))}\n\n"
+        yield "event: end\ndata: {}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+app.router.add_event_handler("startup", runtime)
+app.router.add_event_handler("shutdown", shutdown)
@@ -0,0 +1,72 @@
+"""
+Throughput benchmark: job_orchestrator queue + worker pool at N workers.
+
+Enqueues --jobs jobs into a fresh SQLite queue, starts a WorkerPool with
+each worker count and reports jobs/sec until every job has completed.
+
+Workloads:
+  echo    no-op executor; measures queue/dispatch overhead
+  sleep   each job awaits --sleep-ms; measures concurrency
+
+Run from the repository root::
+
+    python -m agentic.integrations.mcp.job_orchestrator.benchmarks.bench_throughput [--jobs 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from agentic.integrations.mcp.job_orchestrator.domain import executor
+from agentic.integrations.mcp.job_orchestrator.infra.queue import JobQueue
+from agentic.integrations.mcp.job_orchestrator.infra.result_store import ResultStore
+from agentic.integrations.mcp.job_orchestrator.infra.state_store import StateStore
+from agentic.integrations.mcp.job_orchestrator.infra.worker import WorkerPool
+
+
+def _run(workload: str, jobs: int, workers: int, sleep_ms: float) -> float:
+    with tempfile.TemporaryDirectory() as d:
+        store = StateStore(Path(d) / "jobs.sqlite3")
+        queue = JobQueue(store)
+        for i in range(jobs):
+            queue.enqueue(workload, {"i": i, "ms": sleep_ms})
+        pool = WorkerPool(queue, ResultStore(Path(d) / "results"), workers=workers, poll_interval_s=0.01)
+        t0 = time.perf_counter()
+        pool.start()
+        while store.counts().get("completed", 0) < jobs:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - t0
+        pool.stop()
+        store.close()
+    return jobs / elapsed
+
+
+async def _bench_sleep(payload, ctx):
+    await asyncio.sleep(payload["ms"] / 1000)
+    return None
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--jobs", type=int, default=2000)
+    ap.add_argument("--sleep-ms", type=float, default=20.0)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = ap.parse_args()
+    executor.register_executor("bench_sleep", _bench_sleep)
+
+    print(f"{args.jobs} jobs per run")
+    print(f"  {'workers':>7} {'echo jobs/s':>12} {'sleep jobs/s':>13}")
+    for n in args.workers:
+        echo = _run("echo", args.jobs, n, args.sleep_ms)
+        sleep = _run("bench_sleep", min(args.jobs, 50 * n), n, args.sleep_ms)
+        print(f"  {n:>7} {echo:12.0f} {sleep:13.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,74 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
 
 LOG_LEVEL = os.getenv('JOB_ORCHESTRATOR_LOG_LEVEL', 'INFO')
 SERVICE_NAME = os.getenv('JOB_ORCHESTRATOR_SERVICE_NAME', 'mcp-job-orchestrator')
+
+
+def data_dir() -> Path:
+    """Queue database and result blobs (JOB_ORCHESTRATOR_DATA_DIR)."""
+    raw = os.getenv('JOB_ORCHESTRATOR_DATA_DIR', '').strip()
+    return Path(raw) if raw else Path.home() / '.homepilot' / 'job_orchestrator'
+
+
+def workers() -> int:
+    """Jobs executed concurrently across all task types."""
+    return max(1, int(os.getenv('JOB_ORCHESTRATOR_WORKERS', '4')))
+
+
+def task_limits() -> dict[str, int]:
+    """Per-task-type caps, e.g. ``render=1,research=2``; unlisted types share the pool."""
+    limits: dict[str, int] = {}
+    for part in os.getenv('JOB_ORCHESTRATOR_TASK_LIMITS', '').split(','):
+        task, sep, value = part.partition('=')
+        if sep and task.strip() and value.strip().isdigit():
+            limits[task.strip()] = max(1, int(value))
+    return limits
+
+
+def task_endpoints() -> dict[str, str]:
+    """Task types forwarded over HTTP, e.g. ``render=http://localhost:8000/jobs/render``."""
+    endpoints: dict[str, str] = {}
+    for part in os.getenv('JOB_ORCHESTRATOR_TASK_ENDPOINTS', '').split(','):
+        task, sep, url = part.partition('=')
+        if sep and task.strip() and url.strip().startswith(('http://', 'https://')):
+            endpoints[task.strip()] = url.strip()
+    return endpoints
+
+
+def max_attempts() -> int:
+    return max(1, int(os.getenv('JOB_ORCHESTRATOR_MAX_ATTEMPTS', '3')))
+
+
+def backoff_base_s() -> float:
+    return float(os.getenv('JOB_ORCHESTRATOR_BACKOFF_BASE_S', '2'))
+
+
+def backoff_max_s() -> float:
+    return float(os.getenv('JOB_ORCHESTRATOR_BACKOFF_MAX_S', '300'))
+
+
+def job_timeout_s() -> float:
+    return float(os.getenv('JOB_ORCHESTRATOR_JOB_TIMEOUT_S', '3600'))
+
+
+def lease_s() -> float:
+    """How long a claimed job stays ours without a renewal; the pool renews at a third of it."""
+    return max(1.0, float(os.getenv('JOB_ORCHESTRATOR_LEASE_S', '60')))
+
+
+def retention_s() -> float:
+    """Finished jobs (and their results) older than this are deleted; 0 keeps them forever."""
+    return max(0.0, float(os.getenv('JOB_ORCHESTRATOR_RETENTION_S', str(7 * 24 * 3600))))
+
+
+# Idle dispatcher wake-up; new submissions and finished jobs wake it sooner.
+POLL_INTERVAL_S = 1.0
+
+# Minimum spacing between persisted progress updates for one job.
+PROGRESS_FLUSH_S = 0.25
+
+# Spacing between retention sweeps.
+PRUNE_INTERVAL_S = 600.0
@@ -1,5 +1,95 @@
+"""Task executors: what a job of a given task type actually runs.
+
+An executor is ``async def fn(payload, ctx) -> result``; ``result`` must be
+JSON-serialisable and is stored out-of-line. Long jobs report progress with
+``ctx.progress(fraction, message)``. Hosts register their own executors with
+:func:`register_executor`; task types listed in JOB_ORCHESTRATOR_TASK_ENDPOINTS
+are forwarded to an HTTP service.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import asyncio
+import json
+import urllib.error
+import urllib.request
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from agentic.integrations.mcp.job_orchestrator import config
+
+
+class JobContext:
+    def __init__(self, job_id: str, task: str, attempt: int, report: Callable[[float, Optional[str]], None]):
+        self.job_id = job_id
+        self.task = task
+        self.attempt = attempt
+        self._report = report
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        self._report(fraction, message)
+
+
+class PermanentError(Exception):
+    """Raise from an executor to fail the job without further retries."""
+
+
+Executor = Callable[[Dict[str, Any], JobContext], Awaitable[Any]]
+
+_EXECUTORS: Dict[str, Executor] = {}
+
+
+def register_executor(task: str, fn: Executor) -> None:
+    _EXECUTORS[task] = fn
+
+
+def unregister_executor(task: str) -> None:
+    _EXECUTORS.pop(task, None)
+
+
+def get_executor(task: str) -> Optional[Executor]:
+    fn = _EXECUTORS.get(task)
+    if fn is None:
+        url = config.task_endpoints().get(task)
+        if url:
+            return _http_executor(url)
+    return fn
+
+
+def known_tasks() -> list[str]:
+    return sorted(set(_EXECUTORS) | set(config.task_endpoints()))
+
+
+async def _echo(payload: Dict[str, Any], ctx: JobContext) -> Any:
+    return {"echo": payload, "task": ctx.task}
+
+
+async def _sleep(payload: Dict[str, Any], ctx: JobContext) -> Any:
+    """Waits ``seconds`` in ten steps; for smoke tests and benchmarks."""
+    seconds = float(payload.get("seconds", 0))
+    for step in range(1, 11):
+        await asyncio.sleep(seconds / 10)
+        ctx.progress(step / 10)
+    return {"slept": seconds}
+
+
+def _http_executor(url: str) -> Executor:
+    async def run(payload: Dict[str, Any], ctx: JobContext) -> Any:
+        body = json.dumps({"job_id": ctx.job_id, "task": ctx.task, "payload": payload}).encode("utf-8")
+        req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+
+        def post() -> Any:
+            try:
+                with urllib.request.urlopen(req, timeout=config.job_timeout_s()) as resp:
+                    return json.loads(resp.read() or b"null")
+            except urllib.error.HTTPError as exc:
+                if 400 <= exc.code < 500:
+                    raise PermanentError(f"{url} returned HTTP {exc.code}") from exc
+                raise
+
+        return await asyncio.to_thread(post)
+
+    return run
+
+
+register_executor("echo", _echo)
+register_executor("sleep", _sleep)
@@ -1,5 +1,25 @@
+"""Job states and the transitions between them."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+TERMINAL = frozenset({COMPLETED, FAILED, CANCELLED})
+
+_TRANSITIONS = {
+    QUEUED: {RUNNING, CANCELLED},
+    # RUNNING -> QUEUED is a retry (or a requeue after a crash).
+    RUNNING: {QUEUED, COMPLETED, FAILED, CANCELLED},
+}
+
+
+def can_transition(current: str, new: str) -> bool:
+    return new in _TRANSITIONS.get(current, ())
+
+
+def is_terminal(status: str) -> bool:
+    return status in TERMINAL
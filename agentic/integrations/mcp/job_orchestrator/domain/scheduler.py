@@ -1,5 +1,39 @@
+"""Scheduling policy: retry backoff and per-task-type concurrency."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import random
+from collections import Counter
+from typing import Dict, List, Optional
+
+
+def retry_delay(attempt: int, *, base_s: float, max_s: float, jitter: bool = True) -> float:
+    """Exponential backoff after the ``attempt``-th failure (1-based)."""
+    delay = min(max_s, base_s * (2 ** max(0, attempt - 1)))
+    if jitter:
+        # "Equal jitter": keep at least half the delay, spread the rest.
+        delay = delay / 2 + random.uniform(0, delay / 2)
+    return delay
+
+
+class TaskLimits:
+    """Counts running jobs per task type against optional caps.
+
+    Only the dispatcher touches this, from one event loop, so no locking.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self.limits = dict(limits or {})
+        self.running: Counter[str] = Counter()
+
+    def blocked(self) -> List[str]:
+        """Task types at their cap; the next claim must skip them."""
+        return sorted(t for t, cap in self.limits.items() if self.running[t] >= cap)
+
+    def acquire(self, task: str) -> None:
+        self.running[task] += 1
+
+    def release(self, task: str) -> None:
+        self.running[task] -= 1
+        if self.running[task] <= 0:
+            del self.running[task]
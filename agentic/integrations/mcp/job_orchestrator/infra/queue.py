@@ -1,5 +1,141 @@
+"""Durable job queue on top of the SQLite state store.
+
+Ready jobs are claimed highest priority first, then by due time, then FIFO.
+A claim is one ``UPDATE ... RETURNING`` statement, so a job is handed out
+at most once even with several dispatchers on the same database. Each queue
+claims under its own owner id with a lease the worker pool renews; finishing
+a job requires still holding it, and only expired leases are re-queued, so a
+dispatcher never takes back jobs another live dispatcher is running.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import json
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+from agentic.integrations.mcp.job_orchestrator.domain.lifecycle import (
+    CANCELLED,
+    COMPLETED,
+    FAILED,
+    QUEUED,
+    RUNNING,
+)
+from agentic.integrations.mcp.job_orchestrator.infra.state_store import StateStore
+
+
+class JobQueue:
+    def __init__(self, store: StateStore, *, lease_s: float = 60.0):
+        self.store = store
+        self.lease_s = lease_s
+        self.owner = uuid.uuid4().hex
+
+    def enqueue(
+        self,
+        task: str,
+        payload: Dict[str, Any],
+        *,
+        priority: int = 0,
+        delay_s: float = 0.0,
+        max_attempts: int = 1,
+    ) -> Dict[str, Any]:
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        with self.store.lock:
+            self.store.conn.execute(
+                "INSERT INTO jobs (id, task, payload, priority, status, max_attempts, run_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, task, json.dumps(payload), priority, QUEUED, max_attempts, now + max(0.0, delay_s), now),
+            )
+        job = self.store.get(job_id)
+        assert job is not None
+        return job
+
+    def claim(self, *, skip_tasks: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+        """Move the next due job to ``running`` and return it."""
+        skip = list(skip_tasks)
+        exclude = f"AND task NOT IN ({','.join('?' * len(skip))})" if skip else ""
+        now = time.time()
+        with self.store.lock:
+            row = self.store.conn.execute(
+                f"UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ?, progress = 0, message = NULL, "
+                f"owner = ?, lease_until = ? "
+                f"WHERE id = (SELECT id FROM jobs WHERE status = ? AND run_at <= ? {exclude} "
+                f"ORDER BY priority DESC, run_at, seq LIMIT 1) RETURNING *",
+                (RUNNING, now, self.owner, now + self.lease_s, QUEUED, now, *skip),
+            ).fetchone()
+        return StateStore.row_to_job(row) if row else None
+
+    def next_due_at(self, *, skip_tasks: Iterable[str] = ()) -> Optional[float]:
+        skip = list(skip_tasks)
+        exclude = f"AND task NOT IN ({','.join('?' * len(skip))})" if skip else ""
+        with self.store.lock:
+            row = self.store.conn.execute(
+                f"SELECT MIN(run_at) FROM jobs WHERE status = ? {exclude}", (QUEUED, *skip)
+            ).fetchone()
+        return row[0]
+
+    def complete(self, job_id: str, *, result_ref: str, result_bytes: int) -> bool:
+        return self._finish(
+            job_id, COMPLETED,
+            "progress = 1, error = NULL, result_ref = ?, result_bytes = ?", (result_ref, result_bytes),
+        )
+
+    def fail(self, job_id: str, error: str) -> bool:
+        return self._finish(job_id, FAILED, "error = ?", (error,))
+
+    def retry(self, job_id: str, error: str, *, delay_s: float) -> bool:
+        with self.store.lock:
+            cur = self.store.conn.execute(
+                "UPDATE jobs SET status = ?, run_at = ?, error = ?, owner = NULL, lease_until = NULL "
+                "WHERE id = ? AND status = ? AND owner = ?",
+                (QUEUED, time.time() + delay_s, error, job_id, RUNNING, self.owner),
+            )
+        return cur.rowcount == 1
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued or running job; returns its previous status."""
+        with self.store.lock:
+            row = self.store.conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row[0] not in (QUEUED, RUNNING):
+                return None
+            self.store.conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?", (CANCELLED, time.time(), job_id)
+            )
+        return row[0]
+
+    def renew(self, job_ids: Iterable[str]) -> int:
+        """Extend the lease on running jobs this queue holds."""
+        ids = list(job_ids)
+        if not ids:
+            return 0
+        with self.store.lock:
+            cur = self.store.conn.execute(
+                f"UPDATE jobs SET lease_until = ? WHERE status = ? AND owner = ? AND id IN ({','.join('?' * len(ids))})",
+                (time.time() + self.lease_s, RUNNING, self.owner, *ids),
+            )
+        return cur.rowcount
+
+    def requeue_running(self, *, own: bool = True) -> int:
+        """Put running jobs whose lease expired back in the queue.
+
+        With ``own`` this queue's jobs go back too, whatever their lease: used
+        when its pool (re)starts and nothing of its own can still be running.
+        """
+        now = time.time()
+        with self.store.lock:
+            cur = self.store.conn.execute(
+                "UPDATE jobs SET status = ?, run_at = ?, owner = NULL, lease_until = NULL "
+                "WHERE status = ? AND (lease_until IS NULL OR lease_until < ? OR owner = ?)",
+                (QUEUED, now, RUNNING, now, self.owner if own else None),
+            )
+        return cur.rowcount
+
+    def _finish(self, job_id: str, status: str, assignments: str, params: tuple) -> bool:
+        with self.store.lock:
+            cur = self.store.conn.execute(
+                f"UPDATE jobs SET status = ?, finished_at = ?, {assignments} WHERE id = ? AND status = ? AND owner = ?",
+                (status, time.time(), *params, job_id, RUNNING, self.owner),
+            )
+        return cur.rowcount == 1
@@ -1,5 +1,45 @@
+"""Job results stored out-of-line as files, referenced from the job row.
+
+Large render/research outputs stay out of the SQLite table, so status polls
+and queue claims never read them.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import json
+import os
+from pathlib import Path
+from typing import Any, Tuple
+
+
+class ResultStore:
+    def __init__(self, root: Path | str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, ref: str) -> Path:
+        path = (self.root / ref).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"invalid result ref: {ref}")
+        return path
+
+    def put(self, job_id: str, result: Any) -> Tuple[str, int]:
+        """Write ``result`` as JSON; returns ``(ref, size in bytes)``."""
+        data = json.dumps(result, default=str).encode("utf-8")
+        ref = f"{job_id[:2]}/{job_id}.json"
+        path = self._path(ref)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return ref, len(data)
+
+    def get(self, ref: str) -> Any:
+        return json.loads(self._path(ref).read_bytes())
+
+    def open(self, ref: str):
+        """Binary file handle, for streaming a large result without decoding it."""
+        return open(self._path(ref), "rb")
+
+    def delete(self, ref: str) -> None:
+        self._path(ref).unlink(missing_ok=True)
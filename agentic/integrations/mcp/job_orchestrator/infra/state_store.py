@@ -1,5 +1,123 @@
+"""SQLite job table shared by the queue, the worker pool and the tools.
+
+One connection guarded by a lock: statements are short, and the worker
+pool and request handlers run on different threads. WAL keeps readers
+(status polls) from blocking the dispatcher's writes.
+
+A running job carries its dispatcher's ``owner`` id and a ``lease_until``
+the dispatcher keeps renewing; only jobs whose lease ran out are taken back.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq          INTEGER PRIMARY KEY AUTOINCREMENT,
+    id           TEXT    NOT NULL UNIQUE,
+    task         TEXT    NOT NULL,
+    payload      TEXT    NOT NULL,
+    priority     INTEGER NOT NULL DEFAULT 0,
+    status       TEXT    NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at       REAL    NOT NULL,
+    created_at   REAL    NOT NULL,
+    started_at   REAL,
+    finished_at  REAL,
+    progress     REAL    NOT NULL DEFAULT 0,
+    message      TEXT,
+    error        TEXT,
+    result_ref   TEXT,
+    result_bytes INTEGER,
+    owner        TEXT,
+    lease_until  REAL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_ready ON jobs (priority DESC, run_at, seq) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status);
+"""
+
+# Columns added after the first release; older databases get them on open.
+_ADDED_COLUMNS = (("owner", "TEXT"), ("lease_until", "REAL"))
+
+_PUBLIC_FIELDS = (
+    "id", "task", "priority", "status", "attempts", "max_attempts", "run_at",
+    "created_at", "started_at", "finished_at", "progress", "message", "error",
+    "result_bytes",
+)
+
+
+class StateStore:
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(_SCHEMA)
+            have = {r[1] for r in self.conn.execute("PRAGMA table_info(jobs)")}
+            for name, decl in _ADDED_COLUMNS:
+                if name not in have:
+                    self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {decl}")
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+    @staticmethod
+    def row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = {k: row[k] for k in _PUBLIC_FIELDS}
+        job["payload"] = json.loads(row["payload"])
+        job["result_ref"] = row["result_ref"]
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self.row_to_job(row) if row else None
+
+    def list(self, *, status: str = "", task: str = "", limit: int = 50) -> List[Dict[str, Any]]:
+        sql, params = "SELECT * FROM jobs WHERE 1=1", []
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        if task:
+            sql += " AND task = ?"
+            params.append(task)
+        sql += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self.row_to_job(r) for r in rows]
+
+    def set_progress(self, job_id: str, progress: float, message: str | None = None) -> None:
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ? AND status = 'running'",
+                (max(0.0, min(1.0, progress)), message, job_id),
+            )
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def prune(self, *, older_than_s: float) -> List[str]:
+        """Delete finished jobs older than the cutoff; returns their result refs."""
+        cutoff = time.time() - older_than_s
+        with self.lock:
+            rows = self.conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed', 'cancelled') AND finished_at < ? "
+                "RETURNING result_ref",
+                (cutoff,),
+            ).fetchall()
+        return [r[0] for r in rows if r[0]]
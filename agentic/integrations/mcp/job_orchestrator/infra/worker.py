@@ -1,5 +1,221 @@
+"""Asyncio worker pool that drains the job queue.
+
+The pool runs its own event loop on a background thread, so jobs keep
+running independently of the request that submitted them (and of whatever
+loop serves the MCP endpoint). One dispatcher coroutine claims jobs while a
+worker slot is free, skipping task types that are at their concurrency cap,
+and runs each claimed job as its own task. A maintenance coroutine renews
+the leases of running jobs, re-queues jobs whose dispatcher stopped renewing
+theirs, and deletes finished jobs past the retention window.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from agentic.integrations.mcp.job_orchestrator import config
+from agentic.integrations.mcp.job_orchestrator.domain.executor import JobContext, PermanentError, get_executor
+from agentic.integrations.mcp.job_orchestrator.domain.scheduler import TaskLimits, retry_delay
+from agentic.integrations.mcp.job_orchestrator.infra.queue import JobQueue
+from agentic.integrations.mcp.job_orchestrator.infra.result_store import ResultStore
+
+log = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    def __init__(
+        self,
+        queue: JobQueue,
+        results: ResultStore,
+        *,
+        workers: int,
+        limits: Optional[Dict[str, int]] = None,
+        poll_interval_s: float = config.POLL_INTERVAL_S,
+        retention_s: float = 0.0,
+    ):
+        self.queue = queue
+        self.results = results
+        self.workers = workers
+        self.limits = TaskLimits(limits)
+        self.poll_interval_s = poll_interval_s
+        self.retention_s = retention_s
+        self._next_prune = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._running: Dict[str, asyncio.Task] = {}
+        self._maintainer: Optional[asyncio.Task] = None
+        self._started = threading.Event()
+
+    # ── control (any thread) ───────────────────────────────────────────
+    @property
+    def alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.alive:
+            return
+        requeued = self.queue.requeue_running()
+        if requeued:
+            log.info("requeued %d interrupted jobs", requeued)
+        self._stopping = False
+        self._started.clear()
+        self._thread = threading.Thread(target=self._thread_main, name="job-orchestrator", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop dispatching; running jobs are interrupted and re-queued on the next start."""
+        if not self.alive or self._loop is None:
+            return
+        self._stopping = True
+        self._loop.call_soon_threadsafe(self._shutdown)
+        self._thread.join(timeout)  # type: ignore[union-attr]
+        self._thread = None
+
+    def wake(self) -> None:
+        """Tell the dispatcher new work may be ready."""
+        if self._loop is not None and self._wake is not None and self.alive:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def cancel(self, job_id: str) -> None:
+        """Interrupt a running job (its row must already be marked cancelled)."""
+        if self._loop is not None and self.alive:
+            self._loop.call_soon_threadsafe(self._cancel_task, job_id)
+
+    def running_ids(self) -> list[str]:
+        return list(self._running)
+
+    # ── loop side ──────────────────────────────────────────────────────
+    def _thread_main(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._dispatch())
+        finally:
+            self._loop.close()
+
+    def _shutdown(self) -> None:
+        if self._maintainer is not None:
+            self._maintainer.cancel()
+        for task in list(self._running.values()):
+            task.cancel()
+        if self._wake is not None:
+            self._wake.set()
+
+    def _cancel_task(self, job_id: str) -> None:
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+
+    async def _dispatch(self) -> None:
+        self._wake = asyncio.Event()
+        slots = asyncio.Semaphore(self.workers)
+        self._maintainer = asyncio.create_task(self._maintain())
+        self._started.set()
+        while not self._stopping:
+            await slots.acquire()
+            if self._stopping:
+                slots.release()
+                break
+            self._wake.clear()
+            skip = self.limits.blocked()
+            job = await asyncio.to_thread(self.queue.claim, skip_tasks=skip)
+            if job is None:
+                slots.release()
+                due = await asyncio.to_thread(self.queue.next_due_at, skip_tasks=skip)
+                wait = self.poll_interval_s if due is None else min(self.poll_interval_s, max(0.0, due - time.time()))
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.limits.acquire(job["task"])
+            task = asyncio.create_task(self._run(job))
+            self._running[job["id"]] = task
+            task.add_done_callback(lambda _t, job=job: self._done(job, slots))
+
+        self._maintainer.cancel()
+        if self._running:
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
+
+    async def _maintain(self) -> None:
+        while not self._stopping:
+            try:
+                requeued = await asyncio.to_thread(self.sweep, list(self._running))
+            except Exception:  # noqa: BLE001 - keep the pool alive; retry next round
+                log.exception("maintenance sweep failed")
+            else:
+                if requeued and self._wake is not None:
+                    self._wake.set()
+            await asyncio.sleep(self.queue.lease_s / 3)
+
+    def sweep(self, running: list[str]) -> int:
+        """Renew leases of ``running``, re-queue expired ones and apply retention; returns jobs re-queued."""
+        self.queue.renew(running)
+        requeued = self.queue.requeue_running(own=False)
+        if requeued:
+            log.info("requeued %d jobs with expired leases", requeued)
+        now = time.monotonic()
+        if self.retention_s > 0 and now >= self._next_prune:
+            self._next_prune = now + config.PRUNE_INTERVAL_S
+            refs = self.queue.store.prune(older_than_s=self.retention_s)
+            for ref in refs:
+                self.results.delete(ref)
+            if refs:
+                log.info("pruned %d finished jobs past retention", len(refs))
+        return requeued
+
+    def _done(self, job: Dict[str, Any], slots: asyncio.Semaphore) -> None:
+        self._running.pop(job["id"], None)
+        self.limits.release(job["task"])
+        slots.release()
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        job_id, task = job["id"], job["task"]
+        fn = get_executor(task)
+        if fn is None:
+            await asyncio.to_thread(self.queue.fail, job_id, f"No executor registered for task '{task}'")
+            return
+
+        last_flush = 0.0
+
+        def report(fraction: float, message: Optional[str]) -> None:
+            nonlocal last_flush
+            now = time.monotonic()
+            if fraction < 1.0 and now - last_flush < config.PROGRESS_FLUSH_S:
+                return
+            last_flush = now
+            self.queue.store.set_progress(job_id, fraction, message)
+
+        ctx = JobContext(job_id, task, job["attempts"], report)
+        try:
+            result = await asyncio.wait_for(fn(job["payload"], ctx), timeout=config.job_timeout_s())
+        except asyncio.CancelledError:
+            # Either cancelled by the user (row already says so) or the pool
+            # is stopping (row stays running and is re-queued on restart).
+            return
+        except PermanentError as exc:
+            await asyncio.to_thread(self.queue.fail, job_id, str(exc))
+            return
+        except Exception as exc:  # noqa: BLE001 - any executor failure is a job failure
+            error = f"{type(exc).__name__}: {exc}"
+            if job["attempts"] < job["max_attempts"]:
+                delay = retry_delay(job["attempts"], base_s=config.backoff_base_s(), max_s=config.backoff_max_s())
+                await asyncio.to_thread(self.queue.retry, job_id, error, delay_s=delay)
+            else:
+                await asyncio.to_thread(self.queue.fail, job_id, error)
+            return
+
+        ref, size = await asyncio.to_thread(self.results.put, job_id, result)
+        if not await asyncio.to_thread(self.queue.complete, job_id, result_ref=ref, result_bytes=size):
+            # Cancelled while finishing; drop the orphaned blob.
+            await asyncio.to_thread(self.results.delete, ref)
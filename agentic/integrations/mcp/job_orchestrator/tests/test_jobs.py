@@ -1,2 +1,145 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from agentic.integrations.mcp.job_orchestrator import app as server
+from agentic.integrations.mcp.job_orchestrator.domain import executor
+
+
+@pytest.fixture()
+def orchestrator(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOB_ORCHESTRATOR_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("JOB_ORCHESTRATOR_WORKERS", "4")
+    monkeypatch.setenv("JOB_ORCHESTRATOR_BACKOFF_BASE_S", "0.01")
+    monkeypatch.setattr(server.config, "POLL_INTERVAL_S", 0.05)
+    server._reset_for_tests()
+    yield server
+    server._reset_for_tests()
+    for task in ("flaky", "slow", "doomed"):
+        executor.unregister_executor(task)
+
+
+async def _wait_done(job_id: str, timeout: float = 5.0) -> dict:
+    for _ in range(int(timeout / 0.02)):
+        res = await server.status({"job_id": job_id})
+        if res["meta"]["status"] in ("completed", "failed", "cancelled"):
+            return res["meta"]
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.mark.asyncio
+async def test_submit_runs_in_background(orchestrator):
+    res = await server.submit({"task": "echo", "payload": {"a": 1}})
+    assert res["meta"]["status"] == "queued"
+    job_id = res["meta"]["job_id"]
+    assert (await _wait_done(job_id))["status"] == "completed"
+    out = await server.result({"job_id": job_id})
+    assert out["meta"]["result"] == {"echo": {"a": 1}, "task": "echo"}
+
+
+@pytest.mark.asyncio
+async def test_unknown_task_is_rejected(orchestrator):
+    res = await server.submit({"task": "nope"})
+    assert res["meta"]["ok"] is False
+    assert "echo" in res["meta"]["known_tasks"]
+
+
+@pytest.mark.asyncio
+async def test_retries_with_backoff_then_succeeds(orchestrator):
+    calls = []
+
+    async def flaky(payload, ctx):
+        calls.append(ctx.attempt)
+        if ctx.attempt < 3:
+            raise RuntimeError("transient")
+        return "ok"
+
+    executor.register_executor("flaky", flaky)
+    job_id = (await server.submit({"task": "flaky", "max_attempts": 3}))["meta"]["job_id"]
+    meta = await _wait_done(job_id)
+    assert meta["status"] == "completed"
+    assert calls == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_permanent_failure_after_max_attempts(orchestrator):
+    async def doomed(payload, ctx):
+        raise ValueError("bad input")
+
+    executor.register_executor("doomed", doomed)
+    job_id = (await server.submit({"task": "doomed", "max_attempts": 2}))["meta"]["job_id"]
+    meta = await _wait_done(job_id)
+    assert meta["status"] == "failed"
+    assert meta["attempts"] == 2
+    assert "bad input" in meta["error"]
+    assert (await server.result({"job_id": job_id}))["meta"]["ok"] is False
+
+
+@pytest.mark.asyncio
+async def test_per_task_concurrency_limit(orchestrator, monkeypatch):
+    monkeypatch.setenv("JOB_ORCHESTRATOR_TASK_LIMITS", "slow=1")
+    server._reset_for_tests()
+    active, peak = 0, 0
+
+    async def slow(payload, ctx):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+
+    executor.register_executor("slow", slow)
+    ids = [(await server.submit({"task": "slow"}))["meta"]["job_id"] for _ in range(3)]
+    echo_id = (await server.submit({"task": "echo"}))["meta"]["job_id"]
+    assert (await _wait_done(echo_id))["status"] == "completed"
+    for job_id in ids:
+        assert (await _wait_done(job_id))["status"] == "completed"
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_progress_long_poll_and_cancel(orchestrator):
+    job_id = (await server.submit({"task": "sleep", "payload": {"seconds": 3}}))["meta"]["job_id"]
+    res = await server.status({"job_id": job_id, "wait_s": 2})
+    assert res["meta"]["status"] == "running"
+
+    res = await server.cancel({"job_id": job_id})
+    assert res["meta"]["ok"] is True
+    assert res["meta"]["previous_status"] == "running"
+    await asyncio.sleep(0.1)
+    assert (await server.status({"job_id": job_id}))["meta"]["status"] == "cancelled"
+    assert job_id not in server.runtime().pool.running_ids()
+
+
+@pytest.mark.asyncio
+async def test_delayed_job_and_priority(orchestrator):
+    later = (await server.submit({"task": "echo", "delay_s": 0.3}))["meta"]["job_id"]
+    now = (await server.submit({"task": "echo", "priority": 1}))["meta"]["job_id"]
+    assert (await _wait_done(now))["status"] == "completed"
+    assert (await server.status({"job_id": later}))["meta"]["status"] == "queued"
+    assert (await _wait_done(later))["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_queue_survives_restart(orchestrator):
+    job_id = (await server.submit({"task": "echo", "delay_s": 0.2}))["meta"]["job_id"]
+    server._reset_for_tests()
+    assert (await _wait_done(job_id))["status"] == "completed"
+
+
+def test_progress_event_stream(orchestrator):
+    from fastapi.testclient import TestClient
+
+    with TestClient(server.app) as client:
+        job_id = client.post("/rpc", json={
+            "jsonrpc": "2.0", "id": "1", "method": "tools/call",
+            "params": {"name": "hp.jobs.submit", "arguments": {"task": "sleep", "payload": {"seconds": 0.5}}},
+        }).json()["result"]["meta"]["job_id"]
+        with client.stream("GET", f"/jobs/{job_id}/events") as resp:
+            body = "".join(resp.iter_text())
+    assert body.count("event: progress") >= 2
+    assert '"status": "completed"' in body
+    assert body.rstrip().endswith("event: end\ndata: {}")
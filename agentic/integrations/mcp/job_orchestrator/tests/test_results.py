@@ -1,2 +1,65 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from agentic.integrations.mcp.job_orchestrator.infra.queue import JobQueue
+from agentic.integrations.mcp.job_orchestrator.infra.result_store import ResultStore
+from agentic.integrations.mcp.job_orchestrator.infra.state_store import StateStore
+from agentic.integrations.mcp.job_orchestrator.infra.worker import WorkerPool
+
+
+def test_result_round_trip(tmp_path):
+    results = ResultStore(tmp_path / "results")
+    ref, size = results.put("abcdef", {"frames": list(range(5))})
+    assert ref == "ab/abcdef.json"
+    assert size == (tmp_path / "results" / ref).stat().st_size
+    assert results.get(ref) == {"frames": [0, 1, 2, 3, 4]}
+    results.delete(ref)
+    assert not (tmp_path / "results" / ref).exists()
+
+
+def test_result_ref_cannot_escape_root(tmp_path):
+    results = ResultStore(tmp_path / "results")
+    with pytest.raises(ValueError):
+        results.get("../jobs.sqlite3")
+
+
+def test_results_are_stored_out_of_line(tmp_path):
+    store = StateStore(tmp_path / "jobs.sqlite3")
+    results = ResultStore(tmp_path / "results")
+    queue = JobQueue(store)
+    job = queue.enqueue("echo", {})
+    queue.claim()
+    big = {"blob": "x" * 200_000}
+    ref, size = results.put(job["id"], big)
+    assert queue.complete(job["id"], result_ref=ref, result_bytes=size)
+    store.close()
+
+    con = sqlite3.connect(tmp_path / "jobs.sqlite3")
+    row_bytes = con.execute("SELECT SUM(LENGTH(payload) + LENGTH(result_ref)) FROM jobs").fetchone()[0]
+    con.close()
+    assert row_bytes < 1000
+    assert results.get(ref) == big
+
+
+def test_sweep_prunes_finished_jobs_and_results(tmp_path):
+    store = StateStore(tmp_path / "jobs.sqlite3")
+    results = ResultStore(tmp_path / "results")
+    queue = JobQueue(store)
+    old, fresh = queue.enqueue("echo", {}), queue.enqueue("echo", {})
+    refs = []
+    for job in (old, fresh):
+        queue.claim()
+        ref, size = results.put(job["id"], {"ok": True})
+        queue.complete(job["id"], result_ref=ref, result_bytes=size)
+        refs.append(ref)
+    with store.lock:
+        store.conn.execute("UPDATE jobs SET finished_at = finished_at - 7200 WHERE id = ?", (old["id"],))
+
+    WorkerPool(queue, results, workers=1, retention_s=3600).sweep([])
+    assert store.get(old["id"]) is None and store.get(fresh["id"]) is not None
+    assert not (tmp_path / "results" / refs[0]).exists()
+    assert results.get(refs[1]) == {"ok": True}
+    store.close()
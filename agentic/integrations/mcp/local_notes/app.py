@@ -7,22 +7,50 @@ Tools:
   notes.append(note_id, content)               [write-gated]
   notes.update(note_id, content)               [write-gated]
   notes.delete(note_id)                        [write-gated]
+
+Notes persist in SQLite under NOTES_STORAGE_DIR together with an inverted
+index that every write keeps current (see ``store.py``); search ranks the
+notes containing all query terms (prefixes match too) with BM25, and falls
+back to a plain substring match when the index finds nothing.
 """
 
 from __future__ import annotations
 
+import asyncio
 import os
-import time
-import uuid
-from typing import Any, Dict, List
+import threading
+from pathlib import Path
+from typing import List, Optional
 
 from agentic.integrations.mcp._common.server import Json, ToolDef, create_mcp_app
+from agentic.integrations.mcp.local_notes.store import NoteStore
 
 WRITE_ENABLED = os.getenv("WRITE_ENABLED", "false").lower() == "true"
 DRY_RUN = os.getenv("DRY_RUN", "true").lower() == "true"
 
-# In-memory store (placeholder — production would use sqlite or filesystem)
-_NOTES: Dict[str, Dict[str, Any]] = {}
+_store: Optional[NoteStore] = None
+_store_lock = threading.Lock()
+
+
+def _storage_dir() -> Path:
+    raw = os.getenv("NOTES_STORAGE_DIR", "").strip()
+    return Path(raw).expanduser() if raw else Path.home() / ".homepilot" / "local_notes"
+
+
+def get_store() -> NoteStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NoteStore(_storage_dir() / "notes.sqlite3")
+        return _store
+
+
+def _reset_for_tests() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = None
 
 
 def _text(text: str) -> Json:
@@ -40,20 +68,16 @@ def _write_gate(action: str) -> Json | None:
 
 
 async def notes_search(args: Json) -> Json:
-    query = str(args.get("query", "")).strip().lower()
+    query = str(args.get("query", "")).strip()
     limit = max(1, min(int(args.get("limit", 20) or 20), 100))
     if not query:
         return _text("Please provide a non-empty 'query'.")
 
-    matches = []
-    for nid, note in _NOTES.items():
-        if query in note["title"].lower() or query in note["content"].lower() or any(query in t.lower() for t in note.get("tags", [])):
-            matches.append({"note_id": nid, "title": note["title"], "tags": note.get("tags", []), "snippet": note["content"][:120]})
-        if len(matches) >= limit:
-            break
-
+    store = get_store()
+    matches = await asyncio.to_thread(store.search, query, limit)
     if not matches:
-        return _text(f"No notes found for '{query}'. (store has {len(_NOTES)} notes)")
+        total = await asyncio.to_thread(store.count)
+        return _text(f"No notes found for '{query}'. (store has {total} notes)")
     return {"results": matches, "total": len(matches)}
 
 
@@ -61,7 +85,7 @@ async def notes_read(args: Json) -> Json:
     note_id = str(args.get("note_id", "")).strip()
     if not note_id:
         return _text("Please provide a 'note_id'.")
-    note = _NOTES.get(note_id)
+    note = await asyncio.to_thread(get_store().get, note_id)
     if not note:
         return _text(f"Note '{note_id}' not found.")
     return {"note_id": note_id, **note}
@@ -73,11 +97,10 @@ async def notes_create(args: Json) -> Json:
         return gate
     title = str(args.get("title", "")).strip()
     content = str(args.get("content", "")).strip()
-    tags = args.get("tags") or []
+    tags = [str(t) for t in (args.get("tags") or []) if str(t).strip()]
     if not title:
         return _text("Please provide a 'title'.")
-    note_id = f"note-{uuid.uuid4().hex[:8]}"
-    _NOTES[note_id] = {"title": title, "content": content, "tags": tags, "created_at": time.time(), "updated_at": time.time()}
+    note_id = await asyncio.to_thread(get_store().create, title, content, tags)
     return _text(f"Created note '{note_id}': {title}")
 
 
@@ -89,11 +112,8 @@ async def notes_append(args: Json) -> Json:
     content = str(args.get("content", "")).strip()
     if not note_id or not content:
         return _text("Please provide 'note_id' and 'content'.")
-    note = _NOTES.get(note_id)
-    if not note:
+    if not await asyncio.to_thread(get_store().append, note_id, content):
         return _text(f"Note '{note_id}' not found.")
-    note["content"] += "\n" + content
-    note["updated_at"] = time.time()
     return _text(f"Appended to note '{note_id}'.")
 
 
@@ -105,11 +125,8 @@ async def notes_update(args: Json) -> Json:
     content = str(args.get("content", "")).strip()
     if not note_id or not content:
         return _text("Please provide 'note_id' and 'content'.")
-    note = _NOTES.get(note_id)
-    if not note:
+    if not await asyncio.to_thread(get_store().update, note_id, content):
         return _text(f"Note '{note_id}' not found.")
-    note["content"] = content
-    note["updated_at"] = time.time()
     return _text(f"Updated note '{note_id}'.")
 
 
@@ -120,9 +137,8 @@ async def notes_delete(args: Json) -> Json:
     note_id = str(args.get("note_id", "")).strip()
     if not note_id:
         return _text("Please provide a 'note_id'.")
-    if note_id not in _NOTES:
+    if not await asyncio.to_thread(get_store().delete, note_id):
         return _text(f"Note '{note_id}' not found.")
-    del _NOTES[note_id]
     return _text(f"Deleted note '{note_id}'.")
 
 
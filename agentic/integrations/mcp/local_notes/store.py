@@ -0,0 +1,276 @@
+"""SQLite note store with an incrementally maintained inverted index.
+
+Notes live in ``notes.sqlite3`` under NOTES_STORAGE_DIR. Every note is
+tokenized into ``postings`` rows (term, note_id, weighted term frequency);
+title and tag terms count more than body terms. Writes keep the postings in
+step with the note: ``create`` inserts them, ``append`` only adds the terms
+of the appended text, ``update`` rebuilds that one note, ``delete`` drops
+its rows. A search then touches only the postings of its query terms and
+ranks the notes that contain all of them with BM25. Queries the index cannot
+answer (single characters, the middle of a word) fall back to a plain
+substring match over titles, content and tags, newest notes first.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+TITLE_WEIGHT = 3.0
+TAG_WEIGHT = 3.0
+PREFIX_WEIGHT = 0.5  # "meet" still finds "meeting", below an exact hit
+K1 = 1.2
+B = 0.75
+SNIPPET_CHARS = 120
+
+_TOKEN = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    length REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    note_id TEXT NOT NULL,
+    tf REAL NOT NULL,
+    PRIMARY KEY (term, note_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_note ON postings(note_id);
+"""
+
+
+def tokens(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if len(t) > 1 or t.isdigit()]
+
+
+def _weighted_terms(title: str, content: str, tags: Iterable[str]) -> Counter:
+    counts: Counter = Counter()
+    for term in tokens(title):
+        counts[term] += TITLE_WEIGHT
+    for tag in tags:
+        for term in tokens(tag):
+            counts[term] += TAG_WEIGHT
+    counts.update(tokens(content))
+    return counts
+
+
+def _snippet(content: str, terms: List[str]) -> str:
+    low = content.lower()
+    hits = [i for i in (low.find(t) for t in terms) if i >= 0]
+    start = max(0, min(hits) - SNIPPET_CHARS // 4) if hits else 0
+    text = content[start:start + SNIPPET_CHARS]
+    return ("…" if start else "") + text
+
+
+class NoteStore:
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+    # ── writes ─────────────────────────────────────────────────────────
+
+    def _add_postings(self, note_id: str, counts: Counter) -> None:
+        self._db.executemany(
+            "INSERT INTO postings(term, note_id, tf) VALUES (?, ?, ?) "
+            "ON CONFLICT(term, note_id) DO UPDATE SET tf = tf + excluded.tf",
+            [(term, note_id, tf) for term, tf in counts.items()],
+        )
+
+    def create(self, title: str, content: str, tags: List[str]) -> str:
+        note_id = f"note-{uuid.uuid4().hex[:8]}"
+        counts = _weighted_terms(title, content, tags)
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO notes(id, title, content, tags, created_at, updated_at, length) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (note_id, title, content, json.dumps(tags), now, now, sum(counts.values())),
+                )
+                self._add_postings(note_id, counts)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return note_id
+
+    def append(self, note_id: str, content: str) -> bool:
+        counts = Counter(tokens(content))
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._db.execute(
+                    "UPDATE notes SET content = content || ?, updated_at = ?, length = length + ? WHERE id = ?",
+                    ("\n" + content, time.time(), sum(counts.values()), note_id),
+                )
+                if cur.rowcount:
+                    self._add_postings(note_id, counts)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return bool(cur.rowcount)
+
+    def update(self, note_id: str, content: str) -> bool:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT title, tags FROM notes WHERE id = ?", (note_id,)).fetchone()
+                if row is not None:
+                    counts = _weighted_terms(row["title"], content, json.loads(row["tags"]))
+                    self._db.execute(
+                        "UPDATE notes SET content = ?, updated_at = ?, length = ? WHERE id = ?",
+                        (content, time.time(), sum(counts.values()), note_id),
+                    )
+                    self._db.execute("DELETE FROM postings WHERE note_id = ?", (note_id,))
+                    self._add_postings(note_id, counts)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return row is not None
+
+    def delete(self, note_id: str) -> bool:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._db.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+                self._db.execute("DELETE FROM postings WHERE note_id = ?", (note_id,))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return bool(cur.rowcount)
+
+    # ── reads ──────────────────────────────────────────────────────────
+
+    def get(self, note_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT title, content, tags, created_at, updated_at FROM notes WHERE id = ?", (note_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "title": row["title"],
+            "content": row["content"],
+            "tags": json.loads(row["tags"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def _term_weights(self, term: str) -> Dict[str, float]:
+        """note_id -> tf for ``term``, counting prefix expansions at PREFIX_WEIGHT."""
+        weights: Dict[str, float] = {}
+        rows = self._db.execute(
+            "SELECT term, note_id, tf FROM postings WHERE term >= ? AND term < ?", (term, term + "\uffff")
+        )
+        for found, note_id, tf in rows:
+            weights[note_id] = weights.get(note_id, 0.0) + (tf if found == term else tf * PREFIX_WEIGHT)
+        return weights
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        return self._ranked_search(query, limit) or self._substring_search(query, limit)
+
+    def _substring_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        results: List[Dict[str, Any]] = []
+        with self._lock:
+            rows = self._db.execute("SELECT id, title, content, tags FROM notes ORDER BY updated_at DESC, id")
+            for row in rows:
+                tags = json.loads(row["tags"])
+                if (
+                    needle in row["title"].lower()
+                    or needle in row["content"].lower()
+                    or any(needle in t.lower() for t in tags)
+                ):
+                    results.append({
+                        "note_id": row["id"],
+                        "title": row["title"],
+                        "tags": tags,
+                        "snippet": _snippet(row["content"], [needle]),
+                        "score": 0.0,
+                    })
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def _ranked_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        terms = list(dict.fromkeys(tokens(query)))
+        if not terms:
+            return []
+        with self._lock:
+            total, avg_len = self._db.execute("SELECT COUNT(*), AVG(length) FROM notes").fetchone()
+            if not total:
+                return []
+            per_term = []
+            for term in terms:
+                weights = self._term_weights(term)
+                if not weights:
+                    return []
+                per_term.append(weights)
+
+            matching = set.intersection(*(set(w) for w in per_term))
+            if not matching:
+                return []
+            lengths = dict(
+                self._db.execute(
+                    f"SELECT id, length FROM notes WHERE id IN ({','.join('?' * len(matching))})", list(matching)
+                ).fetchall()
+            )
+            avg_len = avg_len or 1.0
+            scores: Dict[str, float] = {}
+            for weights in per_term:
+                idf = math.log(1 + (total - len(weights) + 0.5) / (len(weights) + 0.5))
+                for note_id in matching:
+                    tf = weights[note_id]
+                    norm = K1 * (1 - B + B * lengths.get(note_id, avg_len) / avg_len)
+                    scores[note_id] = scores.get(note_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+            top = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+            rows = {
+                r["id"]: r
+                for r in self._db.execute(
+                    f"SELECT id, title, content, tags FROM notes WHERE id IN ({','.join('?' * len(top))})",
+                    [note_id for note_id, _ in top],
+                )
+            }
+        return [
+            {
+                "note_id": note_id,
+                "title": rows[note_id]["title"],
+                "tags": json.loads(rows[note_id]["tags"]),
+                "snippet": _snippet(rows[note_id]["content"], terms),
+                "score": round(score, 4),
+            }
+            for note_id, score in top
+        ]
@@ -102,3 +102,83 @@ async def test_tool_names_namespaced():
     data = await _post_rpc("tools/list")
     for tool in data["result"]["tools"]:
         assert tool["name"].startswith("hp.")
+
+
+# ── Indexed store ─────────────────────────────────────────────────────
+
+from agentic.integrations.mcp.local_notes import app as notes_app  # noqa: E402
+
+
+@pytest.fixture()
+def writable_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("NOTES_STORAGE_DIR", str(tmp_path))
+    monkeypatch.setattr(notes_app, "WRITE_ENABLED", True)
+    notes_app._reset_for_tests()
+    yield notes_app
+    notes_app._reset_for_tests()
+
+
+async def _call(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return (await _post_rpc("tools/call", {"name": name, "arguments": arguments}))["result"]
+
+
+async def _create(title: str, content: str, tags: list | None = None) -> str:
+    result = await _call("hp.notes.create", {"title": title, "content": content, "tags": tags or []})
+    return result["content"][0]["text"].split("'")[1]
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_title_and_tag_hits_first(writable_store):
+    body_only = await _create("Groceries", "buy milk before the roadmap review")
+    titled = await _create("Roadmap review", "agenda for Q3")
+    tagged = await _create("Standup", "daily notes", tags=["roadmap"])
+
+    result = await _call("hp.notes.search", {"query": "roadmap"})
+    ids = [r["note_id"] for r in result["results"]]
+    assert set(ids[:2]) == {titled, tagged}
+    assert ids[2] == body_only
+
+
+@pytest.mark.asyncio
+async def test_search_requires_all_terms_and_matches_prefixes(writable_store):
+    both = await _create("Meeting notes", "planning for the launch")
+    await _create("Launch checklist", "no gatherings here")
+
+    result = await _call("hp.notes.search", {"query": "meet launch"})
+    assert [r["note_id"] for r in result["results"]] == [both]
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_substring_match(writable_store):
+    meeting = await _create("Meeting notes", "planning for the launch")
+    await _create("Groceries", "milk and eggs", tags=["x-list"])
+
+    # Mid-word and single-character queries have no index term of their own.
+    assert [r["note_id"] for r in (await _call("hp.notes.search", {"query": "eting"}))["results"]] == [meeting]
+    assert (await _call("hp.notes.search", {"query": "x"}))["total"] == 1
+    assert "results" not in await _call("hp.notes.search", {"query": "zz"})
+
+
+@pytest.mark.asyncio
+async def test_index_follows_append_update_delete(writable_store):
+    note_id = await _create("Trip", "pack passport")
+    await _call("hp.notes.append", {"note_id": note_id, "content": "book kayak"})
+    assert (await _call("hp.notes.search", {"query": "kayak"}))["results"][0]["note_id"] == note_id
+
+    await _call("hp.notes.update", {"note_id": note_id, "content": "cancelled"})
+    assert "results" not in await _call("hp.notes.search", {"query": "passport"})
+    assert (await _call("hp.notes.search", {"query": "trip cancelled"}))["total"] == 1
+
+    await _call("hp.notes.delete", {"note_id": note_id})
+    assert "results" not in await _call("hp.notes.search", {"query": "trip"})
+    read = await _call("hp.notes.read", {"note_id": note_id})
+    assert "not found" in read["content"][0]["text"].lower()
+
+
+@pytest.mark.asyncio
+async def test_notes_persist_across_restart(writable_store):
+    note_id = await _create("Recipe", "sourdough starter ratios")
+    writable_store._reset_for_tests()
+    read = await _call("hp.notes.read", {"note_id": note_id})
+    assert read["content"] == "sourdough starter ratios"
+    assert (await _call("hp.notes.search", {"query": "sourdough"}))["results"][0]["note_id"] == note_id
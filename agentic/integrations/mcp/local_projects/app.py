@@ -6,15 +6,21 @@ Tools:
   projects.search_text(query, root_path?, file_globs?, limit=50)
   projects.write_file(path, content)   [write-gated]
   projects.diff(path, proposed_content)
+
+search_text answers from a persisted trigram index per root (see
+``indexer.py``) that is kept current by comparing file mtimes.
 """
 
 from __future__ import annotations
 
+import asyncio
 import os
+import re
 from pathlib import Path
 from typing import Any, Dict, List
 
 from agentic.integrations.mcp._common.server import Json, ToolDef, create_mcp_app
+from agentic.integrations.mcp.local_projects.indexer import get_index, indexes_containing
 
 WRITE_ENABLED = os.getenv("WRITE_ENABLED", "false").lower() == "true"
 DRY_RUN = os.getenv("DRY_RUN", "true").lower() == "true"
@@ -99,8 +105,31 @@ async def projects_search_text(args: Json) -> Json:
             return _text("No root_path provided and ALLOWED_ROOTS not configured.")
     if not _is_allowed(root_path):
         return _text(f"Access denied: '{root_path}'.")
-    # Placeholder search — in production, use ripgrep or index
-    return _text(f"Search for '{query}' in '{root_path}' (placeholder — {limit} max results).")
+    root = Path(root_path)
+    if not root.is_dir():
+        return _text(f"'{root_path}' is not a directory.")
+    regex = bool(args.get("regex", False))
+    if regex:
+        try:
+            re.compile(query)
+        except re.error as e:
+            return _text(f"Invalid regex '{query}': {e}")
+    globs = [str(g) for g in (args.get("file_globs") or [])]
+
+    def run() -> Dict[str, Any]:
+        index = get_index(root, is_allowed=lambda p: _is_allowed(str(p)))
+        return index.search(
+            query,
+            regex=regex,
+            case_sensitive=bool(args.get("case_sensitive", False)),
+            globs=globs,
+            limit=limit,
+        )
+
+    found = await asyncio.to_thread(run)
+    if not found["results"]:
+        return _text(f"No matches for '{query}' in '{root_path}' ({found['indexed_files']} files indexed).")
+    return {"root": root_path, "query": query, "total": len(found["results"]), **found}
 
 
 async def projects_write_file(args: Json) -> Json:
@@ -115,6 +144,8 @@ async def projects_write_file(args: Json) -> Json:
         return _text(f"Access denied: '{path}'.")
     Path(path).parent.mkdir(parents=True, exist_ok=True)
     Path(path).write_text(content)
+    for index in indexes_containing(Path(path)):
+        index.update_path(Path(path))
     return _text(f"Wrote {len(content)} bytes to '{path}'.")
 
 
@@ -160,13 +191,15 @@ TOOLS: List[ToolDef] = [
     ),
     ToolDef(
         name="hp.projects.search_text",
-        description="Search for text across project files.",
+        description="Search project files for a substring or regex; ranked, line-numbered hits.",
         input_schema={
             "type": "object",
             "properties": {
                 "query": {"type": "string"},
                 "root_path": {"type": "string"},
                 "file_globs": {"type": "array", "items": {"type": "string"}},
+                "regex": {"type": "boolean", "default": False},
+                "case_sensitive": {"type": "boolean", "default": False},
                 "limit": {"type": "integer", "default": 50, "minimum": 1, "maximum": 200},
             },
             "required": ["query"],
@@ -0,0 +1,343 @@
+"""Incremental trigram index over a project root.
+
+Each root gets one ``ProjectIndex``, persisted under PROJECTS_INDEX_DIR so a
+restart does not re-read the tree. The index records every text file's
+mtime and size and maps each lower-cased trigram to the ids of the files
+containing it (``array('I')`` posting lists). A query is narrowed to the
+files holding all trigrams of its required literals, and only those files
+are opened and matched line by line; queries shorter than a trigram scan
+every indexed file (helpers shared with archive_workspace in
+``_common/trigrams.py``).
+
+Keeping it current is a ``refresh``: walk the tree, stat each file, and
+re-read only the files whose (mtime, size) changed. A search never waits
+for a refresh of an index it already has; it serves the current postings
+and starts one in the background once the index is older than
+PROJECTS_INDEX_REFRESH_S. Candidate files are re-stat'ed before they are
+read, so an edited file never reports stale lines. Writes through the
+server update their path immediately.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import logging
+import math
+import os
+import pickle
+import re
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from agentic.integrations.mcp._common.trigrams import candidates, required_literals, trigrams_of
+
+logger = logging.getLogger(__name__)
+
+_FORMAT = 1
+MAX_FILE_BYTES = 1024 * 1024
+SNIFF_BYTES = 8192
+MAX_HITS_PER_FILE = 20
+REFRESH_BATCH = 500
+PREVIEW_CHARS = 200
+SKIP_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox", "dist", "build", ".next",
+}
+
+
+def read_text(path: Path) -> Optional[str]:
+    """File text, or None for binaries and oversized files."""
+    try:
+        with open(path, "rb") as fh:
+            data = fh.read(MAX_FILE_BYTES + 1)
+    except OSError:
+        return None
+    if len(data) > MAX_FILE_BYTES or b"\x00" in data[:SNIFF_BYTES]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+@dataclass
+class FileEntry:
+    id: int
+    mtime_ns: int
+    size: int
+    indexed: bool  # False for binary / oversized files
+
+
+class ProjectIndex:
+    def __init__(self, root: Path, state_dir: Path, *, is_allowed: Callable[[Path], bool]) -> None:
+        self.root = root
+        self.state_path = state_dir / (hashlib.sha1(str(root).encode()).hexdigest()[:16] + ".pkl")
+        self.is_allowed = is_allowed
+        self.files: Dict[str, FileEntry] = {}
+        self.postings: Dict[str, array] = {}
+        self.next_id = 1
+        self.retired = 0
+        self.refreshed_at = 0.0
+        self.lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._load()
+
+    # ── persistence ────────────────────────────────────────────────────
+
+    def _load(self) -> None:
+        try:
+            with open(self.state_path, "rb") as fh:
+                data = pickle.load(fh)
+        except FileNotFoundError:
+            return
+        except Exception as exc:  # noqa: BLE001 - a bad index is rebuilt
+            logger.warning("local_projects: discarding index %s: %s", self.state_path, exc)
+            return
+        if data.get("format") != _FORMAT or data.get("root") != str(self.root):
+            return
+        self.files = {p: FileEntry(*e) for p, e in data["files"].items()}
+        self.postings = data["postings"]
+        self.next_id = data["next_id"]
+        self.retired = data["retired"]
+
+    def save(self) -> None:
+        with self.lock:
+            data = {
+                "format": _FORMAT,
+                "root": str(self.root),
+                "files": {p: (e.id, e.mtime_ns, e.size, e.indexed) for p, e in self.files.items()},
+                "postings": self.postings,
+                "next_id": self.next_id,
+                "retired": self.retired,
+            }
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(".tmp")
+            with open(tmp, "wb") as fh:
+                pickle.dump(data, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.state_path)
+
+    # ── maintenance ────────────────────────────────────────────────────
+
+    def _walk(self) -> Dict[str, Tuple[int, int]]:
+        """rel path -> (mtime_ns, size) for every file under the root."""
+        found: Dict[str, Tuple[int, int]] = {}
+        stack = [self.root]
+        while stack:
+            current = stack.pop()
+            try:
+                entries = list(os.scandir(current))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_symlink():
+                    continue
+                path = Path(entry.path)
+                if not self.is_allowed(path):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(path)
+                elif entry.is_file(follow_symlinks=False):
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    found[path.relative_to(self.root).as_posix()] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def _apply(self, rel: str, stat: Optional[Tuple[int, int]], grams: Optional[Set[str]]) -> None:
+        """Record a new version of ``rel`` (or its removal when ``stat`` is None). Caller holds the lock."""
+        if rel in self.files:
+            self.retired += 1
+            del self.files[rel]
+        if stat is None:
+            return
+        entry = FileEntry(self.next_id, stat[0], stat[1], grams is not None)
+        self.next_id += 1
+        self.files[rel] = entry
+        if grams is not None:
+            postings = self.postings
+            for tri in grams:
+                lst = postings.get(tri)
+                if lst is None:
+                    lst = postings[tri] = array("I")
+                lst.append(entry.id)
+
+    def _prune(self) -> None:
+        live = {e.id for e in self.files.values() if e.indexed}
+        pruned: Dict[str, array] = {}
+        for tri, lst in self.postings.items():
+            kept = array("I", (i for i in lst if i in live))
+            if kept:
+                pruned[tri] = kept
+        self.postings = pruned
+        self.retired = 0
+
+    def refresh(self) -> int:
+        """Bring the index in line with the tree; returns the number of changed paths."""
+        with self._refreshing:
+            current = self._walk()
+            with self.lock:
+                known = {p: (e.mtime_ns, e.size) for p, e in self.files.items()}
+            changed = [p for p, st in current.items() if known.get(p) != st]
+            removed = [p for p in known if p not in current]
+
+            with self.lock:
+                for rel in removed:
+                    self._apply(rel, None, None)
+            # Read in batches outside the lock so searches keep running meanwhile.
+            for start in range(0, len(changed), REFRESH_BATCH):
+                batch = []
+                for rel in changed[start:start + REFRESH_BATCH]:
+                    text = read_text(self.root / rel)
+                    batch.append((rel, None if text is None else trigrams_of(text)))
+                with self.lock:
+                    for rel, grams in batch:
+                        self._apply(rel, current[rel], grams)
+            with self.lock:
+                if self.retired > max(1000, len(self.files) // 2):
+                    self._prune()
+                self.refreshed_at = time.time()
+        if changed or removed:
+            self.save()
+        return len(changed) + len(removed)
+
+    def update_path(self, path: Path) -> None:
+        """Re-index one file right away (after a write through the server)."""
+        try:
+            rel = path.resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return
+        try:
+            st = path.stat()
+        except OSError:
+            stat, grams = None, None
+        else:
+            text = read_text(path)
+            stat, grams = (st.st_mtime_ns, st.st_size), None if text is None else trigrams_of(text)
+        with self.lock:
+            self._apply(rel, stat, grams)
+
+    # ── queries ────────────────────────────────────────────────────────
+
+    def search(
+        self,
+        query: str,
+        *,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        globs: Iterable[str] = (),
+        limit: int = 50,
+    ) -> Dict[str, object]:
+        """Ranked, line-numbered hits: files scored by hit count, word matches and path matches."""
+        pattern = re.compile(query if regex else re.escape(query), re.MULTILINE | (0 if case_sensitive else re.IGNORECASE))
+        word = re.compile(r"\b(?:%s)\b" % pattern.pattern, pattern.flags) if not regex else None
+        globs = [g for g in globs if g]
+
+        with self.lock:
+            ids = candidates(self.postings, required_literals(query, regex=regex))
+            entries = [(p, e) for p, e in self.files.items() if e.indexed and (ids is None or e.id in ids)]
+        if globs:
+            entries = [(p, e) for p, e in entries if any(fnmatch.fnmatch(p, g) or fnmatch.fnmatch(p.rsplit("/", 1)[-1], g) for g in globs)]
+
+        ranked: List[Tuple[float, str, List[dict]]] = []
+        stale: List[str] = []
+        for rel, entry in entries:
+            path = self.root / rel
+            try:
+                st = path.stat()
+            except OSError:
+                stale.append(rel)
+                continue
+            if (st.st_mtime_ns, st.st_size) != (entry.mtime_ns, entry.size):
+                stale.append(rel)
+            text = read_text(path)
+            if text is None:
+                continue
+            hits: List[dict] = []
+            word_hits = 0
+            line_no, pos, last_line = 1, 0, 0
+            for m in pattern.finditer(text):
+                line_no += text.count("\n", pos, m.start())
+                pos = m.start()
+                if line_no == last_line:
+                    continue
+                last_line = line_no
+                lo = text.rfind("\n", 0, pos) + 1
+                hi = text.find("\n", pos)
+                line = text[lo:hi if hi >= 0 else len(text)]
+                hits.append({"path": rel, "line": line_no, "text": line.strip()[:PREVIEW_CHARS]})
+                if word is not None and word.search(line):
+                    word_hits += 1
+                if len(hits) >= MAX_HITS_PER_FILE:
+                    break
+            if not hits:
+                continue
+            score = math.log1p(len(hits)) + 0.5 * math.log1p(word_hits)
+            if pattern.search(rel.rsplit("/", 1)[-1]):
+                score += 2.0
+            score -= 0.05 * rel.count("/")
+            ranked.append((score, rel, hits))
+
+        for rel in stale:
+            self.update_path(self.root / rel)
+
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        results: List[dict] = []
+        for score, _rel, hits in ranked:
+            for hit in hits:
+                results.append({**hit, "score": round(score, 3)})
+                if len(results) >= limit:
+                    break
+            if len(results) >= limit:
+                break
+        return {"results": results, "files_matched": len(ranked), "files_scanned": len(entries), "indexed_files": len(self.files)}
+
+
+# ── registry ───────────────────────────────────────────────────────────
+
+_indexes: Dict[str, ProjectIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def index_dir() -> Path:
+    raw = os.getenv("PROJECTS_INDEX_DIR", "").strip()
+    return Path(raw).expanduser() if raw else Path.home() / ".homepilot" / "local_projects" / "index"
+
+
+def refresh_interval_s() -> float:
+    return float(os.getenv("PROJECTS_INDEX_REFRESH_S", "5"))
+
+
+def _background_refresh(index: ProjectIndex) -> None:
+    try:
+        index.refresh()
+    except Exception:  # noqa: BLE001
+        logger.exception("local_projects: refresh of %s failed", index.root)
+
+
+def get_index(root: Path, *, is_allowed: Callable[[Path], bool]) -> ProjectIndex:
+    """The index for ``root``: built on first use, then refreshed in the background when stale."""
+    root = root.resolve()
+    with _registry_lock:
+        index = _indexes.get(str(root))
+        if index is None:
+            index = _indexes[str(root)] = ProjectIndex(root, index_dir(), is_allowed=is_allowed)
+    if index.refreshed_at == 0.0 and not index.files:
+        index.refresh()
+    elif time.time() - index.refreshed_at > refresh_interval_s() and not index._refreshing.locked():
+        threading.Thread(target=_background_refresh, args=(index,), daemon=True).start()
+    return index
+
+
+def indexes_containing(path: Path) -> List[ProjectIndex]:
+    path = path.resolve()
+    with _registry_lock:
+        return [ix for ix in _indexes.values() if path == ix.root or ix.root in path.parents]
+
+
+def _reset_for_tests() -> None:
+    with _registry_lock:
+        _indexes.clear()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 from typing import Any, Dict
@@ -82,3 +83,95 @@ async def test_tool_names_namespaced():
     data = await _post_rpc("tools/list")
     for tool in data["result"]["tools"]:
         assert tool["name"].startswith("hp.")
+
+
+# ── Indexed search ────────────────────────────────────────────────────
+
+from agentic.integrations.mcp.local_projects import app as projects_app  # noqa: E402
+from agentic.integrations.mcp.local_projects import indexer  # noqa: E402
+
+
+@pytest.fixture()
+def project(tmp_path, monkeypatch):
+    root = tmp_path / "repo"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "node_modules" / "dep").mkdir(parents=True)
+    (root / "src" / "pkg" / "handlers.py").write_text("import os\n\ndef handle_request(req):\n    return req\n")
+    (root / "src" / "pkg" / "request_utils.py").write_text("def parse(req):\n    return handle_request(req)\n")
+    (root / "README.md").write_text("Call handle_request from the router.\nhandle_request handles it.\n")
+    (root / "node_modules" / "dep" / "index.js").write_text("handle_request()\n")
+    (root / "logo.bin").write_bytes(b"\x00\x01handle_request\x00")
+    (root / ".env").write_text("SECRET=handle_request\n")
+    monkeypatch.setattr(projects_app, "ALLOWED_ROOTS", [str(root)])
+    monkeypatch.setenv("PROJECTS_INDEX_DIR", str(tmp_path / "index"))
+    indexer._reset_for_tests()
+    yield root
+    indexer._reset_for_tests()
+
+
+async def _search(root: Path, **arguments: Any) -> Dict[str, Any]:
+    params = {"name": "hp.projects.search_text", "arguments": {"root_path": str(root), **arguments}}
+    return (await _post_rpc("tools/call", params))["result"]
+
+
+@pytest.mark.asyncio
+async def test_search_text_returns_ranked_line_hits(project):
+    result = await _search(project, query="handle_request")
+    hits = [(r["path"], r["line"]) for r in result["results"]]
+    # README has two hits; node_modules, binaries and blocked files are skipped.
+    assert hits[:2] == [("README.md", 1), ("README.md", 2)]
+    assert set(hits) == {("README.md", 1), ("README.md", 2), ("src/pkg/handlers.py", 3), ("src/pkg/request_utils.py", 2)}
+    assert result["results"][0]["text"] == "Call handle_request from the router."
+
+
+@pytest.mark.asyncio
+async def test_search_text_regex_and_globs(project):
+    result = await _search(project, query=r"def \w+\(req\)", regex=True, file_globs=["*.py"])
+    assert sorted((r["path"], r["line"]) for r in result["results"]) == [("src/pkg/handlers.py", 3), ("src/pkg/request_utils.py", 1)]
+
+    bad = await _search(project, query="(", regex=True)
+    assert "invalid regex" in bad["content"][0]["text"].lower()
+
+
+@pytest.mark.asyncio
+async def test_search_text_shorter_than_a_trigram_scans_every_file(project):
+    result = await _search(project, query="os")
+    assert [(r["path"], r["line"]) for r in result["results"]] == [("src/pkg/handlers.py", 1)]
+    assert result["files_scanned"] == 3  # every text file; logo.bin is not indexed
+
+
+@pytest.mark.asyncio
+async def test_search_text_follows_file_changes(project):
+    await _search(project, query="handle_request")
+    (project / "README.md").write_text("nothing to see\n")
+    (project / "src" / "new.py").write_text("handle_request = None\n")
+    os.utime(project / "README.md", ns=(1, 1))
+
+    # Edited candidates are re-read at query time; new files arrive with the next refresh.
+    result = await _search(project, query="handle_request")
+    assert "README.md" not in {r["path"] for r in result["results"]}
+    indexer.get_index(project, is_allowed=lambda p: True).refresh()
+    result = await _search(project, query="handle_request")
+    assert "src/new.py" in {r["path"] for r in result["results"]}
+
+
+@pytest.mark.asyncio
+async def test_write_file_updates_index(project, monkeypatch):
+    monkeypatch.setattr(projects_app, "WRITE_ENABLED", True)
+    await _search(project, query="zebra_marker")
+    target = project / "src" / "zoo.py"
+    await _post_rpc("tools/call", {"name": "hp.projects.write_file", "arguments": {"path": str(target), "content": "zebra_marker = 1\n"}})
+    result = await _search(project, query="zebra_marker")
+    assert result["results"][0]["path"] == "src/zoo.py"
+
+
+@pytest.mark.asyncio
+async def test_index_persists_and_respects_allowed_roots(project, tmp_path):
+    await _search(project, query="handle_request")
+    indexer._reset_for_tests()
+    reloaded = indexer.ProjectIndex(project.resolve(), tmp_path / "index", is_allowed=lambda p: True)
+    assert "src/pkg/handlers.py" in reloaded.files
+    assert reloaded.files["logo.bin"].indexed is False
+
+    denied = await _search(tmp_path, query="handle_request")
+    assert "access denied" in denied["content"][0]["text"].lower()
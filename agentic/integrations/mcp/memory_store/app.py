@@ -1,45 +1,151 @@
+"""memory_store MCP server.
+
+Memories persist in a backend chosen by MEMORY_STORE_BACKEND (SQLite by
+default, or Redis). Each scope is capped at MEMORY_STORE_SCOPE_MAX_ENTRIES,
+oldest entries evicted first; entries may carry a TTL and are swept from
+the expiry index in batches. ``hp.memory.recall`` with a ``query`` ranks
+entries by keyword relevance (inverted index) blended with recency; without
+one it returns the latest entries.
+"""
+
 from __future__ import annotations
 
+import asyncio
+import math
+import threading
+import time
 from datetime import datetime, timezone
+from typing import Optional
 
 from agentic.integrations.mcp._common.server import ToolDef, create_mcp_app
+from agentic.integrations.mcp.memory_store import config
+from agentic.integrations.mcp.memory_store.domain.memory_logic import MemoryEntry, MemoryStore, enforce_cap
+from agentic.integrations.mcp.memory_store.domain.recall import recall, terms_of
+from agentic.integrations.mcp.memory_store.domain.ttl import Sweeper, expires_at
+
+_store: Optional[MemoryStore] = None
+_sweeper: Optional[Sweeper] = None
+_store_lock = threading.Lock()
+
+
+def _open_store() -> MemoryStore:
+    if config.backend() == "redis":
+        from agentic.integrations.mcp.memory_store.infra.redis_store import RedisMemoryStore
+
+        return RedisMemoryStore.from_url(config.redis_url())
+    from agentic.integrations.mcp.memory_store.infra.sqlite_store import SQLiteMemoryStore
+
+    return SQLiteMemoryStore(config.db_path())
 
-_MEMORY: dict[str, list[dict]] = {}
+
+def get_store() -> MemoryStore:
+    global _store, _sweeper
+    with _store_lock:
+        if _store is None:
+            _store = _open_store()
+            _sweeper = Sweeper(_store, batch=config.SWEEP_BATCH, interval_s=config.SWEEP_INTERVAL_S)
+        return _store
+
+
+def set_store(store: Optional[MemoryStore]) -> None:
+    """Swap the backend (tests, or hosts that build their own client)."""
+    global _store, _sweeper
+    with _store_lock:
+        if _store is not None and _store is not store:
+            _store.close()
+        _store = store
+        _sweeper = Sweeper(store, batch=config.SWEEP_BATCH, interval_s=config.SWEEP_INTERVAL_S) if store else None
+
+
+def _reset_for_tests() -> None:
+    set_store(None)
 
 
 def _content(text: str, **meta: object) -> dict:
     return {"content": [{"type": "text", "text": text}], "meta": meta}
 
 
+def _item(entry: MemoryEntry, score: Optional[float] = None) -> dict:
+    item = {"id": entry.id, "value": entry.value, "ts": datetime.fromtimestamp(entry.ts, timezone.utc).isoformat()}
+    if entry.expires_at is not None:
+        item["expires_at"] = datetime.fromtimestamp(entry.expires_at, timezone.utc).isoformat()
+    if score is not None:
+        item["score"] = round(score, 4)
+    return item
+
+
+def _sweep() -> None:
+    if _sweeper is not None:
+        _sweeper.maybe_sweep()
+
+
+def _append(scope: str, value: str, ttl_s: Optional[float]) -> tuple[int, int, int]:
+    store = get_store()
+    _sweep()
+    now = time.time()
+    entry_id = store.add(
+        scope, value, ts=now, expires_at=expires_at(now, ttl_s, config.default_ttl_s()), terms=terms_of(value)
+    )
+    evicted = enforce_cap(store, scope, config.scope_max_entries(), now=now)
+    return entry_id, evicted, store.count(scope, now=now)
+
+
+def _recall(scope: str, query: str, limit: int) -> list[dict]:
+    store = get_store()
+    _sweep()
+    now = time.time()
+    if not query:
+        return [_item(e) for e in reversed(store.recent(scope, limit, now=now))]
+    ranked = recall(
+        store,
+        scope,
+        query,
+        limit=limit,
+        now=now,
+        half_life_s=config.recency_half_life_s(),
+        max_candidates=config.MAX_CANDIDATES,
+    )
+    return [_item(e, score) for e, score in ranked]
+
+
 async def append_memory(args: dict) -> dict:
     scope = str(args.get("scope", "default"))
     value = str(args.get("value", "")).strip()
     if not value:
         return _content("Missing required field: value", ok=False)
+    ttl_raw = args.get("ttl_s")
+    ttl_s: Optional[float] = None
+    if ttl_raw is not None and ttl_raw != "":
+        try:
+            ttl_s = float(ttl_raw)
+        except (TypeError, ValueError):
+            ttl_s = math.nan
+        if isinstance(ttl_raw, bool) or not math.isfinite(ttl_s) or ttl_s < 0:
+            return _content("Invalid field: ttl_s must be a non-negative number of seconds", ok=False)
 
-    entry = {"value": value, "ts": datetime.now(timezone.utc).isoformat()}
-    _MEMORY.setdefault(scope, []).append(entry)
-    return _content("Memory appended.", ok=True, scope=scope, size=len(_MEMORY[scope]))
+    entry_id, evicted, size = await asyncio.to_thread(_append, scope, value, ttl_s)
+    return _content("Memory appended.", ok=True, scope=scope, id=entry_id, size=size, evicted=evicted)
 
 
 async def recall_memory(args: dict) -> dict:
     scope = str(args.get("scope", "default"))
+    query = str(args.get("query", "") or "").strip()
     limit = max(1, min(int(args.get("limit", 10) or 10), 100))
-    items = _MEMORY.get(scope, [])[-limit:]
+    items = await asyncio.to_thread(_recall, scope, query, limit)
     lines = [f"Memory scope={scope}, entries={len(items)}"] + [f"- {item['value']}" for item in items]
-    return _content("\n".join(lines), ok=True, items=items, scope=scope)
+    return _content("\n".join(lines), ok=True, items=items, scope=scope, query=query)
 
 
 async def forget_memory(args: dict) -> dict:
     scope = str(args.get("scope", "default"))
-    deleted = len(_MEMORY.pop(scope, []))
+    deleted = await asyncio.to_thread(lambda: get_store().forget(scope))
     return _content(f"Deleted {deleted} entries.", ok=True, scope=scope, deleted=deleted)
 
 
 def register_tools() -> list[ToolDef]:
     return [
-        ToolDef("hp.memory.append", "Append memory row", {"type": "object", "properties": {"scope": {"type": "string"}, "value": {"type": "string"}}, "required": ["value"]}, append_memory),
-        ToolDef("hp.memory.recall", "Recall memories", {"type": "object", "properties": {"scope": {"type": "string"}, "limit": {"type": "integer"}}}, recall_memory),
+        ToolDef("hp.memory.append", "Append memory row", {"type": "object", "properties": {"scope": {"type": "string"}, "value": {"type": "string"}, "ttl_s": {"type": "number"}}, "required": ["value"]}, append_memory),
+        ToolDef("hp.memory.recall", "Recall memories, ranked by relevance when a query is given", {"type": "object", "properties": {"scope": {"type": "string"}, "query": {"type": "string"}, "limit": {"type": "integer"}}}, recall_memory),
         ToolDef("hp.memory.forget", "Delete memory scope", {"type": "object", "properties": {"scope": {"type": "string"}}}, forget_memory),
     ]
 
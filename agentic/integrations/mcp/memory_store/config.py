@@ -1,6 +1,43 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
 
 LOG_LEVEL = os.getenv('MEMORY_STORE_LOG_LEVEL', 'INFO')
 SERVICE_NAME = os.getenv('MEMORY_STORE_SERVICE_NAME', 'mcp-memory-store')
+
+
+def backend() -> str:
+    """``sqlite`` (default) or ``redis``."""
+    return os.getenv('MEMORY_STORE_BACKEND', 'sqlite').strip().lower() or 'sqlite'
+
+
+def db_path() -> Path:
+    raw = os.getenv('MEMORY_STORE_DB_PATH', '').strip()
+    return Path(raw) if raw else Path.home() / '.homepilot' / 'memory_store' / 'memory.sqlite3'
+
+
+def redis_url() -> str:
+    return os.getenv('MEMORY_STORE_REDIS_URL', 'redis://localhost:6379/0')
+
+
+def default_ttl_s() -> float:
+    """TTL applied when ``hp.memory.append`` gets none; 0 keeps entries until evicted."""
+    return float(os.getenv('MEMORY_STORE_DEFAULT_TTL_S', '0'))
+
+
+def scope_max_entries() -> int:
+    """Per-scope cap; the oldest entries are evicted past it."""
+    return max(1, int(os.getenv('MEMORY_STORE_SCOPE_MAX_ENTRIES', '5000')))
+
+
+def recency_half_life_s() -> float:
+    return float(os.getenv('MEMORY_STORE_RECENCY_HALF_LIFE_H', '72')) * 3600
+
+
+# Expired entries are deleted this many at a time, at most once per interval.
+SWEEP_BATCH = 500
+SWEEP_INTERVAL_S = 30.0
+
+# Keyword hits scored for recency/ranking per recall.
+MAX_CANDIDATES = 500
@@ -1,5 +1,66 @@
+"""Storage contract for memory backends and the write path policy."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class MemoryEntry:
+    id: int
+    scope: str
+    value: str
+    ts: float
+    expires_at: Optional[float]
+    length: int  # indexed term count, for length-normalised scoring
+
+
+class MemoryStore(ABC):
+    """One backend holding entries, their inverted index and the expiry index.
+
+    Reads and counts never include entries whose ``expires_at`` has passed,
+    whether or not the sweeper has deleted them yet.
+    """
+
+    @abstractmethod
+    def add(self, scope: str, value: str, *, ts: float, expires_at: Optional[float], terms: Dict[str, int]) -> int:
+        """Store an entry and its term frequencies; returns its id."""
+
+    @abstractmethod
+    def count(self, scope: str, *, now: float) -> int:
+        """Live entries in ``scope``."""
+
+    @abstractmethod
+    def evict_oldest(self, scope: str, n: int, *, now: float) -> int:
+        """Delete the ``n`` oldest live entries of ``scope``."""
+
+    @abstractmethod
+    def recent(self, scope: str, limit: int, *, now: float) -> List[MemoryEntry]:
+        """Newest live entries first."""
+
+    @abstractmethod
+    def postings(self, scope: str, terms: Iterable[str], *, now: float) -> Dict[str, Dict[int, int]]:
+        """``term -> {live entry id: term frequency}`` for the given terms."""
+
+    @abstractmethod
+    def get_many(self, ids: Iterable[int], *, now: float) -> Dict[int, MemoryEntry]:
+        """Live entries by id; missing or expired ids are left out."""
+
+    @abstractmethod
+    def forget(self, scope: str) -> int:
+        """Delete every entry of ``scope``."""
+
+    @abstractmethod
+    def sweep_expired(self, now: float, *, batch: int) -> int:
+        """Delete up to ``batch`` expired entries (oldest expiry first)."""
+
+    def close(self) -> None:
+        pass
+
+
+def enforce_cap(store: MemoryStore, scope: str, cap: int, *, now: float) -> int:
+    """Evict the oldest live entries of ``scope`` beyond ``cap``; returns how many."""
+    over = store.count(scope, now=now) - cap
+    return store.evict_oldest(scope, over, now=now) if over > 0 else 0
@@ -1,5 +1,78 @@
+"""Relevance-ranked recall: BM25 keyword score over the inverted index,
+blended with an exponential recency decay."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from agentic.integrations.mcp.memory_store.domain.memory_logic import MemoryEntry, MemoryStore
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9_'-]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its me my of on or so that the this "
+    "to was we were what when where which who will with you your".split()
+)
+
+K1 = 1.2
+B = 0.75
+AVG_LENGTH = 12.0  # typical memory length in terms; avoids a per-scope stats pass
+RECENCY_WEIGHT = 0.3
+
+
+def terms_of(text: str) -> Dict[str, int]:
+    return dict(Counter(t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1))
+
+
+def recency(age_s: float, half_life_s: float) -> float:
+    return 0.5 ** (max(0.0, age_s) / half_life_s) if half_life_s > 0 else 1.0
+
+
+def recall(
+    store: MemoryStore,
+    scope: str,
+    query: str,
+    *,
+    limit: int,
+    now: float,
+    half_life_s: float,
+    max_candidates: int,
+) -> List[Tuple[MemoryEntry, float]]:
+    """Best ``limit`` live entries for ``query`` with their scores, best first.
+
+    Only entries sharing at least one term with the query are considered.
+    """
+    q_terms = list(terms_of(query))
+    if not q_terms:
+        return []
+    # Both already exclude expired entries, so they neither skew idf nor
+    # take candidate slots from live ones.
+    postings = store.postings(scope, q_terms, now=now)
+    n = max(1, store.count(scope, now=now))
+
+    # First pass on postings alone (tf/df); lengths come with the entries.
+    partial: Dict[int, Dict[str, int]] = {}
+    idf: Dict[str, float] = {}
+    for term, hits in postings.items():
+        if not hits:
+            continue
+        idf[term] = math.log(1 + (n - len(hits) + 0.5) / (len(hits) + 0.5))
+        for entry_id, tf in hits.items():
+            partial.setdefault(entry_id, {})[term] = tf
+    if not partial:
+        return []
+    ranked_ids = sorted(
+        partial, key=lambda i: sum(idf[t] * tf for t, tf in partial[i].items()), reverse=True
+    )[:max_candidates]
+    entries = store.get_many(ranked_ids, now=now)
+
+    scored: List[Tuple[MemoryEntry, float]] = []
+    for entry_id, entry in entries.items():
+        norm = K1 * (1 - B + B * entry.length / AVG_LENGTH)
+        bm25 = sum(idf[t] * tf * (K1 + 1) / (tf + norm) for t, tf in partial[entry_id].items())
+        score = bm25 * (1 - RECENCY_WEIGHT + RECENCY_WEIGHT * recency(now - entry.ts, half_life_s))
+        scored.append((entry, score))
+    scored.sort(key=lambda pair: (pair[1], pair[0].ts), reverse=True)
+    return scored[:limit]
@@ -1,5 +1,53 @@
+"""Entry expiry: TTL resolution and batched sweeping of the expiry index."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import threading
+import time
+from typing import Optional
+
+from agentic.integrations.mcp.memory_store.domain.memory_logic import MemoryStore
+
+
+def expires_at(now: float, ttl_s: Optional[float], default_ttl_s: float) -> Optional[float]:
+    """Absolute expiry for a new entry; ``None`` never expires.
+
+    An explicit ``ttl_s`` of 0 opts out of the default TTL.
+    """
+    ttl = default_ttl_s if ttl_s is None else ttl_s
+    return now + ttl if ttl and ttl > 0 else None
+
+
+class Sweeper:
+    """Deletes expired entries in batches, at most once per ``interval_s``.
+
+    Called opportunistically from the tool handlers rather than from a
+    background thread; reads already hide expired entries, so sweeping only
+    reclaims space and keeps postings short.
+    """
+
+    def __init__(self, store: MemoryStore, *, batch: int, interval_s: float):
+        self.store = store
+        self.batch = batch
+        self.interval_s = interval_s
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def maybe_sweep(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        if now - self._last < self.interval_s or not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            self._last = now
+            return self.sweep(now)
+        finally:
+            self._lock.release()
+
+    def sweep(self, now: float) -> int:
+        """Delete every expired entry, one batch per store call."""
+        total = 0
+        while True:
+            deleted = self.store.sweep_expired(now, batch=self.batch)
+            total += deleted
+            if deleted < self.batch:
+                return total
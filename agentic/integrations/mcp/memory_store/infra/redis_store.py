@@ -1,5 +1,176 @@
+"""Redis memory backend.
+
+Keys (``prefix`` defaults to ``hp:mem``)::
+
+    {p}:next_id             INCR counter for entry ids
+    {p}:e:{id}              hash: scope, value, ts, expires_at, length, terms
+    {p}:s:{scope}           zset: entry id scored by ts (recency, eviction)
+    {p}:t:{scope}:{term}    hash: entry id -> term frequency (inverted index)
+    {p}:expiry              zset: entry id scored by expires_at (sweeper)
+    {p}:x:{scope}           zset: the scope's expiring entry ids by expires_at,
+                            to leave expired-but-unswept entries out of
+                            counts, eviction and postings
+
+Expiry is handled by the sweeper rather than Redis key TTLs so postings and
+scope sets are cleaned up together with the entry.
+
+The client must be created with ``decode_responses=True``. ``redis`` is only
+imported by :meth:`RedisMemoryStore.from_url`, so the SQLite backend works
+without it.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from agentic.integrations.mcp.memory_store.domain.memory_logic import MemoryEntry, MemoryStore
+
+
+class RedisMemoryStore(MemoryStore):
+    def __init__(self, client: Any, *, prefix: str = "hp:mem"):
+        self.r = client
+        self.p = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisMemoryStore":
+        import redis  # optional dependency
+
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def close(self) -> None:
+        close = getattr(self.r, "close", None)
+        if close is not None:
+            close()
+
+    def _entry_key(self, entry_id: int | str) -> str:
+        return f"{self.p}:e:{entry_id}"
+
+    def _scope_key(self, scope: str) -> str:
+        return f"{self.p}:s:{scope}"
+
+    def _term_key(self, scope: str, term: str) -> str:
+        return f"{self.p}:t:{scope}:{term}"
+
+    def _expiry_key(self, scope: str) -> str:
+        return f"{self.p}:x:{scope}"
+
+    def _expired(self, scope: str, now: float) -> set:
+        return set(self.r.zrangebyscore(self._expiry_key(scope), "-inf", now))
+
+    def add(self, scope: str, value: str, *, ts: float, expires_at: Optional[float], terms: Dict[str, int]) -> int:
+        entry_id = int(self.r.incr(f"{self.p}:next_id"))
+        pipe = self.r.pipeline(transaction=True)
+        pipe.hset(self._entry_key(entry_id), mapping={
+            "scope": scope,
+            "value": value,
+            "ts": repr(ts),
+            "expires_at": "" if expires_at is None else repr(expires_at),
+            "length": sum(terms.values()),
+            "terms": json.dumps(sorted(terms)),
+        })
+        pipe.zadd(self._scope_key(scope), {entry_id: ts})
+        for term, tf in terms.items():
+            pipe.hset(self._term_key(scope, term), entry_id, tf)
+        if expires_at is not None:
+            pipe.zadd(f"{self.p}:expiry", {entry_id: expires_at})
+            pipe.zadd(self._expiry_key(scope), {entry_id: expires_at})
+        pipe.execute()
+        return entry_id
+
+    def count(self, scope: str, *, now: float) -> int:
+        return int(self.r.zcard(self._scope_key(scope))) - len(self._expired(scope, now))
+
+    def _delete_ids(self, ids: List[str], *, scope_hint: Optional[str] = None) -> int:
+        if not ids:
+            return 0
+        read = self.r.pipeline(transaction=False)
+        for entry_id in ids:
+            read.hmget(self._entry_key(entry_id), "scope", "terms")
+        meta = read.execute()
+
+        pipe = self.r.pipeline(transaction=True)
+        if scope_hint is not None:
+            # Also drops ids whose entry hash is already gone.
+            pipe.zrem(self._scope_key(scope_hint), *ids)
+        deleted = 0
+        for entry_id, (scope, terms) in zip(ids, meta):
+            pipe.zrem(f"{self.p}:expiry", entry_id)
+            if scope is None:
+                continue
+            deleted += 1
+            for term in json.loads(terms or "[]"):
+                pipe.hdel(self._term_key(scope, term), entry_id)
+            pipe.zrem(self._scope_key(scope), entry_id)
+            pipe.zrem(self._expiry_key(scope), entry_id)
+            pipe.delete(self._entry_key(entry_id))
+        pipe.execute()
+        return deleted
+
+    def evict_oldest(self, scope: str, n: int, *, now: float) -> int:
+        expired = self._expired(scope, now)
+        ids: List[str] = []
+        start = 0
+        # Skip expired-but-unswept entries; the sweeper owns those.
+        while len(ids) < n:
+            page = list(self.r.zrange(self._scope_key(scope), start, start + n + len(expired) - 1))
+            if not page:
+                break
+            ids.extend(i for i in page if i not in expired)
+            start += len(page)
+        return self._delete_ids(ids[:n], scope_hint=scope)
+
+    def _load(self, ids: List[str], now: float) -> List[MemoryEntry]:
+        pipe = self.r.pipeline(transaction=False)
+        for entry_id in ids:
+            pipe.hmget(self._entry_key(entry_id), "scope", "value", "ts", "expires_at", "length")
+        out = []
+        for entry_id, (scope, value, ts, exp, length) in zip(ids, pipe.execute()):
+            if scope is None:
+                continue
+            expires_at = float(exp) if exp else None
+            if expires_at is not None and expires_at <= now:
+                continue
+            out.append(MemoryEntry(int(entry_id), scope, value, float(ts), expires_at, int(length)))
+        return out
+
+    def recent(self, scope: str, limit: int, *, now: float) -> List[MemoryEntry]:
+        out: List[MemoryEntry] = []
+        start = 0
+        # Over-fetch in pages so expired-but-unswept entries don't shorten the result.
+        while len(out) < limit:
+            ids = list(self.r.zrevrange(self._scope_key(scope), start, start + limit - 1))
+            if not ids:
+                break
+            out.extend(self._load(ids, now))
+            start += limit
+        return out[:limit]
+
+    def postings(self, scope: str, terms: Iterable[str], *, now: float) -> Dict[str, Dict[int, int]]:
+        terms = list(terms)
+        expired = self._expired(scope, now)
+        pipe = self.r.pipeline(transaction=False)
+        for term in terms:
+            pipe.hgetall(self._term_key(scope, term))
+        return {
+            term: {int(k): int(v) for k, v in (hits or {}).items() if k not in expired}
+            for term, hits in zip(terms, pipe.execute())
+        }
+
+    def get_many(self, ids: Iterable[int], *, now: float) -> Dict[int, MemoryEntry]:
+        return {e.id: e for e in self._load([str(i) for i in ids], now)}
+
+    def forget(self, scope: str) -> int:
+        total = 0
+        while True:
+            ids = list(self.r.zrange(self._scope_key(scope), 0, 499))
+            if not ids:
+                return total
+            total += self._delete_ids(ids, scope_hint=scope)
+
+    def sweep_expired(self, now: float, *, batch: int) -> int:
+        ids = list(self.r.zrangebyscore(f"{self.p}:expiry", "-inf", now, start=0, num=batch))
+        if not ids:
+            return 0
+        self._delete_ids(ids)
+        return len(ids)
@@ -0,0 +1,161 @@
+"""Local SQLite memory backend.
+
+``memories`` holds the entries; ``postings`` is the inverted index
+(scope, term) -> entry with its term frequency; a partial index on
+``expires_at`` is the expiry index the sweeper walks.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from agentic.integrations.mcp.memory_store.domain.memory_logic import MemoryEntry, MemoryStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id         INTEGER PRIMARY KEY,
+    scope      TEXT    NOT NULL,
+    value      TEXT    NOT NULL,
+    ts         REAL    NOT NULL,
+    expires_at REAL,
+    length     INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_memories_scope_ts ON memories (scope, ts);
+CREATE INDEX IF NOT EXISTS ix_memories_expiry ON memories (expires_at) WHERE expires_at IS NOT NULL;
+CREATE TABLE IF NOT EXISTS postings (
+    scope     TEXT    NOT NULL,
+    term      TEXT    NOT NULL,
+    memory_id INTEGER NOT NULL,
+    tf        INTEGER NOT NULL,
+    PRIMARY KEY (scope, term, memory_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_postings_memory ON postings (memory_id);
+"""
+
+_COLUMNS = "id, scope, value, ts, expires_at, length"
+_LIVE = "(expires_at IS NULL OR expires_at > ?)"
+
+
+def _entry(row: sqlite3.Row) -> MemoryEntry:
+    return MemoryEntry(row[0], row[1], row[2], row[3], row[4], row[5])
+
+
+class SQLiteMemoryStore(MemoryStore):
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def add(self, scope: str, value: str, *, ts: float, expires_at: Optional[float], terms: Dict[str, int]) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                cur = self._conn.execute(
+                    "INSERT INTO memories (scope, value, ts, expires_at, length) VALUES (?, ?, ?, ?, ?)",
+                    (scope, value, ts, expires_at, sum(terms.values())),
+                )
+                entry_id = cur.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO postings (scope, term, memory_id, tf) VALUES (?, ?, ?, ?)",
+                    [(scope, term, entry_id, tf) for term, tf in terms.items()],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return int(entry_id)
+
+    def count(self, scope: str, *, now: float) -> int:
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM memories WHERE scope = ? AND {_LIVE}", (scope, now)
+            ).fetchone()[0]
+
+    def _delete_ids(self, ids: List[int]) -> int:
+        """Caller holds the lock."""
+        if not ids:
+            return 0
+        marks = ",".join("?" * len(ids))
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.execute(f"DELETE FROM postings WHERE memory_id IN ({marks})", ids)
+            cur = self._conn.execute(f"DELETE FROM memories WHERE id IN ({marks})", ids)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return cur.rowcount
+
+    def evict_oldest(self, scope: str, n: int, *, now: float) -> int:
+        with self._lock:
+            ids = [r[0] for r in self._conn.execute(
+                f"SELECT id FROM memories WHERE scope = ? AND {_LIVE} ORDER BY ts, id LIMIT ?", (scope, now, n)
+            )]
+            return self._delete_ids(ids)
+
+    def recent(self, scope: str, limit: int, *, now: float) -> List[MemoryEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM memories WHERE scope = ? AND {_LIVE} ORDER BY ts DESC, id DESC LIMIT ?",
+                (scope, now, limit),
+            ).fetchall()
+        return [_entry(r) for r in rows]
+
+    def postings(self, scope: str, terms: Iterable[str], *, now: float) -> Dict[str, Dict[int, int]]:
+        terms = list(terms)
+        out: Dict[str, Dict[int, int]] = {t: {} for t in terms}
+        if not terms:
+            return out
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT term, memory_id, tf FROM postings JOIN memories ON memories.id = postings.memory_id "
+                f"WHERE postings.scope = ? AND term IN ({','.join('?' * len(terms))}) AND {_LIVE}",
+                (scope, *terms, now),
+            ).fetchall()
+        for term, entry_id, tf in rows:
+            out[term][entry_id] = tf
+        return out
+
+    def get_many(self, ids: Iterable[int], *, now: float) -> Dict[int, MemoryEntry]:
+        ids = list(ids)
+        if not ids:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM memories WHERE id IN ({','.join('?' * len(ids))}) AND {_LIVE}",
+                (*ids, now),
+            ).fetchall()
+        return {r[0]: _entry(r) for r in rows}
+
+    def forget(self, scope: str) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM postings WHERE scope = ?", (scope,))
+                cur = self._conn.execute("DELETE FROM memories WHERE scope = ?", (scope,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cur.rowcount
+
+    def sweep_expired(self, now: float, *, batch: int) -> int:
+        with self._lock:
+            ids = [r[0] for r in self._conn.execute(
+                "SELECT id FROM memories WHERE expires_at IS NOT NULL AND expires_at <= ? ORDER BY expires_at LIMIT ?",
+                (now, batch),
+            )]
+            return self._delete_ids(ids)
@@ -0,0 +1,130 @@
+"""In-process stand-in for the subset of redis-py used by RedisMemoryStore.
+
+Behaves like a client created with ``decode_responses=True``: everything is
+stored and returned as ``str``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+
+def _s(value: Any) -> str:
+    return value if isinstance(value, str) else repr(value) if isinstance(value, float) else str(value)
+
+
+def _score(bound: Any) -> float:
+    return float(bound) if bound not in ("-inf", "+inf", "inf") else float(bound.lstrip("+"))
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: Dict[str, Any] = {}
+        self.commands = 0
+
+    # strings
+    def incr(self, key: str) -> int:
+        self.commands += 1
+        self.data[key] = str(int(self.data.get(key, "0")) + 1)
+        return int(self.data[key])
+
+    def delete(self, *keys: str) -> int:
+        self.commands += 1
+        return sum(self.data.pop(k, None) is not None for k in keys)
+
+    # hashes
+    def hset(self, name: str, key: Any = None, value: Any = None, mapping: Dict[str, Any] | None = None) -> int:
+        self.commands += 1
+        h = self.data.setdefault(name, {})
+        items = dict(mapping or {})
+        if key is not None:
+            items[key] = value
+        added = 0
+        for k, v in items.items():
+            added += _s(k) not in h
+            h[_s(k)] = _s(v)
+        return added
+
+    def hmget(self, name: str, *keys: str) -> List[Any]:
+        self.commands += 1
+        h = self.data.get(name, {})
+        return [h.get(k) for k in keys]
+
+    def hgetall(self, name: str) -> Dict[str, str]:
+        self.commands += 1
+        return dict(self.data.get(name, {}))
+
+    def hdel(self, name: str, *keys: Any) -> int:
+        self.commands += 1
+        h = self.data.get(name, {})
+        n = sum(h.pop(_s(k), None) is not None for k in keys)
+        if name in self.data and not h:
+            del self.data[name]
+        return n
+
+    # sorted sets
+    def zadd(self, name: str, mapping: Dict[Any, float]) -> int:
+        self.commands += 1
+        z = self.data.setdefault(name, {})
+        added = sum(_s(m) not in z for m in mapping)
+        z.update({_s(m): float(s) for m, s in mapping.items()})
+        return added
+
+    def zrem(self, name: str, *members: Any) -> int:
+        self.commands += 1
+        z = self.data.get(name, {})
+        n = sum(z.pop(_s(m), None) is not None for m in members)
+        if name in self.data and not z:
+            del self.data[name]
+        return n
+
+    def zcard(self, name: str) -> int:
+        self.commands += 1
+        return len(self.data.get(name, {}))
+
+    def _sorted(self, name: str) -> List[str]:
+        z = self.data.get(name, {})
+        return sorted(z, key=lambda m: (z[m], m))
+
+    def zrange(self, name: str, start: int, end: int) -> List[str]:
+        self.commands += 1
+        members = self._sorted(name)
+        return members[start:None if end == -1 else end + 1]
+
+    def zrevrange(self, name: str, start: int, end: int) -> List[str]:
+        self.commands += 1
+        members = self._sorted(name)[::-1]
+        return members[start:None if end == -1 else end + 1]
+
+    def zrangebyscore(self, name: str, min: Any, max: Any, start: int | None = None, num: int | None = None) -> List[str]:
+        self.commands += 1
+        z = self.data.get(name, {})
+        hits = [m for m in self._sorted(name) if _score(min) <= z[m] <= _score(max)]
+        if start is not None and num is not None:
+            hits = hits[start:start + num]
+        return hits
+
+    def pipeline(self, transaction: bool = True) -> "_Pipeline":
+        return _Pipeline(self)
+
+    def close(self) -> None:
+        pass
+
+
+class _Pipeline:
+    def __init__(self, client: FakeRedis):
+        self._client = client
+        self._calls: List[tuple] = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self._client, name)
+
+        def queue(*args: Any, **kwargs: Any) -> "_Pipeline":
+            self._calls.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> List[Any]:
+        calls, self._calls = self._calls, []
+        return [method(*args, **kwargs) for method, args, kwargs in calls]
@@ -1,2 +1,125 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from agentic.integrations.mcp.memory_store import app as server
+from agentic.integrations.mcp.memory_store.domain.memory_logic import enforce_cap
+from agentic.integrations.mcp.memory_store.domain.recall import recall, recency, terms_of
+from agentic.integrations.mcp.memory_store.infra.redis_store import RedisMemoryStore
+from agentic.integrations.mcp.memory_store.infra.sqlite_store import SQLiteMemoryStore
+from agentic.integrations.mcp.memory_store.tests.fake_redis import FakeRedis
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        s = SQLiteMemoryStore(tmp_path / "memory.sqlite3")
+    else:
+        s = RedisMemoryStore(FakeRedis())
+    yield s
+    s.close()
+
+
+def _add(store, scope, value, ts, expires_at=None):
+    return store.add(scope, value, ts=ts, expires_at=expires_at, terms=terms_of(value))
+
+
+def test_terms_drop_stopwords_and_count():
+    assert terms_of("The cat and the other cat") == {"cat": 2, "other": 1}
+
+
+def test_recall_ranks_keyword_matches(store):
+    now = time.time()
+    _add(store, "u1", "User prefers dark roast coffee", now - 60)
+    _add(store, "u1", "Coffee machine is in the kitchen", now - 30)
+    _add(store, "u1", "Birthday is in March", now - 10)
+    _add(store, "u2", "dark roast coffee every morning", now)
+
+    ranked = recall(store, "u1", "dark roast coffee", limit=5, now=now, half_life_s=3600, max_candidates=100)
+    assert [e.value for e, _ in ranked] == ["User prefers dark roast coffee", "Coffee machine is in the kitchen"]
+    assert recall(store, "u1", "the of", limit=5, now=now, half_life_s=3600, max_candidates=100) == []
+
+
+def test_recall_prefers_recent_when_relevance_ties(store):
+    now = time.time()
+    _add(store, "s", "meeting with Alex on project", now - 30 * 86400)
+    _add(store, "s", "meeting with Alex on budget", now - 60)
+    ranked = recall(store, "s", "alex meeting", limit=2, now=now, half_life_s=86400, max_candidates=100)
+    assert ranked[0][0].value == "meeting with Alex on budget"
+    assert recency(86400, 86400) == pytest.approx(0.5)
+
+
+def test_recent_newest_first(store):
+    now = time.time()
+    for i in range(5):
+        _add(store, "s", f"note {i}", now + i)
+    assert [e.value for e in store.recent("s", 3, now=now)] == ["note 4", "note 3", "note 2"]
+
+
+def test_cap_evicts_oldest_and_their_postings(store):
+    now = time.time()
+    for i in range(6):
+        _add(store, "s", f"fact number{i} alpha", now + i)
+    assert enforce_cap(store, "s", 4, now=now) == 2
+    assert store.count("s", now=now) == 4
+    assert store.postings("s", ["number0"], now=now) == {"number0": {}}
+    assert len(store.postings("s", ["alpha"], now=now)["alpha"]) == 4
+
+
+def test_forget_scope(store):
+    now = time.time()
+    _add(store, "a", "one thing", now)
+    _add(store, "b", "other thing", now)
+    assert store.forget("a") == 1
+    assert store.count("a", now=now) == 0
+    assert list(store.postings("b", ["thing"], now=now)["thing"]) != []
+
+
+def test_sqlite_store_persists(tmp_path):
+    path = tmp_path / "memory.sqlite3"
+    s = SQLiteMemoryStore(path)
+    _add(s, "s", "persisted preference for tea", time.time())
+    s.close()
+    s = SQLiteMemoryStore(path)
+    try:
+        ranked = recall(s, "s", "tea", limit=1, now=time.time(), half_life_s=3600, max_candidates=10)
+        assert ranked[0][0].value == "persisted preference for tea"
+    finally:
+        s.close()
+
+
+@pytest.fixture()
+def sqlite_server(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_STORE_DB_PATH", str(tmp_path / "memory.sqlite3"))
+    monkeypatch.setenv("MEMORY_STORE_SCOPE_MAX_ENTRIES", "3")
+    server._reset_for_tests()
+    yield server
+    server._reset_for_tests()
+
+
+@pytest.mark.asyncio
+async def test_tools_append_recall_forget(sqlite_server):
+    for value in ("likes jazz", "lives in Lisbon", "allergic to peanuts", "prefers jazz vinyl"):
+        res = await server.append_memory({"scope": "u", "value": value})
+    assert res["meta"]["size"] == 3
+    assert res["meta"]["evicted"] == 1
+
+    latest = await server.recall_memory({"scope": "u", "limit": 2})
+    assert [i["value"] for i in latest["meta"]["items"]] == ["allergic to peanuts", "prefers jazz vinyl"]
+
+    ranked = await server.recall_memory({"scope": "u", "query": "jazz"})
+    assert [i["value"] for i in ranked["meta"]["items"]] == ["prefers jazz vinyl"]
+    assert ranked["meta"]["items"][0]["score"] > 0
+
+    gone = await server.forget_memory({"scope": "u"})
+    assert gone["meta"]["deleted"] == 3
+
+
+@pytest.mark.asyncio
+async def test_tools_survive_restart(sqlite_server):
+    await server.append_memory({"scope": "u", "value": "remember the garage code"})
+    server._reset_for_tests()
+    res = await server.recall_memory({"scope": "u", "query": "garage"})
+    assert res["meta"]["items"][0]["value"] == "remember the garage code"
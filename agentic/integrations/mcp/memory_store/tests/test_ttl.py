@@ -1,2 +1,104 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from agentic.integrations.mcp.memory_store import app as server
+from agentic.integrations.mcp.memory_store.domain.memory_logic import enforce_cap
+from agentic.integrations.mcp.memory_store.domain.recall import recall, terms_of
+from agentic.integrations.mcp.memory_store.domain.ttl import Sweeper, expires_at
+from agentic.integrations.mcp.memory_store.infra.redis_store import RedisMemoryStore
+from agentic.integrations.mcp.memory_store.infra.sqlite_store import SQLiteMemoryStore
+from agentic.integrations.mcp.memory_store.tests.fake_redis import FakeRedis
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def store(request, tmp_path):
+    s = SQLiteMemoryStore(tmp_path / "m.sqlite3") if request.param == "sqlite" else RedisMemoryStore(FakeRedis())
+    yield s
+    s.close()
+
+
+def test_expires_at():
+    assert expires_at(100.0, None, 0) is None
+    assert expires_at(100.0, None, 50) == 150.0
+    assert expires_at(100.0, 10, 50) == 110.0
+    assert expires_at(100.0, 0, 50) is None
+
+
+def test_expired_entries_are_hidden_before_sweep(store):
+    now = time.time()
+    store.add("s", "short lived secret", ts=now, expires_at=now + 5, terms=terms_of("short lived secret"))
+    store.add("s", "long lived secret", ts=now, expires_at=None, terms=terms_of("long lived secret"))
+    later = now + 10
+    assert [e.value for e in store.recent("s", 10, now=later)] == ["long lived secret"]
+    ranked = recall(store, "s", "secret", limit=5, now=later, half_life_s=3600, max_candidates=10)
+    assert [e.value for e, _ in ranked] == ["long lived secret"]
+
+
+def test_sweep_deletes_in_batches(store):
+    now = time.time()
+    for i in range(25):
+        store.add("s", f"temp item{i}", ts=now, expires_at=now + i, terms=terms_of(f"temp item{i}"))
+    store.add("s", "keeper", ts=now, expires_at=None, terms=terms_of("keeper"))
+
+    assert store.sweep_expired(now + 100, batch=10) == 10
+    sweeper = Sweeper(store, batch=10, interval_s=60)
+    assert sweeper.sweep(now + 100) == 15
+    assert store.count("s", now=now + 100) == 1
+    assert store.postings("s", ["temp"], now=now + 100) == {"temp": {}}
+
+    # Rate limited: a second call within the interval does nothing.
+    store.add("s", "gone soon", ts=now, expires_at=now + 1, terms=terms_of("gone soon"))
+    assert sweeper.maybe_sweep(now + 200) == 1
+    store.add("s", "gone too", ts=now, expires_at=now + 1, terms=terms_of("gone too"))
+    assert sweeper.maybe_sweep(now + 210) == 0
+
+
+def test_sweep_only_touches_expired_entries(store):
+    now = time.time()
+    store.add("s", "future", ts=now, expires_at=now + 1000, terms=terms_of("future"))
+    assert store.sweep_expired(now, batch=10) == 0
+    assert store.count("s", now=now) == 1
+
+
+def test_expired_entries_take_no_candidate_slots(store):
+    now = time.time()
+    store.add("s", "secret secret secret", ts=now, expires_at=now + 5, terms=terms_of("secret secret secret"))
+    store.add("s", "a secret note", ts=now, expires_at=None, terms=terms_of("a secret note"))
+    later = now + 10
+    assert store.postings("s", ["secret"], now=later)["secret"].keys() == {2}
+    ranked = recall(store, "s", "secret", limit=5, now=later, half_life_s=3600, max_candidates=1)
+    assert [e.value for e, _ in ranked] == ["a secret note"]
+
+
+def test_cap_counts_only_live_entries(store):
+    now = time.time()
+    for i in range(3):
+        store.add("s", f"stale {i}", ts=now + i, expires_at=now + 5, terms=terms_of(f"stale {i}"))
+    for i in range(3):
+        store.add("s", f"fresh {i}", ts=now + 10 + i, expires_at=None, terms=terms_of(f"fresh {i}"))
+    later = now + 20
+    assert store.count("s", now=later) == 3
+    assert enforce_cap(store, "s", 3, now=later) == 0
+    assert enforce_cap(store, "s", 2, now=later) == 1
+    assert [e.value for e in store.recent("s", 10, now=later)] == ["fresh 2", "fresh 1"]
+
+
+@pytest.mark.asyncio
+async def test_append_with_ttl(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_STORE_DB_PATH", str(tmp_path / "memory.sqlite3"))
+    server._reset_for_tests()
+    try:
+        res = await server.append_memory({"scope": "u", "value": "one-time code 1234", "ttl_s": 60})
+        assert res["meta"]["ok"] is True
+        items = (await server.recall_memory({"scope": "u"}))["meta"]["items"]
+        assert "expires_at" in items[0]
+
+        for bad in ("soon", -5, float("inf"), [60]):
+            res = await server.append_memory({"scope": "u", "value": "never stored", "ttl_s": bad})
+            assert res["meta"]["ok"] is False and "ttl_s" in res["content"][0]["text"]
+        assert len((await server.recall_memory({"scope": "u"}))["meta"]["items"]) == 1
+    finally:
+        server._reset_for_tests()
@@ -1,31 +1,14 @@
 from __future__ import annotations
 
 from agentic.integrations.mcp._common.server import ToolDef, create_mcp_app
+from agentic.integrations.mcp.safety_policy.domain.policy_engine import score_text
+from agentic.integrations.mcp.safety_policy.domain.rules import RISK_TERMS
 
-_RISK_TERMS = {
-    "critical": {"self-harm", "suicide", "explosive", "weapon", "malware"},
-    "high": {"bypass", "steal", "password", "doxx", "phish"},
-    "medium": {"hack", "attack", "exploit", "jailbreak"},
-}
+_RISK_TERMS = RISK_TERMS
 
 
 def _score(text: str) -> tuple[float, str, list[str]]:
-    q = text.lower()
-    hits: list[str] = []
-    score = 0.0
-    for weight, terms in ((0.9, _RISK_TERMS["critical"]), (0.6, _RISK_TERMS["high"]), (0.3, _RISK_TERMS["medium"])):
-        for term in terms:
-            if term in q:
-                hits.append(term)
-                score = max(score, weight)
-    label = "low"
-    if score >= 0.9:
-        label = "critical"
-    elif score >= 0.6:
-        label = "high"
-    elif score >= 0.3:
-        label = "medium"
-    return score, label, hits
+    return score_text(text)
 
 
 def _content(text: str, **meta: object) -> dict:
@@ -1,5 +1,69 @@
+"""
+Compiled term scanner for the safety tools.
+
+Every tier's terms are folded into one case-insensitive alternation used as
+an overlapping lookahead, so a text is scanned once regardless of how many
+terms there are (the old loop did one ``in`` test per term).  At each
+position the lookahead reports the longest term starting there; shorter
+terms that are prefixes of it are added from a precomputed table, which
+makes the hit set identical to testing every term for containment.
+
+Scores are memoised per text — check_input, check_output and risk_score are
+commonly called on the same string by one agent turn.
+"""
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import re
+from functools import lru_cache
+from typing import Iterable, Mapping
+
+from agentic.integrations.mcp.safety_policy.domain.rules import RISK_TERMS, TIER_WEIGHTS, label_for
+
+
+class TermScanner:
+    """Single-pass substring matcher over tiered literal term sets."""
+
+    def __init__(self, tiers: Mapping[str, Iterable[str]], weights: Mapping[str, float]):
+        self._tier_of: dict[str, str] = {}
+        self._order: dict[str, int] = {}
+        for tier, terms in tiers.items():
+            for term in sorted(t.lower() for t in terms):
+                if term and term not in self._tier_of:
+                    self._tier_of[term] = tier
+                    self._order[term] = len(self._order)
+        self._weights = dict(weights)
+        terms = sorted(self._tier_of, key=len, reverse=True)
+        self._prefixes = {t: [p for p in terms if p != t and t.startswith(p)] for t in terms}
+        alternation = "|".join(re.escape(t) for t in terms)
+        self._rx = re.compile(f"(?=({alternation}))") if terms else None
+
+    def hits(self, text: str) -> list[str]:
+        """Every term contained in *text*, in tier order."""
+        if self._rx is None:
+            return []
+        found: set[str] = set()
+        for m in self._rx.finditer(text.lower()):
+            term = m.group(1)
+            if term not in found:
+                found.add(term)
+                found.update(self._prefixes[term])
+        return sorted(found, key=self._order.__getitem__)
+
+    def score(self, text: str) -> tuple[float, str, list[str]]:
+        hits = self.hits(text)
+        score = max((self._weights[self._tier_of[h]] for h in hits), default=0.0)
+        return score, label_for(score), hits
+
+
+SCANNER = TermScanner(RISK_TERMS, TIER_WEIGHTS)
+
+
+@lru_cache(maxsize=1024)
+def _cached_score(text: str) -> tuple[float, str, tuple[str, ...]]:
+    score, label, hits = SCANNER.score(text)
+    return score, label, tuple(hits)
+
+
+def score_text(text: str) -> tuple[float, str, list[str]]:
+    score, label, hits = _cached_score(text)
+    return score, label, list(hits)
@@ -1,5 +1,20 @@
+"""Risk term tables for hp.safety.* scoring, highest tier first."""
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+RISK_TERMS: dict[str, frozenset[str]] = {
+    "critical": frozenset({"self-harm", "suicide", "explosive", "weapon", "malware"}),
+    "high": frozenset({"bypass", "steal", "password", "doxx", "phish"}),
+    "medium": frozenset({"hack", "attack", "exploit", "jailbreak"}),
+}
+
+TIER_WEIGHTS: dict[str, float] = {"critical": 0.9, "high": 0.6, "medium": 0.3}
+
+
+def label_for(score: float) -> str:
+    if score >= 0.9:
+        return "critical"
+    if score >= 0.6:
+        return "high"
+    if score >= 0.3:
+        return "medium"
+    return "low"
@@ -1,2 +1,70 @@
-def test_placeholder() -> None:
-    assert True
+"""Tests for hp.safety.* risk scoring (compiled term scanner)."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[4]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from agentic.integrations.mcp.safety_policy.app import app  # noqa: E402
+from agentic.integrations.mcp.safety_policy.domain.policy_engine import TermScanner, score_text  # noqa: E402
+from agentic.integrations.mcp.safety_policy.domain.rules import RISK_TERMS, TIER_WEIGHTS  # noqa: E402
+
+
+def _legacy_score(text: str) -> tuple[float, set[str]]:
+    q = text.lower()
+    hits: set[str] = set()
+    score = 0.0
+    for tier, weight in TIER_WEIGHTS.items():
+        for term in RISK_TERMS[tier]:
+            if term in q:
+                hits.add(term)
+                score = max(score, weight)
+    return score, hits
+
+
+CORPUS = [
+    "",
+    "hello there",
+    "How do I hack my own router back after losing the PASSWORD?",
+    "explain how a phishing attack works so I can train staff",
+    "Jailbreak prompts and malware samples",
+    "selfharm vs self-harm wording",
+    "the attacker tried to steal credentials with an exploit kit",
+    "hackhackhack",
+]
+
+
+def test_scanner_matches_per_term_containment() -> None:
+    for text in CORPUS:
+        score, label, hits = score_text(text)
+        legacy_score, legacy_hits = _legacy_score(text)
+        assert score == legacy_score
+        assert set(hits) == legacy_hits
+        assert len(hits) == len(set(hits))
+
+
+def test_prefix_and_overlapping_terms_are_all_reported() -> None:
+    scanner = TermScanner({"a": {"he", "hers"}, "b": {"her", "she"}}, {"a": 0.9, "b": 0.3})
+    score, label, hits = scanner.score("USHERS")
+    assert set(hits) == {"he", "her", "hers", "she"}
+    assert hits[:2] == ["he", "hers"]  # tier order first
+    assert score == 0.9 and label == "critical"
+
+
+@pytest.mark.asyncio
+async def test_risk_score_tool_uses_compiled_scanner() -> None:
+    body = {"jsonrpc": "2.0", "id": "t", "method": "tools/call",
+            "params": {"name": "hp.safety.check_output", "arguments": {"text": "steal the password"}}}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as c:
+        r = await c.post("/rpc", json=body)
+    meta = r.json()["result"]["meta"]
+    assert meta["risk"] == "high" and meta["blocked"] is True
+    assert meta["hits"] == ["password", "steal"]
@@ -1,80 +1,112 @@
 from __future__ import annotations
 
-from urllib.parse import urlparse
-
 from agentic.integrations.mcp._common.server import ToolDef, create_mcp_app
+from agentic.integrations.mcp.web_search import config
+from agentic.integrations.mcp.web_search.domain.search import search
+from agentic.integrations.mcp.web_search.infra.extractor import extract_text
+from agentic.integrations.mcp.web_search.infra.fetcher import close_fetcher, get_fetcher
+from agentic.integrations.mcp.web_search.providers import get_provider
 
 
 def _as_content(text: str, **meta: object) -> dict:
     return {"content": [{"type": "text", "text": text}], "meta": meta}
 
 
+def _max_chars(args: dict, default: int) -> int:
+    return max(200, min(int(args.get("max_chars", default) or default), 50000))
+
+
 async def web_search(args: dict) -> dict:
     query = str(args.get("query", "")).strip()
     if not query:
         return _as_content("Missing required field: query", ok=False)
 
     limit = max(1, min(int(args.get("limit", 5) or 5), 20))
-    domains = [d.lower() for d in (args.get("domains") or []) if isinstance(d, str)]
-    base = [
-        {"title": f"{query} overview", "url": f"https://docs.example.com/search?q={query}", "snippet": "Official documentation and quick summary."},
-        {"title": f"{query} latest updates", "url": f"https://news.example.com/{query.replace(' ', '-')}", "snippet": "Recent updates and ecosystem changes."},
-        {"title": f"{query} reference", "url": f"https://reference.example.com/{query.replace(' ', '-')}", "snippet": "Reference links and deeper material."},
-    ]
-
-    if domains:
-        base = [r for r in base if urlparse(r["url"]).hostname in domains]
+    domains = [d.lower() for d in (args.get("domains") or []) if isinstance(d, str)] or None
+    fetch_top = max(0, min(int(args.get("fetch_top", 0) or 0), 10))
+    try:
+        results = await search(
+            get_provider(),
+            get_fetcher(),
+            query,
+            limit=limit,
+            recency_days=int(args.get("recency_days", 30) or 30),
+            domains=domains,
+            fetch_top=fetch_top,
+            max_chars=_max_chars(args, 2000),
+            max_distance=config.SIMHASH_DISTANCE,
+        )
+    except Exception as exc:  # noqa: BLE001 - provider errors are reported to the caller
+        return _as_content(f"Web search failed ({config.PROVIDER}): {exc}", ok=False, query=query)
 
-    results = base[:limit]
     lines = [f"Results for: {query}"]
     for idx, item in enumerate(results, start=1):
         lines.append(f"{idx}. {item['title']} — {item['url']}")
-        lines.append(f"   {item['snippet']}")
-
+        if item.get("snippet"):
+            lines.append(f"   {item['snippet']}")
+        if item.get("content"):
+            lines.append("   " + item["content"].replace("\n", "\n   "))
     return _as_content("\n".join(lines), ok=True, results=results)
 
 
 async def web_fetch(args: dict) -> dict:
+    urls = [str(u).strip() for u in (args.get("urls") or []) if str(u).strip()]
     url = str(args.get("url", "")).strip()
-    if not url:
+    if url:
+        urls.insert(0, url)
+    if not urls:
         return _as_content("Missing required field: url", ok=False)
 
-    max_chars = max(200, min(int(args.get("max_chars", 4000) or 4000), 50000))
-    text = (
-        f"Fetched content for {url}\n"
-        "This is a deterministic offline-safe response for MCP development and testing.\n"
-        "Use provider-backed fetchers in production deployments."
-    )[:max_chars]
-    return _as_content(text, ok=True, url=url, truncated=len(text) == max_chars)
+    max_chars = _max_chars(args, 4000)
+    pages = await get_fetcher().fetch_many(urls[:20], max_chars=max_chars)
+    if len(pages) == 1 and not args.get("urls"):
+        page = pages[0]
+        if not page.ok:
+            return _as_content(f"Fetch failed: {page.error}", ok=False, url=page.url)
+        return _as_content(
+            page.text or "No extractable text.",
+            ok=True,
+            url=page.url,
+            title=page.title,
+            truncated=page.truncated,
+            cache=page.cache,
+        )
+
+    blocks = []
+    for page in pages:
+        body = page.text if page.ok else f"Fetch failed: {page.error}"
+        blocks.append(f"## {page.title or page.url}\n{page.url}\n{body}")
+    return _as_content("\n\n".join(blocks), ok=True, pages=[p.to_dict() for p in pages])
 
 
 async def web_extract(args: dict) -> dict:
     html = str(args.get("html", ""))
-    text = " ".join(html.replace("<", " ").replace(">", " ").split())[:8000]
-    return _as_content(text or "No extractable text.", ok=True)
+    title, text = extract_text(html, _max_chars(args, 8000))
+    return _as_content(text or "No extractable text.", ok=True, title=title)
 
 
 def register_tools() -> list[ToolDef]:
     return [
         ToolDef(
             name="hp.web.search",
-            description="Search web with provider routing",
-            input_schema={"type": "object", "properties": {"query": {"type": "string"}, "limit": {"type": "integer"}, "domains": {"type": "array", "items": {"type": "string"}}}, "required": ["query"]},
+            description="Search web with provider routing; optionally fetch the top results",
+            input_schema={"type": "object", "properties": {"query": {"type": "string"}, "limit": {"type": "integer"}, "recency_days": {"type": "integer"}, "domains": {"type": "array", "items": {"type": "string"}}, "fetch_top": {"type": "integer"}, "max_chars": {"type": "integer"}}, "required": ["query"]},
             handler=web_search,
         ),
         ToolDef(
             name="hp.web.fetch",
-            description="Fetch a URL",
-            input_schema={"type": "object", "properties": {"url": {"type": "string"}, "max_chars": {"type": "integer"}}, "required": ["url"]},
+            description="Fetch one URL (or several, concurrently) as text",
+            input_schema={"type": "object", "properties": {"url": {"type": "string"}, "urls": {"type": "array", "items": {"type": "string"}}, "max_chars": {"type": "integer"}}},
             handler=web_fetch,
         ),
         ToolDef(
             name="hp.web.extract",
             description="Extract text from html",
-            input_schema={"type": "object", "properties": {"html": {"type": "string"}}, "required": ["html"]},
+            input_schema={"type": "object", "properties": {"html": {"type": "string"}, "max_chars": {"type": "integer"}}, "required": ["html"]},
             handler=web_extract,
         ),
     ]
 
 
 app = create_mcp_app(server_name="mcp-web-search", tools=register_tools())
+app.router.add_event_handler("shutdown", close_fetcher)
@@ -1,9 +1,43 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
 
 LOG_LEVEL = os.getenv('WEB_SEARCH_LOG_LEVEL', 'INFO')
 SERVICE_NAME = os.getenv('WEB_SEARCH_SERVICE_NAME', 'mcp-web-search')
 PROVIDER = os.getenv("WEB_SEARCH_PROVIDER", "searxng").strip().lower()
 HTTP_TIMEOUT = float(os.getenv("WEB_SEARCH_HTTP_TIMEOUT", "15"))
 USER_AGENT = os.getenv("WEB_SEARCH_USER_AGENT", "HomePilot-WebSearch/1.0")
+SEARXNG_BASE_URL = os.getenv("SEARXNG_BASE_URL", "http://localhost:8888")
+TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "")
+
+# Fetch pipeline
+MAX_CONNECTIONS = int(os.getenv("WEB_FETCH_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.getenv("WEB_FETCH_MAX_KEEPALIVE", "10"))
+FETCH_CONCURRENCY = int(os.getenv("WEB_FETCH_CONCURRENCY", "8"))
+PER_HOST_LIMIT = int(os.getenv("WEB_FETCH_PER_HOST_LIMIT", "2"))
+MAX_REDIRECTS = int(os.getenv("WEB_FETCH_MAX_REDIRECTS", "5"))
+# Bytes read from one response at most, whatever max_chars asks for.
+MAX_BODY_BYTES = int(float(os.getenv("WEB_FETCH_MAX_BODY_MB", "2")) * 1024 * 1024)
+CACHE_MAX_BYTES = int(float(os.getenv("WEB_FETCH_CACHE_MAX_MB", "200")) * 1024 * 1024)
+# Hamming distance (of 64) under which two results count as near-duplicates.
+SIMHASH_DISTANCE = int(os.getenv("WEB_SEARCH_SIMHASH_DISTANCE", "3"))
+
+
+def cache_dir() -> Path:
+    raw = os.getenv("WEB_FETCH_CACHE_DIR", "").strip()
+    return Path(raw) if raw else Path.home() / ".homepilot" / "web_search" / "http_cache"
+
+
+def _csv(name: str) -> frozenset[str]:
+    return frozenset(h.strip().lower() for h in os.getenv(name, "").split(",") if h.strip())
+
+
+def allowed_hosts() -> frozenset[str]:
+    """Hosts fetched even when they resolve to a private address (WEB_FETCH_ALLOWED_HOSTS)."""
+    return _csv("WEB_FETCH_ALLOWED_HOSTS")
+
+
+def allow_private() -> bool:
+    """Allow fetching loopback / private / link-local addresses (WEB_FETCH_ALLOW_PRIVATE, off by default)."""
+    return os.getenv("WEB_FETCH_ALLOW_PRIVATE", "false").strip().lower() in ("1", "true", "yes", "on")
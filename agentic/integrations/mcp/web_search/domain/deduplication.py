@@ -1,5 +1,71 @@
+"""Collapse duplicate and near-duplicate search results.
+
+Exact duplicates are caught by a normalised URL (no fragment, tracking
+parameters, ``www.`` or trailing slash). Near duplicates - syndicated
+copies, mirrors, the same story on two hosts - by a 64-bit SimHash of the
+title and snippet: results whose fingerprints differ in at most
+``max_distance`` bits are folded into the first (best-ranked) one.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import hashlib
+import re
+from typing import Any, Dict, List
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_TRACKING = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src)$", re.I)
+
+
+def normalize_url(url: str) -> str:
+    parts = urlparse(url.strip())
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING.match(k)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunparse(("", host, path, "", query, ""))
+
+
+def _features(text: str) -> List[str]:
+    words = _WORD.findall(text.lower())
+    if len(words) < 3:
+        return words
+    return [" ".join(words[i:i + 3]) for i in range(len(words) - 2)]
+
+
+def simhash(text: str) -> int:
+    weights = [0] * 64
+    for feature in _features(text):
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def collapse(results: List[Dict[str, Any]], *, max_distance: int = 3) -> List[Dict[str, Any]]:
+    """Keep the first of each duplicate group; the others' URLs go in ``duplicates``."""
+    kept: List[Dict[str, Any]] = []
+    seen_urls: Dict[str, Dict[str, Any]] = {}
+    prints: List[tuple[int, Dict[str, Any]]] = []
+    for item in results:
+        url_key = normalize_url(item.get("url", ""))
+        owner = seen_urls.get(url_key)
+        if owner is None:
+            text = f"{item.get('title', '')} {item.get('snippet', '')}"
+            fp = simhash(text)
+            if len(_features(text)) >= 4:
+                owner = next((o for p, o in prints if hamming(p, fp) <= max_distance), None)
+            if owner is None:
+                item = dict(item)
+                kept.append(item)
+                seen_urls[url_key] = item
+                prints.append((fp, item))
+                continue
+        owner.setdefault("duplicates", []).append(item.get("url", ""))
+    return kept
@@ -1,5 +1,42 @@
+"""Search, collapse near-duplicates, then fetch the top results in parallel."""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+from typing import Any, Dict, List, Optional
+
+from agentic.integrations.mcp.web_search.domain.deduplication import collapse
+from agentic.integrations.mcp.web_search.infra.fetcher import Fetcher
+
+
+async def search(
+    provider: Any,
+    fetcher: Fetcher,
+    query: str,
+    *,
+    limit: int,
+    recency_days: int = 30,
+    domains: Optional[List[str]] = None,
+    fetch_top: int = 0,
+    max_chars: int = 2000,
+    max_distance: int = 3,
+) -> List[Dict[str, Any]]:
+    # Ask for a few extra so collapsing duplicates doesn't leave us short.
+    raw = await provider.search(
+        query=query,
+        limit=min(limit + max(2, limit // 2), 30),
+        recency_days=recency_days,
+        domains=domains,
+        client=fetcher.client,
+    )
+    results = collapse([r.to_dict() for r in raw], max_distance=max_distance)[:limit]
+
+    if fetch_top > 0 and results:
+        top = results[:fetch_top]
+        pages = await fetcher.fetch_many([r["url"] for r in top], max_chars=max_chars)
+        for item, page in zip(top, pages):
+            if page.ok:
+                item["content"] = page.text
+                item["truncated"] = page.truncated
+            else:
+                item["fetch_error"] = page.error
+    return results
@@ -1,5 +1,142 @@
+"""On-disk HTTP cache for fetched pages.
+
+Each URL maps to ``<sha256>.json`` (validators, freshness, how much text the
+stored body yielded) and a ``<sha256>.<token>.body`` holding the raw bytes
+read. The meta names its body file and is written last, so a reader never
+pairs a meta with another write's body; a superseded body is removed after
+the new meta is in place. Entries are
+revalidated with ``If-None-Match`` / ``If-Modified-Since``; a 304 refreshes
+the entry and the stored body is re-extracted. ``Cache-Control: max-age``
+lets a fresh entry be served without a request at all.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    status: int
+    content_type: str
+    etag: str = ""
+    last_modified: str = ""
+    stored_at: float = 0.0
+    max_age: float = 0.0
+    complete: bool = True  # False when reading stopped at max_chars / byte cap
+    chars: int = 0         # text length the stored body produced
+    body: str = ""         # body file name, set by HttpCache.put
+
+    def is_fresh(self, now: float) -> bool:
+        return self.max_age > 0 and now - self.stored_at < self.max_age
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def covers(self, max_chars: int) -> bool:
+        """Whether the stored body can answer a request for ``max_chars``."""
+        return self.complete or self.chars >= max_chars
+
+
+def cache_policy(headers) -> tuple[bool, float]:
+    """``(storable, max_age seconds)`` from response headers."""
+    cc = (headers.get("cache-control") or "").lower()
+    if "no-store" in cc or "private" in cc:
+        return False, 0.0
+    if "no-cache" in cc:
+        return True, 0.0
+    match = _MAX_AGE.search(cc)
+    return True, float(match.group(1)) if match else 0.0
+
+
+class HttpCache:
+    PRUNE_EVERY = 50
+
+    def __init__(self, root: Path | str, *, max_bytes: int):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._puts = 0
+        self._lock = threading.Lock()
+
+    def _meta_path(self, url: str) -> Path:
+        return self.root / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _read_meta(self, meta_path: Path) -> Optional[CacheEntry]:
+        try:
+            return CacheEntry(**json.loads(meta_path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _write(self, path: Path, data: bytes) -> None:
+        tmp = path.with_suffix(path.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def get(self, url: str) -> Optional[tuple[CacheEntry, bytes]]:
+        entry = self._read_meta(self._meta_path(url))
+        if entry is None or not entry.body:
+            return None
+        try:
+            body = (self.root / entry.body).read_bytes()
+        except OSError:
+            return None
+        return entry, body
+
+    def put(self, entry: CacheEntry, body: bytes) -> None:
+        meta_path = self._meta_path(entry.url)
+        old = self._read_meta(meta_path)
+        entry.body = f"{meta_path.stem}.{uuid.uuid4().hex[:12]}.body"
+        self._write(self.root / entry.body, body)
+        self._write(meta_path, json.dumps(asdict(entry)).encode("utf-8"))
+        if old is not None and old.body and old.body != entry.body:
+            (self.root / old.body).unlink(missing_ok=True)
+        with self._lock:
+            self._puts += 1
+            prune = self._puts % self.PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def touch(self, entry: CacheEntry, *, max_age: float) -> None:
+        """Record a successful revalidation (304)."""
+        entry.stored_at = time.time()
+        entry.max_age = max_age
+        self._write(self._meta_path(entry.url), json.dumps(asdict(entry)).encode("utf-8"))
+
+    def prune(self) -> int:
+        """Drop least recently written entries until under ``max_bytes``."""
+        files = []
+        total = 0
+        for path in self.root.glob("*.body"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            (self.root / f"{path.name.split('.', 1)[0]}.json").unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
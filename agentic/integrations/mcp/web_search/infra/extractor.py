@@ -1,5 +1,142 @@
+"""Streaming HTML -> text extraction.
+
+:class:`TextExtractor` is fed decoded chunks as they arrive and reports
+``done`` once it holds ``max_chars`` of text, so the fetcher can stop
+reading the response there instead of downloading the whole page.
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+_SKIP = frozenset({"script", "style", "noscript", "template", "svg", "head", "iframe", "object"})
+_BLOCK = frozenset({
+    "p", "div", "br", "li", "ul", "ol", "tr", "table", "section", "article", "header", "footer",
+    "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "hr", "dd", "dt", "main", "aside", "nav",
+})
+_VOID = frozenset({"br", "hr", "img", "input", "meta", "link", "area", "base", "col", "embed", "source", "wbr"})
+_SPACES = re.compile(r"[ \t\r\f\v ]+")
+_CHARSET = re.compile(r"charset=[\"']?([\w-]+)", re.I)
+
+
+class TextExtractor(HTMLParser):
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.title = ""
+        self._parts: List[str] = []
+        self._len = 0
+        self._skip_depth = 0
+        self._in_title = False
+        self._pending_break = False
+
+    @property
+    def done(self) -> bool:
+        return self._len >= self.max_chars
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag == "title":
+            self._in_title = True
+        if tag in _SKIP and tag not in _VOID:
+            self._skip_depth += 1
+        elif tag in _BLOCK:
+            self._pending_break = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+        if tag in _SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in _BLOCK:
+            self._pending_break = True
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title = (self.title + data).strip()
+            return
+        if self._skip_depth or self.done:
+            return
+        text = _SPACES.sub(" ", data)
+        if not text.strip():
+            if text and self._parts and not self._parts[-1].endswith((" ", "\n")):
+                self._append(" ")
+            return
+        if self._pending_break and self._parts:
+            self._parts[-1] = self._parts[-1].rstrip(" ")
+            self._append("\n")
+        self._pending_break = False
+        self._append(text.replace("\n", " "))
+
+    def _append(self, text: str) -> None:
+        room = self.max_chars - self._len
+        if room <= 0:
+            return
+        text = text[:room]
+        self._parts.append(text)
+        self._len += len(text)
+
+    def text(self) -> str:
+        lines = (line.strip() for line in "".join(self._parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+
+def charset_of(content_type: str, default: str = "utf-8") -> str:
+    match = _CHARSET.search(content_type or "")
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return default
+
+
+class StreamExtractor:
+    """Bytes in, text out: incremental decoding in front of :class:`TextExtractor`.
+
+    Non-HTML bodies (``text/plain``, JSON) are passed through as text.
+    """
+
+    def __init__(self, max_chars: int, content_type: str = "text/html"):
+        self._decoder = codecs.getincrementaldecoder(charset_of(content_type))(errors="replace")
+        self._html = "html" in (content_type or "text/html").lower() or not content_type
+        self._parser: Optional[TextExtractor] = TextExtractor(max_chars) if self._html else None
+        self._plain: List[str] = []
+        self._plain_len = 0
+        self.max_chars = max_chars
+
+    @property
+    def done(self) -> bool:
+        if self._parser is not None:
+            return self._parser.done
+        return self._plain_len >= self.max_chars
+
+    @property
+    def title(self) -> str:
+        return self._parser.title if self._parser is not None else ""
+
+    def feed(self, chunk: bytes, final: bool = False) -> None:
+        text = self._decoder.decode(chunk, final=final)
+        if self._parser is not None:
+            self._parser.feed(text)
+            if final:
+                self._parser.close()
+        elif not self.done:
+            text = text[: self.max_chars - self._plain_len]
+            self._plain.append(text)
+            self._plain_len += len(text)
+
+    def text(self) -> str:
+        if self._parser is not None:
+            return self._parser.text()
+        return "".join(self._plain).replace("\r", "").strip()
+
+
+def extract_text(html: str, max_chars: int = 8000) -> tuple[str, str]:
+    """``(title, text)`` of an HTML document, text capped at ``max_chars``."""
+    parser = TextExtractor(max_chars)
+    parser.feed(html)
+    parser.close()
+    return parser.title, parser.text()
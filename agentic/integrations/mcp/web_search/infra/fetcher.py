@@ -1,5 +1,246 @@
+"""Concurrent page fetcher with a shared connection pool and HTTP cache.
+
+All fetches go through one pooled ``httpx.AsyncClient``. A global semaphore
+bounds how many pages are fetched at once and a per-host semaphore keeps a
+burst of results from one site from opening a socket each. Bodies are
+streamed into the extractor and the response is closed as soon as
+``max_chars`` of text are in hand.
+
+Redirects are followed by hand so every hop's host is resolved and checked:
+loopback, private, link-local and other non-public addresses are refused
+unless the host is in WEB_FETCH_ALLOWED_HOSTS or WEB_FETCH_ALLOW_PRIVATE is
+set (local development and tests).
+"""
+
 from __future__ import annotations
 
-def placeholder() -> None:
-    """Placeholder implementation."""
-    return None
+import asyncio
+import ipaddress
+import socket
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, FrozenSet, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from agentic.integrations.mcp.web_search import config
+from agentic.integrations.mcp.web_search.infra.cache import CacheEntry, HttpCache, cache_policy
+from agentic.integrations.mcp.web_search.infra.extractor import StreamExtractor
+
+_TEXTUAL = ("text/", "html", "xml", "json")
+
+
+@dataclass
+class FetchResult:
+    url: str
+    final_url: str = ""
+    status: int = 0
+    content_type: str = ""
+    title: str = ""
+    text: str = ""
+    truncated: bool = False
+    cache: str = "miss"  # miss | hit | revalidated
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class BlockedURL(Exception):
+    """The URL (or a redirect target) points somewhere fetches may not go."""
+
+
+def _is_public(ip: str) -> bool:
+    addr = ipaddress.ip_address(ip.split("%", 1)[0])
+    if isinstance(addr, ipaddress.IPv6Address) and addr.ipv4_mapped:
+        addr = addr.ipv4_mapped
+    return not (
+        addr.is_private or addr.is_loopback or addr.is_link_local or addr.is_multicast
+        or addr.is_reserved or addr.is_unspecified
+    )
+
+
+def _extract(body: bytes, content_type: str, max_chars: int, *, complete: bool) -> StreamExtractor:
+    ex = StreamExtractor(max_chars, content_type)
+    ex.feed(body, final=complete)
+    return ex
+
+
+class Fetcher:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        cache: Optional[HttpCache] = None,
+        *,
+        concurrency: int = config.FETCH_CONCURRENCY,
+        per_host: int = config.PER_HOST_LIMIT,
+        max_body_bytes: int = config.MAX_BODY_BYTES,
+        max_redirects: int = config.MAX_REDIRECTS,
+        allow_private: Optional[bool] = None,
+        allowed_hosts: Optional[FrozenSet[str]] = None,
+    ):
+        self.client = client
+        self.cache = cache
+        self.max_redirects = max(0, max_redirects)
+        self.allow_private = config.allow_private() if allow_private is None else allow_private
+        self.allowed_hosts = config.allowed_hosts() if allowed_hosts is None else allowed_hosts
+        self.per_host = max(1, per_host)
+        self.max_body_bytes = max_body_bytes
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_slot(self, host: str) -> asyncio.Semaphore:
+        slot = self._hosts.get(host)
+        if slot is None:
+            slot = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return slot
+
+    async def _check(self, url: httpx.URL) -> None:
+        """Raise ``BlockedURL`` unless ``url`` is http(s) to a public address (or an allowed host)."""
+        if url.scheme not in ("http", "https") or not url.host:
+            raise BlockedURL("Only absolute http(s) URLs can be fetched")
+        host = url.host.lower()
+        if self.allow_private or host in self.allowed_hosts:
+            return
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, url.port or 0, type=socket.SOCK_STREAM)
+        except OSError as exc:
+            raise BlockedURL(f"Could not resolve {host}: {exc}") from exc
+        if not infos or not all(_is_public(info[4][0]) for info in infos):
+            raise BlockedURL(f"Refusing to fetch non-public address: {host}")
+
+    async def fetch(self, url: str, *, max_chars: int) -> FetchResult:
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            return FetchResult(url, error="Only absolute http(s) URLs can be fetched")
+
+        cached = await asyncio.to_thread(self.cache.get, url) if self.cache else None
+        entry: Optional[CacheEntry] = None
+        body = b""
+        if cached is not None and cached[0].covers(max_chars):
+            entry, body = cached
+            if entry.is_fresh(time.time()):
+                return self._from_cache(entry, body, max_chars, "hit")
+
+        headers = entry.conditional_headers() if entry else {}
+        request = self.client.build_request("GET", url, headers=headers)
+        try:
+            for _ in range(self.max_redirects + 1):
+                await self._check(request.url)
+                # Host slot first: waiting on a busy host must not hold a global slot.
+                async with self._host_slot(request.url.host), self._slots:
+                    resp = await self.client.send(request, stream=True, follow_redirects=False)
+                    try:
+                        if resp.next_request is not None:
+                            request = resp.next_request
+                            continue
+                        if resp.status_code == 304 and entry is not None:
+                            _, max_age = cache_policy(resp.headers)
+                            await asyncio.to_thread(self.cache.touch, entry, max_age=max_age)
+                            return self._from_cache(entry, body, max_chars, "revalidated")
+                        return await self._read(url, resp, max_chars)
+                    finally:
+                        await resp.aclose()
+            return FetchResult(url, error=f"Too many redirects (> {self.max_redirects})")
+        except BlockedURL as exc:
+            return FetchResult(url, error=str(exc))
+        except httpx.HTTPError as exc:
+            return FetchResult(url, error=f"{type(exc).__name__}: {exc}")
+
+    async def _read(self, url: str, resp: httpx.Response, max_chars: int) -> FetchResult:
+        content_type = resp.headers.get("content-type", "")
+        result = FetchResult(url, final_url=str(resp.url), status=resp.status_code, content_type=content_type)
+        if resp.status_code >= 400:
+            result.error = f"HTTP {resp.status_code}"
+            return result
+        if content_type and not any(t in content_type.lower() for t in _TEXTUAL):
+            result.error = f"Unsupported content type: {content_type}"
+            return result
+
+        ex = StreamExtractor(max_chars, content_type)
+        buf = bytearray()
+        complete = True
+        async for chunk in resp.aiter_bytes():
+            buf += chunk
+            ex.feed(chunk)
+            if ex.done or len(buf) >= self.max_body_bytes:
+                complete = False
+                break
+        if complete:
+            ex.feed(b"", final=True)
+
+        result.title, result.text = ex.title, ex.text()
+        result.truncated = not complete
+        storable, max_age = cache_policy(resp.headers)
+        if self.cache is not None and storable and resp.status_code == 200:
+            entry = CacheEntry(
+                url=url,
+                status=resp.status_code,
+                content_type=content_type,
+                etag=resp.headers.get("etag", ""),
+                last_modified=resp.headers.get("last-modified", ""),
+                stored_at=time.time(),
+                max_age=max_age,
+                complete=complete,
+                chars=len(result.text),
+            )
+            await asyncio.to_thread(self.cache.put, entry, bytes(buf))
+        return result
+
+    def _from_cache(self, entry: CacheEntry, body: bytes, max_chars: int, how: str) -> FetchResult:
+        ex = _extract(body, entry.content_type, max_chars, complete=entry.complete)
+        text = ex.text()
+        return FetchResult(
+            entry.url,
+            final_url=entry.url,
+            status=entry.status,
+            content_type=entry.content_type,
+            title=ex.title,
+            text=text,
+            truncated=not entry.complete or ex.done,
+            cache=how,
+        )
+
+    async def fetch_many(self, urls: List[str], *, max_chars: int) -> List[FetchResult]:
+        """Fetch concurrently (within the pool and per-host limits); order is kept."""
+        return list(await asyncio.gather(*(self.fetch(u, max_chars=max_chars) for u in urls)))
+
+
+# ── shared instance ────────────────────────────────────────────────────
+
+_fetcher: Optional[Fetcher] = None
+_fetcher_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=config.HTTP_TIMEOUT,
+        headers={"User-Agent": config.USER_AGENT},
+        limits=httpx.Limits(max_connections=config.MAX_CONNECTIONS, max_keepalive_connections=config.MAX_KEEPALIVE),
+    )
+
+
+def get_fetcher() -> Fetcher:
+    """The shared fetcher for the running loop.
+
+    Pooled connections and semaphores belong to the loop that created them,
+    so a fetcher from another (finished) loop is replaced, not reused.
+    """
+    global _fetcher, _fetcher_loop
+    loop = asyncio.get_running_loop()
+    if _fetcher is None or _fetcher_loop is not loop or _fetcher.client.is_closed:
+        _fetcher = Fetcher(_new_client(), HttpCache(config.cache_dir(), max_bytes=config.CACHE_MAX_BYTES))
+        _fetcher_loop = loop
+    return _fetcher
+
+
+async def close_fetcher() -> None:
+    global _fetcher, _fetcher_loop
+    if _fetcher is not None and _fetcher_loop is asyncio.get_running_loop():
+        await _fetcher.client.aclose()
+    _fetcher = _fetcher_loop = None
@@ -6,7 +6,8 @@ TavilyProvider  — Tavily API (enterprise mode, requires API key)
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
 
@@ -28,6 +29,16 @@ class SearchResult:
         return {"title": self.title, "url": self.url, "snippet": self.snippet, "source": self.source}
 
 
+@asynccontextmanager
+async def _client(shared: Optional[httpx.AsyncClient], timeout: float) -> AsyncIterator[httpx.AsyncClient]:
+    """Use the caller's pooled client if given, else a short-lived one."""
+    if shared is not None:
+        yield shared
+        return
+    async with httpx.AsyncClient(timeout=timeout, headers={"User-Agent": config.USER_AGENT}) as client:
+        yield client
+
+
 # ── SearXNG (home mode) ─────────────────────────────────────────────────────
 
 class SearxngProvider:
@@ -39,6 +50,7 @@ class SearxngProvider:
         limit: int = 5,
         recency_days: int = 30,
         domains: Optional[List[str]] = None,
+        client: Optional[httpx.AsyncClient] = None,
     ) -> List[SearchResult]:
         q = query.strip()
         if domains:
@@ -57,11 +69,8 @@ class SearxngProvider:
         params = {"q": q, "format": "json", "safesearch": 1, "time_range": time_range}
         url = f"{config.SEARXNG_BASE_URL.rstrip('/')}/search"
 
-        async with httpx.AsyncClient(
-            timeout=config.HTTP_TIMEOUT,
-            headers={"User-Agent": config.USER_AGENT},
-        ) as client:
-            resp = await client.get(url, params=params)
+        async with _client(client, config.HTTP_TIMEOUT) as http:
+            resp = await http.get(url, params=params)
             resp.raise_for_status()
             data = resp.json()
 
@@ -90,6 +99,7 @@ class TavilyProvider:
         limit: int = 5,
         recency_days: int = 30,
         domains: Optional[List[str]] = None,
+        client: Optional[httpx.AsyncClient] = None,
     ) -> List[SearchResult]:
         if not config.TAVILY_API_KEY:
             raise RuntimeError("TAVILY_API_KEY not set but provider=tavily")
@@ -103,11 +113,8 @@ class TavilyProvider:
         if domains:
             payload["include_domains"] = domains
 
-        async with httpx.AsyncClient(
-            timeout=max(config.HTTP_TIMEOUT, 15.0),
-            headers={"User-Agent": config.USER_AGENT},
-        ) as client:
-            resp = await client.post("https://api.tavily.com/search", json=payload)
+        async with _client(client, max(config.HTTP_TIMEOUT, 15.0)) as http:
+            resp = await http.post("https://api.tavily.com/search", json=payload, timeout=max(config.HTTP_TIMEOUT, 15.0))
             resp.raise_for_status()
             data = resp.json()
 
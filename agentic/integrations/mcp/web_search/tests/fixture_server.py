@@ -0,0 +1,109 @@
+"""Local HTTP server the web_search tests fetch from."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE = (
+    "<html><head><title>Fixture page</title><script>ignored()</script></head>"
+    "<body><h1>Heading</h1><p>First paragraph of the fixture.</p><p>Second one.</p></body></html>"
+)
+BIG_CHUNK = b"<p>" + b"lorem ipsum dolor sit amet " * 2400 + b"</p>"  # ~64 KB
+BIG_CHUNKS = 300
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.hits: Counter[str] = Counter()
+        self.conditional: Counter[str] = Counter()
+        self.big_chunks_sent = 0
+        self.inflight: Counter[str] = Counter()
+        self.peak: Counter[str] = Counter()
+        self.peak_total = 0
+        self.lock = threading.Lock()
+        self.search_results: list[dict] = []
+
+    @property
+    def base(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def url(self, path: str, host: str = "127.0.0.1") -> str:
+        return f"http://{host}:{self.server_address[1]}{path}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FixtureServer
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "text/html; charset=utf-8", **headers: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        parsed = urlparse(self.path)
+        path = parsed.path
+        self.server.hits[path] += 1
+
+        if path == "/page":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.server.conditional[path] += 1
+                self._send(304, ETag='"v1"')
+                return
+            self._send(200, PAGE.encode(), ETag='"v1"', Last_Modified="Mon, 01 Jan 2024 00:00:00 GMT")
+        elif path == "/fresh":
+            self._send(200, b"<p>fresh body</p>", Cache_Control="max-age=600")
+        elif path == "/nostore":
+            self._send(200, b"<p>secret</p>", Cache_Control="no-store")
+        elif path == "/plain":
+            self._send(200, "café plain text".encode("latin-1"), content_type="text/plain; charset=latin-1")
+        elif path == "/image":
+            self._send(200, b"\x89PNG", content_type="image/png")
+        elif path == "/big":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(BIG_CHUNK) * BIG_CHUNKS))
+            self.end_headers()
+            try:
+                for _ in range(BIG_CHUNKS):
+                    self.wfile.write(BIG_CHUNK)
+                    self.server.big_chunks_sent += 1
+            except OSError:
+                pass
+        elif path == "/slow":
+            host = self.headers.get("Host", "").split(":")[0]
+            with self.server.lock:
+                self.server.inflight[host] += 1
+                self.server.peak[host] = max(self.server.peak[host], self.server.inflight[host])
+                self.server.peak_total = max(self.server.peak_total, sum(self.server.inflight.values()))
+            time.sleep(0.15)
+            with self.server.lock:
+                self.server.inflight[host] -= 1
+            self._send(200, f"<p>slow {parse_qs(parsed.query).get('i', [''])[0]}</p>".encode())
+        elif path == "/redirect":
+            self._send(302, Location=parse_qs(parsed.query)["to"][0])
+        elif path == "/search":
+            self._send(200, json.dumps({"results": self.server.search_results}).encode(), content_type="application/json")
+        else:
+            self._send(404, b"missing")
+
+
+def start() -> FixtureServer:
+    server = FixtureServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
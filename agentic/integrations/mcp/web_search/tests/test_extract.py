@@ -1,2 +1,35 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import pytest
+
+from agentic.integrations.mcp.web_search import app as server
+from agentic.integrations.mcp.web_search.infra.extractor import StreamExtractor, extract_text
+
+
+def test_extract_skips_scripts_and_keeps_blocks():
+    html = (
+        "<html><head><title>T</title><style>p{}</style></head><body>"
+        "<nav>Menu</nav><h2>Title &amp; more</h2><p>One <b>two</b>\nthree</p>"
+        "<script>var x = '<p>no</p>';</script><ul><li>a</li><li>b</li></ul></body></html>"
+    )
+    title, text = extract_text(html)
+    assert title == "T"
+    assert text == "Menu\nTitle & more\nOne two three\na\nb"
+
+
+def test_stream_extractor_handles_split_chunks_and_stops():
+    ex = StreamExtractor(12, "text/html; charset=utf-8")
+    data = "<p>café au lait</p><p>and much more text</p>".encode()
+    for i in range(0, len(data), 3):
+        ex.feed(data[i:i + 3])
+        if ex.done:
+            break
+    assert ex.done
+    assert ex.text() == "café au lait"
+
+
+@pytest.mark.asyncio
+async def test_extract_tool():
+    res = await server.web_extract({"html": "<title>X</title><p>hello</p>"})
+    assert res["content"][0]["text"] == "hello"
+    assert res["meta"]["title"] == "X"
@@ -1,2 +1,150 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import contextlib
+import time
+
+import httpx
+import pytest
+
+from agentic.integrations.mcp.web_search.infra.cache import CacheEntry, HttpCache
+from agentic.integrations.mcp.web_search.infra.fetcher import Fetcher
+from agentic.integrations.mcp.web_search.tests import fixture_server
+
+
+@pytest.fixture(scope="module")
+def http_server():
+    server = fixture_server.start()
+    yield server
+    server.shutdown()
+
+
+@contextlib.asynccontextmanager
+async def _fetcher(root):
+    async with httpx.AsyncClient(timeout=10) as client:
+        yield Fetcher(
+            client, HttpCache(root / "cache", max_bytes=50 * 1024 * 1024), concurrency=8, per_host=2, allow_private=True
+        )
+
+
+@pytest.mark.asyncio
+async def test_fetch_extracts_text(http_server, tmp_path):
+    async with _fetcher(tmp_path) as fetcher:
+        page = await fetcher.fetch(http_server.url("/page"), max_chars=1000)
+        assert page.ok
+        assert page.title == "Fixture page"
+        assert page.text == "Heading\nFirst paragraph of the fixture.\nSecond one."
+        assert page.truncated is False
+        assert page.cache == "miss"
+
+
+@pytest.mark.asyncio
+async def test_etag_revalidation(http_server, tmp_path):
+    async with _fetcher(tmp_path) as fetcher:
+        url = http_server.url("/page")
+        first = await fetcher.fetch(url, max_chars=1000)
+        before = http_server.conditional["/page"]
+        second = await fetcher.fetch(url, max_chars=1000)
+        assert second.cache == "revalidated"
+        assert second.text == first.text
+        assert http_server.conditional["/page"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_fresh_entries_skip_the_network(http_server, tmp_path):
+    async with _fetcher(tmp_path) as fetcher:
+        url = http_server.url("/fresh")
+        await fetcher.fetch(url, max_chars=1000)
+        hits = http_server.hits["/fresh"]
+        page = await fetcher.fetch(url, max_chars=1000)
+        assert page.cache == "hit"
+        assert page.text == "fresh body"
+        assert http_server.hits["/fresh"] == hits
+
+
+@pytest.mark.asyncio
+async def test_no_store_is_not_cached(http_server, tmp_path):
+    async with _fetcher(tmp_path) as fetcher:
+        url = http_server.url("/nostore")
+        await fetcher.fetch(url, max_chars=1000)
+        assert fetcher.cache.get(url) is None
+
+
+@pytest.mark.asyncio
+async def test_streaming_stops_at_max_chars(http_server, tmp_path):
+    async with _fetcher(tmp_path) as fetcher:
+        page = await fetcher.fetch(http_server.url("/big"), max_chars=500)
+        assert len(page.text) == 500
+        assert page.truncated is True
+        time.sleep(0.2)
+        assert http_server.big_chunks_sent < fixture_server.BIG_CHUNKS // 2
+
+        # The partial body only covers short requests; a longer one refetches.
+        assert fetcher.cache.get(page.url)[0].covers(500)
+        assert not fetcher.cache.get(page.url)[0].covers(10_000_000)
+
+
+@pytest.mark.asyncio
+async def test_charset_and_plain_text(http_server, tmp_path):
+    async with _fetcher(tmp_path) as fetcher:
+        page = await fetcher.fetch(http_server.url("/plain"), max_chars=1000)
+        assert page.text == "café plain text"
+
+
+@pytest.mark.asyncio
+async def test_errors_are_reported(http_server, tmp_path):
+    async with _fetcher(tmp_path) as fetcher:
+        missing, image, bad = await fetcher.fetch_many(
+            [http_server.url("/nope"), http_server.url("/image"), "ftp://example.com/x"], max_chars=100
+        )
+        assert missing.error == "HTTP 404"
+        assert image.error.startswith("Unsupported content type")
+        assert bad.error
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetch_respects_per_host_limit(http_server, tmp_path):
+    async with _fetcher(tmp_path) as fetcher:
+        urls = [http_server.url(f"/slow?i={i}") for i in range(6)]
+        urls += [http_server.url(f"/slow?i=l{i}", host="localhost") for i in range(6)]
+        started = time.perf_counter()
+        pages = await fetcher.fetch_many(urls, max_chars=100)
+        elapsed = time.perf_counter() - started
+        assert [p.text for p in pages[:2]] == ["slow 0", "slow 1"]
+        assert http_server.peak["127.0.0.1"] == 2
+        assert http_server.peak["localhost"] == 2
+        assert http_server.peak_total == 4
+        # 12 requests x 0.15 s serially would take 1.8 s.
+        assert elapsed < 1.2
+
+
+@pytest.mark.asyncio
+async def test_redirects_are_followed(http_server, tmp_path):
+    async with _fetcher(tmp_path) as fetcher:
+        page = await fetcher.fetch(http_server.url("/redirect?to=/page"), max_chars=1000)
+        assert page.ok and page.title == "Fixture page"
+        assert page.final_url == http_server.url("/page")
+
+
+@pytest.mark.asyncio
+async def test_private_addresses_are_refused(http_server, tmp_path):
+    async with httpx.AsyncClient(timeout=10) as client:
+        fetcher = Fetcher(client, allow_private=False, allowed_hosts=frozenset({"localhost"}))
+        hits = http_server.hits["/page"]
+        direct = await fetcher.fetch(http_server.url("/page"), max_chars=100)
+        assert "non-public" in direct.error
+
+        # An allowed host cannot bounce the fetch onto a private address.
+        target = http_server.url("/page")
+        bounced = await fetcher.fetch(http_server.url(f"/redirect?to={target}", host="localhost"), max_chars=100)
+        assert "non-public" in bounced.error
+        assert http_server.hits["/page"] == hits
+
+
+def test_cache_meta_names_its_body(tmp_path):
+    cache = HttpCache(tmp_path, max_bytes=1 << 20)
+    cache.put(CacheEntry("http://x/", 200, "text/html"), b"one")
+    first = cache.get("http://x/")[0].body
+    cache.put(CacheEntry("http://x/", 200, "text/html"), b"two")
+    entry, body = cache.get("http://x/")
+    assert body == b"two" and entry.body != first
+    assert sorted(p.name for p in tmp_path.glob("*.body")) == [entry.body]
@@ -1,2 +1,80 @@
-def test_placeholder() -> None:
-    assert True
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from agentic.integrations.mcp.web_search import app as server
+from agentic.integrations.mcp.web_search import config
+from agentic.integrations.mcp.web_search.domain.deduplication import collapse, hamming, normalize_url, simhash
+from agentic.integrations.mcp.web_search.domain.search import search
+from agentic.integrations.mcp.web_search.infra.fetcher import Fetcher
+from agentic.integrations.mcp.web_search.providers import SearxngProvider
+from agentic.integrations.mcp.web_search.tests import fixture_server
+
+
+@pytest.fixture(scope="module")
+def http_server():
+    server = fixture_server.start()
+    yield server
+    server.shutdown()
+
+
+def test_normalize_url():
+    assert normalize_url("https://www.Example.com/a/?utm_source=x&b=2#frag") == normalize_url("http://example.com/a?b=2")
+
+
+def test_simhash_near_duplicates():
+    a = simhash("Python 3.13 released with a new interactive interpreter and free-threaded build")
+    b = simhash("Python 3.13 released with a new interactive interpreter and a free-threaded build")
+    c = simhash("Local weather forecast calls for heavy rain across the region this weekend")
+    assert hamming(a, b) < hamming(a, c)
+
+
+def test_collapse_keeps_first_and_records_duplicates():
+    text = "Python 3.13 released with a new interactive interpreter, experimental JIT and free threading"
+    results = [
+        {"title": "Python 3.13 released", "url": "https://python.org/news", "snippet": text},
+        {"title": "Python 3.13 released", "url": "https://mirror.example/python-news", "snippet": text + "."},
+        {"title": "Other", "url": "https://python.org/news/?utm_source=feed", "snippet": "x"},
+        {"title": "Rust 1.80", "url": "https://blog.rust-lang.org", "snippet": "Rust 1.80 adds lazy cells and exclusive ranges"},
+    ]
+    kept = collapse(results)
+    assert [r["url"] for r in kept] == ["https://python.org/news", "https://blog.rust-lang.org"]
+    assert kept[0]["duplicates"] == ["https://mirror.example/python-news", "https://python.org/news/?utm_source=feed"]
+
+
+@pytest.mark.asyncio
+async def test_search_fetches_top_results(http_server, monkeypatch):
+    monkeypatch.setattr(config, "SEARXNG_BASE_URL", http_server.base)
+    http_server.search_results = [
+        {"title": "Fixture", "url": http_server.url("/page"), "content": "the fixture page"},
+        {"title": "Fixture copy", "url": http_server.url("/page") + "#top", "content": "the fixture page"},
+        {"title": "Slow", "url": http_server.url("/slow?i=1"), "content": "a slow page about something else entirely"},
+        {"title": "Gone", "url": http_server.url("/gone"), "content": "missing page that returns an error"},
+    ]
+    async with httpx.AsyncClient(timeout=10) as client:
+        results = await search(SearxngProvider(), Fetcher(client, allow_private=True), "fixture", limit=5, fetch_top=3)
+    assert [r["title"] for r in results] == ["Fixture", "Slow", "Gone"]
+    assert results[0]["content"].startswith("Heading")
+    assert results[1]["content"] == "slow 1"
+    assert results[2]["fetch_error"] == "HTTP 404"
+
+
+@pytest.mark.asyncio
+async def test_search_tool_reports_provider_failure(monkeypatch):
+    monkeypatch.setattr(config, "SEARXNG_BASE_URL", "http://127.0.0.1:9")
+    res = await server.web_search({"query": "python"})
+    assert res["meta"]["ok"] is False
+    assert "Web search failed" in res["content"][0]["text"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_tool(http_server, tmp_path, monkeypatch):
+    monkeypatch.setenv("WEB_FETCH_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("WEB_FETCH_ALLOW_PRIVATE", "true")
+    res = await server.web_fetch({"url": http_server.url("/page"), "max_chars": 1000})
+    assert res["meta"]["title"] == "Fixture page"
+    assert "First paragraph" in res["content"][0]["text"]
+    many = await server.web_fetch({"urls": [http_server.url("/page"), http_server.url("/missing")]})
+    assert [p["error"] for p in many["meta"]["pages"]] == ["", "HTTP 404"]
+    await server.close_fetcher()
@@ -41,6 +41,15 @@ class Settings:
     # Where generated PNGs are saved (shared with backend via volume mount)
     avatar_output_dir: str = os.getenv("AVATAR_OUTPUT_DIR", "../backend/data/avatars")
 
+    # Batched inference: concurrent requests arriving within the window are
+    # coalesced into one forward pass of at most STYLEGAN_MAX_BATCH seeds.
+    # STYLEGAN_BATCH_WINDOW_MS=0 batches each request on its own.
+    stylegan_batch_window_ms: float = float(os.getenv("STYLEGAN_BATCH_WINDOW_MS", "8"))
+    stylegan_max_batch: int = int(os.getenv("STYLEGAN_MAX_BATCH", "8"))
+
+    # Seed -> image LRU for caller-supplied (deterministic) seeds; 0 disables
+    stylegan_seed_cache_mb: int = int(os.getenv("STYLEGAN_SEED_CACHE_MB", "256"))
+
     # Service port
     port: int = int(os.getenv("AVATAR_SERVICE_PORT", "8020"))
 
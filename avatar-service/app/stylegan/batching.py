@@ -0,0 +1,207 @@
+"""
+Request coalescing and seed caching for StyleGAN2 inference.
+
+Framework-agnostic helpers used by ``generator.generate_faces``:
+
+  - ``FaceBatcher``: a micro-batching queue.  Concurrent requests (the
+    endpoints are sync and run on the threadpool) submit seed lists; a
+    single worker thread waits up to ``window_s`` for more requests with
+    the same truncation, then runs one batched forward pass of up to
+    ``max_batch`` seeds and hands each caller its slice.  One worker also
+    serialises device access, so concurrent requests no longer compete for
+    the GPU.
+  - ``SeedImageCache``: byte-bounded LRU of seed → uint8 HWC array.  The
+    same (model, seed, truncation) always yields the same face, so repeat
+    requests for a known seed skip inference entirely.
+
+Neither class imports torch; the batch function is injected.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+_log = logging.getLogger(__name__)
+
+# (seeds, truncation) -> one uint8 HWC array per seed, same order
+BatchFn = Callable[[Sequence[int], float], List[Any]]
+
+
+class SeedImageCache:
+    """LRU of generated faces keyed by (model, seed, truncation)."""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_key: Any, seed: int, truncation: float) -> Tuple[Any, int, float]:
+        return (model_key, int(seed), round(float(truncation), 4))
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            arr = self._entries.get(key)
+            if arr is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return arr
+
+    def put(self, key: Hashable, arr: Any) -> None:
+        size = int(getattr(arr, "nbytes", 0))
+        if self.max_bytes <= 0 or size > self.max_bytes:
+            return
+        try:
+            arr.flags.writeable = False  # shared between callers
+        except (AttributeError, ValueError):
+            pass
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= int(getattr(old, "nbytes", 0))
+            self._entries[key] = arr
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= int(getattr(evicted, "nbytes", 0))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class _Job:
+    __slots__ = ("seeds", "truncation", "future")
+
+    def __init__(self, seeds: List[int], truncation: float):
+        self.seeds = seeds
+        self.truncation = truncation
+        self.future: Future = Future()
+
+
+class FaceBatcher:
+    """Coalesce concurrent seed requests into batched forward passes."""
+
+    def __init__(self, run_batch: BatchFn, window_s: float = 0.008, max_batch: int = 8):
+        self.run_batch = run_batch
+        self.window_s = max(0.0, window_s)
+        self.max_batch = max(1, max_batch)
+        self._queue: "queue.Queue[_Job]" = queue.Queue()
+        self._pending: List[_Job] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.faces = 0
+        self.coalesced_requests = 0
+
+    def submit(self, seeds: Sequence[int], truncation: float) -> List[Any]:
+        """Block until every seed has been generated; return arrays in order."""
+        if not seeds:
+            return []
+        job = _Job(list(seeds), truncation)
+        self._ensure_worker()
+        self._queue.put(job)
+        return job.future.result()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._worker, name="stylegan-batcher", daemon=True,
+                )
+                self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _worker(self) -> None:
+        while True:
+            if not self._pending:
+                self._pending.append(self._queue.get())
+            self._collect()
+            group = self._take_group()
+            try:
+                self._run_group(group)
+            except BaseException as exc:  # surface to callers, keep serving
+                for job in group:
+                    if not job.future.done():
+                        job.future.set_exception(exc)
+
+    def _collect(self) -> None:
+        """Gather queued jobs until the window closes or a batch is full."""
+        deadline = time.monotonic() + self.window_s
+        while True:
+            lead = self._pending[0].truncation
+            queued = sum(len(j.seeds) for j in self._pending if j.truncation == lead)
+            if queued >= self.max_batch:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                self._pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                return
+
+    def _take_group(self) -> List[_Job]:
+        """Jobs sharing the oldest job's truncation, up to ~max_batch seeds."""
+        lead = self._pending[0].truncation
+        group: List[_Job] = []
+        total = 0
+        rest: List[_Job] = []
+        for job in self._pending:
+            if job.truncation == lead and (not group or total + len(job.seeds) <= self.max_batch):
+                group.append(job)
+                total += len(job.seeds)
+            else:
+                rest.append(job)
+        self._pending = rest
+        return group
+
+    def _run_group(self, group: List[_Job]) -> None:
+        seeds = [s for job in group for s in job.seeds]
+        truncation = group[0].truncation
+        outputs: List[Any] = []
+        for start in range(0, len(seeds), self.max_batch):
+            chunk = seeds[start:start + self.max_batch]
+            outputs.extend(self.run_batch(chunk, truncation))
+            self.batches += 1
+        self.faces += len(seeds)
+        self.coalesced_requests += len(group)
+        offset = 0
+        for job in group:
+            job.future.set_result(outputs[offset:offset + len(job.seeds)])
+            offset += len(job.seeds)
+        if len(group) > 1:
+            _log.debug("Coalesced %d requests into %d face(s)", len(group), len(seeds))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "faces": self.faces,
+            "requests": self.coalesced_requests,
+            "window_ms": round(self.window_s * 1000, 2),
+            "max_batch": self.max_batch,
+        }
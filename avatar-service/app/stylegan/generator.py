@@ -5,6 +5,10 @@ Generates deterministic face images from random or fixed seeds using the
 loaded StyleGAN2 generator.  Each seed always produces the same face,
 enabling reproducible results and seed-based exploration.
 
+Seeds are synthesised in batches (see ``batching.py``): one forward pass
+per request, with concurrent requests coalesced, and explicit seeds served
+from an LRU once generated.
+
 Non-destructive design:
   - If the model is not loaded, raises ``StyleGANUnavailable`` so the
     caller can fall back to placeholder generation.
@@ -15,11 +19,14 @@ Non-destructive design:
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Sequence
 
 from PIL import Image
 
-from .loader import LoadError, get_device, get_generator, is_loaded
+from ..config import CFG
+from .batching import FaceBatcher, SeedImageCache
+from .loader import LoadError, get_device, get_generator, is_loaded, model_key as loaded_model_key
 
 _log = logging.getLogger(__name__)
 
@@ -28,6 +35,11 @@ class StyleGANUnavailable(RuntimeError):
     """Raised when StyleGAN inference cannot run."""
 
 
+_seed_cache = SeedImageCache(max_bytes=max(0, CFG.stylegan_seed_cache_mb) * 1024 * 1024)
+_batcher: Optional[FaceBatcher] = None
+_batcher_lock = threading.Lock()
+
+
 def generate_faces(
     count: int = 4,
     seeds: Optional[List[int]] = None,
@@ -36,6 +48,11 @@ def generate_faces(
 ) -> List[Dict[str, Any]]:
     """Generate face images from StyleGAN2.
 
+    All seeds of a request go through the mapping and synthesis networks
+    as one batch, and concurrent requests are coalesced by the shared
+    ``FaceBatcher``.  Faces for caller-supplied seeds are cached, since a
+    seed always yields the same face for a given model and truncation.
+
     Parameters
     ----------
     count : int
@@ -65,70 +82,125 @@ def generate_faces(
         )
 
     try:
-        import numpy as np
-        import torch
+        import numpy as np  # noqa: F401
+        import torch  # noqa: F401
     except ImportError as exc:
         raise StyleGANUnavailable(f"Missing dependency: {exc}") from exc
 
     G = get_generator()
-    device = get_device()
     truncation = float(max(0.1, min(1.0, truncation)))
 
-    # Fill in missing seeds
+    # Fill in missing seeds; only caller-supplied seeds are worth caching
     if seeds is None:
         seeds = []
+    explicit = set(seeds[:count])
     if len(seeds) < count:
         import random as _rng
 
         seeds = list(seeds) + [_rng.randint(0, 2**31 - 1) for _ in range(count - len(seeds))]
+    seeds = list(seeds[:count])
+
+    # Not id(G): a reloaded model may reuse the address of the old one.
+    model_key = loaded_model_key()
+    arrays: Dict[int, Any] = {}
+    for seed in explicit:
+        cached = _seed_cache.get(SeedImageCache.key(model_key, seed, truncation))
+        if cached is not None:
+            arrays[seed] = cached
+    cache_hits = set(arrays)
+
+    todo = list(dict.fromkeys(s for s in seeds if s not in arrays))
+    if todo:
+        for seed, arr in zip(todo, _get_batcher().submit(todo, truncation)):
+            arrays[seed] = arr
+            if seed in explicit:
+                _seed_cache.put(SeedImageCache.key(model_key, seed, truncation), arr)
 
     results: List[Dict[str, Any]] = []
-
-    with torch.no_grad():
-        for seed in seeds[:count]:
-            pil_img = _generate_single(G, seed, truncation, device, np, torch)
-
-            # Resize if model output differs from requested size
-            if pil_img.size[0] != output_size or pil_img.size[1] != output_size:
-                pil_img = pil_img.resize((output_size, output_size), Image.LANCZOS)
-
-            results.append({
-                "image": pil_img,
-                "seed": seed,
-                "metadata": {
-                    "generator": "stylegan2",
-                    "truncation": truncation,
-                    "native_resolution": G.img_resolution if hasattr(G, "img_resolution") else "unknown",
-                },
-            })
-
-    _log.info("Generated %d face(s) with truncation=%.2f", len(results), truncation)
+    for seed in seeds:
+        pil_img = Image.fromarray(arrays[seed], mode="RGB")
+
+        # Resize if model output differs from requested size
+        if pil_img.size[0] != output_size or pil_img.size[1] != output_size:
+            pil_img = pil_img.resize((output_size, output_size), Image.LANCZOS)
+        else:
+            pil_img = pil_img.copy()  # never hand out a view of a cached array
+
+        results.append({
+            "image": pil_img,
+            "seed": seed,
+            "metadata": {
+                "generator": "stylegan2",
+                "truncation": truncation,
+                "native_resolution": G.img_resolution if hasattr(G, "img_resolution") else "unknown",
+                "cache_hit": seed in cache_hits,
+            },
+        })
+
+    _log.info(
+        "Generated %d face(s) with truncation=%.2f (%d from seed cache)",
+        len(results), truncation, len(cache_hits),
+    )
     return results
 
 
+def batching_stats() -> Dict[str, Any]:
+    """Batcher and seed-cache counters (for logs / diagnostics)."""
+    return {
+        "batcher": _batcher.stats() if _batcher is not None else None,
+        "seed_cache": _seed_cache.stats(),
+    }
+
+
 # ---------------------------------------------------------------------------
 # Internal
 # ---------------------------------------------------------------------------
 
 
-def _generate_single(
+def _get_batcher() -> FaceBatcher:
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = FaceBatcher(
+                _run_loaded_batch,
+                window_s=max(0.0, CFG.stylegan_batch_window_ms) / 1000.0,
+                max_batch=max(1, CFG.stylegan_max_batch),
+            )
+        return _batcher
+
+
+def _run_loaded_batch(seeds: Sequence[int], truncation: float) -> List[Any]:
+    """Batch function for the batcher: runs on the currently loaded model."""
+    import numpy as np
+    import torch
+
+    try:
+        G = get_generator()
+    except LoadError as exc:
+        raise StyleGANUnavailable(str(exc)) from exc
+    with torch.no_grad():
+        images = _synthesize_batch(G, seeds, truncation, get_device(), np, torch)
+    return list(_batch_to_uint8(images, torch))
+
+
+def _synthesize_batch(
     G: Any,
-    seed: int,
+    seeds: Sequence[int],
     truncation: float,
     device: Any,
     np: Any,
     torch: Any,
-) -> Image.Image:
-    """Generate a single face from a seed.  Returns a PIL RGB Image."""
-    # Deterministic latent vector from seed
+) -> Any:
+    """One mapping + synthesis pass for all *seeds*.  Returns NCHW in [-1, 1]."""
+    # Per-seed RandomState keeps each latent identical to the unbatched path
     z = torch.from_numpy(
-        np.random.RandomState(seed).randn(1, G.z_dim)
+        np.concatenate([np.random.RandomState(seed).randn(1, G.z_dim) for seed in seeds])
     ).to(device=device, dtype=torch.float32)
 
     # Class conditioning (usually None for FFHQ)
     c = None
     if hasattr(G, "c_dim") and G.c_dim > 0:
-        c = torch.zeros([1, G.c_dim], device=device)
+        c = torch.zeros([len(seeds), G.c_dim], device=device)
 
     # Generate — handles both NVIDIA and Rosinality API styles
     if hasattr(G, "mapping") and hasattr(G, "synthesis"):
@@ -137,17 +209,18 @@ def _generate_single(
         if hasattr(G.mapping, "w_avg"):
             w_avg = G.mapping.w_avg.unsqueeze(0).unsqueeze(1)
             w = w_avg + truncation * (w - w_avg)
-        img = G.synthesis(w, noise_mode="const")
-    else:
-        # Direct forward pass (Rosinality or simple models)
-        img = G(z, c, truncation_psi=truncation, noise_mode="const")
+        return G.synthesis(w, noise_mode="const")
+    # Direct forward pass (Rosinality or simple models)
+    return G(z, c, truncation_psi=truncation, noise_mode="const")
+
 
-    return _tensor_to_pil(img[0], torch)
+def _batch_to_uint8(images: Any, torch: Any) -> Any:
+    """NCHW float tensor in [-1, 1] → NHWC uint8 numpy array, in one pass."""
+    x = images.detach().to(dtype=torch.float32)
+    x = (x * 127.5 + 128).clamp(0, 255).to(torch.uint8)
+    return x.permute(0, 2, 3, 1).contiguous().cpu().numpy()
 
 
 def _tensor_to_pil(tensor: Any, torch: Any) -> Image.Image:
     """Convert a CHW float tensor in [-1, 1] → PIL RGB Image."""
-    x = tensor.detach().to(dtype=torch.float32, device="cpu")
-    x = (x * 127.5 + 128).clamp(0, 255).to(torch.uint8)
-    x = x.permute(1, 2, 0).contiguous().numpy()
-    return Image.fromarray(x, mode="RGB")
+    return Image.fromarray(_batch_to_uint8(tensor.unsqueeze(0), torch)[0], mode="RGB")
@@ -17,7 +17,7 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 
 _log = logging.getLogger(__name__)
 
@@ -28,6 +28,8 @@ _log = logging.getLogger(__name__)
 _G: Optional[Any] = None
 _device: Optional[Any] = None
 _loaded_path: Optional[str] = None
+_loaded_mtime_ns: Optional[int] = None
+_load_count = 0
 
 
 class LoadError(RuntimeError):
@@ -52,7 +54,7 @@ def load_model(weights_path: str, device: str = "auto") -> None:
     device : str
         ``"auto"`` (GPU if available, else CPU), ``"cuda"``, or ``"cpu"``.
     """
-    global _G, _device, _loaded_path
+    global _G, _device, _loaded_path, _loaded_mtime_ns, _load_count
 
     try:
         import torch
@@ -90,6 +92,8 @@ def load_model(weights_path: str, device: str = "auto") -> None:
 
     _G = G
     _loaded_path = str(path)
+    _loaded_mtime_ns = path.stat().st_mtime_ns
+    _load_count += 1
 
 
 def get_generator() -> Any:
@@ -102,6 +106,12 @@ def get_generator() -> Any:
     return _G
 
 
+def model_key() -> Tuple[Optional[str], Optional[int], int]:
+    """Identity of the loaded weights: checkpoint path, its mtime and a load
+    counter.  Stable for the lifetime of one load; any reload changes it."""
+    return (_loaded_path, _loaded_mtime_ns, _load_count)
+
+
 def get_device() -> Any:
     """Return the torch device the generator is on."""
     if _device is None:
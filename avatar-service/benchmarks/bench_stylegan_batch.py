@@ -0,0 +1,148 @@
+"""
+Micro-benchmark: batched StyleGAN2 inference vs. the per-seed loop.
+
+Uses a tiny randomly-initialised generator with the NVIDIA
+``mapping`` / ``synthesis`` interface, so it runs on CPU without weights.
+
+Compared paths:
+  loop      one mapping + synthesis pass per seed, per-image tensor → PIL
+            (what ``generate_faces`` did before batching)
+  batched   one pass for all seeds of a request, vectorised conversion
+  coalesced N concurrent single-seed requests through the FaceBatcher
+
+Run from ``avatar-service/``::
+
+    python -m benchmarks.bench_stylegan_batch [--faces 8] [--resolution 128] [--rounds 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    import numpy as np
+    import torch
+    from torch import nn
+except ImportError:  # pragma: no cover - optional [gpu] extra
+    raise SystemExit("bench_stylegan_batch needs torch + numpy: pip install '.[gpu]'")
+
+from app.stylegan.batching import FaceBatcher  # noqa: E402
+from app.stylegan.generator import _batch_to_uint8, _synthesize_batch, _tensor_to_pil  # noqa: E402
+
+
+class _Mapping(nn.Module):
+    def __init__(self, z_dim: int, w_dim: int, num_ws: int):
+        super().__init__()
+        self.num_ws = num_ws
+        self.net = nn.Sequential(
+            nn.Linear(z_dim, w_dim), nn.LeakyReLU(0.2),
+            nn.Linear(w_dim, w_dim), nn.LeakyReLU(0.2),
+        )
+        self.register_buffer("w_avg", torch.zeros(w_dim))
+
+    def forward(self, z, c=None):
+        w = self.net(z)
+        return w.unsqueeze(1).repeat(1, self.num_ws, 1)
+
+
+class _Synthesis(nn.Module):
+    def __init__(self, w_dim: int, resolution: int, channels: int = 32):
+        super().__init__()
+        self.channels = channels
+        self.const = nn.Linear(w_dim, channels * 4 * 4)
+        blocks = []
+        size = 4
+        while size < resolution:
+            blocks += [nn.Upsample(scale_factor=2), nn.Conv2d(channels, channels, 3, padding=1), nn.LeakyReLU(0.2)]
+            size *= 2
+        self.blocks = nn.Sequential(*blocks)
+        self.to_rgb = nn.Conv2d(channels, 3, 1)
+
+    def forward(self, ws, noise_mode="const"):
+        x = self.const(ws[:, 0]).view(-1, self.channels, 4, 4)
+        return torch.tanh(self.to_rgb(self.blocks(x)))
+
+
+class TinyGenerator(nn.Module):
+    """Randomly-initialised stand-in with the stylegan2-ada interface."""
+
+    def __init__(self, resolution: int = 64, z_dim: int = 64, w_dim: int = 64):
+        super().__init__()
+        torch.manual_seed(0)
+        self.z_dim = z_dim
+        self.c_dim = 0
+        self.img_resolution = resolution
+        num_ws = 2 * max(1, resolution.bit_length() - 2)
+        self.mapping = _Mapping(z_dim, w_dim, num_ws)
+        self.synthesis = _Synthesis(w_dim, resolution)
+
+
+def _loop(G, seeds, truncation):
+    out = []
+    for seed in seeds:
+        img = _synthesize_batch(G, [seed], truncation, "cpu", np, torch)
+        out.append(_tensor_to_pil(img[0], torch))
+    return out
+
+
+def _batched(G, seeds, truncation):
+    return list(_batch_to_uint8(_synthesize_batch(G, seeds, truncation, "cpu", np, torch), torch))
+
+
+def _coalesced(batcher, seeds, truncation):
+    threads = [threading.Thread(target=batcher.submit, args=([s], truncation)) for s in seeds]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+
+def _best(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--faces", type=int, default=8)
+    ap.add_argument("--resolution", type=int, default=128)
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--window-ms", type=float, default=8.0)
+    args = ap.parse_args()
+
+    G = TinyGenerator(resolution=args.resolution).eval()
+    seeds = list(range(1000, 1000 + args.faces))
+    truncation = 0.7
+    batcher = FaceBatcher(
+        lambda s, t: _batched(G, s, t), window_s=args.window_ms / 1000.0, max_batch=args.faces,
+    )
+
+    with torch.no_grad():
+        _batched(G, seeds, truncation)  # warm-up
+        rows = [
+            ("loop (batch=1)", _best(lambda: _loop(G, seeds, truncation), args.rounds)),
+            ("batched", _best(lambda: _batched(G, seeds, truncation), args.rounds)),
+            (f"coalesced x{args.faces}", _best(lambda: _coalesced(batcher, seeds, truncation), args.rounds)),
+        ]
+
+    print(f"{args.faces} faces @ {args.resolution}px, torch {torch.__version__}, "
+          f"{torch.get_num_threads()} CPU threads")
+    base = rows[0][1]
+    for label, secs in rows:
+        print(f"  {label:<16} {secs * 1000:8.1f} ms   {secs * 1000 / args.faces:7.2f} ms/face   "
+              f"x{base / secs:4.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+StyleGAN batching unit tests — CI-light (no GPU, no model weights).
+
+Validates:
+  1. FaceBatcher coalesces concurrent requests into one batch
+  2. FaceBatcher splits oversized requests at max_batch and keeps order
+  3. Requests with different truncation are never mixed in a batch
+  4. Batch errors propagate to every waiting caller
+  5. SeedImageCache is byte-bounded LRU with read-only entries
+  6. generate_faces end-to-end with a tiny random generator (needs torch)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.stylegan.batching import FaceBatcher, SeedImageCache
+
+
+def _fake_faces(seeds, truncation):
+    """Deterministic 4x4 'faces' whose pixels encode the seed."""
+    return [np.full((4, 4, 3), seed % 256, dtype=np.uint8) for seed in seeds]
+
+
+class _Recorder:
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self.delay = delay
+
+    def __call__(self, seeds, truncation):
+        self.calls.append((list(seeds), truncation))
+        time.sleep(self.delay)
+        return _fake_faces(seeds, truncation)
+
+
+def _submit_concurrently(batcher, requests):
+    results = [None] * len(requests)
+    barrier = threading.Barrier(len(requests))
+
+    def _run(i, seeds, truncation):
+        barrier.wait()
+        results[i] = batcher.submit(seeds, truncation)
+
+    threads = [threading.Thread(target=_run, args=(i, s, t)) for i, (s, t) in enumerate(requests)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join(timeout=5)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 1-4. FaceBatcher
+# ---------------------------------------------------------------------------
+
+class TestFaceBatcher:
+
+    def test_concurrent_requests_are_coalesced(self):
+        run = _Recorder()
+        batcher = FaceBatcher(run, window_s=0.2, max_batch=8)
+        requests = [([1, 2], 0.7), ([3], 0.7), ([4, 5], 0.7)]
+        results = _submit_concurrently(batcher, requests)
+
+        assert len(run.calls) == 1
+        assert sorted(run.calls[0][0]) == [1, 2, 3, 4, 5]
+        for (seeds, _), out in zip(requests, results):
+            assert [int(a[0, 0, 0]) for a in out] == seeds
+        assert batcher.stats()["requests"] == 3
+
+    def test_oversized_request_is_chunked_in_order(self):
+        run = _Recorder()
+        batcher = FaceBatcher(run, window_s=0.0, max_batch=3)
+        out = batcher.submit(list(range(10, 17)), 0.5)
+
+        assert [len(seeds) for seeds, _ in run.calls] == [3, 3, 1]
+        assert [int(a[0, 0, 0]) for a in out] == list(range(10, 17))
+
+    def test_truncation_groups_are_not_mixed(self):
+        run = _Recorder()
+        batcher = FaceBatcher(run, window_s=0.2, max_batch=8)
+        _submit_concurrently(batcher, [([1], 0.5), ([2], 0.9), ([3], 0.5)])
+
+        by_trunc = {}
+        for seeds, trunc in run.calls:
+            by_trunc.setdefault(trunc, []).extend(seeds)
+        assert sorted(by_trunc[0.5]) == [1, 3]
+        assert by_trunc[0.9] == [2]
+
+    def test_batch_error_reaches_all_callers_and_worker_survives(self):
+        state = {"fail": True}
+
+        def run(seeds, truncation):
+            if state["fail"]:
+                raise RuntimeError("device lost")
+            return _fake_faces(seeds, truncation)
+
+        batcher = FaceBatcher(run, window_s=0.0, max_batch=4)
+        with pytest.raises(RuntimeError, match="device lost"):
+            batcher.submit([1], 0.7)
+        state["fail"] = False
+        assert int(batcher.submit([9], 0.7)[0][0, 0, 0]) == 9
+
+
+# ---------------------------------------------------------------------------
+# 5. SeedImageCache
+# ---------------------------------------------------------------------------
+
+class TestSeedImageCache:
+
+    def test_lru_is_byte_bounded(self):
+        face = lambda v: np.full((4, 4, 3), v, dtype=np.uint8)  # 48 bytes
+        cache = SeedImageCache(max_bytes=48 * 2)
+        for seed in (1, 2, 3):
+            cache.put(SeedImageCache.key("m", seed, 0.7), face(seed))
+
+        assert cache.get(SeedImageCache.key("m", 1, 0.7)) is None
+        assert int(cache.get(SeedImageCache.key("m", 3, 0.7))[0, 0, 0]) == 3
+        assert cache.stats()["bytes"] == 96
+
+    def test_key_distinguishes_model_and_truncation(self):
+        cache = SeedImageCache()
+        cache.put(SeedImageCache.key("m1", 5, 0.7), np.zeros((2, 2, 3), np.uint8))
+        assert cache.get(SeedImageCache.key("m2", 5, 0.7)) is None
+        assert cache.get(SeedImageCache.key("m1", 5, 0.5)) is None
+        assert cache.get(SeedImageCache.key("m1", 5, 0.70001)) is not None
+
+    def test_cached_arrays_are_read_only(self):
+        cache = SeedImageCache()
+        arr = np.zeros((2, 2, 3), np.uint8)
+        cache.put("k", arr)
+        with pytest.raises(ValueError):
+            cache.get("k")[0, 0, 0] = 1
+
+
+# ---------------------------------------------------------------------------
+# 6. generate_faces with a tiny random generator
+# ---------------------------------------------------------------------------
+
+class TestGenerateFacesBatched:
+
+    @pytest.fixture()
+    def tiny_generator(self, monkeypatch):
+        torch = pytest.importorskip("torch")
+        import app.stylegan.generator as gen_mod
+        import app.stylegan.loader as loader_mod
+        from benchmarks.bench_stylegan_batch import TinyGenerator
+
+        G = TinyGenerator(resolution=16).eval()
+        monkeypatch.setattr(loader_mod, "_G", G)
+        monkeypatch.setattr(loader_mod, "_device", torch.device("cpu"))
+        monkeypatch.setattr(gen_mod, "_seed_cache", SeedImageCache())
+        monkeypatch.setattr(gen_mod, "_batcher", None)
+        return G, gen_mod, torch
+
+    def test_batched_output_matches_single_seed_path(self, tiny_generator):
+        G, gen_mod, torch = tiny_generator
+        faces = gen_mod.generate_faces(count=3, seeds=[11, 22, 33], output_size=16)
+
+        for face in faces:
+            with torch.no_grad():
+                single = gen_mod._synthesize_batch(G, [face["seed"]], 0.7, "cpu", np, torch)
+            expected = gen_mod._tensor_to_pil(single[0], torch)
+            diff = np.abs(np.asarray(face["image"], np.int16) - np.asarray(expected, np.int16))
+            assert diff.max() <= 1
+
+    def test_explicit_seeds_are_served_from_cache(self, tiny_generator):
+        _, gen_mod, _ = tiny_generator
+        first = gen_mod.generate_faces(count=2, seeds=[5, 6], output_size=16)
+        again = gen_mod.generate_faces(count=2, seeds=[5, 6], output_size=16)
+
+        assert [f["metadata"]["cache_hit"] for f in first] == [False, False]
+        assert [f["metadata"]["cache_hit"] for f in again] == [True, True]
+        assert gen_mod._batcher.stats()["batches"] == 1
+        assert np.array_equal(np.asarray(first[0]["image"]), np.asarray(again[0]["image"]))
+
+    def test_reload_does_not_serve_old_faces(self, tiny_generator, monkeypatch):
+        _, gen_mod, _ = tiny_generator
+        import app.stylegan.loader as loader_mod
+
+        gen_mod.generate_faces(count=1, seeds=[5], output_size=16)
+        # Same object, same path: a reload alone must change the cache key.
+        monkeypatch.setattr(loader_mod, "_load_count", loader_mod._load_count + 1)
+        again = gen_mod.generate_faces(count=1, seeds=[5], output_size=16)
+        assert again[0]["metadata"]["cache_hit"] is False
@@ -3,7 +3,9 @@ Asset Registry — durable media tracking that survives DB resets.
 
 Core contract:
   1. Every generated image/video gets an `assets` row immediately on creation.
-  2. On startup, `reconcile()` scans disk and rebuilds any missing rows.
+  2. On startup, `reconcile()` scans disk and rebuilds any missing rows
+     (fresh DB), otherwise `reconcile_journal()` replays only the changes
+     recorded by the blob store since the last run.
   3. Landing page APIs fall back to the asset registry when feature tables are empty.
 
 This module is ADDITIVE — it does not modify any existing module.
@@ -42,6 +44,11 @@ IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".tiff"}
 VIDEO_EXTS = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
 MEDIA_EXTS = IMAGE_EXTS | VIDEO_EXTS
 
+# Content-addressed blob directory under the upload root (see blob_store.py);
+# blobs have no extension and are tracked through their materialised paths.
+_BLOB_DIRNAME = "blobs"
+_JOURNAL_CONSUMER = "asset_registry"
+
 
 # ── DB helpers ─────────────────────────────────────────────────────────────────
 
@@ -311,6 +318,7 @@ def reconcile(
             dirnames[:] = [
                 d for d in dirnames
                 if not d.startswith(".") and d not in ("__pycache__", "node_modules")
+                and not (Path(dirpath) == root and d == _BLOB_DIRNAME)
             ]
 
             for fname in filenames:
@@ -386,21 +394,108 @@ def reconcile(
     return stats
 
 
+# ── Incremental reconcile (change journal) ─────────────────────────────────────
+
+def reconcile_journal(verbose: bool = False) -> Dict[str, int]:
+    """
+    Incremental reconcile: apply media_journal entries (written by the blob
+    store on every put/delete) since this consumer's cursor, instead of
+    walking the upload tree.
+
+    Returns stats: {created, updated, deleted, skipped, errors}
+    """
+    from . import blob_store
+
+    _ensure_assets_table()
+    stats = {"created": 0, "updated": 0, "deleted": 0, "skipped": 0, "errors": 0}
+    cursor = blob_store.get_cursor(_JOURNAL_CONSUMER)
+
+    while True:
+        entries = blob_store.read_journal(after_seq=cursor)
+        if not entries:
+            break
+        con = _db()
+        cur = con.cursor()
+        for e in entries:
+            cursor = e["seq"]
+            rel_path = e["rel_path"]
+            ext = Path(rel_path).suffix.lower()
+            if ext not in MEDIA_EXTS:
+                stats["skipped"] += 1
+                continue
+            try:
+                if e["op"] == "delete":
+                    cur.execute(
+                        "DELETE FROM assets WHERE storage_backend = 'local' AND storage_key = ?",
+                        (rel_path,),
+                    )
+                    stats["deleted"] += cur.rowcount
+                    continue
+
+                cur.execute(
+                    "SELECT id FROM assets WHERE storage_backend = 'local' AND storage_key = ?",
+                    (rel_path,),
+                )
+                existing = cur.fetchone()
+                if existing:
+                    cur.execute(
+                        "UPDATE assets SET last_seen_at = datetime('now'), size_bytes = ?, "
+                        "sha256 = ? WHERE id = ?",
+                        (e["size_bytes"], e["sha256"] or "", existing["id"]),
+                    )
+                    stats["updated"] += 1
+                else:
+                    feature, project_id = classify_path(rel_path)
+                    cur.execute(
+                        """
+                        INSERT INTO assets(
+                            id, kind, mime, storage_backend, storage_key,
+                            size_bytes, sha256, origin, source_hint, feature,
+                            project_id, user_id
+                        ) VALUES (?,?,?,'local',?,?,?,?,?,?,?,?)
+                        """,
+                        (f"a_{uuid.uuid4().hex[:20]}",
+                         "video" if ext in VIDEO_EXTS else "image",
+                         e["mime"] or mimetypes.guess_type(rel_path)[0] or "",
+                         rel_path, e["size_bytes"], e["sha256"] or "",
+                         e["origin"] or "journal", os.path.basename(rel_path),
+                         feature, e["project_id"] or project_id, e["user_id"] or ""),
+                    )
+                    stats["created"] += 1
+            except sqlite3.Error:
+                stats["errors"] += 1
+        con.commit()
+        con.close()
+        blob_store.set_cursor(_JOURNAL_CONSUMER, cursor)
+
+    if verbose:
+        print(f"[RECONCILE] Journal applied: {stats}")
+    return stats
+
+
 # ── Startup hook ───────────────────────────────────────────────────────────────
 
 def startup_reconcile():
     """
     Run on backend startup to ensure the asset registry is populated.
-    Only does a full scan if the assets table is empty (fresh DB).
+    Only does a full scan if the assets table is empty (fresh DB) or
+    ASSET_RECONCILE_FULL=1; otherwise replays the blob-store change journal.
     """
+    from . import blob_store
+
     _ensure_assets_table()
     count = count_assets()
-    if count == 0:
-        print("[ASSET_REGISTRY] Empty assets table — running reconcile from disk...")
+    force_full = os.getenv("ASSET_RECONCILE_FULL", "").strip().lower() in ("1", "true", "yes")
+    if count == 0 or force_full:
+        print("[ASSET_REGISTRY] Running full reconcile from disk...")
+        # Everything journalled so far is covered by the walk
+        head = blob_store.journal_head()
         stats = reconcile(verbose=True)
+        blob_store.set_cursor(_JOURNAL_CONSUMER, head)
         print(f"[ASSET_REGISTRY] Reconcile complete: {stats}")
     else:
-        print(f"[ASSET_REGISTRY] {count} assets already registered")
+        stats = reconcile_journal()
+        print(f"[ASSET_REGISTRY] {count} assets already registered; journal: {stats}")
 
 
 # ── Convenience: register from ComfyUI output ─────────────────────────────────
@@ -417,6 +512,9 @@ def register_comfy_output(
     Register a file that was downloaded from ComfyUI.
     Call this right after saving the file to UPLOAD_DIR.
 
+    The file is adopted into the content-addressed blob store, so a
+    byte-identical output already on disk is deduplicated.
+
     Returns the asset_id.
     """
     root = _upload_root()
@@ -431,6 +529,17 @@ def register_comfy_output(
     kind = "video" if ext in VIDEO_EXTS else "image"
     mime = mimetypes.guess_type(str(abs_path))[0] or ""
 
+    sha256 = ""
+    if size and rel_path != str(abs_path):
+        try:
+            from . import blob_store
+            sha256 = blob_store.adopt_file(
+                abs_path, mime=mime, origin="comfy",
+                user_id=user_id, project_id=project_id,
+            )["sha256"]
+        except Exception as e:
+            print(f"[ASSET_REGISTRY] Blob adopt failed for {filename}: {e}")
+
     if not feature:
         feature = classify_filename(filename)
 
@@ -444,4 +553,5 @@ def register_comfy_output(
         feature=feature,
         project_id=project_id,
         user_id=user_id,
+        sha256=sha256,
     )
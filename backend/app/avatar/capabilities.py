@@ -56,7 +56,9 @@ async def get_capabilities() -> Dict[str, Any]:
     openpose_ok = False
     if comfyui_ok:
         try:
+            from ..comfy import get_capability_snapshot_async
             from ..comfy import openpose_available as _openpose_available
+            await get_capability_snapshot_async()  # first fetch off the event loop
             openpose_ok = _openpose_available()
         except Exception:
             pass
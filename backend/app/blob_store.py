@@ -0,0 +1,531 @@
+"""
+Content-Addressed Blob Store — dedup layer under uploads and generated media.
+
+Every byte payload written by the media paths (secure uploads, generated
+images, persisted chat images, ComfyUI outputs) is stored once under its
+SHA-256:
+
+  uploads/blobs/sha256/<aa>/<bb>/<sha256>
+
+and *materialised* into the legacy per-user / per-project path that the
+rest of the app (and file_assets.rel_path) already knows about.
+Materialisation tries, in order:
+
+  1. hardlink   — same inode, zero extra bytes
+  2. reflink    — copy-on-write clone (btrfs / XFS / APFS-style FICLONE)
+  3. copy       — plain copy when the upload dir spans filesystems
+
+Materialised files are treated as immutable: writers always create a new
+file name rather than rewriting one in place (a hardlinked path shares its
+inode with the blob).
+
+Tables (same SQLite DB as file_assets):
+
+  blobs          sha256 → size, mime, refcount   (the hash index)
+  blob_refs      rel_path → sha256, plus the path's size / mtime_ns when it
+                 was materialised (one row per materialised path)
+  media_journal  append-only change log (put / delete per rel_path) consumed
+                 by asset_registry.reconcile_journal() so startup does not
+                 need to walk the whole upload tree.
+
+Set MEDIA_BLOB_STORE=0 to fall back to plain per-path writes (journal still
+recorded).
+
+ADDITIVE ONLY — callers keep their existing rel_path contract.
+"""
+from __future__ import annotations
+
+import errno
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import UPLOAD_DIR
+from .storage import _get_db_path
+
+BLOB_DIRNAME = "blobs"
+
+# Linux FICLONE ioctl (_IOW(0x94, 9, int)) — reflink a whole file
+_FICLONE = 0x40049409
+
+_lock = threading.RLock()
+_tables_ready: set[str] = set()
+
+
+def enabled() -> bool:
+    return os.getenv("MEDIA_BLOB_STORE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+# ---------------------------------------------------------------------------
+# DB / path helpers
+# ---------------------------------------------------------------------------
+
+def _db() -> sqlite3.Connection:
+    path = _get_db_path()
+    con = sqlite3.connect(path, timeout=30)
+    con.row_factory = sqlite3.Row
+    if path not in _tables_ready:
+        _ensure_tables(con)
+        _tables_ready.add(path)
+    return con
+
+
+def _ensure_tables(con: sqlite3.Connection) -> None:
+    con.executescript("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            sha256 TEXT PRIMARY KEY,
+            size_bytes INTEGER NOT NULL DEFAULT 0,
+            mime TEXT DEFAULT '',
+            refcount INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL DEFAULT (datetime('now')),
+            last_ref_at TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+        CREATE TABLE IF NOT EXISTS blob_refs (
+            rel_path TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            method TEXT DEFAULT '',
+            size_bytes INTEGER NOT NULL DEFAULT 0,
+            mtime_ns INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+        CREATE INDEX IF NOT EXISTS idx_blob_refs_sha ON blob_refs(sha256);
+        CREATE TABLE IF NOT EXISTS media_journal (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL,
+            rel_path TEXT NOT NULL,
+            sha256 TEXT DEFAULT '',
+            size_bytes INTEGER DEFAULT 0,
+            mime TEXT DEFAULT '',
+            origin TEXT DEFAULT '',
+            user_id TEXT DEFAULT '',
+            project_id TEXT DEFAULT '',
+            ts TEXT NOT NULL DEFAULT (datetime('now'))
+        );
+        CREATE TABLE IF NOT EXISTS media_journal_cursor (
+            consumer TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+    # Additive columns for databases created before refs recorded their stat.
+    have = {r[1] for r in con.execute("PRAGMA table_info(blob_refs)")}
+    for col in ("size_bytes", "mtime_ns"):
+        if col not in have:
+            con.execute(f"ALTER TABLE blob_refs ADD COLUMN {col} INTEGER NOT NULL DEFAULT 0")
+    con.commit()
+
+
+def _upload_root() -> Path:
+    p = Path(UPLOAD_DIR)
+    if not p.is_absolute():
+        p = Path(__file__).resolve().parents[1] / "data" / "uploads"
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+def blob_path(sha256: str) -> Path:
+    """Sharded on-disk location of a blob (two 2-hex-char directory levels)."""
+    return _upload_root() / BLOB_DIRNAME / "sha256" / sha256[:2] / sha256[2:4] / sha256
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _rel(abs_path: Path) -> str:
+    try:
+        return str(abs_path.relative_to(_upload_root()))
+    except ValueError:
+        return str(abs_path)
+
+
+# ---------------------------------------------------------------------------
+# Materialisation
+# ---------------------------------------------------------------------------
+
+def _reflink(src: Path, dest: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - non-POSIX
+        return False
+    try:
+        with open(src, "rb") as s, open(dest, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        return True
+    except OSError:
+        try:
+            dest.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def materialize(sha256: str, dest: Path) -> str:
+    """Place blob *sha256* at *dest*. Returns 'hardlink', 'reflink' or 'copy'."""
+    src = blob_path(sha256)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists():
+        dest.unlink()
+    try:
+        os.link(src, dest)
+        return "hardlink"
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP):
+            raise
+    if _reflink(src, dest):
+        return "reflink"
+    shutil.copyfile(src, dest)
+    return "copy"
+
+
+def _write_blob(sha256: str, data: bytes) -> None:
+    path = blob_path(sha256)
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{sha256}.{uuid.uuid4().hex[:8]}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _adopt_blob(sha256: str, src: Path) -> None:
+    """Move an already-written file's bytes into the blob store without copying."""
+    path = blob_path(sha256)
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, path)
+    except OSError:
+        tmp = path.with_name(f".{sha256}.{uuid.uuid4().hex[:8]}.tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Journal
+# ---------------------------------------------------------------------------
+
+def _journal(
+    cur: sqlite3.Cursor,
+    op: str,
+    rel_path: str,
+    sha256: str = "",
+    size_bytes: int = 0,
+    mime: str = "",
+    origin: str = "",
+    user_id: str = "",
+    project_id: str = "",
+) -> None:
+    cur.execute(
+        """
+        INSERT INTO media_journal(op, rel_path, sha256, size_bytes, mime, origin, user_id, project_id)
+        VALUES (?,?,?,?,?,?,?,?)
+        """,
+        (op, rel_path, sha256 or "", int(size_bytes or 0), mime or "",
+         origin or "", user_id or "", project_id or ""),
+    )
+
+
+def read_journal(after_seq: int = 0, limit: int = 5000) -> List[Dict[str, Any]]:
+    con = _db()
+    cur = con.cursor()
+    cur.execute(
+        "SELECT * FROM media_journal WHERE seq > ? ORDER BY seq ASC LIMIT ?",
+        (int(after_seq), int(limit)),
+    )
+    rows = [dict(r) for r in cur.fetchall()]
+    con.close()
+    return rows
+
+
+def journal_head() -> int:
+    con = _db()
+    cur = con.cursor()
+    cur.execute("SELECT COALESCE(MAX(seq), 0) FROM media_journal")
+    seq = int(cur.fetchone()[0])
+    con.close()
+    return seq
+
+
+def get_cursor(consumer: str) -> int:
+    con = _db()
+    cur = con.cursor()
+    cur.execute("SELECT seq FROM media_journal_cursor WHERE consumer = ?", (consumer,))
+    row = cur.fetchone()
+    con.close()
+    return int(row["seq"]) if row else 0
+
+
+def set_cursor(consumer: str, seq: int, trim: bool = True) -> None:
+    """Advance *consumer*'s cursor; with *trim*, drop journal rows it has consumed."""
+    con = _db()
+    cur = con.cursor()
+    cur.execute(
+        "INSERT INTO media_journal_cursor(consumer, seq) VALUES (?, ?) "
+        "ON CONFLICT(consumer) DO UPDATE SET seq = excluded.seq",
+        (consumer, int(seq)),
+    )
+    if trim:
+        cur.execute(
+            "DELETE FROM media_journal WHERE seq <= (SELECT MIN(seq) FROM media_journal_cursor)"
+        )
+    con.commit()
+    con.close()
+
+
+# ---------------------------------------------------------------------------
+# Refcounting
+# ---------------------------------------------------------------------------
+
+def _add_ref(
+    cur: sqlite3.Cursor, path: Path, rel_path: str, sha256: str, size: int, mime: str, method: str,
+) -> None:
+    st = path.stat()
+    cur.execute("SELECT sha256 FROM blob_refs WHERE rel_path = ?", (rel_path,))
+    row = cur.fetchone()
+    if row and row["sha256"] == sha256:
+        cur.execute(
+            "UPDATE blob_refs SET method = ?, size_bytes = ?, mtime_ns = ? WHERE rel_path = ?",
+            (method, st.st_size, st.st_mtime_ns, rel_path),
+        )
+        return
+    if row:
+        _drop_ref(cur, rel_path, row["sha256"])
+    cur.execute(
+        """
+        INSERT INTO blobs(sha256, size_bytes, mime, refcount) VALUES (?,?,?,1)
+        ON CONFLICT(sha256) DO UPDATE SET
+            refcount = refcount + 1, last_ref_at = datetime('now')
+        """,
+        (sha256, int(size), mime or ""),
+    )
+    cur.execute(
+        "INSERT INTO blob_refs(rel_path, sha256, method, size_bytes, mtime_ns) VALUES (?,?,?,?,?)",
+        (rel_path, sha256, method, st.st_size, st.st_mtime_ns),
+    )
+
+
+def _drop_ref(cur: sqlite3.Cursor, rel_path: str, sha256: str) -> bool:
+    """Remove one reference; returns True if the blob became unreferenced."""
+    cur.execute("DELETE FROM blob_refs WHERE rel_path = ?", (rel_path,))
+    cur.execute(
+        "UPDATE blobs SET refcount = MAX(refcount - 1, 0) WHERE sha256 = ?",
+        (sha256,),
+    )
+    cur.execute("SELECT refcount FROM blobs WHERE sha256 = ?", (sha256,))
+    row = cur.fetchone()
+    if row is not None and int(row["refcount"]) == 0:
+        cur.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+        return True
+    return False
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def lookup(sha256: str) -> Optional[Dict[str, Any]]:
+    """Hash-index lookup: returns the blob row (size, mime, refcount) or None."""
+    if not sha256:
+        return None
+    con = _db()
+    cur = con.cursor()
+    cur.execute("SELECT * FROM blobs WHERE sha256 = ?", (sha256,))
+    row = cur.fetchone()
+    con.close()
+    return dict(row) if row else None
+
+
+def paths_for(sha256: str) -> List[str]:
+    """All legacy rel_paths currently materialised from *sha256*."""
+    con = _db()
+    cur = con.cursor()
+    cur.execute("SELECT rel_path FROM blob_refs WHERE sha256 = ? ORDER BY created_at", (sha256,))
+    rows = [r["rel_path"] for r in cur.fetchall()]
+    con.close()
+    return rows
+
+
+def sha_for_path(rel_path: str) -> str:
+    con = _db()
+    cur = con.cursor()
+    cur.execute("SELECT sha256 FROM blob_refs WHERE rel_path = ?", (rel_path,))
+    row = cur.fetchone()
+    con.close()
+    return row["sha256"] if row else ""
+
+
+def sha_for_file(path: Path, st: Optional[os.stat_result] = None) -> str:
+    """SHA-256 recorded for *path*, or "" if the file changed since it was materialised.
+
+    A ref only vouches for the bytes it placed: if something rewrote the
+    file outside the blob store, its size or mtime no longer match the ref
+    and the recorded hash is not trusted.
+    """
+    st = st or path.stat()
+    con = _db()
+    cur = con.cursor()
+    cur.execute(
+        "SELECT sha256, size_bytes, mtime_ns FROM blob_refs WHERE rel_path = ?", (_rel(path),)
+    )
+    row = cur.fetchone()
+    con.close()
+    if row is None or (row["size_bytes"], row["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+        return ""
+    return row["sha256"]
+
+
+def store_bytes(
+    data: bytes,
+    dest: Path,
+    mime: str = "",
+    origin: str = "",
+    user_id: str = "",
+    project_id: str = "",
+) -> Dict[str, Any]:
+    """
+    Write *data* to *dest* via the blob store.
+
+    Returns {sha256, rel_path, size_bytes, method, deduped}; ``deduped`` is
+    True when the bytes were already stored and no new blob was written.
+    """
+    sha = sha256_bytes(data)
+    rel_path = _rel(dest)
+    with _lock:
+        if not enabled():
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(data)
+            method, deduped = "direct", False
+        else:
+            deduped = blob_path(sha).exists()
+            if not deduped:
+                _write_blob(sha, data)
+            method = materialize(sha, dest)
+        con = _db()
+        cur = con.cursor()
+        if method != "direct":
+            _add_ref(cur, dest, rel_path, sha, len(data), mime, method)
+        _journal(cur, "put", rel_path, sha, len(data), mime, origin, user_id, project_id)
+        con.commit()
+        con.close()
+    return {"sha256": sha, "rel_path": rel_path, "size_bytes": len(data),
+            "method": method, "deduped": deduped}
+
+
+def adopt_file(
+    path: Path,
+    mime: str = "",
+    origin: str = "",
+    user_id: str = "",
+    project_id: str = "",
+) -> Dict[str, Any]:
+    """
+    Bring a file that another writer already put on disk under blob management.
+
+    If identical bytes are already stored, *path* is re-materialised from the
+    existing blob (freeing its duplicate bytes); otherwise the file itself
+    becomes the blob via a hardlink.
+    """
+    sha = sha256_file(path)
+    size = path.stat().st_size
+    rel_path = _rel(path)
+    with _lock:
+        method, deduped = "direct", False
+        if enabled():
+            deduped = blob_path(sha).exists()
+            if deduped:
+                method = materialize(sha, path)
+            else:
+                _adopt_blob(sha, path)
+                method = "adopted"
+        con = _db()
+        cur = con.cursor()
+        if method != "direct":
+            _add_ref(cur, path, rel_path, sha, size, mime, method)
+        _journal(cur, "put", rel_path, sha, size, mime, origin, user_id, project_id)
+        con.commit()
+        con.close()
+    return {"sha256": sha, "rel_path": rel_path, "size_bytes": size,
+            "method": method, "deduped": deduped}
+
+
+def release(rel_path: str) -> bool:
+    """
+    Drop the reference held by *rel_path* (call after deleting the legacy
+    file). Unreferenced blobs are removed from disk. Always journals the
+    delete. Returns True if a blob was garbage-collected.
+    """
+    if not rel_path:
+        return False
+    collected = False
+    with _lock:
+        con = _db()
+        cur = con.cursor()
+        cur.execute("SELECT sha256 FROM blob_refs WHERE rel_path = ?", (rel_path,))
+        row = cur.fetchone()
+        sha = row["sha256"] if row else ""
+        if sha:
+            collected = _drop_ref(cur, rel_path, sha)
+        _journal(cur, "delete", rel_path, sha)
+        con.commit()
+        con.close()
+        if collected:
+            try:
+                blob_path(sha).unlink()
+            except OSError:
+                pass
+    return collected
+
+
+def remove(path: Path) -> bool:
+    """
+    Delete a materialised file and drop its reference — the one call every
+    delete (or replace-by-delete) of an upload path should go through.
+    Returns True if a file was removed.
+    """
+    removed = False
+    try:
+        if path.is_file():
+            path.unlink()
+            removed = True
+    except OSError:
+        pass
+    release(_rel(path))
+    return removed
+
+
+def stats() -> Dict[str, int]:
+    """Blob count, referenced paths, physical vs logical bytes."""
+    con = _db()
+    cur = con.cursor()
+    cur.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(size_bytes * refcount), 0) FROM blobs")
+    blobs, physical, logical = cur.fetchone()
+    cur.execute("SELECT COUNT(*) FROM blob_refs")
+    refs = cur.fetchone()[0]
+    cur.execute("SELECT COUNT(*) FROM media_journal")
+    pending = cur.fetchone()[0]
+    con.close()
+    return {
+        "blobs": int(blobs),
+        "refs": int(refs),
+        "physical_bytes": int(physical),
+        "logical_bytes": int(logical),
+        "saved_bytes": int(logical) - int(physical),
+        "journal_pending": int(pending),
+    }
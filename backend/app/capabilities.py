@@ -8,7 +8,9 @@ including installed models, dependencies like PIL, and ComfyUI connectivity.
 from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
+import functools
 import importlib.util
+import time
 
 from .edit_models import (
     get_edit_models_status,
@@ -35,6 +37,25 @@ class CapabilitiesResponse(BaseModel):
     capabilities: Dict[str, CapabilityStatus]
 
 
+# get_capabilities() result, reused until a model is installed/removed, the
+# ComfyUI snapshot changes version, or the TTL lapses (catches files copied
+# into the models dir by hand).
+_CAPABILITIES_TTL_S = 30.0
+_capabilities_cache: Dict[str, Any] = {"value": None, "key": None, "at": 0.0}
+
+
+def invalidate_capabilities_cache(*, comfy: bool = True) -> None:
+    """Drop cached capability results; optionally refresh the ComfyUI snapshot too."""
+    _capabilities_cache["value"] = None
+    if comfy:
+        try:
+            from .comfy import invalidate_capabilities
+            invalidate_capabilities()
+        except Exception:
+            pass
+
+
+@functools.lru_cache(maxsize=None)
 def _check_module(module_name: str) -> tuple[bool, Optional[str]]:
     """Check if a Python module is available."""
     spec = importlib.util.find_spec(module_name)
@@ -43,6 +64,7 @@ def _check_module(module_name: str) -> tuple[bool, Optional[str]]:
     return True, None
 
 
+@functools.lru_cache(maxsize=None)
 def _check_pillow() -> tuple[bool, Optional[str]]:
     """Check if PIL/Pillow is available."""
     try:
@@ -52,6 +74,7 @@ def _check_pillow() -> tuple[bool, Optional[str]]:
         return False, "PIL/Pillow not installed"
 
 
+@functools.lru_cache(maxsize=None)
 def _check_torch_gpu() -> tuple[bool, Optional[str]]:
     """Check if PyTorch with GPU is available."""
     try:
@@ -116,7 +139,22 @@ async def get_capabilities():
 
     This allows the UI to disable unavailable features and show
     helpful error messages to users.
+
+    Results are cached (see ``invalidate_capabilities_cache``) so repeated
+    polling does not re-stat model files or re-probe optional modules.
     """
+    from .comfy import _capability_snapshot
+
+    snap = _capability_snapshot.peek()
+    key = snap.version if snap is not None else None
+    cached = _capabilities_cache["value"]
+    if (
+        cached is not None
+        and _capabilities_cache["key"] == key
+        and time.monotonic() - _capabilities_cache["at"] < _CAPABILITIES_TTL_S
+    ):
+        return cached
+
     capabilities: Dict[str, CapabilityStatus] = {}
 
     # Check dependencies
@@ -205,7 +243,23 @@ async def get_capabilities():
         model="SD Inpainting",
     )
 
-    return CapabilitiesResponse(capabilities=capabilities)
+    response = CapabilitiesResponse(capabilities=capabilities)
+    _capabilities_cache.update(value=response, key=key, at=time.monotonic())
+    return response
+
+
+@router.get("/v1/capabilities/comfy-snapshot")
+async def get_comfy_capability_snapshot():
+    """
+    Summary of the in-memory ComfyUI capability snapshot.
+
+    Reports node count, checkpoints, LoRAs, ControlNets, GPU/VRAM, the
+    snapshot version/fingerprint and its age. Served from memory; a stale
+    snapshot is refreshed in the background.
+    """
+    from .comfy import get_capability_snapshot_async
+
+    return (await get_capability_snapshot_async()).summary()
 
 
 @router.get("/v1/capabilities/{feature}")
@@ -281,6 +335,7 @@ _avatar_download_state: _Dict[str, Any] = {
     "results": [],
     "finished": False,
     "error": None,
+    "progress": {},
 }
 _avatar_download_lock = threading.Lock()
 
@@ -296,16 +351,50 @@ def _fmt_bytes(n: int) -> str:
     return f"{n / (1024 * 1024 * 1024):.2f} GB"
 
 
-def _download_one_model(model_id: str, model_name: str, url: str, dest_path, timeout: int = 600) -> dict:
+def _record_download_event(event) -> None:
+    """Fold a ModelDownloader progress event into the shared status dict."""
+    with _avatar_download_lock:
+        progress = _avatar_download_state.setdefault("progress", {})
+        progress[event.key] = {
+            "phase": event.kind,
+            "downloaded": event.downloaded,
+            "total": event.total,
+            "speed_bps": round(event.speed_bps, 1),
+            "connections": event.connections,
+            "resumed_from": event.resumed_from,
+            "error": event.error,
+        }
+        if event.kind == "start":
+            _avatar_download_state["current_model"] = event.key
+
+    if event.kind == "start":
+        _avatar_dl_logger.info(
+            f"  [{event.key}] START — {_fmt_bytes(event.total) if event.total else 'unknown size'}, "
+            f"{event.connections} connection(s)"
+            + (f", resuming at {_fmt_bytes(event.resumed_from)}" if event.resumed_from else "")
+        )
+    elif event.kind == "error":
+        _avatar_dl_logger.error(f"  [{event.key}] FAILED: {event.error}")
+
+
+def _download_one_model(
+    model_id: str,
+    model_name: str,
+    url: str,
+    dest_path,
+    sha256: str = "",
+    on_event=None,
+) -> dict:
     """
-    Download a single model with real-time progress logging.
+    Download a single model through the shared in-process downloader.
     Returns a result dict with status + details.
     """
-    import subprocess
+    import zipfile
     from pathlib import Path
 
+    from .model_downloader import DownloadError, get_default_downloader
+
     dest = Path(dest_path)
-    dest.parent.mkdir(parents=True, exist_ok=True)
 
     _avatar_dl_logger.info(
         "=" * 60 + "\n"
@@ -316,90 +405,49 @@ def _download_one_model(model_id: str, model_name: str, url: str, dest_path, tim
         + "=" * 60
     )
 
-    start = _time.time()
-
     try:
-        # Use wget with --progress=dot:mega so each dot = 1 MB received.
-        # Stream stderr line-by-line to the logger.
-        proc = subprocess.Popen(
-            ["wget", "-c", "--progress=dot:mega", "-O", str(dest), url],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+        res = get_default_downloader().download(
+            url, dest, key=model_id, sha256=sha256, on_event=on_event or _record_download_event,
         )
-
-        last_log = start
-        stderr_lines = []
-
-        # Read stderr in real-time (wget sends progress to stderr)
-        for line in iter(proc.stderr.readline, ""):
-            line = line.rstrip()
-            if not line:
-                continue
-            stderr_lines.append(line)
-
-            now = _time.time()
-            # Log progress lines at most every 3 seconds to avoid spam
-            if "%" in line or "saved" in line.lower() or "error" in line.lower() or "failed" in line.lower():
-                if now - last_log >= 3 or "100%" in line or "saved" in line.lower():
-                    _avatar_dl_logger.info(f"  [{model_id}] {line}")
-                    last_log = now
-            elif "resolving" in line.lower() or "connecting" in line.lower() or "http request" in line.lower():
-                _avatar_dl_logger.info(f"  [{model_id}] {line}")
-
-        proc.wait(timeout=timeout)
-        elapsed = _time.time() - start
-
-        if proc.returncode == 0 and dest.exists() and dest.stat().st_size > 0:
-            file_size = dest.stat().st_size
-            speed = file_size / elapsed if elapsed > 0 else 0
-            _avatar_dl_logger.info(
-                f"  [{model_id}] COMPLETE — {_fmt_bytes(file_size)} in {elapsed:.1f}s "
-                f"({_fmt_bytes(int(speed))}/s)"
-            )
-
-            # Special case: unzip AntelopeV2 archive
-            if model_id == "insightface-antelopev2" and dest.suffix == ".zip":
-                _avatar_dl_logger.info(f"  [{model_id}] Extracting ZIP archive...")
-                unzip = subprocess.run(
-                    ["unzip", "-qo", str(dest), "-d", str(dest.parent)],
-                    capture_output=True,
-                    text=True,
-                    timeout=120,
-                )
-                if unzip.returncode == 0:
-                    _avatar_dl_logger.info(f"  [{model_id}] ZIP extracted successfully")
-                else:
-                    _avatar_dl_logger.warning(
-                        f"  [{model_id}] ZIP extraction warning: {unzip.stderr[-200:] if unzip.stderr else 'unknown'}"
-                    )
-
-            return {"id": model_id, "name": model_name, "status": "installed", "size": file_size, "elapsed": round(elapsed, 1)}
-        else:
-            stderr_tail = "\n".join(stderr_lines[-5:]) if stderr_lines else "no output"
-            _avatar_dl_logger.error(
-                f"  [{model_id}] FAILED (exit code {proc.returncode}, {elapsed:.1f}s)\n"
-                f"  Last output:\n{stderr_tail}"
-            )
-            return {
-                "id": model_id, "name": model_name, "status": "failed",
-                "error": stderr_tail[-300:] if stderr_tail else "download failed",
-            }
-
-    except subprocess.TimeoutExpired:
-        proc.kill()
-        _avatar_dl_logger.error(f"  [{model_id}] TIMEOUT after {timeout}s")
-        return {"id": model_id, "name": model_name, "status": "timeout"}
-    except FileNotFoundError:
-        _avatar_dl_logger.error(f"  [{model_id}] wget not found — install wget to enable downloads")
-        return {"id": model_id, "name": model_name, "status": "error", "error": "wget not found"}
+    except DownloadError as e:
+        return {"id": model_id, "name": model_name, "status": "failed", "error": str(e)[-300:]}
     except Exception as e:
         _avatar_dl_logger.error(f"  [{model_id}] ERROR: {e}")
         return {"id": model_id, "name": model_name, "status": "error", "error": str(e)}
 
+    speed = (res.size - res.resumed_from) / res.elapsed if res.elapsed > 0 else 0
+    _avatar_dl_logger.info(
+        f"  [{model_id}] COMPLETE — {_fmt_bytes(res.size)} in {res.elapsed:.1f}s "
+        f"({_fmt_bytes(int(speed))}/s, sha256 {res.sha256[:12]}…"
+        f"{', verified' if sha256 else ''})"
+    )
+
+    # Special case: unzip AntelopeV2 archive
+    if model_id == "insightface-antelopev2" and dest.suffix == ".zip":
+        _avatar_dl_logger.info(f"  [{model_id}] Extracting ZIP archive...")
+        try:
+            with zipfile.ZipFile(dest) as zf:
+                zf.extractall(dest.parent)
+            _avatar_dl_logger.info(f"  [{model_id}] ZIP extracted successfully")
+        except (zipfile.BadZipFile, OSError) as e:
+            _avatar_dl_logger.warning(f"  [{model_id}] ZIP extraction warning: {e}")
+
+    return {
+        "id": model_id, "name": model_name, "status": "installed",
+        "size": res.size, "elapsed": res.elapsed, "sha256": res.sha256,
+    }
+
 
 def _run_download_batch(preset: str, target_ids: list, all_models: dict):
-    """Background thread: downloads models sequentially with full logging."""
+    """Background thread: downloads models concurrently with full logging.
+
+    Files are fetched in parallel through the shared ModelDownloader, which
+    bounds concurrency and bandwidth globally; results keep preset order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .model_downloader import get_default_downloader
+
     global _avatar_download_state
 
     _avatar_dl_logger.info(
@@ -410,36 +458,41 @@ def _run_download_batch(preset: str, target_ids: list, all_models: dict):
         + "#" * 60
     )
 
-    results = []
+    results: list = [None] * len(target_ids)
+    pending: list[tuple[int, Any]] = []
     for i, mid in enumerate(target_ids):
         m = all_models.get(mid)
 
-        with _avatar_download_lock:
-            _avatar_download_state["current_model"] = mid
-            _avatar_download_state["current_index"] = i + 1
-
         if not m:
             _avatar_dl_logger.warning(f"  [{mid}] SKIP — not registered in model registry")
-            results.append({"id": mid, "status": "not_registered"})
-            continue
-
-        if m.installed:
+            results[i] = {"id": mid, "status": "not_registered"}
+        elif m.installed:
             _avatar_dl_logger.info(f"  [{mid}] SKIP — already installed at {m.path}")
-            results.append({"id": mid, "name": m.name, "status": "already_installed"})
-            continue
-
-        if not m.download_url:
+            results[i] = {"id": mid, "name": m.name, "status": "already_installed"}
+        elif not m.download_url:
             _avatar_dl_logger.warning(f"  [{mid}] SKIP — no download URL configured")
-            results.append({"id": mid, "name": m.name, "status": "no_download_url"})
-            continue
+            results[i] = {"id": mid, "name": m.name, "status": "no_download_url"}
+        else:
+            pending.append((i, m))
 
-        _avatar_dl_logger.info(f"\n  >>> Model {i + 1}/{len(target_ids)}: {m.name}")
+    def _publish() -> None:
+        with _avatar_download_lock:
+            done = [r for r in results if r is not None]
+            _avatar_download_state["results"] = done
+            _avatar_download_state["current_index"] = len(done)
 
-        result = _download_one_model(mid, m.name, m.download_url, m.path)
-        results.append(result)
+    _publish()
 
-        with _avatar_download_lock:
-            _avatar_download_state["results"] = list(results)
+    def _one(item: tuple[int, Any]) -> None:
+        i, m = item
+        _avatar_dl_logger.info(f"\n  >>> Model {i + 1}/{len(target_ids)}: {m.name}")
+        results[i] = _download_one_model(m.id, m.name, m.download_url, m.path, sha256=m.sha256)
+        _publish()
+
+    if pending:
+        workers = min(len(pending), get_default_downloader().max_parallel_files)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="avatar-dl") as pool:
+            list(pool.map(_one, pending))
 
     # Summary
     installed = sum(1 for r in results if r.get("status") in ("installed", "already_installed"))
@@ -463,6 +516,8 @@ def _run_download_batch(preset: str, target_ids: list, all_models: dict):
     # The availability system checks for these markers via pack_installed().
     if installed > 0:
         _write_pack_markers(preset, target_ids, results)
+    if new_count > 0:
+        invalidate_capabilities_cache()
 
     with _avatar_download_lock:
         _avatar_download_state["results"] = results
@@ -596,6 +651,7 @@ async def download_avatar_models(preset: str = "basic"):
             "results": [],
             "finished": False,
             "error": None,
+            "progress": {},
         }
 
     # Launch in background thread
@@ -664,6 +720,7 @@ async def install_single_avatar_model(model_id: str):
             "results": [],
             "finished": False,
             "error": None,
+            "progress": {},
         }
 
     thread = threading.Thread(
@@ -695,11 +752,14 @@ async def get_avatar_download_status():
       current_index — 1-based index of current model
       total_models  — total models in this preset
       results       — per-model results so far
+      progress      — per-model live progress (phase, downloaded, total,
+                      speed_bps, connections, resumed_from, error)
       finished      — True when all models processed
       elapsed       — seconds since download started
     """
     with _avatar_download_lock:
         state = dict(_avatar_download_state)
+        state["progress"] = {k: dict(v) for k, v in state.get("progress", {}).items()}
 
     # Add elapsed time
     if state.get("started_at"):
@@ -713,6 +773,13 @@ async def get_avatar_download_status():
     state["failed_count"] = sum(1 for r in results if r.get("status") not in ("installed", "already_installed", None))
     state["downloaded_bytes"] = sum(r.get("size", 0) for r in results if r.get("size"))
 
+    # Live byte counts across every file currently in flight
+    active = [p for p in state["progress"].values() if p["phase"] in ("start", "progress", "verifying")]
+    state["active_models"] = [k for k, p in state["progress"].items() if p in active]
+    state["bytes_in_flight"] = sum(p["downloaded"] for p in active)
+    state["bytes_total"] = sum(p["total"] for p in state["progress"].values())
+    state["speed_bps"] = round(sum(p["speed_bps"] for p in active), 1)
+
     return state
 
 
@@ -764,6 +831,7 @@ async def delete_avatar_model(model_id: str):
         _avatar_dl_logger.info(
             f"Uninstalled {m.name} — freed {_fmt_bytes(freed_bytes)}"
         )
+        invalidate_capabilities_cache()
 
         return {
             "ok": True,
@@ -824,6 +892,7 @@ async def set_edit_model_preference(mode: str, model_id: str):
     success, error = set_model_preference(mode, model_id)
 
     if success:
+        invalidate_capabilities_cache(comfy=False)
         return {"success": True, "mode": mode, "model": model_id}
     else:
         return {"success": False, "error": error}
@@ -832,7 +901,7 @@ async def set_edit_model_preference(mode: str, model_id: str):
 @router.post("/v1/capabilities/refresh")
 async def refresh_capabilities():
     """
-    Invalidate the ComfyUI object_info cache and re-probe node availability.
+    Invalidate the ComfyUI capability snapshot and re-probe node availability.
 
     Call this after installing/removing custom nodes and restarting ComfyUI
     so the backend immediately sees the new node classes (instead of waiting
@@ -840,11 +909,11 @@ async def refresh_capabilities():
 
     Returns the refreshed ``enhance_faces`` status for convenience.
     """
-    from .comfy import _object_info_cache
+    from .comfy import get_capability_snapshot_async
 
-    _object_info_cache.invalidate()
+    invalidate_capabilities_cache(comfy=False)
     # Force a fresh fetch right now
-    _object_info_cache.get_available_nodes(force=True)
+    await get_capability_snapshot_async(force=True)
 
     # Return the refreshed face-restore status
     from .face_restore import face_restore_ready
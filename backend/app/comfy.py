@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import json
 import os
 import re
@@ -13,27 +15,65 @@ from urllib.parse import urlparse
 import httpx
 
 from .config import COMFY_BASE_URL, COMFY_POLL_INTERVAL_S, COMFY_POLL_MAX_S, UPLOAD_DIR
-from .comfy_utils import ComfyObjectInfoCache, remap_workflow_nodes, find_missing_class_types, NODE_ALIAS_CANDIDATES
+from .comfy_utils import remap_workflow_nodes, find_missing_class_types, NODE_ALIAS_CANDIDATES
+from .comfy_utils.capability_snapshot import CapabilitySnapshot, CapabilitySnapshotStore
+from .comfy_utils.workflow_template import (
+    CompiledWorkflow,
+    NodeValidationCache,
+    WorkflowTemplateCache,
+    strip_meta_keys,
+)
 from .model_config import get_architecture
 
 # ---------------------------------------------------------------------------
-# ComfyUI node availability cache (populated from /object_info)
+# ComfyUI capability snapshot (nodes, checkpoints, LoRAs, controlnets, GPU)
 # ---------------------------------------------------------------------------
-_object_info_cache = ComfyObjectInfoCache(COMFY_BASE_URL, ttl_seconds=300.0)
+# Served stale-while-revalidate from memory so pre-flight checks never wait on
+# the multi-MB /object_info response; see comfy_utils/capability_snapshot.
+_capability_snapshot = CapabilitySnapshotStore(
+    COMFY_BASE_URL, ttl_seconds=float(os.getenv("COMFY_CAPABILITY_TTL_S", "300")),
+)
+
+# Compiled workflow templates (mtime-invalidated) and memoised node checks
+_workflow_templates = WorkflowTemplateCache()
+_node_validation_cache = NodeValidationCache()
+
+
+def get_capability_snapshot(*, force: bool = False) -> CapabilitySnapshot:
+    """Return the current ComfyUI capability snapshot (in-memory, no round-trip)."""
+    return _capability_snapshot.get(force=force)
+
+
+async def get_capability_snapshot_async(*, force: bool = False) -> CapabilitySnapshot:
+    """Like :func:`get_capability_snapshot`, for async callers: a fetch (the
+    first one, or a forced one) runs in a worker thread, off the event loop."""
+    snap = _capability_snapshot.peek()
+    if snap is not None and not force:
+        return _capability_snapshot.get()
+    return await asyncio.to_thread(_capability_snapshot.get, force=force)
+
+
+def invalidate_capabilities(*, background: bool = True) -> None:
+    """Mark the capability snapshot stale; call after models/nodes are installed or removed."""
+    _capability_snapshot.invalidate(background=background)
+
+
+def start_capability_refresh(interval_s: float | None = None) -> None:
+    """Begin periodic background refresh of the capability snapshot."""
+    _capability_snapshot.start(interval_s)
 
 
 def _fetch_object_info(force: bool = False) -> Dict[str, Any]:
     """
-    Fetch ComfyUI /object_info (all registered node classes) with caching.
+    Return ComfyUI /object_info (all registered node classes) from the snapshot.
     Returns a dict mapping node class names to their definitions.
     """
-    raw = _object_info_cache.get_raw(force=force)
-    return raw or {}
+    return get_capability_snapshot(force=force).object_info or {}
 
 
 def get_available_node_names(*, force: bool = False) -> list[str]:
     """Return list of node class names registered in ComfyUI."""
-    return _object_info_cache.get_available_nodes(force=force)
+    return list(get_capability_snapshot(force=force).nodes)
 
 
 def check_nodes_available(node_classes: list[str]) -> tuple[bool, list[str]]:
@@ -114,15 +154,8 @@ def get_available_controlnets() -> list[str]:
     Queries ``/object_info`` and extracts the valid values from the
     ``ControlNetLoader`` node's ``control_net_name`` input.
     """
-    info = _fetch_object_info()
-    cn_loader = info.get("ControlNetLoader", {})
-    input_spec = cn_loader.get("input", {})
-    # ComfyUI nests required inputs: {"required": {"control_net_name": [["a.safetensors", "b.safetensors"]]}}
-    required = input_spec.get("required", {})
-    cn_input = required.get("control_net_name", [])
-    if cn_input and isinstance(cn_input, list) and isinstance(cn_input[0], list):
-        return list(cn_input[0])
-    return []
+    # Parsed once per snapshot from ControlNetLoader.control_net_name options
+    return list(get_capability_snapshot().controlnets)
 
 
 def openpose_available() -> bool:
@@ -225,13 +258,28 @@ def validate_workflow_nodes(workflow_name: str, prompt_graph: Dict[str, Any]) ->
         # Can't reach ComfyUI — let the workflow attempt proceed and fail naturally
         return
 
-    # Step 1: try alias remapping
-    replacements = remap_workflow_nodes(prompt_graph, available)
+    # Steps 1+2 depend only on (class types used, nodes registered), so the
+    # outcome is memoised and replayed onto the graph on repeat runs.
+    class_types = frozenset(
+        n["class_type"] for n in prompt_graph.values() if isinstance(n, dict) and n.get("class_type")
+    )
+    cache_key = NodeValidationCache.key(class_types, available)
+    cached = _node_validation_cache.get(cache_key)
+    if cached is not None:
+        replacements, missing = cached
+        if replacements:
+            for node in prompt_graph.values():
+                if isinstance(node, dict) and node.get("class_type") in replacements:
+                    node["class_type"] = replacements[node["class_type"]]
+    else:
+        # Step 1: try alias remapping
+        replacements = remap_workflow_nodes(prompt_graph, available)
+        # Step 2: check for anything still missing after remapping
+        missing = find_missing_class_types(prompt_graph, available)
+        _node_validation_cache.put(cache_key, replacements, missing)
+
     if replacements:
         print(f"[COMFY] Node alias remap applied for '{workflow_name}': {replacements}")
-
-    # Step 2: check for anything still missing after remapping
-    missing = find_missing_class_types(prompt_graph, available)
     if not missing:
         return
 
@@ -554,14 +602,10 @@ def _deep_replace(obj: Any, mapping: Dict[str, Any]) -> Any:
 
 def _strip_meta_keys(obj: Any) -> Any:
     """Recursively strip _meta and other underscore-prefixed keys from workflow."""
-    if isinstance(obj, dict):
-        return {k: _strip_meta_keys(v) for k, v in obj.items() if not k.startswith("_")}
-    if isinstance(obj, list):
-        return [_strip_meta_keys(x) for x in obj]
-    return obj
+    return strip_meta_keys(obj)
 
 
-def _load_workflow(name: str) -> Dict[str, Any]:
+def _resolve_workflow_path(name: str) -> Path:
     # Search order:
     #   1. WORKFLOWS_DIR / <name>.json          (flat layout — default)
     #   2. WORKFLOWS_DIR / avatar / <name>.json (persona-live recipes live here)
@@ -587,10 +631,21 @@ def _load_workflow(name: str) -> Dict[str, Any]:
             f"{[str(c) for c in candidates]}. "
             f"Set COMFY_WORKFLOWS_DIR or mount workflows into {WORKFLOWS_DIR}."
         )
-    workflow = json.loads(p.read_text(encoding="utf-8"))
-    # Strip metadata keys (like _meta) that ComfyUI doesn't understand
-    # These are used for documentation in our workflow files
-    return _strip_meta_keys(workflow)
+    return p
+
+
+def _get_compiled_workflow(name: str) -> CompiledWorkflow:
+    """Return the compiled template for *name* (parsed once per file version).
+
+    Metadata keys (like _meta) that ComfyUI doesn't understand are stripped
+    at compile time; they are used for documentation in our workflow files.
+    """
+    return _workflow_templates.get(name, _resolve_workflow_path(name))
+
+
+def _load_workflow(name: str) -> Dict[str, Any]:
+    """Return a private, fully mutable copy of the workflow graph."""
+    return copy.deepcopy(_get_compiled_workflow(name).graph)
 
 
 def _validate_prompt_graph(prompt_graph: Dict[str, Any], *, workflow_name: str) -> None:
@@ -1053,14 +1108,16 @@ def run_workflow(name: str, variables: Dict[str, Any]) -> Dict[str, Any]:
     if processed_vars != variables:
         print(f"[COMFY] Processed variables: {processed_vars}")
 
-    workflow = _load_workflow(name)
+    # Targeted copy-on-write substitution from the cached template: only the
+    # paths that hold {{var}} placeholders are rebuilt.
+    template = _get_compiled_workflow(name)
+    prompt_graph = template.instantiate(processed_vars)
 
-    # Inject LoRA loader nodes (before variable substitution so refs are stable)
+    # Inject LoRA loader nodes (injected nodes carry no placeholders, and the
+    # instantiated node/inputs dicts are private copies, so rewiring is safe)
     if loras:
         ckpt_name = processed_vars.get("ckpt_name", "")
-        workflow = _inject_lora_loaders(workflow, loras, ckpt_name=ckpt_name)
-
-    prompt_graph = _deep_replace(workflow, processed_vars)
+        prompt_graph = _inject_lora_loaders(prompt_graph, loras, ckpt_name=ckpt_name)
 
     # ── Pre-flight node availability check ───────────────────────
     # Query ComfyUI /object_info to verify all required node classes
@@ -1072,9 +1129,8 @@ def run_workflow(name: str, variables: Dict[str, Any]) -> Dict[str, Any]:
     # Scan for any remaining {{var}} placeholders that weren't substituted.
     # These would be sent as literal strings to ComfyUI and cause validation
     # failures (e.g. "{{ckpt_name}}" is not a valid checkpoint filename).
-    _unresolved_re = re.compile(r"\{\{(\w+)\}\}")
-    _graph_str = json.dumps(prompt_graph)
-    _unresolved = set(_unresolved_re.findall(_graph_str))
+    # The compiled template already knows every placeholder it contains.
+    _unresolved = template.unresolved(processed_vars)
     if _unresolved:
         print(f"[COMFY] WARNING: Unresolved template variables in workflow '{name}': {_unresolved}")
         print(f"[COMFY] These variables were not provided and will be sent as literal '{{{{...}}}}' strings.")
@@ -1087,7 +1143,11 @@ def run_workflow(name: str, variables: Dict[str, Any]) -> Dict[str, Any]:
             print(f"[COMFY] Checkpoint in workflow: {ckpt}")
             break
 
-    _validate_prompt_graph(prompt_graph, workflow_name=name)
+    # Structural checks only depend on the template unless LoRA nodes were added
+    if loras or not template.structure_checked:
+        _validate_prompt_graph(prompt_graph, workflow_name=name)
+        if not loras:
+            template.structure_checked = True
 
     timeout = httpx.Timeout(60.0, connect=60.0)
     with httpx.Client(timeout=timeout) as client:
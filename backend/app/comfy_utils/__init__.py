@@ -1,15 +1,20 @@
-"""ComfyUI utility modules — node aliasing, object_info caching, preflight checks."""
+"""ComfyUI utility modules — node aliasing, capability snapshot, preflight checks, workflow templates."""
 
 from .node_aliases import (
     NODE_ALIAS_CANDIDATES,
     remap_workflow_nodes,
     find_missing_class_types,
 )
-from .object_info_cache import ComfyObjectInfoCache
+from .capability_snapshot import CapabilitySnapshot, CapabilitySnapshotStore
+from .workflow_template import CompiledWorkflow, NodeValidationCache, WorkflowTemplateCache
 
 __all__ = [
     "NODE_ALIAS_CANDIDATES",
     "remap_workflow_nodes",
     "find_missing_class_types",
-    "ComfyObjectInfoCache",
+    "CapabilitySnapshot",
+    "CapabilitySnapshotStore",
+    "CompiledWorkflow",
+    "NodeValidationCache",
+    "WorkflowTemplateCache",
 ]
@@ -0,0 +1,256 @@
+"""
+Background-refreshed snapshot of what ComfyUI can run.
+
+``/object_info`` is a multi-megabyte response; fetching (or even TTL
+re-fetching) it on the request path makes every generation pay for a
+large HTTP round-trip.  :class:`CapabilitySnapshotStore` keeps one
+immutable :class:`CapabilitySnapshot` in memory and serves it with
+stale-while-revalidate semantics:
+
+- ``get()`` always returns the current snapshot immediately; if it is
+  older than ``ttl_seconds`` a single background refresh is kicked off.
+- Only the very first call (no snapshot yet) blocks on a fetch.
+- Refreshes are change-detected ETag-style: the server ``ETag`` (when
+  ComfyUI sends one) is replayed as ``If-None-Match``, otherwise the body
+  is hashed.  An unchanged payload keeps the same ``version``, so caches
+  keyed on it stay warm.
+- ``invalidate()`` marks the snapshot stale and refreshes in the
+  background; call it after models or custom nodes are installed/removed.
+
+The snapshot also records checkpoint / LoRA / ControlNet names (parsed
+from the loader nodes' option lists) and GPU/VRAM from ``/system_stats``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+import httpx
+
+_logger = logging.getLogger("homepilot.comfy.snapshot")
+
+
+def _loader_options(raw: Dict[str, Any], node: str, field_name: str) -> Tuple[str, ...]:
+    """Extract the option list of a loader node input (e.g. CheckpointLoaderSimple.ckpt_name)."""
+    spec = raw.get(node, {}).get("input", {}).get("required", {}).get(field_name, [])
+    if spec and isinstance(spec, list) and isinstance(spec[0], list):
+        return tuple(str(x) for x in spec[0])
+    return ()
+
+
+@dataclass(frozen=True)
+class CapabilitySnapshot:
+    """Immutable view of ComfyUI capabilities at ``fetched_at``."""
+
+    version: int = 0
+    fingerprint: str = ""
+    fetched_at: float = 0.0
+    reachable: bool = False
+    nodes: Tuple[str, ...] = ()
+    node_set: FrozenSet[str] = frozenset()
+    checkpoints: Tuple[str, ...] = ()
+    loras: Tuple[str, ...] = ()
+    controlnets: Tuple[str, ...] = ()
+    gpu: Dict[str, Any] = field(default_factory=dict)
+    object_info: Dict[str, Any] = field(default_factory=dict, repr=False)
+    error: str = ""
+
+    def has_node(self, name: str) -> bool:
+        return name in self.node_set
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "fetched_at": self.fetched_at,
+            "age_s": round(time.time() - self.fetched_at, 1) if self.fetched_at else None,
+            "reachable": self.reachable,
+            "error": self.error,
+            "node_count": len(self.nodes),
+            "checkpoints": list(self.checkpoints),
+            "loras": list(self.loras),
+            "controlnets": list(self.controlnets),
+            "gpu": dict(self.gpu),
+        }
+
+
+class CapabilitySnapshotStore:
+    """Holds the current :class:`CapabilitySnapshot` and refreshes it off-path."""
+
+    def __init__(
+        self,
+        base_url: str,
+        ttl_seconds: float = 300.0,
+        timeout_s: float = 30.0,
+        unreachable_retry_s: float = 15.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.ttl_seconds = ttl_seconds
+        self.unreachable_retry_s = unreachable_retry_s
+        self.timeout_s = timeout_s
+        self._snapshot: Optional[CapabilitySnapshot] = None
+        self._etag: str = ""
+        self._stale = False
+        self._lock = threading.Lock()
+        self._refreshing = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, *, force: bool = False) -> CapabilitySnapshot:
+        """Return the current snapshot (never blocks once one exists, unless *force*)."""
+        snap = self._snapshot
+        if force:
+            return self.refresh()
+        if snap is None:
+            # Wait for an in-flight first fetch (e.g. the startup refresher)
+            # instead of issuing a second one.
+            with self._lock:
+                return self._snapshot or self._refresh_locked()
+        ttl = self.ttl_seconds if snap.reachable else self.unreachable_retry_s
+        if self._stale or (time.time() - snap.fetched_at) >= ttl:
+            self._refresh_async()
+        return snap
+
+    def peek(self) -> Optional[CapabilitySnapshot]:
+        """Return the snapshot without triggering any fetch."""
+        return self._snapshot
+
+    def invalidate(self, *, background: bool = True) -> None:
+        """Mark the snapshot stale (e.g. after a model install/removal)."""
+        self._stale = True
+        if background and self._snapshot is not None:
+            self._refresh_async()
+
+    def refresh(self) -> CapabilitySnapshot:
+        """Fetch synchronously and return the (possibly unchanged) snapshot."""
+        with self._lock:
+            return self._refresh_locked()
+
+    def start(self, interval_s: Optional[float] = None) -> None:
+        """Start a daemon thread that refreshes every *interval_s* (default: TTL)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        interval = interval_s or self.ttl_seconds
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.refresh()
+                except Exception as exc:  # pragma: no cover - defensive
+                    _logger.debug("capability refresh failed: %s", exc)
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=_loop, daemon=True, name="comfy-capability-refresh")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _refresh_async(self) -> None:
+        if self._refreshing.is_set():
+            return
+        self._refreshing.set()
+
+        def _run() -> None:
+            try:
+                self.refresh()
+            finally:
+                self._refreshing.clear()
+
+        threading.Thread(target=_run, daemon=True, name="comfy-capability-revalidate").start()
+
+    def _refresh_locked(self) -> CapabilitySnapshot:
+        prev = self._snapshot
+        now = time.time()
+        headers = {"If-None-Match": self._etag} if self._etag and prev and prev.reachable else {}
+        try:
+            with httpx.Client(timeout=httpx.Timeout(self.timeout_s, connect=10.0)) as client:
+                r = client.get(f"{self.base_url}/object_info", headers=headers)
+                gpu = self._fetch_gpu(client)
+                if r.status_code == 304 and prev is not None:
+                    return self._touch(prev, now, gpu)
+                r.raise_for_status()
+                body = r.content
+        except Exception as exc:
+            # Can't reach ComfyUI — mark unreachable, keep the last good
+            # capability data (if any) so callers can still inspect it
+            _logger.debug("ComfyUI capability probe failed: %s", exc)
+            self._stale = False
+            error = f"{type(exc).__name__}: {exc}"
+            if prev is None:
+                self._snapshot = CapabilitySnapshot(fetched_at=now, error=error)
+            else:
+                self._snapshot = CapabilitySnapshot(
+                    **{**prev.__dict__, "fetched_at": now, "reachable": False, "error": error}
+                )
+            return self._snapshot
+
+        self._etag = r.headers.get("ETag", "")
+        fingerprint = hashlib.sha256(body).hexdigest()[:16]
+        if prev is not None and prev.fingerprint == fingerprint:
+            return self._touch(prev, now, gpu)
+
+        try:
+            raw = json.loads(body)
+        except ValueError:
+            raw = {}
+        if not isinstance(raw, dict):
+            raw = {}
+        snap = CapabilitySnapshot(
+            version=(prev.version if prev else 0) + 1,
+            fingerprint=fingerprint,
+            fetched_at=now,
+            reachable=True,
+            nodes=tuple(raw.keys()),
+            node_set=frozenset(raw.keys()),
+            checkpoints=_loader_options(raw, "CheckpointLoaderSimple", "ckpt_name"),
+            loras=_loader_options(raw, "LoraLoader", "lora_name"),
+            controlnets=_loader_options(raw, "ControlNetLoader", "control_net_name"),
+            gpu=gpu,
+            object_info=raw,
+        )
+        self._snapshot = snap
+        self._stale = False
+        _logger.info("ComfyUI capability snapshot v%d (%d nodes)", snap.version, len(snap.nodes))
+        return snap
+
+    def _touch(self, prev: CapabilitySnapshot, now: float, gpu: Dict[str, Any]) -> CapabilitySnapshot:
+        """Unchanged payload: keep version/fingerprint, refresh timestamp + GPU stats."""
+        self._snapshot = CapabilitySnapshot(
+            **{**prev.__dict__, "fetched_at": now, "gpu": gpu or prev.gpu, "reachable": True, "error": ""}
+        )
+        self._stale = False
+        return self._snapshot
+
+    def _fetch_gpu(self, client: httpx.Client) -> Dict[str, Any]:
+        try:
+            r = client.get(f"{self.base_url}/system_stats")
+            r.raise_for_status()
+            devices = r.json().get("devices") or []
+        except Exception:
+            return {}
+        if not devices:
+            return {}
+        dev = devices[0]
+        return {
+            "name": dev.get("name", ""),
+            "type": dev.get("type", ""),
+            "vram_total": dev.get("vram_total", 0),
+            "vram_free": dev.get("vram_free", 0),
+            "device_count": len(devices),
+        }
@@ -0,0 +1,207 @@
+"""
+Precompiled ComfyUI workflow templates.
+
+``run_workflow`` used to re-read and re-parse the workflow JSON on every
+call, walk the whole graph recursively to substitute ``{{var}}``
+placeholders, and then ``json.dumps`` the result just to regex-search for
+leftovers.  A :class:`CompiledWorkflow` does that work once per file
+version (invalidated on mtime/size change) and records a *substitution
+plan*: the exact paths inside the graph that hold a placeholder string.
+
+Instantiation is then a targeted copy-on-write:
+
+- every node dict and its ``inputs`` dict are shallow-copied, so callers
+  may assign ``node["class_type"]`` or ``inputs[key]`` (alias remapping,
+  LoRA rewiring) without touching the cached template;
+- containers along a placeholder path are copied and the leaf replaced;
+- everything else (lists, nested dicts, scalars) is shared with the
+  template and must not be mutated in place.
+
+Substitution semantics are identical to ``comfy._deep_replace``.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+_PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+
+PathKey = Tuple[Any, ...]
+
+
+def strip_meta_keys(obj: Any) -> Any:
+    """Recursively strip _meta and other underscore-prefixed keys from workflow."""
+    if isinstance(obj, dict):
+        return {k: strip_meta_keys(v) for k, v in obj.items() if not k.startswith("_")}
+    if isinstance(obj, list):
+        return [strip_meta_keys(x) for x in obj]
+    return obj
+
+
+def substitute_string(template: str, mapping: Dict[str, Any]) -> Any:
+    """Replace placeholders in one string (same rules as ``comfy._deep_replace``).
+
+    - A string that is exactly ``{{key}}`` returns the raw value (type preserved).
+    - Embedded placeholders are replaced with ``str(value)``.
+    - If anything was replaced and the result parses as a number, it is converted.
+    """
+    stripped = template.strip()
+    for k, v in mapping.items():
+        if stripped == f"{{{{{k}}}}}":
+            return v
+
+    out = template
+    for k, v in mapping.items():
+        out = out.replace(f"{{{{{k}}}}}", str(v))
+
+    if out != template:
+        try:
+            if "." in out:
+                return float(out)
+            return int(out)
+        except ValueError:
+            pass
+    return out
+
+
+def _collect_slots(obj: Any, path: PathKey, slots: List[Tuple[PathKey, str]]) -> None:
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            _collect_slots(v, path + (k,), slots)
+    elif isinstance(obj, list):
+        for i, v in enumerate(obj):
+            _collect_slots(v, path + (i,), slots)
+    elif isinstance(obj, str) and "{{" in obj:
+        slots.append((path, obj))
+
+
+class CompiledWorkflow:
+    """A parsed workflow plus its substitution plan. Treat as immutable."""
+
+    __slots__ = ("name", "path", "stamp", "graph", "slots", "variables",
+                 "class_types", "structure_checked")
+
+    def __init__(self, name: str, path: Path, stamp: Tuple[int, int], graph: Dict[str, Any]):
+        self.name = name
+        self.path = path
+        self.stamp = stamp
+        self.graph = graph
+        slots: List[Tuple[PathKey, str]] = []
+        _collect_slots(graph, (), slots)
+        self.slots: Tuple[Tuple[PathKey, str], ...] = tuple(slots)
+        self.variables: FrozenSet[str] = frozenset(
+            v for _, s in slots for v in _PLACEHOLDER_RE.findall(s)
+        )
+        self.class_types: FrozenSet[str] = frozenset(
+            n["class_type"] for n in graph.values() if isinstance(n, dict) and n.get("class_type")
+        )
+        # Set by comfy.run_workflow once _validate_prompt_graph has passed
+        self.structure_checked = False
+
+    def unresolved(self, mapping: Dict[str, Any]) -> Set[str]:
+        """Placeholder names the template uses that *mapping* does not provide."""
+        return {v for v in self.variables if v not in mapping}
+
+    def instantiate(self, mapping: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a new graph with placeholders substituted (copy-on-write)."""
+        out: Dict[str, Any] = {}
+        copied: Set[int] = set()
+        for node_id, node in self.graph.items():
+            if isinstance(node, dict):
+                node = dict(node)
+                inputs = node.get("inputs")
+                if isinstance(inputs, dict):
+                    node["inputs"] = dict(inputs)
+                    copied.add(id(node["inputs"]))
+                copied.add(id(node))
+            out[node_id] = node
+        copied.add(id(out))
+
+        for path, template in self.slots:
+            value = substitute_string(template, mapping)
+            if isinstance(value, str) and value == template:
+                continue
+            parent = out
+            for key in path[:-1]:
+                child = parent[key]
+                if id(child) not in copied:
+                    child = dict(child) if isinstance(child, dict) else list(child)
+                    parent[key] = child
+                    copied.add(id(child))
+                parent = child
+            parent[path[-1]] = value
+        return out
+
+
+class WorkflowTemplateCache:
+    """Process-wide cache of :class:`CompiledWorkflow` keyed by file path.
+
+    Entries are revalidated with a single ``stat`` per lookup; a changed
+    mtime or size recompiles the template.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, CompiledWorkflow] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, path: Path) -> CompiledWorkflow:
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        key = str(path)
+        entry = self._entries.get(key)
+        if entry is not None and entry.stamp == stamp:
+            self.hits += 1
+            return entry
+        graph = strip_meta_keys(json.loads(path.read_text(encoding="utf-8")))
+        entry = CompiledWorkflow(name, path, stamp, graph)
+        with self._lock:
+            self._entries[key] = entry
+            self.misses += 1
+        return entry
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(path), None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class NodeValidationCache:
+    """Memoises alias-remap + missing-node results per (class-type set, node set).
+
+    The outcome of ``remap_workflow_nodes``/``find_missing_class_types`` only
+    depends on which class types a graph uses and which nodes ComfyUI has
+    registered, so repeated runs of the same workflow skip the scan.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[FrozenSet[str], int], Tuple[Dict[str, str], Tuple[str, ...]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(class_types: FrozenSet[str], available: List[str]) -> Tuple[FrozenSet[str], int]:
+        return class_types, hash(tuple(available))
+
+    def get(self, key) -> Optional[Tuple[Dict[str, str], Tuple[str, ...]]]:
+        return self._entries.get(key)
+
+    def put(self, key, replacements: Dict[str, str], missing: Tuple[str, ...]) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[key] = (dict(replacements), tuple(missing))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -22,9 +22,10 @@ import uuid
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Cookie, Header, HTTPException, Query, UploadFile, File
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, Cookie, Header, HTTPException, Query, Request, UploadFile, File
+from fastapi.responses import JSONResponse
 
+from . import blob_store, image_derivatives
 from .config import UPLOAD_DIR, MAX_UPLOAD_MB
 from .storage import _get_db_path
 
@@ -121,6 +122,37 @@ def _resolve_user(
     return None
 
 
+def _write_media(
+    data: bytes,
+    abs_path: Path,
+    mime: str = "",
+    origin: str = "",
+    user_id: str = "",
+    project_id: str = "",
+) -> Dict[str, Any]:
+    """
+    Write bytes to abs_path through the content-addressed blob store
+    (identical payloads share one blob). Falls back to a plain write if the
+    blob layer fails, so uploads never break on it.
+    """
+    try:
+        return blob_store.store_bytes(
+            data, abs_path, mime=mime, origin=origin,
+            user_id=user_id, project_id=project_id,
+        )
+    except Exception as e:
+        print(f"[BLOB] store failed for {abs_path.name}, writing directly: {e}")
+        abs_path.write_bytes(data)
+        return {"sha256": blob_store.sha256_bytes(data), "deduped": False, "method": "direct"}
+
+
+def _release_media(rel_path: str) -> None:
+    try:
+        blob_store.release(rel_path)
+    except Exception as e:
+        print(f"[BLOB] release failed for {rel_path}: {e}")
+
+
 # ---------------------------------------------------------------------------
 # Asset CRUD
 # ---------------------------------------------------------------------------
@@ -199,6 +231,7 @@ def delete_asset_and_file(asset_id: str) -> bool:
                     pass
         except Exception as e:
             print(f"[CLEANUP] Failed to delete file {rel_path}: {e}")
+        _release_media(rel_path)
 
     # Delete the DB record
     cur.execute("DELETE FROM file_assets WHERE id = ?", (asset_id,))
@@ -228,7 +261,10 @@ def save_generated_image_as_asset(
 
     fname = f"{uuid.uuid4().hex}.{ext}"
     abs_path = folder / fname
-    abs_path.write_bytes(image_bytes)
+    blob = _write_media(
+        image_bytes, abs_path, mime=mime or "image/png", origin="generated",
+        user_id=user_id, project_id=project_id,
+    )
 
     rel_path = str(abs_path.relative_to(_upload_root()))
 
@@ -243,7 +279,12 @@ def save_generated_image_as_asset(
         conversation_id=conversation_id,
     )
 
-    return {"asset_id": asset_id, "url": f"/files/{asset_id}", "mime": mime or "image/png"}
+    return {
+        "asset_id": asset_id,
+        "url": f"/files/{asset_id}",
+        "mime": mime or "image/png",
+        "sha256": blob["sha256"],
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -323,6 +364,7 @@ async def persist_chat_images(
                     size_bytes=len(image_bytes),
                     origin="comfy",
                     source_hint=url,
+                    sha256=result.get("sha256", ""),
                     project_id=project_id,
                     user_id=user_id,
                 )
@@ -374,6 +416,7 @@ def delete_conversation_media(conversation_id: str) -> int:
                     pass
         except Exception as e:
             print(f"[CLEANUP] Failed to delete file {rel_path}: {e}")
+        _release_media(rel_path)
 
     # Delete all asset records for this conversation
     if rows:
@@ -479,11 +522,14 @@ async def upload_file(
     folder = _ensure_user_dir(user["id"], kind, project_id=project_id)
     fname = f"{uuid.uuid4().hex}.{ext}"
     abs_path = folder / fname
-    abs_path.write_bytes(data)
+    mime = content_type or mimetypes.guess_type(str(abs_path))[0] or "application/octet-stream"
+    blob = _write_media(
+        data, abs_path, mime=mime, origin="upload",
+        user_id=user["id"], project_id=project_id,
+    )
 
     # Store metadata
     rel_path = str(abs_path.relative_to(_upload_root()))
-    mime = content_type or mimetypes.guess_type(str(abs_path))[0] or "application/octet-stream"
     asset_id = insert_asset(
         user_id=user["id"],
         kind=kind,
@@ -495,7 +541,14 @@ async def upload_file(
         conversation_id=conversation_id,
     )
 
-    return {"ok": True, "asset_id": asset_id, "url": f"/files/{asset_id}", "mime": mime}
+    return {
+        "ok": True,
+        "asset_id": asset_id,
+        "url": f"/files/{asset_id}",
+        "mime": mime,
+        "sha256": blob["sha256"],
+        "deduped": bool(blob.get("deduped")),
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -514,6 +567,31 @@ def _is_public_file(name: str) -> bool:
     return name.startswith(("avatar_", "outfit_", "thumb_"))
 
 
+def _serve(
+    request: Request,
+    abs_path: Path,
+    mime: str,
+    filename: str,
+    w: Optional[int],
+    fmt: Optional[str],
+):
+    """Serve a file (or its ?w=/fmt= derivative) with ETag + Range support."""
+    try:
+        rel_path = abs_path.resolve().relative_to(_upload_root().resolve()).as_posix()
+    except ValueError:
+        rel_path = ""
+    return image_derivatives.serve(
+        request.headers,
+        abs_path,
+        media_type=mime,
+        filename=filename,
+        rel_path=rel_path,
+        w=w,
+        fmt=fmt,
+        headers=_FILE_CACHE_HEADERS,
+    )
+
+
 def _find_persona_file(filename: str) -> Optional[Path]:
     """
     Search all project appearance directories for a file by name.
@@ -535,15 +613,19 @@ def _find_persona_file(filename: str) -> Optional[Path]:
 @router.get("/files/{asset_id}")
 def download_file(
     asset_id: str,
+    request: Request,
     authorization: str = Header(default=""),
     homepilot_session: Optional[str] = Cookie(default=None),
     token: Optional[str] = Query(default=None, alias="token"),
+    w: Optional[int] = Query(default=None, ge=1, le=8192),
+    fmt: Optional[str] = Query(default=None),
 ):
     """
     Secure file serving.
     Requires auth and ownership check.
     This is the endpoint used by <img src="/files/...">.
     Supports ?token=<session_token> for <img> tags that can't set headers.
+    Supports ?w=<px>&fmt=<webp|avif|jpeg|png|auto> for resized image variants.
     Exception: persona appearance images (avatar_*, outfit_*, thumb_*) are public.
     """
     # Public persona images can be served without auth
@@ -552,7 +634,7 @@ def download_file(
         abs_path = _upload_root() / safe
         if abs_path.exists() and abs_path.is_file():
             mime = mimetypes.guess_type(str(abs_path))[0] or "application/octet-stream"
-            return FileResponse(path=str(abs_path), media_type=mime, filename=safe.name, headers=_FILE_CACHE_HEADERS)
+            return _serve(request, abs_path, mime, safe.name, w, fmt)
         raise HTTPException(404, "Not found")
 
     user = _resolve_user(authorization, homepilot_session, token_param=token)
@@ -569,12 +651,7 @@ def download_file(
             raise HTTPException(404, "Not found")
 
         filename = asset.get("original_name") or os.path.basename(str(abs_path))
-        return FileResponse(
-            path=str(abs_path),
-            media_type=asset.get("mime") or "application/octet-stream",
-            filename=filename,
-            headers=_FILE_CACHE_HEADERS,
-        )
+        return _serve(request, abs_path, asset.get("mime") or "application/octet-stream", filename, w, fmt)
 
     # Fallback: serve from flat uploads dir (avatars, legacy files)
     safe = Path(asset_id)
@@ -583,7 +660,7 @@ def download_file(
     abs_path = _upload_root() / safe
     if abs_path.exists() and abs_path.is_file():
         mime = mimetypes.guess_type(str(abs_path))[0] or "application/octet-stream"
-        return FileResponse(path=str(abs_path), media_type=mime, filename=safe.name, headers=_FILE_CACHE_HEADERS)
+        return _serve(request, abs_path, mime, safe.name, w, fmt)
 
     raise HTTPException(404, "Not found")
 
@@ -595,9 +672,12 @@ def download_file(
 @router.get("/files/{subpath:path}")
 def download_file_legacy(
     subpath: str,
+    request: Request,
     authorization: str = Header(default=""),
     homepilot_session: Optional[str] = Cookie(default=None),
     token: Optional[str] = Query(default=None, alias="token"),
+    w: Optional[int] = Query(default=None, ge=1, le=8192),
+    fmt: Optional[str] = Query(default=None),
 ):
     """
     Fallback for legacy /files/<filename> paths (pre-asset era).
@@ -616,13 +696,13 @@ def download_file_legacy(
         abs_path = _upload_root() / safe
         if abs_path.exists() and abs_path.is_file():
             mime = mimetypes.guess_type(str(abs_path))[0] or "application/octet-stream"
-            return FileResponse(path=str(abs_path), media_type=mime, filename=safe.name, headers=_FILE_CACHE_HEADERS)
+            return _serve(request, abs_path, mime, safe.name, w, fmt)
         # Fallback: the stored path may reference a stale project ID.
         # Search all project appearance dirs for the file by name.
         found = _find_persona_file(safe.name)
         if found:
             mime = mimetypes.guess_type(str(found))[0] or "application/octet-stream"
-            return FileResponse(path=str(found), media_type=mime, filename=safe.name, headers=_FILE_CACHE_HEADERS)
+            return _serve(request, found, mime, safe.name, w, fmt)
         raise HTTPException(404, "Not found")
 
     user = _resolve_user(authorization, homepilot_session, token_param=token)
@@ -638,9 +718,4 @@ def download_file_legacy(
         abs_path = found
 
     mime = mimetypes.guess_type(str(abs_path))[0] or "application/octet-stream"
-    return FileResponse(
-        path=str(abs_path),
-        media_type=mime,
-        filename=safe.name,
-        headers=_FILE_CACHE_HEADERS,
-    )
+    return _serve(request, abs_path, mime, safe.name, w, fmt)
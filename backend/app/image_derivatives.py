@@ -0,0 +1,483 @@
+"""
+Responsive image derivatives for /files — resized, re-encoded variants
+generated on demand and cached on disk.
+
+Galleries, inventory grids and persona pickers used to pull the
+full-resolution original (often multi-MB ComfyUI PNGs) for every tile.
+``/files/...?w=256&fmt=webp`` now returns a derivative instead:
+
+  - ``w``    target width in px; snapped up to a small set of buckets so
+             the cache stays bounded, never upscaled
+  - ``fmt``  webp | avif | jpeg | png | auto (default when ``w`` is given;
+             negotiates AVIF → WebP from the Accept header)
+
+Derivatives are keyed by (source hash, params).  The source hash is the
+blob-store SHA-256 when the file is content-addressed, otherwise a
+(path, size, mtime) fingerprint.  Files live under
+``uploads/.derivatives/<aa>/<key>.<ext>`` (hidden, so asset_registry's walk
+skips it) with LRU eviction once the cache exceeds its byte budget.
+Encoding runs in a bounded worker pool; concurrent requests for the same
+derivative share one job.
+
+``file_response`` serves originals and derivatives alike with a strong
+ETag, ``If-None-Match`` → 304 and single-range ``Range`` / ``If-Range``
+support (Starlette's FileResponse in this version does neither).
+
+Config:
+  MEDIA_DERIVATIVES          0 disables ?w=/fmt= handling (originals only)
+  MEDIA_DERIVATIVE_DIR       cache dir (default <UPLOAD_DIR>/.derivatives)
+  MEDIA_DERIVATIVE_CACHE_MB  disk budget (default 1024)
+  MEDIA_DERIVATIVE_WORKERS   encoder threads (default min(4, cpu count))
+  MEDIA_DERIVATIVE_QUALITY   lossy quality (default 80)
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from . import blob_store
+from .config import UPLOAD_DIR
+
+# Bump when encoder settings change so stale derivatives are not reused
+_DERIVATIVE_VERSION = 1
+
+_WIDTH_BUCKETS = (64, 128, 192, 256, 320, 384, 512, 640, 768, 1024, 1280, 1536, 2048, 2560, 3072, 4096)
+
+_FORMATS = {
+    "webp": ("WEBP", "image/webp", ".webp"),
+    "avif": ("AVIF", "image/avif", ".avif"),
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+    "png": ("PNG", "image/png", ".png"),
+}
+_FORMAT_ALIASES = {"jpg": "jpeg"}
+
+# Source types we can decode and re-encode safely (no SVG, no animation)
+_DERIVABLE_MIME = {"image/png", "image/jpeg", "image/webp", "image/avif", "image/bmp", "image/tiff"}
+
+_CHUNK = 256 * 1024
+
+
+def enabled() -> bool:
+    return os.getenv("MEDIA_DERIVATIVES", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+# ---------------------------------------------------------------------------
+# Parameters
+# ---------------------------------------------------------------------------
+
+def snap_width(w: int) -> int:
+    """Round a requested width up to the nearest bucket (bounded cache)."""
+    w = max(1, int(w))
+    for bucket in _WIDTH_BUCKETS:
+        if w <= bucket:
+            return bucket
+    return _WIDTH_BUCKETS[-1]
+
+
+def _supported(fmt: str) -> bool:
+    try:
+        from PIL import features
+    except ImportError:
+        return False
+    if fmt in ("jpeg", "png"):
+        return True
+    return bool(features.check(fmt))
+
+
+def resolve_format(fmt: Optional[str], accept: str, source_mime: str) -> Tuple[Optional[str], bool]:
+    """Return (format key or None for "keep source format", negotiated?)."""
+    fmt = (fmt or "auto").strip().lower()
+    fmt = _FORMAT_ALIASES.get(fmt, fmt)
+    if fmt == "auto":
+        accept = (accept or "").lower()
+        for candidate in ("avif", "webp"):
+            if f"image/{candidate}" in accept and _supported(candidate):
+                return candidate, True
+        return None, True
+    if fmt not in _FORMATS:
+        raise HTTPException(400, f"Unsupported fmt '{fmt}'")
+    if not _supported(fmt):
+        return None, False
+    return fmt, False
+
+
+# ---------------------------------------------------------------------------
+# Disk cache
+# ---------------------------------------------------------------------------
+
+class DerivativeCache:
+    """Byte-bounded LRU of derivative files on disk."""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._index: Dict[Path, Tuple[int, float]] = {}  # path -> (size, last access)
+        self._bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.root.is_dir():
+            return
+        for dirpath, _dirs, names in os.walk(self.root):
+            for name in names:
+                p = Path(dirpath) / name
+                if name.startswith(".tmp-"):
+                    p.unlink(missing_ok=True)
+                    continue
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                self._index[p] = (st.st_size, st.st_atime)
+                self._bytes += st.st_size
+
+    def path_for(self, key: str, ext: str) -> Path:
+        return self.root / key[:2] / f"{key}{ext}"
+
+    def hit(self, path: Path) -> bool:
+        with self._lock:
+            self._load()
+            entry = self._index.get(path)
+            if entry is None:
+                if not path.is_file():
+                    return False
+                entry = (path.stat().st_size, 0.0)
+                self._bytes += entry[0]
+            self._index[path] = (entry[0], time.time())
+            return True
+
+    def add(self, path: Path) -> None:
+        size = path.stat().st_size
+        with self._lock:
+            self._load()
+            old = self._index.get(path)
+            if old is not None:
+                self._bytes -= old[0]
+            self._index[path] = (size, time.time())
+            self._bytes += size
+            self._evict(keep=path)
+
+    def _evict(self, keep: Path) -> None:
+        if self._bytes <= self.max_bytes:
+            return
+        for victim, (size, _) in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            if self._bytes <= self.max_bytes:
+                break
+            if victim == keep:
+                continue
+            victim.unlink(missing_ok=True)
+            del self._index[victim]
+            self._bytes -= size
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._load()
+            return {"entries": len(self._index), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+_cache: Optional[DerivativeCache] = None
+_pool: Optional[ThreadPoolExecutor] = None
+_inflight: Dict[str, Future] = {}
+_state_lock = threading.RLock()
+
+
+def _cache_root() -> Path:
+    custom = os.getenv("MEDIA_DERIVATIVE_DIR", "").strip()
+    if custom:
+        return Path(custom)
+    root = Path(UPLOAD_DIR)
+    if not root.is_absolute():
+        root = Path(__file__).resolve().parents[1] / "data" / "uploads"
+    return root / ".derivatives"
+
+
+def get_cache() -> DerivativeCache:
+    global _cache
+    root = _cache_root()
+    with _state_lock:
+        if _cache is None or _cache.root != root:
+            _cache = DerivativeCache(root, max(0, _env_int("MEDIA_DERIVATIVE_CACHE_MB", 1024)) * 1024 * 1024)
+        return _cache
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _state_lock:
+        if _pool is None:
+            workers = _env_int("MEDIA_DERIVATIVE_WORKERS", min(4, os.cpu_count() or 1))
+            _pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="media-derivative")
+        return _pool
+
+
+# ---------------------------------------------------------------------------
+# Generation
+# ---------------------------------------------------------------------------
+
+_SOURCE_KEY_ENTRIES = 4096
+_source_keys: "OrderedDict[Tuple[str, str, int, int], str]" = OrderedDict()
+
+
+def source_key(abs_path: Path, rel_path: str = "") -> str:
+    """Content identity of a source file: blob SHA-256 or a stat fingerprint.
+
+    The blob hash is only used while the file still has the size and mtime
+    it was materialised with; a file rewritten outside the blob store is
+    keyed by its stat instead. Memoised on (path, size, mtime) so serving a
+    file does not query the blob index on every request.
+    """
+    st = abs_path.stat()
+    memo = (str(abs_path), rel_path, st.st_size, st.st_mtime_ns)
+    with _state_lock:
+        key = _source_keys.get(memo)
+        if key is not None:
+            _source_keys.move_to_end(memo)
+            return key
+    key = ""
+    if rel_path:
+        try:
+            key = blob_store.sha_for_file(abs_path, st) or ""
+        except Exception:
+            key = ""
+    if not key:
+        raw = f"{abs_path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+        key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    with _state_lock:
+        _source_keys[memo] = key
+        while len(_source_keys) > _SOURCE_KEY_ENTRIES:
+            _source_keys.popitem(last=False)
+    return key
+
+
+def _encode(src: Path, dest: Path, width: int, fmt: str, quality: int) -> None:
+    from PIL import Image, ImageOps
+
+    pil_format = _FORMATS[fmt][0]
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.width > width:
+            height = max(1, round(im.height * width / im.width))
+            im.draft("RGB", (width, height))  # fast JPEG downscale-on-decode
+            im = im.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        if pil_format == "JPEG" and im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        elif im.mode not in ("RGB", "RGBA", "L", "LA"):
+            im = im.convert("RGBA" if "transparency" in im.info or "A" in im.getbands() else "RGB")
+        params: Dict[str, object] = {}
+        if pil_format in ("WEBP", "AVIF", "JPEG"):
+            params["quality"] = quality
+        if pil_format == "WEBP":
+            params["method"] = 4
+        elif pil_format == "JPEG":
+            params["optimize"] = True
+            params["progressive"] = True
+        elif pil_format == "PNG":
+            params["optimize"] = True
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.parent / f".tmp-{uuid.uuid4().hex}"
+        try:
+            im.save(tmp, pil_format, **params)
+            os.replace(tmp, dest)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+
+def derivative(
+    abs_path: Path,
+    *,
+    width: int,
+    fmt: str,
+    rel_path: str = "",
+    quality: Optional[int] = None,
+    timeout: float = 60.0,
+) -> Tuple[Path, str]:
+    """Return (derivative path, cache key), generating it in the pool if needed."""
+    quality = quality if quality is not None else _env_int("MEDIA_DERIVATIVE_QUALITY", 80)
+    key = hashlib.sha256(
+        f"{source_key(abs_path, rel_path)}|w={width}|fmt={fmt}|q={quality}|v={_DERIVATIVE_VERSION}".encode("utf-8")
+    ).hexdigest()[:40]
+    cache = get_cache()
+    dest = cache.path_for(key, _FORMATS[fmt][2])
+    if cache.hit(dest):
+        return dest, key
+
+    with _state_lock:
+        fut = _inflight.get(key)
+        owner = fut is None
+        if owner:
+            fut = _get_pool().submit(_encode, abs_path, dest, width, fmt, quality)
+            _inflight[key] = fut
+    try:
+        fut.result(timeout=timeout)
+    finally:
+        if owner:
+            with _state_lock:
+                _inflight.pop(key, None)
+    if owner:
+        cache.add(dest)
+    return dest, key
+
+
+# ---------------------------------------------------------------------------
+# HTTP serving
+# ---------------------------------------------------------------------------
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.strip('"')
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"') == bare:
+            return True
+    return False
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Single ``bytes=a-b`` range → (start, end) inclusive; None = ignore header."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    spec = header[6:].strip()
+    start_s, _, end_s = spec.partition("-")
+    try:
+        if start_s == "":
+            length = int(end_s)
+            if length <= 0:
+                raise ValueError
+            return max(0, size - length), size - 1
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+    except ValueError:
+        raise HTTPException(416, "Invalid range", headers={"Content-Range": f"bytes */{size}"})
+    if start >= size or end < start:
+        raise HTTPException(416, "Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, min(end, size - 1)
+
+
+def _iter_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = fh.read(min(_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(
+    request_headers: Mapping[str, str],
+    path: Path,
+    *,
+    media_type: str,
+    filename: str,
+    etag: str,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """FileResponse with ETag / If-None-Match / Range / If-Range support."""
+    etag = f'"{etag.strip(chr(34))}"'
+    base = dict(headers or {})
+    base["ETag"] = etag
+    base["Accept-Ranges"] = "bytes"
+
+    if _etag_matches(request_headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=base)
+
+    size = path.stat().st_size
+    range_header = request_headers.get("range", "")
+    if_range = request_headers.get("if-range", "")
+    if range_header and (not if_range or _etag_matches(if_range, etag)):
+        rng = _parse_range(range_header, size)
+        if rng is not None:
+            start, end = rng
+            base["Content-Range"] = f"bytes {start}-{end}/{size}"
+            base["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                _iter_range(path, start, end), status_code=206, media_type=media_type, headers=base,
+            )
+
+    return FileResponse(path=str(path), media_type=media_type, filename=filename, headers=base)
+
+
+def serve(
+    request_headers: Mapping[str, str],
+    abs_path: Path,
+    *,
+    media_type: str,
+    filename: str,
+    rel_path: str = "",
+    w: Optional[int] = None,
+    fmt: Optional[str] = None,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Serve *abs_path*, or a derivative of it when ``w`` / ``fmt`` ask for one."""
+    extra = dict(headers or {})
+    base_mime = (media_type or "").split(";")[0].strip().lower()
+    wants_variant = (w is not None or fmt is not None) and enabled() and base_mime in _DERIVABLE_MIME
+    if wants_variant:
+        target, negotiated = resolve_format(fmt, request_headers.get("accept", ""), base_mime)
+        if negotiated:
+            extra["Vary"] = "Accept"
+        if target is None:
+            target = next((k for k, v in _FORMATS.items() if v[1] == base_mime), None)
+        width = snap_width(w) if w is not None else _WIDTH_BUCKETS[-1]
+        if target is not None:
+            try:
+                from PIL import Image
+
+                with Image.open(abs_path) as im:
+                    src_width = im.width
+            except Exception:
+                src_width = 0
+            same_format = _FORMATS[target][1] == base_mime
+            if src_width and (width < src_width or not same_format):
+                try:
+                    dest, key = derivative(abs_path, width=min(width, src_width), fmt=target, rel_path=rel_path)
+                except Exception as exc:
+                    print(f"[FILES] derivative failed for {abs_path.name}: {exc}")
+                else:
+                    stem = os.path.splitext(filename)[0] or "image"
+                    return file_response(
+                        request_headers, dest,
+                        media_type=_FORMATS[target][1],
+                        filename=f"{stem}-{min(width, src_width)}w{_FORMATS[target][2]}",
+                        etag=key,
+                        headers=extra,
+                    )
+
+    return file_response(
+        request_headers, abs_path,
+        media_type=media_type,
+        filename=filename,
+        etag=source_key(abs_path, rel_path)[:40],
+        headers=extra,
+    )
+
+
+def stats() -> Dict[str, object]:
+    return {"enabled": enabled(), "cache": get_cache().stats(), "inflight": len(_inflight)}
@@ -16,6 +16,8 @@ import re
 from dataclasses import dataclass
 from typing import List, Optional, Pattern, Tuple
 
+from ...policy_engine import CompiledTier
+
 
 @dataclass(frozen=True)
 class IntentMatch:
@@ -68,6 +70,9 @@ _RULES: List[Tuple[str, Pattern[str]]] = [
     ("question_about_topic", re.compile(r"\?\s*$")),
 ]
 
+# All rules folded into one automaton; ``first`` keeps first-match-wins.
+_TIER = CompiledTier("intent", _RULES)
+
 
 def classify_intent(text: str) -> IntentMatch:
     """Classify one user utterance. Always returns an IntentMatch —
@@ -77,11 +82,11 @@ def classify_intent(text: str) -> IntentMatch:
     """
     if not text or not text.strip():
         return IntentMatch(intent_code="empty", confidence=0.0, matched_pattern="")
-    for code, pattern in _RULES:
-        if pattern.search(text):
-            return IntentMatch(
-                intent_code=code,
-                confidence=0.7,  # regex rules are deliberately mid-confidence
-                matched_pattern=pattern.pattern,
-            )
+    hit = _TIER.first(text)
+    if hit is not None:
+        return IntentMatch(
+            intent_code=hit.rule_id,
+            confidence=0.7,  # regex rules are deliberately mid-confidence
+            matched_pattern=hit.pattern,
+        )
     return IntentMatch(intent_code="unknown", confidence=0.0, matched_pattern="")
@@ -24,6 +24,7 @@ from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Cookie, Depends, Header, Query
 from fastapi.responses import JSONResponse
 
+from . import blob_store
 from .auth import require_api_key
 from .config import UPLOAD_DIR, PUBLIC_BASE_URL, SQLITE_PATH
 
@@ -90,6 +91,14 @@ def _upload_root() -> Path:
     return p
 
 
+def _delete_upload(path: Path) -> None:
+    """Remove an upload file and its blob reference (never raises)."""
+    try:
+        blob_store.remove(path)
+    except Exception as e:
+        print(f"[INVENTORY] Failed to delete {path}: {e}")
+
+
 def _projects_metadata_path() -> Path:
     return _upload_root() / "projects_metadata.json"
 
@@ -911,12 +920,7 @@ async def inventory_delete_item(
                 if rel_path:
                     rp = _safe_rel_path(rel_path)
                     if rp:
-                        full_path = _upload_root() / rp
-                        if full_path.exists():
-                            try:
-                                full_path.unlink()
-                            except Exception:
-                                pass
+                        _delete_upload(_upload_root() / rp)
         else:
             new_outfits.append(o)
 
@@ -972,12 +976,7 @@ async def inventory_delete_item(
                 if rel_path:
                     rp = _safe_rel_path(rel_path)
                     if rp:
-                        full_path = _upload_root() / rp
-                        if full_path.exists():
-                            try:
-                                full_path.unlink()
-                            except Exception:
-                                pass
+                        _delete_upload(_upload_root() / rp)
             else:
                 new_images.append(img)
         s["images"] = new_images
@@ -1026,12 +1025,7 @@ async def inventory_delete_item(
                 if rel_path:
                     rp = _safe_rel_path(rel_path)
                     if rp:
-                        full_path = _upload_root() / rp
-                        if full_path.exists():
-                            try:
-                                full_path.unlink()
-                            except Exception:
-                                pass
+                        _delete_upload(_upload_root() / rp)
             else:
                 new_images.append(img)
         o["images"] = new_images
@@ -8,15 +8,22 @@ Three graph topologies:
   - orchestrated: perceive → think → decide → [act|embody|respond] → respond
   - guided:       perceive → think → decide → [embody|respond] → respond
   - direct:       perceive → respond (skip thinking entirely)
+
+Compiled graphs are immutable and hold no per-run state, so
+``run_persona_graph`` compiles each topology once and reuses it
+(``get_compiled_graph``).  Every node is wrapped by ``tracing.traced`` so
+per-node latency shows up in ``tracing.metrics_snapshot()``.
 """
 from __future__ import annotations
 
 import logging
+import threading
 from typing import Any, Dict, Optional
 
 from langgraph.graph import END, StateGraph
 
 from .state import PersonaAgentState
+from .tracing import run_trace, traced
 from .nodes.perceive import perceive
 from .nodes.think import think
 from .nodes.decide import decide, route_after_decide
@@ -26,6 +33,11 @@ from .nodes.respond import respond
 
 logger = logging.getLogger(__name__)
 
+_REASONING_MODES = ("orchestrated", "guided", "direct")
+
+_compiled: Dict[str, Any] = {}
+_compiled_lock = threading.Lock()
+
 
 def build_persona_graph(reasoning_mode: str = "direct") -> StateGraph:
     """
@@ -53,12 +65,12 @@ def _build_orchestrated_graph(graph: StateGraph) -> StateGraph:
                                     ↓
                                   respond
     """
-    graph.add_node("perceive", perceive)
-    graph.add_node("think", think)
-    graph.add_node("decide", decide)
-    graph.add_node("act", act)
-    graph.add_node("embody", embody)
-    graph.add_node("respond", respond)
+    graph.add_node("perceive", traced("perceive", perceive))
+    graph.add_node("think", traced("think", think))
+    graph.add_node("decide", traced("decide", decide))
+    graph.add_node("act", traced("act", act))
+    graph.add_node("embody", traced("embody", embody))
+    graph.add_node("respond", traced("respond", respond))
 
     graph.set_entry_point("perceive")
     graph.add_edge("perceive", "think")
@@ -98,11 +110,11 @@ def _build_guided_graph(graph: StateGraph) -> StateGraph:
                                     ↓
                                   respond
     """
-    graph.add_node("perceive", perceive)
-    graph.add_node("think", think)
-    graph.add_node("decide", decide)
-    graph.add_node("embody", embody)
-    graph.add_node("respond", respond)
+    graph.add_node("perceive", traced("perceive", perceive))
+    graph.add_node("think", traced("think", think))
+    graph.add_node("decide", traced("decide", decide))
+    graph.add_node("embody", traced("embody", embody))
+    graph.add_node("respond", traced("respond", respond))
 
     graph.set_entry_point("perceive")
     graph.add_edge("perceive", "think")
@@ -129,8 +141,8 @@ def _build_direct_graph(graph: StateGraph) -> StateGraph:
 
     perceive → respond
     """
-    graph.add_node("perceive", perceive)
-    graph.add_node("respond", respond)
+    graph.add_node("perceive", traced("perceive", perceive))
+    graph.add_node("respond", traced("respond", respond))
 
     graph.set_entry_point("perceive")
     graph.add_edge("perceive", "respond")
@@ -158,6 +170,37 @@ def _route_guided(state: PersonaAgentState) -> str:
     return "respond"
 
 
+# ── Compiled graph cache ─────────────────────────────────────────────
+
+
+def normalize_reasoning_mode(reasoning_mode: Optional[str]) -> str:
+    """Map any reasoning_mode onto the topology that build_persona_graph uses."""
+    return reasoning_mode if reasoning_mode in _REASONING_MODES else "direct"
+
+
+def get_compiled_graph(reasoning_mode: str = "direct") -> Any:
+    """Return the compiled graph for *reasoning_mode*, compiling it once."""
+    mode = normalize_reasoning_mode(reasoning_mode)
+    graph = _compiled.get(mode)
+    if graph is None:
+        with _compiled_lock:
+            graph = _compiled.get(mode)
+            if graph is None:
+                graph = build_persona_graph(mode)
+                _compiled[mode] = graph
+                logger.info("[graph] Compiled %s persona graph", mode)
+    return graph
+
+
+def clear_compiled_graphs() -> None:
+    with _compiled_lock:
+        _compiled.clear()
+
+
+def compiled_graph_modes() -> list:
+    return sorted(_compiled)
+
+
 # ── High-level runner ────────────────────────────────────────────────
 
 
@@ -167,18 +210,28 @@ async def run_persona_graph(
     initial_state: Dict[str, Any],
 ) -> Dict[str, Any]:
     """
-    Build and run the appropriate graph for a persona.
+    Run the appropriate (cached) graph for a persona.
 
     Returns the final state dict containing response_text, motion_plan,
-    avatar_emotion, etc.
+    avatar_emotion, etc., plus ``node_timings`` for this run.
     """
-    graph = build_persona_graph(reasoning_mode)
+    mode = normalize_reasoning_mode(reasoning_mode)
+    graph = get_compiled_graph(mode)
 
     logger.info(
         "[graph] Running %s graph for persona=%s",
-        reasoning_mode,
+        mode,
         initial_state.get("persona_id", "?"),
     )
 
-    result = await graph.ainvoke(initial_state)
-    return dict(result)
+    with run_trace(mode) as trace:
+        result = await graph.ainvoke(initial_state)
+
+    logger.debug(
+        "[graph] %s timings: %s",
+        mode,
+        ", ".join(f"{t['node']}={t['ms']:.1f}ms" for t in trace),
+    )
+    out = dict(result)
+    out["node_timings"] = list(trace)
+    return out
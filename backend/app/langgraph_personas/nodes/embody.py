@@ -56,6 +56,8 @@ async def embody(state: PersonaAgentState) -> Dict[str, Any]:
         logger.debug("[embody] no motion plan generated")
         return {}
 
+    _resolve_seat(plan, (state.get("world_snapshot") or {}).get("nearest_seat"))
+
     motion_dict: MotionPlanDict = plan.to_dict()
     logger.debug("[embody] motion plan: %d commands", len(motion_dict.get("commands", [])))
 
@@ -64,6 +66,16 @@ async def embody(state: PersonaAgentState) -> Dict[str, Any]:
     }
 
 
+def _resolve_seat(plan: Any, seat: Optional[Dict[str, Any]]) -> None:
+    """Pin "nearest_seat" sit targets to the seat the world-state index found."""
+    if not seat:
+        return
+    pos = seat.get("position") or {}
+    for cmd in plan.commands:
+        if cmd.target == "nearest_seat" and cmd.position is None:
+            cmd.position = [pos.get("x", 0.0), pos.get("y", 0.0), pos.get("z", 0.0)]
+
+
 def _plan_from_intent(
     intent: str,
     persona_id: str,
@@ -52,11 +52,13 @@ async def perceive(state: PersonaAgentState) -> Dict[str, Any]:
         if user_hands:
             parts.append(f"User hands visible: {', '.join(user_hands)}.")
 
-        anchors = ws.get("anchors", [])
-        if anchors:
-            seat_count = sum(1 for a in anchors if a.get("type") == "seat")
-            if seat_count:
-                parts.append(f"There {'is' if seat_count == 1 else 'are'} {seat_count} seat(s) in the room.")
+        counts = ws.get("anchor_counts")
+        if counts is not None:
+            seat_count = counts.get("seat", 0)
+        else:
+            seat_count = sum(1 for a in ws.get("anchors", []) if a.get("type") == "seat")
+        if seat_count:
+            parts.append(f"There {'is' if seat_count == 1 else 'are'} {seat_count} seat(s) in the room.")
 
         avatar_state = ws.get("avatar_state", "idle")
         parts.append(f"Your current state: {avatar_state}.")
@@ -7,15 +7,18 @@ Does NOT alter /chat, /v1/agent/chat, or any existing endpoints.
 Provides:
   POST /v1/persona-graph/chat     — graph-based persona chat
   POST /v1/world-state/update     — receive VR world state
+  WS   /v1/world-state/stream     — versioned world-state deltas per session
   GET  /v1/persona/{id}/motion    — get latest motion plan
+  GET  /v1/persona-graph/metrics  — per-node latency + cache stats
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, Header, Request
+from fastapi import APIRouter, Depends, Header, Request, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel, Field
 from starlette.responses import JSONResponse
 
@@ -24,9 +27,8 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["persona-graph"])
 
 
-# ── World State storage (in-memory per-session) ─────────────────────
+# ── Motion plans (world state lives in world_state.registry) ────────
 
-_world_state_sessions: Dict[str, Any] = {}
 _latest_motion_plans: Dict[str, Dict[str, Any]] = {}
 
 
@@ -38,6 +40,7 @@ class PersonaGraphChatIn(BaseModel):
     project_id: Optional[str] = Field(None)
     message: str = Field(..., description="User message")
     persona_id: str = Field("", description="Persona identifier")
+    session_id: str = Field("default", description="VR session whose world state to use")
 
     # LLM settings
     provider: str = Field("openai_compat")
@@ -77,7 +80,7 @@ async def persona_graph_chat(inp: PersonaGraphChatIn) -> JSONResponse:
     from ..storage import get_messages
     from .graph_builder import run_persona_graph
     from .embodiment_prompt import build_embodiment_prompt
-    from ..world_state.service import WorldStateService
+    from ..world_state.registry import get_registry
 
     # Resolve persona config
     project_data = {}
@@ -111,19 +114,11 @@ async def persona_graph_chat(inp: PersonaGraphChatIn) -> JSONResponse:
     if embodiment_section:
         system_prompt = system_prompt + "\n" + embodiment_section
 
-    # Get world state snapshot
+    # Get world state: a compact, index-backed view rather than every anchor
     world_snapshot = {}
-    ws_service = _world_state_sessions.get("default")
-    if ws_service and hasattr(ws_service, "snapshot"):
-        world_snapshot = ws_service.snapshot()
-        # Compute avatar distance
-        user_pos = world_snapshot.get("user", {}).get("position", {})
-        avatar_data = world_snapshot.get("avatars", {}).get(inp.persona_id, {})
-        if user_pos and avatar_data.get("position"):
-            dx = user_pos.get("x", 0) - avatar_data["position"].get("x", 0)
-            dy = user_pos.get("y", 0) - avatar_data["position"].get("y", 0)
-            dz = user_pos.get("z", 0) - avatar_data["position"].get("z", 0)
-            world_snapshot["avatar_distance_m"] = (dx**2 + dy**2 + dz**2) ** 0.5
+    ws_service = get_registry().get(inp.session_id)
+    if ws_service is not None:
+        world_snapshot = ws_service.perception_view(inp.persona_id)
 
     # Get conversation history
     history = []
@@ -213,30 +208,92 @@ async def persona_graph_chat(inp: PersonaGraphChatIn) -> JSONResponse:
 # ── POST /v1/world-state/update ──────────────────────────────────────
 
 
+def _apply_world_update(
+    session_id: str,
+    user: Optional[Dict[str, Any]],
+    avatars: Optional[Dict[str, Dict[str, Any]]],
+    anchors: Optional[List[Dict[str, Any]]],
+) -> int:
+    """Apply one VR update to its session; returns the new state version."""
+    from ..world_state.registry import get_registry
+
+    ws = get_registry().get_or_create(session_id or "default")
+    if user:
+        ws.update_user(user)
+    for persona_id, avatar_data in (avatars or {}).items():
+        ws.update_avatar(persona_id, avatar_data)
+    if anchors is not None:
+        ws.set_anchors(anchors)
+    return ws.version
+
+
 @router.post("/v1/world-state/update")
 async def world_state_update(inp: WorldStateUpdateIn) -> JSONResponse:
     """
     Receive world-state updates from the VR client.
-    Stores in-memory for the current session.
+    Stores in-memory for the given session.
     """
-    from ..world_state.service import WorldStateService
+    version = _apply_world_update(inp.session_id, inp.user, inp.avatars, inp.anchors)
+    return JSONResponse(status_code=200, content={"ok": True, "version": version})
 
-    session_id = inp.session_id or "default"
 
-    if session_id not in _world_state_sessions:
-        _world_state_sessions[session_id] = WorldStateService()
+# ── WS /v1/world-state/stream ────────────────────────────────────────
 
-    ws = _world_state_sessions[session_id]
 
-    if inp.user:
-        ws.update_user(inp.user)
-    if inp.avatars:
-        for persona_id, avatar_data in inp.avatars.items():
-            ws.update_avatar(persona_id, avatar_data)
-    if inp.anchors is not None:
-        ws.set_anchors(inp.anchors)
-
-    return JSONResponse(status_code=200, content={"ok": True})
+@router.websocket("/v1/world-state/stream")
+async def world_state_stream(
+    websocket: WebSocket,
+    session_id: str = "default",
+    since: int = 0,
+    epoch: str = "",
+) -> None:
+    """
+    Push world-state deltas for one session at a bounded tick rate.
+
+    The first message is a full snapshot unless ``since`` (with the
+    ``epoch`` of the delta it came from) names a version the server can
+    still diff against. After that, each tick in which the state changed
+    sends ``{"type": "delta", "epoch", "version", "user"?, "avatars",
+    "anchors", "removed_anchors"}`` with only the changed entities. The
+    client may send ``{"type": "update", ...}`` (same body as
+    /v1/world-state/update) and ``{"type": "resync"}`` for a full snapshot.
+
+    The session is looked up again every tick and kept alive while
+    subscribed; if it was still evicted and recreated, the next message is a
+    full snapshot of the new session under its new epoch.
+    """
+    from ..world_state.registry import TICK_HZ, get_registry
+
+    await websocket.accept()
+    session_id = session_id or "default"
+    interval = 1.0 / max(TICK_HZ, 0.1)
+    cursor = {"sent": max(0, since), "epoch": epoch or None, "initial": True}
+
+    async def receive() -> None:
+        while True:
+            msg = await websocket.receive_json()
+            kind = msg.get("type") if isinstance(msg, dict) else None
+            if kind == "update":
+                _apply_world_update(session_id, msg.get("user"), msg.get("avatars"), msg.get("anchors"))
+            elif kind == "resync":
+                cursor["sent"] = 0
+                cursor["initial"] = True
+
+    receiver = asyncio.create_task(receive())
+    try:
+        while not receiver.done():
+            ws = get_registry().get_or_create(session_id)
+            ws.keep_alive()
+            if cursor["initial"] or ws.epoch != cursor["epoch"] or ws.version != cursor["sent"]:
+                delta = ws.delta_since(cursor["sent"], cursor["epoch"])
+                await websocket.send_json({"type": "delta", **delta})
+                cursor.update(sent=delta["version"], epoch=delta["epoch"], initial=False)
+            await asyncio.wait({receiver}, timeout=interval)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        await asyncio.gather(receiver, return_exceptions=True)
 
 
 # ── GET /v1/persona/{persona_id}/motion ──────────────────────────────
@@ -268,26 +325,27 @@ async def world_state_update_legacy(request: Request) -> JSONResponse:
     Legacy path — WorldStateBridge.js pushes to /world-state/update.
     Delegates to the v1 endpoint.
     """
-    from ..world_state.service import WorldStateService
-
     body = await request.json()
+    version = _apply_world_update(
+        body.get("session_id", "default"), body.get("user"), body.get("avatars"), body.get("anchors")
+    )
+    return JSONResponse(status_code=200, content={"ok": True, "version": version})
 
-    session_id = body.get("session_id", "default")
-    if session_id not in _world_state_sessions:
-        _world_state_sessions[session_id] = WorldStateService()
-
-    ws = _world_state_sessions[session_id]
 
-    user_data = body.get("user")
-    if user_data:
-        ws.update_user(user_data)
+# ── GET /v1/persona-graph/metrics ────────────────────────────────────
 
-    avatars = body.get("avatars", {})
-    for pid, adata in avatars.items():
-        ws.update_avatar(pid, adata)
 
-    anchors = body.get("anchors")
-    if anchors is not None:
-        ws.set_anchors(anchors)
-
-    return JSONResponse(status_code=200, content={"ok": True})
+@router.get("/v1/persona-graph/metrics")
+async def persona_graph_metrics() -> JSONResponse:
+    """
+    Where persona-graph latency goes: per-node and per-run timings, plus
+    compiled-graph and persona-config cache state.
+    """
+    from ..persona_runtime.manager import persona_cache_stats
+    from .graph_builder import compiled_graph_modes
+    from .tracing import metrics_snapshot
+
+    content = metrics_snapshot()
+    content["compiled_graphs"] = compiled_graph_modes()
+    content["persona_config_cache"] = persona_cache_stats()
+    return JSONResponse(status_code=200, content=content)
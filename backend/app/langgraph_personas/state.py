@@ -21,7 +21,11 @@ class WorldSnapshot(TypedDict, total=False):
     avatar_position: Dict[str, float]
     avatar_state: str
     avatar_distance_m: Optional[float]
-    anchors: List[Dict[str, Any]]
+    anchors: List[Dict[str, Any]]          # nearest to the user, with distance_m
+    anchor_counts: Dict[str, int]          # per anchor type, whole room
+    nearest_seat: Optional[Dict[str, Any]]  # closest "seat" anchor to the avatar
+    session_id: str
+    version: int
 
 
 class ToolResult(TypedDict, total=False):
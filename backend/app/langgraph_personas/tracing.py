@@ -0,0 +1,150 @@
+"""
+Node-level tracing for persona graphs.
+
+Every node added by ``graph_builder`` is wrapped with :func:`traced`, which
+times the call and records it twice:
+
+  - into the current run's trace (a contextvar opened by ``run_trace()``),
+    so ``run_persona_graph`` can log / return the per-node breakdown;
+  - into process-wide :class:`NodeStats` (count, errors, total / max and
+    p50 / p95 over a bounded window), exposed via ``metrics_snapshot()``
+    and ``GET /v1/persona-graph/metrics``.
+
+Wrapping keeps the node's sync/async nature so LangGraph schedules it the
+same way as before.
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+_WINDOW = 512  # recent samples kept per node for percentiles
+
+_current_trace: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar(
+    "persona_graph_trace", default=None,
+)
+
+
+class NodeStats:
+    """Running latency stats for one node (or a whole graph run)."""
+
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "_recent")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent: Deque[float] = deque(maxlen=_WINDOW)
+
+    def add(self, ms: float, ok: bool = True) -> None:
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self._recent.append(ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = sorted(self._recent)
+
+        def pct(p: float) -> float:
+            if not recent:
+                return 0.0
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 2)
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(self.max_ms, 2),
+            "total_ms": round(self.total_ms, 2),
+        }
+
+
+_lock = threading.Lock()
+_nodes: Dict[str, NodeStats] = {}
+_runs: Dict[str, NodeStats] = {}
+
+
+def _record(table: Dict[str, NodeStats], key: str, ms: float, ok: bool) -> None:
+    with _lock:
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = NodeStats()
+        stats.add(ms, ok)
+
+
+def _finish(name: str, started: float, ok: bool) -> None:
+    ms = (time.perf_counter() - started) * 1000.0
+    _record(_nodes, name, ms, ok)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.append({"node": name, "ms": round(ms, 2), "ok": ok})
+
+
+def traced(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a graph node so each call is timed under *name*."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def _async_node(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            ok = False
+            try:
+                result = await fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                _finish(name, started, ok)
+
+        return _async_node
+
+    @functools.wraps(fn)
+    def _sync_node(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            _finish(name, started, ok)
+
+    return _sync_node
+
+
+@contextmanager
+def run_trace(reasoning_mode: str) -> Iterator[List[Dict[str, Any]]]:
+    """Collect node timings for one graph run and record the run total."""
+    trace: List[Dict[str, Any]] = []
+    token = _current_trace.set(trace)
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield trace
+        ok = True
+    finally:
+        _current_trace.reset(token)
+        _record(_runs, reasoning_mode, (time.perf_counter() - started) * 1000.0, ok)
+
+
+def metrics_snapshot() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "nodes": {name: s.snapshot() for name, s in sorted(_nodes.items())},
+            "runs": {mode: s.snapshot() for mode, s in sorted(_runs.items())},
+        }
+
+
+def reset_metrics() -> None:
+    with _lock:
+        _nodes.clear()
+        _runs.clear()
@@ -0,0 +1,240 @@
+"""
+Lazy router mounting + startup readiness tracking.
+
+Optional subsystems (agentic, teams, interactive, profile, …) used to be
+imported at the top of ``main.py`` and pay their import cost — plus
+whatever heavy libraries they drag in — before the first request is
+served.  ``LazyRouterMounter`` defers that:
+
+  mounter.register("teams", ["/v1/teams"], _load_teams_routers)
+
+- At registration an inert placeholder route is appended to the app, so
+  the subsystem's routes later land at exactly the position the eager
+  ``include_router`` call would have put them (route precedence is kept).
+- ``LazyMountMiddleware`` (pure ASGI, covers HTTP + WebSocket) loads a
+  subsystem on the first request under one of its prefixes, off the event
+  loop, then lets routing continue as normal.
+- ``warm_in_background()`` loads everything still pending in a daemon
+  thread right after startup, so steady-state requests never pay for it.
+
+Readiness: the mounter also tracks named warm-up tasks (image model
+warmup, capability snapshot, …).  ``readiness()`` reports ``serving``
+until all lazy routers are mounted and all tracked tasks have finished,
+then ``warmed``.  ``/health/ready`` in main.py exposes it.
+
+A loader that raises is logged and marked ``failed``; requests then get
+the usual 404, same as the previous try/except-guarded eager mounts.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import APIRouter, FastAPI
+from starlette.routing import BaseRoute, Match
+
+_logger = logging.getLogger("homepilot.lazy_mount")
+
+RouterLoader = Callable[[], Iterable[APIRouter]]
+
+
+class _Placeholder(BaseRoute):
+    """Inert route marking where a lazy subsystem's routes will be spliced in."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.path = f"<lazy:{name}>"
+
+    def matches(self, scope: Any) -> Tuple[Match, Dict[str, Any]]:
+        return Match.NONE, {}
+
+    async def handle(self, scope, receive, send) -> None:  # pragma: no cover - never matched
+        raise RuntimeError("lazy placeholder route should never be dispatched")
+
+
+@dataclass
+class LazySubsystem:
+    name: str
+    prefixes: Tuple[str, ...]
+    loader: RouterLoader
+    placeholder: _Placeholder
+    state: str = "pending"           # pending | loading | loaded | failed
+    load_ms: float = 0.0
+    route_count: int = 0
+    trigger: str = ""                # "request:<path>" | "warmup"
+    error: str = ""
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "prefixes": list(self.prefixes),
+            "load_ms": round(self.load_ms, 1),
+            "routes": self.route_count,
+            "trigger": self.trigger,
+            "error": self.error,
+        }
+
+
+class LazyRouterMounter:
+    """Registry of lazily imported routers for one FastAPI app."""
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self._subsystems: Dict[str, LazySubsystem] = {}
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._tasks_lock = threading.Lock()
+        self._created = time.time()
+        self._warm_started = 0.0
+        self._warm_finished = 0.0
+
+    # ------------------------------------------------------------------
+    # Routers
+    # ------------------------------------------------------------------
+
+    def register(self, name: str, prefixes: Iterable[str], loader: RouterLoader) -> None:
+        placeholder = _Placeholder(name)
+        self.app.router.routes.append(placeholder)
+        self._subsystems[name] = LazySubsystem(
+            name=name,
+            prefixes=tuple(p.rstrip("/") for p in prefixes),
+            loader=loader,
+            placeholder=placeholder,
+        )
+
+    def pending_for_path(self, path: str) -> List[str]:
+        """Subsystems under *path* that are not mounted yet, including ones
+        warmup is loading right now (``ensure`` then waits on their lock).
+        Failed subsystems are settled and never retried, so they are skipped."""
+        out = []
+        for sub in self._subsystems.values():
+            if sub.state in ("loaded", "failed"):
+                continue
+            if any(path == p or path.startswith(p + "/") for p in sub.prefixes):
+                out.append(sub.name)
+        return out
+
+    def ensure(self, name: str, trigger: str = "") -> bool:
+        """Import + mount *name* if not done yet. Returns True when mounted."""
+        sub = self._subsystems[name]
+        if sub.state in ("loaded", "failed"):
+            return sub.state == "loaded"
+        with sub.lock:
+            if sub.state in ("loaded", "failed"):
+                return sub.state == "loaded"
+            sub.state = "loading"
+            sub.trigger = trigger
+            started = time.perf_counter()
+            try:
+                staging = APIRouter()
+                for router in sub.loader():
+                    staging.include_router(router)
+                self._splice(sub, staging.routes)
+                sub.route_count = len(staging.routes)
+                sub.state = "loaded"
+            except Exception as exc:  # noqa: BLE001 - optional subsystem
+                sub.state = "failed"
+                sub.error = f"{type(exc).__name__}: {exc}"
+                self._splice(sub, [])
+                print(f"[{name}] DISABLED due to import error: {exc}")
+            finally:
+                sub.load_ms = (time.perf_counter() - started) * 1000
+        _logger.info("lazy mount %s: %s in %.0fms (%s)", name, sub.state, sub.load_ms, trigger)
+        return sub.state == "loaded"
+
+    def _splice(self, sub: LazySubsystem, new_routes: List[BaseRoute]) -> None:
+        routes = self.app.router.routes
+        try:
+            idx = routes.index(sub.placeholder)
+        except ValueError:
+            idx = len(routes)
+            routes.insert(idx, sub.placeholder)
+        # Single slice assignment: concurrent readers see old or new list state
+        routes[idx:idx + 1] = list(new_routes)
+        self.app.openapi_schema = None
+
+    def ensure_all(self, trigger: str = "warmup") -> None:
+        for name in list(self._subsystems):
+            self.ensure(name, trigger=trigger)
+
+    def warm_in_background(self, delay_s: float = 0.0) -> None:
+        """Mount every pending subsystem from a daemon thread."""
+        task = "lazy_routers"
+        self.begin_task(task)
+
+        def _run() -> None:
+            if delay_s:
+                time.sleep(delay_s)
+            self._warm_started = time.time()
+            try:
+                self.ensure_all()
+            finally:
+                self._warm_finished = time.time()
+                self.end_task(task)
+
+        threading.Thread(target=_run, daemon=True, name="lazy-router-warmup").start()
+
+    # ------------------------------------------------------------------
+    # Warm-up task tracking
+    # ------------------------------------------------------------------
+
+    def begin_task(self, name: str) -> None:
+        with self._tasks_lock:
+            self._tasks[name] = {"state": "running", "started_at": time.time(), "elapsed_s": None, "error": ""}
+
+    def end_task(self, name: str, error: str = "") -> None:
+        with self._tasks_lock:
+            t = self._tasks.setdefault(name, {"started_at": time.time()})
+            t["state"] = "failed" if error else "done"
+            t["elapsed_s"] = round(time.time() - t["started_at"], 2)
+            t["error"] = error
+
+    async def track(self, name: str, coro) -> Any:
+        """Await *coro* while reporting it as a warm-up task."""
+        self.begin_task(name)
+        try:
+            result = await coro
+        except Exception as exc:  # noqa: BLE001 - warmups are best-effort
+            self.end_task(name, error=str(exc))
+            raise
+        self.end_task(name)
+        return result
+
+    # ------------------------------------------------------------------
+    # Readiness
+    # ------------------------------------------------------------------
+
+    def readiness(self) -> Dict[str, Any]:
+        subs = {n: s.summary() for n, s in self._subsystems.items()}
+        with self._tasks_lock:
+            tasks = {n: dict(t) for n, t in self._tasks.items()}
+        routers_done = all(s["state"] in ("loaded", "failed") for s in subs.values())
+        tasks_done = all(t["state"] != "running" for t in tasks.values())
+        warmed = routers_done and tasks_done
+        return {
+            "ok": True,
+            "status": "warmed" if warmed else "serving",
+            "warmed": warmed,
+            "uptime_s": round(time.time() - self._created, 1),
+            "routers": subs,
+            "tasks": tasks,
+        }
+
+
+class LazyMountMiddleware:
+    """ASGI middleware: mount a lazy subsystem before routing its first request."""
+
+    def __init__(self, app, mounter: LazyRouterMounter):
+        self.app = app
+        self.mounter = mounter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            path = scope.get("path", "")
+            for name in self.mounter.pending_for_path(path):
+                await asyncio.to_thread(self.mounter.ensure, name, f"request:{path}")
+        await self.app(scope, receive, send)
@@ -37,6 +37,7 @@ from .config import (
 )
 from .orchestrator import orchestrate, handle_request, clear_conversation_memory
 from .tracing import log_event, request_id_ctx
+from .session_cache import request_memo as auth_request_memo
 from .providers import provider_info
 from .storage import init_db, list_conversations, get_messages, delete_image_url, delete_conversation
 from .migrations import run_migrations
@@ -81,9 +82,6 @@ from .outpaint import router as outpaint_router
 from .capabilities import router as capabilities_router
 from .compute.routes import router as compute_router
 
-# Agentic AI module routes (additive — zero changes to existing code)
-from .agentic.routes import router as agentic_router
-
 # Topology 3: Agent-Controlled tool use routes (additive)
 from .agent_routes import router as agent_router
 
@@ -98,8 +96,7 @@ from .marketplace import marketplace_router
 # Community gallery proxy (Phase 3 — additive)
 from .community import router as community_router
 
-# User Profile & Memory (additive)
-from .profile import router as profile_router
+# User Memory (additive); User Profile routes are mounted lazily below
 from .user_memory import router as memory_router
 
 # Multi-User Accounts & Onboarding (additive)
@@ -123,6 +120,10 @@ from .multimodal import analyze_image, is_vision_intent, VISION_MODEL_PATTERNS
 # OpenAI-compatible endpoint (additive — exposes personas as /v1/chat/completions)
 from .openai_compat_endpoint import router as openai_compat_router
 
+# Lazy router mounting: optional subsystems are imported on first request
+# (or by the background warm phase right after startup) — see lazy_mount.py
+from .lazy_mount import LazyMountMiddleware, LazyRouterMounter
+
 # ── Access-log noise filter ──────────────────────────────────────────────────
 # The Interactive runtime polls GET /v1/interactive/play/sessions/{id}/pending
 # once per 1.5–5 s to pick up scene-render updates. Uvicorn logs every hit at
@@ -151,6 +152,9 @@ if _os.getenv("UVICORN_LOG_PENDING", "false").lower() != "true":
 
 app = FastAPI(title="HomePilot Orchestrator", version="2.1.0")
 
+_lazy = LazyRouterMounter(app)
+app.add_middleware(LazyMountMiddleware, mounter=_lazy)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS or ["http://localhost:3000"],
@@ -167,7 +171,9 @@ async def request_trace(request: Request, call_next):
     started = time.perf_counter()
     log_event("http.request.start", method=request.method, path=request.url.path)
     try:
-        response = await call_next(request)
+        # Request-scoped auth memo: each bearer token is validated once per request
+        with auth_request_memo():
+            response = await call_next(request)
         response.headers["X-Request-ID"] = request_id
         log_event(
             "http.request.end",
@@ -218,16 +224,23 @@ app.include_router(compute_admin_router)
 from .compute.stream_routes import router as compute_stream_router  # noqa: E402
 app.include_router(compute_stream_router)
 
-# Include Agentic AI routes (/v1/agentic/*)
-app.include_router(agentic_router)
+# Include Agentic AI routes (/v1/agentic/*) — lazy
+def _load_agentic_routers():
+    from .agentic.routes import router as agentic_router
+    return [agentic_router]
+
+
+_lazy.register("agentic", ["/v1/agentic"], _load_agentic_routers)
+
 
-# Include Teams routes (/v1/teams/*)
-from .teams.routes import router as teams_router
-app.include_router(teams_router)
+# Include Teams + Teams Bridge routes (/v1/teams/*, /v1/teams/bridge/*) — lazy
+def _load_teams_routers():
+    from .teams.routes import router as teams_router
+    from .teams.bridge_routes import router as teams_bridge_router
+    return [teams_router, teams_bridge_router]
 
-# Include Teams Bridge routes (/v1/teams/bridge/*)
-from .teams.bridge_routes import router as teams_bridge_router
-app.include_router(teams_bridge_router)
+
+_lazy.register("teams", ["/v1/teams"], _load_teams_routers)
 
 # Container log streaming (/api/spaces/<owner>/<repo>/logs/{run,build}) —
 # ADDITIVE, READ-ONLY. HF Spaces–style SSE log access for remote debugging,
@@ -288,15 +301,18 @@ except Exception as _vc_err:  # noqa: BLE001
 # ``INTERACTIVE_ENABLED=true``. See backend/app/interactive/__init__.py for
 # the service design. Same safety pattern as voice_call: import errors are
 # logged and swallowed so a broken interactive subsystem can't sink the app.
-try:
+# Mounted lazily: the package is ~0.3s of imports even when disabled.
+def _load_interactive_routers():
     from .interactive import load_config as _interactive_load_config
     from .interactive import build_router as _interactive_build_router
     _interactive_cfg = _interactive_load_config()
-    app.include_router(_interactive_build_router(_interactive_cfg))
+    router = _interactive_build_router(_interactive_cfg)
     if _interactive_cfg.enabled:
         print("[interactive] enabled — routes mounted under /v1/interactive")
-except Exception as _ix_err:  # noqa: BLE001
-    print(f"[interactive] DISABLED due to import error: {_ix_err}")
+    return [router]
+
+
+_lazy.register("interactive", ["/v1/interactive"], _load_interactive_routers)
 
 # --- OllaBridge Local (edition + provider sidecar) — ADDITIVE ----------------
 # GET /v1/edition + /v1/ollabridge/local/* — lets the frontend show the right
@@ -419,8 +435,13 @@ app.include_router(community_router)
 # Controlled at runtime via /settings/ollabridge toggle
 app.include_router(openai_compat_router)
 
-# Include User Profile routes (/v1/profile/*)
-app.include_router(profile_router)
+# Include User Profile routes (/v1/profile/*) — lazy
+def _load_profile_routers():
+    from .profile import router as profile_router
+    return [profile_router]
+
+
+_lazy.register("profile", ["/v1/profile"], _load_profile_routers)
 
 # Include User Memory routes (/v1/memory/*)
 app.include_router(memory_router)
@@ -748,9 +769,8 @@ def _viewpack_delete_file(file_url: str) -> bool:
         return False
     target = UPLOAD_PATH / rel
     try:
-        if target.is_file():
-            target.unlink()
-            return True
+        from . import blob_store
+        return blob_store.remove(target)
     except Exception as e:
         print(f"[VIEWPACK] Failed to delete {rel}: {e}")
     return False
@@ -1202,6 +1222,21 @@ def _startup() -> None:
     # Files mount
     _ensure_static_mount()
 
+    # ComfyUI capability snapshot — refreshed in the background so node /
+    # model pre-flight checks read from memory instead of /object_info.
+    if os.getenv("COMFY_CAPABILITY_REFRESH", "true").lower() in ("1", "true", "yes"):
+        try:
+            from .comfy import start_capability_refresh
+            start_capability_refresh()
+        except Exception as e:
+            print(f"Warning: ComfyUI capability refresh not started: {e}")
+
+    # Background warm phase: import + mount the lazy routers now that the
+    # server is accepting requests. HOMEPILOT_LAZY_WARMUP=false keeps them
+    # strictly on-demand (smallest footprint for scaled-to-zero replicas).
+    if os.getenv("HOMEPILOT_LAZY_WARMUP", "true").lower() in ("1", "true", "yes"):
+        _lazy.warm_in_background(delay_s=float(os.getenv("HOMEPILOT_LAZY_WARMUP_DELAY_S", "0") or 0))
+
     # Start MCP core + installed optional servers in the background.
     # This ensures core services are always on even if agentic-start.sh
     # didn't run or failed.  Runs as a background task so it doesn't
@@ -1217,7 +1252,9 @@ def _startup() -> None:
     # features. Set INTERACTIVE_WARMUP_IMAGE=false to skip.
     try:
         from .warmup import warm_image_model_on_startup  # late import
-        asyncio.get_event_loop().create_task(warm_image_model_on_startup())
+        asyncio.get_event_loop().create_task(
+            _lazy.track("image_warmup", warm_image_model_on_startup())
+        )
     except Exception as exc:  # noqa: BLE001
         logging.getLogger("homepilot.startup").warning(
             "Image warmup task couldn't start: %s", exc,
@@ -1365,6 +1402,24 @@ async def health() -> JSONResponse:
     return JSONResponse(status_code=200, content=status)
 
 
+@app.get("/health/ready")
+async def health_ready(require_warm: bool = Query(default=False)) -> JSONResponse:
+    """
+    Readiness probe.
+
+    ``status`` is ``serving`` as soon as the app accepts requests and
+    ``warmed`` once every lazily mounted router is imported and the
+    background warm-up tasks (image model, …) have finished. With
+    ``?require_warm=true`` a not-yet-warmed instance answers 503, for
+    load balancers that should only route to fully warmed replicas.
+    """
+    report = _lazy.readiness()
+    report["service"] = "homepilot-backend"
+    report["version"] = app.version
+    code = 503 if require_warm and not report["warmed"] else 200
+    return JSONResponse(status_code=code, content=report)
+
+
 @app.get("/health/detailed")
 async def health_detailed() -> JSONResponse:
     """
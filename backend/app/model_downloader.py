@@ -0,0 +1,529 @@
+"""
+In-process model downloader shared by the avatar installer and scripts/download.py.
+
+Replaces the per-file ``wget -c`` subprocesses with a native downloader that:
+
+- splits large files into byte ranges fetched over several connections
+  (when the server advertises ``Accept-Ranges``),
+- resumes from ``<dest>.part`` using a small ``<dest>.part.json`` sidecar
+  that records how far each range got,
+- hashes the file with SHA-256 while it downloads (the hasher follows the
+  contiguous prefix that is already on disk, so no second full read is
+  needed once the last range lands),
+- enforces a global connection limit and an optional global bandwidth cap
+  shared by every download running through the same instance,
+- reports structured :class:`DownloadEvent` objects to a callback so
+  callers can surface progress (see ``capabilities.get_avatar_download_status``).
+
+Only ``requests`` is required; everything else is stdlib.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import requests
+
+_logger = logging.getLogger("homepilot.model_downloader")
+
+DEFAULT_HEADERS = {"User-Agent": "HomePilot-ModelDownloader/1.0"}
+
+EventCallback = Callable[["DownloadEvent"], None]
+
+
+class DownloadError(Exception):
+    """Raised when a download cannot be completed or fails verification."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class DownloadEvent:
+    """Progress event emitted by :class:`ModelDownloader`.
+
+    ``kind`` is one of ``start``, ``progress``, ``verifying``, ``complete``
+    or ``error``.  ``total`` is 0 when the server did not report a size.
+    """
+
+    kind: str
+    key: str
+    url: str
+    dest: str
+    downloaded: int = 0
+    total: int = 0
+    speed_bps: float = 0.0
+    connections: int = 1
+    resumed_from: int = 0
+    error: Optional[str] = None
+    ts: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class DownloadJob:
+    """One file to fetch. ``key`` defaults to the destination file name."""
+
+    url: str
+    dest: Union[str, Path]
+    key: str = ""
+    sha256: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class DownloadResult:
+    key: str
+    dest: str
+    size: int
+    sha256: str
+    elapsed: float
+    resumed_from: int = 0
+    connections: int = 1
+
+
+class _TokenBucket:
+    """Thread-safe token bucket used as a global bandwidth cap."""
+
+    def __init__(self, rate_bps: int):
+        self.rate = float(rate_bps)
+        self._tokens = self.rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, n: int) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= n or self._tokens >= self.rate:
+                    self._tokens -= n
+                    return
+                wait = (n - self._tokens) / self.rate
+            time.sleep(min(wait, 0.25))
+
+
+class _Segment:
+    """Byte range ``[start, end]`` (inclusive); ``end`` is None when the size is unknown."""
+
+    __slots__ = ("start", "end", "pos")
+
+    def __init__(self, start: int, end: Optional[int], pos: Optional[int] = None):
+        self.start = start
+        self.end = end
+        self.pos = start if pos is None else pos
+
+    @property
+    def done(self) -> bool:
+        return self.end is not None and self.pos > self.end
+
+    def to_list(self) -> list:
+        return [self.start, self.end, self.pos]
+
+
+def _part_paths(dest: Path) -> tuple[Path, Path]:
+    return dest.with_name(dest.name + ".part"), dest.with_name(dest.name + ".part.json")
+
+
+def _parse_content_range_total(value: str) -> int:
+    # "bytes 0-0/12345" -> 12345 ("*" when unknown)
+    try:
+        total = value.rsplit("/", 1)[1].strip()
+        return int(total) if total != "*" else 0
+    except (IndexError, ValueError):
+        return 0
+
+
+class ModelDownloader:
+    """Parallel, resumable, verified HTTP downloader.
+
+    One instance should be shared process-wide so the connection and
+    bandwidth limits are global; use :func:`get_default_downloader`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_parallel_files: int = 3,
+        connections_per_file: int = 4,
+        max_connections: int = 8,
+        bandwidth_limit_bps: int = 0,
+        min_segment_size: int = 16 * 1024 * 1024,
+        chunk_size: int = 1024 * 1024,
+        timeout: float = 30.0,
+        retries: int = 3,
+        progress_interval: float = 0.5,
+    ):
+        self.max_parallel_files = max(1, max_parallel_files)
+        self.connections_per_file = max(1, connections_per_file)
+        self.min_segment_size = max(1, min_segment_size)
+        self.chunk_size = max(1024, chunk_size)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.progress_interval = progress_interval
+        self._conn_slots = threading.BoundedSemaphore(max(1, max_connections))
+        self._bucket = _TokenBucket(bandwidth_limit_bps) if bandwidth_limit_bps > 0 else None
+
+    # ----------------------------------------------------------------- public
+
+    def download(
+        self,
+        url: str,
+        dest: Union[str, Path],
+        *,
+        key: str = "",
+        sha256: str = "",
+        headers: Optional[Dict[str, str]] = None,
+        on_event: Optional[EventCallback] = None,
+    ) -> DownloadResult:
+        """Download ``url`` to ``dest``; raises :class:`DownloadError` on failure."""
+        dest = Path(dest)
+        key = key or dest.name
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        part, state_path = _part_paths(dest)
+        hdrs = {**DEFAULT_HEADERS, **(headers or {})}
+        emit = on_event or (lambda _e: None)
+        started = time.time()
+
+        def event(kind: str, **kw) -> DownloadEvent:
+            ev = DownloadEvent(kind=kind, key=key, url=url, dest=str(dest), **kw)
+            try:
+                emit(ev)
+            except Exception as e:  # never let a UI callback break a download
+                _logger.debug("download event callback failed: %s", e)
+            return ev
+
+        try:
+            with self._conn_slots:
+                probe = self._request(url, {**hdrs, "Range": "bytes=0-0"}, stream=True)
+            try:
+                final_url = probe.url or url
+                validator = probe.headers.get("ETag") or probe.headers.get("Last-Modified") or ""
+                if probe.status_code == 206:
+                    total = _parse_content_range_total(probe.headers.get("Content-Range", ""))
+                    ranged = total > 0
+                else:
+                    total = int(probe.headers.get("Content-Length") or 0)
+                    ranged = False
+                segments, resumed_from = self._plan(part, state_path, final_url, total, validator, ranged)
+                if not ranged:
+                    if probe.status_code == 206:
+                        # Partial reply without a usable size: fall back to a plain GET.
+                        probe.close()
+                        probe = self._request(final_url, hdrs)
+                    # The probe already returned the whole body — stream it directly.
+                    first_response: Optional[requests.Response] = probe
+                else:
+                    first_response = None
+                    probe.close()
+            except Exception:
+                probe.close()
+                raise
+
+            connections = len([s for s in segments if not s.done])
+            event("start", total=total, connections=max(1, connections), resumed_from=resumed_from)
+            digest = self._run_segments(
+                final_url, hdrs, part, state_path, segments, total, validator,
+                first_response, lambda **kw: event("progress", total=total, connections=max(1, connections),
+                                                   resumed_from=resumed_from, **kw),
+            )
+
+            size = part.stat().st_size
+            if total and size != total:
+                raise DownloadError(f"size mismatch: expected {total} bytes, got {size}")
+            event("verifying", downloaded=size, total=total or size, resumed_from=resumed_from)
+            if sha256 and digest.lower() != sha256.lower():
+                part.unlink(missing_ok=True)
+                state_path.unlink(missing_ok=True)
+                raise DownloadError(f"sha256 mismatch: expected {sha256.lower()}, got {digest}")
+
+            os.replace(part, dest)
+            state_path.unlink(missing_ok=True)
+            elapsed = time.time() - started
+            event("complete", downloaded=size, total=size, resumed_from=resumed_from,
+                  speed_bps=(size - resumed_from) / elapsed if elapsed > 0 else 0.0)
+            return DownloadResult(key=key, dest=str(dest), size=size, sha256=digest,
+                                  elapsed=round(elapsed, 2), resumed_from=resumed_from,
+                                  connections=max(1, connections))
+        except DownloadError as e:
+            event("error", error=str(e))
+            raise
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            event("error", error=str(e))
+            raise DownloadError(str(e), status_code=status) from e
+        except (requests.RequestException, OSError) as e:
+            event("error", error=str(e))
+            raise DownloadError(str(e)) from e
+
+    def download_many(
+        self,
+        jobs: Iterable[DownloadJob],
+        on_event: Optional[EventCallback] = None,
+    ) -> List[Union[DownloadResult, DownloadError]]:
+        """Download several files concurrently (bounded by ``max_parallel_files``).
+
+        Returns one entry per job, in input order: a :class:`DownloadResult`
+        or the :class:`DownloadError` that job failed with.
+        """
+        jobs = list(jobs)
+
+        def _one(job: DownloadJob) -> Union[DownloadResult, DownloadError]:
+            try:
+                return self.download(job.url, job.dest, key=job.key, sha256=job.sha256,
+                                     headers=job.headers, on_event=on_event)
+            except DownloadError as e:
+                return e
+
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel_files, len(jobs)),
+                                thread_name_prefix="model-dl") as pool:
+            return list(pool.map(_one, jobs))
+
+    # ---------------------------------------------------------------- helpers
+
+    def _request(self, url: str, headers: Dict[str, str], stream: bool = True) -> requests.Response:
+        resp = requests.get(url, headers=headers, stream=stream, timeout=self.timeout, allow_redirects=True)
+        if resp.status_code >= 400:
+            resp.close()
+        resp.raise_for_status()
+        return resp
+
+    def _plan(
+        self, part: Path, state_path: Path, url: str, total: int, validator: str, ranged: bool,
+    ) -> tuple[List[_Segment], int]:
+        """Work out which byte ranges still need fetching, reusing partial data."""
+        if ranged:
+            state = None
+            if state_path.exists() and part.exists():
+                try:
+                    state = json.loads(state_path.read_text())
+                except (OSError, ValueError):
+                    state = None
+            if state and state.get("total") == total and state.get("validator", "") == validator:
+                segments = [_Segment(s, e, p) for s, e, p in state["segments"]]
+                resumed = sum(s.pos - s.start for s in segments)
+                return segments, resumed
+            if part.exists() and not state_path.exists() and 0 < part.stat().st_size < total:
+                # Plain sequential partial (e.g. from an older wget/requests run).
+                # A full-size .part without state is never trusted: it may be
+                # a pre-sized file that was never filled.
+                have = part.stat().st_size
+                return self._split(have, total), have
+            part.unlink(missing_ok=True)
+            segments = self._split(0, total)
+            # State first: a crash after pre-sizing must not leave a
+            # full-size .part that looks like a finished sequential download.
+            self._save_state(state_path, url, total, validator, segments, threading.Lock())
+            with open(part, "wb") as f:
+                f.truncate(total)
+            return segments, 0
+
+        part.unlink(missing_ok=True)
+        state_path.unlink(missing_ok=True)
+        part.touch()
+        return [_Segment(0, total - 1 if total else None)], 0
+
+    def _split(self, offset: int, total: int) -> List[_Segment]:
+        remaining = total - offset
+        n = max(1, min(self.connections_per_file, -(-remaining // self.min_segment_size)))
+        step = -(-remaining // n)
+        segments = [_Segment(0, offset - 1, offset)] if offset else []
+        for i in range(n):
+            start = offset + i * step
+            end = min(total, start + step) - 1
+            if start <= end:
+                segments.append(_Segment(start, end))
+        return segments
+
+    def _save_state(self, state_path: Path, url: str, total: int, validator: str,
+                    segments: List[_Segment], lock: threading.Lock) -> None:
+        with lock:
+            payload = {"url": url, "total": total, "validator": validator,
+                       "segments": [s.to_list() for s in segments]}
+        tmp = state_path.with_name(state_path.name + ".tmp")
+        tmp.write_text(json.dumps(payload))
+        os.replace(tmp, state_path)
+
+    def _run_segments(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        part: Path,
+        state_path: Path,
+        segments: List[_Segment],
+        total: int,
+        validator: str,
+        first_response: Optional[requests.Response],
+        progress: Callable[..., DownloadEvent],
+    ) -> str:
+        lock = threading.Lock()
+        abort = threading.Event()
+        errors: List[BaseException] = []
+        ranged = first_response is None
+
+        def worker(seg: _Segment, resp: Optional[requests.Response]) -> None:
+            attempt = 0
+            while not seg.done and not abort.is_set():
+                try:
+                    if resp is None:
+                        with self._conn_slots:
+                            self._fetch_range(url, headers, part, seg, lock, abort)
+                    else:
+                        with self._conn_slots:
+                            self._fetch_stream(resp, part, seg, lock, abort)
+                        return
+                except (requests.RequestException, OSError) as e:
+                    attempt += 1
+                    if not ranged or attempt > self.retries:
+                        errors.append(e)
+                        abort.set()
+                        return
+                    _logger.warning("range %s-%s of %s failed (%s); retry %d/%d",
+                                    seg.pos, seg.end, part.name, e, attempt, self.retries)
+                    time.sleep(min(2 ** attempt * 0.25, 5.0))
+                except Exception as e:
+                    errors.append(e)
+                    abort.set()
+                    return
+
+        threads = [
+            threading.Thread(target=worker, args=(seg, first_response), daemon=True,
+                             name=f"model-dl-seg-{i}")
+            for i, seg in enumerate(s for s in segments if not s.done)
+        ]
+        for t in threads:
+            t.start()
+
+        hasher = hashlib.sha256()
+        hashed = 0
+        last_emit = time.monotonic()
+        last_bytes = self._downloaded(segments, lock)
+        with open(part, "rb", buffering=0) as reader:
+            while True:
+                alive = any(t.is_alive() for t in threads)
+                hashed = self._advance_hash(reader, hasher, hashed, self._frontier(segments, lock))
+                now = time.monotonic()
+                if now - last_emit >= self.progress_interval or not alive:
+                    done = self._downloaded(segments, lock)
+                    speed = (done - last_bytes) / (now - last_emit) if now > last_emit else 0.0
+                    progress(downloaded=done, speed_bps=speed)
+                    last_emit, last_bytes = now, done
+                    if ranged:
+                        self._save_state(state_path, url, total, validator, segments, lock)
+                if not alive:
+                    break
+                for t in threads:
+                    t.join(timeout=0.05)
+            if errors:
+                raise errors[0]
+            if abort.is_set():
+                raise DownloadError("download aborted")
+            hashed = self._advance_hash(reader, hasher, hashed, self._frontier(segments, lock))
+        return hasher.hexdigest()
+
+    def _fetch_range(self, url: str, headers: Dict[str, str], part: Path, seg: _Segment,
+                     lock: threading.Lock, abort: threading.Event) -> None:
+        resp = self._request(url, {**headers, "Range": f"bytes={seg.pos}-{seg.end}"})
+        try:
+            if resp.status_code != 206:
+                raise DownloadError(f"server ignored range request (HTTP {resp.status_code})")
+            self._fetch_stream(resp, part, seg, lock, abort)
+        finally:
+            resp.close()
+        if not seg.done:
+            raise requests.ConnectionError(f"range ended early at byte {seg.pos}")
+
+    def _fetch_stream(self, resp: requests.Response, part: Path, seg: _Segment,
+                      lock: threading.Lock, abort: threading.Event) -> None:
+        # Unbuffered so bytes are visible to the hashing reader once pos advances.
+        with open(part, "r+b", buffering=0) as f:
+            f.seek(seg.pos)
+            try:
+                for chunk in resp.iter_content(chunk_size=self.chunk_size):
+                    if abort.is_set():
+                        return
+                    if not chunk:
+                        continue
+                    if seg.end is not None:
+                        chunk = chunk[: seg.end + 1 - seg.pos]
+                    if self._bucket is not None:
+                        self._bucket.consume(len(chunk))
+                    f.write(chunk)
+                    with lock:
+                        seg.pos += len(chunk)
+                    if seg.done:
+                        return
+            finally:
+                if seg.end is None:
+                    with lock:
+                        seg.end = seg.pos - 1
+
+    @staticmethod
+    def _frontier(segments: List[_Segment], lock: threading.Lock) -> int:
+        """First byte offset not yet written (contiguous prefix length)."""
+        with lock:
+            for seg in segments:
+                if not seg.done:
+                    return seg.pos
+            return segments[-1].end + 1 if segments and segments[-1].end is not None else 0
+
+    @staticmethod
+    def _downloaded(segments: List[_Segment], lock: threading.Lock) -> int:
+        with lock:
+            return sum(s.pos - s.start for s in segments)
+
+    def _advance_hash(self, reader, hasher, hashed: int, frontier: int) -> int:
+        if frontier <= hashed:
+            return hashed
+        reader.seek(hashed)
+        while hashed < frontier:
+            data = reader.read(min(self.chunk_size, frontier - hashed))
+            if not data:
+                break
+            hasher.update(data)
+            hashed += len(data)
+        return hashed
+
+
+def verify_sha256(path: Union[str, Path], expected: str, chunk_size: int = 1024 * 1024) -> bool:
+    """Verify an already-downloaded file against an expected SHA-256."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest().lower() == expected.lower()
+
+
+_default_downloader: Optional[ModelDownloader] = None
+_default_lock = threading.Lock()
+
+
+def get_default_downloader() -> ModelDownloader:
+    """Process-wide downloader configured from MODEL_DOWNLOAD_* env vars."""
+    global _default_downloader
+    with _default_lock:
+        if _default_downloader is None:
+            _default_downloader = ModelDownloader(
+                max_parallel_files=int(os.getenv("MODEL_DOWNLOAD_PARALLEL_FILES", "3")),
+                connections_per_file=int(os.getenv("MODEL_DOWNLOAD_CONNECTIONS", "4")),
+                max_connections=int(os.getenv("MODEL_DOWNLOAD_MAX_CONNECTIONS", "8")),
+                bandwidth_limit_bps=int(os.getenv("MODEL_DOWNLOAD_MAX_BPS", "0")),
+            )
+        return _default_downloader
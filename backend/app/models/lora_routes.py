@@ -239,11 +239,22 @@ def _download_lora_file(lora_id: str, name: str, url: str, dest: Path, timeout:
         return {"id": lora_id, "name": name, "status": "error", "error": str(e)}
 
 
+def _invalidate_comfy_capabilities() -> None:
+    """LoRA set changed on disk — refresh the ComfyUI capability snapshot."""
+    try:
+        from ..comfy import invalidate_capabilities
+        invalidate_capabilities()
+    except Exception as e:
+        _logger.debug(f"Capability snapshot invalidation skipped: {e}")
+
+
 def _run_lora_download(lora_id: str, name: str, url: str, dest: Path, api_key: str = ""):
     """Background thread target: download one LoRA, then update shared state."""
     global _lora_download_state
 
     result = _download_lora_file(lora_id, name, url, dest, api_key=api_key)
+    if result.get("status") == "installed":
+        _invalidate_comfy_capabilities()
 
     with _lora_download_lock:
         _lora_download_state["results"] = [result]
@@ -378,6 +389,7 @@ async def delete_lora(lora_id: str):
     try:
         size = target.stat().st_size
         target.unlink()
+        _invalidate_comfy_capabilities()
         _logger.info(f"Deleted LoRA: {target} ({_fmt_bytes(size)})")
         return {
             "ok": True,
@@ -377,7 +377,8 @@ async def _chat_with_persona_project(
     # (wardrobe catalog, [show:Label] instructions, identity, rules)
     # so the LLM knows how to handle photo requests via external clients.
     projects_mod = _get_projects()
-    system_prompt = projects_mod.build_persona_context(project_id)
+    bundle = projects_mod.get_persona_context_bundle(project_id, project_data=project_data)
+    system_prompt = bundle.render() if bundle else ""
 
     if not system_prompt:
         # Fallback to minimal prompt if build_persona_context returns empty
@@ -4,14 +4,21 @@ Persona Runtime Manager — resolves v3 persona profiles at runtime.
 Additive module: does not modify any existing HomePilot code.
 Loads cognitive, embodiment, VR, voice, and relationship profiles
 from persona project data and presents a unified runtime config.
+
+``resolve_persona`` caches the resolved config per persona directory and
+revalidates it with one ``stat`` per profile file (mtime + size), so the
+JSON is only re-read after a profile actually changes.
 """
 from __future__ import annotations
 
+import copy
 import json
 import logging
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -255,20 +262,9 @@ def load_v3_profiles(persona_dir: Path) -> Dict[str, Any]:
     embodiment, vr_profile, voice, relationship.
     Missing files return None for that key.
     """
-    blueprint = persona_dir / "blueprint"
     result: Dict[str, Any] = {}
 
-    file_map = {
-        "persona_agent": blueprint / "persona_agent.json",
-        "manifest": persona_dir / "manifest.json",
-        "cognitive": blueprint / "cognitive_profile.json",
-        "embodiment": blueprint / "embodiment_profile.json",
-        "vr_profile": blueprint / "vr_profile.json",
-        "voice": blueprint / "voice_profile.json",
-        "relationship": blueprint / "relationship_model.json",
-    }
-
-    for key, path in file_map.items():
+    for key, path in _profile_files(persona_dir).items():
         if path.is_file():
             try:
                 with open(path) as f:
@@ -282,11 +278,74 @@ def load_v3_profiles(persona_dir: Path) -> Dict[str, Any]:
     return result
 
 
+def _profile_files(persona_dir: Path) -> Dict[str, Path]:
+    blueprint = persona_dir / "blueprint"
+    return {
+        "persona_agent": blueprint / "persona_agent.json",
+        "manifest": persona_dir / "manifest.json",
+        "cognitive": blueprint / "cognitive_profile.json",
+        "embodiment": blueprint / "embodiment_profile.json",
+        "vr_profile": blueprint / "vr_profile.json",
+        "voice": blueprint / "voice_profile.json",
+        "relationship": blueprint / "relationship_model.json",
+    }
+
+
+# ── Resolved-config cache (mtime invalidation) ────────────────────────
+
+_CACHE_MAX = 256
+_cache: "OrderedDict[str, Tuple[tuple, PersonaRuntimeConfig]]" = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _profile_signature(persona_dir: Path) -> tuple:
+    sig = []
+    for path in _profile_files(persona_dir).values():
+        try:
+            st = path.stat()
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
 def resolve_persona(persona_dir: Path) -> PersonaRuntimeConfig:
-    """Load and resolve a full PersonaRuntimeConfig from a persona directory."""
+    """Load and resolve a full PersonaRuntimeConfig from a persona directory.
+
+    Served from cache while no profile file has changed on disk; callers
+    get their own copy.
+    """
+    key = str(Path(persona_dir).resolve())
+    signature = _profile_signature(Path(persona_dir))
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return copy.deepcopy(entry[1])
+        _cache_stats["misses"] += 1
+
     profiles = load_v3_profiles(persona_dir)
     if not profiles.get("persona_agent") or not profiles.get("manifest"):
         raise FileNotFoundError(
             f"Missing persona_agent.json or manifest.json in {persona_dir}"
         )
-    return build_runtime_config(**profiles)
+    config = build_runtime_config(**profiles)
+
+    with _cache_lock:
+        _cache[key] = (signature, config)
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_MAX:
+            _cache.popitem(last=False)
+    return copy.deepcopy(config)
+
+
+def clear_persona_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def persona_cache_stats() -> Dict[str, int]:
+    with _cache_lock:
+        return {"entries": len(_cache), **_cache_stats}
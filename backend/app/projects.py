@@ -2,12 +2,16 @@
 Project memory system for HomePilot
 Provides scoped context for project-based conversations and project management.
 """
+import hashlib
 import json
 import os
+import threading
 import uuid
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from pydantic import BaseModel, Field
 
 # Imports from your existing structure
@@ -333,6 +337,7 @@ def delete_project(project_id: str) -> bool:
     # Delete from database
     del db[project_id]
     _save_projects_db(db)
+    invalidate_persona_context(project_id)
 
     # Delete knowledge base if RAG enabled
     if RAG_ENABLED:
@@ -397,6 +402,7 @@ def update_project(project_id: str, data: Dict[str, Any]) -> Optional[Dict[str,
 
     db[project_id] = project
     _save_projects_db(db)
+    invalidate_persona_context(project_id)
 
     return project
 
@@ -426,63 +432,273 @@ def _upload_root_path() -> Path:
     return p
 
 
+# path -> (parent dir mtime_ns, exists). Creating or deleting a file always
+# bumps its directory's mtime, so an answer stays valid until that changes.
+_file_check_memo: Dict[str, Tuple[int, bool]] = {}
+_file_check_lock = threading.Lock()
+_FILE_CHECK_MEMO_MAX = 8192
+
+
+def _dir_mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _file_urls_exist(urls: Iterable[str]) -> Dict[str, bool]:
+    """
+    Batched, memoized form of _file_url_exists.
+
+    Each parent directory is stat'ed once per call; files in a directory
+    whose mtime has not moved reuse their previous answer instead of being
+    stat'ed again.
+    """
+    out: Dict[str, bool] = {}
+    by_dir: Dict[str, List[Tuple[str, Path]]] = {}
+    root = _upload_root_path()
+    for url in urls:
+        if url in out:
+            continue
+        if not url:
+            out[url] = False
+            continue
+        # Extract the path portion after /files/
+        idx = url.find("/files/")
+        if idx < 0:
+            out[url] = True  # Not a /files/ URL — can't validate, assume OK
+            continue
+        rel = url[idx + len("/files/"):]
+        if not rel or ".." in rel:
+            out[url] = False
+            continue
+        path = root / rel
+        out[url] = False
+        by_dir.setdefault(str(path.parent), []).append((url, path))
+
+    with _file_check_lock:
+        for parent, items in by_dir.items():
+            mtime = _dir_mtime(parent)
+            if mtime is None:
+                continue  # folder is gone, so are the files
+            for url, path in items:
+                key = str(path)
+                hit = _file_check_memo.get(key)
+                if hit is not None and hit[0] == mtime:
+                    out[url] = hit[1]
+                    continue
+                exists = path.is_file()
+                if len(_file_check_memo) >= _FILE_CHECK_MEMO_MAX:
+                    _file_check_memo.clear()
+                _file_check_memo[key] = (mtime, exists)
+                out[url] = exists
+    return out
+
+
 def _file_url_exists(url: str) -> bool:
     """Check if a /files/ URL points to a file that actually exists on disk."""
-    if not url:
-        return False
-    # Extract the path portion after /files/
-    idx = url.find("/files/")
-    if idx < 0:
-        return True  # Not a /files/ URL — can't validate, assume OK
-    rel = url[idx + len("/files/"):]
-    if not rel or ".." in rel:
-        return False
-    return (_upload_root_path() / rel).is_file()
+    return _file_urls_exist([url])[url]
 
 
 # -------------------------------------------------------------------------
 # Persona context builder (reusable by agent_chat and project chat)
 # -------------------------------------------------------------------------
 
+# The prompt is the same for every turn until the project or its image files
+# change, so it is assembled once per (project_id, nsfw_mode) and cached as a
+# versioned bundle. Only the clock and the persona's age are filled in per
+# call. agent_chat, project chat, the OpenAI-compatible endpoint and Teams all
+# read from the same cache.
+
+_PERSONA_CONTEXT_CACHE_SIZE = int(os.getenv("PERSONA_CONTEXT_CACHE_SIZE", "128"))
+_NOW_SLOT = "\x00now\x00"
+_AGE_SLOT = "\x00age\x00"
+
+# Map persona_class to human-readable labels
+_CLASS_LABELS = {
+    "secretary": "Secretary",
+    "assistant": "Personal Assistant",
+    "companion": "Companion",
+    "girlfriend": "Romantic Partner",
+    "partner": "Romantic Partner",
+    "custom": "Custom Persona",
+}
+
+# Project fields the persona prompt is built from (the version hashes these)
+_PERSONA_FIELDS = (
+    "name", "project_type", "description", "instructions", "created_at",
+    "updated_at", "persona_agent", "persona_appearance", "agentic",
+)
+
+
+@dataclass(frozen=True)
+class PersonaContextBundle:
+    """Precomputed persona prompt plus the pieces other prompt builders reuse.
+
+    Treat the dict/list fields as read-only; they are shared between callers.
+    """
+    project_id: str
+    nsfw_mode: bool
+    version: str
+    photo_catalog: List[Dict[str, Any]]
+    default_photo_url: str
+    template: str
+    created_at: float
+    watch_dirs: Tuple[str, ...]
+    dir_mtimes: Tuple[Optional[int], ...]
+
+    def render(self, now: Optional[float] = None) -> str:
+        """Fill in the current time and persona age."""
+        from datetime import datetime
+        now = time.time() if now is None else now
+        time_context = datetime.fromtimestamp(now).strftime("%A, %B %d %Y, %I:%M %p")
+        age_days = max(0, int((now - self.created_at) / 86400)) if self.created_at else 0
+        age_str = "brand new (just created today)" if age_days == 0 else f"{age_days} day{'s' if age_days != 1 else ''} old"
+        return self.template.replace(_NOW_SLOT, time_context).replace(_AGE_SLOT, age_str)
+
+
+_persona_ctx_cache: "OrderedDict[Tuple[str, bool], PersonaContextBundle]" = OrderedDict()
+_persona_ctx_lock = threading.Lock()
+_persona_ctx_stats = {"hits": 0, "misses": 0}
+
+
+def persona_identity(project_data: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Raw identity fields of a persona project, None where unset.
+
+    Callers apply their own defaults: the chat prompt and the Teams prompt
+    have always treated missing and empty values differently.
+    """
+    persona_agent = project_data.get("persona_agent") or {}
+    appearance = project_data.get("persona_appearance") or {}
+    return {
+        "name": project_data.get("name"),
+        "label": persona_agent.get("label"),
+        "role": persona_agent.get("role"),
+        "persona_class": persona_agent.get("persona_class"),
+        "tone": (persona_agent.get("response_style") or {}).get("tone"),
+        "style": appearance.get("style_preset"),
+        "system_prompt": persona_agent.get("system_prompt"),
+        "goal": (project_data.get("agentic") or {}).get("goal"),
+        "description": project_data.get("description"),
+        "instructions": project_data.get("instructions"),
+    }
+
+
+def _given(value: Optional[str], default: str) -> str:
+    """``dict.get(key, default)`` semantics over a persona_identity field."""
+    return default if value is None else value
+
+
+def _persona_version(project_data: Dict[str, Any]) -> str:
+    relevant = {k: project_data.get(k) for k in _PERSONA_FIELDS}
+    blob = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def get_persona_context_bundle(
+    project_id: str,
+    *,
+    nsfw_mode: bool = False,
+    project_data: Optional[Dict[str, Any]] = None,
+) -> Optional[PersonaContextBundle]:
+    """
+    Return the cached persona bundle for a project, rebuilding it if stale.
+
+    A bundle is reused while the persona fields of the project hash the same
+    and none of the folders holding its images have changed. Pass
+    ``project_data`` when the caller already has the record loaded.
+    Returns None for non-persona projects.
+    """
+    if project_data is None:
+        project_data = get_project_by_id(project_id)
+    key = (project_id, bool(nsfw_mode))
+    if (
+        not project_data
+        or project_data.get("project_type") != "persona"
+        or not project_data.get("persona_agent")
+    ):
+        with _persona_ctx_lock:
+            _persona_ctx_cache.pop(key, None)
+        return None
+
+    version = _persona_version(project_data)
+    with _persona_ctx_lock:
+        bundle = _persona_ctx_cache.get(key)
+    if (
+        bundle is not None
+        and bundle.version == version
+        and tuple(_dir_mtime(d) for d in bundle.watch_dirs) == bundle.dir_mtimes
+    ):
+        with _persona_ctx_lock:
+            _persona_ctx_stats["hits"] += 1
+            if key in _persona_ctx_cache:
+                _persona_ctx_cache.move_to_end(key)
+        return bundle
+
+    bundle = _build_persona_bundle(project_id, project_data, bool(nsfw_mode), version)
+    with _persona_ctx_lock:
+        _persona_ctx_stats["misses"] += 1
+        _persona_ctx_cache[key] = bundle
+        _persona_ctx_cache.move_to_end(key)
+        while len(_persona_ctx_cache) > _PERSONA_CONTEXT_CACHE_SIZE:
+            _persona_ctx_cache.popitem(last=False)
+    return bundle
+
+
+def invalidate_persona_context(project_id: Optional[str] = None) -> None:
+    """Drop cached bundles for one project, or all of them."""
+    with _persona_ctx_lock:
+        if project_id is None:
+            _persona_ctx_cache.clear()
+            return
+        for key in [k for k in _persona_ctx_cache if k[0] == project_id]:
+            del _persona_ctx_cache[key]
+
+
+def persona_context_cache_stats() -> Dict[str, int]:
+    with _persona_ctx_lock:
+        return {"entries": len(_persona_ctx_cache), **_persona_ctx_stats}
+
+
+def _reset_for_tests() -> None:
+    with _persona_ctx_lock:
+        _persona_ctx_cache.clear()
+        _persona_ctx_stats.update(hits=0, misses=0)
+    with _file_check_lock:
+        _file_check_memo.clear()
+
+
 def build_persona_context(project_id: str, *, nsfw_mode: bool = False) -> str:
     """
     Build the full persona self-awareness prompt (identity, photo catalog,
     persona rules) for a given project.  Returns empty string if the project
     is not a persona project or has no persona_agent data.
 
-    This function is intentionally stateless so it can be called from both
-    the /chat orchestrator and the /v1/agent/chat system.
+    Served from the persona bundle cache, so it can be called on every
+    turn from both the /chat orchestrator and the /v1/agent/chat system.
     """
-    project_data = get_project_by_id(project_id)
-    if not project_data:
-        return ""
-    if project_data.get("project_type") != "persona":
-        return ""
+    bundle = get_persona_context_bundle(project_id, nsfw_mode=nsfw_mode)
+    return bundle.render() if bundle else ""
 
-    persona_agent_data = project_data.get("persona_agent")
+
+def _build_persona_bundle(
+    project_id: str,
+    project_data: Dict[str, Any],
+    nsfw_mode: bool,
+    version: str,
+) -> PersonaContextBundle:
+    persona_agent_data = project_data.get("persona_agent") or {}
     persona_appearance_data = project_data.get("persona_appearance")
-    agentic_data = project_data.get("agentic") or {}
-    if not persona_agent_data:
-        return ""
-
-    name = project_data.get("name", "Persona")
-    p_label = persona_agent_data.get("label", name)
-    p_role = persona_agent_data.get("role", "")
-    p_tone = (persona_agent_data.get("response_style") or {}).get("tone", "warm")
-    p_style = (persona_appearance_data or {}).get("style_preset", "")
-    p_system = persona_agent_data.get("system_prompt", "")
-    p_class = persona_agent_data.get("persona_class", "custom")
-    p_goal = agentic_data.get("goal", "")
-
-    # Map persona_class to human-readable labels
-    _CLASS_LABELS = {
-        "secretary": "Secretary",
-        "assistant": "Personal Assistant",
-        "companion": "Companion",
-        "girlfriend": "Romantic Partner",
-        "partner": "Romantic Partner",
-        "custom": "Custom Persona",
-    }
+    identity = persona_identity(project_data)
+
+    name = _given(identity["name"], "Persona")
+    p_label = _given(identity["label"], name)
+    p_role = _given(identity["role"], "")
+    p_tone = _given(identity["tone"], "warm")
+    p_style = _given(identity["style"], "")
+    p_system = _given(identity["system_prompt"], "")
+    p_class = _given(identity["persona_class"], "custom")
+    p_goal = _given(identity["goal"], "")
     p_class_label = _CLASS_LABELS.get(p_class, p_class.replace("_", " ").title())
 
     _safety = persona_agent_data.get("safety") or {}
@@ -509,6 +725,18 @@ def build_persona_context(project_id: str, *, nsfw_mode: bool = False) -> str:
     _committed_file = pap.get("selected_filename", "")
     _committed_url = _abs_img_url(f"/files/{_committed_file}") if _committed_file else ""
 
+    # Check every referenced file in one batch: one stat per folder, with
+    # per-file answers memoized while the folder is unchanged.
+    _candidates = [_committed_url]
+    for s in (pap.get("sets") or []):
+        _candidates += [_abs_img_url(img.get("url", "")) for img in (s.get("images") or [])]
+    for outfit in (pap.get("outfits") or []):
+        _candidates += [_abs_img_url(img.get("url", "")) for img in (outfit.get("images") or [])]
+        if isinstance(outfit.get("view_pack"), dict):
+            _candidates += [_abs_img_url(u) for u in outfit["view_pack"].values() if isinstance(u, str)]
+    _candidates = [u for u in _candidates if u]
+    _exists = _file_urls_exist(_candidates)
+
     # Track label counts so duplicates get numbered: Lingerie, Lingerie 2, …
     # This must use the same numbering as _build_label_index in media_resolver.
     _label_counts: dict[str, int] = {}
@@ -529,7 +757,7 @@ def build_persona_context(project_id: str, *, nsfw_mode: bool = False) -> str:
             if is_default and _committed_url:
                 full_url = _committed_url
             # Skip images whose files no longer exist on disk
-            if not _file_url_exists(full_url):
+            if not _exists.get(full_url, False):
                 continue
             if is_default:
                 default_photo_url = full_url
@@ -558,7 +786,7 @@ def build_persona_context(project_id: str, *, nsfw_mode: bool = False) -> str:
             if is_default and _committed_url:
                 full_url = _committed_url
             # Skip images whose files no longer exist on disk
-            if not _file_url_exists(full_url):
+            if not _exists.get(full_url, False):
                 continue
             if is_default:
                 default_photo_url = full_url
@@ -579,7 +807,7 @@ def build_persona_context(project_id: str, *, nsfw_mode: bool = False) -> str:
                 if not vp_url:
                     continue
                 full_vp_url = _abs_img_url(vp_url)
-                if not _file_url_exists(full_vp_url):
+                if not _exists.get(full_vp_url, False):
                     continue
                 _vp_angles.append(angle)
             if _vp_angles:
@@ -645,13 +873,9 @@ def build_persona_context(project_id: str, *, nsfw_mode: bool = False) -> str:
 
     catalog_text = "\n".join(catalog_lines) if catalog_lines else "  (no outfits available yet)"
 
-    from datetime import datetime
-    now = datetime.now()
-    time_context = now.strftime("%A, %B %d %Y, %I:%M %p")
-
-    created_ts = project_data.get("created_at", 0)
-    age_days = max(0, int((time.time() - created_ts) / 86400)) if created_ts else 0
-    age_str = "brand new (just created today)" if age_days == 0 else f"{age_days} day{'s' if age_days != 1 else ''} old"
+    # Filled in by PersonaContextBundle.render() on every call
+    time_context = _NOW_SLOT
+    age_str = _AGE_SLOT
 
     hint = f"""
 PERSONA MODE — ACTIVE
@@ -784,7 +1008,23 @@ INTIMATE ENGAGEMENT RULES:
 12. NEVER output long essays or bullet lists. Keep responses SHORT (1-3 sentences), direct, and in character.
 """
 
-    return hint
+    # Folders whose mtime invalidates the bundle (files added or removed)
+    _root = _upload_root_path()
+    watch_dirs = tuple(sorted({
+        str((_root / u[u.find("/files/") + len("/files/"):]).parent)
+        for u in _candidates if "/files/" in u
+    }))
+    return PersonaContextBundle(
+        project_id=project_id,
+        nsfw_mode=nsfw_mode,
+        version=version,
+        photo_catalog=photo_catalog,
+        default_photo_url=default_photo_url,
+        template=hint,
+        created_at=project_data.get("created_at", 0) or 0,
+        watch_dirs=watch_dirs,
+        dir_mtimes=tuple(_dir_mtime(d) for d in watch_dirs),
+    )
 
 
 # -------------------------------------------------------------------------
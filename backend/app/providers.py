@@ -136,8 +136,13 @@ def get_comfy_object_info(base_url: str = None) -> dict:
     Fetch ComfyUI's /object_info to check which nodes are available.
     Returns dict of node_name -> node_info, or empty dict on failure.
     """
+    if base_url is None or base_url.rstrip("/") == COMFY_BASE_URL.rstrip("/"):
+        # Default ComfyUI: serve from the in-memory capability snapshot
+        from .comfy import get_capability_snapshot
+        return get_capability_snapshot().object_info or {}
+
     import requests
-    url = (base_url or COMFY_BASE_URL).rstrip("/")
+    url = base_url.rstrip("/")
     try:
         r = requests.get(f"{url}/object_info", timeout=5)
         r.raise_for_status()
@@ -0,0 +1,235 @@
+"""
+Session token cache for users._validate_token.
+
+Every authenticated request (and every ``<img src="/files/...">`` in a
+gallery) validates its bearer token with a users ⋈ user_sessions join on a
+fresh SQLite connection.  This module keeps validated tokens in memory:
+
+- Bounded LRU keyed by SHA-256(token) — raw tokens are never stored.
+- Each entry expires at min(now + TTL, session expires_at), so a cached
+  token never outlives its session.
+- Revocation is synchronous in-process (``invalidate_token`` /
+  ``invalidate_user``) and fans out to other worker processes through an
+  epoch marker file next to the DB: revoking bumps its mtime and every
+  process drops its cache when it sees a new epoch (one ``stat`` per
+  lookup instead of a DB join).
+- A request-scoped memo (``request_memo()``) makes repeated validations of
+  the same token within one request free, even across dependencies.
+
+Config:
+  AUTH_TOKEN_CACHE_TTL_S     entry lifetime in seconds (default 60, 0 = off)
+  AUTH_TOKEN_CACHE_MAX       max cached tokens (default 4096)
+"""
+from __future__ import annotations
+
+import contextvars
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+MISS = object()
+
+_request_memo: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    "homepilot_auth_request_memo", default=None,
+)
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def parse_expiry(expires_at: Any) -> Optional[float]:
+    """user_sessions.expires_at ('YYYY-MM-DD HH:MM:SS', UTC) → epoch seconds."""
+    if not expires_at:
+        return None
+    try:
+        dt = datetime.strptime(str(expires_at)[:19], "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+class SessionTokenCache:
+    """Bounded, expiry-aware cache of token → user dict."""
+
+    def __init__(self, ttl_s: float = 60.0, max_entries: int = 4096):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch_path = ""
+        self._epoch_seen: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_s > 0 and self.max_entries > 0
+
+    # ------------------------------------------------------------------
+    # Cross-process revocation epoch
+    # ------------------------------------------------------------------
+
+    def bind(self, db_path: str) -> None:
+        """Attach to a DB; switching DBs drops everything cached for the old one."""
+        epoch_path = f"{db_path}.auth-epoch"
+        if epoch_path != self._epoch_path:
+            with self._lock:
+                self._entries.clear()
+                self._epoch_path = epoch_path
+                self._epoch_seen = self._read_epoch()
+
+    def _read_epoch(self) -> int:
+        try:
+            return os.stat(self._epoch_path).st_mtime_ns
+        except OSError:
+            return 0
+
+    def _check_epoch(self) -> None:
+        if not self._epoch_path:
+            return
+        epoch = self._read_epoch()
+        if epoch != self._epoch_seen:
+            with self._lock:
+                self._entries.clear()
+                self._epoch_seen = epoch
+
+    def _bump_epoch(self) -> None:
+        if not self._epoch_path:
+            return
+        try:
+            with open(self._epoch_path, "a"):
+                pass
+            now = time.time_ns()
+            os.utime(self._epoch_path, ns=(now, now))
+            self._epoch_seen = self._read_epoch()
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(self, token: str) -> Any:
+        """Return a copy of the cached user dict, or ``MISS``."""
+        if not self.enabled:
+            return MISS
+        self._check_epoch()
+        key = token_key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS
+            expires, _user_id, user = entry
+            if expires <= now:
+                del self._entries[key]
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(user)
+
+    def put(self, token: str, user: Dict[str, Any], session_expires_at: Any = None) -> None:
+        if not self.enabled:
+            return
+        expires = time.time() + self.ttl_s
+        session_exp = parse_expiry(session_expires_at)
+        if session_exp is not None:
+            expires = min(expires, session_exp)
+        with self._lock:
+            self._entries[token_key(token)] = (expires, str(user.get("id", "")), copy.deepcopy(user))
+            self._entries.move_to_end(token_key(token))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate_token(self, token: str) -> None:
+        key = token_key(token)
+        with self._lock:
+            self._entries.pop(key, None)
+        _forget_in_request_memo(key)
+        self._bump_epoch()
+
+    def invalidate_user(self, user_id: str, keep_token: str = "") -> None:
+        """Drop every cached session of *user_id* (except *keep_token*)."""
+        keep = token_key(keep_token) if keep_token else ""
+        with self._lock:
+            for key in [k for k, (_, uid, _) in self._entries.items() if uid == user_id and k != keep]:
+                del self._entries[key]
+        memo = _request_memo.get()
+        if memo:
+            for key in [k for k, v in memo.items() if v and v.get("id") == user_id and k != keep]:
+                memo.pop(key, None)
+        self._bump_epoch()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl_s": self.ttl_s,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Request-scoped memo
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def request_memo() -> Iterator[Dict[str, Any]]:
+    """Scope within which each token is validated at most once."""
+    memo: Dict[str, Any] = {}
+    tok = _request_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _request_memo.reset(tok)
+
+
+def memo_get(token: str) -> Any:
+    memo = _request_memo.get()
+    if memo is None:
+        return MISS
+    user = memo.get(token_key(token), MISS)
+    return MISS if user is MISS else copy.deepcopy(user)
+
+
+def memo_put(token: str, user: Optional[Dict[str, Any]]) -> None:
+    memo = _request_memo.get()
+    if memo is not None:
+        memo[token_key(token)] = copy.deepcopy(user)
+
+
+def _forget_in_request_memo(key: str) -> None:
+    memo = _request_memo.get()
+    if memo:
+        memo.pop(key, None)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+token_cache = SessionTokenCache(
+    ttl_s=_env_float("AUTH_TOKEN_CACHE_TTL_S", 60.0),
+    max_entries=int(_env_float("AUTH_TOKEN_CACHE_MAX", 4096)),
+)
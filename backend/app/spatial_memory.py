@@ -15,26 +15,54 @@ Storage model:
   │ spatial_trace  (append-only event log)               │
   │  trace_id, seq, timestamp, kind, name, data_json     │
   ├──────────────────────────────────────────────────────┤
+  │ spatial_track  (positional samples, columnar blocks) │
+  │  trace_id, kind, name, start_ts, end_ts, samples     │
+  ├──────────────────────────────────────────────────────┤
   │ spatial_episode (consolidated summaries)              │
   │  episode_id, persona_id, start_ts, end_ts,           │
   │  summary, tags, activation, importance                │
+  ├──────────────────────────────────────────────────────┤
+  │ spatial_watermark (consolidation progress)           │
+  │  persona_id, trace_row, track_row, open episode      │
   └──────────────────────────────────────────────────────┘
 
-Episode consolidation runs lazily: when new traces arrive, if the oldest
-un-consolidated trace is >5 minutes old, a consolidation pass runs.
+Ingestion path: ``ingest_batch`` only appends to a bounded in-memory buffer.
+A background writer (one per database) drains it every
+``flush_interval_s`` — sooner once ``flush_batch`` events are pending — in
+one transaction. Events whose data is just a position (plus optional
+``rotation_y_deg``) are packed into binary column blocks, one block per
+(trace, kind, name) per flush, instead of one JSON row each. When the
+buffer is full the caller flushes inline, so bursts slow down instead of
+dropping events.
+
+Consolidation is incremental: a per-persona watermark records the last
+trace row and track block already segmented, plus the episode still open,
+so each pass only reads new events. An episode closes once no event
+arrives for ``episode_gap_s``.
+
+Retention: positional blocks older than ``raw_retention_s`` are
+downsampled to one averaged sample per ``downsample_s``; everything older
+than ``trace_retention_s`` is deleted. Episodes are kept.
 """
 from __future__ import annotations
 
+import atexit
 import hashlib
 import json
+import logging
 import math
 import sqlite3
+import sys
+import threading
 import time
+from array import array
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from .storage import _get_db_path
 
+_logger = logging.getLogger("homepilot.spatial_memory")
+
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -59,9 +87,19 @@ class SpatialConfig:
     # Max data_json chars stored per trace event.
     max_data_chars: int = 2000
 
-    # Maintenance throttle.
+    # Maintenance throttle (consolidation + retention, on the writer thread).
     maintenance_interval: float = 60.0
 
+    # Ingestion buffer: events held in memory before the writer flushes.
+    buffer_max_events: int = 50_000
+    flush_batch: int = 2_000
+    flush_interval_s: float = 0.5
+
+    # Retention: full-rate positional samples, then downsampled, then gone.
+    raw_retention_s: float = 24 * 3600.0
+    downsample_s: float = 1.0
+    trace_retention_s: float = 30 * 24 * 3600.0
+
 
 _DEFAULT_CFG = SpatialConfig()
 
@@ -111,6 +149,22 @@ CREATE INDEX IF NOT EXISTS idx_spatial_trace_persona
 CREATE INDEX IF NOT EXISTS idx_spatial_trace_kind
     ON spatial_trace(kind);
 
+CREATE TABLE IF NOT EXISTS spatial_track (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    persona_id    TEXT    NOT NULL,
+    trace_id      TEXT    NOT NULL,
+    kind          TEXT    NOT NULL,
+    name          TEXT    NOT NULL,
+    start_ts      REAL    NOT NULL,
+    end_ts        REAL    NOT NULL,
+    sample_count  INTEGER NOT NULL,
+    resolution_s  REAL    NOT NULL DEFAULT 0,
+    samples       BLOB    NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_spatial_track_persona
+    ON spatial_track(persona_id, end_ts);
+
 CREATE TABLE IF NOT EXISTS spatial_episode (
     episode_id    TEXT    PRIMARY KEY,
     persona_id    TEXT    NOT NULL,
@@ -127,6 +181,13 @@ CREATE TABLE IF NOT EXISTS spatial_episode (
 
 CREATE INDEX IF NOT EXISTS idx_spatial_episode_persona
     ON spatial_episode(persona_id, activation DESC);
+
+CREATE TABLE IF NOT EXISTS spatial_watermark (
+    persona_id    TEXT    PRIMARY KEY,
+    trace_row     INTEGER NOT NULL DEFAULT 0,
+    track_row     INTEGER NOT NULL DEFAULT 0,
+    open_episode  TEXT    NOT NULL DEFAULT ''
+);
 """
 
 
@@ -135,6 +196,512 @@ def _ensure_tables(conn: sqlite3.Connection) -> None:
     conn.executescript(_SCHEMA_SQL)
 
 
+# ---------------------------------------------------------------------------
+# Columnar sample blocks
+# ---------------------------------------------------------------------------
+
+# Column layout of a spatial_track blob, one 64-bit array per column (so
+# values read back exactly as sent):
+#   ts (server time), seq, elapsed_ms, x, y, z, rotation_y_deg,
+# followed by the client timestamps verbatim as a UTF-8 JSON list.
+# Axes and rotation the client did not send are NaN and read back as absent.
+_COLUMNS = (("ts", "d"), ("seq", "q"), ("elapsed_ms", "d"),
+            ("x", "d"), ("y", "d"), ("z", "d"), ("yaw", "d"))
+_AXES = ("x", "y", "z")
+_POSITION_KEYS = {"position", "rotation_y_deg"}
+_NAN = float("nan")
+
+
+_SEQ_RANGE = range(-(1 << 63), 1 << 63)
+
+
+def _as_seq(value: Any) -> int:
+    """Client ``seq`` as a 64-bit int (``"2"`` → 2); anything else becomes 0."""
+    try:
+        seq = int(value or 0)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+    return seq if seq in _SEQ_RANGE else 0
+
+
+def _as_ms(value: Any) -> float:
+    """Client ``elapsed_ms`` as a finite number; ints stay ints while a float holds them exactly."""
+    if isinstance(value, int) and not isinstance(value, bool) and abs(value) <= 1 << 53:
+        return value
+    try:
+        ms = float(value or 0)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+    return ms if math.isfinite(ms) else 0
+
+
+def _new_columns() -> Dict[str, list]:
+    cols: Dict[str, list] = {c: [] for c, _ in _COLUMNS}
+    cols["timestamp"] = []
+    return cols
+
+
+def _pack(cols: Dict[str, list]) -> bytes:
+    parts = []
+    for name, code in _COLUMNS:
+        arr = array(code, cols[name])
+        if sys.byteorder == "big":
+            arr.byteswap()
+        parts.append(arr.tobytes())
+    parts.append(json.dumps(cols["timestamp"]).encode("utf-8"))
+    return b"".join(parts)
+
+
+def _unpack(blob: bytes, n: int, only: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+    cols: Dict[str, Any] = {}
+    offset = 0
+    for name, code in _COLUMNS:
+        arr = array(code)
+        size = arr.itemsize * n
+        if only is None or name in only:
+            arr.frombytes(blob[offset:offset + size])
+            if sys.byteorder == "big":
+                arr.byteswap()
+            cols[name] = arr
+        offset += size
+    if only is None or "timestamp" in only:
+        cols["timestamp"] = json.loads(blob[offset:].decode("utf-8"))
+    return cols
+
+
+def _position_of(data: Any) -> Optional[Tuple[float, float, float, float]]:
+    """(x, y, z, yaw) if ``data`` is a bare positional sample, else None; NaN marks a missing value."""
+    if not isinstance(data, dict) or "position" not in data or not set(data) <= _POSITION_KEYS:
+        return None
+    pos = data["position"]
+    if not isinstance(pos, dict) or not set(pos) <= set(_AXES):
+        return None
+    try:
+        x, y, z, yaw = (_NAN if v is None else float(v)
+                        for v in (pos.get("x"), pos.get("y"), pos.get("z"), data.get("rotation_y_deg")))
+    except (TypeError, ValueError):
+        return None
+    return x, y, z, yaw
+
+
+# ---------------------------------------------------------------------------
+# Episode aggregation
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _OpenEpisode:
+    """Running aggregate of an episode that may still receive events."""
+
+    start_ts: float
+    end_ts: float
+    count: int = 0
+    kinds: Dict[str, int] = field(default_factory=dict)
+    tags: List[str] = field(default_factory=list)
+
+    def add(self, ts: float, kind: str, name: str) -> None:
+        self.start_ts = min(self.start_ts, ts)
+        self.end_ts = max(self.end_ts, ts)
+        self.count += 1
+        self.kinds[kind] = self.kinds.get(kind, 0) + 1
+        for tag in (kind, name.split(".")[0] if "." in name else None):
+            if tag is not None and tag not in self.tags:
+                self.tags.append(tag)
+
+    def to_json(self) -> str:
+        return json.dumps({"start_ts": self.start_ts, "end_ts": self.end_ts, "count": self.count,
+                           "kinds": self.kinds, "tags": self.tags})
+
+    @classmethod
+    def from_json(cls, raw: str) -> Optional["_OpenEpisode"]:
+        return cls(**json.loads(raw)) if raw else None
+
+
+def _summarize(ep: _OpenEpisode) -> str:
+    """Build a human-readable summary of an episode."""
+    parts = [f"{k}×{count}" for k, count in sorted(ep.kinds.items(), key=lambda x: -x[1])]
+    duration_s = ep.end_ts - ep.start_ts
+    duration_label = (
+        f"{int(duration_s)}s" if duration_s < 60
+        else f"{duration_s / 60:.1f}min"
+    )
+    return f"Episode ({duration_label}): {', '.join(parts)}"
+
+
+def _importance(ep: _OpenEpisode) -> float:
+    """Score episode importance (0..1) based on event diversity and count."""
+    # More diverse events = more important interaction
+    diversity = min(len(ep.kinds) / 5.0, 1.0)
+    # More events = more substantial
+    volume = min(ep.count / 20.0, 1.0)
+    return round(0.6 * diversity + 0.4 * volume, 3)
+
+
+# ---------------------------------------------------------------------------
+# Trace store (one per database: buffer, writer thread, connection)
+# ---------------------------------------------------------------------------
+
+# Buffered event: persona_id, trace_id, seq, timestamp, elapsed_ms, kind, name, data, ts
+_Pending = Tuple[str, str, int, str, float, str, str, Any, float]
+
+# Raw blocks downsampled per retention pass (keeps transactions short).
+_DOWNSAMPLE_BATCH = 500
+# Samples per downsampled block.
+_MAX_BLOCK_SAMPLES = 65_536
+
+
+class _TraceStore:
+    def __init__(self, db_path: str, cfg: SpatialConfig) -> None:
+        self.db_path = db_path
+        self._cfg = cfg
+        self._lock = threading.Lock()          # connection
+        self._flush_lock = threading.Lock()    # one drain at a time
+        self._buf_lock = threading.Lock()
+        self._pending: List[_Pending] = []
+        self._personas: Dict[str, SpatialConfig] = {}
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        _ensure_tables(self._db)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._last_maintenance = _now()
+        self._thread = threading.Thread(target=self._run, name="spatial-trace-writer", daemon=True)
+        self._thread.start()
+
+    # ── Buffer ───────────────────────────────────────────────────────
+
+    def register(self, persona_id: str, cfg: SpatialConfig) -> None:
+        self._personas[persona_id] = cfg
+
+    def enqueue(self, items: List[_Pending]) -> None:
+        with self._buf_lock:
+            self._pending.extend(items)
+            size = len(self._pending)
+        if size >= self._cfg.buffer_max_events:
+            self.flush()  # backpressure: the producer pays for the flush
+        elif size >= self._cfg.flush_batch:
+            self._wake.set()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """Write every buffered event in one transaction; returns the count."""
+        with self._flush_lock:
+            with self._buf_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            with self._lock:
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    rows, blocks = self._encode(batch)
+                    self._db.executemany(
+                        """INSERT INTO spatial_trace
+                           (persona_id, trace_id, seq, timestamp, elapsed_ms,
+                            kind, name, data_json, ingested_at)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        rows,
+                    )
+                    self._db.executemany(
+                        """INSERT INTO spatial_track
+                           (persona_id, trace_id, kind, name, start_ts, end_ts,
+                            sample_count, resolution_s, samples)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)""",
+                        blocks,
+                    )
+                    self._db.execute("COMMIT")
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    with self._buf_lock:
+                        self._pending[:0] = batch
+                    raise
+            return len(batch)
+
+    def _encode(self, batch: List[_Pending]) -> Tuple[List[tuple], List[tuple]]:
+        max_chars = self._cfg.max_data_chars
+        rows: List[tuple] = []
+        tracks: Dict[Tuple[str, str, str, str], Dict[str, List[float]]] = {}
+        for persona_id, trace_id, seq, stamp, elapsed, kind, name, data, ts in batch:
+            pos = _position_of(data)
+            if pos is None:
+                data_json = json.dumps(data) if data else "{}"
+                if len(data_json) > max_chars:
+                    data_json = json.dumps({"_truncated": data_json[:max_chars]})
+                rows.append((persona_id, trace_id, seq, stamp, elapsed, kind, name, data_json, ts))
+                continue
+            cols = tracks.get((persona_id, trace_id, kind, name))
+            if cols is None:
+                cols = tracks[(persona_id, trace_id, kind, name)] = _new_columns()
+            cols["ts"].append(ts)
+            cols["timestamp"].append(stamp)
+            cols["seq"].append(seq)
+            cols["elapsed_ms"].append(elapsed)
+            for col, value in zip(("x", "y", "z", "yaw"), pos):
+                cols[col].append(value)
+        blocks = [
+            (persona_id, trace_id, kind, name, min(cols["ts"]), max(cols["ts"]), len(cols["ts"]), _pack(cols))
+            for (persona_id, trace_id, kind, name), cols in tracks.items()
+        ]
+        return rows, blocks
+
+    # ── Writer thread ────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self._cfg.flush_interval_s)
+            self._wake.clear()
+            try:
+                self.flush()
+                now = _now()
+                if now - self._last_maintenance >= self._cfg.maintenance_interval:
+                    self._last_maintenance = now
+                    for persona_id, cfg in list(self._personas.items()):
+                        self.consolidate(persona_id, cfg, now)
+                        self.apply_retention(persona_id, cfg, now)
+            except sqlite3.Error:
+                time.sleep(self._cfg.flush_interval_s)  # locked/busy db: retry next tick
+            except Exception:
+                # Never let one bad pass stop flushing and maintenance for
+                # every session sharing this writer.
+                _logger.exception("spatial trace writer pass failed")
+                time.sleep(self._cfg.flush_interval_s)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._db.close()
+
+    # ── Consolidation ────────────────────────────────────────────────
+
+    def _watermark(self, persona_id: str) -> sqlite3.Row:
+        row = self._db.execute(
+            "SELECT trace_row, track_row, open_episode FROM spatial_watermark WHERE persona_id = ?",
+            (persona_id,),
+        ).fetchone()
+        if row is not None:
+            return row
+        # First pass for this persona: skip traces older than the newest
+        # episode built before watermarks existed.
+        latest = self._db.execute(
+            "SELECT MAX(end_ts) FROM spatial_episode WHERE persona_id = ?", (persona_id,)
+        ).fetchone()[0]
+        trace_row = 0
+        if latest:
+            trace_row = self._db.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM spatial_trace WHERE persona_id = ? AND ingested_at <= ?",
+                (persona_id, latest),
+            ).fetchone()[0]
+        self._db.execute(
+            "INSERT INTO spatial_watermark(persona_id, trace_row, track_row, open_episode) VALUES (?, ?, 0, '')",
+            (persona_id, trace_row),
+        )
+        return self._db.execute(
+            "SELECT trace_row, track_row, open_episode FROM spatial_watermark WHERE persona_id = ?",
+            (persona_id,),
+        ).fetchone()
+
+    def consolidate(self, persona_id: str, cfg: SpatialConfig, now: float) -> int:
+        """Segment events past the watermark into episodes; returns episodes created."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                mark = self._watermark(persona_id)
+                trace_row, track_row = mark["trace_row"], mark["track_row"]
+                events: List[Tuple[float, str, str]] = []
+                for r in self._db.execute(
+                    "SELECT id, ingested_at, kind, name FROM spatial_trace WHERE persona_id = ? AND id > ?",
+                    (persona_id, trace_row),
+                ):
+                    events.append((r["ingested_at"], r["kind"], r["name"]))
+                    trace_row = max(trace_row, r["id"])
+                for r in self._db.execute(
+                    """SELECT id, kind, name, sample_count, samples FROM spatial_track
+                       WHERE persona_id = ? AND id > ? AND resolution_s = 0""",
+                    (persona_id, track_row),
+                ):
+                    kind, name = r["kind"], r["name"]
+                    events.extend((ts, kind, name) for ts in _unpack(r["samples"], r["sample_count"], ("ts",))["ts"])
+                    track_row = max(track_row, r["id"])
+                events.sort(key=lambda e: e[0])
+
+                episode = _OpenEpisode.from_json(mark["open_episode"])
+                finished: List[_OpenEpisode] = []
+                for ts, kind, name in events:
+                    if episode is not None and ts - episode.end_ts > cfg.episode_gap_s:
+                        finished.append(episode)
+                        episode = None
+                    if episode is None:
+                        episode = _OpenEpisode(start_ts=ts, end_ts=ts)
+                    episode.add(ts, kind, name)
+                # Only finalize the last group once it has gone quiet.
+                if episode is not None and now - episode.end_ts > cfg.episode_gap_s:
+                    finished.append(episode)
+                    episode = None
+
+                created = 0
+                for ep in finished:
+                    if ep.count < cfg.min_events_per_episode:
+                        continue
+                    cur = self._db.execute(
+                        """INSERT OR IGNORE INTO spatial_episode
+                           (episode_id, persona_id, start_ts, end_ts, event_count,
+                            summary, tags, activation, importance, created_at, last_accessed)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, 1.0, ?, ?, 0)""",
+                        (
+                            _episode_id(persona_id, ep.start_ts), persona_id, ep.start_ts, ep.end_ts,
+                            ep.count, _summarize(ep), json.dumps(sorted(ep.tags)), _importance(ep), now,
+                        ),
+                    )
+                    created += cur.rowcount
+                self._db.execute(
+                    "UPDATE spatial_watermark SET trace_row = ?, track_row = ?, open_episode = ? WHERE persona_id = ?",
+                    (trace_row, track_row, episode.to_json() if episode else "", persona_id),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return created
+
+    # ── Retention ────────────────────────────────────────────────────
+
+    def apply_retention(self, persona_id: str, cfg: SpatialConfig, now: float) -> Dict[str, int]:
+        """Downsample old positional blocks and delete expired traces."""
+        stats = {"deleted_events": 0, "deleted_blocks": 0, "downsampled_blocks": 0}
+        expire_before = now - cfg.trace_retention_s
+        raw_before = now - cfg.raw_retention_s
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                mark = self._watermark(persona_id)
+                # Never drop or rewrite what consolidation has not read yet.
+                stats["deleted_events"] = self._db.execute(
+                    "DELETE FROM spatial_trace WHERE persona_id = ? AND ingested_at < ? AND id <= ?",
+                    (persona_id, expire_before, mark["trace_row"]),
+                ).rowcount
+                stats["deleted_blocks"] = self._db.execute(
+                    """DELETE FROM spatial_track WHERE persona_id = ? AND end_ts < ?
+                       AND (resolution_s > 0 OR id <= ?)""",
+                    (persona_id, expire_before, mark["track_row"]),
+                ).rowcount
+                if cfg.downsample_s > 0:
+                    stats["downsampled_blocks"] = self._downsample(persona_id, cfg.downsample_s, raw_before, mark["track_row"])
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return stats
+
+    def _downsample(self, persona_id: str, step: float, before: float, track_row: int) -> int:
+        blocks = self._db.execute(
+            """SELECT id, trace_id, kind, name, sample_count, samples FROM spatial_track
+               WHERE persona_id = ? AND resolution_s = 0 AND end_ts < ? AND id <= ?
+               ORDER BY trace_id, kind, name, start_ts LIMIT ?""",
+            (persona_id, before, track_row, _DOWNSAMPLE_BATCH),
+        ).fetchall()
+        groups: Dict[Tuple[str, str, str], List[sqlite3.Row]] = {}
+        for b in blocks:
+            groups.setdefault((b["trace_id"], b["kind"], b["name"]), []).append(b)
+
+        for (trace_id, kind, name), group in groups.items():
+            # bucket -> (first sample index data, [sum ts, n], {axis: [sum, n]})
+            buckets: Dict[int, Tuple[tuple, List[float], Dict[str, List[float]]]] = {}
+            for b in group:
+                cols = _unpack(b["samples"], b["sample_count"])
+                for i, ts in enumerate(cols["ts"]):
+                    key = int(ts // step)
+                    acc = buckets.get(key)
+                    if acc is None:
+                        first = (cols["timestamp"][i], cols["seq"][i], cols["elapsed_ms"][i], cols["yaw"][i])
+                        acc = buckets[key] = (first, [0.0, 0], {a: [0.0, 0] for a in _AXES})
+                    acc[1][0] += ts
+                    acc[1][1] += 1
+                    for axis in _AXES:
+                        v = cols[axis][i]
+                        if not math.isnan(v):  # an axis never sent stays absent
+                            acc[2][axis][0] += v
+                            acc[2][axis][1] += 1
+            out = _new_columns()
+            for key in sorted(buckets):
+                (stamp, seq, elapsed, yaw), (ts_sum, n), axes = buckets[key]
+                out["ts"].append(ts_sum / n)
+                out["timestamp"].append(stamp)
+                out["seq"].append(seq)
+                out["elapsed_ms"].append(elapsed)
+                for axis, (total, count) in axes.items():
+                    out[axis].append(total / count if count else _NAN)
+                out["yaw"].append(yaw)
+            for start in range(0, len(out["ts"]), _MAX_BLOCK_SAMPLES):
+                chunk = {c: v[start:start + _MAX_BLOCK_SAMPLES] for c, v in out.items()}
+                self._db.execute(
+                    """INSERT INTO spatial_track
+                       (persona_id, trace_id, kind, name, start_ts, end_ts,
+                        sample_count, resolution_s, samples)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (persona_id, trace_id, kind, name, chunk["ts"][0], chunk["ts"][-1],
+                     len(chunk["ts"]), step, _pack(chunk)),
+                )
+            self._db.executemany("DELETE FROM spatial_track WHERE id = ?", [(b["id"],) for b in group])
+        return len(blocks)
+
+    # ── Reads ────────────────────────────────────────────────────────
+
+    def query(self, sql: str, params: tuple) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def execute(self, sql: str, params: tuple) -> int:
+        with self._lock:
+            return self._db.execute(sql, params).rowcount
+
+    def iter_blocks(self, where: str, params: tuple) -> Iterator[sqlite3.Row]:
+        """Yield matching spatial_track rows newest first, one blob at a time."""
+        with self._lock:
+            ids = [r[0] for r in self._db.execute(
+                f"SELECT id FROM spatial_track WHERE {where} ORDER BY end_ts DESC", params
+            )]
+        for block_id in ids:
+            with self._lock:
+                row = self._db.execute(
+                    """SELECT trace_id, kind, name, end_ts, sample_count, samples
+                       FROM spatial_track WHERE id = ?""",
+                    (block_id,),
+                ).fetchone()
+            if row is not None:  # may have been downsampled meanwhile
+                yield row
+
+
+_stores: Dict[str, _TraceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _get_store(db_path: str, cfg: SpatialConfig) -> _TraceStore:
+    store = _stores.get(db_path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(db_path)
+            if store is None:
+                store = _stores[db_path] = _TraceStore(db_path, cfg)
+    return store
+
+
+def shutdown_spatial_stores() -> None:
+    """Flush buffered traces and stop the writer threads."""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
+
+
+atexit.register(shutdown_spatial_stores)
+
+
 # ---------------------------------------------------------------------------
 # SpatialMemoryBuilder
 # ---------------------------------------------------------------------------
@@ -143,27 +710,18 @@ class SpatialMemoryBuilder:
     """
     Ingests trace events, stores them, and consolidates into episodes.
 
-    Thread-safety: each method acquires its own connection from the DB path.
-    Use one instance per persona (or share with persona_id parameter).
+    Thread-safety: all builders on one database share its trace store
+    (buffer, writer thread, connection); every method is safe to call from
+    any thread. Use one instance per persona (or share with persona_id
+    parameter).
     """
 
-    def __init__(self, persona_id: str = "", cfg: Optional[SpatialConfig] = None):
+    def __init__(self, persona_id: str = "", cfg: Optional[SpatialConfig] = None, db_path: Optional[str] = None):
         self._persona_id = persona_id
         self._cfg = cfg or _DEFAULT_CFG
-        self._db_path = str(_get_db_path())
-        self._last_maintenance = 0.0
-        self._ensure_schema()
-
-    # ── Schema ───────────────────────────────────────────────────────
-
-    def _ensure_schema(self) -> None:
-        with sqlite3.connect(self._db_path) as conn:
-            _ensure_tables(conn)
-
-    def _conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self._db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        self._db_path = db_path or str(_get_db_path())
+        self._store = _get_store(self._db_path, self._cfg)
+        self._store.register(persona_id, self._cfg)
 
     # ── Ingest ───────────────────────────────────────────────────────
 
@@ -171,6 +729,10 @@ class SpatialMemoryBuilder:
         """
         Ingest a batch of trace events from the client.
 
+        Events are buffered and written by the background writer; call
+        ``flush()`` to force them out. Each event gets a server timestamp
+        anchored at arrival and spread by its ``elapsed_ms``.
+
         Args:
             trace_id: Session-scoped trace identifier.
             events: List of TraceEvent dicts from the client.
@@ -182,158 +744,50 @@ class SpatialMemoryBuilder:
             return 0
 
         now = _now()
-        rows = []
-        for ev in events:
-            data_json = json.dumps(ev.get("data", {}))
-            if len(data_json) > self._cfg.max_data_chars:
-                data_json = data_json[:self._cfg.max_data_chars]
-
-            rows.append((
-                self._persona_id,
+        elapsed = [_as_ms(ev.get("elapsed_ms")) for ev in events]
+        latest_ms = max(elapsed)
+        persona_id = self._persona_id
+        self._store.enqueue([
+            (
+                persona_id,
                 trace_id,
-                ev.get("seq", 0),
+                _as_seq(ev.get("seq", 0)),
                 ev.get("timestamp", ""),
-                ev.get("elapsed_ms", 0),
+                ms,
                 ev.get("kind", "custom"),
                 ev.get("name", ""),
-                data_json,
-                now,
-            ))
-
-        with self._conn() as conn:
-            conn.executemany(
-                """INSERT INTO spatial_trace
-                   (persona_id, trace_id, seq, timestamp, elapsed_ms,
-                    kind, name, data_json, ingested_at)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                rows,
+                ev.get("data") or {},
+                now - (latest_ms - ms) / 1000.0,
             )
+            for ev, ms in zip(events, elapsed)
+        ])
+        return len(events)
 
-        # Lazy maintenance
-        if now - self._last_maintenance > self._cfg.maintenance_interval:
-            self._maybe_consolidate()
-            self._last_maintenance = now
-
-        return len(rows)
+    def flush(self) -> int:
+        """Write buffered events now; returns how many were written."""
+        return self._store.flush()
 
     # ── Consolidation ────────────────────────────────────────────────
 
     def _maybe_consolidate(self) -> int:
         """
-        Scan un-consolidated traces and group into episodes.
+        Segment events newer than this persona's watermark into episodes.
 
         Grouping rule: consecutive events within `episode_gap_s` of each
-        other form a single episode.
+        other form a single episode. The last group stays open until it
+        has been quiet for `episode_gap_s`.
 
         Returns number of new episodes created.
         """
-        with self._conn() as conn:
-            # Get traces not yet assigned to an episode
-            # We detect "un-consolidated" by checking which traces have
-            # ingested_at > the latest episode.end_ts for this persona.
-            latest_ep = conn.execute(
-                "SELECT MAX(end_ts) FROM spatial_episode WHERE persona_id = ?",
-                (self._persona_id,),
-            ).fetchone()
-            cutoff = latest_ep[0] if latest_ep and latest_ep[0] else 0
-
-            traces = conn.execute(
-                """SELECT id, ingested_at, kind, name, data_json
-                   FROM spatial_trace
-                   WHERE persona_id = ? AND ingested_at > ?
-                   ORDER BY ingested_at ASC""",
-                (self._persona_id, cutoff),
-            ).fetchall()
-
-            if len(traces) < self._cfg.min_events_per_episode:
-                return 0
+        self._store.flush()
+        return self._store.consolidate(self._persona_id, self._cfg, _now())
 
-            # Group into episodes by time gap
-            episodes: List[List[sqlite3.Row]] = []
-            current_group: List[sqlite3.Row] = [traces[0]]
-
-            for t in traces[1:]:
-                gap = t["ingested_at"] - current_group[-1]["ingested_at"]
-                if gap > self._cfg.episode_gap_s:
-                    if len(current_group) >= self._cfg.min_events_per_episode:
-                        episodes.append(current_group)
-                    current_group = [t]
-                else:
-                    current_group.append(t)
-
-            # Don't consolidate the current (still-active) group
-            # Only finalize groups whose last event is >episode_gap_s old
-            now = _now()
-            if current_group and (now - current_group[-1]["ingested_at"]) > self._cfg.episode_gap_s:
-                if len(current_group) >= self._cfg.min_events_per_episode:
-                    episodes.append(current_group)
-
-            created = 0
-            for group in episodes:
-                start_ts = group[0]["ingested_at"]
-                end_ts = group[-1]["ingested_at"]
-                eid = _episode_id(self._persona_id, start_ts)
-
-                # Build summary from event kinds/names
-                summary = self._summarize_episode(group)
-                tags = self._extract_tags(group)
-                importance = self._score_importance(group)
-
-                conn.execute(
-                    """INSERT OR IGNORE INTO spatial_episode
-                       (episode_id, persona_id, start_ts, end_ts, event_count,
-                        summary, tags, activation, importance, created_at, last_accessed)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, 1.0, ?, ?, 0)""",
-                    (
-                        eid, self._persona_id, start_ts, end_ts,
-                        len(group), summary, json.dumps(tags),
-                        importance, now,
-                    ),
-                )
-                created += 1
-
-            return created
-
-    def _summarize_episode(self, group: List[sqlite3.Row]) -> str:
-        """Build a human-readable summary of an episode."""
-        kinds = {}
-        names = []
-        for t in group:
-            k = t["kind"]
-            kinds[k] = kinds.get(k, 0) + 1
-            names.append(t["name"])
-
-        parts = []
-        for k, count in sorted(kinds.items(), key=lambda x: -x[1]):
-            parts.append(f"{k}×{count}")
-
-        duration_s = group[-1]["ingested_at"] - group[0]["ingested_at"]
-        duration_label = (
-            f"{int(duration_s)}s" if duration_s < 60
-            else f"{duration_s / 60:.1f}min"
-        )
+    consolidate = _maybe_consolidate
 
-        return f"Episode ({duration_label}): {', '.join(parts)}"
-
-    def _extract_tags(self, group: List[sqlite3.Row]) -> List[str]:
-        """Extract searchable tags from an episode's events."""
-        tags = set()
-        for t in group:
-            tags.add(t["kind"])
-            # Extract key event names (first word before dot)
-            name = t["name"]
-            if "." in name:
-                tags.add(name.split(".")[0])
-        return sorted(tags)
-
-    def _score_importance(self, group: List[sqlite3.Row]) -> float:
-        """Score episode importance (0..1) based on event diversity and count."""
-        kinds = set(t["kind"] for t in group)
-        # More diverse events = more important interaction
-        diversity = min(len(kinds) / 5.0, 1.0)
-        # More events = more substantial
-        volume = min(len(group) / 20.0, 1.0)
-        return round(0.6 * diversity + 0.4 * volume, 3)
+    def apply_retention(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Downsample and expire this persona's old traces (normally run by the writer)."""
+        self._store.flush()
+        return self._store.apply_retention(self._persona_id, self._cfg, _now() if now is None else now)
 
     # ── Retrieval (for perceive node) ────────────────────────────────
 
@@ -351,16 +805,15 @@ class SpatialMemoryBuilder:
         limit = limit or self._cfg.top_episodes
         now = _now()
 
-        with self._conn() as conn:
-            rows = conn.execute(
-                """SELECT episode_id, start_ts, end_ts, event_count,
-                          summary, tags, activation, importance, created_at
-                   FROM spatial_episode
-                   WHERE persona_id = ? AND importance >= ?
-                   ORDER BY activation DESC
-                   LIMIT ?""",
-                (self._persona_id, min_importance, limit * 3),
-            ).fetchall()
+        rows = self._store.query(
+            """SELECT episode_id, start_ts, end_ts, event_count,
+                      summary, tags, activation, importance, created_at
+               FROM spatial_episode
+               WHERE persona_id = ? AND importance >= ?
+               ORDER BY activation DESC
+               LIMIT ?""",
+            (self._persona_id, min_importance, limit * 3),
+        )
 
         # Apply decay and re-sort
         results = []
@@ -390,31 +843,33 @@ class SpatialMemoryBuilder:
         limit: int = 100,
     ) -> List[Dict[str, Any]]:
         """
-        Query raw trace events (for replay or debugging).
+        Query raw trace events (for replay or debugging), newest first.
+
+        Positional samples come back from their column blocks with
+        ``data = {"position": ..., "rotation_y_deg"?}``; downsampled ones
+        are averages over ``downsample_s``.
         """
-        with self._conn() as conn:
-            clauses = ["persona_id = ?"]
-            params: list = [self._persona_id]
-
-            if trace_id:
-                clauses.append("trace_id = ?")
-                params.append(trace_id)
-            if kind:
-                clauses.append("kind = ?")
-                params.append(kind)
-
-            params.append(limit)
-            rows = conn.execute(
-                f"""SELECT trace_id, seq, timestamp, elapsed_ms, kind, name, data_json
-                    FROM spatial_trace
-                    WHERE {' AND '.join(clauses)}
-                    ORDER BY ingested_at DESC
-                    LIMIT ?""",
-                params,
-            ).fetchall()
-
-        return [
-            {
+        self._store.flush()
+        clauses = ["persona_id = ?"]
+        params: list = [self._persona_id]
+        if trace_id:
+            clauses.append("trace_id = ?")
+            params.append(trace_id)
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        where = " AND ".join(clauses)
+
+        found: List[Tuple[float, Dict[str, Any]]] = []
+        for r in self._store.query(
+            f"""SELECT trace_id, seq, timestamp, elapsed_ms, kind, name, data_json, ingested_at
+                FROM spatial_trace
+                WHERE {where}
+                ORDER BY ingested_at DESC
+                LIMIT ?""",
+            (*params, limit),
+        ):
+            found.append((r["ingested_at"], {
                 "trace_id": r["trace_id"],
                 "seq": r["seq"],
                 "timestamp": r["timestamp"],
@@ -422,9 +877,33 @@ class SpatialMemoryBuilder:
                 "kind": r["kind"],
                 "name": r["name"],
                 "data": json.loads(r["data_json"]),
-            }
-            for r in rows
-        ]
+            }))
+
+        samples: List[Tuple[float, Dict[str, Any]]] = []
+        for b in self._store.iter_blocks(where, tuple(params)):
+            if len(samples) >= limit:
+                samples.sort(key=lambda s: -s[0])
+                del samples[limit:]
+                if b["end_ts"] < samples[-1][0]:
+                    break
+            cols = _unpack(b["samples"], b["sample_count"])
+            for i, ts in enumerate(cols["ts"]):
+                position = {a: cols[a][i] for a in _AXES if not math.isnan(cols[a][i])}
+                data: Dict[str, Any] = {"position": position}
+                if not math.isnan(cols["yaw"][i]):
+                    data["rotation_y_deg"] = cols["yaw"][i]
+                samples.append((ts, {
+                    "trace_id": b["trace_id"],
+                    "seq": cols["seq"][i],
+                    "timestamp": cols["timestamp"][i],
+                    "elapsed_ms": cols["elapsed_ms"][i],
+                    "kind": b["kind"],
+                    "name": b["name"],
+                    "data": data,
+                }))
+
+        merged = sorted(found + samples, key=lambda s: -s[0])
+        return [ev for _, ev in merged[:limit]]
 
     def reinforce_episode(self, episode_id: str, eta: float = 0.15) -> bool:
         """
@@ -434,22 +913,12 @@ class SpatialMemoryBuilder:
         Uses the same saturating update as memory_v2:
           activation <- 1 - (1 - activation) * exp(-eta)
         """
-        with self._conn() as conn:
-            row = conn.execute(
-                "SELECT activation FROM spatial_episode WHERE episode_id = ?",
-                (episode_id,),
-            ).fetchone()
-            if not row:
-                return False
-
-            new_act = 1.0 - (1.0 - row["activation"]) * math.exp(-eta)
-            conn.execute(
-                """UPDATE spatial_episode
-                   SET activation = ?, last_accessed = ?
-                   WHERE episode_id = ?""",
-                (new_act, _now(), episode_id),
-            )
-            return True
+        return bool(self._store.execute(
+            """UPDATE spatial_episode
+               SET activation = 1.0 - (1.0 - activation) * ?, last_accessed = ?
+               WHERE episode_id = ?""",
+            (math.exp(-eta), _now(), episode_id),
+        ))
 
     def get_spatial_context_block(self) -> str:
         """
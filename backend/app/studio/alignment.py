@@ -12,8 +12,10 @@ Two alignment tiers, best available wins:
 
   whisperx     - word-level timestamps via WhisperX (Whisper + wav2vec2).
                  Heavy optional dependency; imported lazily and only when
-                 installed. Env: WHISPERX_MODEL (default large-v3),
-                 WHISPERX_DEVICE (default cuda; falls back to cpu).
+                 installed. Runs on the resident worker in alignment_worker
+                 (model loaded once; WHISPERX_DEVICE default cpu). Words are
+                 cached by audio content hash, so re-aligning edited scenes
+                 against unchanged audio never re-transcribes.
   proportional - deterministic fallback: total audio duration (ffprobe, or
                  the wave module for WAV) distributed across scenes by word
                  count. No dependencies. Scene boundaries are already
@@ -32,7 +34,7 @@ import subprocess
 import tempfile
 import wave
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -119,6 +121,19 @@ def audio_duration_sec(path: str) -> Optional[float]:
     return None
 
 
+def _cached_duration(path: str, digest: str) -> Optional[float]:
+    """audio_duration_sec, remembered per audio content hash."""
+    from . import alignment_worker
+
+    dur = alignment_worker.cache.duration(digest)
+    if dur:
+        return dur
+    dur = audio_duration_sec(path)
+    if dur and dur > 0:
+        alignment_worker.cache.set_duration(digest, dur)
+    return dur
+
+
 # ── WhisperX tier ────────────────────────────────────────────────────────────
 
 def whisperx_available() -> bool:
@@ -130,32 +145,12 @@ def whisperx_available() -> bool:
 
 
 def _whisperx_words(audio_path: str) -> List[AlignedWord]:
-    """Transcribe + align, returning word-level timestamps."""
-    import whisperx
-
-    device = os.getenv("WHISPERX_DEVICE", "cuda").strip() or "cuda"
-    model_name = os.getenv("WHISPERX_MODEL", "large-v3").strip() or "large-v3"
-
-    try:
-        model = whisperx.load_model(model_name, device)
-    except Exception:
-        device = "cpu"
-        model = whisperx.load_model(model_name, device, compute_type="int8")
+    """Word-level timestamps from the resident worker (cached by content)."""
+    from . import alignment_worker
 
-    audio = whisperx.load_audio(audio_path)
-    result = model.transcribe(audio)
-    align_model, align_meta = whisperx.load_align_model(
-        language_code=result["language"], device=device)
-    aligned = whisperx.align(result["segments"], align_model, align_meta,
-                             audio, device)
-
-    words: List[AlignedWord] = []
-    for seg in aligned.get("word_segments", []):
-        w = str(seg.get("word", "")).strip()
-        if w and seg.get("start") is not None and seg.get("end") is not None:
-            words.append(AlignedWord(word=w, start=float(seg["start"]),
-                                     end=float(seg["end"])))
-    return words
+    words = alignment_worker.words_for(
+        [(audio_path, alignment_worker.audio_hash(audio_path))])[0]
+    return [AlignedWord(**w) for w in words or []]
 
 
 # ── Scene span mapping ───────────────────────────────────────────────────────
@@ -218,40 +213,60 @@ def _spans_proportional(scenes: List[dict], audio_duration: float) -> List[Scene
 def align_scenes(audio_path: str, scenes: List[dict]) -> AlignmentResult:
     """Align scenes against a local audio file. Never raises for missing
     optional dependencies - degrades to the proportional tier."""
-    duration = audio_duration_sec(audio_path)
-    if not duration or duration <= 0:
-        return AlignmentResult(ok=False, message="Could not determine audio duration "
-                                                 "(is ffprobe installed?)")
+    return align_many([(audio_path, scenes)])[0]
 
-    if whisperx_available():
-        try:
-            words = _whisperx_words(audio_path)
-            if words:
-                return AlignmentResult(
-                    ok=True, method="whisperx", audio_duration_sec=duration,
-                    words=words, scene_spans=_spans_from_words(scenes, words, duration),
-                )
-        except Exception as e:
-            print(f"[Alignment] whisperx failed ({e}); falling back to proportional")
 
-    return AlignmentResult(
-        ok=True, method="proportional", audio_duration_sec=duration,
-        scene_spans=_spans_proportional(scenes, duration),
-    )
+def align_many(jobs: List[Tuple[str, List[dict]]]) -> List[AlignmentResult]:
+    """Align several (audio_path, scenes) pairs, sending every uncached
+    narration file to the WhisperX worker as one batch. Results keep the
+    input order; the proportional tier is used only where the worker is
+    unavailable or failed for that file."""
+    from . import alignment_worker
+
+    results: List[Optional[AlignmentResult]] = [None] * len(jobs)
+    ready: List[Tuple[int, str, float]] = []
+    for i, (path, _) in enumerate(jobs):
+        try:
+            digest = alignment_worker.audio_hash(path)
+        except OSError:
+            digest, duration = "", None
+        else:
+            duration = _cached_duration(path, digest)
+        if not duration or duration <= 0:
+            results[i] = AlignmentResult(ok=False, message="Could not determine audio duration "
+                                                           "(is ffprobe installed?)")
+        else:
+            ready.append((i, digest, duration))
+
+    words_by_job: List[Optional[List[dict]]] = [None] * len(ready)
+    if ready and whisperx_available():
+        words_by_job = alignment_worker.words_for([(jobs[i][0], d) for i, d, _ in ready])
+
+    for (i, _, duration), raw in zip(ready, words_by_job):
+        scenes = jobs[i][1]
+        if raw:
+            words = [AlignedWord(**w) for w in raw]
+            results[i] = AlignmentResult(
+                ok=True, method="whisperx", audio_duration_sec=duration,
+                words=words, scene_spans=_spans_from_words(scenes, words, duration),
+            )
+        else:
+            results[i] = AlignmentResult(
+                ok=True, method="proportional", audio_duration_sec=duration,
+                scene_spans=_spans_proportional(scenes, duration),
+            )
+    return [r for r in results if r is not None]
 
 
 def align_from_url(audio_url: str, scenes: List[dict]) -> AlignmentResult:
-    """Fetch audio (if remote) and align. Cleans up its own temp download."""
-    path = fetch_audio(audio_url)
-    is_temp = path != audio_url
-    try:
-        return align_scenes(path, scenes)
-    finally:
-        if is_temp:
-            try:
-                os.unlink(path)
-            except OSError:
-                pass
+    """Fetch audio (if remote) and align. Remote narration is kept in the
+    alignment audio cache and revalidated rather than re-downloaded."""
+    if audio_url.startswith(("http://", "https://")):
+        from .alignment_worker import fetch_audio_cached
+        path = fetch_audio_cached(audio_url)
+    else:
+        path = fetch_audio(audio_url)
+    return align_scenes(path, scenes)
 
 
 class CaptionCue(BaseModel):
@@ -0,0 +1,402 @@
+"""
+Long-lived WhisperX worker + content-addressed caches for forced alignment.
+
+``alignment.align_scenes`` used to load WhisperX, transcribe, re-download the
+narration and shell out to ffprobe on every call. Scene edits re-ran all of
+it even though the audio had not changed. This module keeps the expensive
+parts resident and keyed by what they actually depend on:
+
+  - AlignmentWorker: one daemon thread that owns the WhisperX model (loaded
+    once, CPU / int8 by default so it never competes with image generation
+    for VRAM) and per-language align models. Requests queue up; the worker
+    drains up to ``WHISPERX_MAX_BATCH`` narration files at a time, dedupes
+    identical audio, and resolves each caller's future.
+  - Word cache: aligned words + audio duration per audio *content hash*
+    (sha256), in memory and as JSON on disk, so re-aligning after a script
+    tweak re-maps scenes without re-transcribing.
+  - Audio cache: remote narration downloads kept on disk and revalidated
+    with ETag / Last-Modified instead of re-fetched.
+
+Env: WHISPERX_MODEL, WHISPERX_DEVICE (default cpu), WHISPERX_BATCH_SIZE,
+WHISPERX_MAX_BATCH, STUDIO_ALIGN_TIMEOUT_SEC, STUDIO_ALIGNMENT_CACHE_DIR,
+STUDIO_AUDIO_CACHE_MB.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_MEM_ENTRIES = 64
+
+
+# ── Cache locations ──────────────────────────────────────────────────────────
+
+def cache_dir() -> Path:
+    """``STUDIO_ALIGNMENT_CACHE_DIR``, else a hidden dir beside the studio
+    pipeline files (never served - the file route only allows flat names)."""
+    base = os.getenv("STUDIO_ALIGNMENT_CACHE_DIR", "").strip()
+    if base:
+        p = Path(base)
+    else:
+        files = os.getenv("STUDIO_FILES_DIR", "").strip()
+        root = Path(files) if files else Path(__file__).resolve().parents[2] / "data" / "studio_files"
+        p = root / ".alignment-cache"
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+# ── Content hashing ──────────────────────────────────────────────────────────
+
+_hash_memo: Dict[Tuple[str, int, int], str] = {}
+_hash_lock = threading.Lock()
+
+
+def audio_hash(path: str) -> str:
+    """sha256 of the file contents, memoised on (path, mtime, size)."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    with _hash_lock:
+        cached = _hash_memo.get(memo_key)
+    if cached:
+        return cached
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _hash_lock:
+        _hash_memo[memo_key] = digest
+    return digest
+
+
+# ── Word / duration cache ────────────────────────────────────────────────────
+
+class AlignmentCache:
+    """Per-audio-hash record: ``{"duration": float, "words": {model: [...]}}``.
+
+    Words are keyed by model name too, so switching WHISPERX_MODEL does not
+    serve timings from a different model.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _file(self, digest: str) -> Path:
+        return cache_dir() / f"{digest}.json"
+
+    def _load(self, digest: str) -> Dict[str, Any]:
+        with self._lock:
+            rec = self._mem.get(digest)
+            if rec is not None:
+                self._mem.move_to_end(digest)
+                return rec
+        try:
+            rec = json.loads(self._file(digest).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            rec = {}
+        with self._lock:
+            self._mem[digest] = rec
+            while len(self._mem) > _MEM_ENTRIES:
+                self._mem.popitem(last=False)
+        return rec
+
+    def _store(self, digest: str, **fields: Any) -> None:
+        rec = dict(self._load(digest))
+        for k, v in fields.items():
+            if k == "words":
+                rec["words"] = {**rec.get("words", {}), **v}
+            else:
+                rec[k] = v
+        # Unique per writer: concurrent stores of one digest must not share
+        # (and truncate) the same temp file before os.replace.
+        tmp = self._file(digest).with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(rec), encoding="utf-8")
+        os.replace(tmp, self._file(digest))
+        with self._lock:
+            self._mem[digest] = rec
+
+    def duration(self, digest: str) -> Optional[float]:
+        return self._load(digest).get("duration")
+
+    def set_duration(self, digest: str, duration: float) -> None:
+        self._store(digest, duration=duration)
+
+    def words(self, digest: str, model: str, count: bool = True) -> Optional[List[dict]]:
+        words = self._load(digest).get("words", {}).get(model)
+        if count:
+            with self._lock:
+                if words is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+        return words
+
+    def set_words(self, digest: str, model: str, words: List[dict]) -> None:
+        self._store(digest, words={model: words})
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._mem.clear()
+
+
+cache = AlignmentCache()
+
+
+# ── Remote audio cache ───────────────────────────────────────────────────────
+
+_download_locks: Dict[str, threading.Lock] = {}
+_download_locks_lock = threading.Lock()
+
+
+def _download_lock(key: str) -> threading.Lock:
+    """Per-URL lock: one download per URL, different URLs in parallel."""
+    with _download_locks_lock:
+        lock = _download_locks.get(key)
+        if lock is None:
+            lock = _download_locks[key] = threading.Lock()
+        return lock
+
+
+def fetch_audio_cached(url: str, timeout: float = 60.0) -> str:
+    """Download *url* once into the audio cache and revalidate on reuse.
+
+    A 304 (or a failed revalidation with a cached copy on disk) reuses the
+    cached file; otherwise the new body replaces it. Returns the local path,
+    which callers must NOT delete.
+    """
+    import httpx
+
+    audio_dir = cache_dir() / "audio"
+    audio_dir.mkdir(exist_ok=True)
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+    suffix = Path(url.split("?", 1)[0]).suffix or ".mp3"
+    path = audio_dir / f"{key}{suffix}"
+    meta_path = audio_dir / f"{key}.meta.json"
+
+    with _download_lock(key):
+        headers: Dict[str, str] = {}
+        if path.exists():
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                meta = {}
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            with httpx.stream("GET", url, timeout=timeout, follow_redirects=True,
+                              headers=headers) as resp:
+                if resp.status_code == 304 and path.exists():
+                    os.utime(path)
+                    return str(path)
+                resp.raise_for_status()
+                part = path.with_suffix(path.suffix + ".part")
+                with open(part, "wb") as fh:
+                    for chunk in resp.iter_bytes():
+                        fh.write(chunk)
+                os.replace(part, path)
+                meta_path.write_text(json.dumps({
+                    "url": url,
+                    "etag": resp.headers.get("etag"),
+                    "last_modified": resp.headers.get("last-modified"),
+                }), encoding="utf-8")
+        except httpx.HTTPError as e:
+            if path.exists() and headers:
+                print(f"[Alignment] revalidation failed ({e}); using cached audio")
+                return str(path)
+            raise
+
+        _evict_audio(audio_dir, keep=path)
+        return str(path)
+
+
+def _evict_audio(audio_dir: Path, keep: Path) -> None:
+    try:
+        budget = int(float(os.getenv("STUDIO_AUDIO_CACHE_MB", "1024")) * 1024 * 1024)
+    except ValueError:
+        budget = 1024 * 1024 * 1024
+    files = [p for p in audio_dir.iterdir()
+             if p.is_file() and not p.name.endswith((".meta.json", ".part"))]
+    total = sum(p.stat().st_size for p in files)
+    for p in sorted(files, key=lambda p: p.stat().st_mtime):
+        if total <= budget:
+            break
+        if p == keep:
+            continue
+        total -= p.stat().st_size
+        p.unlink(missing_ok=True)
+        (audio_dir / (p.stem + ".meta.json")).unlink(missing_ok=True)
+
+
+# ── Resident WhisperX worker ─────────────────────────────────────────────────
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, "") or default))
+    except ValueError:
+        return default
+
+
+def model_name() -> str:
+    return os.getenv("WHISPERX_MODEL", "large-v3").strip() or "large-v3"
+
+
+class AlignmentWorker:
+    """Owns the WhisperX models on one thread and aligns queued files in batches."""
+
+    def __init__(self, max_batch: Optional[int] = None) -> None:
+        self.max_batch = max_batch or _env_int("WHISPERX_MAX_BATCH", 4)
+        self.model_name = model_name()
+        self._queue: "queue.Queue[Tuple[str, str, Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._model: Any = None
+        self._device = ""
+        self._align_models: Dict[str, Tuple[Any, Any]] = {}
+        self.stats = {"batches": 0, "files": 0, "model_loads": 0}
+
+    # -- public -----------------------------------------------------------
+
+    def submit(self, audio_path: str, digest: str) -> "Future[List[dict]]":
+        fut: "Future[List[dict]]" = Future()
+        self._ensure_thread()
+        self._queue.put((audio_path, digest, fut))
+        return fut
+
+    # -- worker thread ----------------------------------------------------
+
+    def _ensure_thread(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="whisperx-worker",
+                                                 daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[Tuple[str, str, Future]]) -> None:
+        by_digest: Dict[str, List[Tuple[str, Future]]] = {}
+        for path, digest, fut in batch:
+            by_digest.setdefault(digest, []).append((path, fut))
+        self.stats["batches"] += 1
+
+        for digest, waiters in by_digest.items():
+            try:
+                words = cache.words(digest, self.model_name, count=False)
+                if words is None:
+                    words = self._transcribe(waiters[0][0])
+                    cache.set_words(digest, self.model_name, words)
+                    self.stats["files"] += 1
+                for _, fut in waiters:
+                    fut.set_result(words)
+            except Exception as e:  # noqa: BLE001 - surfaced to every waiter
+                for _, fut in waiters:
+                    fut.set_exception(e)
+
+    def _load(self) -> Any:
+        if self._model is None:
+            import whisperx
+
+            device = os.getenv("WHISPERX_DEVICE", "cpu").strip() or "cpu"
+            try:
+                compute = "int8" if device == "cpu" else "float16"
+                self._model = whisperx.load_model(self.model_name, device, compute_type=compute)
+            except Exception:
+                device = "cpu"
+                self._model = whisperx.load_model(self.model_name, device, compute_type="int8")
+            self._device = device
+            self.stats["model_loads"] += 1
+            print(f"[Alignment] WhisperX {self.model_name} resident on {device}")
+        return self._model
+
+    def _transcribe(self, audio_path: str) -> List[dict]:
+        import whisperx
+
+        model = self._load()
+        audio = whisperx.load_audio(audio_path)
+        result = model.transcribe(audio, batch_size=_env_int("WHISPERX_BATCH_SIZE", 8))
+        lang = result["language"]
+        if lang not in self._align_models:
+            self._align_models[lang] = whisperx.load_align_model(
+                language_code=lang, device=self._device)
+        align_model, align_meta = self._align_models[lang]
+        aligned = whisperx.align(result["segments"], align_model, align_meta,
+                                 audio, self._device)
+
+        words: List[dict] = []
+        for seg in aligned.get("word_segments", []):
+            w = str(seg.get("word", "")).strip()
+            if w and seg.get("start") is not None and seg.get("end") is not None:
+                words.append({"word": w, "start": float(seg["start"]), "end": float(seg["end"])})
+        return words
+
+
+_worker: Optional[AlignmentWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> AlignmentWorker:
+    global _worker
+    with _worker_lock:
+        if _worker is None or _worker.model_name != model_name():
+            _worker = AlignmentWorker()
+        return _worker
+
+
+def words_for(items: List[Tuple[str, str]]) -> List[Optional[List[dict]]]:
+    """Aligned words for each ``(audio_path, digest)``; cache first, then one
+    batched worker pass for the rest. ``None`` where alignment failed."""
+    name = model_name()
+    out: List[Optional[List[dict]]] = [cache.words(d, name) for _, d in items]
+    pending = [(i, get_worker().submit(p, d)) for i, (p, d) in enumerate(items) if out[i] is None]
+    timeout = float(os.getenv("STUDIO_ALIGN_TIMEOUT_SEC", "1800") or 1800)
+    for i, fut in pending:
+        try:
+            out[i] = fut.result(timeout=timeout)
+        except FutureTimeout:
+            print(f"[Alignment] whisperx timed out after {timeout:.0f}s; falling back")
+        except Exception as e:  # noqa: BLE001
+            print(f"[Alignment] whisperx failed ({e}); falling back to proportional")
+    return out
+
+
+def worker_stats() -> Dict[str, Any]:
+    return {
+        "model": model_name(),
+        "resident": bool(_worker and _worker._model is not None),
+        "worker": dict(_worker.stats) if _worker else None,
+        "cache_hits": cache.hits,
+        "cache_misses": cache.misses,
+    }
+
+
+def _reset_for_tests() -> None:
+    """Drop the resident worker and in-memory caches. Tests only."""
+    global _worker
+    with _worker_lock:
+        _worker = None
+    cache.clear_memory()
+    cache.hits = cache.misses = 0
+    with _hash_lock:
+        _hash_memo.clear()
@@ -0,0 +1,555 @@
+"""
+Background, cached exports for professional Studio projects.
+
+``exporter.export_project`` answers inside the request and only returns the
+data an exporter *would* need. That is fine for small projects, but real
+artifacts for large (essay-video) projects take longer than a proxy will
+wait. This module turns each export into a job:
+
+  - Jobs run on one shared, bounded worker pool (``STUDIO_EXPORT_WORKERS``)
+    instead of a thread per request; identical in-flight exports coalesce
+    onto a single job.
+  - Artifacts are cached on disk under
+    ``<UPLOAD_DIR>/studio/exports/projects/<project_id>/`` keyed on the
+    project's latest ``VersionSnapshot`` (plus ``updatedAt`` and the asset
+    list), so repeat exports of an unchanged project finish instantly.
+  - PDF / PPTX pages are rendered in parallel (``STUDIO_EXPORT_RENDER_THREADS``)
+    and handed to the writer in order as they finish, so only a few pages
+    are in memory at once; the asset ZIP is written entry by entry from
+    disk; downloads are streamed with ``FileResponse``.
+
+Same scope as ``render_jobs``: in-memory registry, single process.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import itertools
+import json
+import logging
+import os
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .exporter import (
+    export_project_assets_zip,
+    export_project_json,
+    export_project_slides_pdf,
+    export_project_slides_pptx,
+    export_project_storyboard_pdf,
+)
+from .repo import get_latest_version, get_project, list_assets
+
+logger = logging.getLogger(__name__)
+
+# Bump when the artifact layout changes so stale cache entries are ignored.
+_FORMAT_REV = 1
+
+_MAX_PAGE_WIDTH = 1920
+_MAX_FINISHED_JOBS = 500
+
+_KINDS: Dict[str, Tuple[str, str]] = {
+    # kind: (file extension, media type)
+    "json_metadata": (".json", "application/json"),
+    "storyboard_pdf": (".pdf", "application/pdf"),
+    "slides_pdf": (".pdf", "application/pdf"),
+    "slides_pptx": (".pptx", "application/vnd.openxmlformats-officedocument.presentationml.presentation"),
+    "zip_assets": (".zip", "application/zip"),
+}
+
+# Already-compressed media gains nothing from deflate.
+_STORED_KINDS = {"image", "video", "audio"}
+
+
+@dataclass
+class ExportJob:
+    """In-memory record of a single project export."""
+    id: str
+    project_id: str
+    kind: str
+    cache_key: str
+    status: str = "queued"  # queued | running | done | error
+    progress: float = 0.0
+    cached: bool = False
+    output_path: Optional[str] = None
+    filename: str = ""
+    media_type: str = "application/octet-stream"
+    size_bytes: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=lambda: time.time())
+    updated_at: float = field(default_factory=lambda: time.time())
+    generation: int = 0  # submission order; newer jobs' artifacts are never dropped
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d.pop("output_path", None)
+        d.pop("generation", None)
+        return d
+
+
+# ---------------------------------------------------------------------------
+# Registry + shared runner
+# ---------------------------------------------------------------------------
+
+_jobs_lock = threading.RLock()
+_jobs: Dict[str, ExportJob] = {}
+_inflight: Dict[Tuple[str, str, str], str] = {}
+_generations = itertools.count(1)
+# Artifact path -> generation of the job that wrote it (unknown = older).
+_artifact_generations: Dict[str, int] = {}
+_runner: Optional[ThreadPoolExecutor] = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, "") or default))
+    except ValueError:
+        return default
+
+
+def _get_runner() -> ThreadPoolExecutor:
+    global _runner
+    with _jobs_lock:
+        if _runner is None:
+            _runner = ThreadPoolExecutor(
+                max_workers=_env_int("STUDIO_EXPORT_WORKERS", 2),
+                thread_name_prefix="studio-export",
+            )
+        return _runner
+
+
+def _render_threads() -> int:
+    return _env_int("STUDIO_EXPORT_RENDER_THREADS", min(4, os.cpu_count() or 1))
+
+
+def get_job(job_id: str) -> Optional[ExportJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def _update(job_id: str, **changes: Any) -> None:
+    with _jobs_lock:
+        j = _jobs.get(job_id)
+        if not j:
+            return
+        for k, v in changes.items():
+            setattr(j, k, v)
+        j.updated_at = time.time()
+
+
+def _prune_finished() -> None:
+    finished = sorted(
+        (j for j in _jobs.values() if j.status in ("done", "error")),
+        key=lambda j: j.updated_at,
+    )
+    for j in finished[: max(0, len(finished) - _MAX_FINISHED_JOBS)]:
+        _jobs.pop(j.id, None)
+
+
+# ---------------------------------------------------------------------------
+# Artifact cache
+# ---------------------------------------------------------------------------
+
+def _artifacts_dir(project_id: str) -> Path:
+    from .render_jobs import _exports_dir
+    p = _exports_dir() / "projects" / project_id
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+def compute_cache_key(project_id: str, kind: str) -> Optional[str]:
+    """Hash of everything an artifact depends on, or None if no such project.
+
+    The latest VersionSnapshot covers editor state; ``updatedAt`` covers
+    metadata edits made without a snapshot; the asset list covers uploads.
+    """
+    proj = get_project(project_id)
+    if not proj:
+        return None
+    latest = get_latest_version(project_id)
+    assets = [(a.id, a.url, a.sizeBytes) for a in list_assets(project_id)]
+    payload = json.dumps(
+        [_FORMAT_REV, kind, latest.id if latest else None, proj.updatedAt, sorted(assets)],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def _artifact_path(project_id: str, kind: str, cache_key: str) -> Path:
+    ext, _ = _KINDS[kind]
+    return _artifacts_dir(project_id) / f"{kind}-{cache_key}{ext}"
+
+
+def _drop_stale_artifacts(project_id: str, kind: str, keep: Path, generation: int) -> None:
+    """Delete this kind's artifacts written by jobs submitted before *generation*.
+
+    A slow job that finishes after a newer one must not delete the newer
+    artifact; in-progress ``.part`` files belong to running jobs.
+    """
+    for p in _artifacts_dir(project_id).glob(f"{kind}-*"):
+        if p == keep or p.name.endswith(".part"):
+            continue
+        with _jobs_lock:
+            if _artifact_generations.get(str(p), 0) >= generation:
+                continue
+            _artifact_generations.pop(str(p), None)
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Submission
+# ---------------------------------------------------------------------------
+
+def submit_export(project_id: str, kind: str, actor: str = "system") -> Dict[str, Any]:
+    """Queue (or reuse) an export job. Returns ``{"ok": ..., "job": ...}``."""
+    if kind not in _KINDS:
+        return {"ok": False, "error": f"Unknown export kind: {kind}"}
+    proj = get_project(project_id)
+    if not proj:
+        return {"ok": False, "error": "Project not found"}
+    if kind in ("slides_pdf", "slides_pptx") and proj.projectType != "slides":
+        return {"ok": False, "error": "Project is not a slides project"}
+
+    cache_key = compute_cache_key(project_id, kind) or ""
+    ext, media_type = _KINDS[kind]
+    path = _artifact_path(project_id, kind, cache_key)
+    suffix = {"json_metadata": "metadata", "zip_assets": "assets"}.get(kind, kind.split("_")[0])
+    job = ExportJob(
+        id="ej_" + secrets.token_urlsafe(16),
+        project_id=project_id,
+        kind=kind,
+        cache_key=cache_key,
+        output_path=str(path),
+        filename=f"{proj.title.replace(' ', '_')}_{suffix}{ext}",
+        media_type=media_type,
+    )
+
+    with _jobs_lock:
+        existing_id = _inflight.get((project_id, kind, cache_key))
+        if existing_id and existing_id in _jobs:
+            return {"ok": True, "job": _jobs[existing_id].to_dict()}
+
+        if path.exists():
+            job.status, job.progress, job.cached = "done", 100.0, True
+            job.size_bytes = path.stat().st_size
+            _jobs[job.id] = job
+            _prune_finished()
+            return {"ok": True, "job": job.to_dict()}
+
+        job.generation = next(_generations)
+        _jobs[job.id] = job
+        _inflight[(project_id, kind, cache_key)] = job.id
+        _prune_finished()
+
+    _get_runner().submit(_run_job, job.id, actor)
+    return {"ok": True, "job": job.to_dict()}
+
+
+def _run_job(job_id: str, actor: str) -> None:
+    """Worker entry point — runs on the shared export pool."""
+    job = get_job(job_id)
+    if not job:
+        return
+    _update(job_id, status="running", progress=0.0)
+
+    def _on_progress(pct: float) -> None:
+        _update(job_id, progress=round(max(0.0, min(99.0, pct)), 1))
+
+    out = Path(job.output_path or "")
+    part = out.with_name(out.name + ".part")
+    try:
+        _BUILDERS[job.kind](job.project_id, part, actor, _on_progress)
+        os.replace(part, out)
+        with _jobs_lock:
+            _artifact_generations[str(out)] = job.generation
+        _drop_stale_artifacts(job.project_id, job.kind, out, job.generation)
+        _update(job_id, status="done", progress=100.0, size_bytes=out.stat().st_size)
+    except Exception as exc:  # noqa: BLE001  (we want the message in the job)
+        logger.exception("export job %s failed", job_id)
+        try:
+            part.unlink()
+        except OSError:
+            pass
+        _update(job_id, status="error", error=str(exc))
+    finally:
+        with _jobs_lock:
+            _inflight.pop((job.project_id, job.kind, job.cache_key), None)
+
+
+# ---------------------------------------------------------------------------
+# Builders
+# ---------------------------------------------------------------------------
+
+ProgressFn = Callable[[float], None]
+
+
+def _checked(result: Dict[str, Any]) -> Dict[str, Any]:
+    if not result.get("ok"):
+        raise RuntimeError(result.get("error") or "export failed")
+    return result
+
+
+def _build_json(project_id: str, out: Path, actor: str, progress: ProgressFn) -> None:
+    data = _checked(export_project_json(project_id, actor=actor))["data"]
+    out.write_text(json.dumps(data, indent=2, default=str), encoding="utf-8")
+
+
+def _build_zip(project_id: str, out: Path, actor: str, progress: ProgressFn) -> None:
+    from .render_mp4 import _resolve_to_local_path
+
+    manifest = _checked(export_project_assets_zip(project_id, actor=actor))["manifest"]
+    entries = manifest["assets"]
+    used: set = set()
+    with tempfile.TemporaryDirectory(prefix="studio-zip-") as scratch, \
+            zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        for i, entry in enumerate(entries):
+            local = _resolve_to_local_path(entry.get("url") or "", Path(scratch))
+            if local and os.path.isfile(local):
+                name = _unique_name(entry.get("filename") or Path(local).name, used)
+                compress = zipfile.ZIP_STORED if entry.get("kind") in _STORED_KINDS else zipfile.ZIP_DEFLATED
+                # ZipFile.write copies in chunks, so large media never sits in memory.
+                zf.write(local, arcname=f"assets/{name}", compress_type=compress)
+                entry["path"] = f"assets/{name}"
+                if local.startswith(scratch):
+                    os.remove(local)
+            else:
+                entry["missing"] = True
+            progress(100.0 * (i + 1) / max(1, len(entries)))
+        zf.writestr("manifest.json", json.dumps(manifest, indent=2))
+
+
+def _unique_name(name: str, used: set) -> str:
+    base = os.path.basename(name) or "asset"
+    stem, ext = os.path.splitext(base)
+    candidate, n = base, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{stem}_{n}{ext}"
+    used.add(candidate)
+    return candidate
+
+
+def _page_size(canvas: Dict[str, Any]) -> Tuple[int, int]:
+    w = int(canvas.get("width") or 1920)
+    h = int(canvas.get("height") or 1080)
+    if w > _MAX_PAGE_WIDTH:
+        h, w = round(h * _MAX_PAGE_WIDTH / w), _MAX_PAGE_WIDTH
+    return max(1, w), max(1, h)
+
+
+def _render_page(
+    item: Dict[str, Any],
+    size: Tuple[int, int],
+    caption: Optional[str],
+    scratch: str,
+) -> "Any":
+    """Render one page: the frame image fitted to the canvas, plus an
+    optional caption strip (storyboards)."""
+    from PIL import Image, ImageDraw, ImageOps
+
+    from .render_mp4 import _resolve_to_local_path
+
+    w, h = size
+    strip = max(24, h // 12) if caption else 0
+    page = Image.new("RGB", (w, h + strip), "white")
+    local = _resolve_to_local_path(item.get("imageUrl") or "", Path(scratch))
+    if local:
+        try:
+            with Image.open(local) as im:
+                im.draft("RGB", (w, h))  # cheap JPEG downscale on decode
+                fitted = ImageOps.contain(im.convert("RGB"), (w, h))
+            page.paste(fitted, ((w - fitted.width) // 2, (h - fitted.height) // 2))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("export page %s: cannot read %s: %s", item.get("index"), local, exc)
+    if caption:
+        ImageDraw.Draw(page).text((12, h + strip // 3), caption, fill="black")
+    return page
+
+
+def _iter_pages(
+    items: List[Dict[str, Any]],
+    canvas: Dict[str, Any],
+    captions: bool,
+    progress: ProgressFn,
+    span: float,
+) -> Iterator[Any]:
+    """Render pages in parallel (PIL drops the GIL while decoding and
+    resampling) and yield them in order; reports progress up to *span*
+    percent. At most two pages per render thread are held at once."""
+    size = _page_size(canvas)
+    if not items:
+        items = [{"index": 1, "imageUrl": "", "filename": ""}]
+    threads = _render_threads()
+
+    with tempfile.TemporaryDirectory(prefix="studio-pages-") as scratch, \
+            ThreadPoolExecutor(max_workers=threads, thread_name_prefix="studio-page") as pool:
+        def _one(item: Dict[str, Any]) -> Any:
+            caption = f"{item['index']}. {item.get('filename') or ''}".strip() if captions else None
+            return _render_page(item, size, caption, scratch)
+
+        pending: Deque[Future] = deque()
+        done = 0
+        todo = iter(items)
+        for item in itertools.islice(todo, 2 * threads):
+            pending.append(pool.submit(_one, item))
+        while pending:
+            page = pending.popleft().result()
+            nxt = next(todo, None)
+            if nxt is not None:
+                pending.append(pool.submit(_one, nxt))
+            done += 1
+            progress(span * done / len(items))
+            yield page
+
+
+class _PdfWriter:
+    """Minimal PDF writer: one full-page JPEG per page, written as it arrives.
+
+    PIL's PDF plugin needs every page up front (its append mode re-reads the
+    file for each page), so long exports would hold all pages in memory.
+    """
+
+    # Object numbers 1-3 are written last, once every page is known.
+    _CATALOG, _PAGES, _INFO = 1, 2, 3
+
+    def __init__(self, fh: IO[bytes], resolution: float = 96.0):
+        self._fh = fh
+        self._scale = 72.0 / resolution
+        self._offsets: Dict[int, int] = {}
+        self._pages: List[int] = []
+        self._next = 4
+        fh.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _obj(self, num: int, head: str, stream: Optional[bytes] = None) -> None:
+        self._offsets[num] = self._fh.tell()
+        self._fh.write(f"{num} 0 obj\n{head}\n".encode("ascii"))
+        if stream is not None:
+            self._fh.write(b"stream\n" + stream + b"\nendstream\n")
+        self._fh.write(b"endobj\n")
+
+    def add_page(self, page: Any) -> None:
+        buf = io.BytesIO()
+        page.convert("RGB").save(buf, "JPEG")
+        data = buf.getvalue()
+        w, h = page.size
+        pw, ph = w * self._scale, h * self._scale
+        image, content, node = self._next, self._next + 1, self._next + 2
+        self._next += 3
+        self._obj(image, f"<< /Type /XObject /Subtype /Image /Width {w} /Height {h} /ColorSpace /DeviceRGB "
+                         f"/BitsPerComponent 8 /Filter /DCTDecode /Length {len(data)} >>", data)
+        draw = f"q {pw:.2f} 0 0 {ph:.2f} 0 0 cm /Im0 Do Q".encode("ascii")
+        self._obj(content, f"<< /Length {len(draw)} >>", draw)
+        self._obj(node, f"<< /Type /Page /Parent {self._PAGES} 0 R /MediaBox [0 0 {pw:.2f} {ph:.2f}] "
+                        f"/Resources << /XObject << /Im0 {image} 0 R >> >> /Contents {content} 0 R >>")
+        self._pages.append(node)
+
+    def finish(self, title: str) -> None:
+        kids = " ".join(f"{n} 0 R" for n in self._pages)
+        self._obj(self._PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>")
+        self._obj(self._CATALOG, f"<< /Type /Catalog /Pages {self._PAGES} 0 R >>")
+        self._obj(self._INFO, f"<< /Title <FEFF{title.encode('utf-16-be').hex().upper()}> >>")
+        xref = self._fh.tell()
+        rows = "".join(f"{self._offsets[n]:010d} 00000 n \n" for n in range(1, self._next))
+        self._fh.write(
+            f"xref\n0 {self._next}\n0000000000 65535 f \n{rows}"
+            f"trailer\n<< /Size {self._next} /Root {self._CATALOG} 0 R /Info {self._INFO} 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n".encode("ascii")
+        )
+
+
+def _write_pdf(pages: Iterable[Any], out: Path, title: str) -> None:
+    with open(out, "wb") as fh:
+        writer = _PdfWriter(fh)
+        for page in pages:
+            writer.add_page(page)
+            page.close()
+        writer.finish(title)
+
+
+def _build_storyboard_pdf(project_id: str, out: Path, actor: str, progress: ProgressFn) -> None:
+    data = _checked(export_project_storyboard_pdf(project_id, actor=actor))["data"]
+    _write_pdf(_iter_pages(data["frames"], data["canvas"], True, progress, 90.0), out, data["title"])
+
+
+def _build_slides_pdf(project_id: str, out: Path, actor: str, progress: ProgressFn) -> None:
+    data = _checked(export_project_slides_pdf(project_id, actor=actor))["data"]
+    _write_pdf(_iter_pages(data["slides"], data["canvas"], False, progress, 90.0), out, data["title"])
+
+
+def _build_slides_pptx(project_id: str, out: Path, actor: str, progress: ProgressFn) -> None:
+    try:
+        from pptx import Presentation
+        from pptx.util import Emu
+    except ImportError as exc:
+        raise RuntimeError("PPTX export requires python-pptx (pip install python-pptx)") from exc
+
+    data = _checked(export_project_slides_pptx(project_id, actor=actor))["data"]
+    w, h = _page_size(data["canvas"])
+    emu_per_px = 9525  # 96 dpi
+
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = Emu(w * emu_per_px), Emu(h * emu_per_px)
+    blank = prs.slide_layouts[6]
+    with tempfile.TemporaryDirectory(prefix="studio-pptx-") as scratch:
+        for i, page in enumerate(_iter_pages(data["slides"], data["canvas"], False, progress, 80.0)):
+            png = os.path.join(scratch, f"{i:04d}.png")
+            page.save(png, "PNG")
+            page.close()
+            prs.slides.add_slide(blank).shapes.add_picture(
+                png, 0, 0, width=prs.slide_width, height=prs.slide_height,
+            )
+        prs.save(str(out))
+
+
+_BUILDERS: Dict[str, Callable[[str, Path, str, ProgressFn], None]] = {
+    "json_metadata": _build_json,
+    "storyboard_pdf": _build_storyboard_pdf,
+    "slides_pdf": _build_slides_pdf,
+    "slides_pptx": _build_slides_pptx,
+    "zip_assets": _build_zip,
+}
+
+
+# ---------------------------------------------------------------------------
+# Test / cleanup helpers
+# ---------------------------------------------------------------------------
+
+def _reset_for_tests() -> None:
+    """Clear the in-memory registry. Tests only — never call from prod code."""
+    with _jobs_lock:
+        _jobs.clear()
+        _inflight.clear()
+        _artifact_generations.clear()
+
+
+def wait_for(job_id: str, timeout: float = 30.0) -> Optional[ExportJob]:
+    """Block until a job finishes (CLI / tests); returns the final record."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = get_job(job_id)
+        if not job or job.status in ("done", "error"):
+            return job
+        time.sleep(0.02)
+    return get_job(job_id)
+
+
+def purge_project_artifacts(project_id: str) -> None:
+    """Remove every cached artifact for a project (e.g. on delete)."""
+    from .render_jobs import _exports_dir
+    root = _exports_dir() / "projects" / project_id
+    shutil.rmtree(root, ignore_errors=True)
+    with _jobs_lock:
+        for path in [p for p in _artifact_generations if Path(p).parent == root]:
+            _artifact_generations.pop(path, None)
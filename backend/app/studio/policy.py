@@ -29,6 +29,7 @@ import os
 import re
 from typing import List, Tuple
 
+from ..policy_engine import PolicyEngine, numbered
 from .models import PolicyDecision, ContentRating, PolicyMode, ProviderPolicy
 
 # ============================================================================
@@ -130,6 +131,21 @@ _SFW_RE = _compile_patterns(SFW_BLOCKLIST)
 _EXPLICIT_RE = _compile_patterns(EXPLICIT_BLOCKLIST)
 _MATURE_ALLOWED_RE = _compile_patterns(MATURE_ALLOWED_TERMS)
 
+# Each tier folded into one automaton; a prompt is scanned once per tier and
+# the result memoised (text + image policy usually check the same prompt).
+_ENGINE = PolicyEngine({
+    "absolute": numbered(ABSOLUTE_BLOCKLIST, "absolute"),
+    "sfw": numbered(SFW_BLOCKLIST, "sfw"),
+    "explicit": numbered(EXPLICIT_BLOCKLIST, "explicit"),
+    "mature_allowed": numbered(MATURE_ALLOWED_TERMS, "mature_allowed"),
+})
+
+
+def _tier_hit(text: str, tier: str) -> Tuple[bool, str]:
+    """Same contract as _check_patterns, served from the shared engine."""
+    hit = _ENGINE.scan(text).first(tier)
+    return (True, hit.preview) if hit else (False, "")
+
 
 def _check_patterns(text: str, patterns: List[re.Pattern]) -> Tuple[bool, str]:
     """Check text against patterns, return (matched, pattern_preview)."""
@@ -186,7 +202,7 @@ def enforce_policy(
     # ========================================================================
     # TIER 1: ABSOLUTE SAFETY - Always block (illegal/harmful)
     # ========================================================================
-    matched, term = _check_patterns(text, _ABSOLUTE_RE)
+    matched, term = _tier_hit(text, "absolute")
     if matched:
         return PolicyDecision(
             allowed=False,
@@ -199,7 +215,7 @@ def enforce_policy(
     # ========================================================================
     if content_rating == "sfw":
         # Block any mature/sensual content
-        matched, term = _check_patterns(text, _SFW_RE)
+        matched, term = _tier_hit(text, "sfw")
         if matched:
             return PolicyDecision(
                 allowed=False,
@@ -208,7 +224,7 @@ def enforce_policy(
             )
 
         # Also block explicit content in SFW
-        matched, term = _check_patterns(text, _EXPLICIT_RE)
+        matched, term = _tier_hit(text, "explicit")
         if matched:
             return PolicyDecision(
                 allowed=False,
@@ -263,7 +279,7 @@ def enforce_policy(
     # ========================================================================
     # TIER 2: EXPLICIT BLOCK - Even in Mature mode, pornographic content blocked
     # ========================================================================
-    matched, term = _check_patterns(text, _EXPLICIT_RE)
+    matched, term = _tier_hit(text, "explicit")
     if matched:
         return PolicyDecision(
             allowed=False,
@@ -280,7 +296,7 @@ def enforce_policy(
     # - Literary/romantic terms are allowed
 
     # Check if content uses mature-allowed terms (for logging)
-    uses_mature_terms, _ = _check_patterns(text, _MATURE_ALLOWED_RE)
+    uses_mature_terms, _ = _tier_hit(text, "mature_allowed")
     flags = ["mature_allowed"]
     if uses_mature_terms:
         flags.append("literary_mature_content")
@@ -379,7 +395,7 @@ def enforce_image_policy(
     # TIER 1: ABSOLUTE SAFETY - Always block (illegal/harmful)
     # Same for ALL content types - no exceptions
     # ========================================================================
-    matched, term = _check_patterns(text, _ABSOLUTE_RE)
+    matched, term = _tier_hit(text, "absolute")
     if matched:
         return PolicyDecision(
             allowed=False,
@@ -392,7 +408,7 @@ def enforce_image_policy(
     # ========================================================================
     if content_rating == "sfw":
         # Block any mature/sensual content in SFW
-        matched, term = _check_patterns(text, _SFW_RE)
+        matched, term = _tier_hit(text, "sfw")
         if matched:
             return PolicyDecision(
                 allowed=False,
@@ -400,7 +416,7 @@ def enforce_image_policy(
                 flags=["sfw_block", f"matched:{term}"]
             )
 
-        matched, term = _check_patterns(text, _EXPLICIT_RE)
+        matched, term = _tier_hit(text, "explicit")
         if matched:
             return PolicyDecision(
                 allowed=False,
@@ -2587,6 +2587,7 @@ def project_delete(project_id: str):
     deleted = delete_project(project_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Project not found")
+    export_jobs.purge_project_artifacts(project_id)
     return {"ok": True}
 
 
@@ -2972,6 +2973,47 @@ def project_do_export(project_id: str, req: ProjectExportRequest):
     return export_project(project_id, kind=req.kind)
 
 
+# Background exports build the real artifact (PDF / PPTX / ZIP / JSON) off
+# the request thread and cache it per project version. POST returns 202 +
+# a job; poll GET .../export/jobs/{job_id} and download when status == "done".
+# An unchanged project comes back already "done" with cached == true.
+
+from . import export_jobs
+
+
+@router.post("/projects/{project_id}/export/jobs", status_code=202)
+def project_export_job_submit(project_id: str, req: ProjectExportRequest):
+    """Start (or reuse) a background export job for a professional project."""
+    result = export_jobs.submit_export(project_id, req.kind)
+    if not result.get("ok"):
+        code = 404 if result.get("error") == "Project not found" else 400
+        raise HTTPException(status_code=code, detail=result.get("error"))
+    return result["job"]
+
+
+@router.get("/projects/{project_id}/export/jobs/{job_id}")
+def project_export_job_status(project_id: str, job_id: str):
+    """Poll an export job's status and progress."""
+    job = export_jobs.get_job(job_id)
+    if not job or job.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/projects/{project_id}/export/jobs/{job_id}/download")
+def project_export_job_download(project_id: str, job_id: str):
+    """Stream a finished export artifact."""
+    job = export_jobs.get_job(job_id)
+    if not job or job.project_id != project_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "done" or not job.output_path:
+        raise HTTPException(status_code=409, detail=f"Job not ready (status={job.status})")
+    if not os.path.exists(job.output_path):
+        raise HTTPException(status_code=410, detail="Export no longer available")
+    from fastapi.responses import FileResponse
+    return FileResponse(job.output_path, media_type=job.media_type, filename=job.filename)
+
+
 # ============================================================================
 # Creator Studio MP4 Export
 # ----------------------------------------------------------------------------
@@ -150,20 +150,21 @@ def build_persona_prompt(
       - Knowledge base: RAG context relevant to the conversation topic
       - Meeting context: room name, agenda, other participants (with roles)
     """
-    persona_agent = persona_project.get("persona_agent") or {}
+    from ..projects import persona_identity
+
     project_id = persona_project.get("id") or ""
 
     # ── Persona identity ─────────────────────────────────────────────
-    name = persona_project.get("name") or "Persona"
-    label = persona_agent.get("label") or name
-    role = persona_agent.get("role") or ""
-    persona_class = persona_agent.get("persona_class") or ""
-    description = persona_project.get("description") or ""
-    tone = (persona_agent.get("response_style") or {}).get("tone", "")
+    identity = persona_identity(persona_project)
+    name = identity["name"] or "Persona"
+    label = identity["label"] or name
+    role = identity["role"] or ""
+    persona_class = identity["persona_class"] or ""
+    description = identity["description"] or ""
+    tone = identity["tone"] or ""
 
     # ── Training / personality ───────────────────────────────────────
-    instructions = persona_project.get("instructions") or ""
-    system_prompt = persona_agent.get("system_prompt") or instructions
+    system_prompt = identity["system_prompt"] or identity["instructions"] or ""
 
     # ── Meeting context ──────────────────────────────────────────────
     meeting_name = room.get("name") or "Meeting"
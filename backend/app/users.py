@@ -27,6 +27,7 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 from .config import SQLITE_PATH, UPLOAD_DIR
+from .session_cache import MISS as _CACHE_MISS, memo_get, memo_put, token_cache
 
 # Try to import bcrypt for stronger password hashing (preferred).
 # Falls back to SHA-256+salt if bcrypt is not installed.
@@ -160,6 +161,7 @@ def _upgrade_password_hash_if_needed(user_id: str, password: str, stored_hash: s
     )
     con.commit()
     con.close()
+    _invalidate_cached_user(user_id)
 
 
 # ---------------------------------------------------------------------------
@@ -221,18 +223,32 @@ def _set_session_cookie(resp: JSONResponse, token: str) -> JSONResponse:
 
 
 def _validate_token(token: str) -> Optional[Dict[str, Any]]:
-    """Validate a bearer token. Checks expiry. Returns user dict or None."""
+    """Validate a bearer token. Checks expiry. Returns user dict or None.
+
+    Served from the request memo, then the session token cache
+    (session_cache.py); only a miss on both runs the DB join.
+    """
     if not token:
         return None
 
+    user = memo_get(token)
+    if user is not _CACHE_MISS:
+        return user
+
     path = _get_db_path()
+    token_cache.bind(path)
+    user = token_cache.get(token)
+    if user is not _CACHE_MISS:
+        memo_put(token, user)
+        return user
+
     con = sqlite3.connect(path)
     con.row_factory = sqlite3.Row
     cur = con.cursor()
 
     now = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
     cur.execute("""
-        SELECT u.* FROM users u
+        SELECT u.*, s.expires_at AS _session_expires_at FROM users u
         JOIN user_sessions s ON s.user_id = u.id
         WHERE s.token = ?
           AND (s.expires_at IS NULL OR s.expires_at > ?)
@@ -242,9 +258,14 @@ def _validate_token(token: str) -> Optional[Dict[str, Any]]:
     con.close()
 
     if not row:
+        memo_put(token, None)
         return None
 
-    return dict(row)
+    user = dict(row)
+    session_expires_at = user.pop("_session_expires_at", None)
+    token_cache.put(token, user, session_expires_at)
+    memo_put(token, user)
+    return user
 
 
 def _invalidate_token(token: str) -> None:
@@ -255,6 +276,14 @@ def _invalidate_token(token: str) -> None:
     cur.execute("DELETE FROM user_sessions WHERE token = ?", (token,))
     con.commit()
     con.close()
+    token_cache.bind(path)
+    token_cache.invalidate_token(token)
+
+
+def _invalidate_cached_user(user_id: str) -> None:
+    """Drop cached sessions of a user whose row changed (profile, password, …)."""
+    token_cache.bind(_get_db_path())
+    token_cache.invalidate_user(user_id)
 
 
 # ---------------------------------------------------------------------------
@@ -342,6 +371,7 @@ def set_cloud_link(user_id: str, cloud_user_id: str, auth_provider: str = "ollab
     )
     con.commit()
     con.close()
+    _invalidate_cached_user(user_id)
 
 
 def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
@@ -818,6 +848,8 @@ def _invalidate_other_sessions(user_id: str, keep_token: str) -> int:
     count = cur.rowcount or 0
     con.commit()
     con.close()
+    token_cache.bind(path)
+    token_cache.invalidate_user(user_id, keep_token=keep_token)
     return count
 
 
@@ -878,6 +910,7 @@ def change_password(
     )
     con.commit()
     con.close()
+    _invalidate_cached_user(user["id"])
 
     # 4. Optional: invalidate other sessions.
     revoked = 0
@@ -1048,6 +1081,7 @@ def complete_onboarding(body: OnboardingRequest, authorization: str = Header(def
     ))
     con.commit()
     con.close()
+    _invalidate_cached_user(user["id"])
 
     # Legacy bridge: only update global profile.json when the instance is
     # still in single-user mode.  In multi-user setups writing here would
@@ -1153,8 +1187,9 @@ async def upload_avatar(
     if old_url and old_url.startswith("/files/"):
         old_path = os.path.join(upload_dir, old_url.replace("/files/", "", 1))
         try:
-            if os.path.exists(old_path):
-                os.remove(old_path)
+            from pathlib import Path
+            from . import blob_store
+            blob_store.remove(Path(old_path))
         except Exception:
             pass  # Non-fatal
 
@@ -1168,6 +1203,7 @@ async def upload_avatar(
     )
     con.commit()
     con.close()
+    _invalidate_cached_user(user["id"])
 
     return {"ok": True, "avatar_url": avatar_url}
 
@@ -1190,8 +1226,9 @@ def delete_avatar(authorization: str = Header(default="")):
             upload_dir = str(_backend_dir / "data" / "uploads")
         old_path = os.path.join(upload_dir, old_url.replace("/files/", "", 1))
         try:
-            if os.path.exists(old_path):
-                os.remove(old_path)
+            from pathlib import Path
+            from . import blob_store
+            blob_store.remove(Path(old_path))
         except Exception:
             pass
 
@@ -1205,5 +1242,6 @@ def delete_avatar(authorization: str = Header(default="")):
     )
     con.commit()
     con.close()
+    _invalidate_cached_user(user["id"])
 
     return {"ok": True}
@@ -4,19 +4,28 @@ Provides RAG (Retrieval Augmented Generation) capabilities for project knowledge
 """
 import os
 import hashlib
+import importlib.util
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
-try:
-    import chromadb
-    from chromadb.config import Settings
-    CHROMADB_AVAILABLE = True
-except ImportError:
-    CHROMADB_AVAILABLE = False
-    chromadb = None
-    Settings = None
+# chromadb costs ~0.8s to import (telemetry, grpc, numpy); only check that it
+# is installed here and import it on first client creation.
+CHROMADB_AVAILABLE = importlib.util.find_spec("chromadb") is not None
+chromadb = None
+Settings = None
+if not CHROMADB_AVAILABLE:
     print("Warning: chromadb package not installed. Install with: pip install chromadb")
 
+
+def _load_chromadb():
+    """Import chromadb on first use (module globals are filled in once)."""
+    global chromadb, Settings
+    if chromadb is None:
+        import chromadb as _chromadb
+        from chromadb.config import Settings as _Settings
+        chromadb, Settings = _chromadb, _Settings
+    return chromadb
+
 # Optional document format support (additive)
 try:
     import docx as _docx_lib  # python-docx
@@ -46,6 +55,7 @@ def get_chroma_client():
 
     CHROMA_DB_PATH.mkdir(parents=True, exist_ok=True)
 
+    _load_chromadb()
     client = chromadb.PersistentClient(
         path=str(CHROMA_DB_PATH),
         settings=Settings(
@@ -0,0 +1,103 @@
+"""
+World-State Registry — one WorldStateService per VR session.
+
+Sessions are created on first use and dropped after WORLD_STATE_SESSION_TTL_S
+without an update; past WORLD_STATE_MAX_SESSIONS the least recently updated
+session is evicted. Each session has its own lock, so concurrent sessions
+never wait on each other.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .service import DEFAULT_CELL_SIZE_M, WorldStateService
+
+SESSION_TTL_S = float(os.getenv("WORLD_STATE_SESSION_TTL_S", "3600"))
+MAX_SESSIONS = int(os.getenv("WORLD_STATE_MAX_SESSIONS", "256"))
+CELL_SIZE_M = float(os.getenv("WORLD_STATE_CELL_SIZE_M", str(DEFAULT_CELL_SIZE_M)))
+# Upper bound on deltas pushed per second to each WebSocket subscriber.
+TICK_HZ = float(os.getenv("WORLD_STATE_TICK_HZ", "20"))
+
+# Idle sessions are swept at most this often.
+_SWEEP_EVERY_S = 60.0
+
+
+class WorldStateRegistry:
+    """Thread-safe map of session id -> WorldStateService."""
+
+    def __init__(
+        self,
+        session_ttl_s: float = SESSION_TTL_S,
+        max_sessions: int = MAX_SESSIONS,
+        cell_size_m: float = CELL_SIZE_M,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, WorldStateService] = {}
+        self._ttl_s = session_ttl_s
+        self._max = max(1, max_sessions)
+        self._cell_size_m = cell_size_m
+        self._swept_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[WorldStateService]:
+        return self._sessions.get(session_id or "default")
+
+    def get_or_create(self, session_id: str) -> WorldStateService:
+        session_id = session_id or "default"
+        svc = self._sessions.get(session_id)
+        if svc is not None:
+            return svc
+        with self._lock:
+            svc = self._sessions.get(session_id)
+            if svc is None:
+                now = time.time()
+                if now - self._swept_at >= _SWEEP_EVERY_S:
+                    self._evict_idle_locked(now)
+                if len(self._sessions) >= self._max:
+                    oldest = min(self._sessions.values(), key=lambda s: s.touched_at)
+                    del self._sessions[oldest.session_id]
+                svc = self._sessions[session_id] = WorldStateService(session_id, self._cell_size_m)
+            return svc
+
+    def drop(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def session_ids(self) -> List[str]:
+        return list(self._sessions)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        with self._lock:
+            return self._evict_idle_locked(time.time() if now is None else now)
+
+    def _evict_idle_locked(self, now: float) -> int:
+        self._swept_at = now
+        stale = [sid for sid, svc in self._sessions.items() if now - svc.touched_at > self._ttl_s]
+        for sid in stale:
+            del self._sessions[sid]
+        return len(stale)
+
+
+_registry: Optional[WorldStateRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> WorldStateRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = WorldStateRegistry()
+    return _registry
+
+
+def reset_registry() -> None:
+    """Drop every session (tests)."""
+    global _registry
+    with _registry_lock:
+        _registry = None
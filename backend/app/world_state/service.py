@@ -3,13 +3,33 @@ World-State Service — in-memory spatial state for VR sessions.
 
 The VR client pushes position updates; the embodiment planner reads them.
 Thread-safe via simple locking.
+
+Anchors and avatars are kept in uniform-grid spatial indexes, so nearest
+and radius queries only look at the cells around the query point. Every
+change bumps a per-session version and stamps the changed entity with it;
+``delta_since(v)`` returns just the entities changed after ``v``, which is
+what the WebSocket stream pushes each tick. Versions are only comparable
+within one service instance, so each instance also carries a random
+``epoch`` that clients echo back with ``since``.
 """
 from __future__ import annotations
 
 import threading
 import time
+import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from .spatial import SpatialGrid
+
+DEFAULT_CELL_SIZE_M = 4.0
+
+# Removed-anchor tombstones kept for deltas; older clients get a full snapshot.
+MAX_TOMBSTONES = 4096
+
+# Anchors listed in the per-turn perception view (counts cover all of them).
+PERCEPTION_ANCHORS = 16
 
 
 @dataclass
@@ -29,6 +49,9 @@ class Vector3:
     def distance_to(self, other: "Vector3") -> float:
         return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2 + (self.z - other.z) ** 2) ** 0.5
 
+    def as_tuple(self) -> Tuple[float, float, float]:
+        return (float(self.x), float(self.y), float(self.z))
+
 
 @dataclass
 class Anchor:
@@ -77,13 +100,46 @@ class EntityState:
 
 
 class WorldStateService:
-    """In-memory world state for a single VR session."""
+    """In-memory, versioned world state for a single VR session."""
 
-    def __init__(self) -> None:
+    def __init__(self, session_id: str = "default", cell_size_m: float = DEFAULT_CELL_SIZE_M) -> None:
+        self.session_id = session_id
         self._lock = threading.Lock()
         self._user = EntityState()
         self._avatars: Dict[str, EntityState] = {}
         self._anchors: Dict[str, Anchor] = {}
+        self._anchor_index = SpatialGrid(cell_size_m)
+        self._anchor_index_by_type: Dict[str, SpatialGrid] = {}
+        self._avatar_index = SpatialGrid(cell_size_m)
+        self._cell_size_m = cell_size_m
+
+        # (kind, id) -> version of its last change, oldest first; kind is
+        # "user", "avatar", "anchor" or "removed" (an anchor tombstone).
+        self._version = 0
+        self._log: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._tombstones = 0
+        self._tombstone_floor = 0
+        self.epoch = uuid.uuid4().hex[:12]
+        self.touched_at = time.time()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _bump(self) -> int:
+        self._version += 1
+        self.touched_at = time.time()
+        return self._version
+
+    def keep_alive(self) -> None:
+        """Mark the session as in use without changing its state."""
+        self.touched_at = time.time()
+
+    def _touch(self, kind: str, key: str, version: int) -> None:
+        self._log.pop((kind, key), None)
+        self._log[(kind, key)] = version
+
+    # ── writes ─────────────────────────────────────────────────────────
 
     def update_user(self, data: Dict[str, Any]) -> None:
         with self._lock:
@@ -100,6 +156,7 @@ class WorldStateService:
             if "velocity_mps" in data:
                 self._user.velocity_mps = data["velocity_mps"]
             self._user.updated_at = time.time()
+            self._touch("user", "", self._bump())
 
     def update_avatar(self, persona_id: str, data: Dict[str, Any]) -> None:
         with self._lock:
@@ -111,10 +168,13 @@ class WorldStateService:
             if "state" in data:
                 avatar.state = data["state"]
             avatar.updated_at = time.time()
+            self._avatar_index.insert(persona_id, avatar.position.as_tuple())
+            self._touch("avatar", persona_id, self._bump())
 
     def set_anchors(self, anchors: List[Dict[str, Any]]) -> None:
+        """Replace the anchor set; anchors that did not change keep their version."""
         with self._lock:
-            self._anchors.clear()
+            incoming: Dict[str, Anchor] = {}
             for a in anchors:
                 anchor = Anchor(
                     id=a.get("id", ""),
@@ -122,7 +182,54 @@ class WorldStateService:
                     position=Vector3.from_dict(a.get("position", {})),
                     rotation_y_deg=a.get("rotation_y_deg", 0.0),
                 )
+                incoming[anchor.id] = anchor
+
+            removed = [aid for aid in self._anchors if aid not in incoming]
+            changed = [a for aid, a in incoming.items() if self._anchors.get(aid) != a]
+            if not removed and not changed:
+                return
+            version = self._bump()
+            for aid in removed:
+                self._unindex_anchor(self._anchors.pop(aid))
+                self._log.pop(("anchor", aid), None)
+                self._touch("removed", aid, version)
+                self._tombstones += 1
+            for anchor in changed:
+                old = self._anchors.get(anchor.id)
+                if old is not None:
+                    self._unindex_anchor(old)
                 self._anchors[anchor.id] = anchor
+                if self._log.pop(("removed", anchor.id), None) is not None:
+                    self._tombstones -= 1
+                self._touch("anchor", anchor.id, version)
+                p = anchor.position.as_tuple()
+                self._anchor_index.insert(anchor.id, p)
+                grid = self._anchor_index_by_type.get(anchor.type)
+                if grid is None:
+                    grid = self._anchor_index_by_type[anchor.type] = SpatialGrid(self._cell_size_m)
+                grid.insert(anchor.id, p)
+            self._prune_tombstones()
+
+    def _unindex_anchor(self, anchor: Anchor) -> None:
+        self._anchor_index.remove(anchor.id)
+        grid = self._anchor_index_by_type.get(anchor.type)
+        if grid is not None:
+            grid.remove(anchor.id)
+            if not len(grid):
+                del self._anchor_index_by_type[anchor.type]
+
+    def _prune_tombstones(self) -> None:
+        if self._tombstones <= MAX_TOMBSTONES:
+            return
+        for key, version in list(self._log.items()):
+            if self._tombstones <= MAX_TOMBSTONES // 2:
+                break
+            if key[0] == "removed":
+                del self._log[key]
+                self._tombstones -= 1
+                self._tombstone_floor = version
+
+    # ── reads ──────────────────────────────────────────────────────────
 
     def get_user(self) -> EntityState:
         with self._lock:
@@ -138,10 +245,40 @@ class WorldStateService:
 
     def find_nearest_anchor(self, anchor_type: str, to: Vector3) -> Optional[Anchor]:
         with self._lock:
-            candidates = [a for a in self._anchors.values() if a.type == anchor_type]
-            if not candidates:
+            grid = self._anchor_index_by_type.get(anchor_type)
+            if grid is None:
                 return None
-            return min(candidates, key=lambda a: a.position.distance_to(to))
+            hits = grid.nearest(to.as_tuple(), 1)
+            return self._anchors[hits[0][1]] if hits else None
+
+    def nearest_anchors(
+        self,
+        to: Vector3,
+        k: int = 1,
+        anchor_type: Optional[str] = None,
+        max_distance_m: Optional[float] = None,
+    ) -> List[Tuple[Anchor, float]]:
+        """The ``k`` anchors closest to ``to`` with their distances, nearest first."""
+        with self._lock:
+            grid = self._anchor_index if anchor_type is None else self._anchor_index_by_type.get(anchor_type)
+            if grid is None:
+                return []
+            return [(self._anchors[aid], d) for d, aid in grid.nearest(to.as_tuple(), k, max_distance_m)]
+
+    def anchors_within(self, to: Vector3, radius_m: float, anchor_type: Optional[str] = None) -> List[Tuple[Anchor, float]]:
+        with self._lock:
+            grid = self._anchor_index if anchor_type is None else self._anchor_index_by_type.get(anchor_type)
+            if grid is None:
+                return []
+            return [(self._anchors[aid], d) for d, aid in grid.within(to.as_tuple(), radius_m)]
+
+    def avatars_within(self, to: Vector3, radius_m: float) -> List[Tuple[str, float]]:
+        with self._lock:
+            return [(pid, d) for d, pid in self._avatar_index.within(to.as_tuple(), radius_m)]
+
+    def anchor_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {t: len(grid) for t, grid in self._anchor_index_by_type.items()}
 
     def user_avatar_distance(self, persona_id: str) -> Optional[float]:
         with self._lock:
@@ -153,7 +290,86 @@ class WorldStateService:
     def snapshot(self) -> Dict[str, Any]:
         with self._lock:
             return {
+                "version": self._version,
                 "user": self._user.to_dict(),
                 "avatars": {k: v.to_dict() for k, v in self._avatars.items()},
                 "anchors": [a.to_dict() for a in self._anchors.values()],
             }
+
+    def delta_since(self, since: int, epoch: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Entities changed after version ``since``.
+
+        Falls back to a full snapshot (``full: true``) when ``since`` is 0,
+        ahead of this session, older than the kept removal tombstones, or
+        when ``epoch`` names another incarnation of the session (e.g. after
+        a server restart or eviction).
+        """
+        with self._lock:
+            version = self._version
+            stale = epoch is not None and epoch != self.epoch
+            if stale or since <= 0 or since > version or since < self._tombstone_floor:
+                return {
+                    "full": True,
+                    "epoch": self.epoch,
+                    "version": version,
+                    "user": self._user.to_dict(),
+                    "avatars": {k: v.to_dict() for k, v in self._avatars.items()},
+                    "anchors": [a.to_dict() for a in self._anchors.values()],
+                    "removed_anchors": [],
+                }
+            delta: Dict[str, Any] = {"full": False, "epoch": self.epoch, "since": since, "version": version}
+            avatars: Dict[str, Any] = {}
+            anchors: List[Dict[str, Any]] = []
+            removed: List[str] = []
+            for (kind, key), v in reversed(self._log.items()):
+                if v <= since:
+                    break
+                if kind == "user":
+                    delta["user"] = self._user.to_dict()
+                elif kind == "avatar":
+                    avatars[key] = self._avatars[key].to_dict()
+                elif kind == "anchor":
+                    anchors.append(self._anchors[key].to_dict())
+                else:
+                    removed.append(key)
+            delta.update(avatars=avatars, anchors=anchors[::-1], removed_anchors=removed[::-1])
+            return delta
+
+    def perception_view(self, persona_id: str) -> Dict[str, Any]:
+        """
+        Flat ``WorldSnapshot`` for one persona-graph turn.
+
+        Lists only the anchors nearest the user (counts cover the rest), and
+        resolves the persona's nearest seat from the index, so the per-turn
+        cost does not grow with the size of the room.
+        """
+        with self._lock:
+            user = self._user
+            view: Dict[str, Any] = {
+                "session_id": self.session_id,
+                "version": self._version,
+                "user_position": user.position.to_dict(),
+                "user_head_rotation_y_deg": user.head_rotation_y_deg,
+                "user_velocity_mps": user.velocity_mps,
+                "user_left_hand": user.left_hand.to_dict() if user.left_hand else None,
+                "user_right_hand": user.right_hand.to_dict() if user.right_hand else None,
+                "anchor_counts": {t: len(grid) for t, grid in self._anchor_index_by_type.items()},
+            }
+            if user.head_position:
+                view["user_head_position"] = user.head_position.to_dict()
+            near_user = self._anchor_index.nearest(user.position.as_tuple(), PERCEPTION_ANCHORS)
+            view["anchors"] = [dict(self._anchors[aid].to_dict(), distance_m=round(d, 3)) for d, aid in near_user]
+
+            avatar = self._avatars.get(persona_id)
+            origin = user.position
+            if avatar is not None:
+                origin = avatar.position
+                view["avatar_position"] = avatar.position.to_dict()
+                view["avatar_state"] = avatar.state
+                view["avatar_distance_m"] = user.position.distance_to(avatar.position)
+            seats = self._anchor_index_by_type.get("seat")
+            hit = seats.nearest(origin.as_tuple(), 1) if seats is not None else []
+            if hit:
+                view["nearest_seat"] = dict(self._anchors[hit[0][1]].to_dict(), distance_m=round(hit[0][0], 3))
+            return view
@@ -0,0 +1,150 @@
+"""
+Uniform-grid spatial index for anchors and avatars.
+
+Room-scale scenes are bounded and fairly evenly populated, so a hash of
+fixed-size cells works better than a tree: inserts and moves are O(1), and a
+query only visits the cells that overlap its search sphere. ``nearest``
+grows a cube of cells ring by ring and stops as soon as the k best hits are
+closer than anything an unvisited ring could hold.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+Point = Tuple[float, float, float]
+Cell = Tuple[int, int, int]
+
+
+def _dist(a: Point, b: Point) -> float:
+    return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
+
+
+class SpatialGrid:
+    """Points keyed by id, bucketed into cubic cells of ``cell_size`` metres."""
+
+    def __init__(self, cell_size: float = 2.0) -> None:
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self._cells: Dict[Cell, Set[str]] = {}
+        self._points: Dict[str, Point] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._points
+
+    def _cell(self, p: Point) -> Cell:
+        s = self.cell_size
+        return (math.floor(p[0] / s), math.floor(p[1] / s), math.floor(p[2] / s))
+
+    def position(self, key: str) -> Optional[Point]:
+        return self._points.get(key)
+
+    def insert(self, key: str, p: Point) -> None:
+        """Add ``key`` at ``p``, or move it there if already present."""
+        old = self._points.get(key)
+        cell = self._cell(p)
+        if old is not None:
+            old_cell = self._cell(old)
+            if old_cell == cell:
+                self._points[key] = p
+                return
+            self._discard(key, old_cell)
+        self._points[key] = p
+        self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key: str) -> bool:
+        p = self._points.pop(key, None)
+        if p is None:
+            return False
+        self._discard(key, self._cell(p))
+        return True
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._points.clear()
+
+    def _discard(self, key: str, cell: Cell) -> None:
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+
+    def _ring(self, center: Cell, r: int) -> Iterator[Cell]:
+        """Cells at Chebyshev distance exactly ``r`` from ``center``."""
+        cx, cy, cz = center
+        if r == 0:
+            yield center
+            return
+        for dx in range(-r, r + 1):
+            for dy in range(-r, r + 1):
+                if abs(dx) == r or abs(dy) == r:
+                    for dz in range(-r, r + 1):
+                        yield (cx + dx, cy + dy, cz + dz)
+                else:
+                    yield (cx + dx, cy + dy, cz - r)
+                    yield (cx + dx, cy + dy, cz + r)
+
+    def within(self, p: Point, radius: float) -> List[Tuple[float, str]]:
+        """All (distance, key) within ``radius`` of ``p``, nearest first."""
+        if not self._points or radius < 0:
+            return []
+        lo = self._cell((p[0] - radius, p[1] - radius, p[2] - radius))
+        hi = self._cell((p[0] + radius, p[1] + radius, p[2] + radius))
+        span = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) * (hi[2] - lo[2] + 1)
+        if span > len(self._cells):
+            buckets: List[Set[str]] = list(self._cells.values())
+        else:
+            buckets = [
+                self._cells[c]
+                for c in (
+                    (x, y, z)
+                    for x in range(lo[0], hi[0] + 1)
+                    for y in range(lo[1], hi[1] + 1)
+                    for z in range(lo[2], hi[2] + 1)
+                )
+                if c in self._cells
+            ]
+        hits = []
+        for bucket in buckets:
+            for key in bucket:
+                d = _dist(p, self._points[key])
+                if d <= radius:
+                    hits.append((d, key))
+        hits.sort()
+        return hits
+
+    def nearest(self, p: Point, k: int = 1, max_radius: Optional[float] = None) -> List[Tuple[float, str]]:
+        """The ``k`` nearest (distance, key) to ``p``, optionally within ``max_radius``."""
+        if not self._points or k <= 0:
+            return []
+        if max_radius is not None:
+            return self.within(p, max_radius)[:k]
+        center = self._cell(p)
+        occupied = len(self._cells)
+        best: List[Tuple[float, str]] = []  # max-heap via negated distance
+        r = 0
+        while True:
+            if (2 * r + 1) ** 3 > 8 * occupied:
+                # The cube now covers more empty cells than there are
+                # buckets: finishing with a plain scan is cheaper.
+                return heapq.nsmallest(k, ((_dist(p, q), key) for key, q in self._points.items()))
+            for cell in self._ring(center, r):
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                for key in bucket:
+                    d = _dist(p, self._points[key])
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, key))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, key))
+            # Anything outside the cube is at least r cells away on one axis.
+            if len(best) >= k and -best[0][0] <= r * self.cell_size:
+                return sorted((-nd, key) for nd, key in best)
+            r += 1
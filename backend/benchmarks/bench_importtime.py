@@ -0,0 +1,140 @@
+"""
+Cold-start regression benchmark: summarise ``python -X importtime`` for app.main.
+
+Runs ``import app.main`` in a fresh interpreter (best of ``--runs``), parses
+the importtime trace and prints:
+
+  - total cumulative import time of ``app.main``
+  - the heaviest modules by cumulative time (``--top``)
+  - any *deferred* module that was imported eagerly anyway
+
+Deferred modules are the ones the lazy router mount / lazy imports are meant
+to keep off the startup path (chromadb, interactive, teams, agentic routes,
+profile).  The script exits non-zero when one of them shows up or when the
+total exceeds ``--budget-ms``, so it can gate CI.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_importtime [--runs 3] [--top 25] [--budget-ms 4500] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+DEFERRED_MODULES = (
+    "chromadb",
+    "app.interactive",
+    "app.teams.routes",
+    "app.teams.bridge_routes",
+    "app.agentic.routes",
+    "app.profile",
+)
+
+
+def _run_once() -> List[Tuple[str, int, int, int]]:
+    """Return [(module, self_us, cumulative_us, depth)] for one cold import."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault("UPLOAD_DIR", os.path.join(tmp, "uploads"))
+        env.setdefault("SQLITE_PATH", os.path.join(tmp, "bench.db"))
+        env.setdefault("OUTPUT_DIR", os.path.join(tmp, "outputs"))
+        env["HOMEPILOT_NO_SIGNAL_HANDLER"] = "1"
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app.main"],
+            cwd=str(BACKEND_DIR),
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    if proc.returncode != 0:
+        raise SystemExit(f"import app.main failed:\n{proc.stderr[-2000:]}")
+
+    rows: List[Tuple[str, int, int, int]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            _, rest = line.split(":", 1)
+            self_us, cum_us, name = rest.split("|", 2)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), int(self_us), int(cum_us), depth))
+    return rows
+
+
+def summarise(rows: List[Tuple[str, int, int, int]], top: int) -> Dict[str, object]:
+    cumulative = {name: cum for name, _, cum, _ in rows}
+    total_us = cumulative.get("app.main", 0)
+    heaviest = sorted(rows, key=lambda r: r[2], reverse=True)
+    seen = set()
+    top_rows = []
+    for name, self_us, cum_us, _ in heaviest:
+        if name in seen or name == "app.main":
+            continue
+        seen.add(name)
+        top_rows.append({"module": name, "cumulative_ms": round(cum_us / 1000, 1),
+                         "self_ms": round(self_us / 1000, 1)})
+        if len(top_rows) >= top:
+            break
+    eager = sorted(
+        name for name in cumulative
+        if any(name == d or name.startswith(d + ".") for d in DEFERRED_MODULES)
+    )
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "module_count": len(cumulative),
+        "top": top_rows,
+        "eager_deferred": eager,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--top", type=int, default=25)
+    ap.add_argument("--budget-ms", type=float, default=0.0,
+                    help="fail if app.main cumulative import time exceeds this (0 = no budget)")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    best = None
+    for _ in range(max(1, args.runs)):
+        summary = summarise(_run_once(), args.top)
+        if best is None or summary["total_ms"] < best["total_ms"]:
+            best = summary
+    assert best is not None
+
+    if args.json:
+        print(json.dumps(best, indent=2))
+    else:
+        print(f"app.main import: {best['total_ms']:.0f} ms "
+              f"({best['module_count']} modules, best of {args.runs})")
+        print(f"{'cumulative':>11} {'self':>8}  module")
+        for row in best["top"]:
+            print(f"{row['cumulative_ms']:>9.1f}ms {row['self_ms']:>6.1f}ms  {row['module']}")
+
+    failed = False
+    if best["eager_deferred"]:
+        failed = True
+        print("\nFAIL: deferred modules imported at startup: "
+              + ", ".join(best["eager_deferred"][:10]), file=sys.stderr)
+    if args.budget_ms and best["total_ms"] > args.budget_ms:
+        failed = True
+        print(f"\nFAIL: {best['total_ms']:.0f} ms exceeds budget {args.budget_ms:.0f} ms",
+              file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Micro-benchmark: compiled policy engine vs. the legacy per-regex loops.
+
+Legacy path (before the shared engine):
+  studio  — ``_check_patterns`` over each tier list, one ``re.search`` per rule
+  intent  — loop over ``classifier._RULES`` until the first match
+
+Compiled path:
+  studio  — ``PolicyEngine.scan`` (one scan per tier, LRU across repeats)
+  intent  — ``CompiledTier.first`` over the same rules
+
+The corpus mixes image/story generation prompts and interactive turns; pass
+``--corpus FILE`` (one prompt per line) to replay real traffic instead.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_policy_engine [--iterations 200] [--corpus prompts.txt]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.interactive.policy import classifier  # noqa: E402
+from app.policy_engine import CompiledTier, PolicyEngine, numbered  # noqa: E402
+from app.studio import policy  # noqa: E402
+
+CORPUS = [
+    "portrait photo of an astronaut floating above earth, cinematic lighting, 85mm, f/1.8",
+    "cozy cabin in a snowy forest at dusk, warm windows, watercolor style",
+    "a knight in ornate armor standing on a cliff, dramatic clouds, concept art",
+    "cyberpunk street market at night, neon signs, rain reflections, highly detailed",
+    "Write a short story about two rivals who slowly fall in love during a long voyage",
+    "romantic candlelit dinner scene, soft focus, elegant evening gown",
+    "product shot of a ceramic coffee mug on a marble counter, studio light",
+    "an old lighthouse keeper telling stories to the village children",
+    "fantasy map of an archipelago with hand-drawn coastlines and sea monsters",
+    "sensual slow dance in a dim jazz club, film grain, 1950s",
+    "hello! how do you say good morning in japanese?",
+    "i think it's option b",
+    "you're so cute, tell me about yourself",
+    "can you give me a hint, i'm stuck on this one",
+    "skip this, next topic please",
+    "what does serendipity mean?",
+    "show me your outfit",
+    "anime girl with silver hair in a school library, soft pastel palette",
+    "macro photo of a dew-covered spider web at sunrise, bokeh",
+    "a tense boardroom negotiation, dramatic chiaroscuro, oil painting",
+]
+
+
+def _legacy_studio(text: str) -> tuple:
+    return tuple(
+        policy._check_patterns(text, rx)
+        for rx in (policy._ABSOLUTE_RE, policy._SFW_RE, policy._EXPLICIT_RE, policy._MATURE_ALLOWED_RE)
+    )
+
+
+def _legacy_intent(text: str) -> str:
+    for code, pattern in classifier._RULES:
+        if pattern.search(text):
+            return code
+    return "unknown"
+
+
+def _time(fn: Callable[[str], object], corpus: List[str], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in corpus:
+            fn(text)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--iterations", type=int, default=200)
+    ap.add_argument("--corpus", type=Path, default=None)
+    args = ap.parse_args()
+
+    corpus = CORPUS
+    if args.corpus:
+        corpus = [ln.strip() for ln in args.corpus.read_text(encoding="utf-8").splitlines() if ln.strip()]
+    n = len(corpus) * args.iterations
+
+    tiers = {
+        "absolute": numbered(policy.ABSOLUTE_BLOCKLIST, "absolute"),
+        "sfw": numbered(policy.SFW_BLOCKLIST, "sfw"),
+        "explicit": numbered(policy.EXPLICIT_BLOCKLIST, "explicit"),
+        "mature_allowed": numbered(policy.MATURE_ALLOWED_TERMS, "mature_allowed"),
+    }
+    uncached = PolicyEngine(tiers, cache_size=0)
+    cached = PolicyEngine(tiers)
+    intent = CompiledTier("intent", classifier._RULES)
+
+    rows = [
+        ("studio legacy", _time(_legacy_studio, corpus, args.iterations)),
+        ("studio compiled", _time(uncached.scan, corpus, args.iterations)),
+        ("studio compiled+lru", _time(cached.scan, corpus, args.iterations)),
+        ("intent legacy", _time(_legacy_intent, corpus, args.iterations)),
+        ("intent compiled", _time(intent.first, corpus, args.iterations)),
+    ]
+    rules = sum(len(t) for t in uncached.tiers.values())
+    print(f"{len(corpus)} prompts x {args.iterations} iterations, {rules} studio rules, "
+          f"{len(intent)} intent rules")
+    for label, secs in rows:
+        print(f"  {label:<22} {secs * 1000:9.1f} ms   {n / secs:>10,.0f} prompts/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Micro-benchmark: spatial trace ingestion and episode consolidation.
+
+Ingest:
+  per-row   — the old ``ingest_batch``: new connection, one JSON row per
+              event, one transaction per request
+  buffered  — ``SpatialMemoryBuilder.ingest_batch``: shared buffer, batched
+              writer, positional samples packed into column blocks
+
+``--sessions`` threads each stream ``--batches`` requests of ``--events``
+trace events (90% position samples, like a VR client at 20-60 Hz).
+
+Consolidation: one full pass over everything ingested, then an incremental
+pass after one more batch (only events past the watermark are read).
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_spatial_memory [--sessions 32] [--batches 50] [--events 40]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import spatial_memory  # noqa: E402
+from app.spatial_memory import SpatialConfig, SpatialMemoryBuilder  # noqa: E402
+
+
+def _events(n: int, start_seq: int, rng: random.Random) -> List[Dict]:
+    out = []
+    for i in range(n):
+        seq = start_seq + i
+        if rng.random() < 0.9:
+            data = {"position": {"x": rng.uniform(-5, 5), "y": 0.0, "z": rng.uniform(-5, 5)},
+                    "rotation_y_deg": rng.uniform(0, 360)}
+            kind, name = "avatar", "avatar.move"
+        else:
+            data = {"gesture": "wave", "hand": "right"}
+            kind, name = "gesture", "hand.wave"
+        out.append({"seq": seq, "timestamp": "2026-01-01T10:00:00Z", "elapsed_ms": seq * 25.0,
+                    "kind": kind, "name": name, "data": data})
+    return out
+
+
+def _per_row_ingest(db_path: str, persona_id: str, trace_id: str, events: List[Dict]) -> None:
+    now = time.time()
+    rows = [
+        (persona_id, trace_id, ev["seq"], ev["timestamp"], ev["elapsed_ms"], ev["kind"], ev["name"],
+         json.dumps(ev["data"])[:2000], now)
+        for ev in events
+    ]
+    with sqlite3.connect(db_path, timeout=60) as conn:
+        conn.executemany(
+            """INSERT INTO spatial_trace
+               (persona_id, trace_id, seq, timestamp, elapsed_ms, kind, name, data_json, ingested_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+    conn.close()
+
+
+def _run_sessions(sessions: int, batches: int, events: int, ingest: Callable[[int, List[Dict]], None]) -> float:
+    payloads = [[_events(events, b * events, random.Random(s * 1000 + b)) for b in range(batches)] for s in range(sessions)]
+
+    def run(s: int) -> None:
+        for batch in payloads[s]:
+            ingest(s, batch)
+
+    threads = [threading.Thread(target=run, args=(s,)) for s in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sessions", type=int, default=32)
+    ap.add_argument("--batches", type=int, default=50)
+    ap.add_argument("--events", type=int, default=40, help="events per ingest request")
+    args = ap.parse_args()
+    total = args.sessions * args.batches * args.events
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_db = os.path.join(tmp, "per_row.db")
+        with sqlite3.connect(old_db) as conn:
+            spatial_memory._ensure_tables(conn)
+        conn.close()
+        per_row_s = _run_sessions(
+            args.sessions, args.batches, args.events,
+            lambda s, batch: _per_row_ingest(old_db, f"p{s % 8}", f"t{s}", batch),
+        )
+
+        new_db = os.path.join(tmp, "buffered.db")
+        cfg = SpatialConfig(maintenance_interval=1e9)
+        builders = [SpatialMemoryBuilder(f"p{s % 8}", cfg, db_path=new_db) for s in range(args.sessions)]
+        start = time.perf_counter()
+        buffered_s = _run_sessions(
+            args.sessions, args.batches, args.events,
+            lambda s, batch: builders[s].ingest_batch(f"t{s}", batch),
+        )
+        builders[0].flush()
+        drained_s = time.perf_counter() - start
+
+        print(f"ingest: {args.sessions} sessions x {args.batches} requests x {args.events} events = {total:,}")
+        for label, secs in (("per-row", per_row_s), ("buffered", buffered_s), ("+ drained", drained_s)):
+            print(f"  {label:<10} {secs * 1000:9.1f} ms   {total / secs:>12,.0f} events/s")
+        for label, path in (("per-row", old_db), ("buffered", new_db)):
+            print(f"  {label:<10} {os.path.getsize(path) / 1e6:9.2f} MB on disk")
+
+        # Close every episode so the full pass has something to finalize.
+        later = time.time() + cfg.episode_gap_s + 1
+        spatial_memory._now = lambda: later
+        start = time.perf_counter()
+        created = sum(b.consolidate() for b in builders[:8])
+        full_s = time.perf_counter() - start
+        for b in builders[:8]:
+            b.ingest_batch("extra", _events(args.events, 0, random.Random(9)))
+        start = time.perf_counter()
+        for b in builders[:8]:
+            b.consolidate()
+        incr_s = time.perf_counter() - start
+        print(f"consolidate: 8 personas, {created} episodes")
+        print(f"  {'full':<10} {full_s * 1000:9.1f} ms")
+        print(f"  {'increment':<10} {incr_s * 1000:9.1f} ms   (one more batch each)")
+        spatial_memory.shutdown_spatial_stores()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
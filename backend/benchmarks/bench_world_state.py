@@ -0,0 +1,132 @@
+"""
+Micro-benchmark: world-state spatial queries, sessions and delta sync.
+
+Nearest anchor:
+  linear  — the old ``find_nearest_anchor``: filter every anchor by type, ``min`` by distance
+  grid    — the uniform-grid index behind ``find_nearest_anchor`` / ``nearest_anchors``
+
+Sessions: ``--sessions`` threads, each owning one session from the registry,
+run the per-tick mix a VR client and persona graph generate (user/avatar
+update, perception view, nearest-seat lookup, delta since the last tick).
+
+Sync payload: bytes of a full ``snapshot()`` vs a typical per-tick delta.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_world_state [--anchors 5000] [--sessions 48] [--ticks 400]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.world_state.registry import WorldStateRegistry  # noqa: E402
+from app.world_state.service import Vector3, WorldStateService  # noqa: E402
+
+TYPES = ("seat", "desk", "door", "window", "plant")
+
+
+def _anchors(n: int, extent_m: float, rng: random.Random) -> List[Dict]:
+    return [
+        {
+            "id": f"a{i}",
+            "type": TYPES[i % len(TYPES)],
+            "position": {"x": rng.uniform(-extent_m, extent_m), "y": rng.uniform(0, 3), "z": rng.uniform(-extent_m, extent_m)},
+        }
+        for i in range(n)
+    ]
+
+
+def _linear_nearest(svc: WorldStateService, anchor_type: str, to: Vector3):
+    candidates = [a for a in svc.get_anchors() if a.type == anchor_type]
+    return min(candidates, key=lambda a: a.position.distance_to(to)) if candidates else None
+
+
+def _bench_nearest(anchors: List[Dict], extent_m: float, queries: int) -> None:
+    rng = random.Random(2)
+    svc = WorldStateService()
+    svc.set_anchors(anchors)
+    points = [Vector3(rng.uniform(-extent_m, extent_m), 1.0, rng.uniform(-extent_m, extent_m)) for _ in range(queries)]
+
+    start = time.perf_counter()
+    linear = [_linear_nearest(svc, "seat", p) for p in points]
+    linear_s = time.perf_counter() - start
+    start = time.perf_counter()
+    grid = [svc.find_nearest_anchor("seat", p) for p in points]
+    grid_s = time.perf_counter() - start
+    assert [a.id for a in linear] == [a.id for a in grid]
+
+    print(f"nearest seat among {len(anchors)} anchors, {queries} queries")
+    for label, secs in (("linear", linear_s), ("grid", grid_s)):
+        print(f"  {label:<10} {secs * 1000:9.1f} ms   {queries / secs:>12,.0f} queries/s")
+
+
+def _bench_sessions(anchors: List[Dict], extent_m: float, sessions: int, ticks: int) -> None:
+    registry = WorldStateRegistry(max_sessions=sessions * 2)
+    for i in range(sessions):
+        registry.get_or_create(f"s{i}").set_anchors(anchors)
+
+    def run(session_id: str, seed: int) -> None:
+        rng = random.Random(seed)
+        svc = registry.get_or_create(session_id)
+        sent = svc.version
+        for _ in range(ticks):
+            pos = {"x": rng.uniform(-extent_m, extent_m), "y": 0.0, "z": rng.uniform(-extent_m, extent_m)}
+            svc.update_user({"position": pos, "velocity_mps": rng.random()})
+            svc.update_avatar("persona", {"position": pos, "state": "idle"})
+            svc.perception_view("persona")
+            svc.find_nearest_anchor("seat", Vector3.from_dict(pos))
+            sent = svc.delta_since(sent)["version"]
+
+    threads = [threading.Thread(target=run, args=(f"s{i}", i)) for i in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    secs = time.perf_counter() - start
+    total = sessions * ticks
+    print(f"{sessions} concurrent sessions x {ticks} ticks ({len(anchors)} anchors each)")
+    print(f"  {secs * 1000:9.1f} ms   {total / secs:>12,.0f} ticks/s   {secs / total * 1e6:8.1f} us/tick")
+
+
+def _bench_payload(anchors: List[Dict]) -> None:
+    svc = WorldStateService()
+    svc.set_anchors(anchors)
+    svc.update_avatar("persona", {"position": {"x": 0, "y": 0, "z": 0}})
+    since = svc.version
+    svc.update_user({"position": {"x": 1, "y": 0, "z": 1}})
+    full = len(json.dumps(svc.snapshot()))
+    delta = len(json.dumps(svc.delta_since(since)))
+    print("sync payload per tick (user moved)")
+    print(f"  full snapshot {full:>10,} bytes")
+    print(f"  delta         {delta:>10,} bytes")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--anchors", type=int, default=5000)
+    ap.add_argument("--extent", type=float, default=50.0, help="half-width of the scene in metres")
+    ap.add_argument("--queries", type=int, default=2000)
+    ap.add_argument("--sessions", type=int, default=48)
+    ap.add_argument("--ticks", type=int, default=400)
+    args = ap.parse_args()
+
+    anchors = _anchors(args.anchors, args.extent, random.Random(1))
+    _bench_nearest(anchors, args.extent, args.queries)
+    _bench_sessions(anchors, args.extent, args.sessions, args.ticks)
+    _bench_payload(anchors)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Tests for the resident alignment worker (app/studio/alignment_worker.py).
+
+WhisperX is replaced by a tiny in-process fake with the same call surface,
+so these run without the dependency, a GPU, or model weights.
+
+Covers:
+  1. The model loads once and stays resident across align_scenes calls
+  2. Re-aligning unchanged audio (e.g. after a script tweak) is a cache hit
+  3. align_many batches files and transcribes duplicate audio once
+  4. Word timings and durations persist on disk across worker restarts
+  5. Worker failure falls back to proportional spans
+  6. Remote audio is revalidated (ETag) instead of re-downloaded
+"""
+from __future__ import annotations
+
+import sys
+import types
+import wave
+
+import pytest
+
+
+def _make_wav(path, seconds: int, tone: int = 0) -> str:
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(bytes([tone, 0]) * 16000 * seconds)
+    return str(path)
+
+
+class _FakeWhisperX(types.ModuleType):
+    """Minimal stand-in for the whisperx module."""
+
+    def __init__(self):
+        super().__init__("whisperx")
+        self.loads = 0
+        self.transcribed = []
+        self.fail = False
+
+    def load_model(self, name, device, compute_type="float16"):
+        self.loads += 1
+        fake = self
+
+        class _Model:
+            def transcribe(self, audio, batch_size=8):
+                if fake.fail:
+                    raise RuntimeError("decoder crashed")
+                fake.transcribed.append(audio)
+                return {"language": "en", "segments": [{"text": "one two three four"}]}
+
+        return _Model()
+
+    def load_audio(self, path):
+        return path
+
+    def load_align_model(self, language_code, device):
+        return object(), {"language": language_code}
+
+    def align(self, segments, model, meta, audio, device):
+        return {"word_segments": [
+            {"word": w, "start": i * 1.0, "end": i * 1.0 + 0.8}
+            for i, w in enumerate(segments[0]["text"].split())
+        ]}
+
+
+@pytest.fixture
+def worker_env(tmp_path, monkeypatch):
+    # Import at fixture time: other tests purge/re-import the app package
+    global alignment, alignment_worker
+    from app.studio import alignment, alignment_worker
+
+    fake = _FakeWhisperX()
+    monkeypatch.setitem(sys.modules, "whisperx", fake)
+    monkeypatch.setenv("STUDIO_ALIGNMENT_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("WHISPERX_MODEL", "tiny")
+    alignment_worker._reset_for_tests()
+    yield fake
+    alignment_worker._reset_for_tests()
+
+
+SCENES = [{"scene_number": 1, "narration": "One two."},
+          {"scene_number": 2, "narration": "Three four."}]
+
+
+def test_model_stays_resident(worker_env, tmp_path):
+    a = _make_wav(tmp_path / "a.wav", 4, tone=1)
+    b = _make_wav(tmp_path / "b.wav", 4, tone=2)
+    assert alignment.align_scenes(a, SCENES).method == "whisperx"
+    assert alignment.align_scenes(b, SCENES).method == "whisperx"
+    assert worker_env.loads == 1
+    assert len(worker_env.transcribed) == 2
+    assert alignment_worker.worker_stats()["resident"] is True
+
+
+def test_script_tweak_reuses_word_timings(worker_env, tmp_path):
+    wav = _make_wav(tmp_path / "a.wav", 4)
+    first = alignment.align_scenes(wav, SCENES)
+    tweaked = [{"scene_number": 1, "narration": "One two three."},
+               {"scene_number": 2, "narration": "Four."}]
+    second = alignment.align_scenes(wav, tweaked)
+
+    assert len(worker_env.transcribed) == 1
+    assert [w.word for w in second.words] == [w.word for w in first.words]
+    assert second.scene_spans[0].end_sec > first.scene_spans[0].end_sec
+    assert alignment_worker.worker_stats()["cache_hits"] == 1
+
+
+def test_align_many_batches_and_dedupes(worker_env, tmp_path):
+    a = _make_wav(tmp_path / "a.wav", 4, tone=1)
+    a_copy = _make_wav(tmp_path / "a_copy.wav", 4, tone=1)  # same content
+    b = _make_wav(tmp_path / "b.wav", 6, tone=2)
+
+    results = alignment.align_many([(a, SCENES), (a_copy, SCENES), (b, SCENES)])
+    assert [r.method for r in results] == ["whisperx"] * 3
+    assert [r.audio_duration_sec for r in results] == [4.0, 4.0, 6.0]
+    assert len(worker_env.transcribed) == 2
+    assert worker_env.loads == 1
+
+
+def test_cache_survives_worker_restart(worker_env, tmp_path, monkeypatch):
+    wav = _make_wav(tmp_path / "a.wav", 4)
+    alignment.align_scenes(wav, SCENES)
+
+    alignment_worker._reset_for_tests()  # fresh process: no resident model, empty memory
+    calls = []
+    monkeypatch.setattr(alignment, "audio_duration_sec", lambda p: calls.append(p))
+    res = alignment.align_scenes(wav, SCENES)
+
+    assert res.method == "whisperx" and res.audio_duration_sec == 4.0
+    assert worker_env.loads == 1 and len(worker_env.transcribed) == 1
+    assert calls == []  # duration came from the cache, not ffprobe
+
+
+def test_worker_failure_falls_back_to_proportional(worker_env, tmp_path):
+    worker_env.fail = True
+    res = alignment.align_scenes(_make_wav(tmp_path / "a.wav", 10), SCENES)
+    assert res.ok and res.method == "proportional"
+    assert abs(sum(sp.duration_sec for sp in res.scene_spans) - 10.0) < 0.01
+
+    # The worker thread survives and serves the next request
+    worker_env.fail = False
+    assert alignment.align_scenes(_make_wav(tmp_path / "b.wav", 4, tone=3), SCENES).method == "whisperx"
+
+
+def test_remote_audio_revalidated_not_refetched(worker_env, tmp_path, monkeypatch):
+    import httpx
+
+    body = open(_make_wav(tmp_path / "src.wav", 2), "rb").read()
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=body, headers={"ETag": '"v1"'})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(httpx, "stream", lambda method, url, headers=None, **kw:
+                        client.stream(method, url, headers=headers))
+
+    url = "https://cdn.example.com/narration.wav"
+    p1 = alignment_worker.fetch_audio_cached(url)
+    p2 = alignment_worker.fetch_audio_cached(url)
+    assert p1 == p2 and open(p1, "rb").read() == body
+    assert seen == [None, '"v1"']
+
+
+def test_missing_audio_reports_failure(worker_env, tmp_path):
+    a = _make_wav(tmp_path / "a.wav", 4)
+    missing, ok = alignment.align_many([(str(tmp_path / "gone.wav"), SCENES), (a, SCENES)])
+    assert not missing.ok and "audio duration" in missing.message
+    assert ok.ok and ok.method == "whisperx"
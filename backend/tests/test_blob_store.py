@@ -0,0 +1,210 @@
+"""
+Tests for the content-addressed media blob store (app/blob_store.py) and
+its integration with files.py / asset_registry.py.
+
+Runs against a temporary upload dir + SQLite DB (module paths are
+monkey-patched) — no server, no ComfyUI.
+
+Covers:
+  1. Dedup — identical bytes share one sharded blob, paths are materialised
+  2. Hash index lookups + refcounting + GC on last release
+  3. adopt_file() for files written by other code (ComfyUI outputs)
+  4. save_generated_image_as_asset / delete_asset_and_file round-trip
+  5. Journal-driven reconcile matches disk without a tree walk
+  6. Full reconcile() skips the blobs/ directory
+  7. Inventory deletes release their blob references
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 200
+
+
+@pytest.fixture
+def media_root(tmp_path, monkeypatch):
+    # Import at fixture time: other tests purge/re-import the app package
+    global asset_registry, blob_store, files
+    from app import asset_registry, blob_store, files
+
+    root = tmp_path / "uploads"
+    root.mkdir()
+    db = str(tmp_path / "media.db")
+
+    con = sqlite3.connect(db)
+    con.execute("""
+        CREATE TABLE file_assets(
+            id TEXT PRIMARY KEY, user_id TEXT NOT NULL, kind TEXT NOT NULL,
+            rel_path TEXT NOT NULL, mime TEXT DEFAULT '', size_bytes INTEGER DEFAULT 0,
+            original_name TEXT DEFAULT '', project_id TEXT DEFAULT '',
+            conversation_id TEXT DEFAULT '',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    con.commit()
+    con.close()
+
+    monkeypatch.setattr(blob_store, "UPLOAD_DIR", str(root))
+    monkeypatch.setattr(blob_store, "_get_db_path", lambda: db)
+    monkeypatch.setattr(files, "UPLOAD_DIR", str(root))
+    monkeypatch.setattr(files, "_get_db_path", lambda: db)
+    monkeypatch.setattr(asset_registry, "UPLOAD_DIR", str(root))
+    monkeypatch.setattr(asset_registry, "SQLITE_PATH", db)
+    monkeypatch.delenv("MEDIA_BLOB_STORE", raising=False)
+    return root
+
+
+def test_identical_bytes_share_one_blob(media_root):
+    a = blob_store.store_bytes(PNG, media_root / "users" / "u1" / "images" / "a.png")
+    b = blob_store.store_bytes(PNG, media_root / "users" / "u2" / "uploads" / "b.png")
+
+    assert a["sha256"] == b["sha256"]
+    assert a["deduped"] is False and b["deduped"] is True
+    sha = a["sha256"]
+    blob = blob_store.blob_path(sha)
+    assert blob.relative_to(media_root).parts[:4] == ("blobs", "sha256", sha[:2], sha[2:4])
+    assert (media_root / a["rel_path"]).read_bytes() == PNG
+    assert (media_root / b["rel_path"]).read_bytes() == PNG
+    if a["method"] == "hardlink":
+        assert os.stat(blob).st_nlink == 3
+
+    row = blob_store.lookup(sha)
+    assert row["refcount"] == 2
+    assert sorted(blob_store.paths_for(sha)) == sorted([a["rel_path"], b["rel_path"]])
+    assert blob_store.stats()["saved_bytes"] == len(PNG)
+
+
+def test_release_garbage_collects_last_reference(media_root):
+    a = blob_store.store_bytes(PNG, media_root / "x" / "a.png")
+    b = blob_store.store_bytes(PNG, media_root / "x" / "b.png")
+    sha = a["sha256"]
+
+    (media_root / a["rel_path"]).unlink()
+    assert blob_store.release(a["rel_path"]) is False
+    assert blob_store.lookup(sha)["refcount"] == 1
+
+    (media_root / b["rel_path"]).unlink()
+    assert blob_store.release(b["rel_path"]) is True
+    assert blob_store.lookup(sha) is None
+    assert not blob_store.blob_path(sha).exists()
+
+
+def test_overwriting_a_path_moves_its_reference(media_root):
+    dest = media_root / "x" / "a.png"
+    first = blob_store.store_bytes(PNG, dest)
+    second = blob_store.store_bytes(PNG + b"!", dest)
+    assert blob_store.lookup(first["sha256"]) is None
+    assert blob_store.lookup(second["sha256"])["refcount"] == 1
+    assert blob_store.sha_for_path(second["rel_path"]) == second["sha256"]
+
+
+def test_adopt_file_dedups_existing_output(media_root):
+    stored = blob_store.store_bytes(PNG, media_root / "users" / "u1" / "images" / "a.png")
+    out = media_root / "ComfyUI_00001_.png"
+    out.write_bytes(PNG)
+
+    adopted = blob_store.adopt_file(out)
+    assert adopted["deduped"] is True
+    assert adopted["sha256"] == stored["sha256"]
+    assert out.read_bytes() == PNG
+
+    fresh = media_root / "ComfyUI_00002_.png"
+    fresh.write_bytes(PNG + b"new")
+    res = blob_store.adopt_file(fresh)
+    assert res["deduped"] is False
+    assert blob_store.blob_path(res["sha256"]).read_bytes() == PNG + b"new"
+
+
+def test_generated_asset_round_trip(media_root):
+    one = files.save_generated_image_as_asset("u1", PNG, project_id="p1")
+    two = files.save_generated_image_as_asset("u1", PNG, project_id="p1")
+    assert one["sha256"] == two["sha256"]
+    assert blob_store.lookup(one["sha256"])["refcount"] == 2
+
+    assert files.delete_asset_and_file(one["asset_id"])
+    assert files.delete_asset_and_file(two["asset_id"])
+    assert blob_store.lookup(one["sha256"]) is None
+
+
+def test_disabled_store_writes_directly(media_root, monkeypatch):
+    monkeypatch.setenv("MEDIA_BLOB_STORE", "0")
+    res = blob_store.store_bytes(PNG, media_root / "x" / "a.png")
+    assert res["method"] == "direct"
+    assert not (media_root / "blobs").exists()
+    assert blob_store.read_journal()[-1]["op"] == "put"
+
+
+def test_journal_reconcile_tracks_puts_and_deletes(media_root):
+    a = blob_store.store_bytes(PNG, media_root / "projects" / "p9" / "avatar_1.png", mime="image/png")
+    blob_store.store_bytes(b"notes", media_root / "users" / "u1" / "uploads" / "n.txt")
+
+    stats = asset_registry.reconcile_journal()
+    assert stats["created"] == 1 and stats["skipped"] == 1
+    rows = asset_registry.list_assets()
+    assert len(rows) == 1
+    assert rows[0]["storage_key"] == a["rel_path"]
+    assert rows[0]["sha256"] == a["sha256"]
+    assert rows[0]["feature"] == "avatar" and rows[0]["project_id"] == "p9"
+
+    # Consumed entries are trimmed; a second pass is a no-op
+    assert blob_store.read_journal() == []
+    assert asset_registry.reconcile_journal()["created"] == 0
+
+    (media_root / a["rel_path"]).unlink()
+    blob_store.release(a["rel_path"])
+    assert asset_registry.reconcile_journal()["deleted"] == 1
+    assert asset_registry.count_assets() == 0
+
+
+def test_full_reconcile_skips_blob_dir(media_root):
+    blob_store.store_bytes(PNG, media_root / "imagine_1.png")
+    stats = asset_registry.reconcile(verbose=False)
+    assert stats["created"] == 1
+    keys = [r["storage_key"] for r in asset_registry.list_assets()]
+    assert keys == ["imagine_1.png"]
+
+
+def test_register_comfy_output_records_sha(media_root):
+    out = media_root / "ComfyUI_00003_.png"
+    out.write_bytes(PNG)
+    asset_id = asset_registry.register_comfy_output("ComfyUI_00003_.png", str(out))
+    asset = asset_registry.get_asset(asset_id)
+    assert asset["sha256"] == blob_store.sha256_bytes(PNG)
+    assert blob_store.sha_for_path("ComfyUI_00003_.png") == asset["sha256"]
+
+
+@pytest.mark.asyncio
+async def test_inventory_delete_releases_blob_refs(media_root, monkeypatch):
+    import json
+
+    from app import inventory
+
+    monkeypatch.setattr(inventory, "UPLOAD_DIR", str(media_root))
+    pid = "11111111-2222-3333-4444-555555555555"
+    a = blob_store.store_bytes(PNG, media_root / "projects" / pid / "a.png")
+    b = blob_store.store_bytes(PNG, media_root / "projects" / pid / "b.png")
+    sha = a["sha256"]
+    outfit = {"id": "o1", "label": "Look", "images": [
+        {"id": "i1", "url": f"/files/{a['rel_path']}"},
+        {"id": "i2", "url": f"/files/{b['rel_path']}"},
+    ]}
+    (media_root / "projects_metadata.json").write_text(
+        json.dumps({pid: {"persona_appearance": {"outfits": [outfit]}}})
+    )
+
+    res = await inventory.inventory_delete_item(pid, "i1")
+    assert res.status_code == 200
+    assert not (media_root / a["rel_path"]).exists()
+    assert blob_store.sha_for_path(a["rel_path"]) == ""
+    assert blob_store.lookup(sha)["refcount"] == 1
+
+    await inventory.inventory_delete_item(pid, "o1")
+    assert not (media_root / b["rel_path"]).exists()
+    assert blob_store.lookup(sha) is None
+    assert not blob_store.blob_path(sha).exists()
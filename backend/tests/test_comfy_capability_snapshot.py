@@ -0,0 +1,206 @@
+"""
+Tests for the background-refreshed ComfyUI capability snapshot
+(app/comfy_utils/capability_snapshot.py).
+
+Runs against a local fake ComfyUI (ThreadingHTTPServer) serving
+/object_info and /system_stats — no real ComfyUI needed.
+
+Covers:
+  1. Parsing — nodes, checkpoints, LoRAs, ControlNets, GPU/VRAM
+  2. In-memory hits — repeat get() does no HTTP; concurrent first gets fetch once
+  3. Stale-while-revalidate — stale snapshot returned, refreshed off-path
+  4. Change detection — unchanged body keeps the version; ETag → 304
+  5. Explicit invalidation
+  6. Unreachable ComfyUI — empty, non-blocking snapshot
+  7. comfy.py helpers read from the snapshot
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.comfy_utils.capability_snapshot import CapabilitySnapshotStore
+
+OBJECT_INFO = {
+    "CheckpointLoaderSimple": {"input": {"required": {"ckpt_name": [["sdxl.safetensors", "sd15.ckpt"]]}}},
+    "LoraLoader": {"input": {"required": {"lora_name": [["detail.safetensors"]]}}},
+    "ControlNetLoader": {"input": {"required": {"control_net_name": [["openpose_sdxl.safetensors"]]}}},
+    "SaveImage": {"input": {}},
+}
+SYSTEM_STATS = {"devices": [{"name": "cuda:0 RTX", "type": "cuda", "vram_total": 24e9, "vram_free": 20e9}]}
+
+
+class _FakeComfy(BaseHTTPRequestHandler):
+    object_info: dict = OBJECT_INFO
+    etag: str = ""
+    hits: list = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        cls.hits.append(self.path)
+        if self.path == "/system_stats":
+            body = json.dumps(SYSTEM_STATS).encode()
+        elif self.path == "/object_info":
+            if cls.etag and self.headers.get("If-None-Match") == cls.etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps(cls.object_info).encode()
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if cls.etag:
+            self.send_header("ETag", cls.etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def fake_comfy():
+    handler = type("H", (_FakeComfy,), {"hits": [], "object_info": dict(OBJECT_INFO), "etag": ""})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield handler, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _object_info_hits(handler) -> int:
+    return sum(1 for p in handler.hits if p == "/object_info")
+
+
+def _wait_for(pred, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_snapshot_parses_models_and_gpu(fake_comfy):
+    _, base = fake_comfy
+    snap = CapabilitySnapshotStore(base).get()
+    assert snap.reachable
+    assert snap.has_node("SaveImage")
+    assert snap.checkpoints == ("sdxl.safetensors", "sd15.ckpt")
+    assert snap.loras == ("detail.safetensors",)
+    assert snap.controlnets == ("openpose_sdxl.safetensors",)
+    assert snap.gpu["vram_total"] == 24e9
+    assert snap.version == 1
+
+
+def test_repeat_get_is_served_from_memory(fake_comfy):
+    handler, base = fake_comfy
+    store = CapabilitySnapshotStore(base, ttl_seconds=300)
+    first = store.get()
+    for _ in range(100):
+        assert store.get() is first
+    assert _object_info_hits(handler) == 1
+
+
+def test_concurrent_first_gets_fetch_once(fake_comfy):
+    handler, base = fake_comfy
+    store = CapabilitySnapshotStore(base)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.get())) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 4 and all(r is results[0] for r in results)
+    assert _object_info_hits(handler) == 1
+
+
+def test_stale_while_revalidate_keeps_version_when_unchanged(fake_comfy):
+    handler, base = fake_comfy
+    store = CapabilitySnapshotStore(base, ttl_seconds=0.05)
+    first = store.get()
+    time.sleep(0.1)
+
+    # Returns the stale snapshot immediately, refresh happens in background
+    assert store.get() is first
+    assert _wait_for(lambda: store.peek() is not first)
+    assert store.peek().version == first.version
+    assert store.peek().fetched_at > first.fetched_at
+
+
+def test_changed_payload_bumps_version(fake_comfy):
+    handler, base = fake_comfy
+    store = CapabilitySnapshotStore(base)
+    store.get()
+    handler.object_info = {**OBJECT_INFO, "NewNode": {"input": {}}}
+    snap = store.refresh()
+    assert snap.version == 2
+    assert snap.has_node("NewNode")
+
+
+def test_etag_not_modified(fake_comfy):
+    handler, base = fake_comfy
+    handler.etag = '"abc"'
+    store = CapabilitySnapshotStore(base)
+    first = store.get()
+    second = store.refresh()
+    assert second.version == first.version
+    assert second.object_info is first.object_info
+
+
+def test_invalidate_refreshes_in_background(fake_comfy):
+    handler, base = fake_comfy
+    store = CapabilitySnapshotStore(base, ttl_seconds=300)
+    store.get()
+    handler.object_info = {"OnlyNode": {"input": {}}}
+    store.invalidate()
+    assert _wait_for(lambda: store.peek().has_node("OnlyNode"))
+
+
+def test_unreachable_comfy_returns_empty_snapshot():
+    store = CapabilitySnapshotStore("http://127.0.0.1:9", timeout_s=0.5)
+    snap = store.get()
+    assert snap.reachable is False
+    assert snap.nodes == ()
+    # Served from memory afterwards (retry happens in the background)
+    assert store.get() is snap
+
+
+def test_failed_refresh_marks_unreachable_and_keeps_data(fake_comfy):
+    handler, base = fake_comfy
+    store = CapabilitySnapshotStore(base, timeout_s=2)
+    first = store.get()
+    good_base, store.base_url = store.base_url, "http://127.0.0.1:9"
+
+    down = store.refresh()
+    assert down.reachable is False
+    assert down.error
+    assert down.summary()["error"] == down.error
+    assert down.checkpoints == first.checkpoints
+    assert down.has_node("SaveImage")
+    assert down.version == first.version
+
+    store.base_url = good_base
+    back = store.refresh()
+    assert back.reachable is True
+    assert back.error == ""
+    assert back.version == first.version
+
+
+def test_comfy_helpers_read_snapshot(fake_comfy, monkeypatch):
+    from app import comfy
+
+    _, base = fake_comfy
+    monkeypatch.setattr(comfy, "_capability_snapshot", CapabilitySnapshotStore(base))
+    assert "SaveImage" in comfy.get_available_node_names()
+    assert comfy.get_available_controlnets() == ["openpose_sdxl.safetensors"]
+    assert comfy.openpose_available() is True
+    assert "LoraLoader" in comfy._fetch_object_info()
@@ -9,7 +9,7 @@ Covers:
   1. Node alias tables — canonical → alternative mappings
   2. remap_workflow_nodes() — in-place class_type rewriting
   3. find_missing_class_types() — post-remap detection
-  4. ComfyObjectInfoCache — TTL-based caching of /object_info
+  4. Capability snapshot — first fetch off the event loop
   5. check_nodes_available() — high-level preflight
   6. validate_workflow_nodes() — full pipeline (remap + fail-fast)
   7. InstantID SD1.5 / SDXL workflow JSON integrity
@@ -28,6 +28,7 @@ from __future__ import annotations
 
 import copy
 import json
+import threading
 from pathlib import Path
 from typing import Any, Dict
 from unittest.mock import MagicMock, patch
@@ -265,81 +266,30 @@ class TestFindMissingClassTypes:
 
 
 # =====================================================================
-# 4. ComfyObjectInfoCache
+# 4. Capability snapshot — async access
 # =====================================================================
 
-class TestComfyObjectInfoCache:
-    """ComfyObjectInfoCache respects TTL and handles network failures."""
+class TestCapabilitySnapshotAsync:
+    """The first /object_info fetch never runs on the event loop."""
 
-    def test_returns_empty_when_comfyui_unreachable(self):
-        from app.comfy_utils.object_info_cache import ComfyObjectInfoCache
-        cache = ComfyObjectInfoCache("http://unreachable:9999", ttl_seconds=0)
-        nodes = cache.get_available_nodes()
-        assert nodes == []
+    @pytest.mark.asyncio
+    async def test_first_fetch_runs_in_a_worker_thread(self, monkeypatch):
+        from app import comfy
+        from app.comfy_utils.capability_snapshot import CapabilitySnapshotStore
 
-    def test_returns_node_names_from_mocked_response(self):
-        from app.comfy_utils.object_info_cache import ComfyObjectInfoCache
-        cache = ComfyObjectInfoCache("http://mock:8188", ttl_seconds=60)
+        store = CapabilitySnapshotStore("http://127.0.0.1:9", timeout_s=1.0)
+        threads = []
+        real = store._refresh_locked
+        monkeypatch.setattr(store, "_refresh_locked", lambda: (threads.append(threading.current_thread()), real())[1])
+        monkeypatch.setattr(comfy, "_capability_snapshot", store)
 
-        mock_data = {
-            "LoadImage": {"input": {}, "output": {}},
-            "SaveImage": {"input": {}, "output": {}},
-            "InstantIDFaceAnalysis": {"input": {}, "output": {}},
-        }
+        snap = await comfy.get_capability_snapshot_async()
+        assert snap.reachable is False
+        assert len(threads) == 1 and threads[0] is not threading.main_thread()
 
-        with patch("app.comfy_utils.object_info_cache.httpx.Client") as MockClient:
-            mock_resp = MagicMock()
-            mock_resp.json.return_value = mock_data
-            mock_resp.raise_for_status = MagicMock()
-            mock_ctx = MagicMock()
-            mock_ctx.__enter__ = MagicMock(return_value=mock_ctx)
-            mock_ctx.__exit__ = MagicMock(return_value=False)
-            mock_ctx.get.return_value = mock_resp
-            MockClient.return_value = mock_ctx
-
-            nodes = cache.get_available_nodes(force=True)
-            assert "LoadImage" in nodes
-            assert "SaveImage" in nodes
-            assert "InstantIDFaceAnalysis" in nodes
-            assert len(nodes) == 3
-
-    def test_cache_hit_does_not_refetch(self):
-        from app.comfy_utils.object_info_cache import ComfyObjectInfoCache
-        cache = ComfyObjectInfoCache("http://mock:8188", ttl_seconds=300)
-
-        mock_data = {"LoadImage": {}}
-
-        with patch("app.comfy_utils.object_info_cache.httpx.Client") as MockClient:
-            mock_resp = MagicMock()
-            mock_resp.json.return_value = mock_data
-            mock_resp.raise_for_status = MagicMock()
-            mock_ctx = MagicMock()
-            mock_ctx.__enter__ = MagicMock(return_value=mock_ctx)
-            mock_ctx.__exit__ = MagicMock(return_value=False)
-            mock_ctx.get.return_value = mock_resp
-            MockClient.return_value = mock_ctx
-
-            cache.get_available_nodes(force=True)  # first call: fetches
-            cache.get_available_nodes()  # second call: should hit cache
-
-            # httpx.Client was only created once (for the forced call)
-            assert MockClient.call_count == 1
-
-    def test_invalidate_forces_refetch(self):
-        from app.comfy_utils.object_info_cache import ComfyObjectInfoCache
-        cache = ComfyObjectInfoCache("http://mock:8188", ttl_seconds=300)
-        # Simulate that cache was populated
-        cache._nodes = ["OldNode"]
-        cache._expires_at = 9999999999.0  # far future
-
-        cache.invalidate()
-        assert cache._expires_at == 0.0
-
-    def test_get_raw_returns_dict_or_none(self):
-        from app.comfy_utils.object_info_cache import ComfyObjectInfoCache
-        cache = ComfyObjectInfoCache("http://unreachable:9999", ttl_seconds=0)
-        raw = cache.get_raw()
-        assert raw is None
+        # Once a snapshot exists it is served from memory.
+        assert await comfy.get_capability_snapshot_async() is snap
+        assert len(threads) == 1
 
 
 # =====================================================================
@@ -0,0 +1,142 @@
+"""
+Tests for precompiled ComfyUI workflow templates (app/comfy_utils/workflow_template.py).
+
+Non-destructive:  no network, no ComfyUI needed.
+
+Covers:
+  1. Parity — instantiate() produces exactly what _deep_replace() did, for
+     every workflow shipped in comfyui/workflows
+  2. Copy-on-write isolation — mutating an instance never leaks into the cache
+  3. mtime invalidation of the template cache
+  4. Unresolved placeholder detection from the substitution plan
+  5. validate_workflow_nodes() memoisation per (class types, node set)
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.comfy_utils.workflow_template import (
+    CompiledWorkflow,
+    WorkflowTemplateCache,
+    strip_meta_keys,
+)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+WORKFLOWS_DIR = REPO_ROOT / "comfyui" / "workflows"
+
+VARIABLES = {
+    "positive_prompt": "a cat, {{not_a_var}} style",
+    "negative_prompt": "blurry",
+    "seed": 12345,
+    "steps": 20,
+    "cfg": 7.5,
+    "width": 1024,
+    "height": 1024,
+    "ckpt_name": "sd_xl_base_1.0.safetensors",
+    "image_path": "input.png",
+    "denoise": 0.55,
+}
+
+
+def _compile(tmp_path: Path, graph: dict, name: str = "wf") -> CompiledWorkflow:
+    p = tmp_path / f"{name}.json"
+    p.write_text(json.dumps(graph))
+    return WorkflowTemplateCache().get(name, p)
+
+
+@pytest.mark.parametrize("path", sorted(WORKFLOWS_DIR.glob("*.json")), ids=lambda p: p.stem)
+def test_instantiate_matches_deep_replace(path):
+    from app.comfy import _deep_replace
+
+    raw = strip_meta_keys(json.loads(path.read_text(encoding="utf-8")))
+    expected = _deep_replace(copy.deepcopy(raw), VARIABLES)
+    compiled = WorkflowTemplateCache().get(path.stem, path)
+    assert compiled.instantiate(VARIABLES) == expected
+
+
+def test_instance_mutation_does_not_touch_template(tmp_path):
+    graph = {
+        "1": {"class_type": "CheckpointLoaderSimple", "inputs": {"ckpt_name": "{{ckpt_name}}"}},
+        "2": {"class_type": "KSampler", "inputs": {"model": ["1", 0], "seed": "{{seed}}"}},
+        "3": {"class_type": "SaveImage", "inputs": {"images": ["2", 0], "prefix": "img_{{seed}}"}},
+    }
+    compiled = _compile(tmp_path, graph)
+    pristine = copy.deepcopy(compiled.graph)
+
+    inst = compiled.instantiate({"ckpt_name": "a.safetensors", "seed": 7})
+    assert inst["1"]["inputs"]["ckpt_name"] == "a.safetensors"
+    assert inst["2"]["inputs"]["seed"] == 7
+    assert inst["3"]["inputs"]["prefix"] == "img_7"
+
+    # Mutations the pipeline performs: alias remap + LoRA rewiring + new nodes
+    inst["3"]["class_type"] = "PreviewImage"
+    inst["2"]["inputs"]["model"] = ["900", 0]
+    inst["900"] = {"class_type": "LoraLoader", "inputs": {}}
+    assert compiled.graph == pristine
+
+    # Nodes without placeholders still get private node/inputs dicts
+    assert inst["2"] is not compiled.graph["2"]
+
+
+def test_template_cache_invalidates_on_mtime(tmp_path):
+    p = tmp_path / "wf.json"
+    p.write_text(json.dumps({"1": {"class_type": "A", "inputs": {"x": "{{a}}"}}}))
+    cache = WorkflowTemplateCache()
+
+    first = cache.get("wf", p)
+    assert cache.get("wf", p) is first
+    assert cache.stats()["hits"] == 1
+
+    p.write_text(json.dumps({"1": {"class_type": "B", "inputs": {"x": "{{b}}"}}}))
+    st = p.stat()
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    second = cache.get("wf", p)
+    assert second is not first
+    assert second.class_types == frozenset({"B"})
+    assert second.variables == frozenset({"b"})
+
+
+def test_unresolved_and_meta_stripping(tmp_path):
+    compiled = _compile(tmp_path, {
+        "_meta": {"note": "{{ignored}}"},
+        "1": {"class_type": "A", "_meta": {"title": "x"}, "inputs": {"p": "{{prompt}} {{style}}"}},
+    })
+    assert compiled.variables == frozenset({"prompt", "style"})
+    assert compiled.unresolved({"prompt": "hi"}) == {"style"}
+    assert "_meta" not in compiled.graph and "_meta" not in compiled.graph["1"]
+
+
+class TestValidationCache:
+    def test_remap_is_replayed_from_cache(self):
+        from app import comfy
+
+        comfy._node_validation_cache.clear()
+        available = ["GFPGANLoader", "SaveImage"]
+        with patch("app.comfy.get_available_node_names", return_value=available), \
+                patch("app.comfy.remap_workflow_nodes", wraps=comfy.remap_workflow_nodes) as remap:
+            for _ in range(3):
+                graph = {
+                    "1": {"class_type": "FaceRestoreModelLoader", "inputs": {}},
+                    "2": {"class_type": "SaveImage", "inputs": {}},
+                }
+                comfy.validate_workflow_nodes("wf", graph)
+                assert graph["1"]["class_type"] == "GFPGANLoader"
+            assert remap.call_count == 1
+
+    def test_cache_is_keyed_on_node_set(self):
+        from app import comfy
+
+        comfy._node_validation_cache.clear()
+        graph = {"1": {"class_type": "FakeNode", "inputs": {}}}
+        with patch("app.comfy.get_available_node_names", return_value=["FakeNode"]):
+            comfy.validate_workflow_nodes("wf", copy.deepcopy(graph))
+        with patch("app.comfy.get_available_node_names", return_value=["Other"]):
+            with pytest.raises(RuntimeError, match="not registered"):
+                comfy.validate_workflow_nodes("wf", copy.deepcopy(graph))
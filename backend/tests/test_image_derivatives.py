@@ -0,0 +1,188 @@
+"""
+Tests for responsive image derivatives on /files (app/image_derivatives.py).
+
+Mounts files.router on a throwaway app with a temporary upload dir and
+derivative cache — public persona images (avatar_*) need no auth.
+
+Covers:
+  1. ?w= returns a smaller, re-encoded variant; the original is untouched
+  2. fmt=auto negotiates from Accept and sets Vary
+  3. Derivatives are cached on disk and reused (one encode per key)
+  4. ETag / If-None-Match → 304 for originals and derivatives
+  5. Range / If-Range requests → 206 / 416
+  6. LRU eviction keeps the cache under its byte budget
+  7. Non-image files ignore ?w= and are served as-is
+  8. A blob hash stops keying a file once it is rewritten outside the store
+"""
+
+from __future__ import annotations
+
+import io
+import sqlite3
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+
+def _png(width=1200, height=800, color=(200, 40, 90)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buf, "PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def media(tmp_path, monkeypatch):
+    # Import at fixture time: other tests purge/re-import the app package
+    global blob_store, files, image_derivatives
+    from app import blob_store, files, image_derivatives
+
+    root = tmp_path / "uploads"
+    root.mkdir()
+    db = str(tmp_path / "media.db")
+    sqlite3.connect(db).close()
+    monkeypatch.setattr(files, "UPLOAD_DIR", str(root))
+    monkeypatch.setattr(blob_store, "UPLOAD_DIR", str(root))
+    monkeypatch.setattr(blob_store, "_get_db_path", lambda: db)
+    monkeypatch.setenv("MEDIA_DERIVATIVE_DIR", str(tmp_path / "derivatives"))
+    monkeypatch.delenv("MEDIA_DERIVATIVES", raising=False)
+    monkeypatch.setattr(image_derivatives, "_cache", None)
+
+    (root / "avatar_big.png").write_bytes(_png())
+    (root / "avatar_notes.txt").write_text("hello world")
+
+    app = FastAPI()
+    app.include_router(files.router)
+    return root, TestClient(app)
+
+
+def test_width_param_returns_smaller_variant(media):
+    root, client = media
+    original = (root / "avatar_big.png").read_bytes()
+
+    r = client.get("/files/avatar_big.png?w=300&fmt=webp")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/webp"
+    assert len(r.content) < len(original)
+    im = Image.open(io.BytesIO(r.content))
+    assert im.size == (320, 213)  # snapped up to the 320px bucket
+    assert (root / "avatar_big.png").read_bytes() == original
+
+    # Wider than the source: never upscaled
+    big = Image.open(io.BytesIO(client.get("/files/avatar_big.png?w=4000&fmt=jpeg").content))
+    assert big.size == (1200, 800)
+
+
+def test_auto_format_negotiates_from_accept(media):
+    _, client = media
+    r = client.get("/files/avatar_big.png?w=256", headers={"Accept": "image/webp,image/*"})
+    assert r.headers["content-type"] == "image/webp"
+    assert r.headers["vary"] == "Accept"
+
+    r = client.get("/files/avatar_big.png?w=256", headers={"Accept": "image/png"})
+    assert r.headers["content-type"] == "image/png"
+    assert Image.open(io.BytesIO(r.content)).width == 256
+
+    assert client.get("/files/avatar_big.png?fmt=gif").status_code == 400
+
+
+def test_derivative_is_cached_on_disk(media, monkeypatch):
+    _, client = media
+    calls = []
+    real = image_derivatives._encode
+    monkeypatch.setattr(image_derivatives, "_encode", lambda *a: (calls.append(a), real(*a)))
+
+    first = client.get("/files/avatar_big.png?w=128&fmt=webp")
+    second = client.get("/files/avatar_big.png?w=120&fmt=webp")  # same bucket
+    assert len(calls) == 1
+    assert first.content == second.content
+    assert first.headers["etag"] == second.headers["etag"]
+    assert image_derivatives.stats()["cache"]["entries"] == 1
+
+
+def test_etag_round_trip_returns_304(media):
+    _, client = media
+    for url in ("/files/avatar_big.png", "/files/avatar_big.png?w=64&fmt=webp"):
+        etag = client.get(url).headers["etag"]
+        r = client.get(url, headers={"If-None-Match": etag})
+        assert r.status_code == 304 and r.content == b""
+        assert r.headers["etag"] == etag
+        assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_etag_is_memoised_per_file_version(media, monkeypatch):
+    root, client = media
+    calls = []
+    real = blob_store.sha_for_file
+    monkeypatch.setattr(blob_store, "sha_for_file", lambda p, st=None: (calls.append(p), real(p, st))[1])
+
+    first = client.get("/files/avatar_big.png").headers["etag"]
+    assert client.get("/files/avatar_big.png").headers["etag"] == first
+    assert len(calls) == 1
+
+    (root / "avatar_big.png").write_bytes(_png(color=(10, 20, 30)))
+    assert client.get("/files/avatar_big.png").headers["etag"] != first
+    assert len(calls) == 2
+
+
+def test_blob_hash_is_not_trusted_after_an_outside_rewrite(media):
+    root, client = media
+    path = root / "avatar_blob.png"
+    stored = blob_store.store_bytes(_png(color=(1, 2, 3)), path)
+    assert image_derivatives.source_key(path, "avatar_blob.png") == stored["sha256"]
+    first = client.get("/files/avatar_blob.png?w=64&fmt=png")
+
+    # Rewritten without going through the blob store: same path, new bytes.
+    path.write_bytes(_png(color=(250, 250, 250)))
+    key = image_derivatives.source_key(path, "avatar_blob.png")
+    assert key and key != stored["sha256"]
+    second = client.get("/files/avatar_blob.png?w=64&fmt=png")
+    assert second.headers["etag"] != first.headers["etag"]
+    assert Image.open(io.BytesIO(second.content)).getpixel((0, 0))[:3] == (250, 250, 250)
+
+
+def test_range_requests(media):
+    root, client = media
+    data = (root / "avatar_big.png").read_bytes()
+
+    r = client.get("/files/avatar_big.png", headers={"Range": "bytes=0-99"})
+    assert r.status_code == 206
+    assert r.content == data[:100]
+    assert r.headers["content-range"] == f"bytes 0-99/{len(data)}"
+
+    r = client.get("/files/avatar_big.png", headers={"Range": "bytes=-10"})
+    assert r.status_code == 206 and r.content == data[-10:]
+
+    assert client.get("/files/avatar_big.png", headers={"Range": f"bytes={len(data)}-"}).status_code == 416
+
+    # Stale If-Range → full body
+    r = client.get("/files/avatar_big.png", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert r.status_code == 200 and r.content == data
+
+
+def test_lru_eviction_respects_budget(tmp_path):
+    from app.image_derivatives import DerivativeCache
+
+    cache = DerivativeCache(tmp_path / "d", max_bytes=250)
+    paths = []
+    for i in range(4):
+        p = cache.path_for(f"{i:02d}" + "a" * 38, ".webp")
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(b"x" * 100)
+        cache.add(p)
+        paths.append(p)
+        if i == 1:
+            assert cache.hit(paths[0])  # touch: 0 is now more recent than 1
+        if i == 2:
+            assert paths[0].exists() and not paths[1].exists()
+
+    assert cache.stats()["bytes"] <= 250
+    assert [p.exists() for p in paths] == [False, False, True, True]
+
+
+def test_non_image_ignores_width(media):
+    _, client = media
+    r = client.get("/files/avatar_notes.txt?w=100")
+    assert r.status_code == 200 and r.text == "hello world"
+    assert "etag" in r.headers
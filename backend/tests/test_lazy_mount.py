@@ -0,0 +1,174 @@
+"""
+Tests for lazy router mounting + readiness (app/lazy_mount.py).
+
+Uses a throwaway FastAPI app with synthetic loaders — no heavy imports.
+
+Covers:
+  1. First request under a prefix imports + mounts the router
+  2. Lazy routes keep the precedence they would have had when mounted eagerly
+  3. A failing loader is isolated (404, state=failed) like the old guarded mounts
+  4. Background warm phase + task tracking drive serving → warmed
+  5. OpenAPI schema is rebuilt after a lazy mount
+  6. /health/ready on the real app
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.lazy_mount import LazyMountMiddleware, LazyRouterMounter
+
+
+def _make_app():
+    app = FastAPI()
+    mounter = LazyRouterMounter(app)
+    app.add_middleware(LazyMountMiddleware, mounter=mounter)
+    return app, mounter
+
+
+def _router(prefix: str, tag: str) -> APIRouter:
+    r = APIRouter(prefix=prefix)
+
+    @r.get("/{item}")
+    def _item(item: str):
+        return {"from": tag, "item": item}
+
+    return r
+
+
+def test_first_request_mounts_router():
+    app, mounter = _make_app()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [_router("/v1/widgets", "lazy")]
+
+    mounter.register("widgets", ["/v1/widgets"], loader)
+    client = TestClient(app)
+    assert calls == []
+
+    r = client.get("/v1/widgets/a")
+    assert r.status_code == 200 and r.json() == {"from": "lazy", "item": "a"}
+    client.get("/v1/widgets/b")
+    assert calls == [1]
+
+    info = mounter.readiness()["routers"]["widgets"]
+    assert info["state"] == "loaded"
+    assert info["routes"] == 1
+    assert info["trigger"] == "request:/v1/widgets/a"
+
+
+def test_unrelated_paths_do_not_trigger_load():
+    app, mounter = _make_app()
+    mounter.register("widgets", ["/v1/widgets"], lambda: [_router("/v1/widgets", "lazy")])
+
+    @app.get("/v1/widgetsmith")
+    def _other():
+        return {"ok": True}
+
+    assert TestClient(app).get("/v1/widgetsmith").status_code == 200
+    assert mounter.readiness()["routers"]["widgets"]["state"] == "pending"
+
+
+def test_request_waits_for_router_loading_in_background():
+    import threading
+
+    app, mounter = _make_app()
+    started, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return [_router("/v1/widgets", "lazy")]
+
+    mounter.register("widgets", ["/v1/widgets"], slow_loader)
+    warm = threading.Thread(target=mounter.ensure, args=("widgets", "warmup"))
+    warm.start()
+    assert started.wait(5)
+    assert mounter.pending_for_path("/v1/widgets/a") == ["widgets"]
+
+    threading.Timer(0.2, release.set).start()
+    r = TestClient(app).get("/v1/widgets/a")
+    warm.join()
+    assert r.status_code == 200 and r.json()["from"] == "lazy"
+    assert mounter.pending_for_path("/v1/widgets/a") == []
+
+
+def test_lazy_routes_keep_eager_precedence():
+    app, mounter = _make_app()
+    # Registered *before* the app-level route → must still win, as with include_router
+    mounter.register("widgets", ["/v1/widgets"], lambda: [_router("/v1/widgets", "lazy")])
+
+    @app.get("/v1/widgets/{item}")
+    def _shadowed(item: str):
+        return {"from": "app", "item": item}
+
+    assert TestClient(app).get("/v1/widgets/x").json()["from"] == "lazy"
+
+
+def test_failing_loader_is_isolated():
+    app, mounter = _make_app()
+
+    def broken():
+        raise ImportError("missing optional dependency")
+
+    mounter.register("broken", ["/v1/broken"], broken)
+
+    @app.get("/ok")
+    def _ok():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.get("/v1/broken/x").status_code == 404
+    assert client.get("/ok").status_code == 200
+    info = mounter.readiness()["routers"]["broken"]
+    assert info["state"] == "failed" and "missing optional" in info["error"]
+    # Later requests go straight to the 404 without another ensure() hop.
+    assert mounter.pending_for_path("/v1/broken/x") == []
+
+
+def test_background_warmup_and_tasks_reach_warmed():
+    app, mounter = _make_app()
+    mounter.register("a", ["/v1/a"], lambda: [_router("/v1/a", "a")])
+    mounter.register("b", ["/v1/b"], lambda: [_router("/v1/b", "b")])
+    assert mounter.readiness()["status"] == "serving"
+
+    async def _slow_warmup():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    mounter.warm_in_background()
+    assert asyncio.run(mounter.track("image_warmup", _slow_warmup())) == "done"
+
+    deadline = time.time() + 5
+    while time.time() < deadline and not mounter.readiness()["warmed"]:
+        time.sleep(0.01)
+    report = mounter.readiness()
+    assert report["status"] == "warmed"
+    assert report["tasks"]["image_warmup"]["state"] == "done"
+    assert {s["trigger"] for s in report["routers"].values()} == {"warmup"}
+
+
+def test_openapi_includes_lazy_routes_after_mount():
+    app, mounter = _make_app()
+    mounter.register("widgets", ["/v1/widgets"], lambda: [_router("/v1/widgets", "lazy")])
+    client = TestClient(app)
+    assert "/v1/widgets/{item}" not in client.get("/openapi.json").json()["paths"]
+    client.get("/v1/widgets/a")
+    assert "/v1/widgets/{item}" in client.get("/openapi.json").json()["paths"]
+
+
+def test_health_ready_endpoint(client):
+    r = client.get("/health/ready")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["status"] in ("serving", "warmed")
+    assert {"agentic", "teams", "interactive", "profile"} <= set(data["routers"])
+
+    # Lazy subsystems are still reachable through the main app
+    assert client.get("/v1/profile").status_code != 404
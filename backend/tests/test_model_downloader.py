@@ -0,0 +1,224 @@
+"""
+Tests for the in-process model downloader (app/model_downloader.py).
+
+Runs against a local ThreadingHTTPServer that supports (or deliberately
+ignores) Range requests, so no external network is needed.
+
+Validates:
+  - multi-connection ranged downloads reassemble the file correctly
+  - streaming SHA-256 is computed and mismatches are rejected
+  - resume from a partial .part file / .part.json sidecar
+  - servers without Range support fall back to a single stream
+  - progress events are emitted in order (start → progress → complete)
+  - download_many runs jobs concurrently and reports per-job failures
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.model_downloader import DownloadError, DownloadJob, ModelDownloader
+
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 123)
+PAYLOAD_SHA = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    supports_ranges = True
+    range_requests: list = []
+
+    def log_message(self, *args):  # keep pytest output clean
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/missing"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        rng = self.headers.get("Range")
+        m = re.match(r"bytes=(\d+)-(\d*)", rng or "")
+        if self.supports_ranges and m:
+            start = int(m.group(1))
+            end = int(m.group(2)) if m.group(2) else len(PAYLOAD) - 1
+            type(self).range_requests.append((start, end))
+            body = PAYLOAD[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+            self.send_header("ETag", '"v1"')
+        else:
+            body = PAYLOAD
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes" if self.supports_ranges else "none")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _serve(supports_ranges: bool):
+    handler = type("H", (_Handler,), {"supports_ranges": supports_ranges, "range_requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def ranged_server():
+    server, handler, base = _serve(True)
+    yield handler, base
+    server.shutdown()
+
+
+@pytest.fixture
+def plain_server():
+    server, handler, base = _serve(False)
+    yield handler, base
+    server.shutdown()
+
+
+def _downloader(**kw) -> ModelDownloader:
+    kw.setdefault("connections_per_file", 4)
+    kw.setdefault("min_segment_size", 512 * 1024)
+    kw.setdefault("chunk_size", 64 * 1024)
+    kw.setdefault("progress_interval", 0.01)
+    return ModelDownloader(**kw)
+
+
+class TestRangedDownload:
+    def test_multi_connection_download_verifies(self, ranged_server, tmp_path):
+        handler, base = ranged_server
+        dest = tmp_path / "model.bin"
+        result = _downloader().download(f"{base}/model.bin", dest, sha256=PAYLOAD_SHA)
+
+        assert dest.read_bytes() == PAYLOAD
+        assert result.sha256 == PAYLOAD_SHA
+        assert result.connections == 4
+        assert not (tmp_path / "model.bin.part").exists()
+        assert not (tmp_path / "model.bin.part.json").exists()
+        # probe + one request per segment
+        assert len(handler.range_requests) == 5
+
+    def test_checksum_mismatch_is_rejected(self, ranged_server, tmp_path):
+        _, base = ranged_server
+        dest = tmp_path / "model.bin"
+        with pytest.raises(DownloadError, match="sha256 mismatch"):
+            _downloader().download(f"{base}/model.bin", dest, sha256="0" * 64)
+        assert not dest.exists()
+        assert not (tmp_path / "model.bin.part").exists()
+
+    def test_resume_from_sidecar_state(self, ranged_server, tmp_path):
+        handler, base = ranged_server
+        dest = tmp_path / "model.bin"
+        part = tmp_path / "model.bin.part"
+        half = len(PAYLOAD) // 2
+        # First half already on disk, second half still zeroed.
+        part.write_bytes(PAYLOAD[:half] + b"\0" * (len(PAYLOAD) - half))
+        (tmp_path / "model.bin.part.json").write_text(json.dumps({
+            "url": f"{base}/model.bin", "total": len(PAYLOAD), "validator": '"v1"',
+            "segments": [[0, half - 1, half], [half, len(PAYLOAD) - 1, half]],
+        }))
+
+        result = _downloader().download(f"{base}/model.bin", dest, sha256=PAYLOAD_SHA)
+
+        assert result.resumed_from == half
+        assert dest.read_bytes() == PAYLOAD
+        assert handler.range_requests[1:] == [(half, len(PAYLOAD) - 1)]
+
+    def test_resume_from_plain_partial(self, ranged_server, tmp_path):
+        handler, base = ranged_server
+        dest = tmp_path / "model.bin"
+        (tmp_path / "model.bin.part").write_bytes(PAYLOAD[:1000])
+
+        result = _downloader(connections_per_file=1).download(f"{base}/model.bin", dest)
+
+        assert result.resumed_from == 1000
+        assert dest.read_bytes() == PAYLOAD
+        assert handler.range_requests[1:] == [(1000, len(PAYLOAD) - 1)]
+
+    def test_full_size_part_without_state_is_refetched(self, ranged_server, tmp_path):
+        # What a crash right after pre-sizing would leave behind.
+        handler, base = ranged_server
+        dest = tmp_path / "model.bin"
+        (tmp_path / "model.bin.part").write_bytes(b"\0" * len(PAYLOAD))
+
+        result = _downloader().download(f"{base}/model.bin", dest)
+
+        assert result.resumed_from == 0
+        assert dest.read_bytes() == PAYLOAD
+
+    def test_state_is_written_before_part_is_presized(self, ranged_server, tmp_path, monkeypatch):
+        _, base = ranged_server
+        dest = tmp_path / "model.bin"
+        seen = []
+
+        def plan_then_crash(*a, **kw):
+            seen.append((tmp_path / "model.bin.part.json").exists())
+            raise KeyboardInterrupt
+
+        dl = _downloader()
+        monkeypatch.setattr(dl, "_run_segments", plan_then_crash)
+        with pytest.raises(KeyboardInterrupt):
+            dl.download(f"{base}/model.bin", dest)
+        assert seen == [True]
+        assert (tmp_path / "model.bin.part").stat().st_size == len(PAYLOAD)
+
+    def test_stale_sidecar_restarts(self, ranged_server, tmp_path):
+        _, base = ranged_server
+        dest = tmp_path / "model.bin"
+        (tmp_path / "model.bin.part").write_bytes(b"x" * 10)
+        (tmp_path / "model.bin.part.json").write_text(json.dumps({
+            "url": "", "total": len(PAYLOAD), "validator": '"old"', "segments": [[0, 9, 10]],
+        }))
+        result = _downloader().download(f"{base}/model.bin", dest, sha256=PAYLOAD_SHA)
+        assert result.resumed_from == 0
+        assert dest.read_bytes() == PAYLOAD
+
+
+class TestFallbacksAndEvents:
+    def test_server_without_ranges_streams_once(self, plain_server, tmp_path):
+        _, base = plain_server
+        dest = tmp_path / "model.bin"
+        result = _downloader().download(f"{base}/model.bin", dest, sha256=PAYLOAD_SHA)
+        assert result.connections == 1
+        assert dest.read_bytes() == PAYLOAD
+
+    def test_progress_events(self, ranged_server, tmp_path):
+        _, base = ranged_server
+        events = []
+        _downloader().download(f"{base}/model.bin", tmp_path / "m.bin", key="m", on_event=events.append)
+
+        kinds = [e.kind for e in events]
+        assert kinds[0] == "start"
+        assert "progress" in kinds
+        assert kinds[-2:] == ["verifying", "complete"]
+        assert all(e.key == "m" for e in events)
+        assert events[-1].downloaded == len(PAYLOAD)
+
+    def test_http_error_surfaces_status(self, ranged_server, tmp_path):
+        _, base = ranged_server
+        events = []
+        with pytest.raises(DownloadError) as exc:
+            _downloader().download(f"{base}/missing", tmp_path / "x.bin", on_event=events.append)
+        assert exc.value.status_code == 404
+        assert events[-1].kind == "error"
+
+    def test_download_many_reports_each_job(self, ranged_server, tmp_path):
+        _, base = ranged_server
+        jobs = [
+            DownloadJob(url=f"{base}/a.bin", dest=tmp_path / "a.bin", key="a", sha256=PAYLOAD_SHA),
+            DownloadJob(url=f"{base}/missing", dest=tmp_path / "b.bin", key="b"),
+            DownloadJob(url=f"{base}/c.bin", dest=tmp_path / "c.bin", key="c"),
+        ]
+        results = _downloader(max_parallel_files=3, max_connections=4).download_many(jobs)
+
+        assert results[0].key == "a" and results[2].key == "c"
+        assert isinstance(results[1], DownloadError)
+        assert (tmp_path / "a.bin").read_bytes() == PAYLOAD
+        assert (tmp_path / "c.bin").read_bytes() == PAYLOAD
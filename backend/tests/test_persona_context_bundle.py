@@ -0,0 +1,132 @@
+"""
+Tests for the cached persona context bundle (app/projects.py).
+
+Covers:
+  1. build_persona_context is built once, then served from the cache with a
+     fresh clock on every call
+  2. update_project invalidates the bundle
+  3. Removing an image file on disk drops it from the catalog without a
+     project update
+  4. File existence checks are memoized per folder mtime
+  5. Teams build_persona_prompt reads identity directly; nsfw_mode gets its own entry
+  6. Empty identity fields keep each prompt's original defaults
+"""
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+
+
+@pytest.fixture
+def persona(app):
+    # Import at fixture time: other tests purge/re-import the app package
+    global projects
+    from app import projects
+
+    root = projects._upload_root_path() / "bundle-test"
+    root.mkdir(parents=True, exist_ok=True)
+    for name in ("default.png", "red.png", "blue.png"):
+        (root / name).write_bytes(b"png")
+
+    project = projects.create_new_project({
+        "name": "Bundle Persona",
+        "project_type": "persona",
+        "persona_agent": {"label": "Nova", "role": "Guide", "persona_class": "assistant",
+                          "response_style": {"tone": "calm"}},
+        "persona_appearance": {
+            "selected": {"set_id": "s1", "image_id": "i1"},
+            "sets": [{"set_id": "s1", "images": [
+                {"id": "i1", "url": "/files/bundle-test/default.png", "set_id": "s1"}]}],
+            "outfits": [{"label": "Dress", "outfit_prompt": "red dress", "images": [
+                {"id": "o1", "url": "/files/bundle-test/red.png"},
+                {"id": "o2", "url": "/files/bundle-test/blue.png"}]}],
+        },
+    })
+    projects._reset_for_tests()
+    yield project, root
+    projects.delete_project(project["id"])
+    projects._reset_for_tests()
+
+
+def test_bundle_built_once_and_rendered_per_call(persona):
+    project, _ = persona
+    first = projects.build_persona_context(project["id"])
+    second = projects.build_persona_context(project["id"])
+
+    assert 'You are "Nova"' in first and "[show:Dress 2]" in first
+    assert first == second
+    assert "\x00" not in first
+    stats = projects.persona_context_cache_stats()
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+
+    bundle = projects.get_persona_context_bundle(project["id"])
+    assert bundle.render(now=0) != bundle.render(now=86400 * 400)
+    assert "Personal Assistant" in first
+
+
+def test_update_project_invalidates(persona):
+    project, _ = persona
+    projects.build_persona_context(project["id"])
+    projects.update_project(project["id"], {"persona_agent": {"label": "Orion"}})
+
+    assert 'You are "Orion"' in projects.build_persona_context(project["id"])
+    assert projects.persona_context_cache_stats()["misses"] == 2
+
+
+def test_deleted_image_drops_out_of_catalog(persona):
+    project, root = persona
+    assert "[show:Dress 2]" in projects.build_persona_context(project["id"])
+
+    (root / "blue.png").unlink()
+    text = projects.build_persona_context(project["id"])
+    assert "[show:Dress 2]" not in text and "[show:Dress]" in text
+
+
+def test_file_checks_memoized_per_folder(persona, monkeypatch):
+    _, root = persona
+    urls = [f"http://localhost:8000/files/bundle-test/{n}" for n in ("default.png", "red.png", "nope.png")]
+    assert projects._file_urls_exist(urls) == dict(zip(urls, [True, True, False]))
+
+    calls = []
+    real = pathlib.Path.is_file
+    monkeypatch.setattr(pathlib.Path, "is_file", lambda self: calls.append(self) or real(self))
+    assert projects._file_urls_exist(urls) == dict(zip(urls, [True, True, False]))
+    assert calls == []
+
+    (root / "nope.png").write_bytes(b"png")  # bumps the folder mtime
+    assert projects._file_url_exists(urls[2]) is True
+    assert len(calls) == 1
+
+
+def test_teams_prompt_reads_identity_without_bundle(persona):
+    from app.teams.meeting_engine import build_persona_prompt
+
+    project, _ = persona
+    project = projects.get_project_by_id(project["id"])
+    prompt = build_persona_prompt(project, {"id": "", "name": "Standup"}, [])
+
+    assert 'You are "Nova"' in prompt and "Communication tone: calm" in prompt
+    assert projects.persona_context_cache_stats()["entries"] == 0
+
+    projects.build_persona_context(project["id"])
+    projects.build_persona_context(project["id"], nsfw_mode=True)
+    assert projects.persona_context_cache_stats()["entries"] == 2
+
+
+def test_empty_identity_fields_keep_baseline_defaults(persona):
+    from app.teams.meeting_engine import build_persona_prompt
+
+    project, _ = persona
+
+    def render(persona_agent):
+        data = dict(project, persona_agent=persona_agent)
+        return projects._build_persona_bundle(project["id"], data, False, "v").render()
+
+    text = render({"label": "Nova", "persona_class": "", "response_style": {"tone": ""}})
+    assert "- Tone: \n" in text and "- Class: \n" in text
+    text = render({"label": "Nova"})
+    assert "- Tone: warm\n" in text and "- Class: Custom Persona\n" in text
+
+    prompt = build_persona_prompt({"name": "", "persona_agent": {}}, {"name": "Standup"}, [])
+    assert 'You are "Persona"' in prompt and "Communication tone" not in prompt
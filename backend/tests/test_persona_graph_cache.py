@@ -0,0 +1,147 @@
+"""
+Tests for persona-graph caching and node tracing.
+
+Covers:
+  1. Compiled graphs are built once per reasoning mode and reused
+  2. traced() keeps sync nodes sync and async nodes async, and counts errors
+  3. run_persona_graph returns per-node timings and feeds metrics_snapshot()
+  4. resolve_persona is cached, invalidated on profile change, returns copies
+  5. GET /v1/persona-graph/metrics
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+BUNDLES_DIR = Path(__file__).resolve().parents[2] / "community" / "shared" / "bundles"
+
+
+@pytest.fixture
+def graphs():
+    # Import at fixture time: other tests purge/re-import the app package
+    global graph_builder, tracing
+    from app.langgraph_personas import graph_builder, tracing
+
+    graph_builder.clear_compiled_graphs()
+    tracing.reset_metrics()
+    yield graph_builder
+    graph_builder.clear_compiled_graphs()
+    tracing.reset_metrics()
+
+
+@pytest.fixture
+def persona_dir(tmp_path):
+    from app.persona_runtime import manager
+
+    src = next(p for p in sorted(BUNDLES_DIR.glob("*/persona")) if (p / "manifest.json").exists())
+    dst = tmp_path / "persona"
+    shutil.copytree(src, dst)
+    manager.clear_persona_cache()
+    yield dst
+    manager.clear_persona_cache()
+
+
+# ── 1. Compiled graph cache ──────────────────────────────────────────
+
+
+def test_compiled_graph_is_reused_per_mode(graphs):
+    direct = graphs.get_compiled_graph("direct")
+    assert graphs.get_compiled_graph("direct") is direct
+    assert graphs.get_compiled_graph("orchestrated") is not direct
+    # Unknown modes fall back to direct, like build_persona_graph
+    assert graphs.get_compiled_graph("nonsense") is direct
+    assert graphs.compiled_graph_modes() == ["direct", "orchestrated"]
+
+
+# ── 2. traced() ──────────────────────────────────────────────────────
+
+
+def test_traced_preserves_sync_and_async(graphs):
+    def sync_node(state):
+        return {"x": 1}
+
+    async def async_node(state):
+        return {"y": 2}
+
+    def bad_node(state):
+        raise ValueError("boom")
+
+    wrapped_sync = tracing.traced("s", sync_node)
+    wrapped_async = tracing.traced("a", async_node)
+    assert not inspect.iscoroutinefunction(wrapped_sync)
+    assert inspect.iscoroutinefunction(wrapped_async)
+    assert wrapped_sync({}) == {"x": 1}
+    assert asyncio.run(wrapped_async({})) == {"y": 2}
+    with pytest.raises(ValueError):
+        tracing.traced("bad", bad_node)({})
+
+    nodes = tracing.metrics_snapshot()["nodes"]
+    assert nodes["s"]["count"] == 1 and nodes["a"]["count"] == 1
+    assert nodes["bad"]["errors"] == 1
+
+
+# ── 3. run_persona_graph timings ─────────────────────────────────────
+
+
+def test_run_records_node_timings(graphs, monkeypatch):
+    from app import llm
+
+    async def fake_chat(messages, **kwargs):
+        return "hello there"
+
+    monkeypatch.setattr(llm, "chat", fake_chat)
+
+    state = {"persona_id": "p1", "user_message": "hi", "system_prompt": "You are p1."}
+    for _ in range(2):
+        out = asyncio.run(graphs.run_persona_graph(reasoning_mode="direct", initial_state=state))
+        assert out["response_text"] == "hello there"
+        assert [t["node"] for t in out["node_timings"]] == ["perceive", "respond"]
+        assert all(t["ok"] for t in out["node_timings"])
+
+    snap = tracing.metrics_snapshot()
+    assert snap["runs"]["direct"]["count"] == 2
+    assert snap["nodes"]["perceive"]["count"] == 2
+    assert snap["nodes"]["respond"]["count"] == 2
+    assert graphs.compiled_graph_modes() == ["direct"]
+
+
+# ── 4. resolve_persona cache ─────────────────────────────────────────
+
+
+def test_resolve_persona_cache_and_invalidation(persona_dir):
+    from app.persona_runtime import manager
+
+    first = manager.resolve_persona(persona_dir)
+    second = manager.resolve_persona(persona_dir)
+    assert manager.persona_cache_stats()["hits"] == 1
+    assert first is not second
+    second.display_name = "mutated"
+    assert manager.resolve_persona(persona_dir).display_name == first.display_name
+
+    manifest = persona_dir / "manifest.json"
+    data = json.loads(manifest.read_text())
+    data["name"] = "Renamed Persona"
+    manifest.write_text(json.dumps(data))
+    st = manifest.stat()
+    os.utime(manifest, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    manager.resolve_persona(persona_dir)
+    assert manager.persona_cache_stats()["misses"] == 2
+
+
+# ── 5. Metrics endpoint ──────────────────────────────────────────────
+
+
+def test_metrics_endpoint(client, graphs):
+    graphs.get_compiled_graph("guided")
+    r = client.get("/v1/persona-graph/metrics")
+    assert r.status_code == 200
+    body = r.json()
+    assert {"nodes", "runs", "compiled_graphs", "persona_config_cache"} <= set(body)
+    assert "guided" in body["compiled_graphs"]
@@ -0,0 +1,151 @@
+"""
+Tests for the shared compiled policy engine (app/policy_engine.py) and its
+use by studio policy and the interactive intent classifier.
+
+Covers:
+  1. CompiledTier.first matches the legacy first-match-wins loop exactly
+     (rule, matched text) for studio tiers and classifier rules
+  2. Word-start hoisting only applies where ``\\b`` is provably a word start
+  3. Invalid patterns are skipped, like _compile_patterns
+  4. PolicyEngine caches scans and stays bounded
+  5. enforce_policy / classify_intent decisions are unchanged
+"""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from app.interactive.policy import classifier
+from app.policy_engine import CompiledTier, PolicyEngine, _word_start_body, numbered
+from app.studio import policy
+
+PROMPTS = [
+    "",
+    "portrait photo of an astronaut, cinematic lighting",
+    "a romantic kiss under the rain, passionate embrace",
+    "sensual slow dance, seductive glance",
+    "intimate scene between two lovers, tension and longing",
+    "NSFW porn star in a hardcore scene",
+    "he was forced himself to leave; the child watched",
+    "the child drew a nude figure study",
+    "non-consensual sex",
+    "she undressed slowly, bare skin glowing",
+    "a cocktail party with cumulus clouds",   # substrings, not words
+    "Dick Grayson and a rooster (cock) at dawn",
+    "hello, how do you say thank you?",
+    "you're so cute",
+    "i'm stuck, give me a hint",
+    "option c",
+    "it's the answer is forty two",
+    "what's your name?",
+    "show me your smile",
+    "kid's birthday party, balloons, beautiful cake",
+    "TRANSLATE this: what does hygge mean",
+]
+
+STUDIO_TIERS = {
+    "absolute": policy.ABSOLUTE_BLOCKLIST,
+    "sfw": policy.SFW_BLOCKLIST,
+    "explicit": policy.EXPLICIT_BLOCKLIST,
+    "mature_allowed": policy.MATURE_ALLOWED_TERMS,
+}
+
+
+def _legacy_first(rules, text):
+    for i, rx in enumerate(rules):
+        m = rx.search(text)
+        if m:
+            return i, m.group(0)
+    return None
+
+
+@pytest.mark.parametrize("tier", sorted(STUDIO_TIERS))
+def test_studio_tier_parity(tier):
+    patterns = STUDIO_TIERS[tier]
+    compiled = CompiledTier(tier, numbered(patterns, tier))
+    legacy = [re.compile(p, re.IGNORECASE) for p in patterns]
+    for text in PROMPTS:
+        hit = compiled.first(text)
+        expected = _legacy_first(legacy, text)
+        assert ((hit.index, hit.text) if hit else None) == expected, text
+        if hit:
+            assert hit.rule_id == f"{tier}:{hit.index}"
+        assert policy._tier_hit(text, tier) == policy._check_patterns(text, legacy), text
+
+
+def test_classifier_parity():
+    rules = [rx for _, rx in classifier._RULES]
+    for text in PROMPTS:
+        expected = _legacy_first(rules, text)
+        got = classifier.classify_intent(text)
+        if not text.strip():
+            assert got.intent_code == "empty"
+        elif expected is None:
+            assert got.intent_code == "unknown"
+        else:
+            code, rx = classifier._RULES[expected[0]]
+            assert (got.intent_code, got.matched_pattern) == (code, rx.pattern), text
+
+
+def test_first_rule_wins_even_when_matching_later_in_text():
+    tier = CompiledTier("t", [("late", r"\bzebra\b"), ("early", r"\bapple\b")])
+    hit = tier.first("apple then zebra")
+    assert hit.rule_id == "late" and hit.text == "zebra" and hit.span == (11, 16)
+
+
+def test_word_start_hoisting_is_conservative():
+    assert _word_start_body(r"\bporn\b") == r"porn\b"
+    assert _word_start_body(r"\b(non-?consensual|without consent)\b") is not None
+    assert _word_start_body(r"\b(?=x)y") is None
+    assert _word_start_body(r"\b[a-z]+") is None
+    assert _word_start_body(r"\b-foo") is None
+    assert _word_start_body(r"\b(a|-b)") is None
+    assert _word_start_body(r"\bx?y") is None
+    # A non-hoisted \b rule still matches at a word end
+    tier = CompiledTier("t", [("dash", r"\b-foo"), ("word", r"\bbar\b")])
+    assert tier.first("a-foo bar").rule_id == "dash"
+
+
+def test_invalid_patterns_are_skipped():
+    tier = CompiledTier("t", [("bad", r"(unclosed"), ("ok", r"\bfine\b")])
+    assert len(tier) == 1
+    assert tier.first("all fine").rule_id == "ok"
+    assert CompiledTier("empty", []).first("anything") is None
+
+
+def test_precompiled_patterns_keep_their_flags():
+    tier = CompiledTier("t", [("cs", re.compile(r"\bABC\b")), ("ci", r"\bxyz\b")])
+    assert tier.first("abc XYZ").rule_id == "ci"
+    assert tier.first("ABC").rule_id == "cs"
+
+
+def test_engine_scan_cache_is_bounded():
+    engine = PolicyEngine({"a": [("x", r"\bfoo\b")], "b": [("y", r"\bbar\b")]}, cache_size=2)
+    scan = engine.scan("foo and bar")
+    assert scan.tiers_hit() == ["a", "b"]
+    assert engine.scan("foo and bar") is scan
+    engine.scan("one")
+    engine.scan("two")
+    info = engine.cache_info()
+    assert info["entries"] == 2 and info["hits"] == 1 and info["misses"] == 3
+    assert engine.scan("foo and bar") is not scan
+
+
+@pytest.mark.parametrize("prompt,rating,allowed", [
+    ("a sensual portrait", "sfw", False),
+    ("a sensual portrait", "mature", True),
+    ("hardcore orgy", "mature", False),
+    ("the child drew a nude figure", "mature", False),
+    ("mountain lake at dawn", "sfw", True),
+])
+def test_enforce_policy_decisions_unchanged(prompt, rating, allowed):
+    decision = policy.enforce_policy(
+        prompt=prompt,
+        content_rating=rating,
+        policy_mode="restricted",
+        provider="ollama",
+        provider_policy=policy.ProviderPolicy(allowMature=True),
+    )
+    assert decision.allowed is allowed
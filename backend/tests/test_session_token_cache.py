@@ -0,0 +1,148 @@
+"""
+Tests for the session token cache (app/session_cache.py) wired into
+users._validate_token.
+
+Covers:
+  1. Repeat validation is served from memory (no DB join)
+  2. Logout / _invalidate_token revokes synchronously
+  3. change_password(sign_out_others) revokes the other sessions only
+  4. Profile updates refresh the cached user dict
+  5. Entries never outlive the session's expires_at
+  6. Cross-process fan-out via the epoch marker file
+  7. Request-scoped memo validates a token once per request
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def users_mod(tmp_path, monkeypatch):
+    from app import session_cache, users
+
+    db = str(tmp_path / "auth.db")
+    monkeypatch.setattr(users, "_get_db_path", lambda: db)
+    monkeypatch.setattr(users, "token_cache", session_cache.SessionTokenCache(ttl_s=60))
+    users.ensure_users_tables()
+    return users
+
+
+def _make_user(users, name=None):
+    name = name or f"u{uuid.uuid4().hex[:8]}"
+    user = users.create_user(username=name, password="password123")
+    return user, users._create_token(user["id"])
+
+
+class _CountingConnect:
+    def __init__(self, monkeypatch, users):
+        self.calls = 0
+        real = sqlite3.connect
+
+        def _connect(*a, **k):
+            self.calls += 1
+            return real(*a, **k)
+
+        monkeypatch.setattr(users.sqlite3, "connect", _connect)
+
+
+def test_repeat_validation_skips_db(users_mod, monkeypatch):
+    user, token = _make_user(users_mod)
+    assert users_mod._validate_token(token)["id"] == user["id"]
+
+    counter = _CountingConnect(monkeypatch, users_mod)
+    for _ in range(100):
+        assert users_mod._validate_token(token)["id"] == user["id"]
+    assert counter.calls == 0
+    assert users_mod.token_cache.stats()["hits"] == 100
+
+
+def test_cached_user_is_a_copy(users_mod):
+    _, token = _make_user(users_mod)
+    users_mod._validate_token(token)["display_name"] = "tampered"
+    assert users_mod._validate_token(token)["display_name"] != "tampered"
+
+
+def test_invalidate_token_revokes_immediately(users_mod):
+    _, token = _make_user(users_mod)
+    assert users_mod._validate_token(token)
+    users_mod._invalidate_token(token)
+    assert users_mod._validate_token(token) is None
+
+
+def test_sign_out_others_keeps_current_session(users_mod):
+    user, keep = _make_user(users_mod)
+    other = users_mod._create_token(user["id"])
+    assert users_mod._validate_token(keep) and users_mod._validate_token(other)
+
+    assert users_mod._invalidate_other_sessions(user["id"], keep) == 1
+    assert users_mod._validate_token(keep)["id"] == user["id"]
+    assert users_mod._validate_token(other) is None
+
+
+def test_user_update_refreshes_cached_dict(users_mod):
+    user, token = _make_user(users_mod)
+    assert users_mod._validate_token(token)["cloud_user_id"] in (None, "")
+    users_mod.set_cloud_link(user["id"], "cloud-123")
+    assert users_mod._validate_token(token)["cloud_user_id"] == "cloud-123"
+
+
+def test_entry_expires_with_session(users_mod):
+    user, token = _make_user(users_mod)
+    soon = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(time.time() + 1))
+    con = sqlite3.connect(users_mod._get_db_path())
+    con.execute("UPDATE user_sessions SET expires_at = ? WHERE token = ?", (soon, token))
+    con.commit()
+    con.close()
+
+    assert users_mod._validate_token(token)
+    time.sleep(1.2)
+    assert users_mod._validate_token(token) is None
+
+
+def test_revocation_fans_out_to_other_processes(users_mod):
+    from app.session_cache import MISS, SessionTokenCache
+
+    _, token = _make_user(users_mod)
+    db = users_mod._get_db_path()
+    users_mod._validate_token(token)
+
+    # A second cache stands in for another worker process with its own memory
+    other_worker = SessionTokenCache(ttl_s=60)
+    other_worker.bind(db)
+    other_worker.put(token, {"id": "x"})
+    time.sleep(0.01)
+
+    users_mod._invalidate_token(token)
+    assert other_worker.get(token) is MISS
+
+
+def test_request_memo_validates_once(users_mod, monkeypatch):
+    from app.session_cache import request_memo
+
+    monkeypatch.setattr(users_mod.token_cache, "ttl_s", 0)  # cache off: only the memo helps
+    _, token = _make_user(users_mod)
+    counter = _CountingConnect(monkeypatch, users_mod)
+    with request_memo():
+        for _ in range(5):
+            assert users_mod._validate_token(token)
+        assert users_mod._validate_token("bogus") is None
+        assert users_mod._validate_token("bogus") is None
+    assert counter.calls == 2
+    users_mod._validate_token(token)
+    assert counter.calls == 3
+
+
+def test_bounded_lru():
+    from app.session_cache import MISS, SessionTokenCache
+
+    cache = SessionTokenCache(ttl_s=60, max_entries=3)
+    for i in range(5):
+        cache.put(f"t{i}", {"id": str(i)})
+    assert cache.get("t0") is MISS and cache.get("t1") is MISS
+    assert cache.get("t4")["id"] == "4"
+    assert cache.stats()["entries"] == 3
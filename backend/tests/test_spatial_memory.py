@@ -0,0 +1,243 @@
+"""
+Tests for spatial memory ingestion and consolidation.
+
+Covers:
+  1. Buffered ingestion, oversized data stored as valid JSON
+  2. Positional samples packed into column blocks and read back
+  3. Incremental episode segmentation from a watermark
+  4. Retention: downsampling old samples and expiring old traces
+  5. Concurrent sessions share one writer without losing events
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def sm(tmp_path):
+    from app import spatial_memory
+
+    yield spatial_memory, str(tmp_path / "spatial.db")
+    spatial_memory.shutdown_spatial_stores()
+
+
+def _moves(n: int, start_seq: int = 0, step_ms: float = 50.0):
+    return [
+        {
+            "seq": start_seq + i,
+            "timestamp": "2026-01-01T10:00:00Z",
+            "elapsed_ms": (start_seq + i) * step_ms,
+            "kind": "avatar",
+            "name": "avatar.move",
+            "data": {"position": {"x": float(i), "y": 0.0, "z": -float(i)}, "rotation_y_deg": 90.0},
+        }
+        for i in range(n)
+    ]
+
+
+def _rows(db_path: str, sql: str):
+    import sqlite3
+
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(sql).fetchall()
+
+
+# ── 1. Buffered ingestion ────────────────────────────────────────────
+
+
+def test_ingest_is_buffered_and_truncation_keeps_json(sm):
+    mod, db = sm
+    builder = mod.SpatialMemoryBuilder("p1", mod.SpatialConfig(max_data_chars=50, flush_interval_s=60), db_path=db)
+    events = [
+        {"seq": 1, "kind": "gesture", "name": "hand.wave", "data": {"side": "right"}},
+        {"seq": 2, "kind": "speech", "name": "speech.start", "data": {"text": "x" * 500}},
+    ]
+    assert builder.ingest_batch("t1", events) == 2
+    assert _rows(db, "SELECT COUNT(*) FROM spatial_trace") == [(0,)]
+
+    assert builder.flush() == 2
+    stored = builder.get_trace_events(trace_id="t1")
+    assert [e["seq"] for e in stored] == [2, 1]
+    assert stored[0]["data"]["_truncated"].startswith('{"text": "xxx')
+    assert stored[1]["data"] == {"side": "right"}
+
+
+def test_full_buffer_flushes_inline(sm):
+    mod, db = sm
+    cfg = mod.SpatialConfig(buffer_max_events=10, flush_batch=10, flush_interval_s=60)
+    builder = mod.SpatialMemoryBuilder("p1", cfg, db_path=db)
+    builder.ingest_batch("t1", [{"seq": i, "kind": "custom", "name": "tick"} for i in range(12)])
+    assert builder._store.pending() == 0
+    assert _rows(db, "SELECT COUNT(*) FROM spatial_trace") == [(12,)]
+
+
+# ── 2. Column blocks ─────────────────────────────────────────────────
+
+
+def test_positional_samples_round_trip_through_blocks(sm):
+    mod, db = sm
+    builder = mod.SpatialMemoryBuilder("p1", mod.SpatialConfig(flush_interval_s=60), db_path=db)
+    builder.ingest_batch("t1", _moves(200) + [{"seq": 999, "kind": "avatar", "name": "avatar.sit", "elapsed_ms": 10_000, "data": {"target": "seat"}}])
+    builder.flush()
+
+    assert _rows(db, "SELECT COUNT(*) FROM spatial_trace") == [(1,)]
+    assert _rows(db, "SELECT kind, name, sample_count, resolution_s FROM spatial_track") == [("avatar", "avatar.move", 200, 0)]
+
+    events = builder.get_trace_events(kind="avatar", limit=3)
+    assert [e["seq"] for e in events] == [999, 199, 198]
+    assert events[1]["data"] == {"position": {"x": 199.0, "y": 0.0, "z": -199.0}, "rotation_y_deg": 90.0}
+    assert events[1]["timestamp"] == "2026-01-01T10:00:00Z"
+    assert events[1]["elapsed_ms"] == pytest.approx(199 * 50.0)
+    assert len(builder.get_trace_events(limit=500)) == 201
+
+
+def test_positional_samples_keep_raw_fields(sm):
+    mod, db = sm
+    builder = mod.SpatialMemoryBuilder("p1", mod.SpatialConfig(flush_interval_s=60), db_path=db)
+    sent = [
+        {"seq": 1, "timestamp": "2026-01-01T10:00:00.123+02:00", "elapsed_ms": 86_400_123,
+         "kind": "avatar", "name": "avatar.move", "data": {"position": {"x": 1.5}}},
+        {"seq": 2, "timestamp": "not a date", "elapsed_ms": 86_400_173.25,
+         "kind": "avatar", "name": "avatar.move", "data": {"position": {"x": 1.1, "z": -0.3}, "rotation_y_deg": 12.7}},
+    ]
+    builder.ingest_batch("t1", sent)
+    assert builder.flush() == 2
+    assert _rows(db, "SELECT COUNT(*) FROM spatial_trace") == [(0,)]
+
+    got = sorted(builder.get_trace_events(trace_id="t1"), key=lambda e: e["seq"])
+    for original, back in zip(sent, got):
+        assert back["timestamp"] == original["timestamp"]
+        assert back["elapsed_ms"] == original["elapsed_ms"]
+        assert back["data"] == original["data"]
+
+
+def test_odd_client_fields_do_not_lose_the_batch(sm):
+    mod, db = sm
+    builder = mod.SpatialMemoryBuilder("p1", mod.SpatialConfig(flush_interval_s=60), db_path=db)
+    move = {"kind": "avatar", "name": "avatar.move", "data": {"position": {"x": 1.0}}}
+    builder.ingest_batch("t1", [
+        {**move, "seq": "2", "elapsed_ms": "oops"},
+        {**move, "seq": 2 ** 40, "elapsed_ms": 5},
+        {**move, "seq": 2 ** 70},
+        {"seq": 3, "kind": "gesture", "name": "hand.wave"},
+    ])
+    assert builder.flush() == 4
+    got = sorted((e["seq"], e["elapsed_ms"]) for e in builder.get_trace_events(trace_id="t1"))
+    assert got == [(0, 0), (2, 0), (3, 0), (2 ** 40, 5)]
+
+
+def test_writer_survives_a_failed_pass(sm, monkeypatch):
+    mod, db = sm
+    builder = mod.SpatialMemoryBuilder("p1", mod.SpatialConfig(flush_interval_s=0.02), db_path=db)
+    store = builder._store
+    real = store._encode
+    calls = []
+
+    def flaky(batch):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return real(batch)
+
+    monkeypatch.setattr(store, "_encode", flaky)
+    builder.ingest_batch("t1", [{"seq": 1, "kind": "gesture", "name": "hand.wave"}])
+    deadline = time.time() + 5
+    while _rows(db, "SELECT COUNT(*) FROM spatial_trace") != [(1,)] and time.time() < deadline:
+        time.sleep(0.02)
+    assert store._thread.is_alive()
+    assert _rows(db, "SELECT COUNT(*) FROM spatial_trace") == [(1,)]
+
+
+# ── 3. Incremental consolidation ─────────────────────────────────────
+
+
+def test_consolidation_only_reads_past_the_watermark(sm, monkeypatch):
+    mod, db = sm
+    clock = [1_000_000.0]
+    monkeypatch.setattr(mod, "_now", lambda: clock[0])
+    cfg = mod.SpatialConfig(episode_gap_s=300, flush_interval_s=60, maintenance_interval=1e9)
+    builder = mod.SpatialMemoryBuilder("p1", cfg, db_path=db)
+
+    builder.ingest_batch("t1", _moves(10) + [{"seq": 50, "kind": "gesture", "name": "hand.wave", "elapsed_ms": 500}])
+    # Still open: nothing is finalized until the episode goes quiet.
+    assert builder.consolidate() == 0
+    clock[0] += 100
+    builder.ingest_batch("t1", [{"seq": 60, "kind": "speech", "name": "speech.start"}])
+    assert builder.consolidate() == 0
+
+    clock[0] += 1000
+    builder.ingest_batch("t2", _moves(5))  # starts a second episode
+    assert builder.consolidate() == 1
+    (episode,) = builder.get_recent_episodes()
+    assert episode["event_count"] == 12
+    assert episode["summary"] == "Episode (1.7min): avatar×10, gesture×1, speech×1"
+    assert episode["tags"] == ["avatar", "gesture", "hand", "speech"]
+    assert episode["importance"] == pytest.approx(round(0.6 * 3 / 5 + 0.4 * 12 / 20, 3))
+    assert _rows(db, "SELECT trace_row, track_row FROM spatial_watermark") == [(2, 2)]
+
+    clock[0] += 1000
+    assert builder.consolidate() == 1
+    assert sorted(e["event_count"] for e in builder.get_recent_episodes()) == [5, 12]
+    assert builder.consolidate() == 0
+
+
+# ── 4. Retention ─────────────────────────────────────────────────────
+
+
+def test_retention_downsamples_then_expires(sm, monkeypatch):
+    mod, db = sm
+    clock = [2_000_000.0]
+    monkeypatch.setattr(mod, "_now", lambda: clock[0])
+    cfg = mod.SpatialConfig(raw_retention_s=3600, trace_retention_s=86400, downsample_s=1.0, flush_interval_s=60,
+                            maintenance_interval=1e9)
+    builder = mod.SpatialMemoryBuilder("p1", cfg, db_path=db)
+
+    builder.ingest_batch("t1", _moves(100, step_ms=50))  # 5 s of 20 Hz samples
+    builder.ingest_batch("t1", [{"seq": 500, "kind": "gesture", "name": "hand.wave"}])
+    # Unconsolidated samples are never touched.
+    assert builder.apply_retention(now=clock[0] + 7200)["downsampled_blocks"] == 0
+
+    clock[0] += 600
+    builder.consolidate()
+    stats = builder.apply_retention(now=clock[0] + 7200)
+    assert stats["downsampled_blocks"] == 1
+    ((count, resolution),) = _rows(db, "SELECT sample_count, resolution_s FROM spatial_track")
+    assert resolution == 1.0 and count in (5, 6)
+    xs = [e["data"]["position"]["x"] for e in builder.get_trace_events(kind="avatar", limit=10)]
+    assert len(xs) == count and xs == sorted(xs, reverse=True)
+
+    stats = builder.apply_retention(now=clock[0] + 2 * 86400)
+    assert stats["deleted_events"] == 1 and stats["deleted_blocks"] == 1
+    assert builder.get_trace_events() == []
+    assert len(builder.get_recent_episodes()) == 1
+
+
+# ── 5. Concurrency ───────────────────────────────────────────────────
+
+
+def test_concurrent_sessions_lose_nothing(sm):
+    mod, db = sm
+    cfg = mod.SpatialConfig(flush_batch=500, buffer_max_events=2000, flush_interval_s=0.05)
+
+    def session(n: int) -> None:
+        builder = mod.SpatialMemoryBuilder(f"persona-{n % 4}", cfg, db_path=db)
+        for batch in range(20):
+            events = _moves(40, start_seq=batch * 40)
+            events.append({"seq": 10_000 + batch, "kind": "gesture", "name": "hand.wave", "data": {"n": n}})
+            builder.ingest_batch(f"trace-{n}", events)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    mod.SpatialMemoryBuilder("persona-0", cfg, db_path=db).flush()
+
+    assert _rows(db, "SELECT COUNT(*) FROM spatial_trace") == [(16 * 20,)]
+    assert _rows(db, "SELECT SUM(sample_count) FROM spatial_track") == [(16 * 20 * 40,)]
+    waves = [json.loads(d) for (d,) in _rows(db, "SELECT data_json FROM spatial_trace")]
+    assert sorted({w["n"] for w in waves}) == list(range(16))
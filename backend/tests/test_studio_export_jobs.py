@@ -0,0 +1,161 @@
+"""
+Tests for background Studio project exports (app/studio/export_jobs.py).
+
+Covers:
+  1. JSON / storyboard PDF / slides PDF jobs produce real artifacts
+  2. Asset ZIP streams local files in and flags unreachable ones
+  3. Repeat exports of an unchanged project are served from the cache
+  4. A new VersionSnapshot invalidates the cached artifact
+  5. Status / download endpoints (404 / 409 handling)
+  6. PPTX without python-pptx fails the job with a clear error
+  7. A slower, older job never deletes a newer job's artifact
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+
+@pytest.fixture
+def project(client):
+    # Import at fixture time: other tests purge/re-import the app package
+    global export_jobs
+    from app.config import UPLOAD_DIR
+    from app.studio import export_jobs
+
+    export_jobs._reset_for_tests()
+
+    def _make(project_type="slides", images=2):
+        r = client.post("/studio/projects", json={"title": "Export Test", "projectType": project_type})
+        pid = r.json()["project"]["id"]
+        for i in range(images):
+            name = f"export_{pid[:8]}_{i}.png"
+            Image.new("RGB", (320, 180), (40 * i, 90, 160)).save(Path(UPLOAD_DIR) / name)
+            client.post(f"/studio/projects/{pid}/assets", json={
+                "kind": "image", "filename": name, "mime": "image/png",
+                "sizeBytes": 1, "url": f"/files/{name}",
+            })
+        return pid
+
+    return _make
+
+
+def _export(client, pid, kind):
+    r = client.post(f"/studio/projects/{pid}/export/jobs", json={"kind": kind})
+    assert r.status_code == 202, r.text
+    job = export_jobs.wait_for(r.json()["id"])
+    assert job.status == "done", job.error
+    return r.json(), client.get(f"/studio/projects/{pid}/export/jobs/{job.id}/download")
+
+
+def test_pdf_and_json_artifacts(client, project):
+    pid = project("slides", images=3)
+
+    _, dl = _export(client, pid, "slides_pdf")
+    assert dl.headers["content-type"] == "application/pdf"
+    assert dl.content.startswith(b"%PDF")
+    assert b"/Count 3" in dl.content
+
+    _, dl = _export(client, pid, "storyboard_pdf")
+    assert b"/Count 3" in dl.content
+
+    # The streamed PDF parses (xref offsets and page tree are consistent).
+    from PIL import PdfParser
+    pdf = PdfParser.PdfParser(buf=dl.content)
+    assert len(pdf.pages) == 3
+    assert PdfParser.decode_text(pdf.info.Title) == "Export Test"
+
+    _, dl = _export(client, pid, "json_metadata")
+    assert len(json.loads(dl.content)["assets"]) == 3
+
+
+def test_zip_streams_assets_and_flags_missing(client, project):
+    pid = project("youtube_video", images=2)
+    client.post(f"/studio/projects/{pid}/assets", json={
+        "kind": "image", "filename": "gone.png", "mime": "image/png",
+        "sizeBytes": 1, "url": "/files/does-not-exist.png",
+    })
+
+    _, dl = _export(client, pid, "zip_assets")
+    zf = zipfile.ZipFile(io.BytesIO(dl.content))
+    names = zf.namelist()
+    assert sum(n.startswith("assets/") for n in names) == 2
+    manifest = json.loads(zf.read("manifest.json"))
+    assert [a.get("missing", False) for a in manifest["assets"]].count(True) == 1
+    png = next(n for n in names if n.endswith(".png"))
+    assert zf.getinfo(png).compress_type == zipfile.ZIP_STORED
+
+
+def test_repeat_export_hits_cache_until_new_version(client, project, monkeypatch):
+    pid = project("slides", images=1)
+    first, _ = _export(client, pid, "slides_pdf")
+    assert first["cached"] is False
+
+    calls = []
+    real = export_jobs._BUILDERS["slides_pdf"]
+    monkeypatch.setitem(export_jobs._BUILDERS, "slides_pdf", lambda *a: (calls.append(a), real(*a)))
+
+    again, _ = _export(client, pid, "slides_pdf")
+    assert again["cached"] is True and again["status"] == "done"
+    assert again["cache_key"] == first["cache_key"]
+    assert calls == []
+
+    from app.studio.repo import create_version
+    create_version(pid, {"scenes": [1]}, label="edit")
+
+    third, _ = _export(client, pid, "slides_pdf")
+    assert third["cached"] is False and third["cache_key"] != first["cache_key"]
+    assert len(calls) == 1
+    # Superseded artifact is removed from disk
+    artifacts = list(Path(export_jobs._artifacts_dir(pid)).glob("slides_pdf-*"))
+    assert len(artifacts) == 1
+
+
+def test_status_and_download_errors(client, project):
+    pid = project("youtube_video", images=0)
+    assert client.post("/studio/projects/nope/export/jobs", json={"kind": "zip_assets"}).status_code == 404
+    # slides-only kinds are rejected for other project types
+    assert client.post(f"/studio/projects/{pid}/export/jobs", json={"kind": "slides_pdf"}).status_code == 400
+    assert client.get(f"/studio/projects/{pid}/export/jobs/ej_missing").status_code == 404
+
+    job = export_jobs.ExportJob(id="ej_test", project_id=pid, kind="zip_assets", cache_key="k", status="running")
+    export_jobs._jobs[job.id] = job
+    assert client.get(f"/studio/projects/{pid}/export/jobs/ej_test").json()["status"] == "running"
+    assert client.get(f"/studio/projects/{pid}/export/jobs/ej_test/download").status_code == 409
+
+
+def test_pptx_without_library_reports_error(client, project):
+    try:
+        import pptx  # noqa: F401
+        pytest.skip("python-pptx installed")
+    except ImportError:
+        pass
+
+    pid = project("slides", images=1)
+    r = client.post(f"/studio/projects/{pid}/export/jobs", json={"kind": "slides_pptx"})
+    job = export_jobs.wait_for(r.json()["id"])
+    assert job.status == "error"
+    assert "python-pptx" in job.error
+    assert not list(Path(export_jobs._artifacts_dir(pid)).glob("*.part"))
+
+
+def test_slow_older_job_keeps_newer_artifact(client, project):
+    pid = project("slides", images=1)
+    folder = Path(export_jobs._artifacts_dir(pid))
+    older, newer, part = (folder / f"slides_pdf-{n}" for n in ("a.pdf", "b.pdf", "c.pdf.part"))
+    for p in (older, newer, part):
+        p.write_bytes(b"%PDF")
+    export_jobs._artifact_generations.update({str(older): 3, str(newer): 5})
+
+    # The older job finishing last leaves the newer artifact and running jobs alone.
+    export_jobs._drop_stale_artifacts(pid, "slides_pdf", older, 3)
+    assert older.exists() and newer.exists() and part.exists()
+
+    export_jobs._drop_stale_artifacts(pid, "slides_pdf", newer, 5)
+    assert not older.exists() and newer.exists() and part.exists()
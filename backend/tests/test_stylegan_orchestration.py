@@ -24,6 +24,12 @@ import pytest
 # Helpers
 # ---------------------------------------------------------------------------
 
+@pytest.fixture(autouse=True)
+def _placeholder_uploads(tmp_path, monkeypatch):
+    """Keep placeholder faces generated by the fallback out of data/uploads."""
+    monkeypatch.setattr("app.avatar.placeholder._uploads_dir", lambda: tmp_path)
+
+
 def _make_request(mode="studio_random", count=2, seed=42, truncation=0.7):
     from app.avatar.schemas import AvatarGenerateRequest
     return AvatarGenerateRequest(
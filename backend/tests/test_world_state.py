@@ -0,0 +1,272 @@
+"""
+Tests for the multi-session world state.
+
+Covers:
+  1. SpatialGrid nearest/radius queries agree with a brute-force scan
+  2. Index-backed anchor queries, versioning and delta encoding
+  3. Per-session registry with idle and size-based eviction
+  4. The per-turn perception view feeding perceive/embody
+  5. POST /v1/world-state/update and the WS /v1/world-state/stream deltas
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+
+import pytest
+
+
+def _anchors(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"a{i}",
+            "type": ("seat", "desk", "door")[i % 3],
+            "position": {"x": rng.uniform(-50, 50), "y": rng.uniform(0, 3), "z": rng.uniform(-50, 50)},
+        }
+        for i in range(n)
+    ]
+
+
+# ── 1. SpatialGrid ───────────────────────────────────────────────────
+
+
+def test_grid_matches_brute_force():
+    from app.world_state.spatial import SpatialGrid
+
+    rng = random.Random(1)
+    grid = SpatialGrid(cell_size=2.0)
+    points = {}
+    for i in range(2000):
+        p = (rng.uniform(-40, 40), rng.uniform(0, 4), rng.uniform(-40, 40))
+        points[f"p{i}"] = p
+        grid.insert(f"p{i}", p)
+    # Move some and remove some so buckets are exercised.
+    for i in range(0, 2000, 7):
+        p = (rng.uniform(-40, 40), 1.0, rng.uniform(-40, 40))
+        points[f"p{i}"] = p
+        grid.insert(f"p{i}", p)
+    for i in range(0, 2000, 11):
+        assert grid.remove(f"p{i}")
+        del points[f"p{i}"]
+    assert len(grid) == len(points)
+
+    for _ in range(50):
+        q = (rng.uniform(-60, 60), rng.uniform(0, 4), rng.uniform(-60, 60))
+        brute = sorted((math.dist(q, p), k) for k, p in points.items())
+        got = grid.nearest(q, 5)
+        assert [k for _, k in got] == [k for _, k in brute[:5]]
+        radius = rng.uniform(0.5, 8)
+        assert [k for _, k in grid.within(q, radius)] == [k for d, k in brute if d <= radius]
+
+
+def test_grid_edge_cases():
+    from app.world_state.spatial import SpatialGrid
+
+    grid = SpatialGrid()
+    assert grid.nearest((0, 0, 0)) == []
+    grid.insert("far", (1000.0, 0.0, 1000.0))
+    assert grid.nearest((0, 0, 0))[0][1] == "far"
+    assert grid.nearest((0, 0, 0), 1, max_radius=5) == []
+    assert not grid.remove("missing")
+    with pytest.raises(ValueError):
+        SpatialGrid(0)
+
+
+# ── 2. Service queries and deltas ────────────────────────────────────
+
+
+def test_anchor_queries_use_index():
+    from app.world_state.service import Vector3, WorldStateService
+
+    svc = WorldStateService()
+    anchors = _anchors(3000)
+    svc.set_anchors(anchors)
+    to = Vector3(3, 0, -4)
+
+    seats = [a for a in anchors if a["type"] == "seat"]
+    expected = min(seats, key=lambda a: math.dist((3, 0, -4), (a["position"]["x"], a["position"]["y"], a["position"]["z"])))
+    assert svc.find_nearest_anchor("seat", to).id == expected["id"]
+    assert svc.find_nearest_anchor("window", to) is None
+
+    near = svc.nearest_anchors(to, k=4)
+    assert len(near) == 4 and [d for _, d in near] == sorted(d for _, d in near)
+    assert all(a.type == "desk" for a, _ in svc.nearest_anchors(to, k=3, anchor_type="desk"))
+    within = svc.anchors_within(to, 6.0)
+    assert all(d <= 6.0 for _, d in within)
+    assert svc.anchor_counts() == {"seat": 1000, "desk": 1000, "door": 1000}
+
+
+def test_versioned_deltas():
+    from app.world_state.service import WorldStateService
+
+    svc = WorldStateService()
+    svc.set_anchors(_anchors(10))
+    svc.update_avatar("scarlett", {"position": {"x": 1, "y": 0, "z": 1}})
+    v1 = svc.version
+
+    # Re-sending the same anchors is not a change.
+    svc.set_anchors(_anchors(10))
+    assert svc.version == v1
+    assert svc.delta_since(v1) == {
+        "full": False, "epoch": svc.epoch, "since": v1, "version": v1,
+        "avatars": {}, "anchors": [], "removed_anchors": [],
+    }
+
+    svc.update_user({"position": {"x": 2, "y": 0, "z": 0}})
+    moved = _anchors(10)[:9]
+    moved[0]["position"] = {"x": 9, "y": 0, "z": 9}
+    svc.set_anchors(moved)
+
+    delta = svc.delta_since(v1)
+    assert delta["full"] is False and delta["version"] == svc.version
+    assert delta["user"]["position"]["x"] == 2
+    assert delta["avatars"] == {}
+    assert [a["id"] for a in delta["anchors"]] == ["a0"]
+    assert delta["removed_anchors"] == ["a9"]
+    assert svc.find_nearest_anchor("seat", type(svc.get_user().position)(9, 0, 9)).id == "a0"
+
+    assert svc.delta_since(0)["full"] is True
+    assert svc.delta_since(svc.version + 100)["full"] is True
+    # Same version number, different incarnation of the session.
+    assert svc.delta_since(v1, svc.epoch)["full"] is False
+    assert svc.delta_since(v1, WorldStateService().epoch)["full"] is True
+
+
+def test_old_clients_get_full_snapshot_after_tombstone_prune(monkeypatch):
+    from app.world_state import service
+
+    monkeypatch.setattr(service, "MAX_TOMBSTONES", 4)
+    svc = service.WorldStateService()
+    svc.set_anchors(_anchors(20))
+    start = svc.version
+    for n in range(19, 9, -1):
+        svc.set_anchors(_anchors(n))
+    assert svc.delta_since(start)["full"] is True
+    recent = svc.version - 1
+    assert svc.delta_since(recent)["removed_anchors"] == ["a10"]
+
+
+# ── 3. Registry ──────────────────────────────────────────────────────
+
+
+def test_registry_isolates_and_evicts_sessions():
+    from app.world_state.registry import WorldStateRegistry
+
+    reg = WorldStateRegistry(session_ttl_s=10, max_sessions=3)
+    a = reg.get_or_create("a")
+    assert reg.get_or_create("a") is a and reg.get("b") is None
+    a.update_user({"position": {"x": 1, "y": 0, "z": 0}})
+    assert reg.get_or_create("b").get_user().position.x == 0.0
+
+    reg.get_or_create("c")
+    a.touched_at += 1  # most recently used
+    reg.get_or_create("d")  # over max: evicts the least recently touched
+    assert len(reg) == 3 and reg.get("a") is a
+
+    a.touched_at += 20
+    assert reg.evict_idle(now=a.touched_at + 5) == 2
+    assert reg.session_ids() == ["a"]
+    assert reg.drop("a") and not reg.drop("a")
+
+
+# ── 4. Perception view → perceive / embody ───────────────────────────
+
+
+def test_perception_view_is_compact_and_drives_nodes():
+    from app.langgraph_personas.nodes.embody import embody
+    from app.langgraph_personas.nodes.perceive import perceive
+    from app.world_state.service import PERCEPTION_ANCHORS, WorldStateService
+
+    svc = WorldStateService("vr-1")
+    svc.set_anchors(_anchors(2000) + [{"id": "close-seat", "type": "seat", "position": {"x": 1.2, "y": 0, "z": 0.4}}])
+    svc.update_user({"position": {"x": 0, "y": 0, "z": 0}, "velocity_mps": 0.8, "left_hand": {"x": 0, "y": 1, "z": 0}})
+    svc.update_avatar("scarlett", {"position": {"x": 1, "y": 0, "z": 0}, "state": "speaking"})
+
+    view = svc.perception_view("scarlett")
+    assert len(view["anchors"]) == PERCEPTION_ANCHORS
+    assert view["anchor_counts"]["seat"] == 668
+    assert view["nearest_seat"]["id"] == "close-seat"
+    assert view["avatar_distance_m"] == pytest.approx(1.0)
+
+    summary = asyncio.run(perceive({"world_snapshot": view}))["perception_summary"]
+    assert "668 seat(s)" in summary and "speaking" in summary and "moving" in summary and "left" in summary
+
+    result = asyncio.run(embody({"user_message": "please sit down", "persona_id": "scarlett", "world_snapshot": view}))
+    sit = [c for c in result["motion_plan"]["commands"] if c["type"] == "sit"]
+    assert sit and sit[0]["position"] == [1.2, 0, 0.4]
+
+
+# ── 5. HTTP + WebSocket ──────────────────────────────────────────────
+
+
+@pytest.fixture
+def registry(client):
+    from app.world_state import registry
+
+    registry.reset_registry()
+    yield registry
+    registry.reset_registry()
+
+
+def test_update_routes_are_per_session(client, registry):
+    r = client.post("/v1/world-state/update", json={"session_id": "s1", "user": {"position": {"x": 1, "y": 0, "z": 0}}})
+    assert r.status_code == 200 and r.json()["version"] == 1
+    r = client.post("/world-state/update", json={"session_id": "s2", "anchors": _anchors(3)})
+    assert r.json()["version"] == 1
+    reg = registry.get_registry()
+    assert reg.get("s1").get_user().position.x == 1.0
+    assert reg.get("s2").get_user().position.x == 0.0
+    assert len(reg.get("s2").get_anchors()) == 3
+
+
+def test_stream_pushes_full_then_deltas(client, registry):
+    client.post("/v1/world-state/update", json={"session_id": "live", "anchors": _anchors(50)})
+    with client.websocket_connect("/v1/world-state/stream?session_id=live") as ws:
+        first = ws.receive_json()
+        assert first["type"] == "delta" and first["full"] is True and len(first["anchors"]) == 50
+
+        ws.send_json({"type": "update", "user": {"position": {"x": 4, "y": 0, "z": 0}}})
+        second = ws.receive_json()
+        assert second["full"] is False and second["since"] == first["version"]
+        assert second["user"]["position"]["x"] == 4
+        assert second["anchors"] == [] and second["avatars"] == {}
+
+        ws.send_json({"type": "resync"})
+        assert ws.receive_json()["full"] is True
+
+    with client.websocket_connect(f"/v1/world-state/stream?session_id=live&since={second['version']}&epoch={second['epoch']}") as ws:
+        caught_up = ws.receive_json()
+        assert caught_up["full"] is False and caught_up["version"] == second["version"]
+        client.post("/v1/world-state/update", json={"session_id": "live", "avatars": {"ava": {"state": "idle"}}})
+        resumed = ws.receive_json()
+        assert resumed["full"] is False and list(resumed["avatars"]) == ["ava"]
+
+    # A reconnect against another incarnation of the session starts over.
+    with client.websocket_connect(f"/v1/world-state/stream?session_id=live&since={second['version']}&epoch=gone") as ws:
+        assert ws.receive_json()["full"] is True
+
+
+def test_stream_follows_a_recreated_session(client, registry):
+    client.post("/v1/world-state/update", json={"session_id": "live", "anchors": _anchors(5)})
+    with client.websocket_connect("/v1/world-state/stream?session_id=live") as ws:
+        first = ws.receive_json()
+        reg = registry.get_registry()
+        old = reg.get("live")
+
+        # Subscribers keep the session alive between updates ...
+        old.touched_at = 0.0
+        deadline = time.time() + 5
+        while old.touched_at == 0.0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert reg.evict_idle() == 0 and reg.get("live") is old
+
+        # ... and if it is dropped anyway, updates and deltas move to the new one.
+        reg.drop("live")
+        client.post("/v1/world-state/update", json={"session_id": "live", "avatars": {"ava": {"state": "idle"}}})
+        fresh = ws.receive_json()
+        assert fresh["full"] is True and fresh["epoch"] != first["epoch"]
+        assert list(fresh["avatars"]) == ["ava"] and fresh["anchors"] == []
+        assert reg.get("live") is not old
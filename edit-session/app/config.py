@@ -83,6 +83,25 @@ class Settings(BaseSettings):
         description="Maximum upload file size in megabytes"
     )
 
+    MAX_CONCURRENT_UPLOADS: int = Field(
+        default=4,
+        description="Uploads forwarded to HomePilot at once; extra requests wait for a slot"
+    )
+    UPLOAD_SPOOL_MB: int = Field(
+        default=2,
+        description="Re-encoded uploads larger than this spill from memory to a temp file"
+    )
+
+    # Shared HomePilot connection pool
+    HOME_PILOT_MAX_CONNECTIONS: int = Field(
+        default=20,
+        description="Maximum open connections to the HomePilot backend"
+    )
+    HOME_PILOT_MAX_KEEPALIVE: int = Field(
+        default=10,
+        description="Idle keep-alive connections retained in the pool"
+    )
+
     # SSRF protection: if empty, /select only allows HomePilot-hosted URLs
     ALLOWED_EXTERNAL_IMAGE_HOSTS: str = Field(
         default="",
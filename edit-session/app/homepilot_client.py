@@ -3,17 +3,98 @@ HomePilot API client module.
 
 Provides async HTTP client for communicating with the HomePilot backend service.
 Handles upload and chat endpoints with proper error handling.
+
+All requests share one pooled ``httpx.AsyncClient`` opened in the app
+lifespan, so keep-alive connections to HomePilot are reused instead of
+paying a TCP (and possibly TLS) handshake per proxied call. Upload bodies
+are passed as file objects and streamed into the multipart request in
+64 KB chunks; an upload semaphore caps how many are in flight at once so a
+burst of large images queues instead of piling up sockets and temp files.
 """
 
 from __future__ import annotations
 
+import asyncio
 import httpx
-from typing import Any, Dict
+from typing import Any, BinaryIO, Dict, Optional, Union
 from fastapi import HTTPException
 
 from .config import settings
 
 
+# Per-call timeouts (the pool itself has no default)
+UPLOAD_TIMEOUT = 60
+CHAT_TIMEOUT = 180  # image generation can take minutes
+HEALTH_TIMEOUT = 5
+
+_pool: Optional[httpx.AsyncClient] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+_upload_slots: Optional[asyncio.Semaphore] = None
+_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _new_pool() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.HOME_PILOT_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HOME_PILOT_MAX_KEEPALIVE,
+    )
+    return httpx.AsyncClient(limits=limits, timeout=UPLOAD_TIMEOUT)
+
+
+def _slots_for(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    """
+    Upload semaphore for *loop*.
+
+    It outlives pool reopen/close on the same loop: uploads still holding
+    or waiting for a slot keep using the same semaphore, so the cap holds
+    and nothing ends up acquiring ``None``.
+    """
+    global _upload_slots, _slots_loop
+    if _upload_slots is None or _slots_loop is not loop:
+        _upload_slots = asyncio.Semaphore(max(1, settings.MAX_CONCURRENT_UPLOADS))
+        _slots_loop = loop
+    return _upload_slots
+
+
+async def open_pool() -> httpx.AsyncClient:
+    """Create the shared client for the running event loop (lifespan startup)."""
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    # A pool left over from another (finished) loop cannot be closed from
+    # here; its sockets are dropped with it.
+    if _pool is not None and not _pool.is_closed and _pool_loop is loop:
+        await _pool.aclose()
+    _pool = _new_pool()
+    _pool_loop = loop
+    _slots_for(loop)
+    return _pool
+
+
+async def close_pool() -> None:
+    """Close the shared client (lifespan shutdown); the upload slots are kept."""
+    global _pool, _pool_loop
+    if _pool is not None:
+        await _pool.aclose()
+    _pool = _pool_loop = None
+
+
+async def get_pool() -> httpx.AsyncClient:
+    """
+    Return the shared client, opening one lazily if needed.
+
+    Pooled connections belong to the loop that created them, so a client
+    from a different loop (e.g. TestClient used without its context
+    manager) is replaced rather than reused.
+    """
+    if (
+        _pool is None
+        or _pool.is_closed
+        or _pool_loop is not asyncio.get_running_loop()
+    ):
+        return await open_pool()
+    return _pool
+
+
 class HomePilotClient:
     """
     Async HTTP client for HomePilot backend API.
@@ -44,7 +125,7 @@ class HomePilotClient:
         self,
         filename: str,
         content_type: str,
-        data: bytes
+        data: Union[bytes, BinaryIO]
     ) -> str:
         """
         Upload an image to HomePilot and return the URL.
@@ -52,7 +133,8 @@ class HomePilotClient:
         Args:
             filename: Original filename
             content_type: MIME type (e.g., image/png)
-            data: Raw image bytes
+            data: Raw image bytes, or a seekable binary file object that
+                is streamed to HomePilot without being read into memory
 
         Returns:
             URL of the uploaded image
@@ -63,12 +145,14 @@ class HomePilotClient:
         url = f"{self.base}/upload"
         files = {"file": (filename, data, content_type)}
 
-        async with httpx.AsyncClient(timeout=60) as client:
+        client = await get_pool()
+        async with _slots_for(asyncio.get_running_loop()):
             try:
                 resp = await client.post(
                     url,
                     files=files,
-                    headers=self._headers()
+                    headers=self._headers(),
+                    timeout=UPLOAD_TIMEOUT,
                 )
             except httpx.RequestError as e:
                 raise HTTPException(
@@ -124,19 +208,19 @@ class HomePilotClient:
         """
         url = f"{self.base}/chat"
 
-        # Use longer timeout for image generation (can take minutes)
-        async with httpx.AsyncClient(timeout=180) as client:
-            try:
-                resp = await client.post(
-                    url,
-                    json=payload,
-                    headers=self._headers()
-                )
-            except httpx.RequestError as e:
-                raise HTTPException(
-                    status_code=502,
-                    detail=f"HomePilot chat error: {e}"
-                ) from e
+        client = await get_pool()
+        try:
+            resp = await client.post(
+                url,
+                json=payload,
+                headers=self._headers(),
+                timeout=CHAT_TIMEOUT,
+            )
+        except httpx.RequestError as e:
+            raise HTTPException(
+                status_code=502,
+                detail=f"HomePilot chat error: {e}"
+            ) from e
 
         if resp.status_code >= 400:
             raise HTTPException(
@@ -161,9 +245,11 @@ class HomePilotClient:
         """
         url = f"{self.base}/health"
 
-        async with httpx.AsyncClient(timeout=5) as client:
-            try:
-                resp = await client.get(url, headers=self._headers())
-                return resp.status_code < 400
-            except Exception:
-                return False
+        try:
+            client = await get_pool()
+            resp = await client.get(
+                url, headers=self._headers(), timeout=HEALTH_TIMEOUT
+            )
+            return resp.status_code < 400
+        except Exception:
+            return False
@@ -33,8 +33,8 @@ from fastapi.responses import JSONResponse
 from .config import settings
 from .security import enforce_security, validate_select_url
 from .store import get_store, VersionEntry
-from .homepilot_client import HomePilotClient
-from .utils_images import read_and_validate_upload, strip_exif
+from .homepilot_client import HomePilotClient, open_pool, close_pool
+from .utils_images import validate_upload_stream, strip_exif_stream
 from .models import (
     EditMessageRequest,
     SelectImageRequest,
@@ -61,10 +61,12 @@ async def lifespan(_: FastAPI):
     )
     logger.info("Store backend: %s", settings.STORE)
     logger.info("HomePilot URL: %s", settings.HOME_PILOT_BASE_URL)
+    await open_pool()
     try:
         yield
     finally:
         logger.info("Shutting down edit-session service")
+        await close_pool()
 
 
 # Application metadata
@@ -211,20 +213,23 @@ async def proxy_upload(
     If conversation_id is provided, also sets the uploaded image
     as the active image for that edit session.
     """
-    # Validate and read the upload
-    raw = await read_and_validate_upload(file)
+    # Validate in place (the upload stays in Starlette's spooled temp file)
+    body = await validate_upload_stream(file)
 
     # Optionally strip EXIF metadata
     if strip_metadata:
-        raw = strip_exif(raw)
+        body = strip_exif_stream(body)
 
-    # Forward to HomePilot
+    # Forward to HomePilot, streaming the body from the file
     hp = HomePilotClient()
-    url = await hp.upload(
-        file.filename or "upload.png",
-        file.content_type or "image/png",
-        raw
-    )
+    try:
+        url = await hp.upload(
+            file.filename or "upload.png",
+            file.content_type or "image/png",
+            body
+        )
+    finally:
+        body.close()
 
     # Set as active image if conversation_id provided
     if conversation_id:
@@ -314,19 +319,22 @@ async def set_active_image(
 
     Returns the session state and edit results if instruction provided.
     """
-    # Validate and read the upload
-    raw = await read_and_validate_upload(file)
+    # Validate in place (the upload stays in Starlette's spooled temp file)
+    body = await validate_upload_stream(file)
 
     if strip_metadata:
-        raw = strip_exif(raw)
+        body = strip_exif_stream(body)
 
     # Upload to HomePilot
     hp = HomePilotClient()
-    url = await hp.upload(
-        file.filename or "upload.png",
-        file.content_type or "image/png",
-        raw
-    )
+    try:
+        url = await hp.upload(
+            file.filename or "upload.png",
+            file.content_type or "image/png",
+            body
+        )
+    finally:
+        body.close()
 
     # Set as active in store (this is the original upload, no instruction yet)
     store = get_store()
@@ -6,14 +6,21 @@ Provides persistent storage for edit session state including:
 - Image history with version metadata for undo/branch operations
 - TTL-based automatic expiration
 - Version tracking with prompts, timestamps, and settings
+
+Versions are stored one row / one sorted-set member each, so edits cost the
+same at version 1000 as at version 1; reads go through a revision-checked
+in-process cache.
 """
 
 import json
 import sqlite3
+import threading
 import time
 import os
-from dataclasses import dataclass, field, asdict
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict, replace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from .config import settings
 
@@ -204,14 +211,69 @@ class BaseStore:
         raise NotImplementedError
 
 
+class _RecordCache:
+    """
+    Small in-process LRU of SessionRecords, each tagged with the session's
+    revision. A cached record is only served when the backend still reports
+    the same revision, so several processes can share one database.
+    """
+
+    def __init__(self, size: int = 512):
+        self.size = size
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[int, SessionRecord]]" = OrderedDict()
+
+    def get(self, conversation_id: str, rev: int) -> Optional[SessionRecord]:
+        with self._lock:
+            entry = self._data.get(conversation_id)
+            if entry is None or entry[0] != rev:
+                return None
+            self._data.move_to_end(conversation_id)
+            return _copy_record(entry[1])
+
+    def put(self, conversation_id: str, rev: int, rec: SessionRecord) -> None:
+        with self._lock:
+            self._data[conversation_id] = (rev, _copy_record(rec))
+            self._data.move_to_end(conversation_id)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def drop(self, *conversation_ids: str) -> None:
+        with self._lock:
+            for cid in conversation_ids:
+                self._data.pop(cid, None)
+
+
+def _copy_record(rec: SessionRecord) -> SessionRecord:
+    """Copy with its own versions list, so callers can't mutate the cache."""
+    return replace(rec, versions=list(rec.versions))
+
+
+def _with_version(versions: List[VersionEntry], entry: VersionEntry) -> List[VersionEntry]:
+    """Most-recent-first list with *entry* on top, de-duplicated by URL."""
+    out = [entry] + [v for v in versions if v.url != entry.url]
+    return out[: settings.HISTORY_LIMIT]
+
+
 class SQLiteStore(BaseStore):
     """
     SQLite-based session storage.
 
     Suitable for single-instance deployments or development.
     Data is persisted to disk and survives restarts.
+
+    Each version is its own row in ``edit_session_versions`` (ordered by a
+    per-session sequence number), so adding, activating or removing a
+    version touches only that row plus the session row, never the whole
+    history. ``get`` is answered from an in-process cache while the
+    session's ``rev`` column (bumped by every write) is unchanged.
+    Expired sessions read as empty and are deleted in batches by
+    ``cleanup_expired``, which also runs periodically from writes.
     """
 
+    CLEANUP_INTERVAL_SECONDS = 300.0
+    CLEANUP_BATCH = 500
+
     def __init__(self, path: str):
         """
         Initialize SQLite store.
@@ -220,6 +282,9 @@ class SQLiteStore(BaseStore):
             path: Path to SQLite database file
         """
         self.path = path
+        self._local = threading.local()
+        self._cache = _RecordCache()
+        self._last_cleanup = time.time()
         self._ensure_directory()
         self._init_db()
 
@@ -230,13 +295,37 @@ class SQLiteStore(BaseStore):
             os.makedirs(dir_path, exist_ok=True)
 
     def _conn(self) -> sqlite3.Connection:
-        """Create a new database connection."""
-        return sqlite3.connect(self.path, check_same_thread=False)
-
-    def _init_db(self) -> None:
-        """Create schema if not exists."""
+        """Per-thread connection (autocommit; writes use explicit transactions)."""
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; takes the write lock up front."""
         con = self._conn()
+        con.execute("BEGIN IMMEDIATE")
         try:
+            yield con
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+    def _init_db(self) -> None:
+        """Create schema if not exists and migrate legacy JSON histories."""
+        with self._tx() as con:
             con.execute(
                 """
                 CREATE TABLE IF NOT EXISTS edit_sessions (
@@ -248,6 +337,12 @@ class SQLiteStore(BaseStore):
                 )
                 """
             )
+            columns = {row[1] for row in con.execute("PRAGMA table_info(edit_sessions)")}
+            for name in ("rev", "next_seq", "version_count"):
+                if name not in columns:
+                    con.execute(
+                        f"ALTER TABLE edit_sessions ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0"
+                    )
             # Index for TTL cleanup queries
             con.execute(
                 """
@@ -255,24 +350,58 @@ class SQLiteStore(BaseStore):
                 ON edit_sessions(updated_at)
                 """
             )
-            con.commit()
-        finally:
-            con.close()
-
-    def _prune_if_needed(self, rec: SessionRecord) -> SessionRecord:
-        """
-        Check TTL and clear session if expired.
-
-        Args:
-            rec: Session record to check
-
-        Returns:
-            Original record if valid, empty record if expired
-        """
-        if (time.time() - rec.updated_at) > settings.TTL_SECONDS:
-            self.clear(rec.conversation_id)
-            return SessionRecord(rec.conversation_id, None, [], time.time())
-        return rec
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS edit_session_versions (
+                    conversation_id TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    instruction TEXT NOT NULL DEFAULT '',
+                    created_at REAL NOT NULL,
+                    parent_url TEXT,
+                    settings_json TEXT NOT NULL DEFAULT '{}',
+                    PRIMARY KEY (conversation_id, url)
+                )
+                """
+            )
+            con.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_edit_session_versions_seq
+                ON edit_session_versions(conversation_id, seq)
+                """
+            )
+            self._migrate_history_json(con)
+
+    def _migrate_history_json(self, con: sqlite3.Connection) -> None:
+        """Move histories stored as one JSON blob into version rows."""
+        rows = con.execute(
+            "SELECT conversation_id, history_json FROM edit_sessions "
+            "WHERE history_json NOT IN ('', '[]')"
+        ).fetchall()
+        for conversation_id, history_json in rows:
+            versions = self._parse_history_json(history_json)[: settings.HISTORY_LIMIT]
+            n = len(versions)
+            con.executemany(
+                """
+                INSERT OR IGNORE INTO edit_session_versions
+                    (conversation_id, url, seq, instruction, created_at, parent_url, settings_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (conversation_id, v.url, n - i, v.instruction, v.created_at,
+                     v.parent_url, json.dumps(v.settings))
+                    for i, v in enumerate(versions)
+                ],
+            )
+            count = con.execute(
+                "SELECT COUNT(*) FROM edit_session_versions WHERE conversation_id=?",
+                (conversation_id,),
+            ).fetchone()[0]
+            con.execute(
+                "UPDATE edit_sessions SET history_json='[]', next_seq=?, version_count=?, "
+                "rev=rev+1 WHERE conversation_id=?",
+                (n, count, conversation_id),
+            )
 
     def _parse_history_json(self, history_json: str) -> List[VersionEntry]:
         """
@@ -302,60 +431,144 @@ class SQLiteStore(BaseStore):
 
         return versions
 
+    @staticmethod
+    def _expired(updated_at: float) -> bool:
+        return (time.time() - updated_at) > settings.TTL_SECONDS
+
+    def _read(self, con: sqlite3.Connection, conversation_id: str) -> Tuple[int, SessionRecord]:
+        """Load the full record (and its rev) from the database."""
+        row = con.execute(
+            "SELECT active_image_url, original_image_url, updated_at, rev "
+            "FROM edit_sessions WHERE conversation_id=?",
+            (conversation_id,),
+        ).fetchone()
+        if not row:
+            return -1, SessionRecord(conversation_id, None, [], time.time())
+
+        active, original, updated_at, rev = row
+        versions = [
+            VersionEntry(
+                url=url,
+                instruction=instruction,
+                created_at=created_at,
+                parent_url=parent_url,
+                settings=json.loads(settings_json) if settings_json else {},
+            )
+            for url, instruction, created_at, parent_url, settings_json in con.execute(
+                "SELECT url, instruction, created_at, parent_url, settings_json "
+                "FROM edit_session_versions WHERE conversation_id=? "
+                "ORDER BY seq DESC LIMIT ?",
+                (conversation_id, settings.HISTORY_LIMIT),
+            )
+        ]
+        return rev, SessionRecord(
+            conversation_id=conversation_id,
+            active_image_url=active,
+            versions=versions,
+            updated_at=float(updated_at),
+            original_image_url=original,
+        )
+
     def get(self, conversation_id: str) -> SessionRecord:
         """Retrieve session state."""
         con = self._conn()
-        try:
-            row = con.execute(
-                "SELECT active_image_url, original_image_url, history_json, updated_at "
-                "FROM edit_sessions WHERE conversation_id=?",
-                (conversation_id,),
-            ).fetchone()
+        row = con.execute(
+            "SELECT rev, updated_at FROM edit_sessions WHERE conversation_id=?",
+            (conversation_id,),
+        ).fetchone()
+        if not row or self._expired(float(row[1])):
+            return SessionRecord(conversation_id, None, [], time.time())
 
-            if not row:
-                return SessionRecord(conversation_id, None, [], time.time())
+        cached = self._cache.get(conversation_id, row[0])
+        if cached is not None:
+            return cached
 
-            active, original, history_json, updated_at = row
-            versions = self._parse_history_json(history_json)
-            rec = SessionRecord(
-                conversation_id=conversation_id,
-                active_image_url=active,
-                versions=versions,
-                updated_at=float(updated_at),
-                original_image_url=original,
-            )
-            return self._prune_if_needed(rec)
+        con.execute("BEGIN")
+        try:
+            rev, rec = self._read(con, conversation_id)
         finally:
-            con.close()
+            con.execute("COMMIT")
+        self._cache.put(conversation_id, rev, rec)
+        return rec
 
-    def _save(self, rec: SessionRecord) -> None:
-        """Persist session record to database."""
-        con = self._conn()
-        try:
-            # Serialize versions as list of dicts
-            versions_data = [v.to_dict() for v in rec.versions[: settings.HISTORY_LIMIT]]
+    def _open_session(self, con: sqlite3.Connection, conversation_id: str) -> Tuple[Any, ...]:
+        """
+        Session row for a write, starting fresh if missing or expired.
+
+        Returns (active_image_url, original_image_url, rev, next_seq, version_count).
+        """
+        row = con.execute(
+            "SELECT active_image_url, original_image_url, updated_at, rev, next_seq, version_count "
+            "FROM edit_sessions WHERE conversation_id=?",
+            (conversation_id,),
+        ).fetchone()
+        if row and self._expired(float(row[2])):
+            self._delete(con, [conversation_id])
+            row = None
+        if not row:
+            # Random start revision so a recreated session never matches a
+            # stale cache entry from its previous life.
+            rev = int.from_bytes(os.urandom(6), "big")
             con.execute(
-                """
-                INSERT INTO edit_sessions
-                    (conversation_id, active_image_url, original_image_url, history_json, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT(conversation_id) DO UPDATE SET
-                    active_image_url=excluded.active_image_url,
-                    original_image_url=excluded.original_image_url,
-                    history_json=excluded.history_json,
-                    updated_at=excluded.updated_at
-                """,
-                (
-                    rec.conversation_id,
-                    rec.active_image_url,
-                    rec.original_image_url,
-                    json.dumps(versions_data),
-                    rec.updated_at,
-                ),
+                "INSERT INTO edit_sessions (conversation_id, active_image_url, original_image_url, "
+                "history_json, updated_at, rev, next_seq, version_count) "
+                "VALUES (?, NULL, NULL, '[]', ?, ?, 0, 0)",
+                (conversation_id, time.time(), rev),
             )
-            con.commit()
-        finally:
-            con.close()
+            return None, None, rev, 0, 0
+        return row[0], row[1], row[3], row[4], row[5]
+
+    def _upsert_version(
+        self, con: sqlite3.Connection, conversation_id: str, entry: VersionEntry,
+        seq: int, count: int,
+    ) -> int:
+        """Insert or move-to-front one version; trims the oldest beyond
+        HISTORY_LIMIT. Returns the new version count."""
+        exists = con.execute(
+            "SELECT 1 FROM edit_session_versions WHERE conversation_id=? AND url=?",
+            (conversation_id, entry.url),
+        ).fetchone()
+        con.execute(
+            """
+            INSERT INTO edit_session_versions
+                (conversation_id, url, seq, instruction, created_at, parent_url, settings_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(conversation_id, url) DO UPDATE SET
+                seq=excluded.seq,
+                instruction=excluded.instruction,
+                created_at=excluded.created_at,
+                parent_url=excluded.parent_url,
+                settings_json=excluded.settings_json
+            """,
+            (conversation_id, entry.url, seq, entry.instruction, entry.created_at,
+             entry.parent_url, json.dumps(entry.settings)),
+        )
+        if not exists:
+            count += 1
+        excess = count - settings.HISTORY_LIMIT
+        if excess > 0:
+            con.execute(
+                "DELETE FROM edit_session_versions WHERE conversation_id=? AND seq IN ("
+                "SELECT seq FROM edit_session_versions WHERE conversation_id=? "
+                "ORDER BY seq ASC LIMIT ?)",
+                (conversation_id, conversation_id, excess),
+            )
+            count -= excess
+        return count
+
+    def _finish_write(
+        self, con: sqlite3.Connection, conversation_id: str, old_rev: int, new_rev: int,
+        apply: Callable[[SessionRecord], SessionRecord],
+    ) -> SessionRecord:
+        """Produce the post-write record: patch the cached copy when it was
+        current, otherwise read it back inside the same transaction."""
+        base = self._cache.get(conversation_id, old_rev)
+        if base is not None:
+            rec = apply(base)
+        else:
+            _, rec = self._read(con, conversation_id)
+        self._cache.put(conversation_id, new_rev, rec)
+        return rec
 
     def set_active(
         self,
@@ -365,32 +578,30 @@ class SQLiteStore(BaseStore):
         settings_dict: Optional[Dict[str, Any]] = None,
     ) -> SessionRecord:
         """Set active image and add to version history."""
-        rec = self.get(conversation_id)
-
-        # Create new version entry
-        new_version = VersionEntry(
-            url=image_url,
-            instruction=instruction,
-            created_at=time.time(),
-            parent_url=rec.active_image_url,
-            settings=settings_dict or {},
-        )
-
-        # Add to versions, removing duplicates by URL and keeping most recent first
-        versions = [new_version] + [v for v in rec.versions if v.url != image_url]
-        versions = versions[: settings.HISTORY_LIMIT]
-
-        # Set original_image_url if this is the first image
-        original = rec.original_image_url or image_url
-
-        rec = SessionRecord(
-            conversation_id=conversation_id,
-            active_image_url=image_url,
-            versions=versions,
-            updated_at=time.time(),
-            original_image_url=original,
-        )
-        self._save(rec)
+        with self._tx() as con:
+            active, original, rev, seq, count = self._open_session(con, conversation_id)
+            now = time.time()
+            new_version = VersionEntry(
+                url=image_url,
+                instruction=instruction,
+                created_at=now,
+                parent_url=active,
+                settings=settings_dict or {},
+            )
+            count = self._upsert_version(con, conversation_id, new_version, seq + 1, count)
+            # Set original_image_url if this is the first image
+            original = original or image_url
+            con.execute(
+                "UPDATE edit_sessions SET active_image_url=?, original_image_url=?, updated_at=?, "
+                "rev=?, next_seq=?, version_count=? WHERE conversation_id=?",
+                (image_url, original, now, rev + 1, seq + 1, count, conversation_id),
+            )
+            rec = self._finish_write(
+                con, conversation_id, rev, rev + 1,
+                lambda r: SessionRecord(conversation_id, image_url,
+                                        _with_version(r.versions, new_version), now, original),
+            )
+        self._maybe_cleanup()
         return rec
 
     def push_version(
@@ -402,85 +613,125 @@ class SQLiteStore(BaseStore):
         settings_dict: Optional[Dict[str, Any]] = None,
     ) -> SessionRecord:
         """Add version to history without changing active image."""
-        rec = self.get(conversation_id)
-
-        # Create new version entry
-        new_version = VersionEntry(
-            url=image_url,
-            instruction=instruction,
-            created_at=time.time(),
-            parent_url=parent_url or rec.active_image_url,
-            settings=settings_dict or {},
-        )
-
-        # Add to versions, removing duplicates
-        versions = [new_version] + [v for v in rec.versions if v.url != image_url]
-        versions = versions[: settings.HISTORY_LIMIT]
-
-        rec = SessionRecord(
-            conversation_id=conversation_id,
-            active_image_url=rec.active_image_url,
-            versions=versions,
-            updated_at=time.time(),
-            original_image_url=rec.original_image_url,
-        )
-        self._save(rec)
+        with self._tx() as con:
+            active, original, rev, seq, count = self._open_session(con, conversation_id)
+            now = time.time()
+            new_version = VersionEntry(
+                url=image_url,
+                instruction=instruction,
+                created_at=now,
+                parent_url=parent_url or active,
+                settings=settings_dict or {},
+            )
+            count = self._upsert_version(con, conversation_id, new_version, seq + 1, count)
+            con.execute(
+                "UPDATE edit_sessions SET updated_at=?, rev=?, next_seq=?, version_count=? "
+                "WHERE conversation_id=?",
+                (now, rev + 1, seq + 1, count, conversation_id),
+            )
+            rec = self._finish_write(
+                con, conversation_id, rev, rev + 1,
+                lambda r: SessionRecord(conversation_id, active,
+                                        _with_version(r.versions, new_version), now, original),
+            )
+        self._maybe_cleanup()
         return rec
 
     def remove_version(self, conversation_id: str, image_url: str) -> SessionRecord:
         """Remove a single version and update active if needed."""
-        rec = self.get(conversation_id)
-        filtered = [v for v in rec.versions if v.url != image_url]
-
-        # If nothing was removed, return as-is
-        if len(filtered) == len(rec.versions):
-            return rec
-
-        # If the active image was the one removed, pick the next best
-        new_active = rec.active_image_url
-        if rec.active_image_url == image_url:
-            new_active = filtered[0].url if filtered else None
+        with self._tx() as con:
+            row = con.execute(
+                "SELECT active_image_url, original_image_url, updated_at, rev, version_count "
+                "FROM edit_sessions WHERE conversation_id=?",
+                (conversation_id,),
+            ).fetchone()
+            if not row or self._expired(float(row[2])):
+                return SessionRecord(conversation_id, None, [], time.time())
+            active, original, _, rev, count = row
+
+            deleted = con.execute(
+                "DELETE FROM edit_session_versions WHERE conversation_id=? AND url=?",
+                (conversation_id, image_url),
+            ).rowcount
+            # If nothing was removed, return as-is
+            if not deleted:
+                cached = self._cache.get(conversation_id, rev)
+                return cached if cached is not None else self._read(con, conversation_id)[1]
+
+            # If the active image was the one removed, pick the next best
+            new_active = active
+            if active == image_url:
+                top = con.execute(
+                    "SELECT url FROM edit_session_versions WHERE conversation_id=? "
+                    "ORDER BY seq DESC LIMIT 1",
+                    (conversation_id,),
+                ).fetchone()
+                new_active = top[0] if top else None
+
+            now = time.time()
+            con.execute(
+                "UPDATE edit_sessions SET active_image_url=?, updated_at=?, rev=?, version_count=? "
+                "WHERE conversation_id=?",
+                (new_active, now, rev + 1, max(0, count - 1), conversation_id),
+            )
+            return self._finish_write(
+                con, conversation_id, rev, rev + 1,
+                lambda r: SessionRecord(conversation_id, new_active,
+                                        [v for v in r.versions if v.url != image_url],
+                                        now, original),
+            )
 
-        rec = SessionRecord(
-            conversation_id=conversation_id,
-            active_image_url=new_active,
-            versions=filtered,
-            updated_at=time.time(),
-            original_image_url=rec.original_image_url,
+    def _delete(self, con: sqlite3.Connection, conversation_ids: List[str]) -> None:
+        marks = ",".join("?" * len(conversation_ids))
+        con.execute(
+            f"DELETE FROM edit_session_versions WHERE conversation_id IN ({marks})",
+            conversation_ids,
         )
-        self._save(rec)
-        return rec
+        con.execute(
+            f"DELETE FROM edit_sessions WHERE conversation_id IN ({marks})",
+            conversation_ids,
+        )
+        self._cache.drop(*conversation_ids)
 
     def clear(self, conversation_id: str) -> None:
         """Clear session data."""
-        con = self._conn()
-        try:
-            con.execute(
-                "DELETE FROM edit_sessions WHERE conversation_id=?",
-                (conversation_id,)
-            )
-            con.commit()
-        finally:
-            con.close()
+        with self._tx() as con:
+            self._delete(con, [conversation_id])
 
     def cleanup_expired(self) -> int:
         """
-        Remove all expired sessions.
+        Remove all expired sessions, in batches of CLEANUP_BATCH found via
+        the updated_at index so the write lock is never held for long.
 
         Returns:
             Number of sessions removed
         """
-        con = self._conn()
+        cutoff = time.time() - settings.TTL_SECONDS
+        removed = 0
+        while True:
+            with self._tx() as con:
+                ids = [
+                    row[0] for row in con.execute(
+                        "SELECT conversation_id FROM edit_sessions WHERE updated_at < ? LIMIT ?",
+                        (cutoff, self.CLEANUP_BATCH),
+                    )
+                ]
+                if ids:
+                    self._delete(con, ids)
+            removed += len(ids)
+            if len(ids) < self.CLEANUP_BATCH:
+                return removed
+
+    def _maybe_cleanup(self) -> None:
+        """Amortised expiry: at most one cleanup pass per interval."""
+        now = time.time()
+        if now - self._last_cleanup < self.CLEANUP_INTERVAL_SECONDS:
+            return
+        self._last_cleanup = now
         try:
-            cutoff = time.time() - settings.TTL_SECONDS
-            cursor = con.execute(
-                "DELETE FROM edit_sessions WHERE updated_at < ?",
-                (cutoff,)
-            )
-            con.commit()
-            return cursor.rowcount
-        finally:
-            con.close()
+            self.cleanup_expired()
+        except sqlite3.Error:
+            pass
 
 
 class RedisStore(BaseStore):
@@ -489,6 +740,14 @@ class RedisStore(BaseStore):
 
     Recommended for multi-instance deployments.
     Uses Redis key expiration for automatic TTL enforcement.
+
+    A session is three keys: a meta hash (active/original URL, updated_at,
+    rev), a sorted set ordering version URLs by sequence number, and a hash
+    of URL -> version JSON. Appends and deletes are O(log n) on the sorted
+    set instead of rewriting one JSON blob; writes run under WATCH/MULTI.
+    ``get`` is served from an in-process cache while ``rev`` is unchanged.
+    Sessions written in the old single-JSON-key format are migrated on
+    first access.
     """
 
     def __init__(self, url: str):
@@ -507,11 +766,17 @@ class RedisStore(BaseStore):
                 "Install with: pip install redis"
             )
         self.r = redis.Redis.from_url(url, decode_responses=True)
+        self._cache = _RecordCache()
 
     def _key(self, conversation_id: str) -> str:
-        """Generate Redis key for a conversation."""
+        """Generate Redis key for a conversation (legacy single-JSON format)."""
         return f"edit_session:{conversation_id}"
 
+    def _keys(self, conversation_id: str) -> Tuple[str, str, str]:
+        """(meta hash, order zset, versions hash) keys for a conversation."""
+        base = self._key(conversation_id)
+        return f"{base}:meta", f"{base}:order", f"{base}:versions"
+
     def _parse_versions(self, data: Any) -> List[VersionEntry]:
         """
         Parse versions/history with backward compatibility.
@@ -531,37 +796,132 @@ class RedisStore(BaseStore):
         history = data.get("history") or []
         return [VersionEntry.from_url(url) if isinstance(url, str) else VersionEntry.from_dict(url) for url in history]
 
-    def get(self, conversation_id: str) -> SessionRecord:
-        """Retrieve session state."""
-        k = self._key(conversation_id)
-        raw = self.r.get(k)
-
+    def _migrate_legacy(self, conversation_id: str) -> None:
+        """Rewrite a single-JSON-key session into the hash/zset layout."""
+        raw = self.r.get(self._key(conversation_id))
         if not raw:
-            return SessionRecord(conversation_id, None, [], time.time())
-
+            return
         data = json.loads(raw)
-        versions = self._parse_versions(data)
-
-        return SessionRecord(
+        versions = self._parse_versions(data)[: settings.HISTORY_LIMIT]
+        meta_k, order_k, versions_k = self._keys(conversation_id)
+        ttl = self.r.ttl(self._key(conversation_id))
+        ttl = ttl if ttl and ttl > 0 else settings.TTL_SECONDS
+        n = len(versions)
+
+        pipe = self.r.pipeline()
+        pipe.delete(meta_k, order_k, versions_k)
+        pipe.hset(meta_k, mapping={
+            "active_image_url": data.get("active_image_url") or "",
+            "original_image_url": data.get("original_image_url") or "",
+            "updated_at": float(data.get("updated_at") or time.time()),
+            "rev": int.from_bytes(os.urandom(6), "big"),
+            "next_seq": n,
+        })
+        if versions:
+            pipe.zadd(order_k, {v.url: n - i for i, v in enumerate(versions)})
+            pipe.hset(versions_k, mapping={v.url: json.dumps(v.to_dict()) for v in versions})
+        for k in (meta_k, order_k, versions_k):
+            pipe.expire(k, ttl)
+        pipe.delete(self._key(conversation_id))
+        pipe.execute()
+
+    def _read(self, conversation_id: str) -> Tuple[int, SessionRecord]:
+        meta_k, order_k, versions_k = self._keys(conversation_id)
+        pipe = self.r.pipeline()
+        pipe.hgetall(meta_k)
+        pipe.zrevrange(order_k, 0, settings.HISTORY_LIMIT - 1)
+        meta, urls = pipe.execute()
+        if not meta:
+            return -1, SessionRecord(conversation_id, None, [], time.time())
+        raw_versions = self.r.hmget(versions_k, urls) if urls else []
+        versions = [
+            VersionEntry.from_dict(json.loads(raw)) for raw in raw_versions if raw
+        ]
+        return int(meta.get("rev") or 0), SessionRecord(
             conversation_id=conversation_id,
-            active_image_url=data.get("active_image_url"),
+            active_image_url=meta.get("active_image_url") or None,
             versions=versions,
-            updated_at=float(data.get("updated_at") or time.time()),
-            original_image_url=data.get("original_image_url"),
+            updated_at=float(meta.get("updated_at") or time.time()),
+            original_image_url=meta.get("original_image_url") or None,
         )
 
-    def _save(self, rec: SessionRecord) -> None:
-        """Persist session record to Redis with TTL."""
-        k = self._key(rec.conversation_id)
-        # Serialize versions as list of dicts
-        versions_data = [v.to_dict() for v in rec.versions[: settings.HISTORY_LIMIT]]
-        data = {
-            "active_image_url": rec.active_image_url,
-            "original_image_url": rec.original_image_url,
-            "versions": versions_data,
-            "updated_at": rec.updated_at,
-        }
-        self.r.setex(k, settings.TTL_SECONDS, json.dumps(data))
+    def get(self, conversation_id: str) -> SessionRecord:
+        """Retrieve session state."""
+        meta_k, _, _ = self._keys(conversation_id)
+        rev = self.r.hget(meta_k, "rev")
+        if rev is None:
+            if not self.r.exists(self._key(conversation_id)):
+                return SessionRecord(conversation_id, None, [], time.time())
+            self._migrate_legacy(conversation_id)
+            rev = self.r.hget(meta_k, "rev")
+
+        cached = self._cache.get(conversation_id, int(rev or 0))
+        if cached is not None:
+            return cached
+        rev_read, rec = self._read(conversation_id)
+        self._cache.put(conversation_id, rev_read, rec)
+        return rec
+
+    def _write_version(
+        self,
+        conversation_id: str,
+        entry: VersionEntry,
+        activate: bool,
+    ) -> SessionRecord:
+        """Add (or move to front) one version under WATCH/MULTI."""
+        meta_k, order_k, versions_k = self._keys(conversation_id)
+        if self.r.exists(self._key(conversation_id)):
+            self._migrate_legacy(conversation_id)
+
+        parent_url = entry.parent_url
+        with self.r.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(meta_k, order_k)
+                    meta = pipe.hgetall(meta_k)
+                    rev = int(meta.get("rev") or int.from_bytes(os.urandom(6), "big"))
+                    seq = int(meta.get("next_seq") or 0) + 1
+                    active = meta.get("active_image_url") or None
+                    original = meta.get("original_image_url") or None
+                    # Re-derived on every attempt: a retry must see the
+                    # active image that won the race, not the one it lost to.
+                    entry.parent_url = parent_url if parent_url is not None else active
+                    is_new = pipe.zscore(order_k, entry.url) is None
+                    excess = pipe.zcard(order_k) + (1 if is_new else 0) - settings.HISTORY_LIMIT
+                    dropped = pipe.zrange(order_k, 0, excess - 1) if excess > 0 else []
+                    if activate:
+                        active = entry.url
+                        original = original or entry.url
+                    now = time.time()
+
+                    pipe.multi()
+                    pipe.zadd(order_k, {entry.url: seq})
+                    pipe.hset(versions_k, entry.url, json.dumps(entry.to_dict()))
+                    if dropped:
+                        pipe.zrem(order_k, *dropped)
+                        pipe.hdel(versions_k, *dropped)
+                    pipe.hset(meta_k, mapping={
+                        "active_image_url": active or "",
+                        "original_image_url": original or "",
+                        "updated_at": now,
+                        "rev": rev + 1,
+                        "next_seq": seq,
+                    })
+                    for k in (meta_k, order_k, versions_k):
+                        pipe.expire(k, settings.TTL_SECONDS)
+                    pipe.execute()
+                    break
+                except redis.WatchError:
+                    continue
+
+        base = self._cache.get(conversation_id, rev) if meta else None
+        if base is not None:
+            rec = SessionRecord(conversation_id, active, _with_version(base.versions, entry),
+                                now, original)
+        else:
+            _, rec = self._read(conversation_id)
+        self._cache.put(conversation_id, rev + 1, rec)
+        return rec
 
     def set_active(
         self,
@@ -571,32 +931,14 @@ class RedisStore(BaseStore):
         settings_dict: Optional[Dict[str, Any]] = None,
     ) -> SessionRecord:
         """Set active image and add to version history."""
-        rec = self.get(conversation_id)
-
-        # Create new version entry
-        new_version = VersionEntry(
+        entry = VersionEntry(
             url=image_url,
             instruction=instruction,
             created_at=time.time(),
-            parent_url=rec.active_image_url,
+            parent_url=None,  # filled with the current active image
             settings=settings_dict or {},
         )
-
-        versions = [new_version] + [v for v in rec.versions if v.url != image_url]
-        versions = versions[: settings.HISTORY_LIMIT]
-
-        # Set original_image_url if this is the first image
-        original = rec.original_image_url or image_url
-
-        rec = SessionRecord(
-            conversation_id=conversation_id,
-            active_image_url=image_url,
-            versions=versions,
-            updated_at=time.time(),
-            original_image_url=original,
-        )
-        self._save(rec)
-        return rec
+        return self._write_version(conversation_id, entry, activate=True)
 
     def push_version(
         self,
@@ -607,55 +949,65 @@ class RedisStore(BaseStore):
         settings_dict: Optional[Dict[str, Any]] = None,
     ) -> SessionRecord:
         """Add version to history without changing active image."""
-        rec = self.get(conversation_id)
-
-        # Create new version entry
-        new_version = VersionEntry(
+        entry = VersionEntry(
             url=image_url,
             instruction=instruction,
             created_at=time.time(),
-            parent_url=parent_url or rec.active_image_url,
+            parent_url=parent_url,
             settings=settings_dict or {},
         )
-
-        versions = [new_version] + [v for v in rec.versions if v.url != image_url]
-        versions = versions[: settings.HISTORY_LIMIT]
-
-        rec = SessionRecord(
-            conversation_id=conversation_id,
-            active_image_url=rec.active_image_url,
-            versions=versions,
-            updated_at=time.time(),
-            original_image_url=rec.original_image_url,
-        )
-        self._save(rec)
-        return rec
+        return self._write_version(conversation_id, entry, activate=False)
 
     def remove_version(self, conversation_id: str, image_url: str) -> SessionRecord:
         """Remove a single version and update active if needed."""
-        rec = self.get(conversation_id)
-        filtered = [v for v in rec.versions if v.url != image_url]
-
-        if len(filtered) == len(rec.versions):
-            return rec
-
-        new_active = rec.active_image_url
-        if rec.active_image_url == image_url:
-            new_active = filtered[0].url if filtered else None
-
-        rec = SessionRecord(
-            conversation_id=conversation_id,
-            active_image_url=new_active,
-            versions=filtered,
-            updated_at=time.time(),
-            original_image_url=rec.original_image_url,
-        )
-        self._save(rec)
+        meta_k, order_k, versions_k = self._keys(conversation_id)
+        if self.r.exists(self._key(conversation_id)):
+            self._migrate_legacy(conversation_id)
+
+        with self.r.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(meta_k, order_k)
+                    meta = pipe.hgetall(meta_k)
+                    if not meta or pipe.zscore(order_k, image_url) is None:
+                        pipe.unwatch()
+                        return self.get(conversation_id)
+                    rev = int(meta.get("rev") or 0)
+                    active = meta.get("active_image_url") or None
+                    if active == image_url:
+                        top = [u for u in pipe.zrevrange(order_k, 0, 1) if u != image_url]
+                        active = top[0] if top else None
+                    now = time.time()
+
+                    pipe.multi()
+                    pipe.zrem(order_k, image_url)
+                    pipe.hdel(versions_k, image_url)
+                    pipe.hset(meta_k, mapping={
+                        "active_image_url": active or "",
+                        "updated_at": now,
+                        "rev": rev + 1,
+                    })
+                    for k in (meta_k, order_k, versions_k):
+                        pipe.expire(k, settings.TTL_SECONDS)
+                    pipe.execute()
+                    break
+                except redis.WatchError:
+                    continue
+
+        base = self._cache.get(conversation_id, rev)
+        if base is not None:
+            rec = SessionRecord(conversation_id, active,
+                                [v for v in base.versions if v.url != image_url],
+                                now, base.original_image_url)
+        else:
+            _, rec = self._read(conversation_id)
+        self._cache.put(conversation_id, rev + 1, rec)
         return rec
 
     def clear(self, conversation_id: str) -> None:
         """Clear session data."""
-        self.r.delete(self._key(conversation_id))
+        self.r.delete(self._key(conversation_id), *self._keys(conversation_id))
+        self._cache.drop(conversation_id)
 
     def health_check(self) -> bool:
         """
@@ -671,13 +1023,27 @@ class RedisStore(BaseStore):
             return False
 
 
+_stores: Dict[Tuple[str, str], BaseStore] = {}
+_stores_lock = threading.Lock()
+
+
 def get_store() -> BaseStore:
     """
     Factory function to get the configured storage backend.
 
+    Stores are created once per backend + location and reused, so their
+    connections and read caches survive across requests.
+
     Returns:
         SQLiteStore or RedisStore based on STORE setting
     """
     if settings.STORE.lower() == "redis":
-        return RedisStore(settings.REDIS_URL)
-    return SQLiteStore(settings.SQLITE_PATH)
+        key = ("redis", settings.REDIS_URL)
+    else:
+        key = ("sqlite", settings.SQLITE_PATH)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = RedisStore(key[1]) if key[0] == "redis" else SQLiteStore(key[1])
+            _stores[key] = store
+        return store
@@ -0,0 +1,213 @@
+"""
+Tests for the pooled HomePilot client and streamed upload forwarding.
+
+HomePilot is replaced by an ``httpx.MockTransport`` behind the shared pool,
+so the real multipart encoding path runs without a backend.
+
+Covers:
+  1. Uploads are streamed from the spooled file in chunks, not buffered
+  2. EXIF stripping re-encodes into a temp file that is forwarded as PNG
+  3. One pooled client is reused across calls and closed by the lifespan
+  4. MAX_CONCURRENT_UPLOADS queues extra uploads instead of running them
+  5. Oversized uploads are rejected before anything is forwarded
+"""
+
+import asyncio
+from io import BytesIO
+
+import httpx
+import pytest
+from PIL import Image
+from fastapi.testclient import TestClient
+
+from app import config
+from app import homepilot_client
+from app import main as main_module
+from app import security as security_module
+from app import utils_images
+from app.main import app
+from app.store import SQLiteStore
+
+
+def make_png_bytes(width: int = 100, height: int = 100) -> bytes:
+    """Create a noisy PNG so the encoded file spans several chunks."""
+    im = Image.effect_noise((width, height), 64).convert("RGB")
+    out = BytesIO()
+    im.save(out, format="PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def homepilot(monkeypatch):
+    """Route the shared pool to an in-process fake HomePilot."""
+    received = []
+    pools = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        received.append((request.url.path, request.headers, body))
+        if request.url.path == "/upload":
+            return httpx.Response(200, json={"url": "http://homepilot/files/up.png"})
+        return httpx.Response(200, json={"text": "ok"})
+
+    def new_pool():
+        pools.append(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        return pools[-1]
+
+    monkeypatch.setattr(homepilot_client, "_new_pool", new_pool)
+    asyncio.run(homepilot_client.close_pool())
+    yield received, pools
+    asyncio.run(homepilot_client.close_pool())
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    store = SQLiteStore(str(tmp_path / "db.sqlite"))
+    monkeypatch.setattr(main_module, "get_store", lambda: store)
+    security_module.bucket.tokens.clear()
+    security_module.bucket.updated.clear()
+    return TestClient(app)
+
+
+def test_upload_streams_body_in_chunks(client, homepilot, monkeypatch):
+    received, _ = homepilot
+    reads = []
+    real_read = utils_images.UploadBody.read
+
+    def spy_read(self, n=-1):
+        reads.append(n)
+        return real_read(self, n)
+
+    monkeypatch.setattr(utils_images.UploadBody, "read", spy_read)
+
+    png = make_png_bytes(400, 400)
+    assert len(png) > 3 * 64 * 1024
+    r = client.post(
+        "/upload",
+        files={"file": ("big.png", png, "image/png")},
+        data={"strip_metadata": "false"},
+    )
+
+    assert r.status_code == 200, r.text
+    path, headers, body = received[0]
+    assert path == "/upload"
+    assert png in body
+    assert int(headers["content-length"]) == len(body)
+    assert reads and all(0 < n <= 64 * 1024 for n in reads)
+
+
+def test_strip_metadata_forwards_reencoded_png(client, homepilot):
+    received, _ = homepilot
+    im = Image.new("RGB", (64, 64), (10, 20, 30))
+    exif = Image.Exif()
+    exif[0x010F] = "SecretCam"
+    out = BytesIO()
+    im.save(out, format="JPEG", exif=exif)
+
+    r = client.post(
+        "/v1/edit-sessions/c1/image",
+        files={"file": ("photo.jpg", out.getvalue(), "image/jpeg")},
+    )
+
+    assert r.status_code == 200, r.text
+    body = received[0][2]
+    assert b"\x89PNG" in body
+    assert b"SecretCam" not in body
+
+
+def test_pool_reused_and_closed_by_lifespan(homepilot):
+    received, pools = homepilot
+
+    async def calls():
+        hp = homepilot_client.HomePilotClient()
+        await hp.chat({"message": "hi"})
+        await hp.chat({"message": "again"})
+        assert await hp.health_check()
+
+    asyncio.run(calls())
+    assert len(pools) == 1 and len(received) == 3
+
+    with TestClient(app):
+        pool = homepilot_client._pool
+        assert pool is pools[-1] and not pool.is_closed
+    assert pool.is_closed
+    assert homepilot_client._pool is None
+
+
+def test_upload_concurrency_is_bounded(monkeypatch):
+    monkeypatch.setattr(config.settings, "MAX_CONCURRENT_UPLOADS", 1)
+    active = []
+    peak = []
+
+    async def slow_handler(request):
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.02)
+        active.pop()
+        return httpx.Response(200, json={"url": "http://homepilot/files/x.png"})
+
+    monkeypatch.setattr(
+        homepilot_client, "_new_pool",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(slow_handler)),
+    )
+
+    async def burst():
+        await homepilot_client.open_pool()
+        hp = homepilot_client.HomePilotClient()
+        try:
+            return await asyncio.gather(
+                *(hp.upload(f"{i}.png", "image/png", b"data") for i in range(4))
+            )
+        finally:
+            await homepilot_client.close_pool()
+
+    assert len(asyncio.run(burst())) == 4
+    assert max(peak) == 1
+
+
+def test_close_pool_during_uploads_keeps_slots(monkeypatch):
+    monkeypatch.setattr(config.settings, "MAX_CONCURRENT_UPLOADS", 1)
+    active = []
+    peak = []
+
+    async def slow_handler(request):
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.02)
+        active.pop()
+        return httpx.Response(200, json={"url": "http://homepilot/files/x.png"})
+
+    monkeypatch.setattr(
+        homepilot_client, "_new_pool",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(slow_handler)),
+    )
+
+    async def run():
+        await homepilot_client.open_pool()
+        hp = homepilot_client.HomePilotClient()
+        first = asyncio.create_task(hp.upload("a.png", "image/png", b"data"))
+        await asyncio.sleep(0.005)
+        slots = homepilot_client._upload_slots
+        await homepilot_client.close_pool()
+        assert homepilot_client._upload_slots is slots
+        # Reopens the pool while the first upload still holds the only slot
+        later = [hp.upload(f"{i}.png", "image/png", b"data") for i in range(2)]
+        results = await asyncio.gather(first, *later, return_exceptions=True)
+        await homepilot_client.close_pool()
+        return results
+
+    asyncio.run(run())
+    assert max(peak) == 1
+
+
+def test_oversized_upload_rejected_before_forwarding(client, homepilot, monkeypatch):
+    received, _ = homepilot
+    monkeypatch.setattr(config.settings, "MAX_UPLOAD_MB", 0)
+
+    r = client.post(
+        "/upload",
+        files={"file": ("big.png", make_png_bytes(), "image/png")},
+    )
+
+    assert r.status_code == 413
+    assert received == []
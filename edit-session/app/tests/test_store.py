@@ -142,3 +142,98 @@ class TestSQLiteStore:
                 assert rec.active_image_url is None
             finally:
                 config.settings.TTL_SECONDS = original_ttl
+
+
+class TestSQLiteStoreVersionTable:
+    """Normalized version rows, read cache, legacy migration and batched expiry."""
+
+    def test_legacy_history_json_is_migrated(self, tmp_path):
+        import json
+        import sqlite3
+        import time
+
+        path = str(tmp_path / "db.sqlite")
+        con = sqlite3.connect(path)
+        con.execute(
+            "CREATE TABLE edit_sessions (conversation_id TEXT PRIMARY KEY, "
+            "active_image_url TEXT, original_image_url TEXT, "
+            "history_json TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        history = [{"url": "http://x/b.png", "instruction": "brighter"}, "http://x/a.png"]
+        con.execute(
+            "INSERT INTO edit_sessions VALUES (?, ?, ?, ?, ?)",
+            ("c1", "http://x/b.png", "http://x/a.png", json.dumps(history), time.time()),
+        )
+        con.commit()
+        con.close()
+
+        store = SQLiteStore(path)
+        rec = store.get("c1")
+        assert rec.history == ["http://x/b.png", "http://x/a.png"]
+        assert rec.versions[0].instruction == "brighter"
+
+        rec = store.push_version("c1", "http://x/c.png")
+        assert rec.history == ["http://x/c.png", "http://x/b.png", "http://x/a.png"]
+
+    def test_remove_active_version_picks_next(self, tmp_path):
+        store = SQLiteStore(str(tmp_path / "db.sqlite"))
+        store.set_active("c1", "http://x/a.png")
+        store.set_active("c1", "http://x/b.png")
+        store.push_version("c1", "http://x/c.png")
+
+        rec = store.remove_version("c1", "http://x/b.png")
+        assert rec.active_image_url == "http://x/c.png"
+        assert rec.history == ["http://x/c.png", "http://x/a.png"]
+        assert store.remove_version("c1", "http://x/missing.png").history == rec.history
+
+    def test_history_limit_trims_oldest(self, tmp_path, monkeypatch):
+        from app import config
+
+        monkeypatch.setattr(config.settings, "HISTORY_LIMIT", 3)
+        store = SQLiteStore(str(tmp_path / "db.sqlite"))
+        for i in range(6):
+            store.push_version("c1", f"http://x/{i}.png")
+        store.push_version("c1", "http://x/4.png")  # move-to-front, no growth
+
+        rec = store.get("c1")
+        assert rec.history == ["http://x/4.png", "http://x/5.png", "http://x/3.png"]
+        con = store._conn()
+        assert con.execute("SELECT COUNT(*) FROM edit_session_versions").fetchone()[0] == 3
+
+    def test_read_cache_sees_writes_from_other_instances(self, tmp_path):
+        path = str(tmp_path / "db.sqlite")
+        a, b = SQLiteStore(path), SQLiteStore(path)
+        a.set_active("c1", "http://x/a.png")
+        assert a.get("c1").history == ["http://x/a.png"]  # now cached in a
+
+        b.push_version("c1", "http://x/b.png")
+        assert a.get("c1").history == ["http://x/b.png", "http://x/a.png"]
+
+        # Returned records are copies; mutating one doesn't poison the cache
+        a.get("c1").versions.clear()
+        assert len(a.get("c1").versions) == 2
+
+    def test_cleanup_expired_in_batches(self, tmp_path, monkeypatch):
+        from app import config
+
+        store = SQLiteStore(str(tmp_path / "db.sqlite"))
+        monkeypatch.setattr(SQLiteStore, "CLEANUP_BATCH", 2)
+        for i in range(5):
+            store.set_active(f"old{i}", "http://x/a.png")
+        store._conn().execute("UPDATE edit_sessions SET updated_at = updated_at - 100")
+        store.set_active("fresh", "http://x/a.png")
+
+        monkeypatch.setattr(config.settings, "TTL_SECONDS", 50)
+        assert store.get("old0").history == []  # expired reads as empty
+        assert store.cleanup_expired() == 5
+        assert store.get("fresh").history == ["http://x/a.png"]
+        con = store._conn()
+        assert con.execute("SELECT COUNT(*) FROM edit_session_versions").fetchone()[0] == 1
+
+    def test_get_store_reuses_instance(self, tmp_path, monkeypatch):
+        from app import config, store as store_module
+
+        monkeypatch.setattr(config.settings, "STORE", "sqlite")
+        monkeypatch.setattr(config.settings, "SQLITE_PATH", str(tmp_path / "db.sqlite"))
+        monkeypatch.setattr(store_module, "_stores", {})
+        assert store_module.get_store() is store_module.get_store()
@@ -5,8 +5,16 @@ Provides secure image handling with:
 - File type validation
 - Size limits
 - EXIF metadata stripping for privacy
+
+The ``*_stream`` variants work on the spooled temp file Starlette already
+wrote the upload to, so a 20-50 MB image is never copied into a bytes
+object just to be validated and forwarded.
 """
 
+import os
+import tempfile
+from typing import BinaryIO
+
 from fastapi import UploadFile, HTTPException
 from PIL import Image
 from io import BytesIO
@@ -76,6 +84,111 @@ async def read_and_validate_upload(file: UploadFile) -> bytes:
     return data
 
 
+class UploadBody:
+    """
+    Seekable, sized view over an upload file object.
+
+    httpx streams file objects into multipart requests chunk by chunk and
+    uses seek/tell to compute Content-Length; ``len()`` gives callers the
+    same size check they had with raw bytes.
+    """
+
+    def __init__(self, fileobj: BinaryIO, size: int):
+        self._f = fileobj
+        self.size = size
+        self._f.seek(0)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def read(self, n: int = -1) -> bytes:
+        return self._f.read(n)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        self._f.seek(offset, whence)
+        return self._f.tell()
+
+    def tell(self) -> int:
+        return self._f.tell()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def _stream_size(f: BinaryIO) -> int:
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(0)
+    return size
+
+
+async def validate_upload_stream(file: UploadFile) -> UploadBody:
+    """
+    Validate an uploaded image in place, without reading it into memory.
+
+    Same checks and errors as :func:`read_and_validate_upload`, but the
+    size comes from the spooled file and PIL verifies the image straight
+    from the file object.
+
+    Returns:
+        UploadBody positioned at the start of the upload
+    """
+    if file.content_type not in ALLOWED_MIME:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported content type: {file.content_type}. "
+                   f"Allowed: {', '.join(sorted(ALLOWED_MIME))}"
+        )
+
+    f = file.file
+    size = file.size if file.size is not None else _stream_size(f)
+
+    if not size:
+        raise HTTPException(status_code=400, detail="Empty upload")
+
+    if size > _max_bytes():
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload too large. Maximum size: {settings.MAX_UPLOAD_MB}MB"
+        )
+
+    try:
+        f.seek(0)
+        img = Image.open(f)
+        img.verify()
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid image file: {e}"
+        )
+
+    return UploadBody(f, size)
+
+
+def strip_exif_stream(src: UploadBody) -> UploadBody:
+    """
+    Streaming counterpart of :func:`strip_exif`.
+
+    The PNG re-encode is written to a spooled temp file that spills to disk
+    past ``UPLOAD_SPOOL_MB``. On failure the original body is returned.
+    """
+    out = tempfile.SpooledTemporaryFile(
+        max_size=int(settings.UPLOAD_SPOOL_MB) * 1024 * 1024
+    )
+    try:
+        src.seek(0)
+        im = Image.open(src)
+        if im.mode not in ("RGBA", "RGB"):
+            im = im.convert("RGBA")
+        im.save(out, format="PNG", optimize=True)
+        size = out.tell()
+    except Exception:
+        out.close()
+        src.seek(0)
+        return src
+    return UploadBody(out, size)
+
+
 def strip_exif(image_bytes: bytes) -> bytes:
     """
     Remove EXIF metadata from image for privacy.
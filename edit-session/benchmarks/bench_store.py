@@ -0,0 +1,122 @@
+"""
+Micro-benchmark: edit-session SQLite store at long editing sessions.
+
+Replays one conversation growing to --versions versions (push_version for
+every edit result, set_active every 4th) and reports per-operation latency
+at the start and end of the session, plus get() latency.
+
+Compared stores:
+  blob        the previous layout - full history as one JSON column,
+              read + rewritten on every write (inlined below for reference)
+  normalized  app.store.SQLiteStore - one row per version, rev-checked cache
+
+Run from ``edit-session/``::
+
+    python -m benchmarks.bench_store [--versions 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import config  # noqa: E402
+from app.store import SQLiteStore  # noqa: E402
+
+
+class BlobStore:
+    """Reference: the one-JSON-blob-per-conversation layout."""
+
+    def __init__(self, path: str):
+        self.path = path
+        con = sqlite3.connect(path)
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS s (cid TEXT PRIMARY KEY, active TEXT, "
+            "history_json TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        con.commit()
+        con.close()
+
+    def _load(self, con, cid):
+        row = con.execute("SELECT active, history_json FROM s WHERE cid=?", (cid,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else (None, [])
+
+    def get(self, cid):
+        con = sqlite3.connect(self.path)
+        try:
+            return self._load(con, cid)
+        finally:
+            con.close()
+
+    def _write(self, cid, url, activate):
+        con = sqlite3.connect(self.path)
+        try:
+            active, versions = self._load(con, cid)
+            entry = {"url": url, "instruction": "edit", "created_at": time.time(),
+                     "parent_url": active, "settings": {"steps": 30}}
+            versions = ([entry] + [v for v in versions if v["url"] != url])[: config.settings.HISTORY_LIMIT]
+            con.execute(
+                "INSERT INTO s VALUES (?, ?, ?, ?) ON CONFLICT(cid) DO UPDATE SET "
+                "active=excluded.active, history_json=excluded.history_json, updated_at=excluded.updated_at",
+                (cid, url if activate else active, json.dumps(versions), time.time()),
+            )
+            con.commit()
+        finally:
+            con.close()
+
+    def push_version(self, cid, url, **_):
+        self._write(cid, url, False)
+
+    def set_active(self, cid, url, **_):
+        self._write(cid, url, True)
+
+
+def _session(store, n):
+    """Returns per-op latencies (ms) for the first and last 100 operations."""
+    lat = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        if i % 4 == 0:
+            store.set_active("c1", f"http://homepilot/files/{i}.png", instruction="edit")
+        else:
+            store.push_version("c1", f"http://homepilot/files/{i}.png", instruction="edit")
+        lat.append((time.perf_counter() - t0) * 1000)
+    return sum(lat[:100]) / 100, sum(lat[-100:]) / 100, sum(lat)
+
+
+def _get_latency(store, rounds=500):
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        store.get("c1")
+    return (time.perf_counter() - t0) * 1000 / rounds
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--versions", type=int, default=1000)
+    args = ap.parse_args()
+    config.settings.HISTORY_LIMIT = args.versions
+
+    print(f"{args.versions} versions in one conversation (HISTORY_LIMIT={args.versions})")
+    print(f"  {'store':<11} {'write first100':>15} {'write last100':>14} {'total':>9} {'get':>9}")
+    with tempfile.TemporaryDirectory() as d:
+        for label, store in (
+            ("blob", BlobStore(os.path.join(d, "blob.sqlite"))),
+            ("normalized", SQLiteStore(os.path.join(d, "norm.sqlite"))),
+        ):
+            first, last, total = _session(store, args.versions)
+            get_ms = _get_latency(store)
+            print(f"  {label:<11} {first:12.3f} ms {last:11.3f} ms {total / 1000:7.2f} s {get_ms:6.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,7 +25,6 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import hashlib
 import json
 import os
 import re
@@ -64,6 +63,15 @@ CATALOG_PATH = PROJECT_ROOT / "backend" / "app" / "model_catalog_data.json"
 # ComfyUI models root - consistent with download_models.sh
 COMFYUI_ROOT = PROJECT_ROOT / "models" / "comfy"
 
+# Shared in-process downloader (parallel ranged fetch, resume, streaming SHA-256)
+# lives in the backend so the CLI and the avatar installer behave identically.
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+from app.model_downloader import (  # noqa: E402
+    DownloadError,
+    get_default_downloader,
+    verify_sha256 as _shared_verify_sha256,
+)
+
 # ComfyUI installation root (for custom_nodes)
 def get_comfyui_install_root() -> Path:
     """
@@ -331,13 +339,11 @@ def install_from_install_block(model_id: str, model_data: Dict[str, Any]) -> boo
                 print(f"      [Exists] {dest_rel}")
                 continue
             print(f"      [{idx}/{len(files)}] {dest_rel}")
-            ok, msg = download_file(url, dest)
+            # SHA-256 is verified while streaming; a mismatch fails the download.
+            ok, msg = download_file(url, dest, sha256=sha256)
             if not ok:
                 print(f"ERROR: {msg}")
                 sys.exit(1)
-            if sha256 and not verify_sha256(dest, sha256):
-                print(f"ERROR: SHA256 mismatch for {dest.name}")
-                sys.exit(1)
 
         hint = install.get("hint")
         if hint:
@@ -487,18 +493,20 @@ def download_file(
     show_progress: bool = True,
     resume: bool = True,
     custom_headers: Optional[Dict[str, str]] = None,
+    sha256: Optional[str] = None,
 ) -> Tuple[bool, str]:
     """
     Download a file with progress bar and resume support.
     Returns (success, message).
 
+    Uses the shared backend ModelDownloader: large files are fetched over
+    several ranged connections, partial downloads resume from ``.part``
+    files, and ``sha256`` (when given) is verified while streaming.
+
     Automatically adds authentication headers for:
     - HuggingFace URLs (uses HF_TOKEN env var or stored key)
     - Civitai URLs (uses custom_headers passed by caller)
     """
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    temp_file = dest.with_suffix(dest.suffix + ".part")
-
     headers = custom_headers.copy() if custom_headers else DEFAULT_HEADERS.copy()
 
     # Automatically add HuggingFace authentication for gated models
@@ -507,56 +515,38 @@ def download_file(
         if hf_token and "Authorization" not in headers:
             headers["Authorization"] = f"Bearer {hf_token}"
 
-    # Resume support
-    start_pos = 0
-    if resume and temp_file.exists():
-        start_pos = temp_file.stat().st_size
-        headers["Range"] = f"bytes={start_pos}-"
-
-    try:
-        response = requests.get(url, headers=headers, stream=True, timeout=30)
-        response.raise_for_status()
-
-        # Check if server supports resume
-        if start_pos > 0 and response.status_code == 200:
-            # Server doesn't support resume, start over
-            start_pos = 0
-            temp_file.unlink(missing_ok=True)
+    if not resume:
+        dest.with_name(dest.name + ".part").unlink(missing_ok=True)
+        dest.with_name(dest.name + ".part.json").unlink(missing_ok=True)
 
-        total_size = int(response.headers.get("content-length", 0))
-        if start_pos > 0:
-            total_size += start_pos
+    progress = None
 
-        mode = "ab" if start_pos > 0 else "wb"
-
-        if show_progress and total_size > 0:
+    def _on_event(event) -> None:
+        nonlocal progress
+        if not show_progress:
+            return
+        total = event.total or expected_size or 0
+        if event.kind == "start" and total > 0:
             progress = tqdm(
-                total=total_size,
-                initial=start_pos,
+                total=total,
+                initial=event.resumed_from,
                 unit="B",
                 unit_scale=True,
                 unit_divisor=1024,
                 desc=dest.name,
             )
+        elif progress is not None and event.kind in ("progress", "verifying", "complete"):
+            progress.update(max(0, event.downloaded - progress.n))
 
-        with open(temp_file, mode) as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    if show_progress and total_size > 0:
-                        progress.update(len(chunk))
-
-        if show_progress and total_size > 0:
-            progress.close()
-
-        # Move to final location
-        temp_file.replace(dest)
-
-        return True, f"Downloaded {dest.name} ({total_size / (1024**2):.1f} MB)"
+    try:
+        result = get_default_downloader().download(
+            url, dest, headers=headers, sha256=sha256 or "", on_event=_on_event,
+        )
+        return True, f"Downloaded {dest.name} ({result.size / (1024**2):.1f} MB)"
 
-    except requests.exceptions.HTTPError as e:
+    except DownloadError as e:
         # Provide helpful message for HuggingFace authentication errors
-        if e.response is not None and e.response.status_code == 401 and "huggingface.co" in url:
+        if e.status_code == 401 and "huggingface.co" in url:
             hf_token = get_hf_token()
             if not hf_token:
                 return False, (
@@ -575,17 +565,14 @@ def download_file(
         return False, f"Failed to download: {str(e)}"
     except Exception as e:
         return False, f"Failed to download: {str(e)}"
+    finally:
+        if progress is not None:
+            progress.close()
 
 
 def verify_sha256(file_path: Path, expected: str) -> bool:
     """Verify file SHA256 hash."""
-    sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            sha256.update(chunk)
-
-    actual = sha256.hexdigest()
-    return actual.lower() == expected.lower()
+    return _shared_verify_sha256(file_path, expected)
 
 
 # -----------------------------------------------------------------------------
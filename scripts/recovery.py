@@ -46,6 +46,7 @@ import secrets
 import shutil
 import sqlite3
 import sys
+import time
 from pathlib import Path
 from typing import Iterable, Optional
 
@@ -108,6 +109,24 @@ def _hash_password(password: str) -> str:
     return f"{salt}:{h}"
 
 
+# ----------------------------------------------------------------------------
+# Session revocation — matches backend/app/session_cache.py
+# ----------------------------------------------------------------------------
+# Running backends cache validated tokens in memory and drop that cache when
+# the epoch marker next to the DB changes. Deleting user_sessions rows here
+# must bump it too, or a cached token keeps working until its TTL runs out.
+
+def _bump_auth_epoch(db: Path) -> None:
+    epoch = Path(f"{db}.auth-epoch")
+    try:
+        epoch.touch()
+        now = time.time_ns()
+        os.utime(epoch, ns=(now, now))
+    except OSError as exc:
+        print(f"  Warning: could not signal running backends ({exc}); "
+              "cached sessions may stay valid for up to a minute.")
+
+
 # ----------------------------------------------------------------------------
 # Backup — always run before a mutation
 # ----------------------------------------------------------------------------
@@ -323,6 +342,7 @@ def cmd_reset_password(args: argparse.Namespace) -> int:
     cur.execute("DELETE FROM user_sessions WHERE user_id = ?", (uid,))
     con.commit()
     con.close()
+    _bump_auth_epoch(db)
 
     print(f"✓ Updated password for user {username!r} ({n} row).")
     print(f"  Existing sessions for this user were invalidated.")
@@ -366,6 +386,7 @@ def cmd_unlock_all(args: argparse.Namespace) -> int:
     cur.execute("DELETE FROM user_sessions")
     con.commit()
     con.close()
+    _bump_auth_epoch(db)
 
     print(f"✓ Reset password for {n} user(s); all sessions invalidated.")
     if generated:
@@ -393,6 +414,7 @@ def cmd_clear_sessions(_args: argparse.Namespace) -> int:
     n = cur.rowcount
     con.commit()
     con.close()
+    _bump_auth_epoch(db)
     print(f"✓ Invalidated {n} session(s). Every user will need to re-login.")
     return 0
 